@@ -12,6 +12,7 @@ import io
 import json
 import os
 import tempfile
+import threading
 import time
 import shutil
 import hashlib
@@ -32,7 +33,7 @@ def _esc(val) -> str:
 _current_request: contextvars.ContextVar[Optional["Request"]] = contextvars.ContextVar("_current_request", default=None)
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Form, Query, Depends
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 import sys
@@ -40,6 +41,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from urssaf_analyzer.config.settings import AppConfig
 from urssaf_analyzer.config.constants import SUPPORTED_EXTENSIONS, SMIC_MENSUEL_BRUT as _SMIC_MENSUEL, PASS_MENSUEL as _PASS_MENSUEL
+from urssaf_analyzer.config.subventions import VERSION_CATALOGUE, ProfilEntreprise, rechercher_aides
 from urssaf_analyzer.core.orchestrator import Orchestrator
 from urssaf_analyzer.core.exceptions import URSSAFAnalyzerError
 from urssaf_analyzer.database.db_manager import Database
@@ -51,9 +53,12 @@ from urssaf_analyzer.comptabilite.plan_comptable import PlanComptable
 from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures, TypeJournal
 from urssaf_analyzer.comptabilite.rapports_comptables import GenerateurRapports
 from urssaf_analyzer.security.proof_chain import ProofChain, ScoreProofRecord, ConstantsVersioner
+from urssaf_analyzer.rh.alertes import DonneesRH, MoteurAlertesRH
+from urssaf_analyzer.rh.planning import IndexAbsences, IndexPlanning
+from urssaf_analyzer.rh.identites import IndexIdentites
 
 from auth import (
-    create_user, authenticate, get_user, generate_token,
+    create_user_async, authenticate_async, get_user, generate_token,
     set_auth_cookie, clear_auth_cookie,
     get_current_user, get_optional_user, require_role,
     save_dashboard, load_dashboard, list_users_by_tenant, set_user_tenant,
@@ -61,6 +66,11 @@ from auth import (
     generate_verification_code, verify_email_code,
     VALID_OFFERS, VALID_ROLES,
 )
+from static_assets import RessourcesStatiques
+from cache_http import GenerationDonnees, ReponsesConditionnelles
+from rate_limit import LimiteurDebit, SeauxMemoire
+from pipeline_http import PipelineRequetes
+from serialisation import ReponseJSON
 
 # --- Detection environnement ---
 _IS_OVH = os.getenv("NORMACHECK_ENV") in ("production", "development", "staging")
@@ -104,6 +114,7 @@ app = FastAPI(
     title="NormaCheck",
     description="Plateforme professionnelle de conformite sociale et fiscale",
     version="3.9.0",
+    default_response_class=ReponseJSON,
 )
 
 _CORS_ORIGINS_RAW = os.getenv("NORMACHECK_CORS_ORIGINS", "")
@@ -113,6 +124,11 @@ else:
     # En dev, autoriser localhost ; en production, exiger une config explicite
     _CORS_ORIGINS = ["http://localhost:3000", "http://localhost:8000"] if not _IS_OVH else []
 
+# Compression + GET conditionnel : ajoute en premier, donc au plus pres des
+# routes (apres authentification) ; les routes sont enregistrees plus bas.
+_REPONSES_CONDITIONNELLES: dict = {}
+app.add_middleware(ReponsesConditionnelles, empreintes=_REPONSES_CONDITIONNELLES)
+
 # Securite: ne pas combiner wildcard (*) avec credentials=True
 _CORS_ALLOW_CREDS = "*" not in _CORS_ORIGINS
 app.add_middleware(
@@ -131,22 +147,6 @@ async def _safe_json(request: Request):
         raise HTTPException(400, "Corps de la requete invalide (JSON attendu)")
 
 
-# --- Middleware tracabilite : stocke la requete dans le contexte pour log_action ---
-# NOTE: On utilise un middleware ASGI pur au lieu de BaseHTTPMiddleware
-# car BaseHTTPMiddleware est connu pour corrompre les grandes reponses dans Starlette.
-
-class RequestContextMiddleware:
-    def __init__(self, app):
-        self.app = app
-
-    async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            from starlette.requests import Request as _Req
-            _current_request.set(_Req(scope, receive, send))
-        await self.app(scope, receive, send)
-
-app.add_middleware(RequestContextMiddleware)
-
 # --- Bootstrap admin au demarrage ---
 _admin = bootstrap_admin()
 if _admin:
@@ -158,153 +158,87 @@ _RETENTION_UPLOADS_DAYS = int(os.getenv("NORMACHECK_RETENTION_UPLOADS_DAYS", "90
 _RETENTION_AUDIT_DAYS = int(os.getenv("NORMACHECK_RETENTION_AUDIT_DAYS", "1825"))  # 5 ans (art. L102 B LPF)
 
 
-def _purger_fichiers_expires():
-    """Supprime les fichiers uploades depassant la duree de retention (RGPD art. 5.1.e)."""
-    if not _IS_OVH:
-        return
-    uploads_dir = _DATA_DIR / "uploads"
-    if not uploads_dir.exists():
-        return
-    import time as _time
-    now = _time.time()
-    seuil = now - (_RETENTION_UPLOADS_DAYS * 86400)
-    count = 0
-    for f in uploads_dir.rglob("*"):
-        if f.is_file() and f.stat().st_mtime < seuil:
-            try:
-                from urssaf_analyzer.security.secure_storage import suppression_securisee
-                suppression_securisee(f, passes=1)
-                count += 1
-            except Exception:
-                try:
-                    f.unlink()
-                    count += 1
-                except OSError:
-                    pass
-    if count > 0:
-        logger.info("Purge RGPD: %d fichier(s) expire(s) supprime(s) (retention %d jours)",
-                     count, _RETENTION_UPLOADS_DAYS)
-
-
-# Purge au demarrage
-try:
-    _purger_fichiers_expires()
-except Exception as e:
-    logger.warning("Erreur purge retention: %s", e)
-
-
-# --- Middleware securite : CSP + en-tetes de protection ---
-@app.middleware("http")
-async def security_headers_middleware(request: Request, call_next):
-    """Ajoute les en-tetes de securite (CSP, X-Frame-Options, etc.)."""
-    response = await call_next(request)
-    response.headers["Content-Security-Policy"] = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline'; "
-        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-        "img-src 'self' data:; "
-        "font-src 'self' https://fonts.gstatic.com; "
-        "frame-ancestors 'none'; "
-        "base-uri 'self'; "
-        "form-action 'self'"
-    )
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Permissions-Policy"] = "camera=(), microphone=(), geolocation=()"
-    return response
-
-
-# --- Middleware rate limiting ---
+_purge_scheduler = None
+_alert_manager = None
+if _persist:
+    # Purge RGPD en tache de fond : une execution par hote et par intervalle,
+    # limitee aux fichiers echus de l'index de retention (voir maintenance.py)
+    try:
+        from persistence import expiry_index, UPLOADS_DIR, LOGS_DIR
+        from maintenance import PurgeScheduler
+        from urssaf_analyzer.security.alert_manager import AlertManager
+        _purge_scheduler = PurgeScheduler(expiry_index, UPLOADS_DIR, _RETENTION_UPLOADS_DAYS)
+        # Journal des alertes de securite : segments anciens compresses, purges apres la retention d'audit
+        _alert_manager = AlertManager(LOGS_DIR / "alerts.jsonl")
+        _alert_manager.planifier_compactage(_purge_scheduler, retention_jours=_RETENTION_AUDIT_DAYS)
+    except Exception as e:
+        logger.warning("Planificateur de purge indisponible: %s", e)
+
+
+@app.on_event("startup")
+async def _demarrer_maintenance():
+    # Demarre dans chaque worker (apres le fork de preload_app) ;
+    # le verrou du planificateur garantit une seule purge par hote.
+    if _purge_scheduler is not None:
+        _purge_scheduler.start()
+    # Ouverture / fermeture des fenetres d'alertes RH a chaque changement de jour
+    _moteur_alertes_rh.start()
+    # Index des identites construit en fond : la premiere creation de contrat
+    # ou detection de doublons ne l'indexe plus en entier
+    threading.Thread(target=_indexer_identites, name="index-identites", daemon=True).start()
+
+
+# --- Pipeline des requetes (pipeline_http.py) ---
+# Un seul middleware ASGI pur : contexte de requete (log_action), limitation
+# de debit, authentification des routes /api/*, en-tetes de securite (CSP...)
+# et auto-persistance apres ecriture. Pages statiques et /api/health ne
+# passent que par le contexte et les en-tetes de securite.
+# Ajoute apres CORS : c'est la couche la plus externe.
+
+# Limitation de debit : seaux a jetons (rate_limit.py), partages par les
+# workers via SQLite en OVHcloud, en memoire du processus sinon.
 _RATE_LIMIT_WINDOW = 60  # secondes
 _RATE_LIMIT_MAX = int(os.getenv("NORMACHECK_RATE_LIMIT", "60"))  # requetes/minute
 _RATE_LIMIT_AUTH_MAX = 10  # tentatives auth/minute
-_rate_store: dict[str, list[float]] = {}
-
-
-def _get_client_ip(request: Request) -> str:
-    forwarded = request.headers.get("X-Forwarded-For", "")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
-
-
-def _check_rate_limit(key: str, max_requests: int) -> bool:
-    """Retourne True si la requete est autorisee, False si rate limited."""
-    now = time.time()
-    timestamps = _rate_store.get(key, [])
-    # Nettoyer les entrees expirees
-    timestamps = [t for t in timestamps if now - t < _RATE_LIMIT_WINDOW]
-    if len(timestamps) >= max_requests:
-        _rate_store[key] = timestamps
-        return False
-    timestamps.append(now)
-    _rate_store[key] = timestamps
-    return True
-
-
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    """Limite le debit des requetes par IP."""
-    client_ip = _get_client_ip(request)
-    path = request.url.path
-
-    # Limite stricte sur les endpoints d'authentification
-    if path in ("/api/auth/login", "/api/auth/register", "/api/auth/verify-email", "/api/auth/resend-verification"):
-        if not _check_rate_limit(f"auth:{client_ip}", _RATE_LIMIT_AUTH_MAX):
-            return JSONResponse(
-                {"detail": "Trop de tentatives. Reessayez dans une minute."},
-                status_code=429,
-            )
-    else:
-        if not _check_rate_limit(f"global:{client_ip}", _RATE_LIMIT_MAX):
-            return JSONResponse(
-                {"detail": "Trop de requetes. Reessayez dans une minute."},
-                status_code=429,
-            )
-
-    response = await call_next(request)
-    return response
+_AUTH_PATHS = frozenset(("/api/auth/login", "/api/auth/register", "/api/auth/verify-email", "/api/auth/resend-verification"))
 
+_rate_limit_seaux = None
+if _IS_OVH:
+    try:
+        from persistence import rate_limit_store as _rate_limit_seaux
+    except Exception as e:
+        logger.warning("Limiteur de debit partage indisponible, repli en memoire: %s", e)
+_rate_limiter = LimiteurDebit(
+    _rate_limit_seaux if _rate_limit_seaux is not None else SeauxMemoire(),
+    {"auth": (_RATE_LIMIT_AUTH_MAX, _RATE_LIMIT_WINDOW), "api": (_RATE_LIMIT_MAX, _RATE_LIMIT_WINDOW)},
+)
 
-# --- Middleware authentification (protege /api/* sauf whitelist) ---
+# Routes /api/* accessibles sans authentification
 _AUTH_WHITELIST = {"/api/auth/login", "/api/auth/register", "/api/auth/logout",
                    "/api/auth/verify-email", "/api/auth/resend-verification",
                    "/api/health", "/api/version", "/api/pricing",
                    "/api/collaboration/valider", "/api/collaboration/finaliser"}
 
 
-@app.middleware("http")
-async def auth_middleware(request: Request, call_next):
-    """Verifie l'authentification pour toutes les routes /api/* protegees."""
-    path = request.url.path
-    if path.startswith("/api/") and path not in _AUTH_WHITELIST:
-        token = request.cookies.get("nc_token")
-        if not token:
-            auth_header = request.headers.get("Authorization", "")
-            if auth_header.startswith("Bearer "):
-                token = auth_header[7:]
-        if not token:
-            return JSONResponse({"detail": "Non authentifie"}, status_code=401)
-        payload = jwt_decode(token)
-        if not payload:
-            return JSONResponse({"detail": "Session expiree"}, status_code=401)
-    response = await call_next(request)
-    return response
-
-
-# --- Middleware auto-persistance (OVHcloud) ---
-@app.middleware("http")
-async def auto_persist_middleware(request: Request, call_next):
+def _apres_ecriture(status_code: int):
     """Sauvegarde automatique apres toute requete POST/PUT/DELETE."""
-    response = await call_next(request)
-    if _persist and request.method in ("POST", "PUT", "DELETE") and response.status_code < 400:
+    _generation_donnees.incrementer()
+    if _persist and status_code < 400:
         try:
             _save_state()
         except Exception as e:
             logger.warning(f"Auto-persist failed: {e}")
-    return response
+
+
+app.add_middleware(
+    PipelineRequetes,
+    limiteur=_rate_limiter,
+    verifier_token=jwt_decode,
+    chemins_auth=_AUTH_PATHS,
+    liste_blanche=_AUTH_WHITELIST,
+    apres_ecriture=_apres_ecriture,
+    contexte=_current_request,
+)
 
 
 # --- Singletons ---
@@ -390,6 +324,46 @@ else:
     _entete_config: dict = {}
 
 
+# Version de l'etat en memoire : les ETag des routes ci-dessous en derivent,
+# un 304 est renvoye sans executer le handler tant qu'aucune ecriture n'a eu lieu.
+_generation_donnees = GenerationDonnees()
+# Version des donnees lues par l'audit (base de connaissances, bibliotheque,
+# registres RH qu'elle resume) : incrementee par leurs seuls mutateurs, elle
+# n'est pas invalidee par les autres ecritures (authentification, export...)
+_generation_kb = GenerationDonnees()
+_EMPREINTE_CODE = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+# Index des echeances RH, resynchronise sur la generation des donnees
+_moteur_alertes_rh = MoteurAlertesRH()
+# Planning indexe par jour et par (salarie, jour), tenu a jour par les endpoints
+# du planning ; absences (conges, arrets) resynchronisees sur la generation
+_planning_index = IndexPlanning(_rh_planning)
+_absences_index = IndexAbsences()
+# Identites des salaries (contrats, base de connaissances, planning) pour les doublons,
+# lues et synchronisees hors de la boucle d'evenements, sous verrou
+_identites = IndexIdentites()
+_verrou_identites = threading.Lock()
+_SOURCES_IDENTITES = ("contrat", "connaissances", "planning")
+
+
+def _empreinte_etat() -> str:
+    # Date incluse : echeances et annees de controle dependent du jour
+    return f"{_generation_donnees.empreinte()}|{date.today().isoformat()}"
+
+
+def _empreinte_kb() -> str:
+    return f"{_generation_kb.empreinte()}|{date.today().isoformat()}"
+
+
+_REPONSES_CONDITIONNELLES.update({
+    "/api/bibliotheque/knowledge": _empreinte_kb,
+    "/api/bibliotheque/knowledge/audit": _empreinte_kb,
+    "/api/documents/bibliotheque": _empreinte_etat,
+    "/api/rh/alertes": _empreinte_etat,
+    # Catalogue des aides : fonction pure des parametres, versionnee par le code
+    "/api/subventions/recherche": lambda: f"{_EMPREINTE_CODE}|{VERSION_CATALOGUE}",
+})
+
+
 def _save_state():
     """Persiste l'etat complet sur disque (OVHcloud uniquement)."""
     if not _persist:
@@ -435,7 +409,12 @@ def get_db() -> Database:
 def get_moteur() -> MoteurEcritures:
     global _moteur
     if _moteur is None:
-        _moteur = MoteurEcritures(PlanComptable())
+        # OVH : registre SQLite partage par tous les workers (sinon en memoire)
+        stockage = None
+        if _IS_OVH:
+            from urssaf_analyzer.comptabilite.stockage import StockageEcritures
+            stockage = StockageEcritures(_DATA_DIR / "db" / "ecritures.db")
+        _moteur = MoteurEcritures(PlanComptable(), stockage=stockage)
     return _moteur
 
 
@@ -494,6 +473,26 @@ async def health_check():
     return checks
 
 
+@app.get("/api/maintenance/purge")
+async def maintenance_purge_stats(request: Request):
+    """Statistiques de la derniere purge RGPD des uploads (super-admin)."""
+    user = get_current_user(request)
+    if user.get("role") != "admin" or user.get("tenant_id") != "default":
+        raise HTTPException(403, "Reserve a l'administrateur de la plateforme")
+    if _purge_scheduler is None:
+        return {"actif": False}
+    return {"actif": True, **_purge_scheduler.derniere_execution()}
+
+
+@app.get("/api/maintenance/rate-limit")
+async def maintenance_rate_limit_stats(request: Request):
+    """Compteurs du limiteur de debit : requetes acceptees / refusees par classe (super-admin)."""
+    user = get_current_user(request)
+    if user.get("role") != "admin" or user.get("tenant_id") != "default":
+        raise HTTPException(403, "Reserve a l'administrateur de la plateforme")
+    return {"partage": _rate_limit_seaux is not None, **_rate_limiter.statistiques()}
+
+
 @app.get("/api/pricing")
 async def get_pricing():
     """Retourne la grille tarifaire officielle (source unique de verite).
@@ -517,29 +516,56 @@ async def get_pricing():
 # PAGES
 # ==============================
 
+_STATIC = RessourcesStatiques(Path(__file__).parent / "static", {
+    "/": "landing.html",
+    "/app": "app.html",
+    "/legal/cgu": "legal_cgu.html",
+    "/legal/cgv": "legal_cgv.html",
+    "/legal/mentions": "legal_mentions.html",
+})
+
+
+def _servir_statique(request: Request, chemin: str) -> Response:
+    """Ressource precompressee (voir static_assets) ; 304 si l'ETag du client est a jour."""
+    servi = _STATIC.servir(
+        chemin,
+        request.headers.get("accept-encoding", ""),
+        request.headers.get("if-none-match", ""),
+    )
+    if servi is None:
+        raise HTTPException(404, "Ressource introuvable")
+    statut, entetes, corps = servi
+    return Response(corps, status_code=statut, headers=entetes)
+
+
 @app.get("/", response_class=HTMLResponse)
-async def accueil():
-    return LANDING_HTML
+async def accueil(request: Request):
+    return _servir_statique(request, "/")
 
 
 @app.get("/app", response_class=HTMLResponse)
-async def application():
-    return APP_HTML
+async def application(request: Request):
+    return _servir_statique(request, "/app")
 
 
 @app.get("/legal/cgu", response_class=HTMLResponse)
-async def legal_cgu():
-    return LEGAL_CGU
+async def legal_cgu(request: Request):
+    return _servir_statique(request, "/legal/cgu")
 
 
 @app.get("/legal/cgv", response_class=HTMLResponse)
-async def legal_cgv():
-    return LEGAL_CGV
+async def legal_cgv(request: Request):
+    return _servir_statique(request, "/legal/cgv")
 
 
 @app.get("/legal/mentions", response_class=HTMLResponse)
-async def legal_mentions():
-    return LEGAL_MENTIONS
+async def legal_mentions(request: Request):
+    return _servir_statique(request, "/legal/mentions")
+
+
+@app.get("/static/{nom}", include_in_schema=False)
+async def ressource_statique(nom: str, request: Request):
+    return _servir_statique(request, f"/static/{nom}")
 
 
 # ==============================
@@ -550,7 +576,7 @@ async def legal_mentions():
 async def auth_login(request: Request, email: str = Form(""), mot_de_passe: str = Form("")):
     if not email or not mot_de_passe:
         raise HTTPException(400, "Email et mot de passe requis")
-    user = authenticate(email, mot_de_passe)
+    user = await authenticate_async(email, mot_de_passe)
     if not user:
         raise HTTPException(401, "Email ou mot de passe incorrect")
     token = generate_token(user)
@@ -578,7 +604,7 @@ async def auth_register(
     if role not in VALID_ROLES:
         role = "collaborateur"
     try:
-        user = create_user(
+        user = await create_user_async(
             email, mot_de_passe, nom, prenom,
             role=role, offre=offre,
             entreprise=entreprise, telephone=telephone,
@@ -1328,6 +1354,7 @@ async def rgpd_suppression(request: Request):
         _biblio_knowledge.setdefault("_supprime_par_rgpd", []).append({
             "tenant_id": tenant_id, "email": email, "date": datetime.now().isoformat()
         })
+    _generation_kb.incrementer()
 
     # 5. Supprimer les fichiers uploades sur disque (OVHcloud)
     if _IS_OVH:
@@ -1422,6 +1449,7 @@ async def rgpd_info_traitement(request: Request):
 
 def _alimenter_knowledge(result):
     """Alimente la base de connaissances a partir d'un resultat d'analyse."""
+    _generation_kb.incrementer()
     kb = _biblio_knowledge
     kb["derniere_maj"] = datetime.now().isoformat()
 
@@ -1447,6 +1475,9 @@ def _alimenter_knowledge(result):
 
         # --- Periode ---
         if decl.periode and decl.periode.debut:
+            # Controles annuels de l'audit a recalculer pour cette annee
+            an = decl.periode.debut.year
+            _versions_annee_kb[an] = _versions_annee_kb.get(an, 0) + 1
             per = decl.periode.debut.strftime("%Y-%m")
             if per not in kb["periodes_couvertes"]:
                 kb["periodes_couvertes"].append(per)
@@ -1942,11 +1973,11 @@ async def analyser_documents(
                     dt = {}
             constats.append({
                 "id": f.id,
-                "categorie": f.categorie.value,
-                "severite": f.severite.value,
+                "categorie": f.categorie,
+                "severite": f.severite,
                 "titre": f.titre,
                 "description": f.description,
-                "montant_impact": float(f.montant_impact) if f.montant_impact else 0,
+                "montant_impact": f.montant_impact or 0,
                 "score_risque": f.score_risque,
                 "recommandation": f.recommandation,
                 "reference_legale": f.reference_legale,
@@ -2141,7 +2172,7 @@ async def analyser_documents(
                 "periode": periode_str,
                 "employeur": emp,
                 "salaries": salaries,
-                "masse_salariale_brute": float(decl.masse_salariale_brute),
+                "masse_salariale_brute": decl.masse_salariale_brute,
                 "effectif_declare": decl.effectif_declare,
                 "nature": nature,
                 "nb_cotisations": nb_cots,
@@ -2221,7 +2252,7 @@ async def analyser_documents(
         _integration_log = []
         try:
             moteur = get_moteur()
-            _existing_refs = {e.libelle for e in moteur.ecritures}
+            _existing_refs = moteur.stockage.libelles()
             nb_ecr_paie = 0
             nb_ecr_facture = 0
             for decl in result.declarations:
@@ -2520,6 +2551,8 @@ async def analyser_documents(
             _integration_log.append(f"RH: {nb_rh_new} fiche(s) deduite(s), {nb_rh_updated} mise(s) a jour, {len(_rh_alertes)} alerte(s)")
         except Exception as e:
             _integration_log.append(f"ERREUR RH GLOBALE: {e}\\n{traceback.format_exc()}")
+        # Bibliotheque et fiches RH alimentees apres la base : audit a recalculer
+        _generation_kb.incrementer()
 
         # Build file info with per-file parse status and document type
         # Use source_document_id mapping (not index) for reliability
@@ -2619,7 +2652,7 @@ async def analyser_documents(
                     finfo["type_document"] = nature_labels.get(doc_type, doc_type.replace("_", " ").title())
                 finfo["nb_employes"] = len(decl.employes)
                 finfo["nb_cotisations"] = len(decl.cotisations)
-                finfo["masse_salariale"] = float(decl.masse_salariale_brute)
+                finfo["masse_salariale"] = decl.masse_salariale_brute
             elif ext and ext not in SUPPORTED_EXTENSIONS:
                 finfo["statut"] = "format_non_supporte"
                 finfo["type_document"] = "Format non supporte"
@@ -2641,7 +2674,7 @@ async def analyser_documents(
                 "nb_anomalies": result.nb_anomalies,
                 "nb_incoherences": result.nb_incoherences,
                 "nb_critiques": result.nb_critiques,
-                "impact_financier_total": float(result.impact_total),
+                "impact_financier_total": result.impact_total,
                 "score_risque_global": result.score_risque_global,
                 "nb_fichiers": len(result.documents_analyses),
                 "nb_fichiers_non_reconnus": nb_non_reconnus,
@@ -2703,7 +2736,8 @@ async def analyser_documents(
         except Exception as e:
             logger.warning("Erreur scellement preuve: %s", e)
 
-        return response_data
+        # Retournee directement : Decimal, Enum, dates serialises sans jsonable_encoder
+        return ReponseJSON(response_data)
 
 
 # ==============================
@@ -2712,44 +2746,96 @@ async def analyser_documents(
 
 @app.post("/api/factures/analyser")
 async def analyser_facture(fichier: UploadFile = File(...)):
-    from urssaf_analyzer.ocr.invoice_detector import InvoiceDetector
-    from urssaf_analyzer.ocr.image_reader import ImageReader
+    from starlette.concurrency import run_in_threadpool
+    from urssaf_analyzer.ocr.lot_factures import analyser_facture as _analyser
 
-    config = AppConfig()
-    detector = InvoiceDetector()
+    data = await fichier.read()
+    raw_name = (fichier.filename or "").replace("\\", "/")
+    safe_name = Path(raw_name).name if raw_name else "upload"
+    if not safe_name or safe_name.startswith("."):
+        safe_name = "upload"
+    resultat = await run_in_threadpool(_analyser, data, safe_name)
+    log_action("utilisateur", "analyse_facture", fichier.filename)
+    return resultat
 
-    with tempfile.TemporaryDirectory() as td:
-        data = await fichier.read()
-        raw_name = (fichier.filename or "").replace("\\", "/")
-        safe_name = Path(raw_name).name if raw_name else "upload"
-        if not safe_name or safe_name.startswith("."):
-            safe_name = "upload"
-        chemin = Path(td) / safe_name
-        chemin.write_bytes(data)
-        ext = chemin.suffix.lower()
-
-        texte = ""
-        ecriture_manuscrite = False
-        if ext in (".jpg", ".jpeg", ".png", ".tiff", ".tif", ".bmp", ".gif", ".webp"):
-            reader = ImageReader(config)
-            ocr_result = reader.lire_image(chemin)
-            texte = ocr_result.get("texte", "")
-            ecriture_manuscrite = ocr_result.get("ecriture_manuscrite", False)
-        elif ext == ".pdf":
+
+@app.post("/api/factures/analyser/lot")
+async def analyser_factures_lot(
+    fichiers: list[UploadFile] = File(...),
+    comptabiliser: bool = Query(False, description="Enregistrer les ecritures des factures reconnues (une transaction)"),
+    entreprise_siret: str = Form("", description="SIRET de l'entreprise (sens achat/vente)"),
+):
+    """Analyse un lot de factures (fichiers multiples et/ou archives zip).
+
+    Lecture/OCR et analyse sont reparties sur un pool de processus ; la
+    reponse est un flux NDJSON, une ligne par document dans l'ordre
+    d'achevement (`index` = rang dans le lot), puis une ligne de bilan
+    `termine: true`. Avec `comptabiliser=true`, les ecritures des factures
+    et avoirs reconnus sont inserees en une seule transaction a la fin du
+    lot ; le bilan donne le nombre d'ecritures enregistrees.
+    """
+    from fastapi.responses import StreamingResponse
+    from urssaf_analyzer.ocr.lot_factures import (
+        MAX_DOCUMENTS_LOT, documents_depuis_zip, ecriture_depuis_analyse, iter_analyse_lot,
+    )
+
+    documents: list[tuple[str, bytes]] = []
+    total_size = 0
+    for f in fichiers:
+        data = await f.read()
+        if len(data) > _MAX_FILE_MB * 1024 * 1024:
+            raise HTTPException(400, f"Fichier '{f.filename}' depasse la limite de {_MAX_FILE_MB} Mo.")
+        total_size += len(data)
+        if total_size > _MAX_UPLOAD_MB * 1024 * 1024:
+            raise HTTPException(400, f"Taille totale depasse {_MAX_UPLOAD_MB} Mo.")
+        safe_name = Path((f.filename or "").replace("\\", "/")).name or "upload"
+        if safe_name.lower().endswith(".zip"):
             try:
-                reader = ImageReader(config)
-                ocr_result = reader.lire_pdf(chemin)
-                texte = ocr_result.get("texte", "")
-                ecriture_manuscrite = ocr_result.get("ecriture_manuscrite", False)
-            except Exception:
-                texte = chemin.read_text(errors="replace")
+                documents.extend(documents_depuis_zip(data))
+            except ValueError as e:
+                raise HTTPException(400, f"{safe_name} : {e}")
         else:
-            texte = chemin.read_text(errors="replace")
+            documents.append((safe_name, data))
+        if len(documents) > MAX_DOCUMENTS_LOT:
+            raise HTTPException(400, f"Maximum {MAX_DOCUMENTS_LOT} documents par lot.")
+    if not documents:
+        raise HTTPException(400, "Aucun document a analyser.")
+
+    moteur = get_moteur() if comptabiliser else None
+
+    def _flux():
+        debut = time.monotonic()
+        ecritures = {}
+        erreurs = 0
+        for resultat in iter_analyse_lot(documents, entreprise_siret=entreprise_siret):
+            if "erreur" in resultat:
+                erreurs += 1
+            elif moteur is not None:
+                try:
+                    ecriture = ecriture_depuis_analyse(moteur, resultat)
+                except Exception as e:
+                    resultat["erreur_comptabilisation"] = str(e)
+                else:
+                    if ecriture is not None:
+                        ecritures[resultat["index"]] = ecriture
+                        resultat["ecriture_id"] = ecriture.id
+            yield json.dumps(resultat) + "\n"
+        bilan = {"termine": True, "documents": len(documents), "erreurs": erreurs}
+        if moteur is not None:
+            try:
+                bilan["ecritures_enregistrees"] = moteur.stockage.ajouter_lot(
+                    ecritures[i] for i in sorted(ecritures)
+                )
+            except Exception as e:
+                bilan["ecritures_enregistrees"] = 0
+                bilan["erreur"] = f"Comptabilisation annulee : {e}"
+        bilan["duree_s"] = round(time.monotonic() - debut, 3)
+        log_action("utilisateur", "analyse_factures_lot",
+                   f"{len(documents)} documents, {erreurs} erreurs, "
+                   f"{bilan.get('ecritures_enregistrees', 0)} ecritures")
+        yield json.dumps(bilan) + "\n"
 
-        resultat = detector.detecter(texte, str(chemin))
-        resultat["ecriture_manuscrite"] = ecriture_manuscrite
-        log_action("utilisateur", "analyse_facture", fichier.filename)
-        return resultat
+    return StreamingResponse(_flux(), media_type="application/x-ndjson")
 
 
 @app.post("/api/factures/comptabiliser")
@@ -2841,36 +2927,135 @@ async def balance_comptable():
     return bal
 
 
+@app.post("/api/comptabilite/agregats/verifier")
+async def verifier_agregats_comptables(reparer: bool = Query(False)):
+    """Controle les soldes materialises contre un recalcul complet du registre."""
+    moteur = get_moteur()
+    ecarts = moteur.verifier_agregats(reparer=reparer)
+    if ecarts:
+        logger.warning("Agregats comptables incoherents: %d ecart(s)%s",
+                       len(ecarts), " - reconstruits" if reparer else "")
+    return {"coherent": not ecarts, "nb_ecarts": len(ecarts), "ecarts": ecarts[:100],
+            "reconstruit": bool(ecarts) and reparer}
+
+
 @app.get("/api/comptabilite/grand-livre-detail")
 async def grand_livre_detail(
     date_debut: Optional[str] = None,
     date_fin: Optional[str] = None,
+    compte_debut: Optional[str] = None,
+    compte_fin: Optional[str] = None,
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Mouvements par page"),
+    curseur: Optional[str] = Query(None, description="Curseur X-Curseur-Suivant de la page precedente"),
 ):
+    """Grand livre detaille, filtre par dates et plage de comptes.
+
+    Sans `limite`, la reponse JSON est produite au fil de la lecture du
+    registre (streaming) ; avec `limite`, une page est retournee et
+    l'en-tete X-Curseur-Suivant permet de demander la suivante.
+    """
+    from fastapi.responses import StreamingResponse
+
     moteur = get_moteur()
-    gl = moteur.get_grand_livre()
-    result = []
-    for compte, mouvements in gl.items():
+    filtres = dict(date_debut=date_debut, date_fin=date_fin,
+                   compte_debut=compte_debut, compte_fin=compte_fin)
+
+    def _mouvement(m):
+        return {
+            "date": m["date"],
+            "libelle": m["libelle"],
+            "debit": m["debit"],
+            "credit": m["credit"],
+            "sans_justificatif": "[SANS JUSTIFICATIF]" in m["libelle"],
+        }
+
+    def _libelle(compte):
         cpt = moteur.plan.get_compte(compte)
-        mvts = []
-        for m in mouvements:
-            if date_debut and m.get("date", "") < date_debut:
-                continue
-            if date_fin and m.get("date", "") > date_fin:
-                continue
-            mvts.append({
-                "date": m.get("date", ""),
-                "libelle": m.get("libelle", ""),
-                "debit": float(m.get("debit", 0)),
-                "credit": float(m.get("credit", 0)),
-                "sans_justificatif": "[SANS JUSTIFICATIF]" in m.get("libelle", ""),
-            })
-        if mvts:
-            result.append({
-                "compte": compte,
-                "libelle": cpt.libelle if cpt else compte,
-                "mouvements": mvts,
-            })
-    return result
+        return cpt.libelle if cpt else compte
+
+    if limite is not None:
+        try:
+            page, suivant = moteur.get_grand_livre_page(limite=limite, curseur=curseur, **filtres)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        result = [
+            {"compte": compte, "libelle": _libelle(compte), "mouvements": [_mouvement(m) for m in mvts]}
+            for compte, mvts in page.items()
+        ]
+        return JSONResponse(result, headers={"X-Curseur-Suivant": suivant} if suivant else None)
+
+    def _flux():
+        compte_courant = None
+        morceaux, taille = ["["], 1
+        for compte, m, _ in moteur.iter_grand_livre(**filtres):
+            if compte != compte_courant:
+                prefixe = "]}," if compte_courant is not None else ""
+                morceau = (prefixe + '{"compte":' + json.dumps(compte) + ',"libelle":'
+                           + json.dumps(_libelle(compte)) + ',"mouvements":[' + json.dumps(_mouvement(m)))
+                compte_courant = compte
+            else:
+                morceau = "," + json.dumps(_mouvement(m))
+            morceaux.append(morceau)
+            taille += len(morceau)
+            if taille >= 65536:
+                yield "".join(morceaux)
+                morceaux, taille = [], 0
+        morceaux.append("]}]" if compte_courant is not None else "]")
+        yield "".join(morceaux)
+
+    return StreamingResponse(_flux(), media_type="application/json")
+
+
+@app.post("/api/comptabilite/lettrage")
+async def lettrage_automatique(
+    comptes: Optional[str] = Query(None, description="Comptes a lettrer, separes par des virgules (defaut : 401*, 411*)"),
+    fenetre_jours: int = Query(90, ge=0, le=3660),
+    max_combinaison: int = Query(4, ge=1, le=4, description="Lignes soldees au plus par une ligne de sens oppose"),
+    progression: bool = Query(False, description="Diffuser la progression (NDJSON, une ligne par lot)"),
+):
+    """Lettrage automatique des comptes de tiers (reference, montant exact, combinaisons).
+
+    Les lettrages sont ecrits au fil du traitement ; avec `progression=true`,
+    chaque lot ecrit produit une ligne JSON, la derniere porte `termine: true`.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from fastapi.responses import StreamingResponse
+    from urssaf_analyzer.comptabilite.lettrage import iter_lettrage, lettrer
+
+    moteur = get_moteur()
+    options = dict(
+        comptes=[c.strip() for c in comptes.split(",") if c.strip()] if comptes else None,
+        fenetre_jours=fenetre_jours, max_combinaison=max_combinaison,
+    )
+
+    def _journaliser(resultat):
+        log_action("utilisateur", "lettrage_automatique",
+                   f"{resultat.groupes} lettrages, {resultat.lignes_lettrees} lignes")
+
+    if not progression:
+        resultat = await run_in_threadpool(lettrer, moteur, **options)
+        _journaliser(resultat)
+        return resultat.to_dict()
+
+    def _flux():
+        for resultat in iter_lettrage(moteur, **options):
+            if resultat.termine:
+                _journaliser(resultat)
+            yield json.dumps(resultat.to_dict()) + "\n"
+
+    return StreamingResponse(_flux(), media_type="application/x-ndjson")
+
+
+@app.delete("/api/comptabilite/lettrage")
+async def delettrage(
+    compte: str = Query(...),
+    codes: Optional[str] = Query(None, description="Codes a supprimer, separes par des virgules (defaut : tous)"),
+):
+    """Supprime les lettrages d'un compte (tous ou les codes indiques)."""
+    liste = [c.strip() for c in codes.split(",") if c.strip()] if codes else None
+    lignes = get_moteur().stockage.supprimer_lettrage(compte, liste)
+    log_action("utilisateur", "delettrage", f"{compte}: {lignes} lignes")
+    return {"compte": compte, "lignes_delettrees": lignes}
 
 
 @app.get("/api/comptabilite/compte-resultat")
@@ -2917,12 +3102,23 @@ async def bilan():
 
 
 @app.get("/api/comptabilite/declaration-tva")
-async def declaration_tva(mois: int = Query(1), annee: int = Query(2026)):
+async def declaration_tva(
+    mois: int = Query(1, ge=1, le=12), annee: int = Query(2026),
+    trimestre: Optional[int] = Query(None, ge=1, le=4, description="CA3 trimestrielle (remplace mois)"),
+):
     moteur = get_moteur()
     gen = GenerateurRapports(moteur)
+    if trimestre is not None:
+        return gen.declaration_tva_trimestrielle(trimestre=trimestre, annee=annee)
     return gen.declaration_tva(mois=mois, annee=annee)
 
 
+@app.get("/api/comptabilite/tva/annee")
+async def serie_tva_annuelle(annee: int = Query(2026)):
+    """TVA d'une annee : 12 mois, 4 trimestres et CA12, lus en une requete dans les soldes."""
+    return GenerateurRapports(get_moteur()).serie_tva(annee)
+
+
 @app.get("/api/comptabilite/charges-sociales-detail")
 async def charges_sociales_detail():
     moteur = get_moteur()
@@ -2949,9 +3145,20 @@ async def charges_sociales_detail():
     }
 
 
+_plan_reference: Optional[PlanComptable] = None
+
+
+def get_plan_reference() -> PlanComptable:
+    """PCG de reference partage (index de recherche construit une seule fois)."""
+    global _plan_reference
+    if _plan_reference is None:
+        _plan_reference = PlanComptable()
+    return _plan_reference
+
+
 @app.get("/api/comptabilite/plan-comptable")
 async def plan_comptable_api(terme: Optional[str] = None):
-    pc = PlanComptable()
+    pc = get_plan_reference()
     comptes = pc.rechercher(terme) if terme else list(pc.comptes.values())
     return [{"numero": c.numero, "libelle": c.libelle, "classe": c.classe} for c in comptes]
 
@@ -2983,7 +3190,7 @@ async def ecriture_manuelle(
             LigneEcriture(compte=compte_credit, libelle=libelle + sans_justif, debit=Decimal("0"), credit=mt),
         ],
     )
-    moteur.ecritures.append(ecriture)
+    moteur.ajouter_ecriture(ecriture)
     log_action("utilisateur", "ecriture_manuelle", f"{compte_debit}/{compte_credit} {mt}")
     return {
         "ecriture_id": ecriture.id,
@@ -2995,7 +3202,7 @@ async def ecriture_manuelle(
 @app.post("/api/comptabilite/valider")
 async def valider_ecritures():
     moteur = get_moteur()
-    nb_avant = sum(1 for e in moteur.ecritures if not e.validee)
+    nb_avant = moteur.nb_ecritures(validees=False)
     erreurs = moteur.valider_ecritures()
     nb_validees = nb_avant - len(erreurs)
     log_action("utilisateur", "validation_ecritures", f"{nb_validees} ecritures validees")
@@ -3010,12 +3217,7 @@ async def modifier_libelle_ecriture(ecriture_id: str, request: Request):
     nouveau_libelle = body.get("libelle", "").strip()
     lignes_libelles = body.get("lignes", {})  # {index: nouveau_libelle}
 
-    ecriture = None
-    for e in moteur.ecritures:
-        if e.id == ecriture_id:
-            ecriture = e
-            break
-
+    ecriture = moteur.get_ecriture(ecriture_id)
     if not ecriture:
         raise HTTPException(404, "Ecriture non trouvee")
 
@@ -3037,6 +3239,7 @@ async def modifier_libelle_ecriture(ecriture_id: str, request: Request):
                 ecriture.lignes[idx].libelle = lib
                 modifs.append(f"ligne {idx}: '{ancien_l}' -> '{lib}'")
 
+    moteur.mettre_a_jour_ecriture(ecriture)
     log_action("utilisateur", "modification_libelle", f"Ecriture {ecriture_id}: {', '.join(modifs)}")
     return {"ok": True, "modifications": modifs}
 
@@ -3045,16 +3248,14 @@ async def modifier_libelle_ecriture(ecriture_id: str, request: Request):
 async def supprimer_ecriture(ecriture_id: str):
     """Supprime une ecriture comptable non validee."""
     moteur = get_moteur()
-    idx = None
-    for i, e in enumerate(moteur.ecritures):
-        if e.id == ecriture_id:
-            if e.validee:
-                raise HTTPException(400, "Impossible de supprimer une ecriture validee")
-            idx = i
-            break
-    if idx is None:
+    ecriture = moteur.get_ecriture(ecriture_id)
+    if ecriture is None:
+        raise HTTPException(404, "Ecriture non trouvee")
+    if ecriture.validee:
+        raise HTTPException(400, "Impossible de supprimer une ecriture validee")
+    removed = moteur.supprimer_ecriture(ecriture_id)
+    if removed is None:
         raise HTTPException(404, "Ecriture non trouvee")
-    removed = moteur.ecritures.pop(idx)
     log_action("utilisateur", "suppression_ecriture", f"Ecriture {ecriture_id} supprimee: {removed.libelle}")
     return {"ok": True, "message": f"Ecriture {ecriture_id} supprimee"}
 
@@ -3065,11 +3266,7 @@ async def modifier_montants_ecriture(ecriture_id: str, request: Request):
     moteur = get_moteur()
     body = await _safe_json(request)
 
-    ecriture = None
-    for e in moteur.ecritures:
-        if e.id == ecriture_id:
-            ecriture = e
-            break
+    ecriture = moteur.get_ecriture(ecriture_id)
     if not ecriture:
         raise HTTPException(404, "Ecriture non trouvee")
     if ecriture.validee:
@@ -3089,6 +3286,7 @@ async def modifier_montants_ecriture(ecriture_id: str, request: Request):
                 ancien = float(ligne.credit)
                 ligne.credit = Decimal(str(vals["credit"]))
                 modifs.append(f"ligne {idx} credit: {ancien} -> {vals['credit']}")
+    moteur.mettre_a_jour_ecriture(ecriture)
     log_action("utilisateur", "modification_montants", f"Ecriture {ecriture_id}: {', '.join(modifs)}")
     return {"ok": True, "modifications": modifs}
 
@@ -3097,9 +3295,7 @@ async def modifier_montants_ecriture(ecriture_id: str, request: Request):
 async def reset_ecritures():
     """Reinitialise toutes les ecritures comptables non validees."""
     moteur = get_moteur()
-    nb_avant = len(moteur.ecritures)
-    moteur.ecritures = [e for e in moteur.ecritures if e.validee]
-    nb_supprimees = nb_avant - len(moteur.ecritures)
+    nb_supprimees = moteur.supprimer_non_validees()
     log_action("utilisateur", "reset_ecritures", f"{nb_supprimees} ecritures supprimees")
     return {"ok": True, "nb_supprimees": nb_supprimees}
 
@@ -5188,1402 +5384,192 @@ async def rechercher_subventions(
     ess: bool = Query(False),
 ):
     """Recherche exhaustive de subventions et aides eligibles."""
+    profil = ProfilEntreprise(
+        code_naf=code_naf, effectif=effectif, forme_juridique=forme_juridique,
+        region=region, zone=zone, ca=ca, age_entreprise=age_entreprise,
+        masse_salariale=masse_salariale, innovation=innovation,
+        environnement=environnement, numerique=numerique, export_intl=export_intl,
+        formation=formation, creation_reprise=creation_reprise,
+        investissement=investissement, ess=ess,
+    )
+    return ReponseJSON(rechercher_aides(profil))
 
-    lettre_naf = code_naf[0].upper() if code_naf else ""
-    is_tpe = effectif < 10
-    is_pme = effectif < 250
-    is_eti = 250 <= effectif < 5000
-    is_startup = age_entreprise <= 3
-    is_jeune = age_entreprise <= 8
-
-    # ============================================================
-    # BASE DE DONNEES EXHAUSTIVE DES SUBVENTIONS FRANCAISES
-    # ============================================================
-    toutes_aides = []
-
-    # ------ AIDES NATIONALES - INNOVATION / R&D ------
-    toutes_aides.append({
-        "id": "cir", "nom": "Credit d Impot Recherche (CIR)",
-        "organisme": "MESRI / DGFIP", "niveau": "national", "categorie": "innovation",
-        "type_aide": "credit_impot",
-        "description": "Credit d impot de 30% sur les depenses de R&D (jusqu a 100 MEUR), 5% au-dela. Inclut salaires chercheurs, amortissements, brevets, sous-traitance publique.",
-        "montant_max": "30% des depenses R&D",
-        "montant_estime": round(masse_salariale * 0.10 * 0.30, 2) if masse_salariale and innovation else None,
-        "conditions": ["Activites de R&D au sens du Manuel de Frascati", "Depenses eligibles documentees", "Declaration annuelle 2069-A"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": innovation or lettre_naf in ("C", "J", "M"),
-        "url_info": "https://www.enseignementsup-recherche.gouv.fr/fr/le-credit-d-impot-recherche-cir-49416",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "cii", "nom": "Credit d Impot Innovation (CII)",
-        "organisme": "MESRI / DGFIP", "niveau": "national", "categorie": "innovation",
-        "type_aide": "credit_impot",
-        "description": "Credit d impot de 30% sur les depenses d innovation (prototypes, installations pilotes) pour les PME. Plafond 400 000 EUR de depenses.",
-        "montant_max": "120 000 EUR (30% de 400 000 EUR)",
-        "montant_estime": min(120000, round(masse_salariale * 0.10 * 0.30, 2)) if masse_salariale and innovation else None,
-        "conditions": ["PME au sens communautaire (< 250 sal, CA < 50 MEUR)", "Depenses de conception de prototypes ou installations pilotes de nouveaux produits"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": is_pme and (innovation or lettre_naf in ("C", "J", "M")),
-        "url_info": "https://www.enseignementsup-recherche.gouv.fr/fr/le-credit-d-impot-innovation-cii-49418",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "jei", "nom": "Jeune Entreprise Innovante (JEI)",
-        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "innovation",
-        "type_aide": "exoneration",
-        "description": "Exoneration de cotisations patronales sur les salaires des personnels de R&D (chercheurs, techniciens, gestionnaires de projets). Exoneration d IS partielle. Entreprise de moins de 8 ans, depenses R&D >= 15% des charges.",
-        "montant_max": "Exoneration totale cotisations patronales R&D + IS partiel",
-        "montant_estime": round(masse_salariale * 0.10 * 0.25, 2) if masse_salariale and innovation else None,
-        "conditions": ["Moins de 8 ans d existence", "Depenses R&D >= 15% des charges deductibles", "PME independante", "Activite reellement nouvelle"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": is_jeune and is_pme and innovation,
-        "url_info": "https://www.economie.gouv.fr/entreprises/jeune-entreprise-innovante-JEI",
-        "priorite": 1,
-    })
 
-    toutes_aides.append({
-        "id": "jeic", "nom": "Jeune Entreprise Innovante de Croissance (JEIC)",
-        "organisme": "DGFIP", "niveau": "national", "categorie": "innovation",
-        "type_aide": "exoneration",
-        "description": "Statut renforce depuis 2024 pour les JEI en phase de croissance. Exoneration IS totale la 1ere annee beneficiaire, 50% la 2e. Exoneration cotisations patronales renforcee.",
-        "montant_max": "Exoneration IS + cotisations patronales",
-        "montant_estime": None,
-        "conditions": ["Conditions JEI remplies", "Croissance CA > 10%/an", "Depenses R&D >= 20% des charges"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": is_jeune and is_pme and innovation,
-        "url_info": "https://www.economie.gouv.fr/entreprises/jeune-entreprise-innovante-JEI",
-        "priorite": 2,
-    })
+_MAX_ENTREPRISES_LOT = 1000
 
-    toutes_aides.append({
-        "id": "bpi-aide-innovation", "nom": "Aide a l innovation (Bpifrance)",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "innovation",
-        "type_aide": "subvention",
-        "description": "Subvention ou avance remboursable pour les projets d innovation (faisabilite, developpement, industrialisation). Taux d aide jusqu a 45% pour les PME.",
-        "montant_max": "Jusqu a 3 000 000 EUR",
-        "montant_estime": None,
-        "conditions": ["Projet innovant (produit, procede, service)", "Plan de financement solide", "Potentiel de marche demontre"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": [],
-        "eligible": innovation and (is_pme or is_eti),
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation",
-        "priorite": 1,
-    })
 
-    toutes_aides.append({
-        "id": "bpi-bourse-french-tech", "nom": "Bourse French Tech",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "innovation",
-        "type_aide": "subvention",
-        "description": "Subvention pour les startups innovantes en phase d amorcage. Finance la maturation du projet et la validation du modele economique.",
-        "montant_max": "30 000 EUR",
-        "montant_estime": 30000 if is_tpe and age_entreprise <= 1 and innovation else None,
-        "conditions": ["Entreprise innovante de moins de 1 an", "Projet technologique ou de rupture", "Entrepreneur a temps plein"],
-        "tailles": ["tpe"],
-        "secteurs": [],
-        "eligible": is_tpe and age_entreprise <= 1 and innovation,
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation/bourse-french-tech",
-        "priorite": 1,
-    })
+@app.post("/api/subventions/recherche/lot")
+async def rechercher_subventions_lot(request: Request):
+    """Recherche de subventions pour un portefeuille d'entreprises en un appel.
 
-    toutes_aides.append({
-        "id": "france2030-i-demo", "nom": "France 2030 - i-Demo",
-        "organisme": "Bpifrance / SGPI", "niveau": "national", "categorie": "innovation",
-        "type_aide": "subvention",
-        "description": "Subvention + avance remboursable pour des projets de R&D collaboratifs ou individuels visant un developpement et une demonstration industriels. Budget total France 2030 : 54 Md EUR.",
-        "montant_max": "Jusqu a 10 000 000 EUR",
-        "montant_estime": None,
-        "conditions": ["Projet de R&D avec demonstration industrielle", "TRL 5-8", "Marche vise identifie"],
-        "tailles": ["pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": innovation and not is_tpe,
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation/aide-pour-le-developpement-de-linnovation",
-        "priorite": 2,
-    })
+    Corps : {"entreprises": [{"reference": ..., <parametres de
+    /api/subventions/recherche>}, ...], "detail": true}. Avec
+    `detail=false`, seuls les identifiants des aides sont retournes.
+    Les profils identiques ne sont evalues qu'une fois.
+    """
+    from starlette.concurrency import run_in_threadpool
 
-    toutes_aides.append({
-        "id": "cip", "nom": "Credit d Impot Brevets (CIB / IP Box)",
-        "organisme": "DGFIP", "niveau": "national", "categorie": "innovation",
-        "type_aide": "credit_impot",
-        "description": "Taux reduit d IS a 10% sur les revenus de cession ou concession de brevets, logiciels proteges, certificats d obtention vegetale et procedes de fabrication.",
-        "montant_max": "IS a 10% au lieu de 25% sur revenus PI",
-        "montant_estime": None,
-        "conditions": ["Titulaire de brevets ou licences", "Revenus de PI identifiables", "R&D realisee en France"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": innovation,
-        "url_info": "https://www.economie.gouv.fr/entreprises/impot-societes-taux-reduit-brevets",
-        "priorite": 2,
-    })
+    body = await _safe_json(request)
+    entreprises = body.get("entreprises") if isinstance(body, dict) else None
+    if not isinstance(entreprises, list) or not entreprises:
+        raise HTTPException(400, "Liste 'entreprises' requise")
+    if len(entreprises) > _MAX_ENTREPRISES_LOT:
+        raise HTTPException(400, f"Maximum {_MAX_ENTREPRISES_LOT} entreprises par lot")
+    detail = body.get("detail", True) is not False
+
+    profils = []
+    for i, entreprise in enumerate(entreprises):
+        if not isinstance(entreprise, dict):
+            raise HTTPException(400, f"Entreprise {i} : objet attendu")
+        try:
+            profils.append((entreprise.get("reference", i), ProfilEntreprise.depuis_dict(entreprise)))
+        except ValueError as e:
+            raise HTTPException(400, f"Entreprise {i} : {e}")
 
-    # ------ AIDES NATIONALES - EMPLOI / FORMATION ------
-    toutes_aides.append({
-        "id": "acre", "nom": "ACRE (Aide aux Createurs et Repreneurs d Entreprise)",
-        "organisme": "URSSAF", "niveau": "national", "categorie": "emploi",
-        "type_aide": "exoneration",
-        "description": "Exoneration partielle de cotisations sociales pendant la 1ere annee d activite. 50% d exoneration des cotisations maladie, maternite, invalidite, deces, vieillesse, allocations familiales.",
-        "montant_max": "50% des cotisations pendant 12 mois",
-        "montant_estime": round(masse_salariale * 0.45 * 0.50, 2) if masse_salariale and (creation_reprise or is_startup) else None,
-        "conditions": ["Creation ou reprise d entreprise", "Ne pas avoir beneficie de l ACRE dans les 3 ans precedents", "Avoir le controle effectif de l entreprise"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": creation_reprise or is_startup,
-        "url_info": "https://www.urssaf.fr/accueil/employeur/beneficier-dune-exoneration/exonerations-generales/acre.html",
-        "priorite": 1,
+    def _evaluer():
+        par_profil = {}
+        resultats = []
+        for reference, profil in profils:
+            resultat = par_profil.get(profil)
+            if resultat is None:
+                resultat = par_profil[profil] = rechercher_aides(profil)
+                if not detail:
+                    resultat["ids_aides"] = [a["id"] for a in resultat.pop("aides")]
+            resultats.append({"reference": reference, **resultat})
+        return resultats, len(par_profil)
+
+    resultats, nb_profils = await run_in_threadpool(_evaluer)
+    return ReponseJSON({
+        "total_entreprises": len(resultats),
+        "profils_distincts": nb_profils,
+        "montant_potentiel_max_realiste_total": round(
+            sum(r["montant_potentiel_max_realiste"] for r in resultats), 2),
+        "resultats": resultats,
     })
 
-    toutes_aides.append({
-        "id": "aide-apprentissage", "nom": "Aide a l embauche d un apprenti",
-        "organisme": "ASP / Ministere du Travail", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Aide de 6 000 EUR pour l embauche d un apprenti. Applicable pour les contrats d apprentissage visant un diplome jusqu au master (bac+5).",
-        "montant_max": "6 000 EUR par apprenti",
-        "montant_estime": 6000 * max(1, round(effectif * 0.1)) if formation else None,
-        "conditions": ["Contrat d apprentissage", "Apprenti preparant un diplome jusqu au bac+5", "Entreprise de toute taille"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": formation,
-        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F23556",
-        "priorite": 1,
-    })
 
-    toutes_aides.append({
-        "id": "contrat-pro", "nom": "Aide au contrat de professionnalisation",
-        "organisme": "ASP", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Aide financiere pour l embauche en contrat de professionnalisation de demandeurs d emploi de 26 ans et plus ou de jeunes de moins de 30 ans.",
-        "montant_max": "2 000 EUR",
-        "montant_estime": 2000 if formation else None,
-        "conditions": ["Contrat de professionnalisation", "Salarie de 26 ans et plus ou demandeur d emploi"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": formation,
-        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F35391",
-        "priorite": 2,
-    })
+# ==============================
+# IDCC / CONVENTIONS COLLECTIVES
+# ==============================
 
-    toutes_aides.append({
-        "id": "reduction-generale", "nom": "Reduction generale des cotisations (ex-Fillon)",
-        "organisme": "URSSAF", "niveau": "national", "categorie": "social",
-        "type_aide": "exoneration",
-        "description": "Reduction degressive des cotisations patronales pour les salaires inferieurs a 1.6 SMIC. Applicable automatiquement. Reduction maximale au SMIC, nulle a 1.6 SMIC.",
-        "montant_max": "Jusqu a 32% du brut au niveau du SMIC",
-        "montant_estime": round(effectif * 150 * 12, 2) if effectif and masse_salariale else None,
-        "conditions": ["Salaries dont la remuneration < 1.6 SMIC brut", "Applicable a toutes les entreprises", "Calcul annualise obligatoire"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": True,
-        "url_info": "https://www.urssaf.fr/accueil/employeur/beneficier-dune-exoneration/exonerations-generales/la-reduction-generale.html",
-        "priorite": 1,
-    })
+@app.get("/api/idcc/recherche")
+async def idcc_recherche(terme: str = Query("")):
+    from urssaf_analyzer.config.idcc_database import rechercher_idcc
+    return {"terme": terme, "resultats": rechercher_idcc(terme)}
 
-    toutes_aides.append({
-        "id": "aide-emploi-franc", "nom": "Emplois francs",
-        "organisme": "France Travail", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Aide a l embauche pour le recrutement de residents de QPV (Quartiers Prioritaires de la Ville). CDI : 5 000 EUR/an sur 3 ans. CDD >= 6 mois : 2 500 EUR/an sur 2 ans.",
-        "montant_max": "15 000 EUR (CDI sur 3 ans)",
-        "montant_estime": 15000 if zone == "qpv" else None,
-        "conditions": ["Resident d un QPV", "CDI ou CDD >= 6 mois", "Inscrit comme demandeur d emploi"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": zone == "qpv",
-        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F34917",
-        "priorite": 2,
-    })
 
-    toutes_aides.append({
-        "id": "fne-formation", "nom": "FNE-Formation",
-        "organisme": "DREETS / ASP", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Prise en charge des couts pedagogiques pour la formation des salaries. Cible les transitions ecologiques, alimentaires, numeriques. Taux de prise en charge : 40 a 100% selon taille.",
-        "montant_max": "100% des couts pedagogiques (TPE/PME)",
-        "montant_estime": round(effectif * 1500, 2) if effectif and formation else None,
-        "conditions": ["Salaries en activite", "Formation liee aux transitions (ecologique, numerique, alimentaire)", "Pas de formation obligatoire"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": formation or environnement or numerique,
-        "url_info": "https://travail-emploi.gouv.fr/emploi-et-insertion/accompagnement-des-mutations-economiques/appui-aux-mutations-economiques/fne-formation",
-        "priorite": 1,
-    })
+@app.get("/api/idcc/{idcc}")
+async def idcc_detail(idcc: str):
+    from urssaf_analyzer.config.idcc_database import get_ccn_par_idcc, get_prevoyance_par_idcc
+    ccn = get_ccn_par_idcc(idcc)
+    if not ccn:
+        raise HTTPException(404, f"IDCC {idcc} non trouve dans la base")
+    prev_cadre = get_prevoyance_par_idcc(idcc, est_cadre=True)
+    prev_nc = get_prevoyance_par_idcc(idcc, est_cadre=False)
+    return {"idcc": idcc, "ccn": ccn, "prevoyance_cadre": prev_cadre, "prevoyance_non_cadre": prev_nc}
 
-    toutes_aides.append({
-        "id": "aide-th", "nom": "Aide a l emploi de travailleurs handicapes (AGEFIPH)",
-        "organisme": "AGEFIPH", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Aides financieres pour l integration ou le maintien dans l emploi de personnes en situation de handicap : amenagement de poste, tutorat, formation.",
-        "montant_max": "Jusqu a 5 000 EUR (amenagement) + 3 000 EUR (accueil)",
-        "montant_estime": None,
-        "conditions": ["Recrutement ou maintien d un travailleur handicape (RQTH)", "Entreprise du secteur prive"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": effectif >= 20,
-        "url_info": "https://www.agefiph.fr/aides-handicap",
-        "priorite": 2,
-    })
 
-    toutes_aides.append({
-        "id": "opco-formation", "nom": "Financement OPCO (plan de developpement des competences)",
-        "organisme": "OPCO (11 operateurs)", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Prise en charge des actions de formation pour les entreprises de moins de 50 salaries par l OPCO de branche. Frais pedagogiques + remuneration + frais annexes.",
-        "montant_max": "Variable selon OPCO et branche",
-        "montant_estime": None,
-        "conditions": ["Entreprise < 50 salaries", "Formation dans le plan de developpement des competences", "OPCO de branche identifie"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": effectif < 50,
-        "url_info": "https://travail-emploi.gouv.fr/ministere/acteurs/partenaires/opco",
-        "priorite": 1,
-    })
+# ==============================
+# TAUX AT/MP
+# ==============================
 
-    # ------ AIDES NATIONALES - ENVIRONNEMENT / TRANSITION ECOLOGIQUE ------
-    toutes_aides.append({
-        "id": "ademe-tremplin", "nom": "ADEME Tremplin pour la transition ecologique",
-        "organisme": "ADEME", "niveau": "national", "categorie": "environnement",
-        "type_aide": "subvention",
-        "description": "Aide forfaitaire simplifiee pour les PME : diagnostic environnemental, eco-conception, mobilite durable, economie circulaire, decarbonation.",
-        "montant_max": "Jusqu a 200 000 EUR",
-        "montant_estime": None,
-        "conditions": ["PME (< 250 salaries)", "Projet de transition ecologique identifie", "Devis ou cahier des charges"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": is_pme and environnement,
-        "url_info": "https://agirpourlatransition.ademe.fr/entreprises/aides-financieres/2024/tremplin-transition-ecologique-pme",
-        "priorite": 1,
-    })
+@app.get("/api/atmp/taux")
+async def atmp_taux(
+    code_naf: str = Query(None),
+    naf: str = Query(None),
+    effectif: int = Query(10),
+):
+    from urssaf_analyzer.config.taux_atmp import get_taux_atmp
+    # Accept both 'code_naf' and 'naf' as parameter names for the NAF code
+    effective_naf = code_naf or naf or "62.02"
+    return get_taux_atmp(effective_naf, effectif)
 
-    toutes_aides.append({
-        "id": "ademe-decarb-industrie", "nom": "ADEME Decarbonation de l industrie",
-        "organisme": "ADEME / France 2030", "niveau": "national", "categorie": "environnement",
-        "type_aide": "subvention",
-        "description": "Aide a l investissement pour la decarbonation des sites industriels : efficacite energetique, electrification, chaleur bas-carbone, captage CO2.",
-        "montant_max": "Jusqu a 50 MEUR",
-        "montant_estime": None,
-        "conditions": ["Site industriel emetteur de GES", "Projet de reduction des emissions > 1 000 tCO2/an", "Etude prealable realisee"],
-        "tailles": ["pme", "eti", "ge"],
-        "secteurs": ["C"],
-        "eligible": environnement and lettre_naf == "C",
-        "url_info": "https://agirpourlatransition.ademe.fr/entreprises/aides-financieres/2024/aide-a-decarbonation-industrie",
-        "priorite": 2,
-    })
 
-    toutes_aides.append({
-        "id": "ci-transition-energetique", "nom": "Credit d impot investissements industrie verte (C3IV)",
-        "organisme": "DGFIP", "niveau": "national", "categorie": "environnement",
-        "type_aide": "credit_impot",
-        "description": "Credit d impot de 20 a 60% pour les investissements dans la production de batteries, panneaux solaires, eolien, pompes a chaleur. PME : 60%, ETI : 40%, GE : 20%.",
-        "montant_max": "150 MEUR par entreprise",
-        "montant_estime": None,
-        "conditions": ["Production d equipements pour les energies renouvelables", "Investissement en France", "Agrement prealable"],
-        "tailles": ["pme", "eti", "ge"],
-        "secteurs": ["C"],
-        "eligible": environnement and lettre_naf in ("C", "D"),
-        "url_info": "https://www.economie.gouv.fr/france-nation-verte/credit-impot-investissements-industrie-verte",
-        "priorite": 2,
-    })
+# ==============================
+# REGIMES SPECIAUX
+# ==============================
 
-    toutes_aides.append({
-        "id": "pret-vert", "nom": "Pret Vert (Bpifrance)",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "environnement",
-        "type_aide": "pret",
-        "description": "Pret participatif sans garantie pour financer les investissements lies a la transition ecologique et energetique des PME et ETI.",
-        "montant_max": "3 000 000 EUR",
-        "montant_estime": None,
-        "conditions": ["PME ou ETI", "Projet de transition ecologique identifie", "Cofinancement bancaire"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": [],
-        "eligible": environnement and (is_pme or is_eti),
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/transition-ecologique-et-energetique/pret-vert",
-        "priorite": 2,
-    })
+@app.get("/api/regimes")
+async def regimes_liste():
+    from urssaf_analyzer.rules.regimes_speciaux import lister_regimes
+    return {"regimes": lister_regimes()}
 
-    toutes_aides.append({
-        "id": "diag-eco-flux", "nom": "Diagnostic Eco-Flux (Bpifrance / ADEME)",
-        "organisme": "Bpifrance / ADEME", "niveau": "national", "categorie": "environnement",
-        "type_aide": "accompagnement",
-        "description": "Diagnostic gratuit de 10 jours pour identifier les economies d energie, eau, matieres premieres et dechets. En moyenne 45 000 EUR d economies identifiees.",
-        "montant_max": "Diagnostic finance a 100%",
-        "montant_estime": None,
-        "conditions": ["PME de 20 a 250 salaries", "Secteur industriel, agro, tertiaire"],
-        "tailles": ["pme"],
-        "secteurs": [],
-        "eligible": environnement and 20 <= effectif < 250,
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/transition-ecologique-et-energetique/diag-eco-flux",
-        "priorite": 1,
-    })
 
-    toutes_aides.append({
-        "id": "cee", "nom": "Certificats d Economie d Energie (CEE)",
-        "organisme": "Ministere Transition Ecologique", "niveau": "national", "categorie": "environnement",
-        "type_aide": "subvention",
-        "description": "Primes versees par les fournisseurs d energie pour financer des travaux d efficacite energetique : isolation, chauffage, eclairage, process industriels.",
-        "montant_max": "Variable selon travaux (jusqu a 80% du cout)",
-        "montant_estime": None,
-        "conditions": ["Travaux d efficacite energetique", "Professionnels RGE pour les travaux", "Fiches standardisees CEE"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": environnement or investissement,
-        "url_info": "https://www.ecologie.gouv.fr/certificats-deconomies-denergie",
-        "priorite": 2,
-    })
+@app.get("/api/regimes/{code}")
+async def regime_detail(code: str):
+    from urssaf_analyzer.rules.regimes_speciaux import get_regime
+    regime = get_regime(code)
+    if not regime:
+        raise HTTPException(404, f"Regime {code} non trouve")
+    return regime
 
-    # ------ AIDES NATIONALES - NUMERIQUE ------
-    toutes_aides.append({
-        "id": "france-num", "nom": "France Num - Aides a la numerisation",
-        "organisme": "France Num / DGE", "niveau": "national", "categorie": "numerique",
-        "type_aide": "accompagnement",
-        "description": "Accompagnement et financement de la transformation numerique des TPE/PME : site web, logiciel de gestion, cybersecurite, IA. Cheque numerique et diagnostics.",
-        "montant_max": "Variable (diagnostics gratuits + aides financieres)",
-        "montant_estime": None,
-        "conditions": ["TPE ou PME", "Projet de numerisation identifie"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": numerique and is_pme,
-        "url_info": "https://www.francenum.gouv.fr/aides-financieres",
-        "priorite": 1,
-    })
 
-    toutes_aides.append({
-        "id": "diag-cyber", "nom": "Diagnostic Cybersecurite (Bpifrance)",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "numerique",
-        "type_aide": "accompagnement",
-        "description": "Diagnostic subventionne de cybersecurite pour les PME et ETI. Cartographie des risques, plan d actions, sensibilisation des equipes.",
-        "montant_max": "Prise en charge 50% (reste a charge ~4 000 EUR)",
-        "montant_estime": None,
-        "conditions": ["PME ou ETI", "Volonte de structurer sa cybersecurite"],
-        "tailles": ["pme", "eti"],
-        "secteurs": [],
-        "eligible": numerique and (is_pme or is_eti),
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/transition-numerique/diagnostic-cybersecurite",
-        "priorite": 2,
-    })
+@app.get("/api/regimes/detecter")
+async def regime_detecter(
+    code_naf: str = Query(""), departement: str = Query(""),
+    idcc: str = Query(""), texte: str = Query(""),
+):
+    from urssaf_analyzer.rules.regimes_speciaux import detecter_regime
+    codes = detecter_regime(code_naf, departement, idcc, texte)
+    return {"regimes_detectes": codes, "regime_general": True, "note": "Le regime general s applique toujours sauf substitution complete"}
 
-    toutes_aides.append({
-        "id": "ci-ia", "nom": "Aides France 2030 - Intelligence Artificielle",
-        "organisme": "Bpifrance / SGPI", "niveau": "national", "categorie": "numerique",
-        "type_aide": "subvention",
-        "description": "Financements pour les projets integrant l IA : R&D, deploiement, cas d usage sectoriels. Appels a projets reguliers dans le cadre de la strategie nationale IA.",
-        "montant_max": "Jusqu a 5 000 000 EUR",
-        "montant_estime": None,
-        "conditions": ["Projet integrant l IA", "Dimension innovante demontree", "Equipe technique identifiee"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": ["J", "M", "C"],
-        "eligible": numerique and innovation and lettre_naf in ("J", "M", "C"),
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation",
-        "priorite": 2,
-    })
 
-    # ------ AIDES NATIONALES - EXPORT / INTERNATIONAL ------
-    toutes_aides.append({
-        "id": "assurance-prospection", "nom": "Assurance Prospection (Bpifrance Assurance Export)",
-        "organisme": "Bpifrance Assurance Export", "niveau": "national", "categorie": "export",
-        "type_aide": "garantie",
-        "description": "Garantie couvrant les depenses de prospection a l international en cas d echec commercial. Couverture de 65% a 85% des frais engages.",
-        "montant_max": "Jusqu a 500 000 EUR de budget garanti",
-        "montant_estime": None,
-        "conditions": ["CA export < 50% du CA total", "Budget de prospection defini", "Marches cibles identifies"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": [],
-        "eligible": export_intl,
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/international/assurance-prospection",
-        "priorite": 1,
-    })
+@app.get("/api/regimes/msa/cotisations")
+async def regime_msa_cotisations(brut_mensuel: float = Query(2000), effectif: int = Query(5)):
+    from urssaf_analyzer.rules.regimes_speciaux import calculer_cotisations_msa
+    return calculer_cotisations_msa(Decimal(str(brut_mensuel)), effectif)
 
-    toutes_aides.append({
-        "id": "cheque-relance-export", "nom": "Cheque Relance VIE / Export",
-        "organisme": "Business France / Bpifrance", "niveau": "national", "categorie": "export",
-        "type_aide": "subvention",
-        "description": "Aide financiere pour l embauche d un VIE (Volontaire International en Entreprise) ou pour des missions de prospection. Subvention de 5 000 a 10 000 EUR.",
-        "montant_max": "10 000 EUR",
-        "montant_estime": 10000 if export_intl else None,
-        "conditions": ["PME ou ETI", "Embauche d un VIE ou mission export structuree"],
-        "tailles": ["pme", "eti"],
-        "secteurs": [],
-        "eligible": export_intl and (is_pme or is_eti),
-        "url_info": "https://www.businessfrance.fr/vie-volontariat-international-en-entreprise",
-        "priorite": 2,
-    })
 
-    toutes_aides.append({
-        "id": "pret-croissance-intl", "nom": "Pret Croissance International (Bpifrance)",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "export",
-        "type_aide": "pret",
-        "description": "Pret sans garantie pour financer le developpement international : implantation, recrutement export, adaptation produits, prospection.",
-        "montant_max": "5 000 000 EUR",
-        "montant_estime": None,
-        "conditions": ["PME ou ETI", "Projet de developpement international structure", "3 ans d existence minimum"],
-        "tailles": ["pme", "eti"],
-        "secteurs": [],
-        "eligible": export_intl and age_entreprise >= 3,
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/international/pret-croissance-international",
-        "priorite": 2,
-    })
+@app.get("/api/regimes/alsace-moselle/supplement")
+async def regime_alsace_supplement(brut_mensuel: float = Query(2500)):
+    from urssaf_analyzer.rules.regimes_speciaux import calculer_supplement_alsace_moselle
+    return calculer_supplement_alsace_moselle(Decimal(str(brut_mensuel)))
 
-    # ------ AIDES NATIONALES - CREATION / REPRISE ------
-    toutes_aides.append({
-        "id": "nacre", "nom": "NACRE (Nouvel Accompagnement pour la Creation/Reprise)",
-        "organisme": "Region / BGE / Reseau Entreprendre", "niveau": "national", "categorie": "creation",
-        "type_aide": "accompagnement",
-        "description": "Accompagnement gratuit en 3 phases : aide au montage du projet, structuration financiere, demarrage de l activite. Pret a taux zero de 1 000 a 10 000 EUR.",
-        "montant_max": "10 000 EUR (pret a taux zero) + accompagnement",
-        "montant_estime": 10000 if creation_reprise and is_tpe else None,
-        "conditions": ["Createur ou repreneur d entreprise", "Demandeur d emploi, jeune < 26 ans, beneficiaire RSA/ASS, ou zone urbaine sensible"],
-        "tailles": ["tpe"],
-        "secteurs": [],
-        "eligible": creation_reprise and is_tpe,
-        "url_info": "https://www.service-public.fr/particuliers/vosdroits/F20016",
-        "priorite": 1,
-    })
 
-    toutes_aides.append({
-        "id": "cape", "nom": "CAPE (Contrat d Appui au Projet d Entreprise)",
-        "organisme": "Couveuses / Cooperatives", "niveau": "national", "categorie": "creation",
-        "type_aide": "accompagnement",
-        "description": "Contrat permettant de tester son activite au sein d une structure (couveuse, CAE) tout en conservant son statut social. Duree max 12 mois renouvelable.",
-        "montant_max": "Accompagnement + couverture sociale",
-        "montant_estime": None,
-        "conditions": ["Porteur de projet en phase de test", "Avant immatriculation ou en debut d activite"],
-        "tailles": ["tpe"],
-        "secteurs": [],
-        "eligible": creation_reprise and age_entreprise <= 1,
-        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F11299",
-        "priorite": 3,
-    })
+# ==============================
+# TRAVAILLEURS DETACHES / ETRANGERS
+# ==============================
 
-    toutes_aides.append({
-        "id": "arce", "nom": "ARCE (Aide a la Reprise ou Creation d Entreprise)",
-        "organisme": "France Travail", "niveau": "national", "categorie": "creation",
-        "type_aide": "subvention",
-        "description": "Versement en capital de 60% des droits restants a l allocation chomage pour les createurs ou repreneurs d entreprise. Versee en 2 fois.",
-        "montant_max": "60% des droits ARE restants",
-        "montant_estime": None,
-        "conditions": ["Etre indemnise par France Travail ou avoir des droits ARE", "Avoir obtenu l ACRE", "Creer ou reprendre une entreprise"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": creation_reprise,
-        "url_info": "https://www.service-public.fr/particuliers/vosdroits/F11677",
-        "priorite": 1,
-    })
+@app.get("/api/detachement/reglementation")
+async def detachement_reglementation():
+    from urssaf_analyzer.rules.travailleurs_detaches import DETACHEMENT_UE
+    return DETACHEMENT_UE
 
-    # ------ AIDES NATIONALES - INVESTISSEMENT ------
-    toutes_aides.append({
-        "id": "suramortissement", "nom": "Suramortissement industriel (loi Macron)",
-        "organisme": "DGFIP", "niveau": "national", "categorie": "investissement",
-        "type_aide": "credit_impot",
-        "description": "Deduction exceptionnelle de 40% du prix de revient des biens d equipement industriel acquis entre 2019 et 2025 (prolonge). Robotique, impression 3D, logiciels de production.",
-        "montant_max": "40% du prix des equipements en deduction",
-        "montant_estime": None,
-        "conditions": ["Acquisition de biens industriels eligibles", "PME industrielle", "Investissement productif"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": ["C", "F"],
-        "eligible": investissement and lettre_naf in ("C", "F") and is_pme,
-        "url_info": "https://www.economie.gouv.fr/entreprises/suramortissement-investissement-productif",
-        "priorite": 2,
-    })
 
-    toutes_aides.append({
-        "id": "bpi-pret-atout", "nom": "Pret Atout (Bpifrance)",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "investissement",
-        "type_aide": "pret",
-        "description": "Pret sans garantie de 50 000 a 5 MEUR pour renforcer la tresorerie, financer la croissance, les investissements materiels et immateriels des PME et ETI.",
-        "montant_max": "5 000 000 EUR",
-        "montant_estime": None,
-        "conditions": ["PME ou ETI", "3 ans d existence minimum", "Situation financiere saine"],
-        "tailles": ["pme", "eti"],
-        "secteurs": [],
-        "eligible": investissement and age_entreprise >= 3,
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/financement/pret-atout",
-        "priorite": 2,
-    })
+@app.get("/api/detachement/verifier")
+async def detachement_verifier(
+    nationalite: str = Query(""),
+    pays_employeur: str = Query(""),
+    a1_present: bool = Query(False),
+    sipsi_declare: bool = Query(False),
+    duree_mois: int = Query(6),
+    remuneration_brute: float = Query(0),
+    secteur_btp: bool = Query(False),
+    carte_btp: bool = Query(False),
+):
+    from urssaf_analyzer.rules.travailleurs_detaches import verifier_conformite_detachement
+    return verifier_conformite_detachement(
+        nationalite=nationalite, pays_employeur=pays_employeur,
+        a1_present=a1_present, sipsi_declare=sipsi_declare,
+        duree_mois=duree_mois, remuneration_brute=Decimal(str(remuneration_brute)),
+        secteur_btp=secteur_btp, carte_btp=carte_btp,
+    )
 
-    toutes_aides.append({
-        "id": "garantie-bpi", "nom": "Garantie de pret Bpifrance",
-        "organisme": "Bpifrance", "niveau": "national", "categorie": "investissement",
-        "type_aide": "garantie",
-        "description": "Garantie de 40 a 70% des prets bancaires pour faciliter l acces au credit des TPE/PME. Creation, investissement, international, innovation.",
-        "montant_max": "70% du pret garanti",
-        "montant_estime": None,
-        "conditions": ["Pret bancaire en cours de negociation", "TPE ou PME", "Projet identifie (creation, investissement, croissance)"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": is_pme and (investissement or creation_reprise),
-        "url_info": "https://www.bpifrance.fr/catalogue-offres/financement/garantie-de-pret",
-        "priorite": 1,
-    })
 
-    # ------ AIDES NATIONALES - FISCAL / ZONES ------
-    toutes_aides.append({
-        "id": "zrr-exo", "nom": "Exoneration ZRR (Zone de Revitalisation Rurale)",
-        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "fiscal",
-        "type_aide": "exoneration",
-        "description": "Exoneration d IS/IR pendant 5 ans (totale) puis 3 ans (degressive) pour les entreprises nouvelles en ZRR. Exoneration de CFE et CVAE possible.",
-        "montant_max": "Exoneration totale IS 5 ans + degressive 3 ans",
-        "montant_estime": None,
-        "conditions": ["Implantation en ZRR (France Ruralites Revitalisation depuis 2024)", "Entreprise nouvelle ou reprise", "Activite commerciale, artisanale, industrielle ou liberale"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": zone == "zrr",
-        "url_info": "https://www.economie.gouv.fr/entreprises/zone-revitalisation-rurale-zrr",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "zfu-exo", "nom": "Exoneration ZFU-TE (Zone Franche Urbaine)",
-        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "fiscal",
-        "type_aide": "exoneration",
-        "description": "Exoneration d IS/IR pendant 5 ans (totale) + 3 ans (degressive). Exoneration cotisations patronales pendant 5 ans. Exoneration CFE et taxe fonciere.",
-        "montant_max": "Exoneration totale multi-impots 5 ans",
-        "montant_estime": None,
-        "conditions": ["Implantation en ZFU-TE", "Entreprise de moins de 50 salaries", "Clause d embauche locale (1/3 des salaries en ZFU/QPV)"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": zone == "zfu",
-        "url_info": "https://www.economie.gouv.fr/entreprises/zone-franche-urbaine-zfu",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "ber-exo", "nom": "Exoneration BER (Bassin d Emploi a Redynamiser)",
-        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "fiscal",
-        "type_aide": "exoneration",
-        "description": "Exoneration totale d IS, CFE, CVAE et cotisations patronales pendant 5 ans pour les entreprises nouvelles dans les bassins d emploi a redynamiser.",
-        "montant_max": "Exoneration totale 5 ans",
-        "montant_estime": None,
-        "conditions": ["Implantation dans un BER", "Entreprise nouvelle", "Bassin de la Vallee de la Meuse ou Lavelanet"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": [],
-        "eligible": zone == "ber",
-        "url_info": "https://www.economie.gouv.fr/entreprises/aides-entreprises-bassins-emploi-redynamiser",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "outre-mer-exo", "nom": "Exonerations Outre-mer (LODEOM)",
-        "organisme": "URSSAF / DGFIP", "niveau": "national", "categorie": "social",
-        "type_aide": "exoneration",
-        "description": "Exonerations renforcees de cotisations patronales pour les entreprises d Outre-mer. Baremes specifiques selon taille et secteur : competitivite, competitivite renforcee, innovation.",
-        "montant_max": "Exoneration jusqu a 2.2 SMIC (competitivite) ou 3.0 SMIC (innovation/croissance)",
-        "montant_estime": None,
-        "conditions": ["Siege social en DOM (Guadeloupe, Martinique, Guyane, Reunion, Mayotte)", "Effectif < 250 salaries (sauf secteurs prioritaires)"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": region == "outre-mer",
-        "url_info": "https://www.urssaf.fr/accueil/employeur/beneficier-dune-exoneration/exonerations-outre-mer.html",
-        "priorite": 1,
-    })
-
-    # ------ AIDES NATIONALES - ESS / IMPACT ------
-    toutes_aides.append({
-        "id": "dla", "nom": "DLA (Dispositif Local d Accompagnement)",
-        "organisme": "France Active / Etat", "niveau": "national", "categorie": "ess",
-        "type_aide": "accompagnement",
-        "description": "Accompagnement gratuit pour les structures ESS (associations, cooperatives, entreprises sociales) : diagnostic, plan d actions, appui strategique.",
-        "montant_max": "Accompagnement gratuit",
-        "montant_estime": None,
-        "conditions": ["Structure de l ESS (association, cooperative, entreprise sociale)", "Activite d interet general ou d utilite sociale"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": ess or forme_juridique == "Association",
-        "url_info": "https://www.info-dla.fr/",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "france-active-garantie", "nom": "Garantie France Active",
-        "organisme": "France Active", "niveau": "national", "categorie": "ess",
-        "type_aide": "garantie",
-        "description": "Garantie bancaire pour les entreprises de l ESS et les createurs en situation de precarite. Couvre jusqu a 80% du pret bancaire.",
-        "montant_max": "80% de garantie (plafond 100 000 EUR)",
-        "montant_estime": None,
-        "conditions": ["Entreprise ESS ou createur en difficulte d acces au credit", "Projet viable economiquement"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": ess or forme_juridique == "Association",
-        "url_info": "https://www.franceactive.org/",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "agrement-esus", "nom": "Agrement ESUS (Entreprise Solidaire d Utilite Sociale)",
-        "organisme": "Prefecture / DREETS", "niveau": "national", "categorie": "ess",
-        "type_aide": "accompagnement",
-        "description": "Agrement ouvrant droit a des financements specifiques (epargne salariale solidaire, BPI, fonds ESS) et a des avantages fiscaux pour les investisseurs (IR-PME 25%).",
-        "montant_max": "Acces a l epargne solidaire + avantages fiscaux investisseurs",
-        "montant_estime": None,
-        "conditions": ["Objectif d utilite sociale", "Politique de remuneration encadree (ecart max 1 a 7)", "Charge d utilite sociale > 66% du CA"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": [],
-        "eligible": ess,
-        "url_info": "https://www.economie.gouv.fr/entreprises/agrement-entreprise-solidaire-utilite-sociale-ess",
-        "priorite": 2,
-    })
-
-    # ------ AIDES NATIONALES - PREVENTION / SANTE AU TRAVAIL ------
-    toutes_aides.append({
-        "id": "subvention-prevention-tpe", "nom": "Subventions prevention TPE (CARSAT / CRAMIF)",
-        "organisme": "CARSAT / CRAMIF / CGSS", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Subventions pour les TPE (1-49 salaries) pour des investissements en prevention des risques professionnels : TMS Pro, Risque chimique, Equip Mobile, Filmeuse +.",
-        "montant_max": "25 000 EUR",
-        "montant_estime": None,
-        "conditions": ["TPE de 1 a 49 salaries", "Investissement en equipement de prevention", "DUERP a jour"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": effectif < 50,
-        "url_info": "https://www.ameli.fr/entreprise/sante-travail/aides-financieres",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "fact", "nom": "FACT (Fonds d Amelioration des Conditions de Travail)",
-        "organisme": "ANACT", "niveau": "national", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Financement de projets d amelioration des conditions de travail : organisation du travail, prevenir les TMS, transitions numeriques et ecologiques au travail.",
-        "montant_max": "50 000 EUR",
-        "montant_estime": None,
-        "conditions": ["Entreprise de toute taille", "Projet d amelioration des conditions de travail structure", "Implication des representants du personnel"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": [],
-        "eligible": effectif >= 1,
-        "url_info": "https://www.anact.fr/le-fonds-pour-lamelioration-des-conditions-de-travail-fact",
-        "priorite": 3,
-    })
-
-    # ------ AIDES REGIONALES ------
-    aides_regionales_generiques = [
-        {
-            "id": "region-aide-invest", "nom": "Aide regionale a l investissement productif",
-            "organisme": "Conseil Regional", "niveau": "regional", "categorie": "investissement",
-            "type_aide": "subvention",
-            "description": "Subvention pour les investissements materiels et immateriels des PME. Taux d aide de 10 a 30% selon region et zone AFR. Toutes les regions proposent ce type d aide.",
-            "montant_max": "Variable (30 000 a 500 000 EUR selon region)",
-            "montant_estime": None,
-            "conditions": ["PME implantee dans la region", "Investissement productif (equipement, immobilier)", "Creation d emplois associee souvent requise"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": investissement and is_pme,
-            "url_info": "https://les-aides.fr/",
-            "priorite": 2,
-        },
-        {
-            "id": "region-aide-creation", "nom": "Aide regionale a la creation d entreprise",
-            "organisme": "Conseil Regional", "niveau": "regional", "categorie": "creation",
-            "type_aide": "subvention",
-            "description": "Plupart des regions proposent des aides a la creation : prets d honneur, subventions, accompagnement. Montant et conditions varient selon les regions.",
-            "montant_max": "Variable (5 000 a 50 000 EUR)",
-            "montant_estime": None,
-            "conditions": ["Creation ou reprise d entreprise", "Implantation dans la region", "Projet economiquement viable"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": creation_reprise,
-            "url_info": "https://les-aides.fr/",
-            "priorite": 2,
-        },
-        {
-            "id": "region-aide-export", "nom": "Aide regionale a l export",
-            "organisme": "Conseil Regional / CCI", "niveau": "regional", "categorie": "export",
-            "type_aide": "subvention",
-            "description": "Aides regionales pour la prospection internationale : salons, missions commerciales, etudes de marche. Souvent 50% des depenses prises en charge.",
-            "montant_max": "Variable (5 000 a 30 000 EUR)",
-            "montant_estime": None,
-            "conditions": ["PME de la region", "Premier developpement export ou nouveau marche"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": export_intl and is_pme,
-            "url_info": "https://les-aides.fr/",
-            "priorite": 2,
-        },
-        {
-            "id": "region-aide-innovation", "nom": "Aide regionale a l innovation",
-            "organisme": "Conseil Regional / Agence d innovation", "niveau": "regional", "categorie": "innovation",
-            "type_aide": "subvention",
-            "description": "Aides regionales pour la R&D et l innovation : bourses de faisabilite, aides au prototypage, aides aux brevets. Souvent complementaires au CIR/CII.",
-            "montant_max": "Variable (10 000 a 200 000 EUR)",
-            "montant_estime": None,
-            "conditions": ["PME de la region", "Projet innovant (produit ou procede nouveau)", "Co-financement souvent requis"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": innovation and is_pme,
-            "url_info": "https://les-aides.fr/",
-            "priorite": 2,
-        },
-        {
-            "id": "region-aide-transition", "nom": "Aide regionale a la transition ecologique",
-            "organisme": "Conseil Regional", "niveau": "regional", "categorie": "environnement",
-            "type_aide": "subvention",
-            "description": "Aides regionales pour la transition ecologique : audits energetiques, investissements verts, economie circulaire, mobilite durable.",
-            "montant_max": "Variable (5 000 a 100 000 EUR)",
-            "montant_estime": None,
-            "conditions": ["Entreprise de la region", "Projet de transition ecologique", "Diagnostic prealable souvent requis"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": environnement and is_pme,
-            "url_info": "https://les-aides.fr/",
-            "priorite": 2,
-        },
-        {
-            "id": "region-aide-numerique", "nom": "Cheque numerique regional",
-            "organisme": "Conseil Regional", "niveau": "regional", "categorie": "numerique",
-            "type_aide": "subvention",
-            "description": "Aides regionales a la numerisation : site web, ERP, CRM, e-commerce, cybersecurite. Souvent sous forme de cheque ou de subvention forfaitaire.",
-            "montant_max": "Variable (2 000 a 20 000 EUR)",
-            "montant_estime": None,
-            "conditions": ["TPE ou PME de la region", "Projet de numerisation", "Prestataire agree souvent requis"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": numerique and is_pme,
-            "url_info": "https://les-aides.fr/",
-            "priorite": 2,
-        },
-    ]
-
-    # Aides regionales specifiques selon la region selectionnee
-    if region == "ile-de-france":
-        aides_regionales_generiques.append({
-            "id": "idf-pm-up", "nom": "PM up (Ile-de-France)",
-            "organisme": "Region Ile-de-France", "niveau": "regional", "categorie": "investissement",
-            "type_aide": "subvention",
-            "description": "Aide de 10 000 a 250 000 EUR pour les PME franciliennes en croissance. Investissement materiel, immateriel, recrutement, conseil strategique.",
-            "montant_max": "250 000 EUR",
-            "montant_estime": None,
-            "conditions": ["PME de 5 a 250 salaries", "Siege social en IDF", "Croissance du CA sur 3 ans"],
-            "tailles": ["pme"],
-            "secteurs": [],
-            "eligible": True,
-            "url_info": "https://www.iledefrance.fr/aides-et-appels-a-projets/pm-up",
-            "priorite": 1,
-        })
-        aides_regionales_generiques.append({
-            "id": "idf-innov-up", "nom": "Innov up (Ile-de-France)",
-            "organisme": "Region Ile-de-France", "niveau": "regional", "categorie": "innovation",
-            "type_aide": "subvention",
-            "description": "Aide pour les projets innovants des TPE/PME franciliennes : faisabilite, experimentation, developpement, industrialisation.",
-            "montant_max": "Jusqu a 500 000 EUR",
-            "montant_estime": None,
-            "conditions": ["TPE/PME en IDF", "Projet innovant", "Prototype ou POC"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": innovation,
-            "url_info": "https://www.iledefrance.fr/aides-et-appels-a-projets/innov-up",
-            "priorite": 1,
-        })
-
-    if region == "auvergne-rhone-alpes":
-        aides_regionales_generiques.append({
-            "id": "ara-ambition-eco", "nom": "Ambition Eco (Auvergne-Rhone-Alpes)",
-            "organisme": "Region AURA", "niveau": "regional", "categorie": "investissement",
-            "type_aide": "subvention",
-            "description": "Aide pour les projets d investissement structurants des PME de la region AURA : equipements, immobilier, numerisation.",
-            "montant_max": "200 000 EUR",
-            "montant_estime": None,
-            "conditions": ["PME implantee en AURA", "Projet d investissement productif", "Creation d emplois"],
-            "tailles": ["pme"],
-            "secteurs": [],
-            "eligible": investissement,
-            "url_info": "https://ambitioneco.auvergnerhonealpes.fr/",
-            "priorite": 1,
-        })
-
-    if region == "nouvelle-aquitaine":
-        aides_regionales_generiques.append({
-            "id": "na-croissance-verte", "nom": "Croissance Verte (Nouvelle-Aquitaine)",
-            "organisme": "Region Nouvelle-Aquitaine", "niveau": "regional", "categorie": "environnement",
-            "type_aide": "subvention",
-            "description": "Aide aux entreprises de Nouvelle-Aquitaine pour des projets de croissance verte : eco-conception, EnR, economie circulaire, mobilite propre.",
-            "montant_max": "100 000 EUR",
-            "montant_estime": None,
-            "conditions": ["Entreprise implantee en Nouvelle-Aquitaine", "Projet de transition ecologique"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": environnement,
-            "url_info": "https://les-aides.nouvelle-aquitaine.fr/",
-            "priorite": 1,
-        })
-
-    if region == "occitanie":
-        aides_regionales_generiques.append({
-            "id": "occ-pass-occitanie", "nom": "Pass Occitanie",
-            "organisme": "Region Occitanie / AD Occ", "niveau": "regional", "categorie": "investissement",
-            "type_aide": "subvention",
-            "description": "Aide de 2 000 a 10 000 EUR pour les TPE et PME d Occitanie. Investissement, conseil, communication, numerisation.",
-            "montant_max": "10 000 EUR",
-            "montant_estime": 10000 if is_pme and effectif < 50 else None,
-            "conditions": ["TPE/PME d Occitanie", "Moins de 50 salaries", "Projet de developpement"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": [],
-            "eligible": is_pme and effectif < 50,
-            "url_info": "https://www.laregion.fr/Pass-Occitanie",
-            "priorite": 1,
-        })
-
-    toutes_aides.extend(aides_regionales_generiques)
-
-    # ------ AIDES LOCALES ------
-    toutes_aides.append({
-        "id": "local-pret-honneur", "nom": "Pret d honneur (Initiative France / Reseau Entreprendre)",
-        "organisme": "Initiative France / Reseau Entreprendre", "niveau": "local", "categorie": "creation",
-        "type_aide": "pret",
-        "description": "Pret a taux zero, sans garantie, pour les createurs et repreneurs. De 2 000 a 50 000 EUR. Effet levier pour obtenir un pret bancaire (1 EUR Initiative = 7.50 EUR de pret bancaire).",
-        "montant_max": "50 000 EUR (Initiative) / 90 000 EUR (Reseau Entreprendre)",
-        "montant_estime": None,
-        "conditions": ["Creation ou reprise d entreprise", "Projet viable et coherent", "Accompagnement par la plateforme"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": creation_reprise or is_startup,
-        "url_info": "https://www.initiative-france.fr/",
-        "priorite": 1,
-    })
-
-    toutes_aides.append({
-        "id": "local-pepiniere", "nom": "Pepiniere / Incubateur d entreprises",
-        "organisme": "Collectivites locales / Technopoles", "niveau": "local", "categorie": "creation",
-        "type_aide": "accompagnement",
-        "description": "Hebergement a tarif reduit + accompagnement pour les jeunes entreprises. Services mutualises : salle reunion, secretariat, conseil juridique, comptable.",
-        "montant_max": "Loyer reduit 50-70% + services inclus",
-        "montant_estime": None,
-        "conditions": ["Entreprise de moins de 3-5 ans", "Projet innovant ou a fort potentiel", "Candidature aupres de la pepiniere"],
-        "tailles": ["tpe"],
-        "secteurs": [],
-        "eligible": is_startup,
-        "url_info": "https://www.economie.gouv.fr/entreprises/pepinieres-incubateurs-entreprises",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "local-exo-cfe", "nom": "Exoneration CFE (Cotisation Fonciere des Entreprises)",
-        "organisme": "Communes / EPCI", "niveau": "local", "categorie": "fiscal",
-        "type_aide": "exoneration",
-        "description": "Exoneration de CFE possible sur deliberation communale pour les creations d entreprises (2 ans), les ZRR, les JEI, les artistes, et certaines activites specifiques.",
-        "montant_max": "Exoneration totale CFE 2-5 ans",
-        "montant_estime": None,
-        "conditions": ["Variable selon commune", "Creation d entreprise ou implantation en zone prioritaire"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": creation_reprise or zone in ("zrr", "zfu", "ber"),
-        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F23547",
-        "priorite": 2,
-    })
-
-    # ------ AIDES EUROPEENNES ------
-    toutes_aides.append({
-        "id": "feder", "nom": "FEDER (Fonds Europeen de Developpement Regional)",
-        "organisme": "Commission europeenne / Region", "niveau": "europeen", "categorie": "investissement",
-        "type_aide": "subvention",
-        "description": "Cofinancement de projets d investissement, d innovation, de transition ecologique et de numerisation. Gere au niveau regional. Budget 2021-2027 : 226 Md EUR.",
-        "montant_max": "Variable (40 a 85% de cofinancement selon zone)",
-        "montant_estime": None,
-        "conditions": ["Projet s inscrivant dans les priorites regionales", "Cofinancement obligatoire", "Appel a projets regional"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": investissement or innovation or environnement or numerique,
-        "url_info": "https://ec.europa.eu/regional_policy/funding/erdf_fr",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "fse-plus", "nom": "FSE+ (Fonds Social Europeen Plus)",
-        "organisme": "Commission europeenne / DREETS", "niveau": "europeen", "categorie": "emploi",
-        "type_aide": "subvention",
-        "description": "Financement de projets emploi, formation, inclusion sociale. Formation des salaries, insertion professionnelle, lutte contre la pauvrete. Budget 2021-2027 : 99 Md EUR.",
-        "montant_max": "Variable selon projet (cofinancement 50 a 85%)",
-        "montant_estime": None,
-        "conditions": ["Projet emploi/formation/inclusion", "Cofinancement obligatoire", "Appel a projets"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": formation or ess,
-        "url_info": "https://ec.europa.eu/european-social-fund-plus/fr",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "horizon-europe", "nom": "Horizon Europe",
-        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "innovation",
-        "type_aide": "subvention",
-        "description": "Programme-cadre de R&D de l UE (2021-2027, 95.5 Md EUR). Finance des projets collaboratifs de recherche et innovation. EIC Accelerator pour les PME innovantes : jusqu a 2.5 MEUR subvention + 15 MEUR equity.",
-        "montant_max": "2 500 000 EUR (subvention EIC) + 15 MEUR (equity)",
-        "montant_estime": None,
-        "conditions": ["Projet de R&D avec dimension europeenne", "Consortium transnational (sauf EIC)", "Excellence scientifique et impact"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": innovation,
-        "url_info": "https://research-and-innovation.ec.europa.eu/funding/funding-opportunities/funding-programmes-and-open-calls/horizon-europe_en",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "eic-accelerator", "nom": "EIC Accelerator (Horizon Europe)",
-        "organisme": "European Innovation Council", "niveau": "europeen", "categorie": "innovation",
-        "type_aide": "subvention",
-        "description": "Financement pour les PME innovantes a fort potentiel de croissance. Subvention jusqu a 2.5 MEUR + investissement en equity jusqu a 15 MEUR. TRL 5-9.",
-        "montant_max": "2 500 000 EUR subvention + 15 MEUR equity",
-        "montant_estime": None,
-        "conditions": ["PME au sens UE", "Innovation de rupture (deep tech, green tech, health tech)", "TRL 5-9", "Ambition de scale-up europeen"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": innovation and is_pme,
-        "url_info": "https://eic.ec.europa.eu/eic-funding-opportunities/eic-accelerator_en",
-        "priorite": 2,
-    })
-
-    toutes_aides.append({
-        "id": "cosme-sme", "nom": "Programme SMP / COSME (ex-COSME)",
-        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "investissement",
-        "type_aide": "garantie",
-        "description": "Garantie de prets et facilitation d acces aux marches pour les PME europeennes. Via le programme Single Market Programme (ex-COSME). Garantie intermediee par les banques.",
-        "montant_max": "Garantie bancaire facilitee (jusqu a 150 000 EUR)",
-        "montant_estime": None,
-        "conditions": ["PME europeenne", "Demande via banque partenaire", "Projet de croissance ou de creation"],
-        "tailles": ["tpe", "pme"],
-        "secteurs": [],
-        "eligible": is_pme,
-        "url_info": "https://single-market-economy.ec.europa.eu/smes/cosme_en",
-        "priorite": 3,
-    })
-
-    toutes_aides.append({
-        "id": "life", "nom": "Programme LIFE (environnement et climat)",
-        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "environnement",
-        "type_aide": "subvention",
-        "description": "Financement de projets environnementaux : biodiversite, economie circulaire, attenuation/adaptation climatique, transition energetique. Budget 2021-2027 : 5.4 Md EUR.",
-        "montant_max": "Variable (cofinancement 60 a 75%)",
-        "montant_estime": None,
-        "conditions": ["Projet a dimension environnementale", "Impact mesurable", "Valeur ajoutee europeenne"],
-        "tailles": ["tpe", "pme", "eti", "ge"],
-        "secteurs": [],
-        "eligible": environnement,
-        "url_info": "https://cinea.ec.europa.eu/programmes/life_en",
-        "priorite": 3,
-    })
-
-    toutes_aides.append({
-        "id": "erasmus-entreprises", "nom": "Erasmus pour jeunes entrepreneurs",
-        "organisme": "Commission europeenne / EASME", "niveau": "europeen", "categorie": "creation",
-        "type_aide": "accompagnement",
-        "description": "Programme d echange permettant a un jeune entrepreneur de passer 1 a 6 mois chez un entrepreneur experimente dans un autre pays de l UE. Bourse de sejour incluse.",
-        "montant_max": "Bourse de 530 a 1 100 EUR/mois selon pays",
-        "montant_estime": None,
-        "conditions": ["Entrepreneur de moins de 3 ans d activite ou porteur de projet", "Partenariat avec un entrepreneur hote dans un autre pays UE"],
-        "tailles": ["tpe"],
-        "secteurs": [],
-        "eligible": creation_reprise and is_startup,
-        "url_info": "https://www.erasmus-entrepreneurs.eu/",
-        "priorite": 3,
-    })
-
-    toutes_aides.append({
-        "id": "digital-europe", "nom": "Digital Europe Programme",
-        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "numerique",
-        "type_aide": "subvention",
-        "description": "Programme europeen pour la transformation numerique : IA, cybersecurite, calcul haute performance, competences numeriques, interoperabilite. Budget : 7.5 Md EUR.",
-        "montant_max": "Variable selon appel a projets",
-        "montant_estime": None,
-        "conditions": ["Projet numerique (IA, cyber, cloud, data)", "Consortium transnational recommande", "Appel a projets"],
-        "tailles": ["tpe", "pme", "eti"],
-        "secteurs": ["J", "M"],
-        "eligible": numerique and innovation,
-        "url_info": "https://digital-strategy.ec.europa.eu/en/activities/digital-programme",
-        "priorite": 3,
-    })
-
-    # ------ AIDES SECTORIELLES ------
-    if lettre_naf in ("A",):
-        toutes_aides.append({
-            "id": "pac-aides", "nom": "PAC - Aides agricoles",
-            "organisme": "ASP / DDT", "niveau": "europeen", "categorie": "investissement",
-            "type_aide": "subvention",
-            "description": "Aides directes (DPB, paiement vert, aide redistributive) et aides couplees pour les exploitations agricoles. PCAE pour les investissements.",
-            "montant_max": "Variable selon exploitation",
-            "montant_estime": None,
-            "conditions": ["Exploitant agricole", "Surface minimale (SNA)", "Respect conditionnalite"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": ["A"],
-            "eligible": True,
-            "url_info": "https://agriculture.gouv.fr/la-pac-en-un-coup-doeil",
-            "priorite": 1,
-        })
-
-    if lettre_naf in ("I",):
-        toutes_aides.append({
-            "id": "chr-modernisation", "nom": "Aide a la modernisation CHR",
-            "organisme": "Bpifrance / Region", "niveau": "national", "categorie": "investissement",
-            "type_aide": "pret",
-            "description": "Pret specifique pour les cafes, hotels, restaurants : renovation, mise aux normes, equipements, numerisation.",
-            "montant_max": "300 000 EUR",
-            "montant_estime": None,
-            "conditions": ["Cafe, hotel ou restaurant", "Investissement de modernisation"],
-            "tailles": ["tpe", "pme"],
-            "secteurs": ["I"],
-            "eligible": True,
-            "url_info": "https://www.bpifrance.fr/",
-            "priorite": 2,
-        })
-
-    if lettre_naf in ("F",):
-        toutes_aides.append({
-            "id": "btp-prevention", "nom": "Aides OPPBTP a la prevention BTP",
-            "organisme": "OPPBTP", "niveau": "national", "categorie": "emploi",
-            "type_aide": "subvention",
-            "description": "Aides financieres et accompagnement pour la prevention des risques dans le BTP : equipements de securite, formations, diagnostics.",
-            "montant_max": "Variable (diagnostics gratuits + aides equipements)",
-            "montant_estime": None,
-            "conditions": ["Entreprise du BTP", "Cotisant OPPBTP"],
-            "tailles": ["tpe", "pme", "eti"],
-            "secteurs": ["F"],
-            "eligible": True,
-            "url_info": "https://www.preventionbtp.fr/",
-            "priorite": 2,
-        })
-
-    if lettre_naf in ("C", "J", "M"):
-        toutes_aides.append({
-            "id": "cifre", "nom": "Convention CIFRE (These en entreprise)",
-            "organisme": "ANRT / MESRI", "niveau": "national", "categorie": "innovation",
-            "type_aide": "subvention",
-            "description": "Subvention annuelle de 14 000 EUR pendant 3 ans pour l embauche d un doctorant en these au sein de l entreprise. Eligible au CIR en complementarite.",
-            "montant_max": "42 000 EUR (14 000/an x 3 ans)",
-            "montant_estime": 42000 if innovation else None,
-            "conditions": ["Embauche d un doctorant en CDI ou CDD 3 ans", "Partenariat avec un laboratoire de recherche", "Sujet de these valide par l ANRT"],
-            "tailles": ["tpe", "pme", "eti", "ge"],
-            "secteurs": ["C", "J", "M"],
-            "eligible": innovation,
-            "url_info": "https://www.anrt.asso.fr/fr/le-dispositif-cifre-7844",
-            "priorite": 2,
-        })
-
-    # Filtrage : ne garder que les aides eligible = True
-    aides_eligibles = [a for a in toutes_aides if a.get("eligible")]
-
-    # ============================================================
-    # REGLES DE NON-CUMUL ENTRE SUBVENTIONS
-    # Certaines aides ne sont pas cumulables entre elles.
-    # On marque les incompatibilites et on calcule le montant max realiste.
-    # ============================================================
-    _NON_CUMUL_SUBVENTIONS = {
-        # CIR et CII : cumulables entre eux mais pas sur les memes depenses
-        "cir_cii": {
-            "ids": ["cir", "cii"],
-            "regle": "Le CIR et le CII sont cumulables, mais pas sur les memes depenses. Les depenses eligibles au CII ne doivent pas etre declarees au CIR.",
-        },
-        # JEI et ACRE : non cumulables
-        "jei_acre": {
-            "ids": ["jei", "jeic", "acre"],
-            "regle": "L'exoneration JEI/JEIC n'est pas cumulable avec l'ACRE. Seule l'aide la plus avantageuse s'applique.",
-            "exclusif": True,
-        },
-        # Aides de zone : mutuellement exclusives
-        "zones": {
-            "ids": ["zrr", "zfu", "qpv", "ber", "afr", "zrd"],
-            "regle": "Les exonerations de zone (ZRR, ZFU-TE, QPV, BER, AFR, ZRD) sont mutuellement exclusives. Une seule peut s'appliquer.",
-            "exclusif": True,
-        },
-        # Reduction generale (Fillon) vs exonerations specifiques
-        "fillon_vs_specifiques": {
-            "ids": ["fillon", "jei", "jeic", "acre", "zrr", "zfu", "qpv"],
-            "regle": "La reduction generale (ex-Fillon) n'est pas cumulable avec les exonerations specifiques (JEI, ACRE, exonerations de zone).",
-            "exclusif": True,
-        },
-    }
-
-    # Marquer les aides avec leurs incompatibilites
-    avertissements_non_cumul = []
-    ids_eligibles = {a["id"] for a in aides_eligibles}
-
-    for regle_nom, regle in _NON_CUMUL_SUBVENTIONS.items():
-        ids_concernes = [aid_id for aid_id in regle["ids"] if aid_id in ids_eligibles]
-        if len(ids_concernes) >= 2:
-            noms_concernes = [a["nom"] for a in aides_eligibles if a["id"] in ids_concernes]
-            avertissement = {
-                "type": "non_cumul",
-                "regle": regle["regle"],
-                "aides_concernees": noms_concernes,
-                "exclusif": regle.get("exclusif", False),
-            }
-            avertissements_non_cumul.append(avertissement)
-
-            # Marquer les aides individuellement
-            for a in aides_eligibles:
-                if a["id"] in ids_concernes:
-                    if "avertissements" not in a:
-                        a["avertissements"] = []
-                    a["avertissements"].append(regle["regle"])
-                    a["non_cumulable_avec"] = [n for n in noms_concernes if n != a["nom"]]
-
-    # Calculer un score de correspondance aux criteres utilisateur
-    criteres_actifs = []
-    if innovation: criteres_actifs.append("innovation")
-    if environnement: criteres_actifs.append("environnement")
-    if numerique: criteres_actifs.append("numerique")
-    if export_intl: criteres_actifs.append("export")
-    if formation: criteres_actifs.append("formation")
-    if creation_reprise: criteres_actifs.append("creation")
-    if investissement: criteres_actifs.append("investissement")
-    if ess: criteres_actifs.append("ess")
-    if zone and zone != "metropole": criteres_actifs.append("zone")
-
-    cat_critere_map = {
-        "innovation": "innovation", "environnement": "environnement",
-        "numerique": "numerique", "export": "export",
-        "emploi": "formation", "creation": "creation",
-        "investissement": "investissement", "ess": "ess",
-        "fiscal": "innovation", "social": "formation",
-    }
-
-    for a in aides_eligibles:
-        score = 0
-        cat = a.get("categorie", "")
-        mapped = cat_critere_map.get(cat, "")
-        if mapped and mapped in criteres_actifs:
-            score += 10
-        # Bonus si montant estime disponible
-        est = a.get("montant_estime")
-        if est and isinstance(est, (int, float)) and est > 0:
-            score += 5
-        a["_score_criteres"] = score
-
-    # Tri par: score criteres (desc), montant estime (desc), priorite, nom
-    def _sort_key(a):
-        est = a.get("montant_estime")
-        montant = est if isinstance(est, (int, float)) else 0
-        return (-a.get("_score_criteres", 0), -montant, a.get("priorite", 5), a["nom"])
-
-    aides_eligibles.sort(key=_sort_key)
-
-    # ============================================================
-    # CALCUL DU MONTANT POTENTIEL MAX REALISTE
-    # Tient compte des regles de non-cumul pour ne pas additionner
-    # des aides mutuellement exclusives.
-    # ============================================================
-    montant_total_brut = 0  # Somme brute de tous les montants estimes
-    montant_total_realiste = 0  # Somme apres deduction des non-cumuls
-    nb_aides_chiffrees = 0
-
-    # Calculer le montant brut
-    for a in aides_eligibles:
-        est = a.get("montant_estime")
-        if est and isinstance(est, (int, float)):
-            montant_total_brut += est
-            nb_aides_chiffrees += 1
-
-    # Calculer le montant realiste : pour les groupes exclusifs, ne garder que le max
-    ids_deja_comptes = set()
-    for regle_nom, regle in _NON_CUMUL_SUBVENTIONS.items():
-        if not regle.get("exclusif"):
-            continue
-        ids_concernes = [aid_id for aid_id in regle["ids"] if aid_id in ids_eligibles]
-        if len(ids_concernes) >= 2:
-            # Trouver le montant max du groupe
-            montants_groupe = []
-            for a in aides_eligibles:
-                if a["id"] in ids_concernes:
-                    est = a.get("montant_estime")
-                    if est and isinstance(est, (int, float)):
-                        montants_groupe.append((a["id"], est))
-            if montants_groupe:
-                montants_groupe.sort(key=lambda x: x[1], reverse=True)
-                # Garder le meilleur, retrancher les autres
-                for aid_id, _ in montants_groupe:
-                    ids_deja_comptes.add(aid_id)
-
-    # Montant realiste = somme de toutes les aides - les doublons des groupes exclusifs
-    montant_total_realiste = 0
-    groupes_exclusifs_traites = set()
-    for a in aides_eligibles:
-        est = a.get("montant_estime")
-        if not est or not isinstance(est, (int, float)):
-            continue
-        # Verifier si l'aide est dans un groupe exclusif
-        in_exclusif = False
-        for regle_nom, regle in _NON_CUMUL_SUBVENTIONS.items():
-            if not regle.get("exclusif"):
-                continue
-            if a["id"] in regle["ids"]:
-                if regle_nom not in groupes_exclusifs_traites:
-                    # Premier du groupe : compter le max
-                    max_est = max(
-                        (aa.get("montant_estime", 0) for aa in aides_eligibles
-                         if aa["id"] in regle["ids"] and isinstance(aa.get("montant_estime"), (int, float))),
-                        default=0,
-                    )
-                    montant_total_realiste += max_est
-                    groupes_exclusifs_traites.add(regle_nom)
-                in_exclusif = True
-                break
-        if not in_exclusif:
-            montant_total_realiste += est
-
-    niveaux = {}
-    categories = {}
-    types = {}
-    for a in aides_eligibles:
-        niveaux[a["niveau"]] = niveaux.get(a["niveau"], 0) + 1
-        categories[a["categorie"]] = categories.get(a["categorie"], 0) + 1
-        types[a["type_aide"]] = types.get(a["type_aide"], 0) + 1
-
-    return {
-        "total": len(aides_eligibles),
-        "montant_potentiel_estime": round(montant_total_brut, 2),
-        "montant_potentiel_max_realiste": round(montant_total_realiste, 2),
-        "nb_aides_chiffrees": nb_aides_chiffrees,
-        "avertissement_cumul": (
-            "Attention : certaines aides ne sont pas cumulables entre elles. "
-            "Le montant potentiel max realiste tient compte de ces regles de non-cumul "
-            "et ne retient que l'aide la plus avantageuse dans chaque groupe exclusif."
-        ) if avertissements_non_cumul else None,
-        "regles_non_cumul": avertissements_non_cumul if avertissements_non_cumul else [],
-        "par_niveau": niveaux,
-        "par_categorie": categories,
-        "par_type": types,
-        "aides": aides_eligibles,
-        "criteres_utilises": {
-            "code_naf": code_naf,
-            "effectif": effectif,
-            "forme_juridique": forme_juridique,
-            "region": region,
-            "zone": zone,
-            "ca": ca,
-            "age_entreprise": age_entreprise,
-            "masse_salariale": masse_salariale,
-            "innovation": innovation,
-            "environnement": environnement,
-            "numerique": numerique,
-            "export": export_intl,
-            "formation": formation,
-            "creation_reprise": creation_reprise,
-            "investissement": investissement,
-            "ess": ess,
-        },
-    }
-
-
-# ==============================
-# IDCC / CONVENTIONS COLLECTIVES
-# ==============================
-
-@app.get("/api/idcc/recherche")
-async def idcc_recherche(terme: str = Query("")):
-    from urssaf_analyzer.config.idcc_database import rechercher_idcc
-    return {"terme": terme, "resultats": rechercher_idcc(terme)}
-
-
-@app.get("/api/idcc/{idcc}")
-async def idcc_detail(idcc: str):
-    from urssaf_analyzer.config.idcc_database import get_ccn_par_idcc, get_prevoyance_par_idcc
-    ccn = get_ccn_par_idcc(idcc)
-    if not ccn:
-        raise HTTPException(404, f"IDCC {idcc} non trouve dans la base")
-    prev_cadre = get_prevoyance_par_idcc(idcc, est_cadre=True)
-    prev_nc = get_prevoyance_par_idcc(idcc, est_cadre=False)
-    return {"idcc": idcc, "ccn": ccn, "prevoyance_cadre": prev_cadre, "prevoyance_non_cadre": prev_nc}
-
-
-# ==============================
-# TAUX AT/MP
-# ==============================
-
-@app.get("/api/atmp/taux")
-async def atmp_taux(
-    code_naf: str = Query(None),
-    naf: str = Query(None),
-    effectif: int = Query(10),
-):
-    from urssaf_analyzer.config.taux_atmp import get_taux_atmp
-    # Accept both 'code_naf' and 'naf' as parameter names for the NAF code
-    effective_naf = code_naf or naf or "62.02"
-    return get_taux_atmp(effective_naf, effectif)
-
-
-# ==============================
-# REGIMES SPECIAUX
-# ==============================
-
-@app.get("/api/regimes")
-async def regimes_liste():
-    from urssaf_analyzer.rules.regimes_speciaux import lister_regimes
-    return {"regimes": lister_regimes()}
-
-
-@app.get("/api/regimes/{code}")
-async def regime_detail(code: str):
-    from urssaf_analyzer.rules.regimes_speciaux import get_regime
-    regime = get_regime(code)
-    if not regime:
-        raise HTTPException(404, f"Regime {code} non trouve")
-    return regime
-
-
-@app.get("/api/regimes/detecter")
-async def regime_detecter(
-    code_naf: str = Query(""), departement: str = Query(""),
-    idcc: str = Query(""), texte: str = Query(""),
-):
-    from urssaf_analyzer.rules.regimes_speciaux import detecter_regime
-    codes = detecter_regime(code_naf, departement, idcc, texte)
-    return {"regimes_detectes": codes, "regime_general": True, "note": "Le regime general s applique toujours sauf substitution complete"}
-
-
-@app.get("/api/regimes/msa/cotisations")
-async def regime_msa_cotisations(brut_mensuel: float = Query(2000), effectif: int = Query(5)):
-    from urssaf_analyzer.rules.regimes_speciaux import calculer_cotisations_msa
-    return calculer_cotisations_msa(Decimal(str(brut_mensuel)), effectif)
-
-
-@app.get("/api/regimes/alsace-moselle/supplement")
-async def regime_alsace_supplement(brut_mensuel: float = Query(2500)):
-    from urssaf_analyzer.rules.regimes_speciaux import calculer_supplement_alsace_moselle
-    return calculer_supplement_alsace_moselle(Decimal(str(brut_mensuel)))
-
-
-# ==============================
-# TRAVAILLEURS DETACHES / ETRANGERS
-# ==============================
-
-@app.get("/api/detachement/reglementation")
-async def detachement_reglementation():
-    from urssaf_analyzer.rules.travailleurs_detaches import DETACHEMENT_UE
-    return DETACHEMENT_UE
-
-
-@app.get("/api/detachement/verifier")
-async def detachement_verifier(
-    nationalite: str = Query(""),
-    pays_employeur: str = Query(""),
-    a1_present: bool = Query(False),
-    sipsi_declare: bool = Query(False),
-    duree_mois: int = Query(6),
-    remuneration_brute: float = Query(0),
-    secteur_btp: bool = Query(False),
-    carte_btp: bool = Query(False),
-):
-    from urssaf_analyzer.rules.travailleurs_detaches import verifier_conformite_detachement
-    return verifier_conformite_detachement(
-        nationalite=nationalite, pays_employeur=pays_employeur,
-        a1_present=a1_present, sipsi_declare=sipsi_declare,
-        duree_mois=duree_mois, remuneration_brute=Decimal(str(remuneration_brute)),
-        secteur_btp=secteur_btp, carte_btp=carte_btp,
-    )
-
-
-@app.get("/api/detachement/regime-applicable")
-async def detachement_regime_applicable(
-    nationalite: str = Query(""),
-    pays_residence: str = Query(""),
-    pays_employeur: str = Query(""),
-    certificat_a1: bool = Query(False),
-    convention_bilaterale: bool = Query(False),
-):
-    from urssaf_analyzer.rules.travailleurs_detaches import determiner_regime_applicable
-    return determiner_regime_applicable(
-        nationalite=nationalite, pays_residence=pays_residence,
-        pays_employeur=pays_employeur, certificat_a1=certificat_a1,
-        convention_bilaterale=convention_bilaterale,
-    )
+@app.get("/api/detachement/regime-applicable")
+async def detachement_regime_applicable(
+    nationalite: str = Query(""),
+    pays_residence: str = Query(""),
+    pays_employeur: str = Query(""),
+    certificat_a1: bool = Query(False),
+    convention_bilaterale: bool = Query(False),
+):
+    from urssaf_analyzer.rules.travailleurs_detaches import determiner_regime_applicable
+    return determiner_regime_applicable(
+        nationalite=nationalite, pays_residence=pays_residence,
+        pays_employeur=pays_employeur, certificat_a1=certificat_a1,
+        convention_bilaterale=convention_bilaterale,
+    )
 
 
 @app.get("/api/detachement/conventions-bilaterales")
@@ -6963,6 +5949,102 @@ async def get_version():
     return {"version": "3.9.0", "build": "20260305a", "audit_checks": 90, "controles_v": "5.0", "idcc_base": True, "atmp_table": True, "regimes_speciaux": 9, "multi_annuel": True, "env": "ovhcloud" if _IS_OVH else "vercel", "persistence": bool(_persist), "max_files": _MAX_FILES, "max_upload_mb": _MAX_UPLOAD_MB, "auth": True}
 
 
+# Constantes reglementaires historiques (PASS, SMIC, seuils)
+_CONSTANTES_HIST = {
+    2021: {"pass": 41136, "smic_h": 10.25, "smic_m": 1554.58, "plafond_ss_m": 3428, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.28, "forfait_social_pee": 20, "taux_agff": 2.0},
+    2022: {"pass": 41136, "smic_h": 10.57, "smic_m": 1603.12, "plafond_ss_m": 3428, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.28, "forfait_social_pee": 20, "taux_agff": 2.0},
+    2023: {"pass": 43992, "smic_h": 11.52, "smic_m": 1747.20, "plafond_ss_m": 3666, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.24, "forfait_social_pee": 20, "taux_agff": 2.0},
+    2024: {"pass": 46368, "smic_h": 11.65, "smic_m": 1766.92, "plafond_ss_m": 3864, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.23, "forfait_social_pee": 20, "taux_agff": 2.0},
+    2025: {"pass": 47100, "smic_h": 11.88, "smic_m": 1801.80, "plafond_ss_m": 3925, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.22, "forfait_social_pee": 20, "taux_agff": 2.0},
+    # 2026 : valeurs 2025 reconduites (actualiser des publication des textes 2026)
+    2026: {"pass": 47100, "smic_h": 11.88, "smic_m": 1801.84, "plafond_ss_m": 3925, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.20, "forfait_social_pee": 20, "taux_agff": 2.0},
+}
+
+
+def _cst(annee, cle):
+    return _CONSTANTES_HIST.get(annee, _CONSTANTES_HIST.get(2026, {})).get(cle, 0)
+
+
+# Regles specifiques par annee (entree en vigueur)
+_REGLES_PAR_ANNEE = {
+    "ppv": 2022,  # Prime de partage de la valeur (ex Macron) - Loi 2022-1158
+    "bonus_malus_chomage": 2023,  # Modulation taux chomage - Decret 2023-33
+    "facturation_electronique_reception": 2024,  # Obligation reception - Ordonnance 2021-1190
+    "facturation_electronique_emission": 2026,  # Obligation emission
+    "entretien_pro_bilan_6ans": 2020,  # Bilan obligatoire tous les 6 ans - Loi 2018-771
+    "referent_harcelement_cse": 2019,  # Loi 2018-771
+    "index_egalite_250": 2019,  # Index egalite >= 250 sal
+    "index_egalite_50": 2020,  # Index egalite >= 50 sal
+    "c2p_6_facteurs": 2018,  # C2P remplace C3P
+    "pas_prelevement_source": 2019,  # PAS obligatoire
+    "cse_obligatoire": 2020,  # Fin periode transitoire CE/DP -> CSE
+    "activite_partielle_longue_duree": 2021,  # APLD - Decret 2020-926
+}
+
+
+
+def _annee_periode(periode) -> int:
+    try:
+        return int(str(periode)[:4])
+    except (ValueError, TypeError):
+        return 0
+
+
+# --- Memoisation de l'audit ---
+# Le rapport complet est memoise par version des donnees auditees
+# (_empreinte_kb : compteur des mutateurs de la base de connaissances et des
+# registres qu'elle resume + date) et periode demandee. Les controles annuels
+# (couverture documentaire, effectifs, SMIC, plafonds PASS) ne dependent que
+# des periodes, effectifs, bulletins et cotisations de l'annee, alimentes
+# uniquement par _alimenter_knowledge : ils sont memoises par annee et
+# version de l'annee, et seules les annees touchees par une nouvelle analyse
+# sont recalculees.
+_versions_annee_kb: dict[int, int] = {}
+_cache_controles_annee: dict[int, tuple[int, dict]] = {}  # annee -> (version, controles)
+_cache_audit: dict = {"empreinte": None, "rapports": {}}
+
+
+def _controles_annee(an: int) -> dict:
+    """Controles annuels de l'audit sur les donnees de paie d'une annee (memoises)."""
+    version = _versions_annee_kb.get(an, 0)
+    en_cache = _cache_controles_annee.get(an)
+    if en_cache is not None and en_cache[0] == version:
+        return en_cache[1]
+    kb = _biblio_knowledge
+
+    # 31, 33, 54. Couverture documentaire et effectif maximal de l'annee
+    periodes = [per for per in kb["periodes_couvertes"] if _annee_periode(per) == an]
+    effectif = max((kb["effectifs"].get(str(per), kb["effectifs"].get(per, 0)) for per in periodes), default=0)
+
+    # 55. SMIC : salaires inferieurs au SMIC de l'annee
+    anomalies_smic = []
+    smic_ref = _cst(an, "smic_m")
+    if smic_ref > 0:
+        for bp in kb["bulletins_paie"]:
+            if _annee_periode(bp.get("periode", "")) == an:
+                brut_m = bp.get("masse_salariale", 0)
+                if 0 < brut_m < smic_ref * 0.9:  # marge 10% pour temps partiel
+                    anomalies_smic.append(f"{an}: brut {brut_m:.0f} EUR < SMIC {smic_ref:.0f} EUR")
+
+    # 56. Assiettes plafonnees au-dela du PASS de l'annee
+    anomalies_plafonds = []
+    pass_ref = _cst(an, "pass")
+    if pass_ref > 0:
+        for cot in kb["cotisations"]:
+            if _annee_periode(cot.get("periode", "")) == an and cot.get("base_plafonnee", 0) > 0:
+                if cot["base_plafonnee"] > pass_ref * 1.05:
+                    anomalies_plafonds.append(f"{an}: assiette {cot.get('code','?')} {cot['base_plafonnee']:.0f} > PASS {pass_ref}")
+
+    controles = {
+        "documentee": bool(periodes),
+        "effectif": effectif,
+        "smic": anomalies_smic,
+        "plafonds": anomalies_plafonds,
+    }
+    _cache_controles_annee[an] = (version, controles)
+    return controles
+
+
 @app.get("/api/bibliotheque/knowledge/audit")
 async def knowledge_audit(
     annee_debut: int = Query(0),
@@ -6970,10 +6052,7 @@ async def knowledge_audit(
 ):
     """Genere un rapport d'audit complet base sur la base de connaissances.
     Supporte le controle pluri-annuel (jusqu'a N-5). Les regles sont adaptees a chaque annee."""
-    ks = _get_knowledge_summary()
-    kb = _biblio_knowledge
-
-    # --- Controle pluri-annuel : constantes historiques par annee ---
+    # --- Controle pluri-annuel : jusqu'a N-5 ---
     annee_courante = datetime.now().year
     if annee_fin <= 0:
         annee_fin = annee_courante
@@ -6981,36 +6060,21 @@ async def knowledge_audit(
         annee_debut = annee_courante - 5
     annee_debut = max(annee_debut, annee_courante - 5)
     annee_fin = min(annee_fin, annee_courante)
-    periode_controle = list(range(annee_debut, annee_fin + 1))
 
-    # Constantes reglementaires historiques (PASS, SMIC, seuils)
-    _CONSTANTES_HIST = {
-        2021: {"pass": 41136, "smic_h": 10.25, "smic_m": 1554.58, "plafond_ss_m": 3428, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.28, "forfait_social_pee": 20, "taux_agff": 2.0},
-        2022: {"pass": 41136, "smic_h": 10.57, "smic_m": 1603.12, "plafond_ss_m": 3428, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.28, "forfait_social_pee": 20, "taux_agff": 2.0},
-        2023: {"pass": 43992, "smic_h": 11.52, "smic_m": 1747.20, "plafond_ss_m": 3666, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.24, "forfait_social_pee": 20, "taux_agff": 2.0},
-        2024: {"pass": 46368, "smic_h": 11.65, "smic_m": 1766.92, "plafond_ss_m": 3864, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.23, "forfait_social_pee": 20, "taux_agff": 2.0},
-        2025: {"pass": 47100, "smic_h": 11.88, "smic_m": 1801.80, "plafond_ss_m": 3925, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.22, "forfait_social_pee": 20, "taux_agff": 2.0},
-        # 2026 : valeurs 2025 reconduites (actualiser des publication des textes 2026)
-        2026: {"pass": 47100, "smic_h": 11.88, "smic_m": 1801.84, "plafond_ss_m": 3925, "seuil_cse": 11, "seuil_participation": 50, "taux_at_moyen": 2.20, "forfait_social_pee": 20, "taux_agff": 2.0},
-    }
-    def _cst(annee, cle):
-        return _CONSTANTES_HIST.get(annee, _CONSTANTES_HIST.get(2026, {})).get(cle, 0)
-
-    # Regles specifiques par annee (entree en vigueur)
-    _REGLES_PAR_ANNEE = {
-        "ppv": 2022,  # Prime de partage de la valeur (ex Macron) - Loi 2022-1158
-        "bonus_malus_chomage": 2023,  # Modulation taux chomage - Decret 2023-33
-        "facturation_electronique_reception": 2024,  # Obligation reception - Ordonnance 2021-1190
-        "facturation_electronique_emission": 2026,  # Obligation emission
-        "entretien_pro_bilan_6ans": 2020,  # Bilan obligatoire tous les 6 ans - Loi 2018-771
-        "referent_harcelement_cse": 2019,  # Loi 2018-771
-        "index_egalite_250": 2019,  # Index egalite >= 250 sal
-        "index_egalite_50": 2020,  # Index egalite >= 50 sal
-        "c2p_6_facteurs": 2018,  # C2P remplace C3P
-        "pas_prelevement_source": 2019,  # PAS obligatoire
-        "cse_obligatoire": 2020,  # Fin periode transitoire CE/DP -> CSE
-        "activite_partielle_longue_duree": 2021,  # APLD - Decret 2020-926
-    }
+    empreinte = _empreinte_kb()
+    if _cache_audit["empreinte"] != empreinte:
+        _cache_audit["empreinte"], _cache_audit["rapports"] = empreinte, {}
+    rapport = _cache_audit["rapports"].get((annee_debut, annee_fin))
+    if rapport is None:
+        rapport = _calculer_audit(annee_debut, annee_fin)
+        _cache_audit["rapports"][(annee_debut, annee_fin)] = rapport
+    return ReponseJSON(rapport)
+
+
+def _calculer_audit(annee_debut: int, annee_fin: int) -> dict:
+    ks = _get_knowledge_summary()
+    kb = _biblio_knowledge
+    periode_controle = list(range(annee_debut, annee_fin + 1))
 
     # --- AUDIT SOCIAL (CSS + CT) ---
     social_checks = []
@@ -7274,7 +6338,7 @@ async def knowledge_audit(
     smic_mensuel = float(_SMIC_MENSUEL)  # SMIC 2025/2026 approximatif
     sous_smic = [b for b in salaires_analyses if b < smic_mensuel and b > 0]
     # Verification minimum conventionnel (si CCN identifiee)
-    ccn_ctx = ctx.get("convention_collective", "")
+    ccn_ctx = ks["contexte_entreprise"].get("convention_collective", "")
     min_conv_detail = ""
     sous_minimum_conv = []
     if ccn_ctx:
@@ -7521,15 +6585,8 @@ async def knowledge_audit(
 
     # 31. Prescription travail dissimule - couverture N a N-5 (L.8223-1 CT)
     annee_courante = datetime.now().year
-    annees_prescrites = set(range(annee_courante - 5, annee_courante + 1))
-    annees_couvertes = set()
-    for per in kb["periodes_couvertes"]:
-        try:
-            an = int(str(per)[:4])
-            annees_couvertes.add(an)
-        except (ValueError, TypeError):
-            pass
-    annees_manquantes = sorted(annees_prescrites - annees_couvertes)
+    annees_couvertes = {_annee_periode(per) for per in kb["periodes_couvertes"]} - {0}
+    annees_manquantes = [an for an in range(annee_courante - 5, annee_courante + 1) if not _controles_annee(an)["documentee"]]
     couverture_ok = len(annees_manquantes) == 0
     if annees_couvertes:
         couv_detail = f"Annees couvertes: {', '.join(str(a) for a in sorted(annees_couvertes))}."
@@ -7579,14 +6636,7 @@ async def knowledge_audit(
     ))
 
     # 33. Coherence inter-annuelle des effectifs
-    effectifs_par_annee = {}
-    for per in kb["periodes_couvertes"]:
-        try:
-            an = int(str(per)[:4])
-            effectifs_par_annee.setdefault(an, 0)
-            effectifs_par_annee[an] = max(effectifs_par_annee[an], kb["effectifs"].get(str(per), kb["effectifs"].get(per, 0)))
-        except (ValueError, TypeError):
-            pass
+    effectifs_par_annee = {an: _controles_annee(an)["effectif"] for an in annees_couvertes}
     variation_anormale = False
     detail_eff = ""
     annees_eff = sorted(effectifs_par_annee.keys())
@@ -7836,15 +6886,9 @@ async def knowledge_audit(
     ))
 
     # 54. Controle pluri-annuel : couverture documentaire par annee
-    annees_prescrites_ctrl = set(periode_controle)
-    annees_docs = set()
-    for per in kb["periodes_couvertes"]:
-        try:
-            annees_docs.add(int(str(per)[:4]))
-        except (ValueError, TypeError):
-            pass
-    annees_docs_ctrl = annees_docs & annees_prescrites_ctrl
-    annees_manquantes_ctrl = sorted(annees_prescrites_ctrl - annees_docs)
+    controles_annees = [_controles_annee(an) for an in periode_controle]
+    annees_docs_ctrl = [an for an, c in zip(periode_controle, controles_annees) if c["documentee"]]
+    annees_manquantes_ctrl = [an for an, c in zip(periode_controle, controles_annees) if not c["documentee"]]
     couverture_ctrl = len(annees_manquantes_ctrl) == 0
     detail_ctrl = f"Periode de controle: {annee_debut}-{annee_fin}. "
     if annees_docs_ctrl:
@@ -7864,22 +6908,7 @@ async def knowledge_audit(
     ))
 
     # 55. Controle pluri-annuel : evolution SMIC et plafonds par annee
-    anomalies_smic = []
-    for an in periode_controle:
-        smic_ref = _cst(an, "smic_m")
-        pass_ref = _cst(an, "pass")
-        if smic_ref > 0:
-            # Verifier si des salaires inferieurs au SMIC pour cette annee
-            for bp in kb["bulletins_paie"]:
-                bp_an = 0
-                try:
-                    bp_an = int(str(bp.get("periode", ""))[:4])
-                except (ValueError, TypeError):
-                    pass
-                if bp_an == an:
-                    brut_m = bp.get("masse_salariale", 0)
-                    if 0 < brut_m < smic_ref * 0.9:  # marge 10% pour temps partiel
-                        anomalies_smic.append(f"{an}: brut {brut_m:.0f} EUR < SMIC {smic_ref:.0f} EUR")
+    anomalies_smic = [a for c in controles_annees for a in c["smic"]]
     social_checks.append(_audit_check(
         f"Respect du SMIC par annee ({annee_debut}-{annee_fin})",
         "Art. L.3231-2 CT - Art. D.3231-3 CT",
@@ -7891,19 +6920,7 @@ async def knowledge_audit(
     ))
 
     # 56. Controle pluri-annuel : coherence taux cotisations par annee
-    taux_anomalies = []
-    for an in periode_controle:
-        pass_ref = _cst(an, "pass")
-        if pass_ref > 0:
-            for cot in kb["cotisations"]:
-                cot_an = 0
-                try:
-                    cot_an = int(str(cot.get("periode", ""))[:4])
-                except (ValueError, TypeError):
-                    pass
-                if cot_an == an and cot.get("base_plafonnee", 0) > 0:
-                    if cot["base_plafonnee"] > pass_ref * 1.05:
-                        taux_anomalies.append(f"{an}: assiette {cot.get('code','?')} {cot['base_plafonnee']:.0f} > PASS {pass_ref}")
+    taux_anomalies = [a for c in controles_annees for a in c["plafonds"]]
     social_checks.append(_audit_check(
         f"Coherence plafonds de cotisations par annee ({annee_debut}-{annee_fin})",
         "Art. L.241-3 CSS - Art. D.242-4 CSS",
@@ -8334,7 +7351,7 @@ async def finaliser_invitation(
             if inv["statut"] == "active":
                 return HTMLResponse("<h2>Ce lien a deja ete utilise.</h2>", 400)
             try:
-                user = create_user(
+                user = await create_user_async(
                     inv["email"], mot_de_passe,
                     nom=inv.get("email", "").split("@")[0],
                     prenom="",
@@ -8434,46 +7451,27 @@ async def creer_contrat(
     nir: str = Form(""),
 ):
     """Cree un contrat de travail avec toutes les mentions legales obligatoires (Code du travail L.1221-1 et suivants)."""
+    from starlette.concurrency import run_in_threadpool
     contrat_id = str(uuid.uuid4())[:8]
     salarie_id = str(uuid.uuid4())[:8]
 
-    # Detection de doublons par Nom/Prenom et NIR
+    # Detection de doublons par NIR et Nom/Prenom (accents, fautes de frappe, inversion)
     nir_value = nir.strip() if nir else ""
     doublons_detectes = []
-    nom_norm = nom_salarie.strip().lower()
-    prenom_norm = prenom_salarie.strip().lower()
-
-    for c in _rh_contrats:
-        c_nom = c.get("nom_salarie", "").strip().lower()
-        c_prenom = c.get("prenom_salarie", "").strip().lower()
-        c_nir = c.get("nir", "")
-
-        # Match par NIR (plus fiable)
-        if nir_value and c_nir and nir_value.replace(" ", "") == c_nir.replace(" ", ""):
-            doublons_detectes.append({
-                "id": c["id"],
-                "nom": c.get("nom_salarie", ""),
-                "prenom": c.get("prenom_salarie", ""),
-                "poste": c.get("poste", ""),
-                "type_contrat": c.get("type_contrat", ""),
-                "date_debut": c.get("date_debut", ""),
-                "motif": "nir_identique",
-                "nir": c_nir,
-            })
-            continue
-
-        # Match par nom + prenom (insensible a la casse)
-        if c_nom == nom_norm and c_prenom == prenom_norm:
-            doublons_detectes.append({
-                "id": c["id"],
-                "nom": c.get("nom_salarie", ""),
-                "prenom": c.get("prenom_salarie", ""),
-                "poste": c.get("poste", ""),
-                "type_contrat": c.get("type_contrat", ""),
-                "date_debut": c.get("date_debut", ""),
-                "motif": "nom_prenom_identique",
-                "nir": c_nir,
-            })
+    proches = await run_in_threadpool(_rechercher_contrats, nom_salarie, prenom_salarie, nir_value)
+    for fiche, score, motif in proches:
+        c = fiche.enregistrement
+        doublons_detectes.append({
+            "id": c["id"],
+            "nom": c.get("nom_salarie", ""),
+            "prenom": c.get("prenom_salarie", ""),
+            "poste": c.get("poste", ""),
+            "type_contrat": c.get("type_contrat", ""),
+            "date_debut": c.get("date_debut", ""),
+            "motif": motif,
+            "score": score,
+            "nir": c.get("nir", ""),
+        })
 
     # Validation du type de contrat
     types_valides = ("CDI", "CDD", "CTT", "Apprentissage", "Professionnalisation", "Saisonnier", "Intermittent")
@@ -8617,6 +7615,7 @@ async def creer_contrat(
         cascading["visite_medicale"] = {"date_limite": date_limite_visite, "reference": "Art. R.4624-10 CT"}
     except (ValueError, TypeError):
         pass
+    _generation_kb.incrementer()
 
     # 3. Planning : suggestion sans auto-creation
     # Le planning doit etre cree manuellement par l'utilisateur
@@ -8643,7 +7642,7 @@ async def creer_contrat(
                 LigneEcriture(compte="431000", libelle=f"Charges salariales {prenom_salarie} {nom_salarie}", debit=Decimal("0"), credit=Decimal(str(round(brut - net_estime, 2)))),
             ],
         )
-        moteur.ecritures.append(provision)
+        moteur.ajouter_ecriture(provision)
         cascading["ecriture_comptable"] = {"id": provision.id, "montant_brut": brut}
     except Exception:
         pass
@@ -8662,79 +7661,119 @@ async def creer_contrat(
     return contrat
 
 
-@app.get("/api/rh/doublons")
-async def detecter_doublons_salaries():
-    """Detecte les doublons potentiels parmi les salaries (par Nom/Prenom et NIR)."""
-    doublons = []
-    seen_noms = {}  # (nom_lower, prenom_lower) -> [contrats]
-    seen_nirs = {}  # nir -> [contrats]
+def _identite_contrat(c: dict) -> tuple:
+    return (c.get("id", ""), c.get("nom_salarie", "") or c.get("nom", ""),
+            c.get("prenom_salarie", "") or c.get("prenom", ""), c.get("nir", ""), c)
 
-    for c in _rh_contrats:
-        nom = c.get("nom_salarie", "").strip().lower()
-        prenom = c.get("prenom_salarie", "").strip().lower()
-        nir = c.get("nir", "").strip()
-
-        # Detection par nom + prenom
-        if nom and prenom:
-            cle = (nom, prenom)
-            if cle not in seen_noms:
-                seen_noms[cle] = []
-            seen_noms[cle].append(c)
-
-        # Detection par NIR
-        if nir and not nir.startswith("unknown_"):
-            if nir not in seen_nirs:
-                seen_nirs[nir] = []
-            seen_nirs[nir].append(c)
-
-    # Collecter les doublons par nom/prenom
-    for cle, contrats in seen_noms.items():
-        if len(contrats) > 1:
-            doublons.append({
-                "type": "nom_prenom",
-                "valeur": f"{contrats[0].get('prenom_salarie', '')} {contrats[0].get('nom_salarie', '')}",
-                "nb_occurrences": len(contrats),
-                "fiches": [{
-                    "id": c["id"],
-                    "nom": c.get("nom_salarie", ""),
-                    "prenom": c.get("prenom_salarie", ""),
-                    "poste": c.get("poste", ""),
-                    "type_contrat": c.get("type_contrat", ""),
-                    "date_debut": c.get("date_debut", ""),
-                    "nir": c.get("nir", ""),
-                    "source": c.get("source", ""),
-                    "salaire_brut": c.get("salaire_brut", "0"),
-                } for c in contrats],
-            })
 
-    # Collecter les doublons par NIR
-    for nir, contrats in seen_nirs.items():
-        if len(contrats) > 1:
-            # Verifier que ce n'est pas deja couvert par le doublon nom/prenom
-            deja_couvert = False
-            for d in doublons:
-                ids_existants = {f["id"] for f in d["fiches"]}
-                ids_nir = {c["id"] for c in contrats}
-                if ids_nir.issubset(ids_existants):
-                    deja_couvert = True
-                    break
-            if not deja_couvert:
-                doublons.append({
-                    "type": "nir",
-                    "valeur": nir,
-                    "nb_occurrences": len(contrats),
-                    "fiches": [{
-                        "id": c["id"],
-                        "nom": c.get("nom_salarie", ""),
-                        "prenom": c.get("prenom_salarie", ""),
-                        "poste": c.get("poste", ""),
-                        "type_contrat": c.get("type_contrat", ""),
-                        "date_debut": c.get("date_debut", ""),
-                        "nir": c.get("nir", ""),
-                        "source": c.get("source", ""),
-                        "salaire_brut": c.get("salaire_brut", "0"),
-                    } for c in contrats],
-                })
+def _salaries_planning_seuls():
+    # Salaries saisis uniquement dans le planning (comme dans liste_salaries)
+    connus = set(_biblio_knowledge.get("salaries", {}))
+    for c in list(_rh_contrats):
+        connus.add(c.get("salarie_id", "") or c.get("id", ""))
+    vus = set()
+    for p in list(_rh_planning):
+        sid = p.get("salarie_id", "")
+        if sid and sid not in connus and sid not in vus:
+            vus.add(sid)
+            yield sid, p.get("salarie_nom", sid), "", "", p
+
+
+def _identites_salaries(sources=("contrat",)) -> IndexIdentites:
+    """Index des identites, resynchronise sur la generation des donnees pour les sources demandees.
+
+    A appeler sous _verrou_identites, dans un thread (run_in_threadpool) : la
+    premiere synchronisation indexe toutes les fiches. Les stores, modifies
+    par la boucle d'evenements, sont lus sur une copie.
+    """
+    version = _generation_donnees.empreinte()
+    if "contrat" in sources:
+        _identites.synchroniser("contrat", version, lambda: map(_identite_contrat, list(_rh_contrats)))
+    if "connaissances" in sources:
+        _identites.synchroniser("connaissances", version, lambda: (
+            (nir, sal.get("nom", ""), sal.get("prenom", ""), nir, sal)
+            for nir, sal in list(_biblio_knowledge.get("salaries", {}).items())
+        ))
+    if "planning" in sources:
+        _identites.synchroniser("planning", version, _salaries_planning_seuls)
+    return _identites
+
+
+def _indexer_identites() -> None:
+    """Construction de l'index au demarrage du worker (thread de fond)."""
+    with _verrou_identites:
+        _identites_salaries(_SOURCES_IDENTITES)
+
+
+def _rechercher_contrats(nom: str, prenom: str, nir: str) -> list:
+    with _verrou_identites:
+        return _identites_salaries().rechercher(nom, prenom, nir, sources=("contrat",))
+
+
+def _groupes_doublons(sources: tuple) -> list[dict]:
+    with _verrou_identites:
+        return _identites_salaries(sources).doublons(sources)
+
+
+def _fiche_doublon(identite) -> dict:
+    source, ident = identite.ref
+    e = identite.enregistrement
+    if source == "contrat":
+        return {
+            "id": e["id"],
+            "nom": e.get("nom_salarie", ""),
+            "prenom": e.get("prenom_salarie", ""),
+            "poste": e.get("poste", ""),
+            "type_contrat": e.get("type_contrat", ""),
+            "date_debut": e.get("date_debut", ""),
+            "nir": e.get("nir", ""),
+            "source": e.get("source", ""),
+            "salaire_brut": e.get("salaire_brut", "0"),
+            "origine": "contrat_rh",
+        }
+    if source == "connaissances":
+        return {
+            "id": ident, "nom": e.get("nom", ""), "prenom": e.get("prenom", ""), "poste": "",
+            "type_contrat": "", "date_debut": "", "nir": "" if ident.startswith("unknown_") else ident,
+            "source": "analyse_documents", "salaire_brut": e.get("dernier_brut", 0), "origine": "analyse_documents",
+        }
+    return {
+        "id": ident, "nom": e.get("salarie_nom", ident), "prenom": "", "poste": "", "type_contrat": "",
+        "date_debut": "", "nir": "", "source": "planning_manuel", "salaire_brut": 0, "origine": "planning_manuel",
+    }
+
+
+@app.get("/api/rh/doublons")
+async def detecter_doublons_salaries(
+    etendu: bool = Query(False, description="Inclure les salaries de la base de connaissances et du planning"),
+):
+    """Detecte les doublons potentiels parmi les salaries.
+
+    Rapprochement par NIR (cle de controle ignoree) et par Nom/Prenom :
+    identiques, ou proches (accents, fautes de frappe, nom et prenom
+    inverses). Par defaut sur les contrats RH (fiches fusionnables) ;
+    etendu=true inclut base de connaissances et planning.
+    """
+    from starlette.concurrency import run_in_threadpool
+    sources = _SOURCES_IDENTITES if etendu else ("contrat",)
+    doublons = []
+    for groupe in await run_in_threadpool(_groupes_doublons, sources):
+        fiches = [_fiche_doublon(identite) for identite in groupe["fiches"]]
+        motifs = groupe["motifs"]
+        if motifs == ["nir_identique"]:
+            type_doublon = "nir"
+            valeur = next((f["nir"].strip() for f in fiches if f["nir"]), "")
+        else:
+            type_doublon = "nom_prenom_proche" if "nom_prenom_proche" in motifs else "nom_prenom"
+            valeur = f"{fiches[0]['prenom']} {fiches[0]['nom']}".strip()
+        doublons.append({
+            "type": type_doublon,
+            "valeur": valeur,
+            "nb_occurrences": len(fiches),
+            "score": groupe["score"],
+            "motifs": motifs,
+            "fiches": fiches,
+        })
 
     return {
         "nb_doublons": len(doublons),
@@ -8783,6 +7822,7 @@ async def fusionner_doublons(request: Request):
     # Supprimer la fiche doublon
     if idx_supprimer >= 0:
         _rh_contrats.pop(idx_supprimer)
+    _generation_kb.incrementer()
 
     log_action("utilisateur", "fusion_doublons", f"Garde {id_garder}, supprime {id_supprimer}")
     return {
@@ -8830,6 +7870,7 @@ async def modifier_contrat(contrat_id: str, request: Request):
     if "verifie" in form:
         contrat["verifie"] = form["verifie"] in ("true", "True", "1")
     contrat["date_modification"] = datetime.now().isoformat()
+    _generation_kb.incrementer()
     log_action("utilisateur", "modification_contrat", f"{contrat.get('prenom_salarie','')} {contrat.get('nom_salarie','')} ({contrat_id})")
     return contrat
 
@@ -9218,6 +8259,64 @@ td{{padding:6px 12px;border-bottom:1px solid #e2e8f0;font-size:.88em}}.num{{text
 
 _sous_comptes: list[dict] = []
 
+# Guide par mots-cles en langage naturel (pour les non-comptables)
+_GUIDE_COMPTES = {
+    "loyer": [("613000", "Locations", "Loyers et charges locatives de vos locaux professionnels")],
+    "location": [("613000", "Locations", "Loyers de bureaux, ateliers, entrepots"), ("612000", "Redevances de credit-bail", "Leasing de materiel ou vehicules")],
+    "electricite": [("606100", "Fournitures non stockables (eau, energie)", "Factures EDF, eau, gaz pour vos locaux")],
+    "eau": [("606100", "Fournitures non stockables (eau, energie)", "Factures d'eau et d'energie")],
+    "gaz": [("606100", "Fournitures non stockables (eau, energie)", "Factures de gaz et d'energie")],
+    "energie": [("606100", "Fournitures non stockables (eau, energie)", "Toutes les factures d'energie (EDF, gaz, eau)")],
+    "telephone": [("626000", "Frais postaux et de telecommunications", "Factures de telephone, internet, abonnements telecom")],
+    "internet": [("626000", "Frais postaux et de telecommunications", "Abonnement internet, fibre, services cloud")],
+    "assurance": [("616000", "Primes d'assurances", "Assurance RC pro, locaux, vehicules, multirisque")],
+    "salaire": [("641100", "Salaires, appointements", "Salaires bruts verses aux employes")],
+    "paie": [("641100", "Salaires, appointements", "Salaires bruts mensuels des salaries")],
+    "remuneration": [("641100", "Salaires, appointements", "Remunerations brutes du personnel")],
+    "cotisation": [("645100", "Cotisations URSSAF", "Cotisations sociales URSSAF patronales"), ("645300", "Cotisations retraite complementaire", "Cotisations AGIRC-ARRCO")],
+    "urssaf": [("645100", "Cotisations URSSAF", "Charges patronales URSSAF"), ("431000", "Securite sociale (URSSAF)", "Dette URSSAF a payer")],
+    "banque": [("512000", "Banque", "Compte bancaire principal de l'entreprise"), ("627000", "Services bancaires et assimiles", "Frais et commissions bancaires")],
+    "frais bancaire": [("627000", "Services bancaires et assimiles", "Commissions, frais de tenue de compte, agios")],
+    "achat": [("607000", "Achats de marchandises", "Marchandises achetees pour revente"), ("601000", "Achats de matieres premieres", "Matieres premieres pour la production"), ("606000", "Achats non stockes de matieres et fournitures", "Fournitures consommables")],
+    "marchandise": [("607000", "Achats de marchandises", "Marchandises destinees a la revente")],
+    "fourniture": [("606000", "Achats non stockes de matieres et fournitures", "Fournitures de bureau, consommables"), ("606400", "Fournitures administratives", "Papeterie, cartouches, petit materiel de bureau")],
+    "materiel": [("218100", "Materiel de bureau et informatique", "Ordinateurs, imprimantes, mobilier (immobilisations > 500 EUR)"), ("606300", "Fournitures d'entretien et petit equipement", "Petit materiel < 500 EUR (charge directe)")],
+    "informatique": [("218100", "Materiel de bureau et informatique", "Ordinateurs, serveurs, logiciels (immobilisations)"), ("606400", "Fournitures administratives", "Petit materiel informatique < 500 EUR")],
+    "vehicule": [("218200", "Materiel de transport", "Achat de vehicule (immobilisation)"), ("625000", "Deplacements, missions et receptions", "Frais de deplacement, carburant, peages")],
+    "voiture": [("218200", "Materiel de transport", "Achat de vehicule professionnel"), ("625000", "Deplacements, missions et receptions", "Frais de route, carburant")],
+    "carburant": [("625000", "Deplacements, missions et receptions", "Carburant, peages, parking professionnel")],
+    "deplacement": [("625000", "Deplacements, missions et receptions", "Frais de transport, hotel, repas en deplacement")],
+    "restaurant": [("625000", "Deplacements, missions et receptions", "Repas d'affaires, frais de reception")],
+    "hotel": [("625000", "Deplacements, missions et receptions", "Frais d'hebergement en deplacement professionnel")],
+    "vente": [("707000", "Ventes de marchandises", "Ventes de biens et marchandises"), ("706000", "Prestations de services", "Ventes de services et prestations")],
+    "prestation": [("706000", "Prestations de services", "Facturation de services rendus aux clients")],
+    "service": [("706000", "Prestations de services", "Prestations de services facturees"), ("604000", "Achats d'etudes et prestations de services", "Prestations de services achetees a des tiers")],
+    "client": [("411000", "Clients", "Creances dues par vos clients"), ("707000", "Ventes de marchandises", "Chiffre d'affaires ventes")],
+    "fournisseur": [("401000", "Fournisseurs", "Dettes envers vos fournisseurs")],
+    "honoraire": [("622000", "Remunerations d'intermediaires et honoraires", "Honoraires d'avocat, comptable, consultant")],
+    "comptable": [("622600", "Honoraires comptables", "Honoraires de l'expert-comptable")],
+    "avocat": [("622700", "Frais d'actes et de contentieux", "Honoraires d'avocats et frais juridiques")],
+    "publicite": [("623000", "Publicite, publications, relations publiques", "Frais de publicite, communication, marketing")],
+    "marketing": [("623000", "Publicite, publications, relations publiques", "Campagnes marketing, reseaux sociaux, flyers")],
+    "entretien": [("615000", "Entretien et reparations", "Travaux d'entretien et de reparation des locaux/materiel")],
+    "reparation": [("615000", "Entretien et reparations", "Reparations de materiel, locaux, equipements")],
+    "tva": [("445660", "TVA deductible sur autres biens et services", "TVA recuperable sur vos achats"), ("445710", "TVA collectee", "TVA facturee a vos clients")],
+    "impot": [("695000", "Impots sur les benefices", "IS ou IR sur les benefices de l'entreprise"), ("635100", "Contribution economique territoriale (CET)", "CFE + CVAE")],
+    "sous-traitance": [("611000", "Sous-traitance generale", "Travaux sous-traites a d'autres entreprises")],
+    "formation": [("618000", "Divers (documentation, colloques...)", "Frais de formation professionnelle, conferences"), ("631300", "Participation formation continue", "Contribution formation professionnelle obligatoire")],
+    "mutuelle": [("645200", "Cotisations aux mutuelles", "Part patronale de la mutuelle obligatoire"), ("437220", "Mutuelle obligatoire", "Dette mutuelle a payer")],
+    "prevoyance": [("645200", "Cotisations aux mutuelles", "Cotisations de prevoyance complementaire"), ("437210", "Prevoyance complementaire", "Dette prevoyance a payer")],
+    "retraite": [("645300", "Cotisations retraite complementaire", "Cotisations AGIRC-ARRCO patronales"), ("437100", "Retraite complementaire (AGIRC-ARRCO)", "Dette retraite complementaire")],
+    "amortissement": [("681000", "Dotations aux amortissements et provisions - Exploitation", "Amortissement annuel des immobilisations")],
+    "capital": [("101000", "Capital social", "Capital social de la societe")],
+    "emprunt": [("661000", "Charges d'interets", "Interets d'emprunts bancaires")],
+    "dividende": [("455000", "Associes - Comptes courants", "Distribution de dividendes aux associes")],
+    "caisse": [("530000", "Caisse", "Paiements et encaissements en especes")],
+    "espece": [("530000", "Caisse", "Mouvements de caisse en especes")],
+    "attente": [("471000", "Compte d'attente", "Ecriture temporaire en attente de justificatif ou d'affectation definitive")],
+    "provision": [("681000", "Dotations aux amortissements et provisions - Exploitation", "Constitution de provisions pour risques et charges")],
+}
+
 
 @app.get("/api/comptabilite/suggestions")
 async def suggestions_comptes(compte: str = Query(""), description: str = Query("")):
@@ -9227,68 +8326,10 @@ async def suggestions_comptes(compte: str = Query(""), description: str = Query(
     (ex: 'loyer', 'achat fournitures', 'salaire') pour guider les utilisateurs
     ne connaissant pas le plan comptable.
     """
-    pc = PlanComptable()
+    pc = get_plan_reference()
     suggestions = []
     contreparties = []
 
-    # Guide par mots-cles en langage naturel (pour les non-comptables)
-    _GUIDE_COMPTES = {
-        "loyer": [("613000", "Locations", "Loyers et charges locatives de vos locaux professionnels")],
-        "location": [("613000", "Locations", "Loyers de bureaux, ateliers, entrepots"), ("612000", "Redevances de credit-bail", "Leasing de materiel ou vehicules")],
-        "electricite": [("606100", "Fournitures non stockables (eau, energie)", "Factures EDF, eau, gaz pour vos locaux")],
-        "eau": [("606100", "Fournitures non stockables (eau, energie)", "Factures d'eau et d'energie")],
-        "gaz": [("606100", "Fournitures non stockables (eau, energie)", "Factures de gaz et d'energie")],
-        "energie": [("606100", "Fournitures non stockables (eau, energie)", "Toutes les factures d'energie (EDF, gaz, eau)")],
-        "telephone": [("626000", "Frais postaux et de telecommunications", "Factures de telephone, internet, abonnements telecom")],
-        "internet": [("626000", "Frais postaux et de telecommunications", "Abonnement internet, fibre, services cloud")],
-        "assurance": [("616000", "Primes d'assurances", "Assurance RC pro, locaux, vehicules, multirisque")],
-        "salaire": [("641100", "Salaires, appointements", "Salaires bruts verses aux employes")],
-        "paie": [("641100", "Salaires, appointements", "Salaires bruts mensuels des salaries")],
-        "remuneration": [("641100", "Salaires, appointements", "Remunerations brutes du personnel")],
-        "cotisation": [("645100", "Cotisations URSSAF", "Cotisations sociales URSSAF patronales"), ("645300", "Cotisations retraite complementaire", "Cotisations AGIRC-ARRCO")],
-        "urssaf": [("645100", "Cotisations URSSAF", "Charges patronales URSSAF"), ("431000", "Securite sociale (URSSAF)", "Dette URSSAF a payer")],
-        "banque": [("512000", "Banque", "Compte bancaire principal de l'entreprise"), ("627000", "Services bancaires et assimiles", "Frais et commissions bancaires")],
-        "frais bancaire": [("627000", "Services bancaires et assimiles", "Commissions, frais de tenue de compte, agios")],
-        "achat": [("607000", "Achats de marchandises", "Marchandises achetees pour revente"), ("601000", "Achats de matieres premieres", "Matieres premieres pour la production"), ("606000", "Achats non stockes de matieres et fournitures", "Fournitures consommables")],
-        "marchandise": [("607000", "Achats de marchandises", "Marchandises destinees a la revente")],
-        "fourniture": [("606000", "Achats non stockes de matieres et fournitures", "Fournitures de bureau, consommables"), ("606400", "Fournitures administratives", "Papeterie, cartouches, petit materiel de bureau")],
-        "materiel": [("218100", "Materiel de bureau et informatique", "Ordinateurs, imprimantes, mobilier (immobilisations > 500 EUR)"), ("606300", "Fournitures d'entretien et petit equipement", "Petit materiel < 500 EUR (charge directe)")],
-        "informatique": [("218100", "Materiel de bureau et informatique", "Ordinateurs, serveurs, logiciels (immobilisations)"), ("606400", "Fournitures administratives", "Petit materiel informatique < 500 EUR")],
-        "vehicule": [("218200", "Materiel de transport", "Achat de vehicule (immobilisation)"), ("625000", "Deplacements, missions et receptions", "Frais de deplacement, carburant, peages")],
-        "voiture": [("218200", "Materiel de transport", "Achat de vehicule professionnel"), ("625000", "Deplacements, missions et receptions", "Frais de route, carburant")],
-        "carburant": [("625000", "Deplacements, missions et receptions", "Carburant, peages, parking professionnel")],
-        "deplacement": [("625000", "Deplacements, missions et receptions", "Frais de transport, hotel, repas en deplacement")],
-        "restaurant": [("625000", "Deplacements, missions et receptions", "Repas d'affaires, frais de reception")],
-        "hotel": [("625000", "Deplacements, missions et receptions", "Frais d'hebergement en deplacement professionnel")],
-        "vente": [("707000", "Ventes de marchandises", "Ventes de biens et marchandises"), ("706000", "Prestations de services", "Ventes de services et prestations")],
-        "prestation": [("706000", "Prestations de services", "Facturation de services rendus aux clients")],
-        "service": [("706000", "Prestations de services", "Prestations de services facturees"), ("604000", "Achats d'etudes et prestations de services", "Prestations de services achetees a des tiers")],
-        "client": [("411000", "Clients", "Creances dues par vos clients"), ("707000", "Ventes de marchandises", "Chiffre d'affaires ventes")],
-        "fournisseur": [("401000", "Fournisseurs", "Dettes envers vos fournisseurs")],
-        "honoraire": [("622000", "Remunerations d'intermediaires et honoraires", "Honoraires d'avocat, comptable, consultant")],
-        "comptable": [("622600", "Honoraires comptables", "Honoraires de l'expert-comptable")],
-        "avocat": [("622700", "Frais d'actes et de contentieux", "Honoraires d'avocats et frais juridiques")],
-        "publicite": [("623000", "Publicite, publications, relations publiques", "Frais de publicite, communication, marketing")],
-        "marketing": [("623000", "Publicite, publications, relations publiques", "Campagnes marketing, reseaux sociaux, flyers")],
-        "entretien": [("615000", "Entretien et reparations", "Travaux d'entretien et de reparation des locaux/materiel")],
-        "reparation": [("615000", "Entretien et reparations", "Reparations de materiel, locaux, equipements")],
-        "tva": [("445660", "TVA deductible sur autres biens et services", "TVA recuperable sur vos achats"), ("445710", "TVA collectee", "TVA facturee a vos clients")],
-        "impot": [("695000", "Impots sur les benefices", "IS ou IR sur les benefices de l'entreprise"), ("635100", "Contribution economique territoriale (CET)", "CFE + CVAE")],
-        "sous-traitance": [("611000", "Sous-traitance generale", "Travaux sous-traites a d'autres entreprises")],
-        "formation": [("618000", "Divers (documentation, colloques...)", "Frais de formation professionnelle, conferences"), ("631300", "Participation formation continue", "Contribution formation professionnelle obligatoire")],
-        "mutuelle": [("645200", "Cotisations aux mutuelles", "Part patronale de la mutuelle obligatoire"), ("437220", "Mutuelle obligatoire", "Dette mutuelle a payer")],
-        "prevoyance": [("645200", "Cotisations aux mutuelles", "Cotisations de prevoyance complementaire"), ("437210", "Prevoyance complementaire", "Dette prevoyance a payer")],
-        "retraite": [("645300", "Cotisations retraite complementaire", "Cotisations AGIRC-ARRCO patronales"), ("437100", "Retraite complementaire (AGIRC-ARRCO)", "Dette retraite complementaire")],
-        "amortissement": [("681000", "Dotations aux amortissements et provisions - Exploitation", "Amortissement annuel des immobilisations")],
-        "capital": [("101000", "Capital social", "Capital social de la societe")],
-        "emprunt": [("661000", "Charges d'interets", "Interets d'emprunts bancaires")],
-        "dividende": [("455000", "Associes - Comptes courants", "Distribution de dividendes aux associes")],
-        "caisse": [("530000", "Caisse", "Paiements et encaissements en especes")],
-        "espece": [("530000", "Caisse", "Mouvements de caisse en especes")],
-        "attente": [("471000", "Compte d'attente", "Ecriture temporaire en attente de justificatif ou d'affectation definitive")],
-        "provision": [("681000", "Dotations aux amortissements et provisions - Exploitation", "Constitution de provisions pour risques et charges")],
-    }
-
     terme = (description or compte or "").lower().strip()
 
     if terme:
@@ -9376,24 +8417,9 @@ async def creer_sous_compte(
     libelle: str = Form(...),
 ):
     """Cree un sous-compte du plan comptable (ex: 401001 pour fournisseur specifique)."""
-    pc = PlanComptable()
-
     # Verifier que le compte parent existe (au moins la racine)
     racine = compte_parent[:3]
-    parent_valide = False
-    try:
-        resultats = pc.rechercher(racine)
-        if resultats:
-            parent_valide = True
-    except Exception:
-        pass
-    if not parent_valide:
-        for cpt_num in pc.comptes:
-            if cpt_num.startswith(racine):
-                parent_valide = True
-                break
-
-    if not parent_valide:
+    if not get_plan_reference().rechercher(racine):
         raise HTTPException(400, f"Compte racine {racine} introuvable dans le plan comptable national")
 
     # Generer le prochain numero de sous-compte
@@ -9470,6 +8496,7 @@ async def importer_fec(file: UploadFile = File(...)):
                     par_num[num] = []
                 par_num[num].append(ec)
 
+            nouvelles = []
             for num, lignes_ec in par_num.items():
                 if not lignes_ec:
                     continue
@@ -9515,8 +8542,10 @@ async def importer_fec(file: UploadFile = File(...)):
                         piece_ref=l.get("piece_ref", ""),
                     ))
 
-                moteur.ecritures.append(ecriture)
-                ecritures_importees += 1
+                nouvelles.append(ecriture)
+
+            # Une seule transaction pour l'ensemble du fichier
+            ecritures_importees = moteur.stockage.ajouter_lot(nouvelles)
 
         # Retirer les ecritures brutes de la reponse (trop volumineux)
         result_meta = {k: v for k, v in (declarations[0].metadata or {}).items()
@@ -9534,19 +8563,79 @@ async def importer_fec(file: UploadFile = File(...)):
         tmp_path.unlink(missing_ok=True)
 
 
+@app.post("/api/fec/importer/masse")
+async def importer_fec_masse(
+    file: UploadFile = File(...),
+    progression: bool = Query(False, description="Diffuser la progression (NDJSON, une ligne par lot)"),
+):
+    """Charge un FEC volumineux directement dans le registre des ecritures.
+
+    Pas d'analyse de conformite (voir /api/fec/importer) : lecture en flux,
+    controle d'equilibre par ecriture et insertion par lots. Les ecritures
+    desequilibrees ou sans date valide sont rejetees et listees.
+    Avec `progression=true`, chaque lot insere produit une ligne JSON ;
+    la derniere porte `termine: true`.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from fastapi.responses import StreamingResponse
+    from urssaf_analyzer.comptabilite.fec_import import importer_fec_en_masse, iter_import_fec
+    from urssaf_analyzer.core.exceptions import ParseError
+
+    ext = Path(file.filename).suffix.lower() if file.filename else ".fec"
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False, mode="wb") as tmp:
+        while bloc := await file.read(1024 * 1024):
+            tmp.write(bloc)
+        tmp_path = Path(tmp.name)
+
+    moteur = get_moteur()
+
+    def _journaliser(resultat):
+        log_action("utilisateur", "import_fec_masse",
+                   f"{file.filename}: {resultat.ecritures_importees} ecritures importees, "
+                   f"{resultat.ecritures_rejetees} rejetees")
+
+    if not progression:
+        try:
+            resultat = await run_in_threadpool(importer_fec_en_masse, moteur, tmp_path)
+        except ParseError as e:
+            raise HTTPException(400, str(e))
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        _journaliser(resultat)
+        return {"ok": True, "fichier": file.filename, **resultat.to_dict()}
+
+    def _flux():
+        try:
+            for resultat in iter_import_fec(moteur, tmp_path):
+                etat = resultat.to_dict()
+                if not resultat.termine:
+                    etat.pop("erreurs")
+                else:
+                    _journaliser(resultat)
+                yield json.dumps(etat) + "\n"
+        except ParseError as e:
+            yield json.dumps({"termine": True, "erreur": str(e)}) + "\n"
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    return StreamingResponse(_flux(), media_type="application/x-ndjson")
+
+
 @app.get("/api/fec/exporter")
 async def exporter_fec_endpoint(
     siren: str = Query("", description="SIREN de l'entreprise (9 chiffres)"),
     date_cloture: Optional[str] = Query(None, description="Date de cloture (YYYY-MM-DD)"),
     validees_seulement: bool = Query(True, description="N'exporter que les ecritures validees"),
+    compresser: bool = Query(False, alias="zip", description="Compresser le fichier dans une archive ZIP"),
 ):
     """Exporte les ecritures comptables au format FEC reglementaire.
 
     Genere un fichier conforme a l'art. L.47 A-I LPF, telechargeable directement.
-    Nom de fichier : {SIREN}FEC{YYYYMMDD}.txt
+    Nom de fichier : {SIREN}FEC{YYYYMMDD}.txt (.zip si compresse).
+    Le fichier est diffuse par blocs au fil de la lecture du registre.
     """
-    from urssaf_analyzer.comptabilite.fec_export import exporter_fec, nom_fichier_fec
-    from fastapi.responses import Response
+    from urssaf_analyzer.comptabilite.fec_export import iter_fec, nom_fichier_fec, zipper_flux
+    from fastapi.responses import StreamingResponse
 
     moteur = get_moteur()
     if not moteur.ecritures:
@@ -9559,14 +8648,19 @@ async def exporter_fec_endpoint(
         except ValueError:
             raise HTTPException(400, "Format de date invalide (attendu: YYYY-MM-DD)")
 
-    contenu = exporter_fec(moteur, siren=siren, date_cloture=dt_cloture,
-                            validees_seulement=validees_seulement)
     filename = nom_fichier_fec(siren, dt_cloture)
+    flux = iter_fec(moteur, siren=siren, date_cloture=dt_cloture,
+                    validees_seulement=validees_seulement, encodage="utf-8-sig")
+    media_type = "text/plain; charset=utf-8"
+    if compresser:
+        flux = zipper_flux(flux, filename)
+        filename = filename.rsplit(".", 1)[0] + ".zip"
+        media_type = "application/zip"
 
     log_action("utilisateur", "export_fec", f"Export FEC: {filename}")
-    return Response(
-        content=contenu.encode("utf-8-sig"),
-        media_type="text/plain; charset=utf-8",
+    return StreamingResponse(
+        flux,
+        media_type=media_type,
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"',
             "X-FEC-Siren": siren or "000000000",
@@ -9872,6 +8966,7 @@ async def enregistrer_conge(
     }
 
     _rh_conges.append(conge)
+    _generation_kb.incrementer()
     log_action("utilisateur", "enregistrement_conge", f"{type_conge} salarie {effective_salarie_id} du {date_debut} au {date_fin}")
     return conge
 
@@ -10304,6 +9399,7 @@ async def enregistrer_entretien(
     }
 
     _rh_entretiens.append(entretien)
+    _generation_kb.incrementer()
     log_action("utilisateur", "enregistrement_entretien", f"{type_entretien} salarie {salarie_id} le {date_entretien}")
     return entretien
 
@@ -10397,6 +9493,7 @@ async def enregistrer_visite_medicale(
     }
 
     _rh_visites_med.append(visite)
+    _generation_kb.incrementer()
     log_action("utilisateur", "enregistrement_visite_medicale", f"{type_visite} salarie {salarie_id} - {resultat}")
     return visite
 
@@ -10411,1041 +9508,150 @@ async def liste_visites_medicales(offset: int = Query(0, ge=0), limit: int = Que
 # RH - ALERTES (calcul dynamique)
 # ======================================================================
 
+def _donnees_alertes_rh() -> DonneesRH:
+    # 4k. DAS-2 : des qu'une piece comptable est connue
+    das2 = bool(_biblio_knowledge.get("documents_comptables")) or any(
+        d.get("nature") in ("facture_achat", "facture_vente", "note_frais") for d in _doc_library
+    )
+    return DonneesRH(_rh_contrats, _rh_entretiens, _rh_visites_med, _rh_arrets, _rh_conges, _rh_sanctions, das2)
+
+
 @app.get("/api/rh/alertes")
 async def get_rh_alertes():
     """Calcule et retourne les alertes RH basees sur les echeances.
 
     Verifie: fin CDD, entretiens professionnels, visites medicales,
     prevoyance, interessement, declarations, periodes d'essai.
+    Les echeances sont indexees par rh.alertes.MoteurAlertesRH, mis a jour
+    a chaque ecriture : la consultation est une requete sur l'index.
     """
-    alertes = []
     aujourdhui = date.today()
+    _moteur_alertes_rh.synchroniser(_generation_donnees.empreinte(), _donnees_alertes_rh)
+    alertes = _moteur_alertes_rh.alertes(aujourdhui)
 
-    # --- 1. CDD arrivant a echeance dans les 30 jours ---
-    for contrat in _rh_contrats:
-        if contrat["type_contrat"] == "CDD" and contrat.get("date_fin"):
-            try:
-                fin = date.fromisoformat(contrat["date_fin"])
-                jours_restants = (fin - aujourdhui).days
-                if 0 <= jours_restants <= 30:
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "fin_cdd",
-                        "urgence": "haute" if jours_restants <= 7 else "moyenne",
-                        "message": (
-                            f"CDD de {contrat['prenom_salarie']} {contrat['nom_salarie']} "
-                            f"({contrat['poste']}) expire dans {jours_restants} jour(s) "
-                            f"(le {contrat['date_fin']})"
-                        ),
-                        "reference": "Art. L.1243-5 CT - Le CDD cesse de plein droit a l'echeance du terme",
-                        "action_requise": "Renouveler, transformer en CDI, ou preparer les documents de fin de contrat",
-                        "contrat_id": contrat["id"],
-                        "date_echeance": contrat["date_fin"],
-                    })
-            except (ValueError, TypeError):
-                pass
-
-    # --- 2. Entretiens professionnels en retard (tous les 2 ans) ---
-    # Collecter le dernier entretien par salarie
-    derniers_entretiens: dict[str, str] = {}
-    for ent in _rh_entretiens:
-        if ent["type_entretien"] in ("professionnel_2ans", "bilan_6ans"):
-            sid = ent["salarie_id"]
-            if sid not in derniers_entretiens or ent["date_entretien"] > derniers_entretiens[sid]:
-                derniers_entretiens[sid] = ent["date_entretien"]
-
-    for contrat in _rh_contrats:
-        if contrat["statut"] != "actif":
+    # --- 5bis. Alertes libres de l'utilisateur ---
+    for al in _alertes_libres:
+        if not al.get("actif", True) or al.get("statut") == "archivee":
             continue
-        sid = contrat["salarie_id"]
-        dernier = derniers_entretiens.get(sid)
-        if dernier:
-            try:
-                date_dernier = date.fromisoformat(dernier)
-                jours_depuis = (aujourdhui - date_dernier).days
-                if jours_depuis > 730:  # > 2 ans
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "entretien_professionnel_retard",
-                        "urgence": "haute",
-                        "message": (
-                            f"Entretien professionnel en retard pour {contrat['prenom_salarie']} "
-                            f"{contrat['nom_salarie']} - dernier entretien il y a {jours_depuis} jours"
-                        ),
-                        "reference": "Art. L.6315-1 CT - Entretien professionnel tous les 2 ans",
-                        "action_requise": "Planifier un entretien professionnel dans les meilleurs delais",
-                        "salarie_id": sid,
-                    })
-            except (ValueError, TypeError):
-                pass
-        else:
-            # Aucun entretien enregistre : verifier si le contrat a plus de 2 ans
+        urgence_libre = al.get("urgence", "moyenne")
+        # Ajuster urgence si echeance proche
+        if al.get("date_echeance"):
             try:
-                date_debut = date.fromisoformat(contrat["date_debut"])
-                anciennete_jours = (aujourdhui - date_debut).days
-                if anciennete_jours > 730:
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "entretien_professionnel_manquant",
-                        "urgence": "haute",
-                        "message": (
-                            f"Aucun entretien professionnel enregistre pour {contrat['prenom_salarie']} "
-                            f"{contrat['nom_salarie']} (anciennete: {anciennete_jours} jours)"
-                        ),
-                        "reference": "Art. L.6315-1 CT - Entretien professionnel tous les 2 ans",
-                        "action_requise": "Planifier un entretien professionnel immediatement",
-                        "salarie_id": sid,
-                    })
+                ech = date.fromisoformat(al["date_echeance"])
+                jours_avant = (ech - aujourdhui).days
+                if jours_avant < 0:
+                    urgence_libre = "haute"
+                elif jours_avant <= al.get("delai_rappel_jours", 7):
+                    urgence_libre = "haute" if jours_avant <= 3 else "moyenne"
             except (ValueError, TypeError):
                 pass
-
-    # --- 3. Visites medicales en retard ---
-    dernieres_visites: dict[str, str] = {}
-    prochaines_visites: dict[str, str] = {}
-    for v in _rh_visites_med:
-        sid = v["salarie_id"]
-        if sid not in dernieres_visites or v["date_visite"] > dernieres_visites[sid]:
-            dernieres_visites[sid] = v["date_visite"]
-        if v.get("date_prochaine"):
-            if sid not in prochaines_visites or v["date_prochaine"] < prochaines_visites[sid]:
-                prochaines_visites[sid] = v["date_prochaine"]
-
-    for sid, date_prochaine in prochaines_visites.items():
-        try:
-            dp = date.fromisoformat(date_prochaine)
-            jours_restants = (dp - aujourdhui).days
-            if jours_restants < 0:
-                # Trouver le nom du salarie
-                nom_complet = sid
-                for c in _rh_contrats:
-                    if c["salarie_id"] == sid:
-                        nom_complet = f"{c['prenom_salarie']} {c['nom_salarie']}"
-                        break
-                alertes.append({
-                    "id": str(uuid.uuid4())[:8],
-                    "type": "visite_medicale_retard",
-                    "urgence": "haute",
-                    "message": (
-                        f"Visite medicale en retard pour {nom_complet} "
-                        f"(prevue le {date_prochaine}, retard: {abs(jours_restants)} jour(s))"
-                    ),
-                    "reference": "Art. R.4624-16 CT - Suivi individuel de l'etat de sante",
-                    "action_requise": "Prendre rendez-vous avec la medecine du travail",
-                    "salarie_id": sid,
-                })
-            elif jours_restants <= 30:
-                nom_complet = sid
-                for c in _rh_contrats:
-                    if c["salarie_id"] == sid:
-                        nom_complet = f"{c['prenom_salarie']} {c['nom_salarie']}"
-                        break
-                alertes.append({
-                    "id": str(uuid.uuid4())[:8],
-                    "type": "visite_medicale_a_planifier",
-                    "urgence": "moyenne",
-                    "message": (
-                        f"Visite medicale a planifier pour {nom_complet} "
-                        f"(echeance: {date_prochaine}, dans {jours_restants} jour(s))"
-                    ),
-                    "reference": "Art. R.4624-16 CT",
-                    "action_requise": "Prendre rendez-vous avec la medecine du travail",
-                    "salarie_id": sid,
-                })
-        except (ValueError, TypeError):
-            pass
-
-    # --- 4. Obligations legales selon effectif ---
-    nb_actifs = sum(1 for c in _rh_contrats if c.get("statut") == "actif")
-
-    # 4a. Prevoyance obligatoire cadres (ANI 17/11/2017)
-    nb_cadres = sum(1 for c in _rh_contrats if c.get("statut") == "actif" and "cadre" in (c.get("convention_collective", "") or "").lower())
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "prevoyance_obligatoire",
-            "urgence": "moyenne",
-            "titre": "Prevoyance obligatoire cadres",
-            "description": f"La prevoyance deces est obligatoire pour tous les cadres (ANI du 17/11/2017). Effectif actif: {nb_actifs}. Le non-respect expose l'employeur a la prise en charge des garanties sur ses fonds propres.",
-            "reference": "ANI du 17/11/2017 - Art. 7 CCN Cadres du 14/03/1947",
-            "action_requise": "Verifier la mise en place d'un contrat de prevoyance aupres d'un organisme assureur",
-            "echeance": "",
-            "incidence_legale": "En l'absence de contrat, l'employeur doit assumer sur ses fonds propres le versement du capital deces (3x plafond annuel SS) et le maintien de salaire.",
-        })
-
-    # 4b. Mutuelle obligatoire (ANI 14/06/2013 - Loi 2016)
-    if nb_actifs >= 1:
         alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "mutuelle_obligatoire",
-            "urgence": "moyenne",
-            "titre": "Complementaire sante obligatoire",
-            "description": f"Depuis le 01/01/2016, tous les employeurs doivent proposer une couverture complementaire sante collective. Part employeur min 50%. Effectif: {nb_actifs}.",
-            "reference": "Art. L.911-7 CSS - ANI du 11/01/2013 generalise par loi du 14/06/2013",
-            "action_requise": "Verifier la mise en place d'une complementaire sante avec participation employeur >= 50%",
-            "echeance": "",
-            "incidence_legale": "Amende et redressement URSSAF sur les contributions patronales (reintegration dans l'assiette de cotisations).",
-        })
-
-    # 4c. DUERP obligatoire (art. R.4121-1 CT)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "duerp_obligatoire",
-            "urgence": "moyenne",
-            "titre": "Document unique d'evaluation des risques (DUERP)",
-            "description": "Le DUERP est obligatoire des le 1er salarie. Mise a jour annuelle ou lors de tout changement significatif.",
-            "reference": "Art. R.4121-1 a R.4121-4 CT - Art. L.4121-3 CT",
-            "action_requise": "Verifier l'existence et la mise a jour du DUERP",
-            "echeance": "",
-            "incidence_legale": "Contravention de 5eme classe (1500 EUR). Responsabilite penale en cas d'accident du travail.",
+            "id": al["id"],
+            "type": al.get("type_alerte", "personnalise"),
+            "urgence": urgence_libre,
+            "titre": al.get("titre", "Alerte personnalisee"),
+            "description": al.get("description", ""),
+            "reference": al.get("reference_legale", ""),
+            "action_requise": al.get("action_requise", ""),
+            "echeance": al.get("date_echeance", ""),
+            "recurrence": al.get("recurrence", ""),
+            "categorie": al.get("categorie", "autre"),
+            "notes": al.get("notes", ""),
+            "est_libre": True,
         })
 
-    # 4d. Registre unique du personnel (art. L.1221-13 CT)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "registre_personnel",
-            "urgence": "info",
-            "titre": "Registre unique du personnel",
-            "description": "Le registre unique du personnel est obligatoire des le 1er salarie. Doit mentionner nom, prenom, nationalite, emploi, qualification, dates d'entree et sortie.",
-            "reference": "Art. L.1221-13 CT",
-            "action_requise": "Verifier la tenue a jour du registre unique du personnel",
-            "echeance": "",
-            "incidence_legale": "Contravention de 4eme classe (750 EUR par salarie concerne).",
-        })
+    # Include contextual alerts from analysis (DPAE/contrat/registre/DUERP absence)
+    kb_ctx_alerts = _biblio_knowledge.get("alertes_contextuelles", [])
+    for ctx_al in kb_ctx_alerts:
+        # Avoid duplicates by title
+        if not any(a.get("titre") == ctx_al.get("titre") for a in alertes):
+            alertes.append({
+                "id": str(uuid.uuid4())[:8],
+                "type": ctx_al.get("type", "analyse_contextuelle"),
+                "urgence": ctx_al.get("severite", "moyenne"),
+                "titre": ctx_al.get("titre", ""),
+                "description": ctx_al.get("description", ""),
+                "reference": ctx_al.get("reference_legale", ""),
+                "action_requise": "Importer le document manquant ou verifier sa conformite",
+                "incidence_legale": ctx_al.get("incidence_legale", ""),
+            })
 
-    # 4e. CSE obligatoire si >= 11 salaries (art. L.2311-2 CT)
-    if nb_actifs >= 11:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "cse_obligatoire",
-            "urgence": "moyenne",
-            "titre": "Comite social et economique (CSE)",
-            "description": f"Le CSE est obligatoire dans les entreprises d'au moins 11 salaries pendant 12 mois consecutifs. Effectif: {nb_actifs}.",
-            "reference": "Art. L.2311-2 CT",
-            "action_requise": "Organiser les elections du CSE si non fait",
-            "echeance": "",
-            "incidence_legale": "Delit d'entrave (art. L.2317-1 CT) : 1 an d'emprisonnement et 7500 EUR d'amende.",
-        })
+    # Appliquer les personnalisations
+    for cfg in _alertes_config:
+        type_cfg = cfg["type_alerte"]
+        if not cfg.get("actif", True):
+            # Desactiver ce type d'alerte
+            alertes = [a for a in alertes if a.get("type") != type_cfg]
+        else:
+            # Appliquer delai et message personnalise
+            for a in alertes:
+                if a.get("type") == type_cfg:
+                    if cfg.get("delai_jours"):
+                        a["delai_personnalise"] = cfg["delai_jours"]
+                    if cfg.get("message_personnalise"):
+                        a["message_personnalise"] = cfg["message_personnalise"]
 
-    # 4f. Participation obligatoire si >= 50 salaries
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "participation_obligatoire",
-            "urgence": "moyenne",
-            "titre": "Accord de participation obligatoire",
-            "description": f"Participation aux resultats obligatoire pour les entreprises >= 50 salaries. Effectif: {nb_actifs}.",
-            "reference": "Art. L.3322-2 CT",
-            "action_requise": "Verifier la mise en place d'un accord de participation",
-            "echeance": "",
-            "incidence_legale": "Perte des exonerations sociales et fiscales sur l'ensemble de l'epargne salariale.",
-        })
+    # Trier par urgence (haute > moyenne > info)
+    ordre_urgence = {"haute": 0, "moyenne": 1, "info": 2}
+    alertes.sort(key=lambda a: ordre_urgence.get(a.get("urgence", "info"), 3))
 
-    # 4g. Reglement interieur obligatoire si >= 50 salaries
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "reglement_interieur",
-            "urgence": "moyenne",
-            "titre": "Reglement interieur obligatoire",
-            "description": f"Le reglement interieur est obligatoire dans les entreprises >= 50 salaries. Effectif: {nb_actifs}.",
-            "reference": "Art. L.1311-2 CT",
-            "action_requise": "Verifier l'existence et la conformite du reglement interieur",
-            "echeance": "",
-            "incidence_legale": "Sanctions disciplinaires potentiellement inopposables aux salaries.",
-        })
+    log_action("utilisateur", "consultation_alertes_rh", f"{len(alertes)} alerte(s) generee(s)")
+    return {"nb_alertes": len(alertes), "alertes": alertes}
 
-    # 4h. Index egalite pro si >= 50 salaries
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "index_egalite_pro",
-            "urgence": "moyenne",
-            "titre": "Index egalite professionnelle",
-            "description": f"Publication obligatoire de l'index egalite femmes-hommes avant le 1er mars. Effectif: {nb_actifs}.",
-            "reference": "Art. L.1142-8 CT - Decret n2019-15 du 08/01/2019",
-            "action_requise": "Calculer et publier l'index egalite professionnelle",
-            "echeance": "01 mars de chaque annee",
-            "incidence_legale": "Penalite financiere jusqu'a 1% de la masse salariale.",
-        })
 
-    # 4i. Bilan social si >= 300 salaries
-    if nb_actifs >= 300:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "bilan_social",
-            "urgence": "info",
-            "titre": "Bilan social obligatoire",
-            "description": f"Bilan social obligatoire pour les entreprises >= 300 salaries. Effectif: {nb_actifs}.",
-            "reference": "Art. L.2312-28 CT",
-            "action_requise": "Etablir et presenter le bilan social au CSE",
-            "echeance": "",
-        })
+# ======================================================================
+# RH - ECHANGES SALARIES
+# ======================================================================
 
-    # 4j. Formation professionnelle
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "formation_professionnelle",
-            "urgence": "info",
-            "titre": "Plan de developpement des competences",
-            "description": "L'employeur a l'obligation d'assurer l'adaptation des salaries a leur poste de travail et de veiller au maintien de leur capacite a occuper un emploi.",
-            "reference": "Art. L.6321-1 CT",
-            "action_requise": "Verifier le plan de developpement des competences et le financement formation",
-            "echeance": "",
-        })
+@app.post("/api/rh/echanges")
+async def enregistrer_echange(
+    salarie_id: str = Form(...),
+    objet: str = Form(...),
+    contenu: str = Form(...),
+    type_echange: str = Form("email"),
+    date_echange: str = Form(""),
+):
+    """Enregistre un echange avec un salarie (email, courrier, reunion, entretien)."""
+    types_valides = ("email", "courrier", "reunion", "entretien")
+    if type_echange not in types_valides:
+        raise HTTPException(400, f"Type d'echange invalide. Valeurs acceptees: {', '.join(types_valides)}")
 
-    # 4k. DAS-2 (honoraires > 2400 EUR/beneficiaire/an)
-    kb = _biblio_knowledge
-    docs_compta = kb.get("documents_comptables", [])
-    factures_importees = [d for d in _doc_library if d.get("nature") in ("facture_achat", "facture_vente", "note_frais")]
-    if factures_importees or docs_compta:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "das2_honoraires",
-            "urgence": "moyenne",
-            "titre": "DAS-2 : declaration des honoraires",
-            "description": (
-                "Tout versement d'honoraires, commissions, courtages, ristournes "
-                "superieurs a 2400 EUR par beneficiaire et par an doit etre declare "
-                "via la DAS-2 avant le 28 fevrier de l'annee suivante."
-            ),
-            "reference": "CGI art. 241 a 243-bis - CSS art. L.133-5-3",
-            "action_requise": "Verifier le montant cumule des honoraires verses par beneficiaire et deposer la DAS-2",
-            "echeance": f"{aujourdhui.year + 1}-02-28",
-            "incidence_legale": "Amende de 50% des sommes non declarees (art. 1736 CGI). Majoration 50% si retard > 1 mois.",
-        })
+    if not date_echange:
+        date_echange = date.today().isoformat()
 
-    # 4l. Heures supplementaires - contingent annuel 220h
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "heures_supplementaires",
-            "urgence": "info",
-            "titre": "Contingent annuel d'heures supplementaires (220h)",
-            "description": (
-                "Le contingent annuel d'heures supplementaires est fixe a 220 heures par salarie. "
-                "Au-dela, chaque heure supplementaire ouvre droit a une contrepartie obligatoire en repos (COR). "
-                "Majorations: +25% pour les 8 premieres heures/semaine, +50% au-dela."
-            ),
-            "reference": "Art. L.3121-30 a L.3121-33 CT - Art. D.3121-24 CT",
-            "action_requise": "Verifier le decompte individuel des heures supplementaires et les majorations appliquees",
-            "incidence_legale": "Rappel de salaire sur 3 ans + dommages et interets pour non-respect du repos compensateur.",
-        })
+    echange_id = str(uuid.uuid4())[:8]
 
-    # 4m. Conges payes - accumulation et prise
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "conges_payes",
-            "urgence": "info",
-            "titre": "Conges payes : droits et prise effective",
-            "description": (
-                "Chaque salarie acquiert 2,5 jours ouvrables de conges par mois (30 jours/an). "
-                "L'employeur doit permettre la prise des conges et verifier leur effectivite. "
-                "Le calcul de l'indemnite se fait au maintien de salaire ou au 1/10eme (le plus favorable)."
-            ),
-            "reference": "Art. L.3141-1 a L.3141-31 CT",
-            "action_requise": "Verifier le solde de conges de chaque salarie et planifier les periodes de prise",
-            "incidence_legale": "Indemnite compensatrice de conges non pris due au depart du salarie.",
-        })
+    echange = {
+        "id": echange_id,
+        "salarie_id": salarie_id,
+        "objet": objet,
+        "contenu": contenu,
+        "type_echange": type_echange,
+        "date_echange": date_echange,
+        "date_creation": datetime.now().isoformat(),
+    }
 
-    # 4n. Affichages obligatoires
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "affichages_obligatoires",
-            "urgence": "info",
-            "titre": "Affichages obligatoires dans les locaux",
-            "description": (
-                "L'employeur doit afficher: horaires de travail, convention collective applicable, "
-                "coordonnees inspection du travail, consignes de securite, interdiction de fumer, "
-                "lutte contre le harcelement moral et sexuel, egalite de remuneration H/F."
-            ),
-            "reference": "Art. L.1321-1 et suivants CT - Art. R.4227-34 CT",
-            "action_requise": "Verifier la presence des affichages obligatoires dans tous les locaux",
-            "incidence_legale": "Contravention de 3e a 5e classe selon l'affichage manquant (750 a 1500 EUR).",
-        })
+    _rh_echanges.append(echange)
+    log_action("utilisateur", "enregistrement_echange", f"{type_echange} salarie {salarie_id}: {objet}")
+    return echange
 
-    # 4o. Entretien professionnel bisannuel
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "entretien_professionnel",
-            "urgence": "moyenne",
-            "titre": "Entretien professionnel bisannuel",
-            "description": (
-                "L'entretien professionnel est obligatoire tous les 2 ans pour chaque salarie. "
-                "Un bilan recapitulatif doit etre fait tous les 6 ans. "
-                "Il porte sur les perspectives d'evolution professionnelle et les actions de formation."
-            ),
-            "reference": "Art. L.6315-1 CT",
-            "action_requise": "Verifier la planification des entretiens professionnels pour chaque salarie",
-            "incidence_legale": "Abondement correctif CPF de 3000 EUR par salarie si non-realise dans les 6 ans (entreprises >= 50 sal.).",
-        })
 
-    # --- 5. ECHEANCES LEGALES CALENDAIRES ---
-    mois = aujourdhui.month
-    annee = aujourdhui.year
+@app.get("/api/rh/echanges")
+async def liste_echanges(offset: int = Query(0, ge=0), limit: int = Query(_DEFAULT_PAGE_LIMIT, ge=1)):
+    """Liste tous les echanges enregistres."""
+    return _paginate(_rh_echanges, offset, limit)
 
-    # 5a. Taxe sur les salaires (entreprises non assujetties TVA)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "taxe_salaires",
-            "urgence": "info",
-            "titre": "Taxe sur les salaires (si non assujetti TVA)",
-            "description": (
-                "Les employeurs non soumis a la TVA ou partiellement doivent declarer et payer "
-                "la taxe sur les salaires. Baremes progressifs : 4.25%, 8.50%, 13.60%. "
-                "Paiement mensuel (>10 000 EUR/an), trimestriel (4 000-10 000 EUR) ou annuel."
-            ),
-            "reference": "CGI art. 231 a 231 bis V",
-            "action_requise": "Verifier l'assujettissement TVA et le cas echeant declarer la taxe sur les salaires",
-            "echeance": f"15 janvier {annee + 1}",
-            "incidence_legale": "Majoration de 10% pour defaut de declaration, 5% pour retard de paiement.",
-        })
 
-    # 5b. Contribution formation professionnelle et taxe apprentissage (via DSN depuis 2022)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "contribution_formation",
-            "urgence": "moyenne",
-            "titre": "Contribution formation professionnelle et taxe d'apprentissage",
-            "description": (
-                f"Depuis 2022, la contribution a la formation professionnelle (0.55% si <11 sal., 1% au-dela) "
-                f"et la taxe d'apprentissage (0.68%) sont collectees mensuellement via la DSN par l'URSSAF. "
-                f"Le solde de la taxe d'apprentissage (0.09%) est verse directement aux etablissements eligibles."
-            ),
-            "reference": "Art. L.6131-1 et L.6241-1 CT - Loi Avenir professionnel du 05/09/2018",
-            "action_requise": "Verifier le paiement via DSN et le versement du solde de la TA aux organismes eligibles",
-            "echeance": "Mensuel (DSN) + solde TA avant le 31 mai",
-            "incidence_legale": "Majoration de 100% de l'insuffisance constatee (art. L.6252-4 CT).",
-        })
+# ======================================================================
+# RH - PLANNING (vues jour/hebdo/mensuelle/annuelle, filtrage, integration salaries)
+# ======================================================================
 
-    # 5c. Participation construction (effort construction) >= 50 salaries
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "participation_construction",
-            "urgence": "moyenne",
-            "titre": "Participation a l'effort de construction (PEEC)",
-            "description": (
-                f"Les entreprises >= 50 salaries doivent investir 0.45% de la masse salariale N-1 dans "
-                f"le logement des salaries via un organisme collecteur (Action Logement). Effectif: {nb_actifs}."
-            ),
-            "reference": "Art. L.313-1 CCH",
-            "action_requise": "Verifier le versement a Action Logement avant le 31 decembre",
-            "echeance": f"{annee}-12-31",
-            "incidence_legale": "Cotisation de 2% de la masse salariale en cas de non-versement (art. L.313-4 CCH).",
-        })
-
-    # 5d. AGEFIPH - Obligation emploi travailleurs handicapes >= 20 salaries
-    if nb_actifs >= 20:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "oeth_handicap",
-            "urgence": "moyenne",
-            "titre": "Obligation d'emploi de travailleurs handicapes (OETH)",
-            "description": (
-                f"Les entreprises >= 20 salaries doivent employer au moins 6% de travailleurs handicapes. "
-                f"Effectif actif: {nb_actifs}, objectif: {max(1, round(nb_actifs * 0.06))} TH. "
-                f"Declaration annuelle via la DSN."
-            ),
-            "reference": "Art. L.5212-1 et suivants CT",
-            "action_requise": "Verifier le taux d'emploi de TH et la declaration OETH via DSN",
-            "echeance": "Declaration annuelle via DSN de mars",
-            "incidence_legale": f"Contribution AGEFIPH : environ {max(1, round(nb_actifs * 0.06))} x 400 a 600 SMIC horaire/an selon effort.",
-        })
-
-    # 5e. Versement mobilite (transport) >= 11 salaries
-    if nb_actifs >= 11:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "versement_mobilite",
-            "urgence": "info",
-            "titre": "Versement mobilite (ex-versement transport)",
-            "description": (
-                f"Le versement mobilite est du par les entreprises >= 11 salaries. "
-                f"Taux variable selon la zone (0.55% a 2.95% en IDF). Effectif: {nb_actifs}."
-            ),
-            "reference": "Art. L.2333-64 CGCT",
-            "action_requise": "Verifier le taux applicable selon la zone et le paiement via DSN",
-        })
-
-    # 5f. Forfait social sur epargne salariale
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "forfait_social",
-            "urgence": "info",
-            "titre": "Forfait social sur epargne salariale",
-            "description": (
-                "Le forfait social de 20% s'applique sur l'interessement, la participation, "
-                "l'abondement PEE pour les entreprises >= 50 salaries. "
-                "Exoneration pour les entreprises < 50 salaries."
-            ),
-            "reference": "Art. L.137-15 et L.137-16 CSS",
-            "action_requise": "Verifier le calcul et le paiement du forfait social sur les sommes versees",
-        })
-
-    # 5g. Contribution patronale prevoyance - Declaration DAS2
-    # deja gere en 4k
-
-    # 5h. Declaration des effectifs (DADS/DSN annuelle)
-    if nb_actifs >= 1 and mois in (1, 2):
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "dsn_annuelle",
-            "urgence": "haute",
-            "titre": "DSN evenementielle annuelle (bilan)",
-            "description": (
-                "La DSN de janvier doit inclure les donnees de bilan annuel : effectifs, "
-                "masse salariale annuelle, base OETH, base formation. A transmettre avant le 31 janvier."
-            ),
-            "reference": "Art. R.133-14 CSS",
-            "action_requise": "Verifier et transmettre la DSN annuelle (bilan) avant le 31 janvier",
-            "echeance": f"{annee}-01-31",
-        })
-
-    # 5i. Cotisations retraite complementaire AGIRC-ARRCO
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "agirc_arrco",
-            "urgence": "info",
-            "titre": "Cotisations retraite complementaire AGIRC-ARRCO",
-            "description": (
-                "Cotisations obligatoires : Tranche 1 (jusqu'a 1 PASS) 7.87% dont 3.15% salarial. "
-                "Tranche 2 (1 a 8 PASS) 21.59% dont 8.64% salarial. "
-                "Paiement mensuel ou trimestriel (< 10 salaries)."
-            ),
-            "reference": "ANI du 17/11/2017 - Accord AGIRC-ARRCO",
-            "action_requise": "Verifier les declarations et paiements AGIRC-ARRCO",
-        })
-
-    # 5j. Remboursement des frais de transport (50% abonnement)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "remboursement_transport",
-            "urgence": "info",
-            "titre": "Prise en charge obligatoire des frais de transport",
-            "description": (
-                "L'employeur doit prendre en charge 50% du prix des abonnements de transports "
-                "publics (metro, bus, train, velo). Egalement le forfait mobilites durables "
-                "(velo, covoiturage) jusqu'a 800 EUR/an net d'impot."
-            ),
-            "reference": "Art. L.3261-2 CT et Art. L.3261-3-1 CT",
-            "action_requise": "Verifier la prise en charge des abonnements transport et le forfait mobilites durables",
-            "incidence_legale": "Amende de 3750 EUR par salarie concerne (art. R.3261-1 CT).",
-        })
-
-    # 5k. NAO (Negociation Annuelle Obligatoire) >= 50 salaries
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "nao",
-            "urgence": "moyenne",
-            "titre": "Negociation Annuelle Obligatoire (NAO)",
-            "description": (
-                f"L'employeur doit engager chaque annee une negociation sur la remuneration, "
-                f"le temps de travail, le partage de la valeur ajoutee et l'egalite professionnelle. "
-                f"Effectif: {nb_actifs}."
-            ),
-            "reference": "Art. L.2242-1 et suivants CT",
-            "action_requise": "Convoquer les delegues syndicaux pour l'ouverture de la NAO",
-            "echeance": "Annuelle",
-            "incidence_legale": "Delit d'entrave : 1 an d'emprisonnement et 3750 EUR d'amende (art. L.2243-1 CT).",
-        })
-
-    # 5l. BDESE (Base de Donnees Economiques, Sociales et Environnementales) >= 50 sal
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "bdese",
-            "urgence": "moyenne",
-            "titre": "BDESE (Base de Donnees Economiques, Sociales et Environnementales)",
-            "description": (
-                f"La BDESE doit etre mise a disposition du CSE et mise a jour annuellement. "
-                f"Contient les informations sur 6 ans (investissements, egalite, flux financiers, "
-                f"remuneration, fonds propres, consequences environnementales). Effectif: {nb_actifs}."
-            ),
-            "reference": "Art. L.2312-18 et R.2312-7 CT - Loi Climat et Resilience 2021",
-            "action_requise": "Verifier la mise a jour annuelle de la BDESE",
-            "incidence_legale": "Delit d'entrave (7500 EUR d'amende).",
-        })
-
-    # 5m. Plan de mobilite >= 50 salaries sur un meme site
-    if nb_actifs >= 50:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "plan_mobilite",
-            "urgence": "info",
-            "titre": "Plan de mobilite employeur",
-            "description": (
-                f"Les entreprises regroupant >= 50 salaries sur un meme site doivent elaborer "
-                f"un plan de mobilite employeur. Effectif: {nb_actifs}."
-            ),
-            "reference": "Art. L.1214-8-2 Code des transports - Loi LOM du 24/12/2019",
-            "action_requise": "Elaborer ou mettre a jour le plan de mobilite",
-        })
-
-    # 5n. Referent harcelement CSE + employeur
-    if nb_actifs >= 11:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "referent_harcelement",
-            "urgence": "info",
-            "titre": "Designation d'un referent harcelement sexuel",
-            "description": (
-                "Le CSE doit designer un referent harcelement sexuel parmi ses membres. "
-                "Dans les entreprises >= 250 salaries, l'employeur doit aussi designer un referent charge "
-                "d'orienter, informer et accompagner les salaries."
-            ),
-            "reference": "Art. L.1153-5-1 CT et Art. L.2314-1 CT",
-            "action_requise": "Verifier la designation du/des referent(s) harcelement",
-        })
-
-    # 5o. Referent securite (personne competente prevention risques)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "referent_securite",
-            "urgence": "info",
-            "titre": "Designation d'un referent securite / prevention",
-            "description": (
-                "L'employeur doit designer un ou plusieurs salaries competents pour s'occuper "
-                "des activites de protection et de prevention des risques professionnels. "
-                "A defaut, il peut faire appel a des intervenants exterieurs (IPRP)."
-            ),
-            "reference": "Art. L.4644-1 CT",
-            "action_requise": "Verifier la designation du salarie competent en prevention",
-        })
-
-    # 5p. Entretien de retour (apres absence longue)
-    for contrat in _rh_contrats:
-        if contrat.get("statut") != "actif":
-            continue
-        # Verifier arrets > 30 jours
-        for arret in _rh_arrets:
-            if arret.get("salarie_id") == contrat.get("salarie_id") and arret.get("date_fin"):
-                try:
-                    fin_arret = date.fromisoformat(arret["date_fin"])
-                    debut_arret = date.fromisoformat(arret.get("date_debut", arret["date_fin"]))
-                    duree = (fin_arret - debut_arret).days
-                    retour_recent = 0 <= (aujourdhui - fin_arret).days <= 14
-                    if duree >= 30 and retour_recent:
-                        alertes.append({
-                            "id": str(uuid.uuid4())[:8],
-                            "type": "entretien_retour_absence",
-                            "urgence": "haute",
-                            "titre": f"Entretien de retour : {contrat['prenom_salarie']} {contrat['nom_salarie']}",
-                            "description": (
-                                f"Entretien de reprise obligatoire apres une absence de {duree} jours "
-                                f"(retour le {arret['date_fin']}). Un entretien professionnel doit etre propose "
-                                f"au salarie de retour d'un arret de travail d'au moins 30 jours."
-                            ),
-                            "reference": "Art. L.6315-1 CT - Art. R.4624-31 CT",
-                            "action_requise": "Organiser l'entretien professionnel de reprise et la visite medicale de reprise",
-                            "salarie_id": contrat.get("salarie_id"),
-                        })
-                except (ValueError, TypeError):
-                    pass
-
-    # 5q. Visite d'information et de prevention (VIP) embauche
-    for contrat in _rh_contrats:
-        if contrat.get("statut") != "actif":
-            continue
-        try:
-            dd = date.fromisoformat(contrat["date_debut"])
-            anciennete = (aujourdhui - dd).days
-            if anciennete <= 90:  # < 3 mois
-                sid = contrat.get("salarie_id", "")
-                # Verifier si visite deja planifiee
-                a_visite = any(v.get("salarie_id") == sid for v in _rh_visites_med)
-                if not a_visite:
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "vip_embauche",
-                        "urgence": "haute" if anciennete > 60 else "moyenne",
-                        "titre": f"VIP embauche : {contrat['prenom_salarie']} {contrat['nom_salarie']}",
-                        "description": (
-                            f"La visite d'information et de prevention (VIP) doit avoir lieu dans les 3 mois "
-                            f"suivant la prise de poste. Embauche le {contrat['date_debut']} ({anciennete} jours). "
-                            f"Suivi renforce si poste a risque."
-                        ),
-                        "reference": "Art. R.4624-10 CT",
-                        "action_requise": "Prendre rendez-vous avec le service de prevention et sante au travail",
-                        "salarie_id": sid,
-                        "contrat_id": contrat["id"],
-                    })
-        except (ValueError, TypeError):
-            pass
-
-    # 5r. Arrets de travail en cours - suivi
-    for arret in _rh_arrets:
-        if arret.get("date_fin") and arret.get("date_debut"):
-            try:
-                debut = date.fromisoformat(arret["date_debut"])
-                fin = date.fromisoformat(arret["date_fin"])
-                if debut <= aujourdhui <= fin:
-                    duree = (fin - debut).days
-                    jours_restants = (fin - aujourdhui).days
-                    nom_complet = arret.get("salarie_id", "")
-                    for c in _rh_contrats:
-                        if c.get("salarie_id") == arret.get("salarie_id"):
-                            nom_complet = f"{c['prenom_salarie']} {c['nom_salarie']}"
-                            break
-                    if jours_restants <= 7:
-                        alertes.append({
-                            "id": str(uuid.uuid4())[:8],
-                            "type": "retour_arret_imminent",
-                            "urgence": "moyenne",
-                            "titre": f"Retour d'arret imminent : {nom_complet}",
-                            "description": (
-                                f"Fin de l'arret prevue le {arret['date_fin']} (dans {jours_restants} jour(s)). "
-                                f"Duree totale: {duree} jours. "
-                                + ("Visite de reprise obligatoire (arret > 30 jours)." if duree >= 30 else "")
-                            ),
-                            "reference": "Art. R.4624-31 CT" if duree >= 30 else "",
-                            "action_requise": "Preparer la reprise" + (" et planifier la visite medicale de reprise" if duree >= 30 else ""),
-                            "salarie_id": arret.get("salarie_id"),
-                        })
-            except (ValueError, TypeError):
-                pass
-
-    # 5s. Conges payes en cours - solde et planification
-    for conge in _rh_conges:
-        if conge.get("date_fin") and conge.get("statut") in ("valide", "accepte", "en_cours"):
-            try:
-                fin_conge = date.fromisoformat(conge["date_fin"])
-                jours_avant_retour = (fin_conge - aujourdhui).days
-                if 0 <= jours_avant_retour <= 3:
-                    sid = conge.get("salarie_id", "")
-                    nom_complet = sid
-                    for c in _rh_contrats:
-                        if c.get("salarie_id") == sid:
-                            nom_complet = f"{c['prenom_salarie']} {c['nom_salarie']}"
-                            break
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "retour_conge",
-                        "urgence": "info",
-                        "titre": f"Retour de conge : {nom_complet}",
-                        "description": f"Retour prevu le {conge['date_fin']} (dans {jours_avant_retour} jour(s)).",
-                        "salarie_id": sid,
-                    })
-            except (ValueError, TypeError):
-                pass
-
-    # 5t. Sanctions disciplinaires - purge du dossier
-    for sanction in _rh_sanctions:
-        if sanction.get("date_notification"):
-            try:
-                date_sanction = date.fromisoformat(sanction["date_notification"])
-                anciennete_sanction = (aujourdhui - date_sanction).days
-                if 1060 <= anciennete_sanction <= 1100:  # Proche des 3 ans
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "purge_sanction",
-                        "urgence": "info",
-                        "titre": f"Sanction a purger : {sanction.get('nom_salarie', '')}",
-                        "description": (
-                            f"La sanction du {sanction['date_notification']} ne peut plus etre invoquee "
-                            f"(prescription de 3 ans - art. L.1332-5 CT). Elle doit etre retiree du dossier."
-                        ),
-                        "reference": "Art. L.1332-5 CT",
-                        "action_requise": "Retirer la sanction du dossier disciplinaire du salarie",
-                    })
-            except (ValueError, TypeError):
-                pass
-
-    # 5u. Echeances fiscales calendaires
-    echeances_fiscales = [
-        (1, 15, "TVA mensuelle", "Declarer et payer la TVA du mois precedent (regime mensuel)", "CGI art. 287"),
-        (1, 15, "Acompte IS 1er trimestre", "Verser le 1er acompte d'IS (15% ou 25% de l'IS N-1)", "CGI art. 1668"),
-        (2, 28, "DAS-2 Honoraires", "Declarer les honoraires verses > 2400 EUR/beneficiaire/an", "CGI art. 240"),
-        (3, 1, "Index egalite pro", "Publier l'index d'egalite professionnelle F/H", "Art. L.1142-8 CT"),
-        (3, 31, "Contribution AGEFIPH", "Declaration OETH via DSN de mars", "Art. L.5212-5 CT"),
-        (4, 15, "Acompte IS 2eme trimestre", "Verser le 2e acompte d'IS", "CGI art. 1668"),
-        (5, 31, "Solde taxe apprentissage", "Verser le solde de la taxe d'apprentissage (0.09%)", "Art. L.6241-2 CT"),
-        (5, 15, "Liasse fiscale / IS", "Deposer la liasse fiscale et payer le solde d'IS", "CGI art. 223"),
-        (6, 15, "Acompte IS 3eme trimestre", "Verser le 3e acompte d'IS", "CGI art. 1668"),
-        (12, 15, "Acompte IS 4eme trimestre", "Verser le 4e acompte d'IS", "CGI art. 1668"),
-        (12, 31, "PEEC (Action Logement)", "Verser la participation construction 0.45%", "Art. L.313-1 CCH"),
-    ]
-
-    for m_ech, j_ech, titre_ech, desc_ech, ref_ech in echeances_fiscales:
-        try:
-            date_ech = date(annee, m_ech, j_ech)
-            jours_avant = (date_ech - aujourdhui).days
-            if -7 <= jours_avant <= 30:
-                urg = "haute" if jours_avant <= 3 else ("moyenne" if jours_avant <= 14 else "info")
-                alertes.append({
-                    "id": str(uuid.uuid4())[:8],
-                    "type": "echeance_fiscale",
-                    "urgence": urg,
-                    "titre": titre_ech,
-                    "description": f"{desc_ech}. Echeance: {date_ech.isoformat()} ({jours_avant} jour(s)).",
-                    "reference": ref_ech,
-                    "action_requise": desc_ech,
-                    "echeance": date_ech.isoformat(),
-                })
-        except (ValueError, TypeError):
-            pass
-
-    # 5v. Elections CSE - renouvellement tous les 4 ans
-    if nb_actifs >= 11:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "elections_cse_renouvellement",
-            "urgence": "info",
-            "titre": "Renouvellement du CSE (tous les 4 ans)",
-            "description": (
-                "Le mandat des elus du CSE est de 4 ans. L'employeur doit organiser les elections "
-                "de renouvellement et informer les organisations syndicales au moins 2 mois avant l'expiration."
-            ),
-            "reference": "Art. L.2314-33 et L.2314-4 CT",
-            "action_requise": "Verifier la date de fin des mandats CSE et anticiper l'organisation des elections",
-        })
-
-    # 5w. Protection des donnees (RGPD / DPO)
-    if nb_actifs >= 1:
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "rgpd_conformite",
-            "urgence": "info",
-            "titre": "Conformite RGPD - Protection des donnees personnelles",
-            "description": (
-                "L'employeur traite des donnees personnelles de ses salaries (paie, sante, evaluations). "
-                "Registre des traitements obligatoire. DPO obligatoire si plus de 250 salaries ou "
-                "traitement de donnees sensibles a grande echelle."
-            ),
-            "reference": "RGPD art. 30, 37 - Loi Informatique et Libertes (CNIL)",
-            "action_requise": "Verifier le registre des traitements, les clauses contractuelles et la designation DPO si necessaire",
-        })
-
-    # 5x. Medaille du travail (20, 30, 35, 40 ans)
-    for contrat in _rh_contrats:
-        if contrat.get("statut") != "actif" or not contrat.get("date_debut"):
-            continue
-        try:
-            dd = date.fromisoformat(contrat["date_debut"])
-            anciennete_ans = (aujourdhui - dd).days / 365.25
-            for seuil in (20, 30, 35, 40):
-                if seuil - 0.5 <= anciennete_ans <= seuil + 0.5:
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "medaille_travail",
-                        "urgence": "info",
-                        "titre": f"Medaille du travail : {contrat['prenom_salarie']} {contrat['nom_salarie']} ({seuil} ans)",
-                        "description": (
-                            f"Eligible a la medaille du travail ({seuil} ans de service). "
-                            f"Gratification facultative exoneree dans la limite d'un mois de salaire."
-                        ),
-                        "reference": "Decret n2000-1015 du 17/10/2000",
-                        "salarie_id": contrat.get("salarie_id"),
-                    })
-                    break
-        except (ValueError, TypeError):
-            pass
-
-    # --- 5bis. Alertes libres de l'utilisateur ---
-    for al in _alertes_libres:
-        if not al.get("actif", True) or al.get("statut") == "archivee":
-            continue
-        urgence_libre = al.get("urgence", "moyenne")
-        # Ajuster urgence si echeance proche
-        if al.get("date_echeance"):
-            try:
-                ech = date.fromisoformat(al["date_echeance"])
-                jours_avant = (ech - aujourdhui).days
-                if jours_avant < 0:
-                    urgence_libre = "haute"
-                elif jours_avant <= al.get("delai_rappel_jours", 7):
-                    urgence_libre = "haute" if jours_avant <= 3 else "moyenne"
-            except (ValueError, TypeError):
-                pass
-        alertes.append({
-            "id": al["id"],
-            "type": al.get("type_alerte", "personnalise"),
-            "urgence": urgence_libre,
-            "titre": al.get("titre", "Alerte personnalisee"),
-            "description": al.get("description", ""),
-            "reference": al.get("reference_legale", ""),
-            "action_requise": al.get("action_requise", ""),
-            "echeance": al.get("date_echeance", ""),
-            "recurrence": al.get("recurrence", ""),
-            "categorie": al.get("categorie", "autre"),
-            "notes": al.get("notes", ""),
-            "est_libre": True,
-        })
-
-    # --- 6. Rappels declarations ---
-    # DSN mensuelle : a transmettre au plus tard le 5 ou le 15 du mois suivant
-    jour_du_mois = aujourdhui.day
-    if jour_du_mois <= 15:
-        date_limite_dsn = "le 5 du mois" if nb_actifs >= 50 else "le 15 du mois"
-        alertes.append({
-            "id": str(uuid.uuid4())[:8],
-            "type": "declaration_dsn_mensuelle",
-            "urgence": "info",
-            "message": f"Rappel: DSN mensuelle a transmettre avant {date_limite_dsn} en cours",
-            "reference": "Art. R.133-14 CSS - Declaration sociale nominative",
-            "action_requise": "Verifier et transmettre la DSN mensuelle",
-        })
-
-    # DPAE : avant toute embauche
-    for contrat in _rh_contrats:
-        if contrat.get("statut") == "actif":
-            try:
-                dd = date.fromisoformat(contrat["date_debut"])
-                if (dd - aujourdhui).days >= 0 and (dd - aujourdhui).days <= 8:
-                    alertes.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "type": "dpae_a_effectuer",
-                        "urgence": "haute",
-                        "message": (
-                            f"DPAE a effectuer pour {contrat['prenom_salarie']} {contrat['nom_salarie']} "
-                            f"avant le {contrat['date_debut']}"
-                        ),
-                        "reference": "Art. L.1221-10 CT - DPAE au plus tard dans les 8 jours precedant l'embauche",
-                        "action_requise": "Effectuer la DPAE aupres de l'URSSAF",
-                        "contrat_id": contrat["id"],
-                    })
-            except (ValueError, TypeError):
-                pass
-
-    # --- 7. Periodes d'essai arrivant a echeance ---
-    for contrat in _rh_contrats:
-        if contrat.get("statut") != "actif":
-            continue
-        pe_jours = contrat.get("periode_essai_jours", 0)
-        if pe_jours <= 0:
-            continue
-        try:
-            dd = date.fromisoformat(contrat["date_debut"])
-            fin_pe = dd + __import__("datetime").timedelta(days=pe_jours)
-            jours_restants_pe = (fin_pe - aujourdhui).days
-            if 0 <= jours_restants_pe <= 14:
-                alertes.append({
-                    "id": str(uuid.uuid4())[:8],
-                    "type": "fin_periode_essai",
-                    "urgence": "haute" if jours_restants_pe <= 3 else "moyenne",
-                    "message": (
-                        f"Periode d'essai de {contrat['prenom_salarie']} {contrat['nom_salarie']} "
-                        f"se termine dans {jours_restants_pe} jour(s) (le {fin_pe.isoformat()})"
-                    ),
-                    "reference": "Art. L.1221-19 et suivants CT",
-                    "action_requise": "Confirmer l'embauche ou notifier la rupture de la periode d'essai",
-                    "contrat_id": contrat["id"],
-                })
-        except (ValueError, TypeError):
-            pass
-
-    # Include contextual alerts from analysis (DPAE/contrat/registre/DUERP absence)
-    kb_ctx_alerts = _biblio_knowledge.get("alertes_contextuelles", [])
-    for ctx_al in kb_ctx_alerts:
-        # Avoid duplicates by title
-        if not any(a.get("titre") == ctx_al.get("titre") for a in alertes):
-            alertes.append({
-                "id": str(uuid.uuid4())[:8],
-                "type": ctx_al.get("type", "analyse_contextuelle"),
-                "urgence": ctx_al.get("severite", "moyenne"),
-                "titre": ctx_al.get("titre", ""),
-                "description": ctx_al.get("description", ""),
-                "reference": ctx_al.get("reference_legale", ""),
-                "action_requise": "Importer le document manquant ou verifier sa conformite",
-                "incidence_legale": ctx_al.get("incidence_legale", ""),
-            })
-
-    # Normaliser toutes les alertes pour avoir titre + description
-    for a in alertes:
-        if "titre" not in a and "message" in a:
-            a["titre"] = a["type"].replace("_", " ").capitalize()
-            a["description"] = a["message"]
-        if "description" not in a and "message" in a:
-            a["description"] = a["message"]
-
-    # Appliquer les personnalisations
-    for cfg in _alertes_config:
-        type_cfg = cfg["type_alerte"]
-        if not cfg.get("actif", True):
-            # Desactiver ce type d'alerte
-            alertes = [a for a in alertes if a.get("type") != type_cfg]
-        else:
-            # Appliquer delai et message personnalise
-            for a in alertes:
-                if a.get("type") == type_cfg:
-                    if cfg.get("delai_jours"):
-                        a["delai_personnalise"] = cfg["delai_jours"]
-                    if cfg.get("message_personnalise"):
-                        a["message_personnalise"] = cfg["message_personnalise"]
-
-    # Trier par urgence (haute > moyenne > info)
-    ordre_urgence = {"haute": 0, "moyenne": 1, "info": 2}
-    alertes.sort(key=lambda a: ordre_urgence.get(a.get("urgence", "info"), 3))
-
-    log_action("utilisateur", "consultation_alertes_rh", f"{len(alertes)} alerte(s) generee(s)")
-    return {"nb_alertes": len(alertes), "alertes": alertes}
-
-
-# ======================================================================
-# RH - ECHANGES SALARIES
-# ======================================================================
-
-@app.post("/api/rh/echanges")
-async def enregistrer_echange(
-    salarie_id: str = Form(...),
-    objet: str = Form(...),
-    contenu: str = Form(...),
-    type_echange: str = Form("email"),
-    date_echange: str = Form(""),
-):
-    """Enregistre un echange avec un salarie (email, courrier, reunion, entretien)."""
-    types_valides = ("email", "courrier", "reunion", "entretien")
-    if type_echange not in types_valides:
-        raise HTTPException(400, f"Type d'echange invalide. Valeurs acceptees: {', '.join(types_valides)}")
-
-    if not date_echange:
-        date_echange = date.today().isoformat()
-
-    echange_id = str(uuid.uuid4())[:8]
-
-    echange = {
-        "id": echange_id,
-        "salarie_id": salarie_id,
-        "objet": objet,
-        "contenu": contenu,
-        "type_echange": type_echange,
-        "date_echange": date_echange,
-        "date_creation": datetime.now().isoformat(),
-    }
-
-    _rh_echanges.append(echange)
-    log_action("utilisateur", "enregistrement_echange", f"{type_echange} salarie {salarie_id}: {objet}")
-    return echange
-
-
-@app.get("/api/rh/echanges")
-async def liste_echanges(offset: int = Query(0, ge=0), limit: int = Query(_DEFAULT_PAGE_LIMIT, ge=1)):
-    """Liste tous les echanges enregistres."""
-    return _paginate(_rh_echanges, offset, limit)
-
-
-# ======================================================================
-# RH - PLANNING (vues jour/hebdo/mensuelle/annuelle, filtrage, integration salaries)
-# ======================================================================
-
-# Creneau par defaut applique a l'integration automatique (modifiable)
-_planning_creneau_defaut = {
-    "heure_debut": "09:00",
-    "heure_fin": "17:00",
-    "type_poste": "normal",
-}
+# Creneau par defaut applique a l'integration automatique (modifiable)
+_planning_creneau_defaut = {
+    "heure_debut": "09:00",
+    "heure_fin": "17:00",
+    "type_poste": "normal",
+}
 
 
 def _resoudre_salarie(salarie_id: str) -> dict:
@@ -11486,24 +9692,21 @@ def _resoudre_salarie(salarie_id: str) -> dict:
     }
 
 
+def _planning() -> IndexPlanning:
+    # Garde-fou : creneaux ajoutes ou supprimes hors des endpoints du planning
+    if len(_planning_index) != len(_rh_planning):
+        _planning_index.reconstruire(_rh_planning)
+    return _planning_index
+
+
+def _absences() -> IndexAbsences:
+    _absences_index.synchroniser(_generation_donnees.empreinte(), _rh_conges, _rh_arrets)
+    return _absences_index
+
+
 def _get_statut_jour(salarie_id: str, date_str: str) -> str:
     """Determine le statut d'un salarie pour un jour donne (present, conge, absence, arret)."""
-    # Verifier conges
-    for c in _rh_conges:
-        if c.get("salarie_id") == salarie_id or c.get("nom_salarie") == salarie_id:
-            if c.get("statut") != "refuse":
-                deb = c.get("date_debut", "")
-                fin = c.get("date_fin", "")
-                if deb <= date_str <= fin:
-                    return f"conge_{c.get('type_conge', c.get('type', 'cp'))}"
-    # Verifier arrets
-    for a in _rh_arrets:
-        if a.get("salarie_id") == salarie_id:
-            deb = a.get("date_debut", "")
-            fin = a.get("date_fin", "")
-            if deb <= date_str <= fin:
-                return f"arret_{a.get('type_arret', a.get('type', 'maladie'))}"
-    return "present"
+    return _absences().statut(salarie_id, date_str)
 
 
 def _calculer_majorations(type_poste: str) -> list[dict]:
@@ -11579,23 +9782,26 @@ async def liste_salaries():
         }
 
     # 2. Salaries issus des contrats RH (enrichir ou ajouter)
+    par_nom = {}
+    for cle, sal in salaries.items():
+        par_nom.setdefault((sal["nom"], sal["prenom"]), cle)
     for c in _rh_contrats:
         cid = c.get("salarie_id", "") or c.get("id", "")
         c_nom = c.get("nom_salarie", "") or c.get("nom", "")
         c_prenom = c.get("prenom_salarie", "") or c.get("prenom", "")
         nom_complet = f"{c_prenom} {c_nom}".strip()
-        # Chercher si deja present par NIR dans les salaries detectes
-        matched = False
-        for nir, sal in list(salaries.items()):
-            if sal["nom"] == c_nom and sal["prenom"] == c_prenom:
-                # Enrichir le salarie existant
-                salaries[nir]["type_contrat"] = c.get("type_contrat", "")
-                salaries[nir]["date_embauche"] = c.get("date_debut", "")
-                salaries[nir]["source"] = "contrat_rh+analyse"
-                salaries[nir]["actif"] = c.get("statut", "") != "termine"
-                matched = True
-                break
-        if not matched:
+        # Chercher si deja present (meme nom et prenom) : premiere fiche inseree
+        sal = salaries.get(par_nom.get((c_nom, c_prenom)))
+        if sal is not None and (sal["nom"], sal["prenom"]) != (c_nom, c_prenom):
+            # Fiche ecrasee depuis l'indexation : parcours complet
+            sal = next((v for v in salaries.values() if v["nom"] == c_nom and v["prenom"] == c_prenom), None)
+        if sal is not None:
+            # Enrichir le salarie existant
+            sal["type_contrat"] = c.get("type_contrat", "")
+            sal["date_embauche"] = c.get("date_debut", "")
+            sal["source"] = "contrat_rh+analyse"
+            sal["actif"] = c.get("statut", "") != "termine"
+        else:
             salaries[cid] = {
                 "id": cid,
                 "nir": c.get("nir", ""),
@@ -11609,6 +9815,7 @@ async def liste_salaries():
                 "date_embauche": c.get("date_debut", ""),
                 "actif": c.get("statut", "") != "termine",
             }
+            par_nom.setdefault((c_nom, c_prenom), cid)
 
     # 3. Salaries presents uniquement dans le planning (ajouts manuels)
     for p in _rh_planning:
@@ -11694,13 +9901,15 @@ async def ajouter_planning(
     else:
         dates_a_planifier = [date]
 
+    planning = _planning()
+    absences = _absences()
     nb_creees = 0
     derniere_entree = None
     for d in dates_a_planifier:
         planning_id = str(uuid.uuid4())[:8]
 
         # Determiner le statut automatiquement si non force
-        st = statut if statut else _get_statut_jour(salarie_id, d)
+        st = statut if statut else absences.statut(salarie_id, d)
 
         entree = {
             "id": planning_id,
@@ -11718,19 +9927,16 @@ async def ajouter_planning(
         }
 
         # Verifier s'il existe deja une entree pour ce salarie a cette date/heure
-        index_existant = None
-        for i, p in enumerate(_rh_planning):
-            if p["salarie_id"] == salarie_id and p["date"] == d and p["heure_debut"] == heure_debut:
-                index_existant = i
-                break
-
-        if index_existant is not None:
-            entree["id"] = _rh_planning[index_existant]["id"]
-            _rh_planning[index_existant] = entree
+        existant = planning.creneau(salarie_id, d, heure_debut)
+        if existant is not None:
+            entree["id"] = existant["id"]
+            planning.modifier(existant, entree)
         else:
             _rh_planning.append(entree)
+            planning.ajouter(entree)
             nb_creees += 1
         derniere_entree = entree
+    _generation_kb.incrementer()
 
     log_action("utilisateur", "ajout_planning", f"salarie {salarie_id} {date}-{date_fin or date} {heure_debut}-{heure_fin} ({type_poste}) - {nb_creees} creneaux")
 
@@ -11804,14 +10010,11 @@ async def planning_jour(
     except ValueError:
         raise HTTPException(400, "Format de date invalide (attendu: YYYY-MM-DD)")
 
+    absences = _absences()
     entrees = []
-    for p in _rh_planning:
-        if p.get("date") != date_jour:
-            continue
-        if salarie_id and p.get("salarie_id") != salarie_id:
-            continue
+    for p in _planning().jour(date_jour, salarie_id or None):
         # Enrichir avec le statut reel
-        st = _get_statut_jour(p["salarie_id"], date_jour)
+        st = absences.statut(p["salarie_id"], date_jour)
         entry = dict(p)
         entry["statut_reel"] = st
         if statut and st != statut:
@@ -11830,7 +10033,7 @@ async def planning_jour(
     for sid in tous_salaries:
         if sid in ids_planifies:
             continue
-        st = _get_statut_jour(sid, date_jour)
+        st = absences.statut(sid, date_jour)
         if st != "present":
             sal = _resoudre_salarie(sid)
             entrees.append({
@@ -11877,18 +10080,16 @@ async def planning_mois(
     jours = []
     jour_semaine = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
     total_heures = 0
+    planning = _planning()
+    absences = _absences()
 
     for j in range(1, nb_jours + 1):
         d = date(annee, mois, j)
         date_str = d.isoformat()
 
         entrees_jour = []
-        for p in _rh_planning:
-            if p.get("date") != date_str:
-                continue
-            if salarie_id and p.get("salarie_id") != salarie_id:
-                continue
-            st = _get_statut_jour(p["salarie_id"], date_str)
+        for p in planning.jour(date_str, salarie_id or None):
+            st = absences.statut(p["salarie_id"], date_str)
             entry = {
                 "salarie_id": p["salarie_id"],
                 "salarie_nom": p.get("salarie_nom", ""),
@@ -11929,8 +10130,10 @@ async def planning_annee(
     """Vue annuelle du planning.
 
     Retourne un resume par mois : jours travailles, heures, absences.
+    Les resumes mensuels sont memorises par l'index du planning.
     """
-    import calendar
+    planning = _planning()
+    absences = _absences() if salarie_id else None
 
     mois_resume = []
     total_heures_annee = 0
@@ -11938,26 +10141,10 @@ async def planning_annee(
     total_absences = 0
 
     for m in range(1, 13):
-        nb_jours = calendar.monthrange(annee, m)[1]
-        heures_mois = 0
-        jours_travailles = 0
-        jours_absence = 0
-
-        for j in range(1, nb_jours + 1):
-            date_str = date(annee, m, j).isoformat()
-            entrees_jour = [p for p in _rh_planning if p.get("date") == date_str]
-            if salarie_id:
-                entrees_jour = [p for p in entrees_jour if p.get("salarie_id") == salarie_id]
-
-            if entrees_jour:
-                jours_travailles += 1
-                heures_mois += sum(p.get("duree_heures", 0) for p in entrees_jour)
-
-            # Compter les absences
-            if salarie_id:
-                st = _get_statut_jour(salarie_id, date_str)
-                if st != "present":
-                    jours_absence += 1
+        resume = planning.resume_mois(annee, m, salarie_id or None, absences)
+        heures_mois = resume["heures"]
+        jours_travailles = resume["jours_travailles"]
+        jours_absence = resume["jours_absence"]
 
         mois_noms = ["", "Janvier", "Fevrier", "Mars", "Avril", "Mai", "Juin",
                       "Juillet", "Aout", "Septembre", "Octobre", "Novembre", "Decembre"]
@@ -12049,6 +10236,8 @@ async def integrer_salaries_planning(
     majorations = _calculer_majorations(type_poste)
 
     # Generer les creneaux
+    planning = _planning()
+    absences = _absences()
     nb_creees = 0
     current = d_debut
     while current <= d_fin:
@@ -12058,15 +10247,11 @@ async def integrer_salaries_planning(
             date_str = current.isoformat()
             for sid, nom in salaries_actifs.items():
                 # Verifier si deja present dans le planning
-                deja = any(
-                    p["salarie_id"] == sid and p["date"] == date_str and p["heure_debut"] == heure_debut
-                    for p in _rh_planning
-                )
-                if deja:
+                if planning.creneau(sid, date_str, heure_debut) is not None:
                     continue
 
-                st = _get_statut_jour(sid, date_str)
-                _rh_planning.append({
+                st = absences.statut(sid, date_str)
+                entree = {
                     "id": str(uuid.uuid4())[:8],
                     "salarie_id": sid,
                     "salarie_nom": nom,
@@ -12079,9 +10264,12 @@ async def integrer_salaries_planning(
                     "statut": st,
                     "majorations": majorations,
                     "date_creation": datetime.now().isoformat(),
-                })
+                }
+                _rh_planning.append(entree)
+                planning.ajouter(entree)
                 nb_creees += 1
         current += timedelta(days=1)
+    _generation_kb.incrementer()
 
     log_action("utilisateur", "integration_planning",
                f"{nb_creees} creneaux crees pour {len(salaries_actifs)} salaries du {date_debut} au {date_fin}")
@@ -12114,9 +10302,12 @@ async def modifier_creneau_defaut(request: Request):
 @app.delete("/api/rh/planning/{planning_id}")
 async def supprimer_planning(planning_id: str):
     """Supprime une entree de planning."""
+    planning = _planning()
     for i, p in enumerate(_rh_planning):
         if p.get("id") == planning_id:
             removed = _rh_planning.pop(i)
+            planning.retirer(removed)
+            _generation_kb.incrementer()
             log_action("utilisateur", "suppression_planning", f"Planning {planning_id} supprime")
             return {"ok": True, "supprime": removed}
     raise HTTPException(404, "Entree de planning non trouvee")
@@ -12463,4308 +10654,3 @@ async def telecharger_dsn(draft_id: str):
         if d["id"] == draft_id:
             return JSONResponse({"status": "ok", "message": "Utilisez le contenu_dsn de la generation."})
     raise HTTPException(404, "Brouillon non trouve")
-
-
-# ==============================
-# HTML TEMPLATES
-# ==============================
-
-
-LANDING_HTML = """<!DOCTYPE html>
-<html lang="fr">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<meta name="description" content="NormaCheck - Plateforme professionnelle de conformite sociale et fiscale. Analysez vos documents, detectez les anomalies, gerez votre comptabilite et generez vos DSN.">
-<meta name="theme-color" content="#1e40af">
-<link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'><defs><linearGradient id='g' x1='0' y1='0' x2='1' y2='1'><stop offset='0' stop-color='%233b82f6'/><stop offset='1' stop-color='%2310b981'/></linearGradient></defs><rect width='32' height='32' rx='8' fill='url(%23g)'/><path d='M10 16l4 4 8-8' stroke='white' stroke-width='2.5' stroke-linecap='round' stroke-linejoin='round' fill='none'/></svg>">
-<title>NormaCheck - Conformite sociale et fiscale intelligente</title>
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap');
-*{margin:0;padding:0;box-sizing:border-box}
-:root{--blue:#2563eb;--blue-dark:#1e40af;--blue-light:#dbeafe;--blue-50:#eff6ff;--green:#10b981;--green-dark:#059669;--green-light:#d1fae5;--green-50:#ecfdf5;--teal:#0d9488;--slate-50:#f8fafc;--slate-100:#f1f5f9;--slate-200:#e2e8f0;--slate-300:#cbd5e1;--slate-400:#94a3b8;--slate-500:#64748b;--slate-600:#475569;--slate-700:#334155;--slate-800:#1e293b;--slate-900:#0f172a;--radius:12px}
-html{scroll-behavior:smooth}
-body{font-family:'Inter',-apple-system,'Segoe UI',system-ui,sans-serif;background:var(--slate-50);color:var(--slate-800);-webkit-font-smoothing:antialiased;line-height:1.6}
-/* NAV */
-.nav{background:rgba(255,255,255,.85);backdrop-filter:blur(16px);-webkit-backdrop-filter:blur(16px);display:flex;justify-content:space-between;align-items:center;padding:0 40px;position:sticky;top:0;z-index:100;height:64px;border-bottom:1px solid var(--slate-200)}
-.nav .logo-wrap{display:flex;align-items:center;gap:12px}
-.nav .logo-mark{display:flex;align-items:center;gap:10px}
-.nav .logo-mark svg{width:36px;height:36px;flex-shrink:0}
-.nav .logo-text{font-size:1.3em;font-weight:800;letter-spacing:-.5px;background:linear-gradient(135deg,var(--blue),var(--green));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text}
-.nav .logo-sub{font-size:.56em;color:var(--slate-400);font-weight:500;letter-spacing:.3px;text-transform:uppercase;margin-top:1px}
-.nav .links{display:flex;gap:24px;align-items:center}
-.nav a{color:var(--slate-600);text-decoration:none;font-size:.85em;transition:color .2s;font-weight:500}
-.nav a:hover{color:var(--blue)}
-.nav a:focus-visible{outline:2px solid var(--blue);outline-offset:2px;border-radius:4px}
-.nav .cta-nav{background:linear-gradient(135deg,var(--blue),var(--blue-dark));color:#fff;padding:9px 24px;border-radius:8px;font-weight:600;border:none;transition:all .3s;box-shadow:0 2px 8px rgba(37,99,235,.2)}
-.nav .cta-nav:hover{transform:translateY(-1px);box-shadow:0 4px 16px rgba(37,99,235,.3)}
-/* HERO */
-.hero{background:linear-gradient(160deg,#f8fafc 0%,#eff6ff 40%,#ecfdf5 100%);text-align:center;padding:100px 20px 80px;position:relative;overflow:hidden}
-.hero::before{content:"";position:absolute;top:-200px;right:-200px;width:600px;height:600px;background:radial-gradient(circle,rgba(37,99,235,.06) 0%,transparent 70%);pointer-events:none}
-.hero::after{content:"";position:absolute;bottom:-200px;left:-200px;width:600px;height:600px;background:radial-gradient(circle,rgba(16,185,129,.06) 0%,transparent 70%);pointer-events:none}
-.hero-logo{margin-bottom:36px;position:relative;animation:fadeInUp .7s ease-out}
-.hero-logo svg{width:88px;height:88px;filter:drop-shadow(0 8px 32px rgba(37,99,235,.15))}
-.hero h1{font-size:2.8em;font-weight:800;margin-bottom:20px;line-height:1.15;position:relative;animation:fadeInUp .8s ease-out .1s both;max-width:780px;margin-left:auto;margin-right:auto;letter-spacing:-.03em;color:var(--slate-900)}
-.hero h1 em{font-style:normal;background:linear-gradient(135deg,var(--blue),var(--green));-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text}
-.hero p{font-size:1.08em;color:var(--slate-500);max-width:620px;margin:0 auto 40px;line-height:1.75;position:relative;animation:fadeInUp .8s ease-out .2s both}
-.hero-btns{display:flex;gap:14px;justify-content:center;flex-wrap:wrap;position:relative;animation:fadeInUp .8s ease-out .3s both}
-.cta-main{display:inline-flex;align-items:center;gap:8px;background:linear-gradient(135deg,var(--blue),var(--blue-dark));color:#fff;padding:15px 36px;border-radius:10px;font-size:1em;font-weight:700;cursor:pointer;border:none;box-shadow:0 4px 20px rgba(37,99,235,.25);transition:all .3s;letter-spacing:.01em}
-.cta-main:hover{transform:translateY(-2px);box-shadow:0 8px 32px rgba(37,99,235,.35)}
-.cta-main:focus-visible{outline:2px solid var(--blue);outline-offset:3px}
-.cta-sec{display:inline-flex;align-items:center;gap:8px;background:#fff;color:var(--slate-700);padding:15px 36px;border-radius:10px;font-size:1em;font-weight:600;cursor:pointer;border:1.5px solid var(--slate-200);transition:all .3s;box-shadow:0 2px 8px rgba(0,0,0,.04)}
-.cta-sec:hover{border-color:var(--blue);color:var(--blue);transform:translateY(-2px);box-shadow:0 4px 16px rgba(37,99,235,.08)}
-/* Badges */
-.inst-bar{display:flex;justify-content:center;gap:12px;margin-top:48px;flex-wrap:wrap;position:relative;animation:fadeInUp .8s ease-out .4s both}
-.inst-badge{display:flex;align-items:center;gap:6px;background:#fff;padding:8px 16px;border-radius:20px;font-size:.76em;font-weight:600;border:1px solid var(--slate-200);color:var(--slate-500);letter-spacing:.02em;box-shadow:0 1px 4px rgba(0,0,0,.03)}
-@keyframes fadeInUp{from{opacity:0;transform:translateY(24px)}to{opacity:1;transform:translateY(0)}}
-/* Trust */
-.trust-bar{background:#fff;border-bottom:1px solid var(--slate-200);padding:16px 20px}
-.trust-bar .inner{max-width:1000px;margin:0 auto;display:flex;align-items:center;justify-content:center;gap:24px;flex-wrap:wrap}
-.trust-item{display:flex;align-items:center;gap:8px;font-size:.8em;color:var(--slate-500);font-weight:500}
-.trust-item svg{width:18px;height:18px;flex-shrink:0}
-.trust-sep{width:1px;height:20px;background:var(--slate-200)}
-/* Formats */
-.formats-bar{background:var(--slate-50);padding:18px 20px;text-align:center;border-bottom:1px solid var(--slate-200)}
-.formats-bar .inner{max-width:900px;margin:0 auto;display:flex;align-items:center;justify-content:center;gap:10px;flex-wrap:wrap;font-size:.8em;color:var(--slate-400)}
-.formats-bar .tag{background:#fff;padding:4px 12px;border-radius:6px;font-weight:600;color:var(--blue);font-size:.88em;border:1px solid var(--blue-light)}
-/* Pricing */
-.pricing{max-width:1000px;margin:80px auto;padding:0 20px}
-.pricing h2{text-align:center;font-size:1.8em;color:var(--slate-900);margin-bottom:10px;font-weight:800;letter-spacing:-.02em}
-.pricing .sub{text-align:center;color:var(--slate-500);font-size:.92em;margin-bottom:40px}
-.plans{display:grid;grid-template-columns:repeat(3,1fr);gap:20px}
-.plan{background:#fff;border-radius:16px;padding:32px 24px;border:1px solid var(--slate-200);text-align:center;transition:all .3s;position:relative}
-.plan:hover{transform:translateY(-4px);box-shadow:0 16px 48px rgba(0,0,0,.06)}
-.plan.pop{border-color:var(--blue);box-shadow:0 8px 32px rgba(37,99,235,.1)}
-.plan.pop::before{content:"Recommand\00e9 ";position:absolute;top:-12px;left:50%;transform:translateX(-50%);background:linear-gradient(135deg,var(--blue),var(--green));color:#fff;padding:4px 18px;border-radius:20px;font-size:.72em;font-weight:700}
-.plan h3{font-size:1.12em;color:var(--slate-800);margin-bottom:6px}
-.plan .price{font-size:2.2em;font-weight:800;color:var(--slate-900);margin:10px 0}
-.plan .price em{font-size:.36em;font-weight:400;color:var(--slate-400);font-style:normal}
-.plan .profiles{font-size:.82em;color:var(--blue);font-weight:600;margin-bottom:12px}
-.plan ul{list-style:none;text-align:left;margin:12px 0}
-.plan li{padding:5px 0;font-size:.84em;color:var(--slate-600)}
-.plan li::before{content:"";display:inline-block;width:6px;height:6px;border-radius:50%;background:linear-gradient(135deg,var(--blue),var(--green));margin-right:8px;vertical-align:middle}
-.plan-btn{width:100%;padding:12px;border-radius:8px;font-size:.92em;font-weight:700;cursor:pointer;transition:all .25s;border:1.5px solid var(--slate-200);background:#fff;color:var(--slate-700);font-family:inherit}
-.plan-btn:hover{border-color:var(--blue);color:var(--blue);transform:translateY(-1px);box-shadow:0 4px 12px rgba(37,99,235,.06)}
-.plan-btn:focus-visible{outline:2px solid var(--blue);outline-offset:2px}
-.plan.pop .plan-btn{background:linear-gradient(135deg,var(--blue),var(--blue-dark));color:#fff;border-color:transparent}
-.plan.pop .plan-btn:hover{box-shadow:0 4px 16px rgba(37,99,235,.3);transform:translateY(-1px)}
-/* Features */
-.feat{max-width:1100px;margin:80px auto;padding:0 20px}
-.feat h2{text-align:center;font-size:1.8em;font-weight:800;color:var(--slate-900);margin-bottom:12px;letter-spacing:-.02em}
-.feat .sub{text-align:center;color:var(--slate-500);font-size:.92em;margin-bottom:40px}
-.fg{display:grid;grid-template-columns:repeat(auto-fit,minmax(250px,1fr));gap:18px}
-.fc{background:#fff;border-radius:14px;padding:24px;border:1px solid var(--slate-200);transition:all .3s}
-.fc:hover{transform:translateY(-3px);box-shadow:0 12px 32px rgba(0,0,0,.06);border-color:var(--blue-light)}
-.fc .ic{width:44px;height:44px;border-radius:10px;display:flex;align-items:center;justify-content:center;font-size:1.3em;margin-bottom:12px;transition:transform .3s}
-.fc:hover .ic{transform:scale(1.08)}
-.fc .ic.bl{background:var(--blue-50);color:var(--blue)}.fc .ic.gr{background:var(--green-50);color:var(--green)}.fc .ic.pu{background:#f5f3ff;color:#7c3aed}.fc .ic.am{background:#fffbeb;color:#d97706}.fc .ic.tl{background:#f0fdfa;color:var(--teal)}
-.fc h3{color:var(--slate-800);margin-bottom:6px;font-size:.98em}
-.fc p{color:var(--slate-500);font-size:.83em;line-height:1.6}
-/* Guarantee */
-.guarantee{max-width:800px;margin:50px auto;padding:24px 30px;background:#fff;border:1px solid var(--slate-200);border-left:4px solid var(--blue);border-radius:10px}
-.guarantee h3{color:var(--slate-800);margin-bottom:8px;font-size:.95em}.guarantee p{color:var(--slate-500);font-size:.85em;line-height:1.65}
-/* Targets */
-.tgt{background:#fff;padding:70px 20px;text-align:center;border-top:1px solid var(--slate-200)}
-.tgt h2{font-size:1.6em;color:var(--slate-900);margin-bottom:35px;font-weight:800;letter-spacing:-.02em}
-.tg{display:flex;justify-content:center;gap:20px;flex-wrap:wrap;max-width:800px;margin:0 auto}
-.ti{background:var(--slate-50);border:1px solid var(--slate-200);border-radius:14px;padding:24px 18px;width:170px;transition:all .3s;cursor:default}
-.ti:hover{border-color:var(--blue-light);transform:translateY(-3px);box-shadow:0 8px 24px rgba(37,99,235,.06)}.ti .ic2{font-size:1.6em;margin-bottom:6px}.ti h4{color:var(--slate-800);font-size:.92em;margin-bottom:3px}.ti p{font-size:.78em;color:var(--slate-500)}
-/* Auth */
-.auth-sec{max-width:420px;margin:70px auto;padding:0 20px}
-.auth-card{background:#fff;border-radius:16px;padding:36px;box-shadow:0 12px 40px rgba(0,0,0,.06);border:1px solid var(--slate-200)}
-.auth-card h2{text-align:center;color:var(--slate-800);margin-bottom:22px;font-size:1.25em}
-.auth-tabs{display:flex;margin-bottom:22px;background:var(--slate-100);border-radius:8px;padding:4px}
-.auth-tab{flex:1;padding:10px;text-align:center;cursor:pointer;font-weight:600;color:var(--slate-400);border-radius:6px;transition:all .25s;font-size:.88em}
-.auth-tab:focus-visible{outline:2px solid var(--blue);outline-offset:-2px}
-.auth-tab.active{color:var(--blue);background:#fff;box-shadow:0 2px 8px rgba(0,0,0,.06)}
-.auth-form{display:none}.auth-form.active{display:block}
-.auth-form label{display:block;font-weight:600;font-size:.82em;color:var(--slate-600);margin-bottom:4px}
-.auth-form input{width:100%;padding:11px 14px;border:1.5px solid var(--slate-200);border-radius:8px;font-size:.93em;margin-bottom:12px;background:var(--slate-50);transition:all .25s;font-family:inherit}
-.auth-form input:focus{border-color:var(--blue);outline:none;background:#fff;box-shadow:0 0 0 3px rgba(37,99,235,.08)}
-.submit-btn{width:100%;padding:13px;background:linear-gradient(135deg,var(--blue),var(--blue-dark));color:#fff;border:none;border-radius:8px;font-size:1em;font-weight:700;cursor:pointer;transition:all .25s;font-family:inherit;box-shadow:0 2px 8px rgba(37,99,235,.2)}
-.submit-btn:hover{transform:translateY(-1px);box-shadow:0 4px 16px rgba(37,99,235,.3)}
-.offer-selector{display:flex;gap:8px;margin-bottom:14px}
-.offer-opt{flex:1;padding:10px 8px;border:1.5px solid var(--slate-200);border-radius:8px;text-align:center;cursor:pointer;transition:all .25s;background:var(--slate-50);font-size:.82em}
-.offer-opt strong{display:block;color:var(--slate-700);font-size:1em;margin-bottom:2px}
-.offer-opt span{color:var(--slate-400);font-size:.85em}
-.offer-opt.selected{border-color:var(--blue);background:#eff6ff;box-shadow:0 0 0 2px rgba(37,99,235,.1)}
-.offer-opt.selected strong{color:var(--blue)}
-.offer-opt:hover{border-color:var(--blue-light);transform:translateY(-1px)}
-.submit-btn:focus-visible{outline:2px solid var(--green);outline-offset:2px}
-.submit-btn:active{transform:translateY(0)}
-.msg{padding:11px 15px;border-radius:8px;margin:10px 0;font-size:.88em;display:none;animation:fadeInUp .3s ease-out}
-.msg.ok{display:block;background:var(--green-50);color:#166534;border:1px solid #bbf7d0}
-.msg.err{display:block;background:#fef2f2;color:#991b1b;border:1px solid #fecaca}
-.rgpd{font-size:.76em;color:var(--slate-400);margin-top:12px;line-height:1.4;text-align:center}
-/* Footer */
-footer{text-align:center;padding:40px 20px;color:var(--slate-400);font-size:.8em;background:var(--slate-900)}
-footer a{color:var(--slate-400);text-decoration:none;transition:color .2s}footer a:hover{text-decoration:underline;color:#fff}
-footer .links{margin-bottom:12px;display:flex;gap:18px;justify-content:center}
-@media(max-width:768px){.hero h1{font-size:2em}.hero{padding:70px 16px 50px}.fg{grid-template-columns:1fr}.plans{grid-template-columns:1fr}.nav{padding:0 16px;height:56px}.nav .links{gap:10px}.nav a:not(.cta-nav){display:none}.inst-bar{gap:8px}.inst-badge{padding:6px 10px;font-size:.72em}.auth-card{padding:24px 18px}.tg{gap:10px}.ti{width:calc(50% - 10px)}.nav .logo-sub{display:none}.hero-logo svg{width:64px;height:64px}.formats-bar .inner{font-size:.72em}.trust-bar .inner{gap:12px}.trust-sep{display:none}}
-</style>
-</head>
-<body>
-
-<!-- NAVIGATION -->
-<nav class="nav" aria-label="Navigation principale">
-<div class="logo-wrap">
-<div class="logo-mark">
-<!-- LOGO: Moderne avec virgules bleu/vert -->
-<svg viewBox="0 0 36 36" fill="none" xmlns="http://www.w3.org/2000/svg">
-<defs><linearGradient id="lg1" x1="0" y1="0" x2="36" y2="36"><stop offset="0%" stop-color="#3b82f6"/><stop offset="100%" stop-color="#10b981"/></linearGradient></defs>
-<rect width="36" height="36" rx="10" fill="url(#lg1)"/>
-<!-- Virgule bleue -->
-<path d="M12 10c0 4 2 7 5 9" stroke="rgba(255,255,255,.9)" stroke-width="2.5" stroke-linecap="round" fill="none"/>
-<!-- Virgule verte -->
-<path d="M19 10c0 4 2 7 5 9" stroke="rgba(255,255,255,.5)" stroke-width="2.5" stroke-linecap="round" fill="none"/>
-<!-- Check -->
-<path d="M11 22l4.5 4.5 9-9" stroke="#fff" stroke-width="2.2" stroke-linecap="round" stroke-linejoin="round" fill="none"/>
-</svg>
-<div>
-<div class="logo-text">NormaCheck</div>
-<div class="logo-sub">Conformite sociale &amp; fiscale</div>
-</div>
-</div>
-</div>
-<div class="links"><a href="#features">Fonctionnalites</a><a href="#pricing">Tarifs</a><a href="#auth" class="cta-nav">Connexion</a></div>
-</nav>
-
-<!-- HERO -->
-<main class="hero" role="banner">
-<div class="hero-logo">
-<!-- Grand logo hero -->
-<svg viewBox="0 0 88 88" fill="none" xmlns="http://www.w3.org/2000/svg">
-<defs>
-<linearGradient id="lg2" x1="0" y1="0" x2="88" y2="88"><stop offset="0%" stop-color="#3b82f6"/><stop offset="100%" stop-color="#10b981"/></linearGradient>
-<linearGradient id="lg3" x1="0" y1="0" x2="88" y2="88"><stop offset="0%" stop-color="#60a5fa"/><stop offset="100%" stop-color="#34d399"/></linearGradient>
-</defs>
-<rect width="88" height="88" rx="24" fill="url(#lg2)"/>
-<rect x="4" y="4" width="80" height="80" rx="20" fill="none" stroke="rgba(255,255,255,.15)" stroke-width="1"/>
-<!-- Virgule 1 - grande -->
-<path d="M28 22c0 12 6 20 14 26" stroke="rgba(255,255,255,.85)" stroke-width="5" stroke-linecap="round" fill="none"/>
-<!-- Virgule 2 - petite -->
-<path d="M46 22c0 12 6 20 14 26" stroke="rgba(255,255,255,.4)" stroke-width="5" stroke-linecap="round" fill="none"/>
-<!-- Check mark -->
-<path d="M24 55l12 12 24-24" stroke="#fff" stroke-width="5" stroke-linecap="round" stroke-linejoin="round" fill="none"/>
-</svg>
-</div>
-<h1>La conformite sociale et fiscale<br>enfin <em>maitrisee</em>.</h1>
-<p>Analysez bulletins de paie, DSN, bordereaux URSSAF et documents fiscaux. Detectez chaque ecart en euros. Generez vos declarations. Pour dirigeants, comptables et experts.</p>
-<div class="hero-btns">
-<button class="cta-main" onclick="document.getElementById('auth').scrollIntoView({behavior:'smooth'})">Commencer maintenant</button>
-<button class="cta-sec" onclick="document.getElementById('pricing').scrollIntoView({behavior:'smooth'})">Voir les tarifs</button>
-</div>
-<div class="inst-bar">
-<div class="inst-badge" style="max-width:600px;font-size:.95em;letter-spacing:.01em">Couvrez l'ensemble de vos obligations sociales et fiscales en un seul outil</div>
-</div>
-</main>
-
-<!-- Trust bar -->
-<div class="trust-bar">
-<div class="inner">
-<div class="trust-item"><svg viewBox="0 0 18 18" fill="none"><path d="M9 1l2 4h4.5l-3.5 3 1.2 4.5L9 10l-4.2 2.5L6 8 2.5 5H7z" fill="#3b82f6" opacity=".6"/></svg>Norme NEODeS Phase 3</div>
-<div class="trust-sep"></div>
-<div class="trust-item"><svg viewBox="0 0 18 18" fill="none"><rect x="2" y="2" width="14" height="14" rx="2" stroke="#3b82f6" stroke-width="1.2"/><path d="M6 9l2 2 4-4" stroke="#10b981" stroke-width="1.5" stroke-linecap="round" stroke-linejoin="round"/></svg>FEC conforme art. L.47 A-I LPF</div>
-<div class="trust-sep"></div>
-<div class="trust-item"><svg viewBox="0 0 18 18" fill="none"><circle cx="9" cy="9" r="7" stroke="#10b981" stroke-width="1"/><path d="M6 9l2 2 4-4" stroke="#10b981" stroke-width="1.2" stroke-linecap="round" stroke-linejoin="round"/></svg>Conforme RGPD</div>
-<div class="trust-sep"></div>
-<div class="trust-item"><svg viewBox="0 0 18 18" fill="none"><path d="M9 1.5l7 4v5c0 4-3 7-7 8.5-4-1.5-7-4.5-7-8.5v-5l7-4z" stroke="#3b82f6" stroke-width="1" fill="none"/><path d="M7 9l1.5 1.5 3-3" stroke="#10b981" stroke-width="1.2" stroke-linecap="round"/></svg>Donnees chiffrees</div>
-</div>
-</div>
-
-<!-- Formats -->
-<div class="formats-bar">
-<div class="inner">
-<span>Formats compatibles :</span>
-<span class="tag">PDF</span><span class="tag">Excel</span><span class="tag">CSV</span><span class="tag">DSN</span><span class="tag">XML</span><span class="tag">FEC</span><span class="tag">Images</span><span class="tag">DOCX</span>
-<span style="color:var(--slate-300)">|</span>
-<span>Compatible avec tous les logiciels de paie et comptabilite</span>
-</div>
-</div>
-
-<div class="pricing" id="pricing">
-<h2>Tarification adaptative</h2>
-<p class="sub">Un prix adapte a votre equipe. Toutes les fonctionnalites incluses, sans surprises.</p>
-<div class="plans">
-<div class="plan">
-<h3>Solo</h3>
-<div class="price">59,99 EUR <em>HT / mois</em></div>
-<div class="profiles">1 profil utilisateur</div>
-<ul>
-<li>Toutes les fonctionnalites</li>
-<li>Analyses illimitees</li>
-<li>Comptabilite, DSN, factures</li>
-<li>Simulations (paie, micro, TNS)</li>
-<li>Veille juridique 2020-2026</li>
-<li>Export CSV</li>
-</ul>
-<button class="plan-btn" onclick="selectOffer('solo')">Choisir Solo</button>
-</div>
-<div class="plan pop">
-<h3>Equipe</h3>
-<div class="price">119,99 EUR <em>HT / mois</em></div>
-<div class="profiles">Jusqu'a 3 profils</div>
-<ul>
-<li>Toutes les fonctionnalites</li>
-<li>3 profils collaborateurs</li>
-<li>Profil decisionnaire</li>
-<li>Tracabilite des actions</li>
-<li>Bibliotheque partagee</li>
-</ul>
-<button class="plan-btn" onclick="selectOffer('equipe')">Choisir Equipe</button>
-</div>
-<div class="plan">
-<h3>Cabinet</h3>
-<div class="price">249,99 EUR <em>HT / mois</em></div>
-<div class="profiles">Jusqu'a 10 profils</div>
-<ul>
-<li>Toutes les fonctionnalites</li>
-<li>10 profils collaborateurs</li>
-<li>Multi-dossiers (portefeuille)</li>
-<li>DSN multi-etablissements</li>
-<li>Accompagnement demarrage</li>
-</ul>
-<button class="plan-btn" onclick="selectOffer('cabinet')">Choisir Cabinet</button>
-</div>
-</div>
-</div>
-
-<div class="feat" id="features">
-<h2>Plateforme complete de conformite</h2>
-<p class="sub">Tous les outils pour maitriser vos obligations sociales et fiscales.</p>
-<div class="fg">
-<div class="fc"><div class="ic bl">&#128269;</div><h3>Analyse et detection</h3><p>Rapprochement DSN / livre de paie. Ecarts par salarie, par rubrique. Score de risque par destinataire (URSSAF, DGFIP, France Travail).</p></div>
-<div class="fc"><div class="ic tl">&#128200;</div><h3>Dashboard dirigeant</h3><p>Vision globale : anomalies, charges, conformite, scores URSSAF / Fiscal / France Travail / GUSO / AGESSA.</p></div>
-<div class="fc"><div class="ic pu">&#128196;</div><h3>Comptabilite integree</h3><p>Grand livre, balance, bilan, resultat, TVA. FEC conforme art. L.47 A-I. Ecritures manuelles tracees.</p></div>
-<div class="fc"><div class="ic am">&#128221;</div><h3>Generation DSN</h3><p>Declarations sociales nominatives NEODeS Phase 3. Salaries, cotisations, arrets, contrats. 80+ codes CTP.</p></div>
-<div class="fc"><div class="ic bl">&#9878;</div><h3>Veille juridique</h3><p>Baremes et legislation 2020-2026. PMSS, SMIC, taux AT/MP. Comparaison interannuelle. Mise a jour mensuelle.</p></div>
-<div class="fc"><div class="ic gr">&#128101;</div><h3>Collaboration</h3><p>Invitez des collaborateurs. Tracabilite des actions. Profil decisionnaire pour validation.</p></div>
-<div class="fc"><div class="ic tl">&#128203;</div><h3>Gestion factures</h3><p>Analyse OCR, comptabilisation auto, suivi paiements (paye/impaye), historique complet.</p></div>
-<div class="fc"><div class="ic gr">&#128274;</div><h3>Securite et RGPD</h3><p>Donnees chiffrees, acces controle, conformite RGPD. Validation NIR, SIRET par algorithme de Luhn.</p></div>
-</div>
-</div>
-
-<div class="guarantee">
-<h3>Garantie et transparence</h3>
-<p>NormaCheck est un outil d'aide a la decision. Les analyses produites sont indicatives et ne se substituent pas a l'avis d'un expert-comptable ou d'un conseil juridique. Les resultats ne sont pas opposables aux administrations (URSSAF, DGFIP, France Travail, etc.). L'utilisation de NormaCheck ne dispense pas de vos obligations declaratives et de paiement.</p>
-</div>
-
-<div class="tgt"><h2>Concu pour les professionnels</h2><div class="tg">
-<div class="ti"><div class="ic2">&#128188;</div><h4>Dirigeants</h4><p>Pilotez votre conformite</p></div>
-<div class="ti"><div class="ic2">&#128202;</div><h4>Comptables</h4><p>Automatisez vos controles</p></div>
-<div class="ti"><div class="ic2">&#127891;</div><h4>Experts-comptables</h4><p>Multi-dossiers</p></div>
-<div class="ti"><div class="ic2">&#128270;</div><h4>Inspecteurs</h4><p>Verification rapide</p></div>
-</div></div>
-
-<div class="auth-sec" id="auth"><div class="auth-card">
-<h2>Acces a NormaCheck</h2>
-<div class="auth-tabs"><div class="auth-tab active" onclick="showAT('login')" tabindex="0" role="tab" aria-selected="true">Connexion</div><div class="auth-tab" onclick="showAT('register')" tabindex="0" role="tab" aria-selected="false">Inscription</div></div>
-<div id="amsg" class="msg"></div>
-<div class="auth-form active" id="form-login">
-<label for="le">Adresse email</label><input type="email" id="le" placeholder="votre@email.fr" autocomplete="username">
-<label for="lp">Mot de passe</label><input type="password" id="lp" placeholder="Votre mot de passe" autocomplete="current-password">
-<button class="submit-btn" onclick="doLogin()">Se connecter</button>
-</div>
-<div class="auth-form" id="form-register">
-<div id="reg-step-1">
-<label for="r-offre">Offre choisie</label>
-<div class="offer-selector" id="offer-selector">
-<label class="offer-opt selected" data-offer="solo"><input type="radio" name="offre" value="solo" checked style="display:none"><strong>Solo</strong><span>1 profil - 59,99 EUR/mois</span></label>
-<label class="offer-opt" data-offer="equipe"><input type="radio" name="offre" value="equipe" style="display:none"><strong>Equipe</strong><span>3 profils - 119,99 EUR/mois</span></label>
-<label class="offer-opt" data-offer="cabinet"><input type="radio" name="offre" value="cabinet" style="display:none"><strong>Cabinet</strong><span>10 profils - 249,99 EUR/mois</span></label>
-</div>
-<label for="r-role">Votre role</label>
-<select id="r-role" style="width:100%;padding:11px 14px;border:1.5px solid var(--slate-200);border-radius:8px;font-size:.93em;margin-bottom:12px;background:var(--slate-50);font-family:inherit">
-<option value="">-- Selectionnez votre role --</option>
-<option value="expert_comptable">Expert-comptable</option>
-<option value="comptable">Comptable</option>
-<option value="gestionnaire_paie">Gestionnaire de paie</option>
-<option value="dirigeant">Dirigeant / Gerant</option>
-<option value="collaborateur">Collaborateur</option>
-<option value="inspecteur">Inspecteur / Controleur</option>
-</select>
-<label for="rn">Nom</label><input id="rn" placeholder="Dupont" autocomplete="family-name">
-<label for="rp2">Prenom</label><input id="rp2" placeholder="Jean" autocomplete="given-name">
-<label for="r-entreprise">Entreprise / Cabinet</label><input id="r-entreprise" placeholder="Nom de votre structure (facultatif)">
-<label for="r-tel">Telephone</label><input type="tel" id="r-tel" placeholder="06 12 34 56 78" autocomplete="tel">
-<label for="re">Email professionnel</label><input type="email" id="re" placeholder="jean@cabinet-dupont.fr" autocomplete="email">
-<label for="rpw">Mot de passe</label><input type="password" id="rpw" placeholder="Min. 12 caracteres, majuscules et minuscules" autocomplete="new-password">
-<label for="rpw2">Confirmer</label><input type="password" id="rpw2" placeholder="Confirmez votre mot de passe" autocomplete="new-password">
-<div style="margin:14px 0;padding:14px;background:var(--slate-50);border-radius:10px;font-size:.82em;color:var(--slate-500)">
-<label style="display:flex;align-items:center;gap:8px;font-weight:400;margin:0;cursor:pointer"><input type="checkbox" id="cgv" style="width:auto;margin:0"> J'accepte les <a href="/legal/cgu" target="_blank" style="color:var(--blue)">CGU</a> et <a href="/legal/cgv" target="_blank" style="color:var(--blue)">CGV</a>.</label></div>
-<button class="submit-btn" onclick="doReg()">Creer mon compte</button>
-</div>
-<div id="reg-step-verify" style="display:none">
-<div style="text-align:center;padding:10px 0 20px">
-<div style="font-size:2em;margin-bottom:10px">&#9993;</div>
-<p style="font-size:.95em;color:var(--slate-600)">Un code de verification a 6 chiffres a ete envoye a votre adresse email.</p>
-<p style="font-size:.82em;color:var(--slate-400);margin-top:6px">Saisissez-le ci-dessous pour activer votre compte.</p>
-</div>
-<label for="r-verif-code">Code de verification</label>
-<input id="r-verif-code" placeholder="000000" maxlength="6" style="text-align:center;font-size:1.4em;letter-spacing:.3em;font-weight:700" autocomplete="one-time-code">
-<button class="submit-btn" onclick="doVerify()" style="margin-top:12px">Verifier mon email</button>
-<button onclick="doResendCode()" style="background:none;border:none;color:var(--blue);cursor:pointer;font-size:.82em;margin-top:10px;width:100%;text-align:center;font-family:inherit">Renvoyer le code</button>
-</div>
-<div class="rgpd">Vos donnees sont traitees conformement au RGPD (Reglement UE 2016/679). Vous disposez d'un droit d'acces, de rectification et de suppression de vos donnees. Contact : dpo@normacheck-app.fr</div>
-</div></div></div>
-
-<footer>
-<div class="links">
-<a href="/legal/mentions">Mentions legales</a>
-<a href="/legal/cgu">CGU</a>
-<a href="/legal/cgv">CGV</a>
-<a href="/legal/mentions#rgpd">RGPD</a>
-</div>
-NormaCheck v3.9.0 &mdash; Conformite sociale et fiscale &copy; 2026<br>
-<span style="font-size:.85em;opacity:.6">Outil d'aide a la decision - Non opposable aux administrations (URSSAF, DGFIP, France Travail, etc.)</span>
-</footer>
-<script>
-function showAT(t){
-document.querySelectorAll(".auth-tab").forEach(function(b,i){
-var isActive=i===(t==="login"?0:1);
-b.classList.toggle("active",isActive);
-b.setAttribute("aria-selected",isActive?"true":"false");
-});
-document.getElementById("form-login").classList.toggle("active",t==="login");
-document.getElementById("form-register").classList.toggle("active",t==="register");
-document.getElementById("amsg").className="msg";
-}
-/* Keyboard support for auth tabs */
-document.addEventListener("keydown",function(e){
-if(e.target.classList.contains("auth-tab")&&(e.key==="Enter"||e.key===" ")){
-e.preventDefault();e.target.click();
-}
-});
-function doLogin(){var email=document.getElementById("le").value.trim();var pwd=document.getElementById("lp").value;if(!email){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Veuillez saisir votre identifiant.";return;}var btn=document.querySelector("#form-login .submit-btn");btn.disabled=true;btn.textContent="Connexion...";var fd=new FormData();fd.append("email",email);fd.append("mot_de_passe",pwd);fetch("/api/auth/login",{method:"POST",body:fd,credentials:"same-origin"}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Identifiants incorrects")});return r.json();}).then(function(d){sessionStorage.setItem("nc_user",JSON.stringify(d));var m=document.getElementById("amsg");m.className="msg ok";m.textContent="Connexion reussie. Redirection...";setTimeout(function(){window.location.href="/app"},600);}).catch(function(e){var m=document.getElementById("amsg");m.className="msg err";m.textContent=e.message;btn.disabled=false;btn.textContent="Se connecter";});}
-var _regEmail="";
-function selectOffer(o){document.querySelectorAll(".offer-opt").forEach(function(el){el.classList.toggle("selected",el.dataset.offer===o);if(el.dataset.offer===o)el.querySelector("input").checked=true;});showAT("register");}
-document.querySelectorAll(".offer-opt").forEach(function(el){el.addEventListener("click",function(){selectOffer(el.dataset.offer);});});
-function doReg(){var nom=document.getElementById("rn").value.trim();var prenom=document.getElementById("rp2").value.trim();var email=document.getElementById("re").value.trim();var pwd=document.getElementById("rpw").value;var role=document.getElementById("r-role").value;var offre=document.querySelector('input[name="offre"]:checked').value;var entreprise=document.getElementById("r-entreprise").value.trim();var tel=document.getElementById("r-tel").value.trim();if(!nom||!prenom||!email){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Nom, prenom et email sont obligatoires.";return;}if(!role){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Veuillez selectionner votre role.";return;}if(!/^[^\s@]+@[^\s@]+\.[^\s@]+$/.test(email)){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Adresse email invalide.";return;}if(pwd.length<12){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Le mot de passe doit contenir au moins 12 caracteres.";return;}if(pwd===pwd.toLowerCase()||pwd===pwd.toUpperCase()){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Le mot de passe doit contenir des majuscules et des minuscules.";return;}if(pwd!==document.getElementById("rpw2").value){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Les mots de passe ne correspondent pas.";return;}if(!document.getElementById("cgv").checked){var m2=document.getElementById("amsg");m2.className="msg err";m2.textContent="Veuillez accepter les CGU et CGV.";return;}var btn=document.querySelector("#reg-step-1 .submit-btn");btn.disabled=true;btn.textContent="Creation...";var fd=new FormData();fd.append("nom",nom);fd.append("prenom",prenom);fd.append("email",email);fd.append("mot_de_passe",pwd);fd.append("offre",offre);fd.append("role",role);fd.append("entreprise",entreprise);fd.append("telephone",tel);_regEmail=email;fetch("/api/auth/register",{method:"POST",body:fd,credentials:"same-origin"}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur lors de l inscription")});return r.json();}).then(function(d){sessionStorage.setItem("nc_user",JSON.stringify(d));document.getElementById("reg-step-1").style.display="none";document.getElementById("reg-step-verify").style.display="block";var m=document.getElementById("amsg");m.className="msg ok";m.textContent="Compte cree ! Verifiez votre email.";}).catch(function(e){var m=document.getElementById("amsg");m.className="msg err";m.textContent=e.message;btn.disabled=false;btn.textContent="Creer mon compte";});}
-function doVerify(){var code=document.getElementById("r-verif-code").value.trim();if(!code||code.length!==6){var m=document.getElementById("amsg");m.className="msg err";m.textContent="Saisissez le code a 6 chiffres.";return;}var fd=new FormData();fd.append("email",_regEmail);fd.append("code",code);fetch("/api/auth/verify-email",{method:"POST",body:fd,credentials:"same-origin"}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Code invalide")});return r.json();}).then(function(){var m=document.getElementById("amsg");m.className="msg ok";m.textContent="Email verifie ! Redirection...";setTimeout(function(){window.location.href="/app"},800);}).catch(function(e){var m=document.getElementById("amsg");m.className="msg err";m.textContent=e.message;});}
-function doResendCode(){fetch("/api/auth/resend-verification",{method:"POST",credentials:"same-origin"}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){var m=document.getElementById("amsg");m.className="msg ok";m.textContent="Nouveau code envoye a votre adresse email.";}).catch(function(e){var m=document.getElementById("amsg");m.className="msg err";m.textContent=e.message||"Erreur lors du renvoi du code.";});}
-</script>
-</body>
-</html>"""
-
-
-LEGAL_CGU = """<!DOCTYPE html>
-<html lang="fr"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<title>NormaCheck - Conditions Generales d'Utilisation</title>
-<style>*{margin:0;padding:0;box-sizing:border-box}body{font-family:-apple-system,sans-serif;background:#f8fafc;color:#1e293b;line-height:1.7}
-.nav{background:#0f172a;color:#fff;padding:14px 40px;display:flex;justify-content:space-between;align-items:center}
-.nav a{color:#60a5fa;text-decoration:none;font-size:.9em}.nav .logo{font-size:1.4em;font-weight:800}
-.nav .logo em{font-style:normal;color:#60a5fa}
-.content{max-width:800px;margin:40px auto;padding:0 20px}
-h1{color:#0f172a;font-size:1.8em;margin-bottom:24px}h2{color:#0f172a;font-size:1.2em;margin:24px 0 10px;padding-bottom:6px;border-bottom:1px solid #e2e8f0}
-p,li{font-size:.92em;margin-bottom:10px}ul{margin-left:20px}
-.warn{background:#fffbeb;border:1px solid #fde68a;padding:16px;border-radius:10px;margin:20px 0;color:#92400e;font-size:.9em}
-footer{text-align:center;padding:30px;color:#94a3b8;font-size:.82em;margin-top:40px}
-@media(max-width:640px){.content{padding:0 14px;margin:20px auto}h1{font-size:1.4em}.nav{padding:12px 16px}}</style></head>
-<body>
-<div class="nav"><div class="logo"><em>NormaCheck</em></div><a href="/">Retour a l'accueil</a></div>
-<div class="content">
-<h1>Conditions Generales d'Utilisation</h1>
-<p><em>Derniere mise a jour : 5 mars 2026 — Version 2.0</em></p>
-
-<div class="warn"><strong>AVERTISSEMENT ESSENTIEL :</strong> NormaCheck est exclusivement un <strong>outil d'aide a la decision</strong> destine aux professionnels. Les analyses, calculs, simulations, scores et recommandations produits par la plateforme sont fournis <strong>a titre purement indicatif</strong> et ne constituent en aucun cas un conseil juridique, fiscal, comptable ou social. Les resultats fournis <strong>ne sont pas opposables</strong> aux administrations (URSSAF, DGFIP, France Travail, MSA, AGIRC-ARRCO, etc.). L'utilisateur <strong>doit imperativement</strong> faire valider toute decision par un professionnel qualifie (expert-comptable, commissaire aux comptes, avocat specialise).</div>
-
-<h2>Article 1 - Objet et definitions</h2>
-<p>Les presentes Conditions Generales d'Utilisation (ci-apres "CGU") regissent l'acces et l'utilisation de la plateforme NormaCheck (ci-apres "la Plateforme"), editee par NormaCheck (ci-apres "l'Editeur").</p>
-<p><strong>Definitions :</strong></p>
-<ul>
-<li><strong>"Plateforme"</strong> : l'ensemble des services, interfaces, algorithmes et bases de donnees de NormaCheck</li>
-<li><strong>"Utilisateur"</strong> : toute personne physique ou morale ayant cree un compte sur la Plateforme</li>
-<li><strong>"Resultats"</strong> : l'ensemble des analyses, scores, simulations, calculs et rapports produits par la Plateforme</li>
-<li><strong>"Donnees"</strong> : les documents, fichiers et informations transmis par l'Utilisateur a la Plateforme</li>
-</ul>
-
-<h2>Article 2 - Nature du service et limites</h2>
-<p>NormaCheck est un outil informatique d'aide a la decision. <strong>La Plateforme ne fournit pas de prestations de conseil juridique, fiscal ou comptable</strong> au sens des professions reglementees (ordonnance n°45-2138 du 19 septembre 1945 pour les experts-comptables, loi n°71-1130 du 31 decembre 1971 pour les avocats).</p>
-<p>Les Resultats produits par la Plateforme :</p>
-<ul>
-<li>Sont fondes sur les donnees fournies par l'Utilisateur et les referentiels legislatifs et reglementaires integres</li>
-<li>Peuvent contenir des erreurs, omissions ou imprecisions inherentes au traitement automatise</li>
-<li>Ne prennent pas en compte l'ensemble des specificites individuelles de chaque situation</li>
-<li>Ne se substituent en aucun cas a une consultation professionnelle personnalisee</li>
-<li>N'ont aucune valeur probante devant les juridictions ou administrations</li>
-<li>Sont susceptibles d'etre obsoletes en cas d'evolution legislative ou reglementaire non encore integree</li>
-</ul>
-
-<h2>Article 3 - Acces au service</h2>
-<p>L'acces a NormaCheck necessite la creation d'un compte utilisateur. L'Utilisateur s'engage a :</p>
-<ul>
-<li>Fournir des informations exactes, completes et a jour lors de l'inscription</li>
-<li>Maintenir la stricte confidentialite de ses identifiants et mots de passe</li>
-<li>Informer immediatement l'Editeur de toute utilisation non autorisee de son compte</li>
-<li>Ne pas partager ses identifiants avec des tiers non autorises</li>
-</ul>
-<p>Toute utilisation du compte est reputee effectuee par le titulaire. <strong>L'Editeur ne saurait etre tenu responsable des consequences d'un acces non autorise resultant de la negligence de l'Utilisateur dans la protection de ses identifiants.</strong></p>
-
-<h2>Article 4 - Obligations de l'Utilisateur</h2>
-<p>L'Utilisateur s'engage a :</p>
-<ul>
-<li>Utiliser NormaCheck dans le strict respect de la legislation en vigueur</li>
-<li>Ne pas tenter de contourner, desactiver ou compromettre les mesures de securite de la Plateforme</li>
-<li>Ne pas utiliser le service a des fins illicites, frauduleuses ou contraires a l'ordre public</li>
-<li><strong>Verifier systematiquement les Resultats avec un professionnel qualifie avant toute prise de decision</strong></li>
-<li>Ne pas redistribuer, revendre, sous-licencier ou mettre a disposition de tiers non autorises l'acces au service</li>
-<li>Ne pas utiliser la Plateforme pour stocker ou transmettre des donnees illicites ou portant atteinte aux droits de tiers</li>
-<li>Ne pas proceder a de l'extraction systematique de donnees (scraping) ou a de la retro-ingenierie</li>
-<li>Respecter les limitations techniques et les quotas d'utilisation applicables a son abonnement</li>
-</ul>
-
-<h2>Article 5 - Propriete intellectuelle</h2>
-<p>L'ensemble des elements de NormaCheck (logiciel, code source, algorithmes, interfaces, bases de donnees, referentiels, documentation, marques et logos) est protege par le droit de la propriete intellectuelle (Code de la propriete intellectuelle, directive 2009/24/CE sur la protection juridique des programmes d'ordinateur, directive 96/9/CE sur la protection juridique des bases de donnees).</p>
-<p>Toute reproduction, representation, adaptation, traduction ou exploitation non expressement autorisee est interdite et constitue une contrefacon sanctionnee par les articles L.335-2 et suivants du Code de la propriete intellectuelle.</p>
-<p>Les documents uploades et Donnees transmis par l'Utilisateur restent sa propriete exclusive. L'Editeur s'interdit tout usage des Donnees a d'autres fins que la fourniture du service.</p>
-
-<h2>Article 6 - Limitation de responsabilite</h2>
-<div class="warn"><strong>Clause essentielle :</strong> L'Utilisateur reconnait avoir ete clairement informe des limites du service avant toute utilisation. Les dispositions suivantes constituent une condition essentielle et determinante du consentement de l'Editeur a la fourniture du service.</div>
-<p>NormaCheck est fourni <strong>"en l'etat" et "tel que disponible"</strong>, sans garantie d'aucune sorte, expresse ou implicite. L'Editeur ne garantit pas :</p>
-<ul>
-<li>L'exactitude, l'exhaustivite ou la fiabilite des Resultats produits par la Plateforme</li>
-<li>L'adequation du service aux besoins particuliers de l'Utilisateur</li>
-<li>La disponibilite ininterrompue, securisee et sans erreur du service</li>
-<li>La conformite des Resultats a la legislation en vigueur a la date de la consultation</li>
-<li>L'absence de bugs, virus ou elements nuisibles dans le service</li>
-</ul>
-<p><strong>L'Editeur decline expressement toute responsabilite :</strong></p>
-<ul>
-<li>Pour les decisions prises par l'Utilisateur sur la base des Resultats de NormaCheck</li>
-<li>Pour les consequences financieres, fiscales, sociales, penales ou juridiques decoulant directement ou indirectement de l'utilisation de la Plateforme</li>
-<li>Pour les redressements URSSAF, fiscaux, ou toute sanction administrative resultant de calculs ou analyses de la Plateforme</li>
-<li>Pour les pertes de donnees, d'exploitation ou de chiffre d'affaires</li>
-<li>Pour les dommages indirects, accessoires, speciaux ou consecutifs de quelque nature que ce soit</li>
-<li>Pour les erreurs dans les taux, baremes, seuils ou references legislatives integres dans la Plateforme</li>
-</ul>
-<p><strong>En tout etat de cause, la responsabilite totale de l'Editeur, toutes causes confondues, est limitee au montant des sommes effectivement versees par l'Utilisateur au cours des douze (12) derniers mois precedant le fait generateur.</strong></p>
-<p>L'Utilisateur s'engage a ne formuler aucune reclamation, action ou demande d'indemnisation a l'encontre de l'Editeur pour les dommages resultant de l'utilisation des Resultats sans validation prealable par un professionnel qualifie.</p>
-
-<h2>Article 7 - Indemnisation</h2>
-<p>L'Utilisateur s'engage a garantir et indemniser l'Editeur, ses dirigeants, employes et partenaires contre toute reclamation, perte, dommage, cout ou depense (y compris les frais de justice et honoraires d'avocats raisonnables) resultant de :</p>
-<ul>
-<li>La violation des presentes CGU par l'Utilisateur</li>
-<li>L'utilisation du service en violation de la loi ou des droits de tiers</li>
-<li>Les contenus ou Donnees transmis par l'Utilisateur via la Plateforme</li>
-<li>Toute reclamation d'un tiers liee a l'utilisation des Resultats par l'Utilisateur</li>
-</ul>
-
-<h2>Article 8 - Donnees personnelles et RGPD</h2>
-<p>Conformement au Reglement General sur la Protection des Donnees (RGPD - Reglement UE 2016/679), a la loi n°78-17 du 6 janvier 1978 modifiee (Informatique et Libertes) et aux recommandations de la CNIL, l'Utilisateur dispose des droits suivants :</p>
-<ul>
-<li><strong>Droit d'acces (art. 15 RGPD) :</strong> obtenir la communication de ses donnees personnelles et des informations sur leur traitement</li>
-<li><strong>Droit de rectification (art. 16 RGPD) :</strong> corriger des donnees inexactes ou incompletes</li>
-<li><strong>Droit a l'effacement (art. 17 RGPD) :</strong> demander la suppression de ses donnees dans les conditions prevues par le reglement</li>
-<li><strong>Droit a la portabilite (art. 20 RGPD) :</strong> recuperer ses donnees dans un format structure, couramment utilise et lisible par machine</li>
-<li><strong>Droit d'opposition (art. 21 RGPD) :</strong> s'opposer au traitement de ses donnees pour des motifs tenant a sa situation particuliere</li>
-<li><strong>Droit a la limitation du traitement (art. 18 RGPD) :</strong> obtenir la limitation du traitement dans les cas prevus par le reglement</li>
-<li><strong>Droit relatif aux decisions automatisees (art. 22 RGPD) :</strong> obtenir une intervention humaine, exprimer son point de vue et contester toute decision fondee exclusivement sur un traitement automatise. Les scores NormaCheck sont provisoires et necessitent une validation humaine</li>
-</ul>
-<p><strong>Finalites du traitement :</strong> fourniture du service, analyse de documents, generation de rapports, amelioration des algorithmes. <strong>Base legale :</strong> execution du contrat (art. 6.1.b RGPD).</p>
-<p><strong>Duree de conservation :</strong> les donnees sont conservees pendant la duree du contrat et 3 ans apres la fin de la relation contractuelle (prescription civile de droit commun). Les donnees comptables et fiscales sont conservees conformement aux obligations legales (6 ans, art. L.102 B du LPF).</p>
-<p><strong>Hebergement :</strong> les donnees sont hebergees en France / Union Europeenne. Aucun transfert hors UE n'est effectue.</p>
-<p><strong>Securite :</strong> les donnees sont chiffrees au repos et en transit. Les acces sont controles par authentification et journalises.</p>
-<p>Pour exercer vos droits ou pour toute question : <strong>dpo@normacheck-app.fr</strong>. En cas de reclamation, vous pouvez saisir la CNIL (www.cnil.fr).</p>
-
-<h2>Article 9 - Signature electronique</h2>
-<p>La Plateforme propose un service de signature electronique conforme au Reglement (UE) n°910/2014 (eIDAS) :</p>
-<ul>
-<li><strong>SEA (Signature Electronique Avancee, art. 26 eIDAS) :</strong> identifie le signataire de maniere univoque, est liee aux donnees de maniere a detecter toute modification ulterieure. Recevable en preuve (art. 25.1 eIDAS)</li>
-<li><strong>SEQ (Signature Electronique Qualifiee, art. 3.12 eIDAS) :</strong> beneficie de la presomption d'equivalence avec la signature manuscrite (art. 25.2 eIDAS). Necessite un certificat qualifie et un dispositif de creation qualifie</li>
-</ul>
-<p>L'Editeur ne garantit pas la qualification SEQ au sens strict du reglement eIDAS en l'absence de recours a un prestataire de services de confiance qualifie (PSCQ) inscrit sur la liste de confiance de l'ANSSI. La signature generee par la Plateforme constitue une SEA et peut etre soumise a un PSCQ pour obtenir le niveau SEQ.</p>
-
-<h2>Article 10 - Force majeure</h2>
-<p>L'Editeur ne saurait etre tenu responsable de l'inexecution ou du retard dans l'execution de ses obligations en cas de force majeure au sens de l'article 1218 du Code civil, incluant notamment : catastrophe naturelle, pandemie, greve, panne de reseau, cyberattaque, decision gouvernementale ou administrative.</p>
-
-<h2>Article 11 - Duree et resiliation</h2>
-<p>L'inscription est valable pour une duree indeterminee. L'Utilisateur peut supprimer son compte a tout moment via les parametres de son compte ou par demande a l'adresse de contact.</p>
-<p>L'Editeur se reserve le droit de suspendre ou resilier un compte, sans preavis ni indemnite, en cas de :</p>
-<ul>
-<li>Violation des presentes CGU</li>
-<li>Utilisation frauduleuse ou abusive du service</li>
-<li>Defaut de paiement (pour les abonnements payants)</li>
-<li>Inactivite prolongee (plus de 24 mois)</li>
-</ul>
-
-<h2>Article 12 - Modification des CGU</h2>
-<p>L'Editeur se reserve le droit de modifier les presentes CGU a tout moment. Les Utilisateurs seront informes de toute modification substantielle par email ou notification dans la Plateforme au moins 30 jours avant l'entree en vigueur. La poursuite de l'utilisation du service apres cette date vaut acceptation des CGU modifiees. En cas de refus, l'Utilisateur peut resilier son compte avant l'entree en vigueur.</p>
-
-<h2>Article 13 - Divisibilite</h2>
-<p>Si l'une quelconque des dispositions des presentes CGU est declaree nulle ou inapplicable par une juridiction competente, les autres dispositions conservent leur pleine force et leur plein effet.</p>
-
-<h2>Article 14 - Droit applicable et juridiction competente</h2>
-<p>Les presentes CGU sont soumises au droit francais. <strong>Tout litige relatif a l'interpretation ou a l'execution des presentes sera soumis a la competence exclusive des tribunaux competents du ressort du siege social de l'Editeur</strong>, sauf disposition imperative contraire.</p>
-<p>Conformement aux articles L.611-1 et R.612-1 du Code de la consommation, l'Utilisateur consommateur peut recourir gratuitement au service de mediation de la consommation. Le mediateur peut etre saisi via la plateforme en ligne de resolution des litiges de la Commission europeenne (https://ec.europa.eu/consumers/odr).</p>
-</div>
-<footer>NormaCheck v3.9.0 &copy; 2026 - <a href="/" style="color:#60a5fa">Retour</a></footer>
-</body></html>"""
-
-
-LEGAL_CGV = """<!DOCTYPE html>
-<html lang="fr"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<title>NormaCheck - Conditions Generales de Vente</title>
-<style>*{margin:0;padding:0;box-sizing:border-box}body{font-family:-apple-system,sans-serif;background:#f8fafc;color:#1e293b;line-height:1.7}
-.nav{background:#0f172a;color:#fff;padding:14px 40px;display:flex;justify-content:space-between;align-items:center}
-.nav a{color:#60a5fa;text-decoration:none;font-size:.9em}.nav .logo{font-size:1.4em;font-weight:800}
-.nav .logo em{font-style:normal;color:#60a5fa}
-.content{max-width:800px;margin:40px auto;padding:0 20px}
-h1{color:#0f172a;font-size:1.8em;margin-bottom:24px}h2{color:#0f172a;font-size:1.2em;margin:24px 0 10px;padding-bottom:6px;border-bottom:1px solid #e2e8f0}
-p,li{font-size:.92em;margin-bottom:10px}ul{margin-left:20px}
-.warn{background:#fffbeb;border:1px solid #fde68a;padding:16px;border-radius:10px;margin:20px 0;color:#92400e;font-size:.9em}
-footer{text-align:center;padding:30px;color:#94a3b8;font-size:.82em;margin-top:40px}
-@media(max-width:640px){.content{padding:0 14px;margin:20px auto}h1{font-size:1.4em}.nav{padding:12px 16px}}</style></head>
-<body>
-<div class="nav"><div class="logo"><em>NormaCheck</em></div><a href="/">Retour a l'accueil</a></div>
-<div class="content">
-<h1>Conditions Generales de Vente</h1>
-<p><em>Derniere mise a jour : 1er janvier 2026</em></p>
-
-<h2>Article 1 - Offres et tarifs</h2>
-<p>NormaCheck propose une tarification adaptative basee sur le nombre de profils utilisateurs :</p>
-<ul>
-<li><strong>Solo (59,99 EUR HT/mois, soit 719,88 EUR HT/an) :</strong> 1 profil utilisateur - Analyses illimitees, comptabilite, generation DSN, gestion factures, simulations, veille juridique 2020-2026, export CSV</li>
-<li><strong>Equipe (119,99 EUR HT/mois, soit 1 439,88 EUR HT/an) :</strong> Jusqu'a 3 profils - Tout Solo + collaboration multi-profils, profil decisionnaire, tracabilite, bibliotheque partagee, audit trail, support prioritaire</li>
-<li><strong>Cabinet (249,99 EUR HT/mois, soit 2 999,88 EUR HT/an) :</strong> Jusqu'a 10 profils - Tout Equipe + multi-dossiers (portefeuille), DSN multi-etablissements, veille personnalisee, accompagnement demarrage, support dedie</li>
-</ul>
-<p>Les prix sont indiques hors taxes. TVA applicable en sus au taux en vigueur. L'editeur se reserve le droit de modifier ses tarifs, les modifications ne s'appliquant pas aux licences en cours.</p>
-
-<h2>Article 2 - Commande et paiement</h2>
-<p>La commande est validee apres acceptation des CGV et paiement du prix. Le paiement est exigible immediatement a la commande. Les moyens de paiement acceptes sont : carte bancaire, virement.</p>
-
-<h2>Article 3 - Droit de retractation</h2>
-<p>Conformement a l'article L221-18 du Code de la consommation, le consommateur dispose d'un delai de 14 jours a compter de la souscription pour exercer son droit de retractation, sans avoir a justifier de motifs.</p>
-<p>Toutefois, conformement a l'article L221-28 du Code de la consommation, le droit de retractation ne peut etre exerce si le service a ete pleinement execute avant la fin du delai de retractation et si l'execution a commence avec l'accord prealable exprime du consommateur.</p>
-
-<h2>Article 4 - Livraison et acces</h2>
-<p>L'acces au service est immediat apres validation du paiement. La licence est delivree sous forme numerique (acces en ligne). Aucune livraison physique n'est effectuee.</p>
-
-<h2>Article 5 - Garantie et limitation de responsabilite</h2>
-<p>NormaCheck est un outil d'aide a la decision. L'editeur garantit le bon fonctionnement technique de la plateforme mais ne garantit pas l'exactitude des analyses produites.</p>
-<p>La responsabilite de l'editeur est limitee au montant de la licence acquise. L'editeur ne saurait etre tenu responsable des dommages indirects.</p>
-
-<div class="warn"><strong>Non-opposabilite :</strong> Les resultats produits par NormaCheck ne constituent pas des avis juridiques ou comptables et ne sont pas opposables aux administrations publiques (URSSAF, DGFIP, France Travail, MSA, caisses de retraite, etc.).</div>
-
-<h2>Article 6 - Service apres-vente et reclamations</h2>
-<p>Pour toute reclamation : support@normacheck-app.fr. Delai de reponse : 48 heures ouvrees.</p>
-
-<h2>Article 7 - Mediateur de la consommation</h2>
-<p>En cas de litige non resolu, le consommateur peut saisir gratuitement le mediateur de la consommation (article L612-1 du Code de la consommation).</p>
-
-<h2>Article 8 - Droit applicable</h2>
-<p>Les presentes CGV sont soumises au droit francais. Tout litige releve de la competence des tribunaux francais.</p>
-</div>
-<footer>NormaCheck v3.8.1 &copy; 2026 - <a href="/" style="color:#60a5fa">Retour</a></footer>
-</body></html>"""
-
-
-LEGAL_MENTIONS = """<!DOCTYPE html>
-<html lang="fr"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1.0">
-<title>NormaCheck - Mentions legales</title>
-<style>*{margin:0;padding:0;box-sizing:border-box}body{font-family:-apple-system,sans-serif;background:#f8fafc;color:#1e293b;line-height:1.7}
-.nav{background:#0f172a;color:#fff;padding:14px 40px;display:flex;justify-content:space-between;align-items:center}
-.nav a{color:#60a5fa;text-decoration:none;font-size:.9em}.nav .logo{font-size:1.4em;font-weight:800}
-.nav .logo em{font-style:normal;color:#60a5fa}
-.content{max-width:800px;margin:40px auto;padding:0 20px}
-h1{color:#0f172a;font-size:1.8em;margin-bottom:24px}h2{color:#0f172a;font-size:1.2em;margin:24px 0 10px;padding-bottom:6px;border-bottom:1px solid #e2e8f0}
-p,li{font-size:.92em;margin-bottom:10px}ul{margin-left:20px}
-.warn{background:#fffbeb;border:1px solid #fde68a;padding:16px;border-radius:10px;margin:20px 0;color:#92400e;font-size:.9em}
-footer{text-align:center;padding:30px;color:#94a3b8;font-size:.82em;margin-top:40px}
-@media(max-width:640px){.content{padding:0 14px;margin:20px auto}h1{font-size:1.4em}.nav{padding:12px 16px}}</style></head>
-<body>
-<div class="nav"><div class="logo"><em>NormaCheck</em></div><a href="/">Retour a l'accueil</a></div>
-<div class="content">
-<h1>Mentions legales</h1>
-
-<h2>Identification</h2>
-<p><strong>Denomination :</strong> NormaCheck - Plateforme de conformite sociale et fiscale</p>
-<p><strong>Forme juridique :</strong> [A completer]</p>
-<p><strong>Siege social :</strong> [A completer]</p>
-<p><strong>SIRET :</strong> [A completer]</p>
-<p><strong>Directeur de la publication :</strong> [A completer]</p>
-<p><strong>Contact :</strong> contact@normacheck-app.fr</p>
-
-<h2>Hebergement</h2>
-<p><strong>Hebergeur :</strong> Vercel Inc.</p>
-<p><strong>Adresse :</strong> 340 S Lemon Ave #4133, Walnut, CA 91789, USA</p>
-<p><strong>Site :</strong> vercel.com</p>
-
-<h2 id="rgpd">Protection des donnees personnelles (RGPD)</h2>
-<p>Conformement au Reglement General sur la Protection des Donnees (RGPD - Reglement UE 2016/679) et a la loi n 78-17 du 6 janvier 1978 relative a l'informatique, aux fichiers et aux libertes :</p>
-<ul>
-<li><strong>Responsable du traitement :</strong> L'editeur de NormaCheck</li>
-<li><strong>Donnees collectees :</strong> Nom, prenom, email, documents uploades (pour analyse uniquement)</li>
-<li><strong>Finalites :</strong> Fourniture du service d'analyse, gestion du compte, amelioration du service</li>
-<li><strong>Base legale :</strong> Execution du contrat (art. 6.1.b RGPD)</li>
-<li><strong>Duree de conservation :</strong> Donnees de compte : duree de l'inscription + 3 ans. Documents analyses : duree de la session d'analyse (suppression automatique)</li>
-<li><strong>Transferts :</strong> Les donnees peuvent etre traitees par l'hebergeur (Vercel, USA) dans le cadre de clauses contractuelles types approuvees par la Commission europeenne</li>
-<li><strong>Droits :</strong> Acces, rectification, suppression, portabilite, opposition, limitation</li>
-<li><strong>DPO :</strong> dpo@normacheck-app.fr</li>
-<li><strong>Reclamation CNIL :</strong> www.cnil.fr</li>
-</ul>
-
-<h2 id="art22">Decisions automatisees et droit a l'intervention humaine (Art. 22 RGPD)</h2>
-<div class="warn">
-<p><strong>Qualification du systeme :</strong> NormaCheck est un <strong>outil d'aide a la decision</strong>, et non un systeme de decision automatisee au sens de l'article 22 du RGPD. Les scores produits sont des indicateurs provisoires qui necessitent une validation par un professionnel qualifie avant toute utilisation a des fins decisionnelles.</p>
-</div>
-<p>Conformement a l'article 22 du Reglement (UE) 2016/679 (RGPD) et aux lignes directrices du Comite europeen de la protection des donnees (CEPD, WP251rev.01) :</p>
-<ul>
-<li><strong>Aucune decision juridique ou administrative</strong> ne resulte directement et exclusivement des scores NormaCheck</li>
-<li><strong>Droit a l'intervention humaine :</strong> tout score est qualifie de &laquo; provisoire &raquo; jusqu'a validation par un operateur humain qualifie. L'utilisateur peut demander une revision humaine a tout moment</li>
-<li><strong>Droit d'expression :</strong> l'entite auditee peut exprimer son point de vue et fournir des justificatifs via la procedure contradictoire (delai de 30 jours, art. R*243-59 CSS)</li>
-<li><strong>Droit de contestation :</strong> tout constat et le score global peuvent etre contestes. La contestation declenche un reexamen humain obligatoire dont le resultat est scelle dans la chaine de preuve</li>
-<li><strong>Explicabilite :</strong> la methodologie complete de calcul est documentee et accessible (endpoint /api/scores/methodologie). Chaque element du score (routage domaine, poids, normalisation, couverture) est traçable</li>
-<li><strong>AIPD :</strong> une Analyse d'Impact relative a la Protection des Donnees (art. 35 RGPD) a ete realisee pour le traitement de scoring</li>
-</ul>
-<p>Contact pour exercer ces droits : <strong>dpo@normacheck-app.fr</strong></p>
-
-<h2>Cookies</h2>
-<p>NormaCheck utilise uniquement des cookies techniques strictement necessaires au fonctionnement du service (authentification, session). Aucun cookie publicitaire ou de tracking n'est utilise. Conformement a la directive ePrivacy, ces cookies techniques ne necessitent pas de consentement.</p>
-
-<h2>Non-opposabilite</h2>
-<div class="warn">
-<p><strong>Avertissement important :</strong> NormaCheck est un outil d'aide a la decision destine aux professionnels. Les analyses, calculs, simulations et recommandations produits par la plateforme sont fournis a titre purement indicatif.</p>
-<p>Les resultats de NormaCheck :</p>
-<ul>
-<li>Ne se substituent pas a l'avis d'un expert-comptable ou d'un conseil juridique</li>
-<li>Ne sont pas opposables aux administrations publiques (URSSAF, DGFIP, France Travail, MSA, caisses de retraite complementaire, etc.)</li>
-<li>Ne constituent pas des declarations sociales ou fiscales</li>
-<li>Ne dispensent pas l'utilisateur de ses obligations declaratives et de paiement</li>
-</ul>
-<p>L'utilisateur reste seul responsable des decisions prises sur la base des informations fournies par NormaCheck.</p>
-</div>
-
-<h2>Propriete intellectuelle</h2>
-<p>L'ensemble des contenus de la plateforme NormaCheck (textes, logiciels, algorithmes, bases de donnees, interfaces) est protege par le Code de la propriete intellectuelle. Toute reproduction non autorisee est constitutive de contrefacon.</p>
-
-<h2>Droit applicable</h2>
-<p>Le present site et ses mentions legales sont regis par le droit francais.</p>
-</div>
-<footer>NormaCheck v3.8.1 &copy; 2026 - <a href="/" style="color:#60a5fa">Retour</a></footer>
-</body></html>"""
-
-
-APP_HTML = """<!DOCTYPE html>
-<html lang="fr">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<meta name="description" content="NormaCheck - Plateforme de conformite sociale et fiscale">
-<meta name="theme-color" content="#1e40af">
-<link rel="preconnect" href="https://fonts.googleapis.com"><link rel="preconnect" href="https://fonts.gstatic.com" crossorigin><link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800&display=swap">
-<link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 32 32'><defs><linearGradient id='g' x1='0' y1='0' x2='1' y2='1'><stop offset='0' stop-color='%233b82f6'/><stop offset='1' stop-color='%2310b981'/></linearGradient></defs><rect width='32' height='32' rx='8' fill='url(%23g)'/><path d='M10 16l4 4 8-8' stroke='white' stroke-width='2.5' stroke-linecap='round' stroke-linejoin='round' fill='none'/></svg>">
-<title>NormaCheck - Conformite</title>
-<style>
-:root{--p:#0c1829;--p2:#1a3a6b;--p3:#2563eb;--pl:#eef4ff;--g:#059669;--gl:#ecfdf5;--r:#dc2626;--rl:#fef2f2;--o:#d97706;--ol:#fffbeb;--pu:#7c3aed;--pul:#f5f3ff;--tl:#0d7377;--bg:#f1f5f9;--bg2:#f8fafc;--tx:#0f172a;--tx2:#475569;--brd:#cbd5e1;--sh:0 1px 4px rgba(15,23,42,.08);--sidebar-w:256px;--card-bg:#fff;--accent:#1d4ed8;--accent-light:#dbeafe}
-*{margin:0;padding:0;box-sizing:border-box}
-body{font-family:'Inter',-apple-system,'Segoe UI',system-ui,sans-serif;background:var(--bg);color:var(--tx);-webkit-font-smoothing:antialiased;overflow-x:hidden;-webkit-text-size-adjust:100%;letter-spacing:-.01em}
-.layout{display:flex;min-height:100vh;min-height:100dvh}
-:focus-visible{outline:2px solid var(--p3);outline-offset:2px;border-radius:4px}:focus:not(:focus-visible){outline:none}
-/* Sidebar desktop */
-.sidebar{width:var(--sidebar-w);background:var(--p);color:#fff;display:flex;flex-direction:column;position:fixed;top:0;bottom:0;left:0;z-index:100;transition:transform .3s;overflow:hidden}
-.sidebar .logo{padding:22px 24px;font-size:1.3em;font-weight:800;border-bottom:1px solid rgba(255,255,255,.06);display:flex;align-items:center;gap:10px;flex-shrink:0}
-.sidebar .logo em{font-style:normal;background:linear-gradient(135deg,#60a5fa,#a78bfa);-webkit-background-clip:text;-webkit-text-fill-color:transparent;background-clip:text}
-.sidebar .logo span{font-size:.48em;background:rgba(96,165,250,.2);color:#93c5fd;padding:2px 8px;border-radius:12px;font-weight:600;letter-spacing:.5px}
-.sidebar .logo-shield{width:28px;height:28px;flex-shrink:0}
-.sidebar-nav{flex:1;overflow-y:auto;overflow-x:hidden;scrollbar-width:thin;scrollbar-color:rgba(255,255,255,.15) transparent;padding-bottom:8px}
-.sidebar-nav::-webkit-scrollbar{width:5px}.sidebar-nav::-webkit-scrollbar-track{background:transparent}.sidebar-nav::-webkit-scrollbar-thumb{background:rgba(255,255,255,.15);border-radius:3px}.sidebar-nav::-webkit-scrollbar-thumb:hover{background:rgba(255,255,255,.25)}
-.sidebar .nav-group{padding:16px 12px 4px;font-size:.62em;text-transform:uppercase;letter-spacing:2px;color:rgba(148,163,184,.6);font-weight:700}
-.sidebar .nl{display:flex;align-items:center;gap:10px;padding:10px 16px;cursor:pointer;color:rgba(255,255,255,.55);transition:all .2s ease;border-radius:10px;margin:1px 10px;font-size:.84em;-webkit-tap-highlight-color:transparent;min-height:42px;font-weight:500}
-.sidebar .nl:hover{background:rgba(255,255,255,.06);color:rgba(255,255,255,.9);transform:translateX(2px)}
-.sidebar .nl.active{background:linear-gradient(135deg,rgba(37,99,235,.2),rgba(96,165,250,.15));color:#93c5fd;font-weight:600;box-shadow:inset 3px 0 0 #60a5fa}
-.sidebar .nl .ico{width:22px;text-align:center;font-size:1em;flex-shrink:0;display:flex;align-items:center;justify-content:center}
-.sidebar .nl .ico svg{width:18px;height:18px;stroke:currentColor;fill:none;stroke-width:1.8;stroke-linecap:round;stroke-linejoin:round}
-.sidebar .logout{padding:14px 18px;cursor:pointer;color:rgba(255,255,255,.35);font-size:.82em;border-top:1px solid rgba(255,255,255,.05);transition:.2s;display:flex;align-items:center;gap:8px;min-height:44px;flex-shrink:0;padding-bottom:calc(14px + env(safe-area-inset-bottom, 0px))}
-.sidebar .logout:hover{color:#fca5a5;background:rgba(239,68,68,.1)}
-.content{margin-left:var(--sidebar-w);flex:1;min-height:100vh;min-height:100dvh}
-/* Topbar */
-.topbar{background:var(--card-bg);border-bottom:1px solid var(--brd);padding:14px 28px;display:flex;justify-content:space-between;align-items:center;position:sticky;top:0;z-index:50;backdrop-filter:blur(12px);background:rgba(255,255,255,.92)}
-.topbar h1{font-size:1.08em;font-weight:700;color:var(--p);letter-spacing:-.02em}
-.topbar .info{font-size:.8em;color:var(--tx2)}
-.topbar .mob-menu{display:none;background:none;border:none;font-size:1.5em;cursor:pointer;padding:8px 12px;color:var(--p);-webkit-tap-highlight-color:transparent;min-height:44px;min-width:44px}
-.page{padding:24px 28px;max-width:1200px}
-.sec{display:none;animation:fadeIn .3s ease-out}.sec.active{display:block}
-@keyframes fadeIn{from{opacity:0}to{opacity:1}}
-/* Overlay mobile */
-.sidebar-overlay{display:none;position:fixed;inset:0;background:rgba(0,0,0,.5);z-index:90;-webkit-tap-highlight-color:transparent}
-/* Tablet */
-@media(max-width:1024px){
-.page{padding:20px 20px;max-width:100%}
-.topbar{padding:12px 20px}
-.g3{grid-template-columns:1fr 1fr}
-}
-/* Mobile */
-@media(max-width:768px){
-:root{--sidebar-w:0px}
-.sidebar{transform:translateX(-280px);width:280px}
-.sidebar.open{transform:translateX(0)}
-.sidebar-overlay.show{display:block}
-.content{margin-left:0}
-.topbar{padding:10px 16px;padding-top:calc(10px + env(safe-area-inset-top, 0px))}
-.topbar .mob-menu{display:block}
-.topbar .info{display:none}
-.page{padding:14px 12px;padding-left:calc(12px + env(safe-area-inset-left, 0px));padding-right:calc(12px + env(safe-area-inset-right, 0px));padding-bottom:calc(14px + env(safe-area-inset-bottom, 0px))}
-.g2,.g3{grid-template-columns:1fr}
-.g4{grid-template-columns:repeat(2,1fr);gap:8px}
-.card{padding:16px;margin-bottom:12px;border-radius:10px;overflow-x:auto;-webkit-overflow-scrolling:touch}
-.tabs{gap:3px;padding:4px;margin-bottom:10px}
-.tab{padding:8px 12px;font-size:.8em;min-height:36px}
-table{font-size:.85em;min-width:480px}
-th{padding:8px 10px}td{padding:7px 10px}
-.sc .val{font-size:1.2em}
-.sc .lab{font-size:.72em}
-.btn{padding:11px 16px;font-size:.85em}
-.btn-sm{padding:8px 14px}
-.uz{padding:20px 12px}
-.anomalie{padding:12px}
-.anomalie .title{font-size:.85em}
-.anomalie .montant{font-size:1em}
-.al{padding:10px 12px;font-size:.85em}
-input,select,textarea{font-size:16px;padding:12px 14px}
-.badge{font-size:.78em}
-.fmts{flex-direction:column}
-.fopt{padding:12px}
-.gauge{width:100px;height:100px}
-.gauge-inner{width:74px;height:74px;font-size:1.3em}
-.btn-group{gap:6px}
-}
-/* Small phones */
-@media(max-width:480px){
-.g4{grid-template-columns:1fr 1fr;gap:6px}
-.sc{padding:10px}
-.sc .val{font-size:1em}
-.sc .lab{font-size:.68em}
-.card{padding:12px}
-.card h2{font-size:.95em}
-.topbar h1{font-size:.95em}
-.page{padding:10px 8px;padding-left:calc(8px + env(safe-area-inset-left, 0px));padding-right:calc(8px + env(safe-area-inset-right, 0px))}
-}
-/* Landscape phones */
-@media(max-width:768px) and (orientation:landscape){
-.page{padding:10px 20px}
-.g4{grid-template-columns:repeat(4,1fr)}
-.g2{grid-template-columns:1fr 1fr}
-.gauge{width:80px;height:80px}
-.gauge-inner{width:60px;height:60px;font-size:1.1em}
-}
-/* Cards */
-.card{background:var(--card-bg);border-radius:16px;padding:24px;border:1px solid var(--brd);margin-bottom:18px;transition:all .25s ease;box-shadow:0 1px 3px rgba(15,23,42,.06)}
-.card:hover{box-shadow:0 6px 24px rgba(15,23,42,.08);border-color:rgba(37,99,235,.25)}
-.card h2{color:var(--p);margin-bottom:14px;font-size:1.05em;font-weight:700;display:flex;align-items:center;gap:8px;letter-spacing:-.02em;padding-bottom:12px;border-bottom:1px solid var(--brd)}
-.card h2 .ct{background:#eff6ff;color:#1d4ed8;padding:2px 10px;border-radius:20px;font-size:.72em;font-weight:700;border:1px solid #bfdbfe}
-/* Grids */
-.g2{display:grid;grid-template-columns:1fr 1fr;gap:18px}
-.g3{display:grid;grid-template-columns:repeat(3,1fr);gap:14px}
-.g4{display:grid;grid-template-columns:repeat(auto-fit,minmax(150px,1fr));gap:14px}
-/* Stat cards */
-.sc{border-radius:14px;padding:18px 16px;text-align:center;border:none;background:var(--card-bg);transition:all .25s ease;position:relative;overflow:hidden}
-.sc::before{content:'';position:absolute;top:0;left:0;right:0;height:3px;opacity:1;transition:.25s}
-.sc:hover{transform:translateY(-2px);box-shadow:0 8px 24px rgba(15,23,42,.1)}.sc .val{font-size:1.5em;font-weight:800;letter-spacing:-.03em}.sc .lab{font-size:.74em;margin-top:4px;font-weight:600;text-transform:uppercase;letter-spacing:.5px}
-.sc.blue{background:linear-gradient(135deg,#eff6ff,#dbeafe);border:1px solid #93c5fd}.sc.blue .val{color:#1e40af}.sc.blue .lab{color:#2563eb}.sc.blue::before{background:#2563eb}
-.sc.green{background:linear-gradient(135deg,#ecfdf5,#d1fae5);border:1px solid #6ee7b7}.sc.green .val{color:#065f46}.sc.green .lab{color:#059669}.sc.green::before{background:#059669}
-.sc.red{background:linear-gradient(135deg,#fef2f2,#fee2e2);border:1px solid #fca5a5}.sc.red .val{color:#991b1b}.sc.red .lab{color:#dc2626}.sc.red::before{background:#dc2626}
-.sc.amber{background:linear-gradient(135deg,#fffbeb,#fef3c7);border:1px solid #fcd34d}.sc.amber .val{color:#92400e}.sc.amber .lab{color:#d97706}.sc.amber::before{background:#d97706}
-.sc.purple{background:linear-gradient(135deg,#f5f3ff,#ede9fe);border:1px solid #c4b5fd}.sc.purple .val{color:#5b21b6}.sc.purple .lab{color:#7c3aed}.sc.purple::before{background:#7c3aed}
-.sc.teal{background:linear-gradient(135deg,#f0fdfa,#ccfbf1);border:1px solid #5eead4}.sc.teal .val{color:#134e4a}.sc.teal .lab{color:#0d9488}.sc.teal::before{background:#0d9488}
-/* Upload zone */
-.uz{border:2px dashed var(--brd);border-radius:16px;padding:32px;text-align:center;cursor:pointer;transition:all .3s ease;background:var(--card-bg);position:relative}
-.uz:hover{border-color:var(--p3);background:var(--pl);box-shadow:0 0 0 4px rgba(37,99,235,.06)}
-.uz input[type="file"]{position:absolute;inset:0;opacity:0;cursor:pointer}
-.uz .uzi{font-size:2em;margin-bottom:6px;opacity:.5}
-.uz h3{color:var(--p);font-size:.92em;margin-bottom:3px}.uz p{color:var(--tx2);font-size:.8em}
-/* Inputs */
-input,select,textarea{width:100%;padding:10px 14px;border:1.5px solid var(--brd);border-radius:10px;font-size:.88em;transition:all .2s ease;margin-bottom:12px;background:var(--card-bg);font-family:inherit;color:var(--tx)}
-input:focus,select:focus,textarea:focus{border-color:var(--p3);outline:none;box-shadow:0 0 0 3px rgba(37,99,235,.1)}
-label{display:block;font-weight:600;margin-bottom:5px;font-size:.8em;color:var(--tx2);text-transform:none;letter-spacing:.01em}
-/* Buttons */
-.btn{display:inline-flex;align-items:center;gap:6px;padding:11px 22px;border:none;border-radius:10px;font-size:.86em;font-weight:600;cursor:pointer;transition:all .2s ease;font-family:inherit;-webkit-tap-highlight-color:transparent;min-height:44px;letter-spacing:.01em}
-.btn-p{background:linear-gradient(135deg,var(--p),#1e293b);color:#fff;box-shadow:0 2px 4px rgba(15,23,42,.15)}.btn-p:hover{box-shadow:0 4px 12px rgba(15,23,42,.25);transform:translateY(-1px)}.btn-p:disabled{background:#94a3b8;cursor:not-allowed;box-shadow:none;transform:none}
-.btn-blue{background:linear-gradient(135deg,#2563eb,#1d4ed8);color:#fff;box-shadow:0 2px 4px rgba(37,99,235,.2);position:relative}.btn-blue:hover:not(:disabled):not(.loading){box-shadow:0 4px 12px rgba(37,99,235,.3);transform:translateY(-1px)}.btn-blue:disabled{background:#94a3b8;cursor:not-allowed;box-shadow:none;transform:none;opacity:.7}.btn-blue:active:not(:disabled){transform:translateY(1px);box-shadow:0 1px 2px rgba(37,99,235,.2)}.btn-blue.loading{pointer-events:none;opacity:.8}
-.btn-s{background:var(--pl);color:var(--p3);border:1px solid #bfdbfe}.btn-s:hover{background:#dbeafe;transform:translateY(-1px)}
-.btn-green{background:linear-gradient(135deg,#059669,#047857);color:#fff;box-shadow:0 2px 4px rgba(5,150,105,.2)}.btn-green:hover{box-shadow:0 4px 12px rgba(5,150,105,.3);transform:translateY(-1px)}
-.btn-red{background:var(--rl);color:var(--r);border:1px solid #fecaca}.btn-red:hover{background:#fee2e2;transform:translateY(-1px)}
-.btn-f{width:100%;justify-content:center}
-.btn-sm{padding:8px 14px;font-size:.8em;border-radius:8px;min-height:40px}
-.btn-group{display:flex;gap:8px;flex-wrap:wrap;margin-bottom:14px}
-/* Tables */
-table{width:100%;border-collapse:collapse}
-th{background:linear-gradient(135deg,#0c1829,#1a2744);color:#e2e8f0;padding:11px 14px;text-align:left;font-size:.78em;font-weight:600;letter-spacing:.02em;text-transform:none}
-th:first-child{border-radius:10px 0 0 0}th:last-child{border-radius:0 10px 0 0}
-td{padding:8px 14px;border-bottom:1px solid var(--brd);font-size:.86em}
-tr:hover{background:var(--pl)}.num{text-align:right;font-family:'SF Mono','Consolas',monospace;font-size:.84em}
-.sans-just{background:var(--rl) !important}.sans-just td{color:var(--r)}
-/* Badges */
-.badge{display:inline-block;padding:4px 10px;border-radius:20px;font-size:.75em;font-weight:700}
-.badge-blue{background:var(--pl);color:var(--p2)}.badge-green{background:var(--gl);color:#16a34a}
-.badge-red{background:var(--rl);color:var(--r)}.badge-amber{background:var(--ol);color:#d97706}
-.badge-purple{background:var(--pul);color:var(--pu)}.badge-teal{background:#f0fdfa;color:var(--tl)}
-.badge-paye{background:var(--gl);color:#16a34a}.badge-impaye{background:var(--rl);color:var(--r)}
-.sug-box{position:relative;z-index:999}.sug-box .sug-list{position:absolute;left:0;right:0;top:0;background:var(--card-bg);border:1px solid var(--brd);border-radius:6px;max-height:280px;overflow-y:auto;box-shadow:0 8px 24px rgba(0,0,0,.18);display:none;z-index:9999}.sug-box .sug-list.show{display:block}.sug-item{padding:8px 10px;cursor:pointer;font-size:.84em;border-bottom:1px solid #f1f5f9;min-height:44px;display:flex;align-items:center}.sug-item:hover{background:var(--pl)}.sug-item .sug-num{font-weight:700;color:var(--p2)}.sug-item .sug-lbl{color:var(--tx2);margin-left:6px}
-/* Tabs */
-.tabs{display:flex;flex-wrap:wrap;gap:4px;background:#e2e8f0;border-radius:12px;padding:5px;margin-bottom:16px}
-.tab{padding:8px 14px;cursor:pointer;border-radius:8px;color:var(--tx2);font-weight:600;font-size:.82em;transition:all .2s ease;white-space:nowrap;-webkit-tap-highlight-color:transparent;min-height:38px;display:inline-flex;align-items:center}
-.tab:hover{color:var(--tx);background:rgba(255,255,255,.5)}.tab.active{color:var(--p);background:var(--card-bg);box-shadow:0 2px 8px rgba(15,23,42,.08)}
-.tc{display:none}.tc.active{display:block}
-/* Anomalies */
-.anomalie{border:1px solid var(--brd);border-radius:14px;padding:16px;margin:8px 0;cursor:pointer;transition:all .25s ease;background:var(--card-bg)}
-.anomalie:hover{box-shadow:0 4px 16px rgba(15,23,42,.06);transform:translateY(-1px)}
-.anomalie.sev-high{border-left:4px solid var(--r)}.anomalie.sev-med{border-left:4px solid var(--o)}.anomalie.sev-low{border-left:4px solid var(--p3)}
-.anomalie .head{display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:6px}
-.anomalie .title{font-weight:600;font-size:.9em}
-.anomalie .montant{font-size:1.15em;font-weight:700;font-family:'SF Mono','Consolas',monospace}
-.anomalie .montant.neg{color:var(--r)}.anomalie .montant.pos{color:var(--g)}
-.anomalie .detail{display:none;margin-top:12px;padding-top:12px;border-top:1px solid var(--brd);font-size:.84em;line-height:1.6}
-.anomalie.open .detail{display:block}
-.anomalie .dest{padding:2px 10px;border-radius:20px;font-size:.7em;font-weight:700;display:inline-block;margin-left:6px}
-/* Alerts */
-.al{padding:12px 16px;border-radius:12px;margin:8px 0;font-size:.84em;display:flex;align-items:flex-start;gap:10px;line-height:1.6;border-left:4px solid transparent}
-.al .ai{font-size:1em;margin-top:1px;flex-shrink:0;display:flex;align-items:center}
-.al.info{background:var(--pl);color:var(--p2);border:1px solid #bfdbfe;border-left-color:#2563eb}
-.al.ok{background:var(--gl);color:#065f46;border:1px solid #a7f3d0;border-left-color:#059669}
-.al.err{background:var(--rl);color:#991b1b;border:1px solid #fecaca;border-left-color:#dc2626}
-.al.warn{background:var(--ol);color:#92400e;border:1px solid #fde68a;border-left-color:#d97706}
-/* Gauge */
-.gauge{width:120px;height:120px;border-radius:50%;background:conic-gradient(var(--gc,var(--g)) 0%,var(--gc,var(--g)) var(--pct),#e2e8f0 var(--pct));display:flex;align-items:center;justify-content:center;margin:0 auto;box-shadow:0 4px 16px rgba(15,23,42,.1)}
-.gauge-inner{width:88px;height:88px;border-radius:50%;background:var(--card-bg);display:flex;align-items:center;justify-content:center;font-size:1.5em;font-weight:800;color:var(--p);box-shadow:inset 0 2px 8px rgba(15,23,42,.06)}
-/* Progress */
-.prg{display:none;margin:14px 0}
-.prg-bar{height:6px;background:#e2e8f0;border-radius:3px;overflow:hidden}
-.prg-fill{height:100%;background:linear-gradient(90deg,#2563eb,#7c3aed);border-radius:3px;width:0%;transition:width .5s}
-.prg-txt{text-align:center;margin-top:6px;color:var(--tx2);font-size:.82em}
-/* File items */
-.fi{display:flex;align-items:center;justify-content:space-between;padding:7px 12px;background:var(--pl);border-radius:8px;margin:3px 0;font-size:.84em;border:1px solid #bfdbfe;min-height:44px}
-.fi .nm{font-weight:600;color:var(--p);overflow:hidden;text-overflow:ellipsis;white-space:nowrap;max-width:60%}.fi .rm{background:none;border:none;color:var(--r);cursor:pointer;font-size:1.2em;padding:6px 10px;border-radius:4px;min-height:44px;min-width:44px;display:inline-flex;align-items:center;justify-content:center}
-/* Format options */
-.fmts{display:flex;gap:8px;margin-bottom:14px}
-.fopt{flex:1;padding:12px;border:1.5px solid var(--brd);border-radius:10px;text-align:center;cursor:pointer;background:var(--card-bg);transition:.2s;min-height:44px}
-.fopt:hover{border-color:var(--p3)}.fopt.active{border-color:var(--p3);background:var(--pl)}
-.fopt strong{color:var(--p);font-size:.9em}.fopt small{color:var(--tx2);font-size:.76em}
-/* Misc */
-.ent-item{border:1px solid var(--brd);border-radius:10px;padding:14px;margin:8px 0;transition:.2s;cursor:pointer}
-.ent-item:hover{border-color:var(--p3);box-shadow:0 2px 8px rgba(59,130,246,.08)}
-.doc-item{border:1px solid var(--brd);border-radius:10px;padding:14px;margin:8px 0;transition:.2s}
-.doc-item:hover{box-shadow:0 2px 8px rgba(0,0,0,.04)}
-.period-sel{margin-bottom:14px;padding:14px;background:var(--pl);border-radius:10px;border:1px solid #bfdbfe;display:none}
-@keyframes slideIn{from{transform:translateX(100px);opacity:0}to{transform:translateX(0);opacity:1}}
-/* ===== Dark Mode ===== */
-@media(prefers-color-scheme:dark){
-:root{--p:#e2e8f0;--p2:#93c5fd;--p3:#60a5fa;--pl:rgba(59,130,246,.12);--g:#4ade80;--gl:rgba(74,222,128,.1);--r:#f87171;--rl:rgba(248,113,113,.1);--o:#fbbf24;--ol:rgba(251,191,36,.1);--pu:#c084fc;--pul:rgba(192,132,252,.1);--tl:#2dd4bf;--bg:#0f172a;--bg2:#1a2332;--tx:#e2e8f0;--tx2:#94a3b8;--brd:#334155;--card-bg:#1e293b;--sh:0 1px 3px rgba(0,0,0,.2);--accent:#60a5fa;--accent-light:rgba(96,165,250,.15)}
-body{color-scheme:dark}
-.sidebar{background:#020617}
-.topbar{background:rgba(30,41,59,.92);backdrop-filter:blur(12px)}
-th{background:#334155;color:#e2e8f0}
-tr:hover{background:rgba(59,130,246,.08)}
-.tabs{background:#334155}
-.sc.blue{background:linear-gradient(135deg,rgba(37,99,235,.15),rgba(59,130,246,.1));border-color:#1e40af}.sc.blue .val{color:#93c5fd}.sc.blue .lab{color:#60a5fa}
-.sc.green{background:linear-gradient(135deg,rgba(5,150,105,.15),rgba(16,185,129,.1));border-color:#065f46}.sc.green .val{color:#6ee7b7}.sc.green .lab{color:#34d399}
-.sc.red{background:linear-gradient(135deg,rgba(220,38,38,.12),rgba(248,113,113,.08));border-color:#991b1b}.sc.red .val{color:#fca5a5}.sc.red .lab{color:#f87171}
-.sc.amber{background:linear-gradient(135deg,rgba(217,119,6,.12),rgba(251,191,36,.08));border-color:#92400e}.sc.amber .val{color:#fcd34d}.sc.amber .lab{color:#fbbf24}
-.sc.purple{background:linear-gradient(135deg,rgba(124,58,237,.15),rgba(167,139,250,.1));border-color:#5b21b6}.sc.purple .val{color:#c4b5fd}.sc.purple .lab{color:#a78bfa}
-.sc.teal{background:linear-gradient(135deg,rgba(13,148,136,.12),rgba(45,212,191,.08));border-color:#0d9488}.sc.teal .val{color:#5eead4}.sc.teal .lab{color:#2dd4bf}
-.badge-blue{background:rgba(59,130,246,.15);color:#93c5fd}
-.badge-green{background:rgba(74,222,128,.12);color:#4ade80}
-.badge-red{background:rgba(248,113,113,.12);color:#f87171}
-.badge-amber{background:rgba(251,191,36,.12);color:#fbbf24}
-.badge-purple{background:rgba(192,132,252,.12);color:#c084fc}
-.badge-teal{background:rgba(45,212,191,.1);color:#2dd4bf}
-.badge-paye{background:rgba(74,222,128,.12);color:#4ade80}
-.badge-impaye{background:rgba(248,113,113,.12);color:#f87171}
-input,select,textarea{background:#1e293b;border-color:#475569;color:#e2e8f0}
-.sug-item{border-bottom-color:#334155}
-.fi{background:rgba(59,130,246,.1);border-color:#1e40af}
-.al.info{background:rgba(59,130,246,.1);border-color:#1e40af;color:#93c5fd}
-.al.ok{background:rgba(74,222,128,.08);border-color:#166534;color:#4ade80}
-.al.err{background:rgba(248,113,113,.08);border-color:#991b1b;color:#f87171}
-.al.warn{background:rgba(251,191,36,.08);border-color:#92400e;color:#fbbf24}
-.sans-just{background:rgba(248,113,113,.1) !important}
-.prg-bar{background:#334155}
-label{color:#94a3b8}
-.sidebar .nav-group{color:#64748b}
-.period-sel{background:rgba(59,130,246,.08);border-color:#1e40af}
-.topbar{background:var(--card-bg);border-bottom-color:var(--brd)}
-}
-/* ===== Print ===== */
-@media print{
-.sidebar,.topbar,.mob-menu,.sidebar-overlay,.logout,.btn-group,.uz,.fmts,.prg,.tabs{display:none !important}
-.content{margin-left:0 !important}
-.page{padding:0 !important;max-width:100% !important}
-.card{break-inside:avoid;box-shadow:none !important;border:1px solid #ccc}
-body{background:#fff;color:#000;font-size:12pt}
-.anomalie{break-inside:avoid}
-table{font-size:10pt}
-a{color:#000;text-decoration:underline}
-.gauge{print-color-adjust:exact;-webkit-print-color-adjust:exact}
-th{print-color-adjust:exact;-webkit-print-color-adjust:exact}
-}
-</style>
-</head>
-<body>
-<div class="sidebar-overlay" id="sidebar-overlay" onclick="closeSidebar()"></div>
-<div class="layout">
-<nav class="sidebar" id="sidebar" aria-label="Menu principal">
-<div class="logo"><svg class="logo-shield" viewBox="0 0 28 28" fill="none"><defs><linearGradient id="slg" x1="0" y1="0" x2="28" y2="28"><stop offset="0%" stop-color="#60a5fa"/><stop offset="100%" stop-color="#34d399"/></linearGradient></defs><rect width="28" height="28" rx="7" fill="url(#slg)"/><path d="M9 8c0 3.5 1.5 6 4 8" stroke="rgba(255,255,255,.85)" stroke-width="2" stroke-linecap="round" fill="none"/><path d="M15 8c0 3.5 1.5 6 4 8" stroke="rgba(255,255,255,.4)" stroke-width="2" stroke-linecap="round" fill="none"/><path d="M8 18l3.5 3.5 7-7" stroke="#fff" stroke-width="1.8" stroke-linecap="round" stroke-linejoin="round" fill="none"/></svg><em>NormaCheck</em> <span>v3.9.0</span></div>
-<div class="sidebar-nav">
-<div class="nav-group">Tableau de bord</div>
-<div class="nl active" tabindex="0" onclick="showS('dashboard',this)"><span class="ico"><svg viewBox="0 0 24 24"><rect x="3" y="3" width="7" height="7" rx="1.5"/><rect x="14" y="3" width="7" height="4" rx="1.5"/><rect x="3" y="14" width="7" height="7" rx="1.5"/><rect x="14" y="11" width="7" height="10" rx="1.5"/></svg></span><span>Dashboard</span></div>
-<div class="nl" tabindex="0" onclick="showS('analyse',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M9 2v6a2 2 0 002 2h6"/><path d="M4 5.5V19a2 2 0 002 2h12a2 2 0 002-2V8l-6-6H6a2 2 0 00-2 2z"/><path d="M9 15l2 2 4-4"/></svg></span><span>Import / Analyse</span></div>
-<div class="nl" tabindex="0" onclick="showS('biblio',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M4 19.5A2.5 2.5 0 016.5 17H20"/><path d="M6.5 2H20v20H6.5A2.5 2.5 0 014 19.5v-15A2.5 2.5 0 016.5 2z"/></svg></span><span>Bibliotheque</span></div>
-<div class="nav-group">Comptabilite & Fiscal</div>
-<div class="nl" tabindex="0" onclick="showS('compta',this)"><span class="ico"><svg viewBox="0 0 24 24"><rect x="2" y="5" width="20" height="14" rx="2"/><line x1="2" y1="10" x2="22" y2="10"/><line x1="12" y1="10" x2="12" y2="19"/></svg></span><span>Comptabilite</span></div>
-<div class="nl" tabindex="0" onclick="showS('factures',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M14 2H6a2 2 0 00-2 2v16a2 2 0 002 2h12a2 2 0 002-2V8z"/><polyline points="14 2 14 8 20 8"/><line x1="8" y1="13" x2="16" y2="13"/><line x1="8" y1="17" x2="12" y2="17"/></svg></span><span>Factures</span></div>
-<div class="nl" tabindex="0" onclick="showS('dsn',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4"/><polyline points="17 8 12 3 7 8"/><line x1="12" y1="3" x2="12" y2="15"/></svg></span><span>DSN</span></div>
-<div class="nav-group">Social & RH</div>
-<div class="nl" tabindex="0" onclick="showS('rh',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M17 21v-2a4 4 0 00-4-4H5a4 4 0 00-4 4v2"/><circle cx="9" cy="7" r="4"/><path d="M23 21v-2a4 4 0 00-3-3.87"/><path d="M16 3.13a4 4 0 010 7.75"/></svg></span><span>Ressources humaines</span></div>
-<div class="nl" tabindex="0" onclick="showS('simulation',this)"><span class="ico"><svg viewBox="0 0 24 24"><line x1="18" y1="20" x2="18" y2="10"/><line x1="12" y1="20" x2="12" y2="4"/><line x1="6" y1="20" x2="6" y2="14"/><line x1="3" y1="20" x2="21" y2="20"/></svg></span><span>Simulation</span></div>
-<div class="nl" tabindex="0" onclick="showS('subventions',this)"><span class="ico"><svg viewBox="0 0 24 24"><circle cx="12" cy="12" r="10"/><line x1="12" y1="6" x2="12" y2="18"/><path d="M15 9.5c-.8-1-2-1.5-3-1.5s-3 .5-3 2.5c0 3.5 6 2 6 5.5 0 2-1.5 2.5-3 2.5s-2.2-.5-3-1.5"/></svg></span><span>Aides & Subventions</span></div>
-<div class="nav-group">Veille & Outils</div>
-<div class="nl" tabindex="0" onclick="showS('veille',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M12 22s8-4 8-10V5l-8-3-8 3v7c0 6 8 10 8 10z"/></svg></span><span>Veille juridique</span></div>
-<div class="nl" tabindex="0" onclick="showS('portefeuille',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M21 12V7H5a2 2 0 010-4h14v4"/><path d="M3 5v14a2 2 0 002 2h16v-5"/><path d="M18 12a2 2 0 100 4 2 2 0 000-4z"/></svg></span><span>Portefeuille</span></div>
-<div class="nav-group">Administration</div>
-<div class="nl" tabindex="0" onclick="showS('equipe',this)"><span class="ico"><svg viewBox="0 0 24 24"><path d="M17 21v-2a4 4 0 00-4-4H5a4 4 0 00-4 4v2"/><circle cx="9" cy="7" r="4"/></svg></span><span>Equipe</span></div>
-<div class="nl" tabindex="0" onclick="showS('config',this)"><span class="ico"><svg viewBox="0 0 24 24"><circle cx="12" cy="12" r="3"/><path d="M19.4 15a1.65 1.65 0 00.33 1.82l.06.06a2 2 0 01-2.83 2.83l-.06-.06a1.65 1.65 0 00-1.82-.33 1.65 1.65 0 00-1 1.51V21a2 2 0 01-4 0v-.09A1.65 1.65 0 009 19.4a1.65 1.65 0 00-1.82.33l-.06.06a2 2 0 01-2.83-2.83l.06-.06A1.65 1.65 0 004.68 15a1.65 1.65 0 00-1.51-1H3a2 2 0 010-4h.09A1.65 1.65 0 004.6 9a1.65 1.65 0 00-.33-1.82l-.06-.06a2 2 0 012.83-2.83l.06.06A1.65 1.65 0 009 4.68a1.65 1.65 0 001-1.51V3a2 2 0 014 0v.09a1.65 1.65 0 001 1.51 1.65 1.65 0 001.82-.33l.06-.06a2 2 0 012.83 2.83l-.06.06A1.65 1.65 0 0019.4 9a1.65 1.65 0 001.51 1H21a2 2 0 010 4h-.09a1.65 1.65 0 00-1.51 1z"/></svg></span><span>Configuration</span></div>
-<div class="nl" tabindex="0" onclick="showS('ensavoirplus',this)"><span class="ico"><svg viewBox="0 0 24 24"><circle cx="12" cy="12" r="10"/><line x1="12" y1="16" x2="12" y2="12"/><line x1="12" y1="8" x2="12.01" y2="8"/></svg></span><span>En savoir plus</span></div>
-</div><!-- end sidebar-nav -->
-<div style="padding:10px 18px;font-size:.78em;color:#94a3b8;flex-shrink:0" id="sidebar-user"></div>
-<div class="logout" onclick="doLogout()"><span class="ico"><svg viewBox="0 0 24 24" width="16" height="16" fill="none" stroke="currentColor" stroke-width="1.8" stroke-linecap="round" stroke-linejoin="round"><path d="M9 21H5a2 2 0 01-2-2V5a2 2 0 012-2h4"/><polyline points="16 17 21 12 16 7"/><line x1="21" y1="12" x2="9" y2="12"/></svg></span><span>Deconnexion</span></div>
-</nav>
-<div class="content">
-<div class="topbar"><button class="mob-menu" id="mob-menu" onclick="toggleSidebar()">&#9776;</button><h1 id="page-title">Dashboard</h1><div class="info">NormaCheck v3.9.0 &bull; <span id="topbar-date"></span> &bull; <a href="/legal/mentions" style="color:var(--tx2);font-size:.9em">Mentions legales</a></div></div>
-<div class="page">
-
-<script>
-/* === CORE NAV (inline before content to guarantee availability) === */
-var _ncUser=null;
-var _refreshingToken=false;
-var _refreshPromise=null;
-/* Global fetch wrapper: auto-include credentials for API calls */
-(function(){var _origFetch=window.fetch;window.fetch=function(url,opts){opts=opts||{};if(typeof url==="string"&&url.indexOf("/api/")>=0){if(!opts.credentials)opts.credentials="same-origin";}return _origFetch.call(this,url,opts);};})();
-/* Token auto-refresh: renouvelle le cookie JWT toutes les 20 min pour eviter les deconnexions */
-var _tokenRefreshInterval=setInterval(function(){
-if(!_ncUser)return;
-fetch("/api/auth/refresh",{method:"POST"}).then(function(r){
-if(!r.ok&&r.status===401){clearInterval(_tokenRefreshInterval);toast("Session expiree. Reconnexion dans 5 secondes...");setTimeout(function(){window.location.href="/";},5000);}
-}).catch(function(){});
-},20*60*1000);
-/* Fonction de refresh token utilisable par safeJson */
-function _tryRefreshToken(){
-if(_refreshingToken)return _refreshPromise;
-_refreshingToken=true;
-_refreshPromise=fetch("/api/auth/refresh",{method:"POST"}).then(function(r){_refreshingToken=false;return r.ok;}).catch(function(){_refreshingToken=false;return false;});
-return _refreshPromise;
-}
-var titles={"dashboard":"Dashboard","analyse":"Import / Analyse","biblio":"Bibliotheque","factures":"Factures","dsn":"DSN","compta":"Comptabilite","rh":"Ressources humaines","simulation":"Simulation","subventions":"Aides & Subventions","veille":"Veille juridique","portefeuille":"Portefeuille","equipe":"Equipe","config":"Configuration","score-details":"Details des scores de conformite","ensavoirplus":"En savoir plus"};
-function toggleSidebar(){var sb=document.getElementById("sidebar");var ov=document.getElementById("sidebar-overlay");if(sb)sb.classList.toggle("open");if(ov)ov.classList.toggle("show");}
-function closeSidebar(){var sb=document.getElementById("sidebar");var ov=document.getElementById("sidebar-overlay");if(sb)sb.classList.remove("open");if(ov)ov.classList.remove("show");}
-function resetTabs(tabsSel,secSel,defaultId){var tabs=document.querySelectorAll(tabsSel+" .tab");tabs.forEach(function(t){t.classList.remove("active")});if(tabs.length)tabs[0].classList.add("active");document.querySelectorAll(secSel+" .tc").forEach(function(t){t.classList.remove("active")});var def=document.getElementById(defaultId);if(def)def.classList.add("active");}
-function showS(n,el){
-try{
-closeSidebar();
-document.querySelectorAll(".sec").forEach(function(s){s.classList.remove("active")});
-document.querySelectorAll(".sidebar .nl").forEach(function(l){l.classList.remove("active")});
-var sec=document.getElementById("s-"+n);if(sec)sec.classList.add("active");
-if(el){el.classList.add("active");}else{document.querySelectorAll(".sidebar .nl").forEach(function(l){if(l.getAttribute("onclick")&&l.getAttribute("onclick").indexOf("'"+n+"'")>=0)l.classList.add("active");});}
-var pt=document.getElementById("page-title");if(pt)pt.textContent=titles[n]||n;
-if(typeof loadCompta==="function"&&n==="compta"){resetTabs("#compta-tabs","#s-compta","ct-journal");loadCompta();}
-if(typeof rechEnt==="function"&&n==="portefeuille"){rechEnt();if(typeof rechTI==="function")rechTI();if(typeof loadPortVue==="function")loadPortVue();}
-if(typeof loadDash==="function"&&n==="dashboard")loadDash();
-if(typeof loadBiblio==="function"&&n==="biblio"){loadBiblio();if(typeof loadKnowledge==="function")loadKnowledge();}
-if(typeof loadEquipe==="function"&&n==="equipe")loadEquipe();
-if(typeof loadPayStatuses==="function"&&n==="factures"){resetTabs("#fact-tabs","#s-factures","ft-analyse");loadPayStatuses();}
-if(typeof preFillDSN==="function"&&n==="dsn"){preFillDSN();if(typeof loadDSNBrouillons==="function")loadDSNBrouillons();}
-if(typeof loadRHSalaries==="function"&&n==="rh"){resetTabs("#rh-tabs","#s-rh","rh-salaries");loadRHSalaries();if(typeof loadRHAlertes==="function")loadRHAlertes();}
-if(n==="analyse"){if(typeof analysisData!=="undefined"&&analysisData){var ra=document.getElementById("res-analyse");if(ra)ra.style.display="block";if(typeof showJsonResults==="function")showJsonResults(analysisData);}else{fetch("/api/dashboard/load",{credentials:"same-origin"}).then(safeJson).then(function(r){if(r.status==="ok"&&r.data){analysisData=r.data;try{sessionStorage.setItem("nc_analysis",JSON.stringify(r.data));}catch(e){}var ra=document.getElementById("res-analyse");if(ra)ra.style.display="block";if(typeof showJsonResults==="function")showJsonResults(analysisData);loadDash();}}).catch(function(){});}}
-if(n==="simulation"){resetTabs("#s-simulation .tabs","#s-simulation","sim-bulletin");}
-if(n==="subventions"&&typeof prefillSubventions==="function"){prefillSubventions();}
-if(typeof loadVeille==="function"&&n==="veille"){loadVeille();}
-if(typeof loadEntete==="function"&&n==="config"){loadEntete();if(typeof loadAlertConfigs==="function")loadAlertConfigs();if(typeof loadSignatures==="function")loadSignatures();}
-if(typeof renderScoreDetails==="function"&&n==="score-details"){renderScoreDetails();}
-}catch(e){console.error("showS error:",n,e);}
-}
-function doLogout(){fetch("/api/auth/logout",{method:"POST",credentials:"same-origin"}).then(function(){sessionStorage.removeItem("nc_user");sessionStorage.removeItem("nc_analysis");window.location.href="/";}).catch(function(){window.location.href="/";});}
-function goToRH(){showS('rh');}
-function goToRHContrats(){showS('rh');setTimeout(function(){if(typeof showRHTab==="function")showRHTab('contrats',document.querySelector('#rh-tabs .tab:nth-child(2)'));},200);}
-function safeJson(r){if(!r.ok){if(r.status===401){return _tryRefreshToken().then(function(refreshed){if(refreshed){toast("Session renouvelee. Veuillez reessayer.","ok");throw new Error("Session renouvelee - reessayez");}else{toast("Session expiree. Reconnexion dans 5 secondes...");setTimeout(function(){window.location.href="/";},5000);throw new Error("Session expiree - reconnectez-vous");}});}return r.json().then(function(e){throw new Error(e.detail||"Erreur serveur ("+r.status+")")}).catch(function(parseErr){if(parseErr.message&&parseErr.message!=="Erreur serveur ("+r.status+")")throw parseErr;throw new Error("Erreur serveur ("+r.status+")");});}return r.json();}
-function gv(id){var el=document.getElementById(id);return el?el.value:"";}
-function fmt(n){return typeof n==="number"?n.toFixed(2).replace(/\B(?=(\d{3})+(?!\d))/g," ")+" EUR":n;}
-function fmtN(n){return typeof n==="number"?n.toFixed(2).replace(/\B(?=(\d{3})+(?!\d))/g," "):String(n);}
-function showSimTab(n,el){try{document.querySelectorAll("#s-simulation .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-simulation .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("sim-"+n);if(tc)tc.classList.add("active");}catch(e){console.error("showSimTab error:",n,e);}}
-function showRHTab(n,el){try{document.querySelectorAll("#rh-tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-rh .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("rh-"+n);if(tc)tc.classList.add("active");
-if(typeof loadRHSalaries==="function"&&n==="salaries")loadRHSalaries();if(n==="contrats"){if(typeof loadRHContrats==="function")loadRHContrats();if(typeof loadRHAvenants==="function")loadRHAvenants();}if(typeof loadRHConges==="function"&&n==="conges")loadRHConges();if(typeof loadRHArrets==="function"&&n==="arrets")loadRHArrets();if(typeof loadRHSanctions==="function"&&n==="sanctions")loadRHSanctions();if(typeof loadRHEntretiens==="function"&&n==="entretiens")loadRHEntretiens();if(typeof loadRHVisites==="function"&&n==="visites")loadRHVisites();if(typeof loadRHAttestations==="function"&&n==="attestations")loadRHAttestations();if(n==="planning"){if(typeof loadRHPlanning==="function")loadRHPlanning();if(typeof renderCalendar==="function")renderCalendar();}if(typeof loadRHEchanges==="function"&&n==="echanges")loadRHEchanges();if(typeof loadRHAlertes==="function"&&n==="alertes")loadRHAlertes();if(typeof loadRHBulletins==="function"&&n==="bulletins")loadRHBulletins();
-/* Setup autocomplete on salarie input fields */
-var salInputs={"conges":"rh-cg-sal","arrets":"rh-ar-sal","sanctions":"rh-sa-sal","entretiens":"rh-en-sal","visites":"rh-vm-sal","attestations":"rh-at-sal","echanges":"rh-ec-sal","planning":"rh-pl-sal","bulletins":"rh-bp-nom"};
-if(salInputs[n]&&typeof setupSalarieAutocomplete==="function"){_salariesCache=null;setupSalarieAutocomplete(salInputs[n]);}}catch(e){console.error("showRHTab error:",n,e);}}
-function showPortTab(name,el){document.querySelectorAll("#s-portefeuille .port-panel").forEach(function(p){p.style.display="none";});
-var panel=document.getElementById("port-"+name);if(panel)panel.style.display="block";
-document.querySelectorAll("#s-portefeuille > div:first-child .tab").forEach(function(t){t.classList.remove("active");});
-if(el)el.classList.add("active");
-if(typeof loadPortVue==="function"&&name==="vue")loadPortVue();if(typeof rechTI==="function"&&name==="ti")rechTI();if(typeof rechEnt==="function"&&name==="employeur")rechEnt();}
-function showFT(n,el){try{document.querySelectorAll("#fact-tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-factures .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("ft-"+n);if(tc)tc.classList.add("active");if(typeof loadPayStatuses==="function"&&n==="suivi")loadPayStatuses();}catch(e){console.error("showFT error:",n,e);}}
-function showCT(n,el){try{document.querySelectorAll("#compta-tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-compta .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("ct-"+n);if(tc)tc.classList.add("active");var ps=document.getElementById("period-sel");if(ps)ps.style.display=(n==="grandlivre"||n==="balance"||n==="bilan")?"block":"none";if(typeof loadCompta==="function")loadCompta();}catch(e){console.error("showCT error:",n,e);}}
-function showAlTab(n,el){document.querySelectorAll("#rh-alertes .tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#rh-alertes .al-panel").forEach(function(t){t.style.display="none";t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("al-"+n);if(tc){tc.style.display="block";tc.classList.add("active");}if(typeof loadAlertesLibres==="function"&&n==="libres")loadAlertesLibres();if(typeof loadRHAlertes==="function"&&n==="auto")loadRHAlertes();}
-</script>
-
-"""
-
-
-APP_HTML += """
-<!-- ===== DASHBOARD ===== -->
-<div class="sec active" id="s-dashboard">
-<div id="dash-welcome" style="margin-bottom:16px;padding:20px 24px;background:linear-gradient(135deg,#eff6ff,#ecfdf5);border:1.5px solid #bfdbfe;border-radius:14px">
-<h3 style="margin:0 0 8px;color:#1e40af;font-size:1.05em">Bienvenue sur NormaCheck</h3>
-<p style="margin:0 0 12px;color:#475569;font-size:.88em;line-height:1.5">Pour commencer, importez vos documents dans <strong>Import / Analyse</strong>. NormaCheck detectera automatiquement le type de chaque fichier (bulletins, DSN, factures, contrats...) et generera votre tableau de bord de conformite.</p>
-<div style="display:flex;gap:8px;flex-wrap:wrap">
-<button class="btn btn-blue btn-sm" onclick="showS('analyse')" style="font-size:.82em">Importer des documents</button>
-<span style="color:#94a3b8;font-size:.8em;align-self:center">Formats : PDF, Excel, CSV, DSN, XML, Images</span>
-</div>
-</div>
-<div class="g4" id="dash-stats">
-<div class="sc blue"><div class="val" id="dash-anomalies">0</div><div class="lab">Anomalies</div></div>
-<div class="sc amber"><div class="val" id="dash-impact">0 EUR</div><div class="lab">Impact cotisations</div></div>
-<div class="sc green"><div class="val" id="dash-conf">-</div><div class="lab">Conformite</div></div>
-<div class="sc teal"><div class="val" id="dash-docs">0</div><div class="lab">Documents</div></div>
-</div>
-<div class="g2">
-<div class="card"><h2>Conformite globale</h2>
-<div class="gauge" id="gauge" style="--pct:0%"><div class="gauge-inner" id="gauge-val">-</div></div>
-<div style="text-align:center;margin-top:10px;font-size:.82em;color:var(--tx2)">Score base sur les analyses realisees</div>
-</div>
-<div class="card"><h2>Alertes</h2><div id="dash-alertes"><div class="al info"><span class="ai">&#128161;</span><span>Importez des documents pour lancer l'analyse.</span></div></div></div>
-</div>
-<div class="card"><h2>Scores de conformite par organisme <button class="btn btn-s btn-sm" onclick="showS('score-details')" style="margin-left:8px;font-size:.78em">Voir le detail des formules</button> <button class="btn btn-s btn-sm" onclick="showS('ensavoirplus')" style="margin-left:4px;font-size:.78em">&#128218; En savoir plus</button></h2>
-<div class="g3" id="dash-scores-triple">
-<div style="text-align:center;padding:20px 16px;border-radius:14px;background:linear-gradient(180deg,#f8fafc,#eff6ff);border:1px solid #bfdbfe;box-shadow:0 2px 8px rgba(37,99,235,.06)">
-<div style="font-size:.72em;text-transform:uppercase;letter-spacing:1.5px;color:#1e40af;margin-bottom:10px;font-weight:800">URSSAF / CSS</div>
-<div class="gauge" id="gauge-urssaf" style="--pct:0%;--gc:#2563eb"><div class="gauge-inner" id="gauge-urssaf-val">-</div></div>
-<div style="font-size:.78em;color:var(--tx2);margin-top:8px;font-weight:500">Securite sociale</div>
-<div style="font-size:.72em;margin-top:2px" id="grade-urssaf"></div>
-</div>
-<div style="text-align:center;padding:20px 16px;border-radius:14px;background:linear-gradient(180deg,#f8fafc,#f5f3ff);border:1px solid #ddd6fe;box-shadow:0 2px 8px rgba(124,58,237,.06)">
-<div style="font-size:.72em;text-transform:uppercase;letter-spacing:1.5px;color:#6d28d9;margin-bottom:10px;font-weight:800">DGFIP / CGI</div>
-<div class="gauge" id="gauge-fiscal" style="--pct:0%;--gc:#7c3aed"><div class="gauge-inner" id="gauge-fiscal-val">-</div></div>
-<div style="font-size:.78em;color:var(--tx2);margin-top:8px;font-weight:500">Fiscal</div>
-<div style="font-size:.72em;margin-top:2px" id="grade-fiscal"></div>
-</div>
-<div style="text-align:center;padding:20px 16px;border-radius:14px;background:linear-gradient(180deg,#f8fafc,#f0fdfa);border:1px solid #99f6e4;box-shadow:0 2px 8px rgba(13,115,119,.06)">
-<div style="font-size:.72em;text-transform:uppercase;letter-spacing:1.5px;color:#0d7377;margin-bottom:10px;font-weight:800">COUR DES COMPTES</div>
-<div class="gauge" id="gauge-cdc" style="--pct:0%;--gc:#0d9488"><div class="gauge-inner" id="gauge-cdc-val">-</div></div>
-<div style="font-size:.78em;color:var(--tx2);margin-top:8px;font-weight:500">Regularite comptable</div>
-<div style="font-size:.72em;margin-top:2px" id="grade-cdc"></div>
-</div>
-</div>
-</div>
-<div class="card"><h2>Impacts financiers par destinataire</h2>
-<div class="g4" id="dash-by-dest">
-<div class="sc blue"><div class="val" id="dd-urssaf">-</div><div class="lab">URSSAF</div></div>
-<div class="sc purple"><div class="val" id="dd-fiscal">-</div><div class="lab">Fiscal</div></div>
-<div class="sc amber"><div class="val" id="dd-ft">-</div><div class="lab">France Travail</div></div>
-<div class="sc teal"><div class="val" id="dd-guso">-</div><div class="lab">GUSO</div></div>
-</div></div>
-<div class="card"><h2>Dernieres anomalies <span class="ct" id="dash-anom-count">0</span></h2><div id="dash-anomalies-list"><p style="color:var(--tx2)">Aucune anomalie. Lancez une analyse.</p></div></div>
-</div>
-
-<!-- ===== IMPORT / ANALYSE ===== -->
-<div class="sec" id="s-analyse">
-<div class="card">
-<h2>Importer et analyser</h2>
-<div class="al info" style="margin-bottom:14px"><span class="ai">&#128196;</span><span>Max <strong>50 fichiers</strong> et <strong>2 Go</strong> par analyse. Reconnaissance OCR, ecriture manuscrite, libelles, totaux et sous-totaux.</span></div>
-<div class="g4" style="margin-bottom:14px">
-<div><label>Mode d analyse</label><select id="mode-analyse">
-<option value="simple">Analyse simple</option>
-<option value="social">Audit social</option>
-<option value="fiscal">Audit fiscal</option>
-<option value="complet" selected>Audit complet</option>
-</select></div>
-<div><label>Annee debut</label><select id="audit-annee-debut"><option value="2021">2021</option><option value="2022">2022</option><option value="2023">2023</option><option value="2024">2024</option><option value="2025">2025</option><option value="2026" selected>2026</option></select></div>
-<div><label>Annee fin</label><select id="audit-annee-fin"><option value="2026" selected>2026</option><option value="2025">2025</option><option value="2024">2024</option></select></div>
-<div style="display:flex;align-items:flex-end"><div class="al info" id="mode-info" style="margin:0;font-size:.78em;flex:1"><span class="ai"><svg width='14' height='14' viewBox='0 0 24 24' fill='none' stroke='currentColor' stroke-width='2'><circle cx='12' cy='12' r='10'/><line x1='12' y1='8' x2='12' y2='12'/><line x1='12' y1='16' x2='12.01' y2='16'/></svg></span><span>Audit complet : verification pluri-annuelle avec regles en vigueur par periode.</span></div></div>
-</div>
-<div class="uz" id="dz-analyse">
-<input type="file" id="fi-analyse" multiple accept=".pdf,.csv,.xlsx,.xls,.xml,.dsn,.jpg,.jpeg,.png,.bmp,.tiff,.tif,.gif,.webp,.heic,.heif,.txt">
-<div class="uzi">&#128196;</div>
-<h3>Glissez vos fichiers ici</h3>
-<p>PDF, Excel, CSV, DSN, XML, Images, TXT</p>
-</div>
-<div id="fl-analyse" style="margin:10px 0"></div>
-<div style="display:flex;align-items:center;gap:10px;margin:12px 0;padding:12px;background:var(--pl);border-radius:10px;border:1px solid #bfdbfe">
-<input type="checkbox" id="chk-integrer" checked style="width:auto;margin:0">
-<label for="chk-integrer" style="margin:0;font-weight:500;color:var(--p);font-size:.86em;cursor:pointer">Integrer les documents dans la bibliotheque</label>
-</div>
-<div style="display:flex;gap:8px;flex-wrap:wrap"><button class="btn btn-blue btn-f" id="btn-az" onclick="lancerAnalyse()" disabled>&#128269; Lancer l'analyse</button></div>
-<div class="prg" id="prg-az"><div class="prg-bar"><div class="prg-fill" id="pf-az"></div></div><div class="prg-txt" id="pt-az">Import...</div></div>
-</div>
-<div id="res-analyse" style="display:none">
-<div class="card">
-<div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:14px;flex-wrap:wrap;gap:8px">
-<h2>Resultats</h2>
-<div class="btn-group"><button class="btn btn-s btn-sm" onclick="exportPDF()">&#128196; Export PDF</button><button class="btn btn-s btn-sm" onclick="exportSection('az')">&#128190; CSV</button><button class="btn btn-blue" onclick="resetAz()" style="font-weight:600">&#10227; Nouvelle analyse</button></div>
-</div>
-<div class="g4" id="az-dashboard"></div>
-</div>
-<div class="card" id="az-impact-detail" style="display:none"></div>
-<div class="card" id="az-fichiers-card"><h2>Fichiers analyses</h2><div id="az-fichiers-list"></div></div>
-<div class="card" id="az-integration-card" style="display:none"><h2>Integration automatique</h2><div id="az-integration-results"></div></div>
-<div class="card" id="az-audit-card" style="display:none"><h2>Points de controle Audit</h2><div id="az-audit-checks"></div></div>
-<div class="card"><h2>Anomalies</h2><div id="az-findings"></div></div>
-<div class="card"><h2>Recommandations</h2><div id="az-reco"></div></div>
-<div class="card" id="az-html-card" style="display:none"><h2>Rapport visuel complet</h2><iframe id="az-html-frame" style="width:100%;height:600px;border:1px solid var(--brd);border-radius:10px"></iframe></div>
-<div style="text-align:center;margin:20px 0"><button class="btn btn-blue" onclick="resetAz()" style="font-size:1.05em;padding:12px 32px;font-weight:600">&#10227; Nouvelle analyse</button></div>
-</div>
-</div>
-
-<!-- ===== BIBLIOTHEQUE ===== -->
-<div class="sec" id="s-biblio">
-<div class="card">
-<h2>Base de connaissances</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Toutes les informations extraites des documents importes, utilisees comme base d interpretation pour l audit et les controles.</p>
-<div class="btn-group"><button class="btn btn-blue btn-sm" onclick="loadBiblio();loadKnowledge()">&#8635; Actualiser</button><button class="btn btn-s btn-sm" onclick="exportSection('biblio')">&#128190; Exporter</button></div>
-<div id="biblio-knowledge" style="margin-top:12px"></div>
-</div>
-<div class="card">
-<h2>Documents importes</h2>
-<div id="biblio-list"></div>
-</div>
-</div>
-
-<!-- ===== FACTURES ===== -->
-<div class="sec" id="s-factures">
-<div class="tabs" id="fact-tabs">
-<div class="tab active" onclick="showFT('analyse',this)">Analyser</div>
-<div class="tab" onclick="showFT('saisie',this)">Saisie manuelle</div>
-<div class="tab" onclick="showFT('suivi',this)">Suivi paiements</div>
-</div>
-<div class="tc active" id="ft-analyse">
-<div class="g2">
-<div class="card">
-<h2>Analyser une facture</h2>
-<div class="uz" id="dz-fact">
-<input type="file" id="fi-fact" accept=".pdf,.csv,.txt,.jpg,.jpeg,.png">
-<div class="uzi">&#128206;</div><h3>Deposer une facture</h3><p>PDF, CSV, TXT, Image</p>
-</div>
-<div id="fact-fn" style="margin:8px 0"></div>
-<button class="btn btn-blue btn-f" id="btn-fact" onclick="analyserFacture()" disabled>Analyser</button>
-</div>
-<div class="card" id="fact-res" style="display:none"><h2>Resultat</h2><div id="fact-det"></div></div>
-</div>
-</div>
-<div class="tc" id="ft-saisie">
-<div class="card">
-<h2>Saisie manuelle / Comptabilisation</h2>
-<label>Type</label>
-<select id="f-type"><option value="facture_achat">Facture achat</option><option value="facture_vente">Facture vente</option><option value="avoir_achat">Avoir achat</option><option value="avoir_vente">Avoir vente</option></select>
-<div class="g2"><div><label>Date</label><input type="date" id="f-date"></div><div><label>N piece</label><input id="f-num" placeholder="FA-2026-001"></div></div>
-<label>Tiers</label><input id="f-tiers" placeholder="Nom du tiers">
-<div class="g3"><div><label>HT</label><input type="number" step="0.01" id="f-ht" placeholder="0.00"></div><div><label>TVA</label><input type="number" step="0.01" id="f-tva" placeholder="0.00"></div><div><label>TTC</label><input type="number" step="0.01" id="f-ttc" placeholder="0.00"></div></div>
-<button class="btn btn-p btn-f" onclick="comptabiliserFacture()">Comptabiliser</button>
-<div id="alerte-justif" class="al err" style="display:none"><span class="ai">&#9888;</span><span><strong>Alerte justificatif</strong> : Saisie sans document. L'ecriture sera marquee en rouge.</span></div>
-<div id="fact-saisie-res" style="margin-top:12px"></div>
-</div>
-</div>
-<div class="tc" id="ft-suivi">
-<div class="card">
-<h2>Suivi des paiements</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Gerez le statut de vos factures. Marquez comme paye avec reference de virement.</p>
-<div class="g2">
-<div>
-<label>ID facture / ecriture</label><input id="pay-id" placeholder="ID de la facture">
-<label>Statut</label><select id="pay-stat" onchange="toggleMontantPaye()"><option value="impaye">Impaye</option><option value="paye">Paye</option><option value="partiellement_paye">Partiellement paye</option><option value="en_retard">En retard</option></select>
-<div id="pay-montant-row" style="display:none"><label>Montant paye (EUR)</label><input type="number" step="0.01" id="pay-montant" placeholder="0.00"></div>
-<label>Date paiement</label><input type="date" id="pay-date">
-<label>Reference virement / justificatif</label><input id="pay-ref" placeholder="REF-VIR-2026-001">
-<button class="btn btn-green btn-f" onclick="majStatutFacture()">Mettre a jour le statut</button>
-</div>
-<div>
-<h3 style="margin-bottom:10px">Statuts enregistres</h3>
-<div id="pay-list"></div>
-</div>
-</div>
-</div>
-</div>
-</div>
-
-<!-- ===== CREATION DSN ===== -->
-<div class="sec" id="s-dsn">
-<div class="card">
-<h2>&#128196; Generation de DSN</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Creez vos declarations sociales nominatives au format texte structure (NEODeS). Remplissez les informations, ajoutez les salaries et generez le fichier.</p>
-<div class="al info" style="margin-bottom:14px"><span class="ai">&#9878;</span><span>La DSN generee est un brouillon. Elle doit etre verifiee et validee avant envoi a net-entreprises.fr.</span></div>
-</div>
-<div class="g2">
-<div class="card">
-<h2>Emetteur et entreprise</h2>
-<label>SIREN emetteur</label><input id="dsn-siren-em" placeholder="123456789" maxlength="9">
-<label>SIREN entreprise</label><input id="dsn-siren-ent" placeholder="123456789" maxlength="9">
-<label>Raison sociale</label><input id="dsn-raison" placeholder="Mon Entreprise SAS">
-<label>NIC etablissement</label><input id="dsn-nic" placeholder="00001" maxlength="5">
-<div class="g2">
-<div><label>Effectif</label><input type="number" id="dsn-eff" value="1" min="1"></div>
-<div><label>Mois (AAAAMM)</label><input id="dsn-mois" placeholder="202601" maxlength="6"></div>
-</div>
-</div>
-<div class="card">
-<h2>Salaries <span class="ct" id="dsn-sal-count">0</span></h2>
-<div id="dsn-sal-list"></div>
-<div style="border:1px solid var(--brd);border-radius:10px;padding:14px;margin-top:10px">
-<div class="g2"><div><label>NIR</label><input id="dsn-nir" placeholder="1 85 01 75 108 888 42" maxlength="15"></div><div><label>Nom</label><input id="dsn-nom" placeholder="DUPONT"></div></div>
-<div class="g2"><div><label>Prenom</label><input id="dsn-prenom" placeholder="Jean"></div><div><label>Date naissance (JJMMAAAA)</label><input id="dsn-ddn" placeholder="01011990" maxlength="8"></div></div>
-<div class="g3"><div><label>Brut mensuel</label><input type="number" step="0.01" id="dsn-brut" placeholder="2500.00"></div><div><label>Net fiscal</label><input type="number" step="0.01" id="dsn-net" placeholder="1950.00"></div><div><label>Heures</label><input type="number" step="0.01" id="dsn-heures" value="151.67"></div></div>
-<div class="g2"><div><label>Statut</label><select id="dsn-statut"><option value="02">Non-cadre</option><option value="01">Cadre</option></select></div><div><label>N contrat</label><input id="dsn-contrat" placeholder="C0001"></div></div>
-<button class="btn btn-blue btn-f" onclick="ajouterSalarieDSN()">+ Ajouter ce salarie</button>
-</div>
-</div>
-</div>
-<div class="card">
-<button class="btn btn-p btn-f" onclick="genererDSN()" id="btn-dsn-gen">&#128196; Generer la DSN</button>
-<div id="dsn-result" style="margin-top:14px"></div>
-</div>
-<div class="card" style="display:none" id="dsn-brouillons-card">
-<h2>Brouillons</h2>
-<div class="btn-group"><button class="btn btn-s btn-sm" onclick="loadDSNBrouillons()">&#8635; Actualiser</button></div>
-<div id="dsn-brouillons"></div>
-</div>
-</div>
-
-<!-- ===== COMPTABILITE ===== -->
-<div class="sec" id="s-compta">
-<div class="tabs" id="compta-tabs">
-<div class="tab active" onclick="showCT('journal',this)">Journal</div>
-<div class="tab" onclick="showCT('ecritures',this)">Saisie</div>
-<div class="tab" onclick="showCT('grandlivre',this)">Grand Livre</div>
-<div class="tab" onclick="showCT('balance',this)">Balance</div>
-<div class="tab" onclick="showCT('resultat',this)">Resultat</div>
-<div class="tab" onclick="showCT('bilan',this)">Bilan</div>
-<div class="tab" onclick="showCT('tva',this)">TVA</div>
-<div class="tab" onclick="showCT('social',this)">Charges sociales</div>
-<div class="tab" onclick="showCT('plan',this)">Plan comptable</div>
-</div>
-<div class="card">
-<div class="btn-group">
-<button class="btn btn-p btn-sm" onclick="loadCompta()">&#8635; Actualiser</button>
-<button class="btn btn-s btn-sm" onclick="validerEcr()">&#9989; Valider</button>
-<button class="btn btn-s btn-sm" onclick="exportSection('compta')">&#128190; Exporter</button>
-</div>
-<div class="period-sel" id="period-sel" style="display:none">
-<div class="g3"><div><label>Debut</label><input type="date" id="gl-dd"></div><div><label>Fin</label><input type="date" id="gl-df"></div><div><button class="btn btn-blue btn-f" onclick="loadCompta()" style="margin-top:22px">Appliquer</button></div></div>
-</div>
-<div class="tc active" id="ct-journal"><div style="margin-bottom:10px"><input id="ct-journal-search" placeholder="Rechercher par mot-cle (libelle, compte, date...)" oninput="filterJournal()" style="width:100%;max-width:400px"></div><div id="ct-journal-c"></div></div>
-<div class="tc" id="ct-balance"><div id="ct-balance-c"></div></div>
-<div class="tc" id="ct-grandlivre"><div id="ct-grandlivre-c"></div></div>
-<div class="tc" id="ct-resultat"><div id="ct-resultat-c"></div></div>
-<div class="tc" id="ct-bilan"><div id="ct-bilan-c"></div></div>
-<div class="tc" id="ct-tva"><div id="ct-tva-c"></div></div>
-<div class="tc" id="ct-social"><div id="ct-social-c"></div></div>
-<div class="tc" id="ct-ecritures">
-<h2 style="margin-bottom:12px">Ecriture manuelle</h2>
-<div class="al info" style="margin-bottom:12px"><span class="ai">&#128161;</span><span><strong>Vous ne connaissez pas le plan comptable ?</strong> Decrivez la nature de la depense ou du revenu (ex: <em>loyer</em>, <em>achat fournitures</em>, <em>salaire</em>, <em>vente</em>) dans le champ ci-dessous et le systeme vous suggerera les bons comptes avec des explications.</span></div>
-<div style="margin-bottom:14px"><label>Rechercher un type d'operation</label><input id="em-search" placeholder="Ex: loyer, achat, salaire, vente, assurance, telephone..." oninput="suggestByDescription()"><div id="em-search-sug" class="sug-box"></div></div>
-<div class="g2">
-<div><label>Date</label><input type="date" id="em-date"><label>Libelle</label><input id="em-lib" placeholder="Description de l'ecriture"></div>
-<div><label>Compte debit</label><input id="em-deb" placeholder="601000 ou tapez un mot-cle" oninput="suggestCompte('em-deb','em-deb-sug','em-cre')"><div id="em-deb-sug" class="sug-box"></div><label>Compte credit</label><input id="em-cre" placeholder="401000 ou tapez un mot-cle" oninput="suggestCompte('em-cre','em-cre-sug',null)"><div id="em-cre-sug" class="sug-box"></div></div>
-</div>
-<div class="g3">
-<div><label>Montant</label><input type="number" step="0.01" id="em-mt" placeholder="0.00"></div>
-<div><label>Justificatif (optionnel)</label><input type="file" id="em-just-file" accept=".pdf,.jpg,.png"></div>
-<div><button class="btn btn-p btn-f" onclick="saisirEcriture()" style="margin-top:22px">Enregistrer</button></div>
-</div>
-<div id="em-res" style="margin-top:10px"></div>
-<h3 style="margin-top:20px">Creer un sous-compte</h3>
-<div class="g3"><div><label>Compte parent</label><input id="sc-parent" placeholder="401000"></div>
-<div><label>Libelle</label><input id="sc-lib" placeholder="Fournisseur X"></div>
-<div><button class="btn btn-s btn-f" onclick="creerSousCompte()" style="margin-top:22px">Creer</button></div></div>
-<div id="sc-res" style="margin-top:8px"></div>
-</div>
-<div class="tc" id="ct-plan"><div id="ct-plan-c"></div></div>
-</div>
-</div>
-
-<!-- ===== SIMULATION ===== -->
-<div class="sec" id="s-simulation">
-<div class="tabs">
-<div class="tab active" onclick="showSimTab('bulletin',this)">Bulletin</div>
-<div class="tab" onclick="showSimTab('cout',this)">Cout employeur</div>
-<div class="tab" onclick="showSimTab('exo',this)">Exonerations</div>
-<div class="tab" onclick="showSimTab('masse',this)">Masse salariale</div>
-<div class="tab" onclick="showSimTab('seuils',this)">Seuils entreprise</div>
-<div class="tab" onclick="showSimTab('fincontrat',this)">Fins contrats</div>
-<div class="tab" onclick="showSimTab('optim',this)">Optimisation</div>
-<div class="tab" onclick="showSimTab('risques',this)">Risques sectoriels</div>
-<div class="tab" onclick="showSimTab('ccn',this)">Convention collective</div>
-<div class="tab" onclick="showSimTab('micro',this)">Micro</div>
-<div class="tab" onclick="showSimTab('tns',this)">TNS</div>
-<div class="tab" onclick="showSimTab('guso',this)">GUSO</div>
-<div class="tab" onclick="showSimTab('ir',this)">IR</div>
-<div class="tab" onclick="showSimTab('epargne',this)">Epargne salariale</div>
-</div>
-<div class="card">
-<div class="tc active" id="sim-bulletin">
-<h2>Simulation bulletin de paie</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Simulation pour <strong>un salarie</strong>. L effectif total de l entreprise determine les cotisations liees aux seuils (FNAL, versement mobilite, formation).</p>
-<div class="g4">
-<div><label>Salaire brut mensuel du salarie (EUR)</label><input type="number" step="0.01" id="sim-brut" value="2500"></div>
-<div><label>Effectif total de l entreprise (nb salaries)</label><input type="number" id="sim-eff" value="10"></div>
-<div><label>Statut du salarie</label><select id="sim-cadre"><option value="false">Non cadre</option><option value="true">Cadre</option></select></div>
-<div><label>Convention collective (IDCC ou nom)</label><input id="sim-bull-ccn" placeholder="Ex: 1486, SYNTEC, HCR..."></div>
-</div>
-<div style="background:var(--bg2);border-radius:8px;padding:14px;margin:10px 0">
-<h3 style="margin:0 0 8px;font-size:.95em">&#128197; Absences du mois</h3>
-<div class="g3"><div><label>Jours d absence</label><input type="number" step="0.5" id="sim-abs-jours" value="0" min="0" max="31"></div><div><label>Type d absence</label><select id="sim-abs-type"><option value="">Aucune</option><option value="maladie">Maladie</option><option value="at_mp">AT / Maladie professionnelle</option><option value="maternite">Maternite / Paternite</option><option value="conge_sans_solde">Conge sans solde</option></select></div><div><label style="color:var(--tx2);font-size:.82em">La retenue est calculee au prorata des jours ouvres (base 21.67j/mois). Les IJSS sont estimees selon le type.</label></div></div>
-</div>
-<div class="al info" style="margin:8px 0;font-size:.82em"><span class="ai">&#9878;</span><span>La convention collective peut imposer des taux de prevoyance et mutuelle superieurs aux minimums legaux. <a href="#" onclick="showSimTab('ccn',document.querySelector('[onclick*=ccn]'));return false">Voir l onglet Convention collective</a> pour le detail.</span></div>
-<div class="btn-group"><button class="btn btn-blue" onclick="simBulletin()">Simuler</button><button class="btn btn-s btn-sm" onclick="exportSection('sim')">&#128190; Export</button></div>
-<div id="sim-bull-res"></div>
-</div>
-
-<div class="tc" id="sim-cout"><h2>Cout total employeur detaille</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Cout mensuel complet pour <strong>un salarie</strong>. L effectif total sert a determiner les obligations annexes (formation 0.55% ou 1%, effort construction >= 50, participation >= 50).</p>
-<div class="g4"><div><label>Salaire brut mensuel du salarie (EUR)</label><input type="number" step="0.01" id="ce-brut" value="2500"></div><div><label>Effectif total de l entreprise (nb salaries)</label><input type="number" id="ce-eff" value="10"></div><div><label>Statut du salarie</label><select id="ce-cadre"><option value="false">Non cadre</option><option value="true">Cadre</option></select></div><div><label>Convention collective (IDCC ou nom)</label><input id="ce-ccn" placeholder="Ex: 1486, SYNTEC..."></div></div>
-<div class="al info" style="margin:8px 0;font-size:.82em"><span class="ai">&#9878;</span><span>Rappel : la CCN peut imposer des surcouts (prevoyance, primes, indemnites majorees). <a href="#" onclick="showSimTab('ccn',document.querySelector('[onclick*=ccn]'));return false">Onglet Convention collective</a>.</span></div>
-<div class="g3"><div><label>Primes mensuelles (EUR)</label><input type="number" step="0.01" id="ce-primes" value="0"></div><div></div><div></div></div>
-<div class="g4"><div><label>Avantages nature (EUR/mois)</label><input type="number" step="0.01" id="ce-avantages" value="0"></div><div><label>Frais km (EUR/mois)</label><input type="number" step="0.01" id="ce-km" value="0"></div><div><label>Tickets resto (EUR/mois)</label><input type="number" step="0.01" id="ce-tr" value="0"></div><div><label>Mutuelle part employeur (EUR/mois)</label><input type="number" step="0.01" id="ce-mut" value="40"></div></div>
-<button class="btn btn-blue" onclick="simCout()">Calculer</button><div id="sim-cout-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-exo"><h2>Exonerations et aides a l emploi</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Simulation pour <strong>un salarie</strong> (ou un groupe au meme profil). L effectif total determine les exonerations liees aux seuils. Tous les parametres sont modifiables.</p>
-
-<div style="background:#e8f4fd;border:2px solid #2196F3;border-radius:8px;padding:14px;margin-bottom:12px">
-<h3 style="margin:0 0 8px;font-size:.95em">&#128197; Annee de reference des baremes</h3>
-<p style="color:var(--tx2);font-size:.82em;margin:0 0 8px">Un document 2024 doit etre simule avec les baremes 2024. Les taux SMIC, PASS, cotisations et formules de reduction changent selon l annee.</p>
-<select id="exo-annee" style="font-size:1em;padding:6px 12px;border-radius:6px;border:2px solid #2196F3;font-weight:bold">
-<option value="2020">2020 (SMIC 1539,42 / PASS 3428 / Fillon 1.6 SMIC)</option>
-<option value="2021">2021 (SMIC 1554,58 / PASS 3428 / Fillon 1.6 SMIC)</option>
-<option value="2022">2022 (SMIC 1603,12 / PASS 3428 / Fillon 1.6 SMIC)</option>
-<option value="2023">2023 (SMIC 1747,20 / PASS 3666 / Fillon 1.6 SMIC)</option>
-<option value="2024">2024 (SMIC 1766,92 / PASS 3864 / Fillon 1.6 SMIC)</option>
-<option value="2025">2025 (SMIC 1801,80 / PASS 3925 / Fillon 1.6 SMIC)</option>
-<option value="2026" selected>2026 (SMIC 1801,84 / PASS 3925 / RGDU 3.0 SMIC)</option>
-</select>
-</div>
-
-<div style="background:var(--bg2);border-radius:8px;padding:14px;margin-bottom:12px">
-<h3 style="margin:0 0 8px;font-size:.95em">&#128100; Salarie simule</h3>
-<div class="g4"><div><label>Salaire brut mensuel du salarie (EUR)</label><input type="number" step="0.01" id="exo-brut" value="2000"></div><div><label>Effectif total de l entreprise (nb salaries)</label><input type="number" id="exo-eff" value="10"></div><div><label>Age du salarie simule</label><input type="number" id="exo-age" value="30"></div><div><label>Duree du contrat (mois, 0 = CDI)</label><input type="number" id="exo-duree" value="0" placeholder="0 = CDI"></div></div>
-<div class="g4"><div><label>Statut du salarie</label><select id="exo-statut"><option value="standard">Standard (CDI/CDD)</option><option value="apprenti">Apprenti</option><option value="handicape">Travailleur handicape (RQTH)</option><option value="jei">JEI - Chercheur/technicien</option><option value="contrat_pro">Contrat professionnalisation</option><option value="acre">ACRE (Createur/Repreneur)</option><option value="emploi_franc">Emploi franc (resident QPV)</option></select></div><div><label>Statut cadre/non-cadre</label><select id="exo-cadre"><option value="false">Non cadre</option><option value="true">Cadre</option></select></div><div><label>Convention collective</label><input id="exo-ccn" placeholder="Ex: Syntec, HCR, BTP..."></div><div><label>Nb de salaries au meme profil (simulation groupee)</label><input type="number" id="exo-nb" value="1" min="1" max="500"></div></div>
-</div>
-
-<div style="background:var(--bg2);border-radius:8px;padding:14px;margin-bottom:12px">
-<h3 style="margin:0 0 8px;font-size:.95em">&#9200; Temps de travail</h3>
-<div class="g4"><div><label>Heures mensuelles contrat</label><input type="number" step="0.01" id="exo-heures" value="151.67"></div><div><label>Temps partiel (%)</label><input type="number" step="1" id="exo-tp" value="100" min="1" max="100"></div><div><label>Heures sup /mois</label><input type="number" step="0.5" id="exo-hs" value="0"></div><div><label>Taux AT/MP (%)</label><input type="number" step="0.01" id="exo-at" value="0" placeholder="0 = defaut 2.08%"></div></div>
-</div>
-
-<div style="background:var(--bg2);border-radius:8px;padding:14px;margin-bottom:12px">
-<h3 style="margin:0 0 8px;font-size:.95em">&#128197; Absences du mois</h3>
-<div class="g3"><div><label>Jours d'absence</label><input type="number" step="0.5" id="exo-abs-jours" value="0" min="0" max="31"></div><div><label>Type d'absence</label><select id="exo-abs-type"><option value="">Aucune</option><option value="maladie">Maladie</option><option value="at_mp">AT / Maladie professionnelle</option><option value="maternite">Maternite / Paternite</option><option value="conge_sans_solde">Conge sans solde</option></select></div><div><label style="color:var(--tx2);font-size:.82em">Impact : le SMIC est proratise au temps de presence pour le calcul du ratio SMIC (reduction Fillon, LODEOM)</label></div></div>
-</div>
-
-<div style="background:var(--bg2);border-radius:8px;padding:14px;margin-bottom:12px">
-<h3 style="margin:0 0 8px;font-size:.95em">&#127758; Zone geographique</h3>
-<div class="g2"><div><label>Zone</label><select id="exo-zone" onchange="toggleLodeom()"><option value="metropole">Metropole</option><option value="zrr">ZRR (Revitalisation rurale)</option><option value="zfu">ZFU-TE (Franche urbaine)</option><option value="qpv">QPV (Quartier prioritaire)</option><option value="outremer">Outre-mer (LODEOM)</option><option value="ber">BER (Bassin emploi a redynamiser)</option><option value="zrd">ZRD (Restructuration defense)</option><option value="afr">AFR (Finalite regionale)</option></select></div><div id="lodeom-bareme-wrap" style="display:none"><label>Bareme LODEOM</label><select id="exo-lodeom"><option value="competitivite">Competitivite (exo totale <= 1.3 SMIC, degr. 1.3-2.2)</option><option value="competitivite_renforcee">Comp. renforcee (exo totale <= 1.7 SMIC, degr. 1.7-2.7)</option><option value="innovation_croissance">Innovation et croissance (exo totale <= 2.0 SMIC, degr. 2.0-3.0)</option></select></div></div>
-</div>
-
-<button class="btn btn-blue btn-f" onclick="simExo()">&#9889; Simuler les exonerations</button>
-<div id="sim-exo-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-masse"><h2>Simulation masse salariale globale</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Projection du budget salarial <strong>pour l ensemble de l entreprise</strong>. Le brut moyen est multiplie par l effectif total pour estimer la masse annuelle. Impact augmentations, inflation, primes, frais et turnover.</p>
-<div class="g4"><div><label>Salaire brut moyen par salarie (EUR/mois)</label><input type="number" step="0.01" id="ms-brut" value="2500"></div><div><label>Effectif total de l entreprise (nb salaries)</label><input type="number" id="ms-eff" value="10"></div><div><label>Augmentation envisagee (%)</label><input type="number" step="0.1" id="ms-aug" value="3"></div><div><label>Inflation prevue (%)</label><input type="number" step="0.1" id="ms-infl" value="2"></div></div>
-<div class="g4"><div><label>Frais km moyen par salarie (EUR/mois)</label><input type="number" step="0.01" id="ms-km" value="50"></div><div><label>Avantages nature moyen par salarie (EUR/mois)</label><input type="number" step="0.01" id="ms-an" value="0"></div><div><label>Primes variables (% masse salariale)</label><input type="number" step="0.1" id="ms-primes" value="5"></div><div><label>Turnover annuel previsionnel (%)</label><input type="number" step="0.1" id="ms-turn" value="10"></div></div>
-<div class="g2"><div><label>Convention collective applicable (IDCC ou nom)</label><input id="ms-ccn" placeholder="Ex: 1486, SYNTEC, HCR..."></div><div style="display:flex;align-items:flex-end;font-size:.82em;color:var(--tx2)">La CCN peut impacter les primes obligatoires (13e mois, anciennete, vacances). <a href="#" onclick="showSimTab('ccn',document.querySelector('[onclick*=ccn]'));return false">Voir detail CCN</a></div></div>
-<button class="btn btn-blue" onclick="simMasse()">Projeter</button><div id="sim-masse-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-seuils"><h2>Impact des seuils d effectif sur les obligations de l entreprise</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Analyse <strong>pour l ensemble de l entreprise</strong> : quelles obligations sont declenchees par le franchissement des seuils legaux (11, 20, 50, 250, 300 salaries) et leur impact financier estime.</p>
-<div class="g2"><div><label>Effectif total actuel de l entreprise (nb salaries ETP)</label><input type="number" id="se-eff" value="48"></div><div><label>Masse salariale brute annuelle totale (EUR)</label><input type="number" step="0.01" id="se-masse" value="1500000"></div></div>
-<button class="btn btn-blue" onclick="simSeuils()">Analyser les seuils</button><div id="sim-seuils-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-fincontrat"><h2>Simulation fins de contrats</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Simulation pour <strong>un salarie</strong> : licenciement, rupture conventionnelle, fin CDD, depart retraite — indemnites legales et cout total.</p>
-<div class="g4"><div><label>Type de rupture</label><select id="fc-type"><option value="licenciement">Licenciement</option><option value="rupture_conventionnelle">Rupture conventionnelle</option><option value="fin_cdd">Fin de CDD</option><option value="retraite">Depart retraite</option></select></div><div><label>Salaire brut mensuel du salarie (EUR)</label><input type="number" step="0.01" id="fc-brut" value="2500"></div><div><label>Anciennete du salarie (mois)</label><input type="number" id="fc-anc" value="36"></div><div><label>Statut du salarie</label><select id="fc-cadre"><option value="false">Non cadre</option><option value="true">Cadre</option></select></div></div>
-<div class="g2"><div><label>Motif (licenciement)</label><select id="fc-motif"><option value="personnel">Personnel</option><option value="economique">Economique</option><option value="faute_grave">Faute grave</option><option value="inaptitude">Inaptitude</option></select></div><div style="display:flex;align-items:flex-end"><button class="btn btn-blue btn-f" onclick="simFinContrat()" style="margin-top:0">Calculer les indemnites</button></div></div>
-<div id="sim-fc-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-optim"><h2>Optimisation legale de la remuneration</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Comparaison : salaire, dividendes, interessement, participation, PEE, frais professionnels.</p>
-<div class="g3"><div><label>Benefice net entreprise</label><input type="number" step="0.01" id="op-benef" value="80000"></div><div><label>Remuneration gerant</label><input type="number" step="0.01" id="op-rem" value="40000"></div><div><label>Dividendes prevus</label><input type="number" step="0.01" id="op-div" value="20000"></div></div>
-<div class="g4"><div><label>Interessement</label><input type="number" step="0.01" id="op-int" value="0"></div><div><label>Participation</label><input type="number" step="0.01" id="op-part" value="0"></div><div><label>Frais pro annuels</label><input type="number" step="0.01" id="op-frais" value="0"></div><div><label>Abondement PEE</label><input type="number" step="0.01" id="op-pee" value="0"></div></div>
-<div class="g2"><div><label>Parts fiscales</label><input type="number" step="0.5" id="op-parts" value="1"></div><div><label>Forme juridique</label><select id="op-forme"><option value="sas">SAS/SASU</option><option value="sarl">SARL/EURL</option><option value="ei">EI/EIRL</option></select></div></div>
-<button class="btn btn-blue" onclick="simOptim()">Comparer les scenarios</button><div id="sim-optim-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-risques"><h2>Risques specifiques sectoriels</h2>
-<p style="color:var(--tx2);font-size:.84em;margin-bottom:10px">Analyse <strong>pour l ensemble de l entreprise</strong> : risques sociaux, AT/MP, obligations et subventions par secteur d activite.</p>
-<div class="g3"><div><label>Code NAF/APE de l entreprise</label><input id="rs-naf" value="6201Z" placeholder="Ex: 6201Z, 4120A..."></div><div><label>Effectif total de l entreprise (nb salaries)</label><input type="number" id="rs-eff" value="10"></div><div><label>Masse salariale brute annuelle totale (EUR)</label><input type="number" step="0.01" id="rs-masse" value="400000"></div></div>
-<button class="btn btn-blue" onclick="simRisques()">Analyser</button><div id="sim-risques-res" style="margin-top:12px"></div></div>
-
-<div class="tc" id="sim-ccn">
-<h2>Convention collective : legal vs conventionnel</h2>
-<div class="al info" style="margin-bottom:14px"><span class="ai">&#9878;</span><span><strong>Principe de faveur</strong> (art. L.2251-1 CT) : la convention collective s applique lorsqu elle est <strong>plus favorable</strong> que la loi. Cette simulation compare les obligations legales (Code du travail, ANI) avec les dispositions conventionnelles specifiques a votre CCN. <strong>60+ conventions nationales</strong> sont referencees.</span></div>
-<div class="g4">
-<div><label>Convention collective (IDCC ou intitule)</label><input id="ccn-search" placeholder="Ex: 1486, SYNTEC, metallurgie, HCR..." oninput="ccnAutoSearch()"></div>
-<div><label>Salaire brut mensuel du salarie (EUR)</label><input type="number" step="0.01" id="ccn-brut" value="2500"></div>
-<div><label>Statut du salarie</label><select id="ccn-cadre"><option value="false">Non cadre</option><option value="true">Cadre</option></select></div>
-<div><label>Effectif total de l entreprise</label><input type="number" id="ccn-eff" value="10"></div>
-</div>
-<div id="ccn-search-results" style="margin:8px 0;max-height:150px;overflow-y:auto"></div>
-<button class="btn btn-blue btn-f" onclick="simCCN()">&#9878; Comparer legal vs conventionnel</button>
-<div id="sim-ccn-res" style="margin-top:12px"></div>
-</div>
-
-<div class="tc" id="sim-micro"><h2>Micro-entrepreneur</h2>
-<div class="g3"><div><label>CA</label><input type="number" step="0.01" id="sim-ca" value="50000"></div><div><label>Activite</label><select id="sim-act"><option value="prestations_bnc">BNC</option><option value="prestations_bic">BIC</option><option value="vente_marchandises">Vente</option><option value="location_meublee">Location</option></select></div><div><label>ACRE</label><select id="sim-acre"><option value="false">Non</option><option value="true">Oui</option></select></div></div>
-<button class="btn btn-blue" onclick="simMicro()">Simuler</button><div id="sim-micro-res" style="margin-top:12px"></div></div>
-<div class="tc" id="sim-tns"><h2>TNS</h2>
-<div class="g3"><div><label>Revenu net</label><input type="number" step="0.01" id="sim-rev" value="40000"></div><div><label>Statut</label><select id="sim-stat"><option value="gerant_majoritaire">Gerant maj.</option><option value="profession_liberale">PL</option><option value="artisan">Artisan</option><option value="commercant">Commercant</option></select></div><div><label>ACRE</label><select id="sim-tacre"><option value="false">Non</option><option value="true">Oui</option></select></div></div>
-<button class="btn btn-blue" onclick="simTNS()">Simuler</button><div id="sim-tns-res" style="margin-top:12px"></div></div>
-<div class="tc" id="sim-guso"><h2>GUSO - Spectacle occasionnel</h2>
-<div class="al info" style="margin-bottom:12px"><span class="ai"><svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2"><circle cx="12" cy="12" r="10"/><line x1="12" y1="8" x2="12" y2="12"/><line x1="12" y1="16" x2="12.01" y2="16"/></svg></span><span>Simulation exhaustive GUSO : cotisations URSSAF + conge spectacle (15.5%) + Audiens + FCAP + medecine du travail. Annexe 8 (techniciens) ou 10 (artistes).</span></div>
-<div class="g4"><div><label>Salaire brut</label><input type="number" step="0.01" id="sim-gbrut" value="500"></div><div><label>Heures</label><input type="number" step="0.5" id="sim-gh" value="8"></div><div><label>Type contrat</label><select id="sim-gtype"><option value="cddu">CDDU</option><option value="cachet">Cachet</option><option value="intermittent">Intermittent</option></select></div><div><label>Statut</label><select id="sim-gartiste"><option value="true">Artiste (Annexe 10)</option><option value="false">Technicien (Annexe 8)</option></select></div></div>
-<button class="btn btn-blue" onclick="simGUSO()" style="margin-top:10px">Simuler</button><div id="sim-guso-res" style="margin-top:12px"></div></div>
-<div class="tc" id="sim-ir"><h2>Impot sur le revenu</h2>
-<div class="g3"><div><label>Benefice</label><input type="number" step="0.01" id="sim-ben" value="40000"></div><div><label>Parts</label><input type="number" step="0.5" id="sim-parts" value="1"></div><div><label>Autres rev.</label><input type="number" step="0.01" id="sim-autres" value="0"></div></div>
-<button class="btn btn-blue" onclick="simIR()">Simuler</button><div id="sim-ir-res" style="margin-top:12px"></div></div>
-<div class="tc" id="sim-epargne"><h2>Epargne salariale</h2>
-<div class="al info" style="margin-bottom:14px"><span class="ai">&#128161;</span><span>Simulez les dispositifs d'epargne salariale (PEE, PERCO/PER, Interessement, Participation) et creez vos contrats/accords.</span></div>
-<details open><summary style="cursor:pointer;font-weight:600;margin-bottom:10px">&#128200; Simulation</summary>
-<div class="g3">
-<div><label>Dispositif</label><select id="ep-type"><option value="pee">PEE (Plan Epargne Entreprise)</option><option value="perco">PERCO/PER Collectif</option><option value="per">PER Obligatoire</option><option value="interessement">Interessement</option><option value="participation">Participation</option></select></div>
-<div><label>Masse salariale brute annuelle</label><input type="number" id="ep-ms" value="500000"></div>
-<div><label>Effectif</label><input type="number" id="ep-eff" value="10"></div>
-</div>
-<div class="g3" style="margin-top:8px">
-<div><label>Montant a verser (total)</label><input type="number" id="ep-montant" value="10000"></div>
-<div><label>Abondement employeur (%)</label><input type="number" id="ep-abond" value="100" min="0" max="300"></div>
-<div><label>Plafond abondement (0=auto)</label><input type="number" id="ep-plaf" value="0"></div>
-</div>
-<div class="g3" style="margin-top:8px">
-<div><label>Forfait social % (0=auto)</label><input type="number" id="ep-fs" value="0" min="0" max="20"></div>
-<div><label>Benefice net (si Participation)</label><input type="number" id="ep-bn" value="100000"></div>
-<div></div>
-</div>
-<button class="btn btn-blue" onclick="simEpargne()" style="margin-top:10px">Simuler</button>
-<div id="sim-epargne-res" style="margin-top:12px"></div>
-</details>
-<details style="margin-top:16px"><summary style="cursor:pointer;font-weight:600;margin-bottom:10px">&#128196; Creer un contrat / accord</summary>
-<div class="g3">
-<div><label>Type de dispositif</label><select id="epc-type"><option value="pee">PEE</option><option value="perco">PERCO/PER Collectif</option><option value="per">PER Obligatoire</option><option value="interessement">Interessement</option><option value="participation">Participation</option></select></div>
-<div><label>Nom du contrat</label><input type="text" id="epc-nom" placeholder="Ex: Accord PEE 2026"></div>
-<div><label>Organisme gestionnaire</label><input type="text" id="epc-org" placeholder="Ex: Amundi, Natixis..."></div>
-</div>
-<div class="g3" style="margin-top:8px">
-<div><label>Date mise en place</label><input type="date" id="epc-date"></div>
-<div><label>Duree accord (ans)</label><input type="number" id="epc-duree" value="3" min="1" max="5"></div>
-<div><label>Montant prevu annuel</label><input type="number" id="epc-montant" value="10000"></div>
-</div>
-<div class="g3" style="margin-top:8px">
-<div><label>Abondement (%)</label><input type="number" id="epc-abond" value="100"></div>
-<div><label>Plafond abondement</label><input type="number" id="epc-plaf" value="0"></div>
-<div><label>Beneficiaires</label><select id="epc-benef"><option value="tous">Tous les salaries</option><option value="3mois">Anciennete 3 mois</option><option value="cadres">Cadres uniquement</option></select></div>
-</div>
-<div style="margin-top:8px"><label>Observations</label><textarea id="epc-obs" rows="2" style="width:100%"></textarea></div>
-<button class="btn btn-green" onclick="creerContratEpargne()" style="margin-top:10px">Creer le contrat</button>
-</details>
-<details style="margin-top:16px"><summary style="cursor:pointer;font-weight:600;margin-bottom:10px">&#128203; Contrats existants</summary>
-<button class="btn btn-blue" onclick="loadContratsEpargne()" style="margin-bottom:10px">Actualiser</button>
-<div id="epargne-contrats-list"></div>
-</details>
-</div>
-</div>
-</div>
-
-<!-- ===== SUBVENTIONS ET AIDES ===== -->
-<div class="sec" id="s-subventions">
-<div class="card">
-<h2>Recherche de subventions et aides</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Identifiez toutes les subventions, aides et dispositifs auxquels votre entreprise est potentiellement eligible. Renseignez les criteres ci-dessous pour un matching precis.</p>
-<div class="al info" style="margin-bottom:14px"><span class="ai">&#128161;</span><span>Les donnees de votre entreprise sont pre-remplies depuis la <strong>Configuration</strong> et le <strong>Portefeuille</strong>. Vous pouvez les ajuster pour affiner la recherche.</span></div>
-<div class="g3">
-<div><label>Code NAF / APE</label><input id="sub-naf" placeholder="Ex: 6201Z, 4120A..." value=""></div>
-<div><label>Effectif</label><input type="number" id="sub-eff" value="10"></div>
-<div><label>Forme juridique</label><select id="sub-forme"><option value="">-- Toutes --</option><option value="SAS">SAS / SASU</option><option value="SARL">SARL / EURL</option><option value="SA">SA</option><option value="EI">EI / EIRL</option><option value="SCI">SCI</option><option value="Association">Association</option><option value="SNC">SNC</option></select></div>
-</div>
-<div class="g3">
-<div><label>Region</label><select id="sub-region"><option value="">-- Toute la France --</option><option value="ile-de-france">Ile-de-France</option><option value="auvergne-rhone-alpes">Auvergne-Rhone-Alpes</option><option value="nouvelle-aquitaine">Nouvelle-Aquitaine</option><option value="occitanie">Occitanie</option><option value="hauts-de-france">Hauts-de-France</option><option value="provence-alpes-cote-dazur">Provence-Alpes-Cote d Azur</option><option value="grand-est">Grand Est</option><option value="pays-de-la-loire">Pays de la Loire</option><option value="bretagne">Bretagne</option><option value="normandie">Normandie</option><option value="bourgogne-franche-comte">Bourgogne-Franche-Comte</option><option value="centre-val-de-loire">Centre-Val de Loire</option><option value="corse">Corse</option><option value="outre-mer">Outre-mer (DOM-TOM)</option></select></div>
-<div><label>Ville / Zone</label><select id="sub-zone"><option value="">-- Toute zone --</option><option value="zrr">ZRR (Zone revitalisation rurale)</option><option value="zfu">ZFU-TE (Zone franche urbaine)</option><option value="qpv">QPV (Quartier prioritaire)</option><option value="ber">BER (Bassin emploi a redynamiser)</option><option value="zrd">ZRD (Zone restructuration defense)</option><option value="afi">AFR (Aide finalite regionale)</option></select></div>
-<div><label>Chiffre d affaires annuel</label><input type="number" id="sub-ca" placeholder="Ex: 500000" value=""></div>
-</div>
-<div class="g3">
-<div><label>Age de l entreprise (annees)</label><input type="number" id="sub-age" value="5"></div>
-<div><label>Masse salariale annuelle</label><input type="number" id="sub-masse" placeholder="Ex: 400000" value=""></div>
-<div><label>Date de creation</label><input type="date" id="sub-creation" value=""></div>
-</div>
-<p style="font-weight:600;font-size:.88em;color:var(--p);margin:14px 0 8px">Domaines d activite (cochez ceux qui vous concernent) :</p>
-<div class="g4" style="margin-bottom:14px">
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-innovation" style="width:auto;margin:0"> Innovation / R&D</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-environnement" style="width:auto;margin:0"> Transition ecologique</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-numerique" style="width:auto;margin:0"> Transformation numerique</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-export" style="width:auto;margin:0"> Export / International</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-formation" style="width:auto;margin:0"> Formation / Emploi</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-creation-reprise" style="width:auto;margin:0"> Creation / Reprise</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-investissement" style="width:auto;margin:0"> Investissement</label>
-<label style="display:flex;align-items:center;gap:6px;font-weight:500;font-size:.84em;cursor:pointer"><input type="checkbox" id="sub-ess" style="width:auto;margin:0"> ESS / Impact social</label>
-</div>
-<div class="btn-group"><button class="btn btn-blue btn-f" onclick="rechercherSubventions()">&#128269; Rechercher les subventions eligibles</button></div>
-</div>
-
-<div id="sub-results" style="display:none">
-
-<div class="g4" id="sub-stats" style="margin-bottom:18px">
-<div class="sc blue"><div class="val" id="sub-total">0</div><div class="lab">Aides identifiees</div></div>
-<div class="sc green"><div class="val" id="sub-montant">0 EUR</div><div class="lab">Estimation potentielle</div></div>
-<div class="sc amber"><div class="val" id="sub-nationales">0</div><div class="lab">Nationales</div></div>
-<div class="sc purple"><div class="val" id="sub-europeennes">0</div><div class="lab">Europeennes</div></div>
-</div>
-
-<div class="card">
-<h2>Filtrer les resultats</h2>
-<div class="g4">
-<div><label>Niveau</label><select id="sub-filtre-niveau" onchange="filtrerSubventions()"><option value="">Tous</option><option value="local">Local</option><option value="regional">Regional</option><option value="national">National</option><option value="europeen">Europeen</option></select></div>
-<div><label>Categorie</label><select id="sub-filtre-cat" onchange="filtrerSubventions()"><option value="">Toutes</option><option value="innovation">Innovation / R&D</option><option value="environnement">Environnement</option><option value="emploi">Emploi / Formation</option><option value="numerique">Numerique</option><option value="export">Export</option><option value="creation">Creation / Reprise</option><option value="investissement">Investissement</option><option value="fiscal">Avantage fiscal</option><option value="social">Exoneration sociale</option><option value="ess">ESS / Impact</option></select></div>
-<div><label>Type d aide</label><select id="sub-filtre-type" onchange="filtrerSubventions()"><option value="">Tous</option><option value="subvention">Subvention directe</option><option value="credit_impot">Credit d impot</option><option value="exoneration">Exoneration</option><option value="pret">Pret / Avance</option><option value="garantie">Garantie</option><option value="accompagnement">Accompagnement</option></select></div>
-<div><label>Taille entreprise</label><select id="sub-filtre-taille" onchange="filtrerSubventions()"><option value="">Toutes</option><option value="tpe">TPE (< 10 sal.)</option><option value="pme">PME (< 250 sal.)</option><option value="eti">ETI (250-4999)</option><option value="ge">GE (5000+)</option></select></div>
-</div>
-</div>
-
-<div id="sub-liste"></div>
-
-<div class="card" id="sub-recapitulatif" style="display:none">
-<h2>Recapitulatif des aides eligibles</h2>
-<div style="overflow-x:auto"><table id="sub-recap-table">
-<tr><th>Aide</th><th>Niveau</th><th>Type</th><th>Montant max</th><th>Organisme</th><th>Eligibilite</th></tr>
-</table></div>
-<div class="btn-group" style="margin-top:14px;justify-content:flex-end"><button class="btn btn-s btn-sm" onclick="exportSubventions()">&#128190; Exporter CSV</button><button class="btn btn-blue btn-sm" onclick="imprimerSubventions()">&#128424; Imprimer</button></div>
-</div>
-</div>
-</div>
-
-<!-- ===== VEILLE ===== -->
-<div class="sec" id="s-veille">
-<div class="card">
-<h2>Veille juridique</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Baremes et legislation 2020-2026. Historique 6 ans.</p>
-<div class="g3"><div><label>Annee</label><select id="v-annee" onchange="loadVeille()"><option value="2020">2020</option><option value="2021">2021</option><option value="2022">2022</option><option value="2023">2023</option><option value="2024">2024</option><option value="2025">2025</option><option value="2026" selected>2026</option></select></div><div><button class="btn btn-blue btn-f" onclick="loadVeille()" style="margin-top:22px">Charger</button></div><div><button class="btn btn-s btn-f" onclick="compAnnees()" style="margin-top:22px">Comparer N-1</button></div></div>
-</div>
-<div id="v-res" style="display:none">
-<div class="card"><h2>Baremes URSSAF</h2><div class="btn-group" style="justify-content:flex-end"><button class="btn btn-s btn-sm" onclick="exportSection('veille')">&#128190; Export</button></div><div id="v-baremes"></div></div>
-<div class="card"><h2>Legislation</h2><div id="v-legis"></div></div>
-<div class="card" id="v-comp-card" style="display:none"><h2>Comparaison</h2><div id="v-comp"></div></div>
-</div>
-</div>
-
-<!-- ===== PORTEFEUILLE ===== -->
-<div class="sec" id="s-portefeuille">
-<div style="display:flex;gap:8px;margin-bottom:16px;flex-wrap:wrap">
-<button class="tab active" onclick="showPortTab('employeur',this)">&#127970; Compte Employeur</button>
-<button class="tab" onclick="showPortTab('ti',this)">&#128188; Compte T.I.</button>
-<button class="tab" onclick="showPortTab('vue',this)">&#128202; Vue d'ensemble</button>
-</div>
-
-<!-- Onglet Employeur -->
-<div class="port-panel" id="port-employeur">
-<div class="g2">
-<div class="card">
-<h2>&#127970; Ajouter une entreprise (Employeur)</h2>
-<label>SIRET</label><input id="ent-siret" placeholder="12345678901234" maxlength="14">
-<label>Raison sociale</label><input id="ent-raison" placeholder="Nom">
-<div class="g2"><div><label>Forme</label><select id="ent-forme"><option value="">--</option><option>SAS</option><option>SARL</option><option>SA</option><option>EURL</option><option>EI</option><option>SASU</option><option>SCI</option><option>SNC</option><option>Association</option></select></div><div><label>NAF</label><input id="ent-naf" placeholder="6201Z"></div></div>
-<div class="g2"><div><label>Effectif</label><input type="number" id="ent-eff" value="0"></div><div><label>Ville</label><input id="ent-ville" placeholder="Paris"></div></div>
-<button class="btn btn-p btn-f" onclick="ajouterEnt()">Ajouter l'entreprise</button>
-</div>
-<div class="card"><h2>Entreprises (Employeur)</h2><input id="ent-search" placeholder="Rechercher..." oninput="rechEnt()"><div id="ent-list"></div></div>
-</div>
-</div>
-
-<!-- Onglet Travailleur Independant -->
-<div class="port-panel" id="port-ti" style="display:none">
-<div class="g2">
-<div class="card">
-<h2>&#128188; Ajouter un compte T.I.</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:12px">Gerant majoritaire, micro-entrepreneur, profession liberale, artisan, commercant... Ajoutez votre profil independant pour gerer vos cotisations personnelles.</p>
-<label>Statut</label><select id="ti-statut">
-<option value="gerant_majoritaire">Gerant majoritaire (SARL/EURL)</option>
-<option value="micro_entrepreneur">Micro-entrepreneur</option>
-<option value="profession_liberale">Profession liberale</option>
-<option value="entreprise_individuelle_ir">EI classique (IR)</option>
-<option value="entreprise_individuelle_is">EI a l'IS</option>
-<option value="artisan">Artisan</option>
-<option value="commercant">Commercant</option>
-</select>
-<div class="g2"><div><label>SIRET personnel</label><input id="ti-siret" placeholder="12345678901234" maxlength="14"></div><div><label>NAF</label><input id="ti-naf" placeholder="6201Z"></div></div>
-<label>Activite</label><input id="ti-activite" placeholder="Ex: Conseil en gestion">
-<div class="g2"><div><label>Regime fiscal</label><select id="ti-regime"><option value="">--</option><option value="prestations_bnc">BNC (prestations)</option><option value="prestations_bic">BIC (prestations)</option><option value="vente_marchandises">BIC (vente)</option><option value="location_meublee">BIC (location meublee)</option><option value="is">IS (impot societes)</option></select></div><div><label>Caisse retraite</label><select id="ti-caisse"><option value="">--</option><option value="cipav">CIPAV</option><option value="ssi">SSI (ex-RSI)</option><option value="carpimko">CARPIMKO</option><option value="carcdsf">CARCDSF</option><option value="cnbf">CNBF</option><option value="cavec">CAVEC</option><option value="carmf">CARMF</option><option value="autre">Autre</option></select></div></div>
-<div class="g3"><div><label>ACRE</label><select id="ti-acre"><option value="false">Non</option><option value="true">Oui</option></select></div><div><label>Option IS</label><select id="ti-is"><option value="false">Non</option><option value="true">Oui</option></select></div><div><label>Franchise TVA</label><select id="ti-tva"><option value="true">Oui</option><option value="false">Non</option></select></div></div>
-<div class="g3"><div><label>Annee creation</label><input type="number" id="ti-annee" placeholder="2020" min="1950" max="2030"></div><div><label>CA annuel (EUR)</label><input type="number" id="ti-ca" value="0" step="100"></div><div><label>Benefice (EUR)</label><input type="number" id="ti-benefice" value="0" step="100"></div></div>
-<label>Remuneration nette (EUR/an)</label><input type="number" id="ti-remun" value="0" step="100">
-<button class="btn btn-blue btn-f" onclick="ajouterTI()">Ajouter le profil T.I.</button>
-</div>
-<div class="card"><h2>Profils T.I.</h2><input id="ti-search" placeholder="Rechercher..." oninput="rechTI()"><div id="ti-list"></div></div>
-</div>
-</div>
-
-<!-- Vue d'ensemble -->
-<div class="port-panel" id="port-vue" style="display:none">
-<div class="card">
-<h2>&#128202; Vue d'ensemble du portefeuille</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:12px">Synthese de vos comptes Employeur et Travailleur Independant.</p>
-<div class="g3" id="port-stats" style="margin-bottom:16px">
-<div class="card" style="background:var(--bg2);text-align:center;padding:16px"><div style="font-size:2em;font-weight:700" id="port-nb-emp">-</div><div style="font-size:.82em;color:var(--tx2)">Entreprises (Employeur)</div></div>
-<div class="card" style="background:var(--bg2);text-align:center;padding:16px"><div style="font-size:2em;font-weight:700" id="port-nb-ti">-</div><div style="font-size:.82em;color:var(--tx2)">Profils T.I.</div></div>
-<div class="card" style="background:var(--bg2);text-align:center;padding:16px"><div style="font-size:2em;font-weight:700" id="port-nb-total">-</div><div style="font-size:.82em;color:var(--tx2)">Total comptes</div></div>
-</div>
-<h3 style="margin-top:16px">Comptes Employeur</h3>
-<div id="port-vue-emp"></div>
-<h3 style="margin-top:16px">Comptes T.I.</h3>
-<div id="port-vue-ti"></div>
-</div>
-</div>
-</div>
-
-<!-- ===== EQUIPE ===== -->
-<div class="sec" id="s-equipe">
-<div class="g2">
-<div class="card">
-<h2>Inviter un collaborateur</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Ajoutez un acces a votre dossier. Le collaborateur recevra un lien pour creer son mot de passe.</p>
-<label>Email du collaborateur</label><input type="email" id="inv-email" placeholder="collaborateur@exemple.fr">
-<label>Role</label><select id="inv-role"><option value="collaborateur">Collaborateur (lecture + analyse)</option><option value="comptable">Comptable (lecture + ecriture)</option><option value="decisionnaire">Decisionnaire (tous droits + validation)</option></select>
-<button class="btn btn-blue btn-f" onclick="inviterCollab()">Envoyer l'invitation</button>
-<div id="inv-res" style="margin-top:10px"></div>
-</div>
-<div class="card">
-<h2>Equipe et tracabilite</h2>
-<div class="btn-group"><button class="btn btn-s btn-sm" onclick="loadEquipe()">&#8635; Actualiser</button></div>
-<div id="equipe-list"></div>
-<h3 style="margin-top:16px;font-size:.95em">Journal d'audit</h3>
-<div id="audit-log" style="margin-top:8px"></div>
-</div>
-</div>
-</div>
-
-<!-- ===== RESSOURCES HUMAINES ===== -->
-<div class="sec" id="s-rh">
-<div class="tabs" id="rh-tabs">
-<div class="tab active" onclick="showRHTab('salaries',this)">Salaries</div>
-<div class="tab" onclick="showRHTab('contrats',this)">Contrats</div>
-<div class="tab" onclick="showRHTab('bulletins',this)">Bulletins</div>
-<div class="tab" onclick="showRHTab('conges',this)">Conges</div>
-<div class="tab" onclick="showRHTab('planning',this)">Planning</div>
-<div class="tab" onclick="showRHTab('arrets',this)">Arrets</div>
-<div class="tab" onclick="showRHTab('entretiens',this)">Entretiens</div>
-<div class="tab" onclick="showRHTab('visites',this)">Visites med.</div>
-<div class="tab" onclick="showRHTab('attestations',this)">Attestations</div>
-<div class="tab" onclick="showRHTab('echanges',this)">Echanges</div>
-<div class="tab" onclick="showRHTab('sanctions',this)">Sanctions</div>
-<div class="tab" onclick="showRHTab('alertes',this)">Alertes</div>
-</div>
-<div class="card">
-<div class="tc active" id="rh-salaries">
-<h2>Liste des salaries</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:12px">Les salaries sont detectes automatiquement lors de l analyse de documents (bulletins, DSN, contrats). Vous pouvez aussi les ajouter manuellement via l onglet Contrats.</p>
-<div class="btn-group" style="margin-bottom:12px"><button class="btn btn-s btn-sm" onclick="detecterDoublons()">&#128269; Detecter les doublons</button></div>
-<div id="rh-doublons-alert" style="display:none"></div>
-<div id="rh-sal-list"><p style="color:var(--tx2)">Aucun salarie.</p></div>
-</div>
-<div class="tc" id="rh-contrats">
-<h2>Gestion des contrats de travail</h2>
-<div class="g2"><div>
-<label>Type de contrat</label><select id="rh-type-ctr"><option value="CDI">CDI</option><option value="CDD">CDD</option><option value="CTT">CTT (Interim)</option><option value="Apprentissage">Apprentissage</option><option value="Professionnalisation">Professionnalisation</option><option value="Saisonnier">Saisonnier</option><option value="Intermittent">Intermittent</option></select>
-<label>Nom</label><input id="rh-ctr-nom" placeholder="NOM">
-<label>Prenom</label><input id="rh-ctr-prenom" placeholder="Prenom">
-<label>NIR (N de securite sociale)</label><input id="rh-ctr-nir" placeholder="1 85 05 78 006 084 36" maxlength="21">
-<label>Poste</label><input id="rh-ctr-poste" placeholder="Intitule du poste">
-<label>Date debut</label><input type="date" id="rh-ctr-debut">
-<label>Date fin (CDD)</label><input type="date" id="rh-ctr-fin">
-</div><div>
-<label>Salaire brut mensuel</label><input type="number" step="0.01" id="rh-ctr-salaire" placeholder="0.00">
-<label>Temps de travail</label><select id="rh-ctr-temps"><option value="complet">Temps complet</option><option value="partiel">Temps partiel</option></select>
-<label>Duree hebdomadaire (h)</label><input type="number" step="0.5" id="rh-ctr-heures" value="35">
-<label>Convention collective</label><input id="rh-ctr-ccn" placeholder="IDCC ou intitule">
-<label>Periode essai (jours)</label><input type="number" id="rh-ctr-essai" value="60">
-<label>Motif CDD</label><input id="rh-ctr-motif" placeholder="Remplacement, surcroit...">
-</div></div>
-<button class="btn btn-blue btn-f" onclick="creerContrat()">Generer le contrat</button>
-<div id="rh-ctr-res" style="margin-top:12px"></div>
-<h3 style="margin-top:20px">Contrats enregistres</h3>
-<div id="rh-ctr-list" style="margin-top:8px"><p style="color:var(--tx2)">Aucun contrat.</p></div>
-<h3 style="margin-top:20px">Avenants</h3>
-<div class="g3"><div><label>ID Contrat</label><input id="rh-av-ctr" placeholder="ID du contrat"></div>
-<div><label>Type</label><select id="rh-av-type"><option value="remuneration">Remuneration</option><option value="poste">Changement de poste</option><option value="temps_travail">Temps de travail</option><option value="lieu">Lieu de travail</option><option value="autre">Autre</option></select></div>
-<div><label>Date effet</label><input type="date" id="rh-av-date"></div></div>
-<label>Nouvelles conditions</label><textarea id="rh-av-desc" rows="2" placeholder="Description des modifications"></textarea>
-<button class="btn btn-s btn-f" onclick="creerAvenant()">Enregistrer l avenant</button>
-<div id="rh-av-list" style="margin-top:8px"></div>
-</div>
-<div class="tc" id="rh-conges">
-<h2>Gestion des conges et absences</h2>
-<div class="g3"><div><label>Salarie (nom)</label><input id="rh-cg-sal" placeholder="Nom du salarie"></div>
-<div><label>Type</label><select id="rh-cg-type"><option value="cp">Conges payes</option><option value="rtt">RTT</option><option value="maladie">Maladie</option><option value="maternite">Maternite</option><option value="paternite">Paternite</option><option value="sans_solde">Sans solde</option><option value="familial">Evenement familial</option><option value="formation">Formation</option></select></div>
-<div><label>Nb jours</label><input type="number" id="rh-cg-jours" value="1"></div></div>
-<div class="g3"><div><label>Date debut</label><input type="date" id="rh-cg-dd"></div>
-<div><label>Date fin</label><input type="date" id="rh-cg-df"></div>
-<div><label>Statut</label><select id="rh-cg-stat"><option value="demande">Demande</option><option value="valide">Valide</option><option value="refuse">Refuse</option></select></div></div>
-<button class="btn btn-blue btn-f" onclick="enregConge()">Enregistrer</button>
-<div id="rh-cg-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-arrets">
-<h2>Arrets de travail</h2>
-<div class="g3"><div><label>Salarie</label><input id="rh-ar-sal" placeholder="Nom"></div>
-<div><label>Type</label><select id="rh-ar-type"><option value="maladie">Maladie</option><option value="accident_travail">Accident du travail</option><option value="maladie_pro">Maladie professionnelle</option><option value="mi_temps_therapeutique">Mi-temps therapeutique</option></select></div>
-<div><label>Subrogation</label><select id="rh-ar-sub"><option value="true">Oui</option><option value="false">Non</option></select></div></div>
-<div class="g3"><div><label>Date debut</label><input type="date" id="rh-ar-dd"></div>
-<div><label>Date fin</label><input type="date" id="rh-ar-df"></div>
-<div><label>Prolongation</label><select id="rh-ar-prol"><option value="false">Non</option><option value="true">Oui</option></select></div></div>
-<button class="btn btn-blue btn-f" onclick="enregArret()">Enregistrer</button>
-<div id="rh-ar-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-sanctions">
-<h2>Procedures disciplinaires</h2>
-<div class="g3"><div><label>Salarie</label><input id="rh-sa-sal" placeholder="Nom"></div>
-<div><label>Type</label><select id="rh-sa-type"><option value="avertissement">Avertissement</option><option value="blame">Blame</option><option value="mise_a_pied">Mise a pied</option><option value="retrogradation">Retrogradation</option><option value="licenciement">Licenciement</option></select></div>
-<div><label>Date sanction</label><input type="date" id="rh-sa-date"></div></div>
-<label>Motif</label><input id="rh-sa-motif" placeholder="Motif de la sanction">
-<label>Description</label><textarea id="rh-sa-desc" rows="2" placeholder="Details"></textarea>
-<label>Date entretien prealable</label><input type="date" id="rh-sa-epr">
-<button class="btn btn-blue btn-f" onclick="enregSanction()">Enregistrer</button>
-<div id="rh-sa-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-entretiens">
-<h2>Entretiens professionnels</h2>
-<div class="g3"><div><label>Salarie</label><input id="rh-en-sal" placeholder="Nom"></div>
-<div><label>Type</label><select id="rh-en-type"><option value="professionnel_2ans">Professionnel (2 ans)</option><option value="bilan_6ans">Bilan (6 ans)</option><option value="annuel">Annuel</option><option value="fin_periode_essai">Fin periode essai</option></select></div>
-<div><label>Date</label><input type="date" id="rh-en-date"></div></div>
-<label>Compte-rendu</label><textarea id="rh-en-cr" rows="3" placeholder="Notes de l entretien"></textarea>
-<label>Date prochain entretien</label><input type="date" id="rh-en-next">
-<button class="btn btn-blue btn-f" onclick="enregEntretien()">Enregistrer</button>
-<div id="rh-en-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-visites">
-<h2>Visites medicales</h2>
-<div class="g3"><div><label>Salarie</label><input id="rh-vm-sal" placeholder="Nom"></div>
-<div><label>Type</label><select id="rh-vm-type"><option value="embauche">Visite embauche (VIP)</option><option value="periodique">Periodique</option><option value="reprise">Reprise</option><option value="pre_reprise">Pre-reprise</option><option value="demande">A la demande</option></select></div>
-<div><label>Date</label><input type="date" id="rh-vm-date"></div></div>
-<div class="g3"><div><label>Resultat</label><select id="rh-vm-res"><option value="apte">Apte</option><option value="inapte">Inapte</option><option value="amenagement">Amenagement</option></select></div>
-<div><label>Remarques</label><input id="rh-vm-rem" placeholder="Observations"></div>
-<div><label>Prochaine visite</label><input type="date" id="rh-vm-next"></div></div>
-<button class="btn btn-blue btn-f" onclick="enregVisite()">Enregistrer</button>
-<div id="rh-vm-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-attestations">
-<h2>Generation d attestations</h2>
-<div class="g3"><div><label>Salarie</label><input id="rh-at-sal" placeholder="Nom"></div>
-<div><label>Type</label><select id="rh-at-type"><option value="travail">Attestation de travail</option><option value="employeur">Attestation employeur</option><option value="salaire">Attestation de salaire</option><option value="pole_emploi">Attestation Pole Emploi</option><option value="mutuelle">Attestation mutuelle</option><option value="stage">Attestation de stage</option></select></div>
-<div><button class="btn btn-blue btn-f" onclick="genererAttestation()" style="margin-top:22px">Generer</button></div></div>
-<div id="rh-at-res" style="margin-top:12px"></div>
-<div id="rh-at-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-planning">
-<h2>Planning</h2>
-
-<div style="display:flex;gap:6px;margin-bottom:14px;flex-wrap:wrap;align-items:center">
-<button class="btn btn-sm" id="pl-v-jour" onclick="setPlanningView('jour')" style="border:2px solid transparent">Jour</button>
-<button class="btn btn-sm" id="pl-v-semaine" onclick="setPlanningView('semaine')" style="border:2px solid var(--p2);background:var(--p2);color:#fff">Semaine</button>
-<button class="btn btn-sm" id="pl-v-mois" onclick="setPlanningView('mois')" style="border:2px solid transparent">Mois</button>
-<button class="btn btn-sm" id="pl-v-annee" onclick="setPlanningView('annee')" style="border:2px solid transparent">Annee</button>
-<span style="flex:1"></span>
-<button class="btn btn-sm btn-green" onclick="integrerSalaries()" title="Reporter automatiquement les salaries detectes dans le planning">&#128101; Integrer salaries</button>
-</div>
-
-<div class="g3" style="margin-bottom:12px">
-<div><label>Date</label><input type="date" id="rh-pl-sem" onchange="renderPlanningView()"></div>
-<div><label>Filtre salarie</label><input id="rh-pl-filter" placeholder="Tous" oninput="renderPlanningView()"></div>
-<div><label>Filtre statut</label><select id="rh-pl-statut-filter" onchange="renderPlanningView()"><option value="">Tous</option><option value="present">Present</option><option value="conge_cp">Conge CP</option><option value="conge_maladie">Arret maladie</option><option value="arret_accident_travail">Accident travail</option><option value="formation">Formation</option><option value="teletravail">Teletravail</option></select></div>
-</div>
-
-<div style="display:flex;gap:8px;margin-bottom:10px;align-items:center">
-<button class="btn btn-sm" onclick="planningNav(-1)">&#9664; Precedent</button>
-<span id="rh-pl-period-label" style="font-weight:600;font-size:.95em;min-width:180px;text-align:center"></span>
-<button class="btn btn-sm" onclick="planningNav(1)">Suivant &#9654;</button>
-<button class="btn btn-sm" onclick="planningGoToday()" style="margin-left:8px">Aujourd hui</button>
-</div>
-
-<div id="rh-pl-calendar" style="overflow-x:auto;margin-bottom:16px;border:1px solid var(--brd);border-radius:8px;min-height:100px"></div>
-
-<div id="rh-pl-legend" style="margin-bottom:16px;display:flex;gap:12px;flex-wrap:wrap;font-size:.8em">
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#3b82f6;display:inline-block"></span>Normal</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#f59e0b;display:inline-block"></span>Astreinte</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#6366f1;display:inline-block"></span>Nuit</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#ef4444;display:inline-block"></span>Dimanche/Ferie</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#22c55e;display:inline-block"></span>Present</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#f97316;display:inline-block"></span>Conge</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#e11d48;display:inline-block"></span>Arret maladie</span>
-<span style="display:inline-flex;align-items:center;gap:4px"><span style="width:14px;height:14px;border-radius:3px;background:#8b5cf6;display:inline-block"></span>Teletravail</span>
-</div>
-
-<div id="rh-pl-stats" style="display:flex;gap:12px;flex-wrap:wrap;margin-bottom:18px"></div>
-
-<details style="margin-bottom:12px">
-<summary style="cursor:pointer;font-weight:600;color:var(--p2)">&#10010; Ajouter un creneau manuellement</summary>
-<div style="margin-top:10px">
-<div class="g3"><div><label>Salarie</label><input id="rh-pl-sal" placeholder="Nom ou ID"></div>
-<div><label>Date debut</label><input type="date" id="rh-pl-date"></div>
-<div><label>Date fin (optionnel, pour une periode)</label><input type="date" id="rh-pl-date-fin"></div></div>
-<div class="g3"><div><label>Type</label><select id="rh-pl-type"><option value="normal">Normal</option><option value="astreinte">Astreinte</option><option value="nuit">Nuit</option><option value="dimanche">Dimanche</option><option value="ferie">Jour ferie</option></select></div>
-<div><label>Statut</label><select id="rh-pl-statut"><option value="">Automatique</option><option value="present">Present</option><option value="conge_cp">Conge CP</option><option value="conge_maladie">Arret maladie</option><option value="arret_accident_travail">Accident travail</option><option value="formation">Formation</option><option value="teletravail">Teletravail</option></select></div>
-<div><label>Jours a planifier</label><select id="rh-pl-jours"><option value="1,2,3,4,5">Lun-Ven</option><option value="1,2,3,4,5,6">Lun-Sam</option><option value="1,2,3,4,5,6,7">Tous les jours</option></select></div></div>
-<div class="g3"><div><label>Heure debut</label><input type="time" id="rh-pl-hd" value="09:00"></div>
-<div><label>Heure fin</label><input type="time" id="rh-pl-hf" value="17:00"></div>
-<div><button class="btn btn-blue btn-f" onclick="ajouterPlanning()" style="margin-top:22px">Ajouter</button></div></div>
-</div>
-</details>
-
-<details id="rh-pl-integrer-section" style="margin-bottom:12px">
-<summary style="cursor:pointer;font-weight:600;color:var(--p2)">&#128101; Integration automatique des salaries</summary>
-<div style="margin-top:10px">
-<div class="al info"><span class="ai">&#128161;</span><span>Cette fonction reporte automatiquement tous les salaries detectes dans vos documents et contrats dans le planning sur la periode choisie.</span></div>
-<div class="g3"><div><label>Date debut</label><input type="date" id="rh-pl-int-debut"></div>
-<div><label>Date fin</label><input type="date" id="rh-pl-int-fin"></div>
-<div><label>Jours</label><select id="rh-pl-int-jours"><option value="1,2,3,4,5">Lun-Ven</option><option value="1,2,3,4,5,6">Lun-Sam</option><option value="1,2,3,4,5,6,7">Tous les jours</option></select></div></div>
-<div class="g3"><div><label>Heure debut</label><input type="time" id="rh-pl-int-hd" value="09:00"></div>
-<div><label>Heure fin</label><input type="time" id="rh-pl-int-hf" value="17:00"></div>
-<div><button class="btn btn-blue btn-f" onclick="integrerSalariesManuel()" style="margin-top:22px">Integrer</button></div></div>
-<div id="rh-pl-int-result" style="margin-top:8px"></div>
-</div>
-</details>
-
-<div id="rh-pl-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-echanges">
-<h2>Suivi des echanges salaries</h2>
-<div class="g3"><div><label>Salarie</label><input id="rh-ec-sal" placeholder="Nom"></div>
-<div><label>Type</label><select id="rh-ec-type"><option value="email">Email</option><option value="courrier">Courrier</option><option value="reunion">Reunion</option><option value="entretien">Entretien</option></select></div>
-<div><label>Date</label><input type="date" id="rh-ec-date"></div></div>
-<label>Objet</label><input id="rh-ec-obj" placeholder="Objet de l echange">
-<label>Contenu</label><textarea id="rh-ec-txt" rows="3" placeholder="Details"></textarea>
-<button class="btn btn-blue btn-f" onclick="enregEchange()">Enregistrer</button>
-<div id="rh-ec-list" style="margin-top:12px"></div>
-</div>
-<div class="tc" id="rh-alertes">
-<h2>Alertes et echeances RH</h2>
-<div class="al info"><span class="ai">&#128161;</span><span>Les alertes sont calculees automatiquement selon les donnees RH, les obligations legales et vos alertes personnalisees. Cliquez sur une alerte pour voir les details.</span></div>
-
-<div class="tabs" style="margin:14px 0 8px">
-<div class="tab active" onclick="showAlTab('auto',this)">Alertes automatiques</div>
-<div class="tab" onclick="showAlTab('libres',this)">Mes alertes personnalisees</div>
-<div class="tab" onclick="showAlTab('creer',this)">+ Creer une alerte</div>
-</div>
-
-<div class="al-panel active" id="al-auto">
-<div style="display:flex;gap:8px;flex-wrap:wrap;margin-bottom:12px">
-<button class="btn btn-s btn-sm" onclick="filtrerAlertesUrgence('')">Toutes</button>
-<button class="btn btn-sm" style="background:var(--rl);color:var(--r)" onclick="filtrerAlertesUrgence('haute')">Haute</button>
-<button class="btn btn-sm" style="background:var(--ol);color:#92400e" onclick="filtrerAlertesUrgence('moyenne')">Moyenne</button>
-<button class="btn btn-sm" style="background:var(--pl);color:var(--p2)" onclick="filtrerAlertesUrgence('info')">Info</button>
-<span style="flex:1"></span>
-<button class="btn btn-s btn-sm" onclick="exportAlertes()">&#128190; Export CSV</button>
-</div>
-<div id="rh-alertes-list"></div>
-</div>
-
-<div class="al-panel" id="al-libres" style="display:none">
-<div id="rh-alertes-libres-list"><p style="color:var(--tx2)">Aucune alerte personnalisee configuree.</p></div>
-</div>
-
-<div class="al-panel" id="al-creer" style="display:none">
-<h2 style="margin-bottom:14px">Creer une alerte personnalisee</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Configurez une alerte libre avec vos propres criteres : echeance, recurrence, niveau d urgence, etc.</p>
-<div class="g2">
-<div><label>Titre de l alerte *</label><input id="al-titre" placeholder="Ex: Renouvellement bail commercial"></div>
-<div><label>Categorie</label><select id="al-categorie"><option value="rh">Ressources humaines</option><option value="fiscal">Fiscal / Comptable</option><option value="social">Social / URSSAF</option><option value="juridique">Juridique / Contrats</option><option value="securite">Securite / Prevention</option><option value="commercial">Commercial / Clients</option><option value="administratif">Administratif</option><option value="autre">Autre</option></select></div>
-</div>
-<div><label>Description detaillee</label><textarea id="al-desc" rows="3" placeholder="Decrivez le contexte et l'objet de cette alerte..."></textarea></div>
-<div class="g3">
-<div><label>Urgence</label><select id="al-urgence"><option value="info">Information</option><option value="moyenne" selected>Moyenne</option><option value="haute">Haute (critique)</option></select></div>
-<div><label>Date d echeance</label><input type="date" id="al-echeance"></div>
-<div><label>Recurrence</label><select id="al-recurrence"><option value="">Aucune (ponctuelle)</option><option value="quotidien">Quotidienne</option><option value="hebdomadaire">Hebdomadaire</option><option value="mensuel">Mensuelle</option><option value="trimestriel">Trimestrielle</option><option value="semestriel">Semestrielle</option><option value="annuel">Annuelle</option></select></div>
-</div>
-<div class="g2">
-<div><label>Action requise</label><input id="al-action" placeholder="Ex: Envoyer le courrier recommande avant la date limite"></div>
-<div><label>Destinataire / Responsable</label><input id="al-destinataire" placeholder="Ex: Responsable RH, DAF, Gerant..."></div>
-</div>
-<div class="g2">
-<div><label>Reference legale (optionnel)</label><input id="al-ref" placeholder="Ex: Art. L.1234-5 CT"></div>
-<div><label>Delai de rappel (jours avant echeance)</label><input type="number" id="al-delai" value="7" min="1" max="365"></div>
-</div>
-<div><label>Notes complementaires</label><textarea id="al-notes" rows="2" placeholder="Notes internes..."></textarea></div>
-<div class="btn-group" style="margin-top:14px"><button class="btn btn-blue btn-f" onclick="creerAlerteLibre()">Creer l alerte</button></div>
-<div id="al-creer-res" style="margin-top:10px"></div>
-</div>
-
-</div>
-<div class="tc" id="rh-bulletins">
-<h2>Generation de bulletins de paie</h2>
-<div class="al info" style="margin-bottom:12px"><span class="ai">&#128161;</span><span>Renseignez l ID contrat <strong>ou</strong> saisissez directement le nom et salaire. Le bulletin inclut la verification SMIC et convention collective.</span></div>
-<div class="g2"><div>
-<label>Contrat (ID) <small style="color:var(--tx2)">- auto-remplit les champs</small></label><input id="rh-bp-ctr" placeholder="ID du contrat" oninput="prefillBulletin(this.value)">
-<label>Nom</label><input id="rh-bp-nom" placeholder="NOM">
-<label>Prenom</label><input id="rh-bp-prenom" placeholder="Prenom">
-<label>Mois (YYYY-MM)</label><input id="rh-bp-mois" placeholder="2026-01">
-<label>Salaire brut mensuel (EUR)</label><input type="number" step="0.01" id="rh-bp-brut" placeholder="0.00">
-<label>Cadre</label><select id="rh-bp-cadre"><option value="false">Non</option><option value="true">Oui</option></select>
-</div><div>
-<label>Heures travaillees /mois</label><input type="number" step="0.01" id="rh-bp-heures" value="151.67">
-<label>Heures supplementaires</label><input type="number" step="0.5" id="rh-bp-hs" value="0">
-<label>Primes (EUR)</label><input type="number" step="0.01" id="rh-bp-primes" value="0">
-<label>Avantages en nature (EUR)</label><input type="number" step="0.01" id="rh-bp-avantages" value="0">
-<label>Jours absence</label><input type="number" step="0.5" id="rh-bp-abs" value="0">
-</div></div>
-<button class="btn btn-blue btn-f" onclick="genererBulletin()">Generer le bulletin</button>
-<div id="rh-bp-res" style="margin-top:12px"></div>
-<h3 style="margin-top:20px">Bulletins generes</h3>
-<div id="rh-bp-list" style="margin-top:8px"><p style="color:var(--tx2)">Aucun bulletin.</p></div>
-</div>
-</div>
-</div>
-
-<!-- ===== CONFIGURATION ===== -->
-<div class="sec" id="s-config">
-<div class="card">
-<h2>En-tete des documents</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Configurez les informations qui apparaitront sur tous les documents generes (contrats, attestations, rapports, etc.)</p>
-<div class="g2"><div>
-<label>Nom de l entreprise</label><input id="cfg-nom" placeholder="Raison sociale">
-<label>Adresse</label><input id="cfg-adresse" placeholder="Adresse complete">
-<label>Telephone</label><input id="cfg-tel" placeholder="01 23 45 67 89">
-<label>Email</label><input type="email" id="cfg-email" placeholder="contact@entreprise.fr">
-</div><div>
-<label>SIRET</label><input id="cfg-siret" placeholder="123 456 789 00012">
-<label>Code NAF</label><input id="cfg-naf" placeholder="7022Z">
-<label>Forme juridique</label><input id="cfg-forme" placeholder="SARL, SAS, etc.">
-<label>Capital social</label><input id="cfg-capital" placeholder="10 000 EUR">
-</div></div>
-<div class="g3"><div><label>RCS</label><input id="cfg-rcs" placeholder="RCS Paris B 123 456 789"></div>
-<div><label>TVA intracommunautaire</label><input id="cfg-tva" placeholder="FR12345678901"></div>
-<div><label>Logo URL</label><input id="cfg-logo" placeholder="https://..."></div></div>
-<button class="btn btn-blue btn-f" onclick="sauverEntete()">Sauvegarder</button>
-<div id="cfg-res" style="margin-top:10px"></div>
-</div>
-<div class="card">
-<h2>Comptes URSSAF par etablissement</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Gerez les comptes URSSAF distincts pour chaque etablissement de l entreprise.</p>
-<div class="g3"><div><label>SIRET etablissement</label><input id="urssaf-siret" placeholder="123 456 789 00012"></div>
-<div><label>N compte URSSAF</label><input id="urssaf-compte" placeholder="527000000012345678"></div>
-<div><label>Caisse</label><input id="urssaf-caisse" placeholder="URSSAF Ile-de-France"></div></div>
-<label>Taux AT/MP (%)</label><input type="number" step="0.01" id="urssaf-at" placeholder="2.08">
-<button class="btn btn-blue btn-f" onclick="ajouterCompteURSSAF()">Ajouter</button>
-<div id="urssaf-list" style="margin-top:12px"></div>
-</div>
-<div class="card">
-<h2>Personnalisation des alertes automatiques</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Activez/desactivez les types d alertes automatiques, personnalisez les delais de notification et ajoutez des messages. Pour creer des alertes libres, utilisez l onglet <strong>Alertes</strong> dans <strong>Ressources humaines</strong>.</p>
-<div id="cfg-alertes-list" style="margin-top:8px"></div>
-<div class="g3" style="margin-top:12px"><div><label>Type d alerte</label><select id="cfg-al-type">
-<optgroup label="Echeances salaries">
-<option value="dpae_a_effectuer">DPAE embauche</option>
-<option value="fin_cdd">Fin de contrat CDD</option>
-<option value="fin_periode_essai">Fin periode essai</option>
-<option value="vip_embauche">Visite embauche (VIP)</option>
-<option value="visite_medicale_retard">Visite medicale retard</option>
-<option value="visite_medicale_a_planifier">Visite medicale a planifier</option>
-<option value="entretien_professionnel_retard">Entretien professionnel retard</option>
-<option value="entretien_professionnel_manquant">Entretien professionnel manquant</option>
-<option value="entretien_retour_absence">Entretien retour absence</option>
-<option value="retour_arret_imminent">Retour arret imminent</option>
-<option value="retour_conge">Retour conge</option>
-<option value="medaille_travail">Medaille du travail</option>
-<option value="purge_sanction">Purge sanction disciplinaire</option>
-</optgroup>
-<optgroup label="Obligations employeur">
-<option value="prevoyance_obligatoire">Prevoyance cadres</option>
-<option value="mutuelle_obligatoire">Mutuelle obligatoire</option>
-<option value="duerp_obligatoire">DUERP</option>
-<option value="registre_personnel">Registre du personnel</option>
-<option value="affichages_obligatoires">Affichages obligatoires</option>
-<option value="referent_securite">Referent securite</option>
-<option value="referent_harcelement">Referent harcelement</option>
-<option value="remboursement_transport">Frais transport 50%</option>
-<option value="rgpd_conformite">Conformite RGPD</option>
-</optgroup>
-<optgroup label="Seuils effectif">
-<option value="cse_obligatoire">CSE (>=11 sal.)</option>
-<option value="oeth_handicap">OETH handicap (>=20 sal.)</option>
-<option value="participation_obligatoire">Participation (>=50 sal.)</option>
-<option value="reglement_interieur">Reglement interieur (>=50 sal.)</option>
-<option value="index_egalite_pro">Index egalite pro (>=50 sal.)</option>
-<option value="nao">NAO (>=50 sal.)</option>
-<option value="bdese">BDESE (>=50 sal.)</option>
-<option value="plan_mobilite">Plan mobilite (>=50 sal.)</option>
-<option value="forfait_social">Forfait social (>=50 sal.)</option>
-<option value="participation_construction">Participation construction (>=50 sal.)</option>
-<option value="bilan_social">Bilan social (>=300 sal.)</option>
-</optgroup>
-<optgroup label="Declarations et echeances fiscales">
-<option value="declaration_dsn_mensuelle">DSN mensuelle</option>
-<option value="dsn_annuelle">DSN annuelle (bilan)</option>
-<option value="das2_honoraires">DAS-2 Honoraires</option>
-<option value="contribution_formation">Contribution formation / TA</option>
-<option value="taxe_salaires">Taxe sur les salaires</option>
-<option value="echeance_fiscale">Echeances fiscales calendaires</option>
-<option value="versement_mobilite">Versement mobilite</option>
-<option value="agirc_arrco">Cotisations AGIRC-ARRCO</option>
-<option value="elections_cse_renouvellement">Renouvellement CSE</option>
-</optgroup>
-<optgroup label="Gestion courante">
-<option value="formation_professionnelle">Formation professionnelle</option>
-<option value="heures_supplementaires">Heures supplementaires</option>
-<option value="conges_payes">Conges payes</option>
-<option value="entretien_professionnel">Entretien professionnel bisannuel</option>
-</optgroup>
-</select></div>
-<div><label>Delai notification (jours)</label><input type="number" id="cfg-al-delai" value="30"></div>
-<div><label>Actif</label><select id="cfg-al-actif"><option value="true">Oui</option><option value="false">Non</option></select></div></div>
-<label>Message personnalise (optionnel)</label><input id="cfg-al-msg" placeholder="Message personnalise pour cette alerte">
-<button class="btn btn-blue btn-f" onclick="sauverAlertConfig()" style="margin-top:8px">Enregistrer la configuration</button>
-<div id="cfg-al-res" style="margin-top:8px"></div>
-</div>
-<div class="card">
-<h2>&#10010; Creer une alerte personnalisee</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Ajoutez une alerte avec un nom personnalise. Pour un parametrage complet (recurrence, destinataire, reference legale), utilisez l onglet <strong>RH > Alertes > Creer une alerte</strong>.</p>
-<div class="g3">
-<div><label>Nom de l alerte *</label><input id="cfg-al-libre-titre" placeholder="Ex: Renouvellement bail, Echeance certification..."></div>
-<div><label>Urgence</label><select id="cfg-al-libre-urgence"><option value="info">Info</option><option value="moyenne" selected>Moyenne</option><option value="haute">Haute</option></select></div>
-<div><label>Date d echeance</label><input type="date" id="cfg-al-libre-echeance"></div>
-</div>
-<div><label>Description (optionnel)</label><input id="cfg-al-libre-desc" placeholder="Description de l alerte..."></div>
-<button class="btn btn-blue btn-f" onclick="creerAlerteLibreDepuisConfig()" style="margin-top:8px">Creer l alerte</button>
-<div id="cfg-al-libre-res" style="margin-top:8px"></div>
-</div>
-<div class="card">
-<h2>&#128274; Signature electronique (eIDAS)</h2>
-<div class="al info" style="margin-bottom:14px"><span class="ai">&#9878;</span><span><strong>Reglement (UE) 910/2014 eIDAS</strong> : signez electroniquement vos documents avec un niveau de confiance <strong>SEA</strong> (Signature Electronique Avancee, art. 26) ou <strong>SEQ</strong> (Signature Electronique Qualifiee, art. 3.12 — equivalence manuscrite art. 25.2).</span></div>
-<details open><summary style="cursor:pointer;font-weight:600;margin-bottom:10px">&#9997; Signer un document</summary>
-<div class="g2">
-<div><label>Identifiant du document</label><input id="sig-docid" placeholder="Ex: CONTRAT-2026-001, ATT-0042..."></div>
-<div><label>Nom du document</label><input id="sig-docnom" placeholder="Ex: Contrat CDI Dupont Jean"></div>
-</div>
-<div class="g3" style="margin-top:8px">
-<div><label>Nom du signataire</label><input id="sig-nom" placeholder="Prenom Nom"></div>
-<div><label>Email du signataire</label><input type="email" id="sig-email" placeholder="signataire@entreprise.fr"></div>
-<div><label>Qualite / Fonction</label><input id="sig-qualite" placeholder="Ex: Gerant, DRH, Salarie..."></div>
-</div>
-<div class="g2" style="margin-top:8px">
-<div><label>Niveau de signature</label><select id="sig-niveau">
-<option value="sea">SEA - Signature Electronique Avancee (art. 26 eIDAS)</option>
-<option value="seq">SEQ - Signature Electronique Qualifiee (art. 25.2 eIDAS — equivalence manuscrite)</option>
-</select></div>
-<div><label>Motif de la signature</label><input id="sig-motif" placeholder="Ex: Approbation, Lu et approuve..."></div>
-</div>
-<button class="btn btn-blue btn-f" onclick="signerDocument()" style="margin-top:10px">&#128274; Signer le document</button>
-<div id="sig-res" style="margin-top:12px"></div>
-</details>
-<details style="margin-top:16px"><summary style="cursor:pointer;font-weight:600;margin-bottom:10px">&#128203; Signatures enregistrees</summary>
-<button class="btn btn-blue" onclick="loadSignatures()" style="margin-bottom:10px">Actualiser</button>
-<div id="sig-list"></div>
-</details>
-</div>
-<div class="card">
-<h2>&#128101; Journal d activite multi-utilisateurs</h2>
-<p style="color:var(--tx2);font-size:.86em;margin-bottom:14px">Tracabilite complete des actions par utilisateur au sein du compte. Chaque action est horodatee et associee a l email de l utilisateur connecte.</p>
-<button class="btn btn-blue" onclick="loadAuditLog()" style="margin-bottom:10px">Charger le journal</button>
-<div id="cfg-audit-log"></div>
-</div>
-</div>
-
-<!-- ===== DETAILS DES SCORES DE CONFORMITE ===== -->
-<div class="sec" id="s-score-details">
-<div class="card">
-<h2>Methodologie des scores de conformite NormaCheck v4.0</h2>
-<div class="al info"><span class="ai">&#9878;</span><span>Methodologie v4.0 : scoring <strong>proportionnel, objectivable, reproductible et non-discretionnaire</strong>. Chaque parametre est derive d une reference legale explicite. Aucun coefficient arbitraire n est utilise. Soumis a validation methodologique aupres des organismes de reference.</span></div>
-<button class="btn btn-s" onclick="showS('dashboard')" style="margin-top:12px">&#8592; Retour au dashboard</button>
-</div>
-
-<div class="card" style="border-left:4px solid var(--p3)">
-<h2 style="color:var(--p2)">1. Score URSSAF - Conformite sociale (CSS)</h2>
-<div style="background:var(--bg);border-radius:10px;padding:16px;margin:12px 0;font-family:'SF Mono','Consolas',monospace;font-size:.88em;line-height:1.8">
-<strong>Formule (v4.0) :</strong><br>
-S<sub>URSSAF</sub> = max(0, 100 &times; (1 - &Sigma;W<sub>k</sub> / W<sub>max</sub>)) &times; (0.5 + 0.5 &times; F<sub>c</sub>)<br><br>
-<strong>Poids de gravite W<sub>k</sub> (derives des sanctions legales) :</strong><br>
-&bull; Critique (W<sub>k</sub>=4) : manquement delibere, majoration 40% (CSS L243-7-7)<br>
-&bull; Haute (W<sub>k</sub>=3) : retard/omission significatif, majoration 10% (CSS L243-7-2)<br>
-&bull; Moyenne (W<sub>k</sub>=2) : ecart formel, droit a regularisation (CSS L243-6-7)<br>
-&bull; Faible (W<sub>k</sub>=1) : anomalie mineure, pas de sanction directe<br><br>
-<strong>Normalisation :</strong> W<sub>max</sub> = max(&Sigma;W<sub>k</sub>, 4 &times; N<sub>points</sub>) avec N<sub>points</sub> = 10<br>
-<strong>Couverture documentaire :</strong> F<sub>c</sub> = min(1, nbDocs/3) - facteur continu<br>
-<strong>Pas de bonus subjectif</strong> - seuls les constats impactent le score<br>
-<strong>Intervalle de confiance :</strong> Score &plusmn; marge selon qualite des documents analyses
-</div>
-<div style="margin-top:12px;font-size:.86em;line-height:1.8">
-<h3 style="margin-bottom:8px">Perimetres de controle</h3>
-<table><thead><tr><th>Point de controle</th><th>Reference legale</th><th>Nature du constat</th></tr></thead><tbody>
-<tr><td>Assiette des cotisations</td><td>Art. L242-1 CSS</td><td>Ecart brut BS vs DSN</td></tr>
-<tr><td>Reduction generale (RGDU 2026)</td><td>Art. L241-13 CSS (refonte)</td><td>Depassement 3,0 SMIC, coefficient errone</td></tr>
-<tr><td>FNAL</td><td>Art. L834-1 CSS</td><td>Taux incorrect selon effectif (&lt;50 / &ge;50)</td></tr>
-<tr><td>Taux AT/MP</td><td>Art. L242-5, D242-6-1 CSS</td><td>Taux applique vs taux notifie</td></tr>
-<tr><td>CSG/CRDS</td><td>Art. L136-1-1 CSS</td><td>Assiette incorrecte (abattement 1,75%)</td></tr>
-<tr><td>Plafond SS proratise</td><td>Art. L242-8 CSS</td><td>Temps partiel non proratise</td></tr>
-<tr><td>Retraite complementaire</td><td>ANI AGIRC-ARRCO art. 36</td><td>Tranche 1/2 incorrecte</td></tr>
-<tr><td>SMIC horaire</td><td>Art. L3231-2 Code du travail</td><td>Net inferieur au SMIC 2026</td></tr>
-<tr><td>NIR / Identite</td><td>Decret n. 82-103 du 22/01/1982</td><td>NIR absent ou format invalide</td></tr>
-<tr><td>Bulletin de paie</td><td>Art. L3243-2 Code du travail</td><td>Rubriques obligatoires manquantes</td></tr>
-</tbody></table>
-</div>
-<div style="margin-top:12px;padding:12px;background:var(--pl);border-radius:8px;font-size:.84em">
-<strong>Echelle de notation :</strong> A (&ge;90) | B (&ge;75) | C (&ge;60) | D (&ge;45) | E (&ge;30) | F (&lt;30)<br>
-<strong>Organisme certificateur vise :</strong> URSSAF / Caisse Nationale (art. L.243-6-3 CSS)
-</div>
-<div id="score-detail-urssaf" style="margin-top:12px"></div>
-</div>
-
-<div class="card" style="border-left:4px solid var(--pu)">
-<h2 style="color:var(--pu)">2. Score DGFIP - Conformite fiscale (CGI)</h2>
-<div style="background:var(--bg);border-radius:10px;padding:16px;margin:12px 0;font-family:'SF Mono','Consolas',monospace;font-size:.88em;line-height:1.8">
-<strong>Formule (v4.0) :</strong><br>
-S<sub>DGFIP</sub> = max(0, 100 &times; (1 - &Sigma;W<sub>k</sub> / W<sub>max</sub>)) &times; (0.5 + 0.5 &times; F<sub>c</sub>)<br><br>
-<strong>Poids de gravite W<sub>k</sub> (derives des sanctions legales) :</strong><br>
-&bull; Critique (W<sub>k</sub>=4) : manquement delibere, majoration 40% (CGI art. 1729)<br>
-&bull; Haute (W<sub>k</sub>=3) : retard declaration, majoration 10% (CGI art. 1728)<br>
-&bull; Moyenne (W<sub>k</sub>=2) : ecart formel, interet de retard 0.2%/mois (CGI art. 1727)<br>
-&bull; Faible (W<sub>k</sub>=1) : anomalie mineure, pas de sanction directe<br><br>
-<strong>Normalisation :</strong> W<sub>max</sub> = max(&Sigma;W<sub>k</sub>, 4 &times; N<sub>points</sub>) avec N<sub>points</sub> = 10<br>
-<strong>Couverture documentaire :</strong> F<sub>c</sub> = min(1, nbDocs/3)<br>
-<strong>Pas de bonus subjectif</strong>
-</div>
-<div style="margin-top:12px;font-size:.86em;line-height:1.8">
-<h3 style="margin-bottom:8px">Perimetres de controle</h3>
-<table><thead><tr><th>Point de controle</th><th>Reference legale</th><th>Nature du constat</th></tr></thead><tbody>
-<tr><td>TVA collectee / deductible</td><td>Art. 256 et 271 CGI</td><td>Ecart entre TVA declaree et calculee</td></tr>
-<tr><td>Declarations fiscales</td><td>Art. 1649 quater B CGI</td><td>Completude des declarations (IS, IR, TVA)</td></tr>
-<tr><td>DAS-2 Honoraires</td><td>Art. 240 CGI</td><td>Declaration des honoraires > 2400 EUR/an</td></tr>
-<tr><td>FEC</td><td>Art. L.47 A-I LPF</td><td>Presentation du fichier des ecritures comptables</td></tr>
-<tr><td>Facturation</td><td>Art. 289 CGI</td><td>Mentions obligatoires sur factures</td></tr>
-<tr><td>Conservation documents</td><td>Art. L.102 B LPF</td><td>Delai 6 ans fiscal / 10 ans comptable</td></tr>
-<tr><td>Avantages en nature</td><td>Art. 82 CGI</td><td>Evaluation et declaration correctes</td></tr>
-<tr><td>Credit impot formation (EXPIRE 31/12/2024)</td><td>Art. 244 quater M CGI</td><td>Dispositif expire - ne plus appliquer</td></tr>
-<tr><td>CFE / CVAE</td><td>Art. 1447 CGI</td><td>Declarations et paiement</td></tr>
-<tr><td>Taxe sur les salaires</td><td>Art. 231 CGI</td><td>Assujettissement et calcul</td></tr>
-</tbody></table>
-</div>
-<div style="margin-top:12px;padding:12px;background:var(--pul);border-radius:8px;font-size:.84em">
-<strong>Echelle de notation :</strong> A (&ge;90) | B (&ge;75) | C (&ge;60) | D (&ge;45) | E (&ge;30) | F (&lt;30)<br>
-<strong>Organisme certificateur vise :</strong> Direction Generale des Finances Publiques (DGFiP)
-</div>
-<div id="score-detail-fiscal" style="margin-top:12px"></div>
-</div>
-
-<div class="card" style="border-left:4px solid var(--tl)">
-<h2 style="color:var(--tl)">3. Score Cour des comptes - Regularite comptable</h2>
-<div style="background:var(--bg);border-radius:10px;padding:16px;margin:12px 0;font-family:'SF Mono','Consolas',monospace;font-size:.88em;line-height:1.8">
-<strong>Formule :</strong><br>
-S<sub>CDC</sub> = max(0, 100 &times; (1 - &Sigma;W<sub>k</sub> / W<sub>max</sub>)) &times; (0.5 + 0.5 &times; F<sub>c</sub>)<br><br>
-<strong>Poids de gravite W<sub>k</sub> (derives des normes d audit) :</strong><br>
-&bull; Critique (W<sub>k</sub>=4) : comptes non certifiables, anomalie significative (NEP 700, ISA 705)<br>
-&bull; Haute (W<sub>k</sub>=3) : ecart BS/DSN &gt; 5%, cut-off non respecte (ISA 450)<br>
-&bull; Moyenne (W<sub>k</sub>=2) : piece justificative manquante, rapprochement partiel (ISA 500)<br>
-&bull; Faible (W<sub>k</sub>=1) : ecart arrondi, libelle imprecis - non significatif<br><br>
-<strong>Normalisation :</strong> W<sub>max</sub> = max(&Sigma;W<sub>k</sub>, 4 &times; N<sub>points</sub>) avec N<sub>points</sub> = 8<br>
-<strong>Couverture documentaire :</strong> F<sub>c</sub> = min(1, nbDocs/3)<br>
-<strong>Pas de bonus subjectif</strong> - seuls les constats impactent le score
-</div>
-<div style="margin-top:12px;font-size:.86em;line-height:1.8">
-<h3 style="margin-bottom:8px">Perimetres de controle</h3>
-<table><thead><tr><th>Point de controle</th><th>Reference legale / norme</th><th>Nature du constat</th></tr></thead><tbody>
-<tr><td>Regularite des comptes</td><td>Normes NEP / ISA</td><td>Comptes annuels certifiables</td></tr>
-<tr><td>Sincerite des ecritures</td><td>Art. L.123-14 Code de commerce</td><td>Absence de manipulations comptables</td></tr>
-<tr><td>Image fidele du patrimoine</td><td>Art. L.123-14 Code de commerce</td><td>Bilan refletant la realite economique</td></tr>
-<tr><td>Continuite d exploitation</td><td>NEP 570</td><td>Aucun doute significatif</td></tr>
-<tr><td>Separation des exercices</td><td>Art. L.123-12 C.com / PCG 313-1</td><td>Cut-off correct</td></tr>
-<tr><td>Exhaustivite charges sociales</td><td>ISA 315 / ISA 500</td><td>Concordance BS / DSN / LDP</td></tr>
-<tr><td>Conventions reglementees</td><td>Art. L.225-38 C.com</td><td>Rapport special CAC</td></tr>
-<tr><td>Controle interne</td><td>NEP 315 / ISA 315</td><td>Documentation des procedures</td></tr>
-</tbody></table>
-</div>
-<div style="margin-top:12px;padding:12px;background:#f0fdfa;border-radius:8px;font-size:.84em">
-<strong>Echelle de notation :</strong> A (&ge;90) | B (&ge;75) | C (&ge;60) | D (&ge;45) | E (&ge;30) | F (&lt;30)<br>
-<strong>Organisme certificateur vise :</strong> Cour des comptes / Chambres regionales des comptes
-</div>
-<div id="score-detail-cdc" style="margin-top:12px"></div>
-</div>
-
-<div class="card">
-<h2>Score global NormaCheck</h2>
-<div style="background:var(--bg);border-radius:10px;padding:16px;margin:12px 0;font-family:'SF Mono','Consolas',monospace;font-size:.88em;line-height:1.8">
-<strong>Formule du score global :</strong><br>
-S<sub>global</sub> = &lfloor; (S<sub>URSSAF</sub> &times; 0.40) + (S<sub>DGFIP</sub> &times; 0.35) + (S<sub>CDC</sub> &times; 0.25) &rfloor;<br><br>
-<strong>Poids de ponderation :</strong><br>
-&bull; URSSAF : 40% (risque financier principal : cotisations sociales)<br>
-&bull; DGFIP : 35% (risque fiscal : impots, TVA, declarations)<br>
-&bull; Cour des comptes : 25% (risque comptable : regularite, sincerite)
-</div>
-<div id="score-detail-global" style="margin-top:12px"></div>
-<div style="margin-top:16px;padding:14px;background:var(--ol);border-radius:10px;border:1px solid #fde68a;font-size:.84em">
-<strong>&#9888; Avertissement :</strong> Les scores NormaCheck sont des indicateurs internes d aide a la conformite. Ils ne constituent pas une certification officielle et ne sont pas opposables aux administrations (art. L.243-6-3 CSS). La labelisation est en cours de validation aupres des organismes certificateurs.
-</div>
-</div>
-</div>
-
-<div class="sec" id="s-ensavoirplus">
-
-<div class="card" style="background:linear-gradient(135deg,#f0f9ff 0%,#e0f2fe 100%);border:none">
-<h2 style="font-size:1.5em;color:var(--p2);margin-bottom:4px">&#128218; En savoir plus - NormaCheck v3.8.1</h2>
-<p style="color:var(--tx2);font-size:.92em;margin-top:0">Comprendre le score de conformite, la methodologie et les garanties de NormaCheck.</p>
-</div>
-
-<div class="card">
-<h2 style="color:var(--p2)">&#127919; A quoi sert le score de conformite ?</h2>
-<p style="font-size:.9em;line-height:1.7;color:var(--tx)">Le score de conformite NormaCheck est un <strong>indicateur synthetique</strong> qui vous permet de mesurer en un coup d oeil le niveau de conformite de votre entreprise face aux obligations sociales, fiscales et comptables.</p>
-<p style="font-size:.9em;line-height:1.7;color:var(--tx)">Concretement, il repond a une question simple : <em>"Si un controleur URSSAF, un inspecteur des impots ou un commissaire aux comptes se presentait demain, quel serait le niveau de risque pour mon entreprise ?"</em></p>
-<div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(220px,1fr));gap:12px;margin:16px 0">
-<div style="background:#f0fdf4;padding:14px;border-radius:10px;border-left:4px solid #22c55e"><strong style="color:#166534">Score A (90-100)</strong><br><span style="font-size:.85em;color:#166534">Excellent. Votre conformite est quasi-parfaite. Risque tres faible en cas de controle.</span></div>
-<div style="background:#ecfdf5;padding:14px;border-radius:10px;border-left:4px solid #10b981"><strong style="color:#065f46">Score B (75-89)</strong><br><span style="font-size:.85em;color:#065f46">Bon. Quelques points d amelioration mineurs, mais pas de risque majeur.</span></div>
-<div style="background:#fefce8;padding:14px;border-radius:10px;border-left:4px solid #eab308"><strong style="color:#854d0e">Score C (60-74)</strong><br><span style="font-size:.85em;color:#854d0e">Moyen. Des ecarts ont ete identifies. Des actions correctives sont recommandees.</span></div>
-<div style="background:#fff7ed;padding:14px;border-radius:10px;border-left:4px solid #f97316"><strong style="color:#9a3412">Score D (45-59)</strong><br><span style="font-size:.85em;color:#9a3412">Insuffisant. Des anomalies significatives necessitent une attention immediate.</span></div>
-<div style="background:#fef2f2;padding:14px;border-radius:10px;border-left:4px solid #ef4444"><strong style="color:#991b1b">Score E/F (&lt;45)</strong><br><span style="font-size:.85em;color:#991b1b">Critique. Risque eleve de redressement en cas de controle. Actions urgentes requises.</span></div>
-</div>
-</div>
-
-<div class="card">
-<h2 style="color:var(--p2)">&#9878; Comment le score est-il calcule ?</h2>
-<p style="font-size:.9em;line-height:1.7">Notre methodologie repose sur <strong>4 principes fondamentaux</strong> :</p>
-<div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(240px,1fr));gap:12px;margin:12px 0">
-<div class="card" style="border-top:3px solid var(--p2)"><strong>1. Proportionnalite</strong><br><span style="font-size:.85em;color:var(--tx2)">Le poids de chaque anomalie est proportionnel a la gravite de la sanction prevue par la loi. Une erreur de calcul de cotisations (qui entraine une majoration de 40%) pese plus qu un libelle imprecis (sans sanction directe).</span></div>
-<div class="card" style="border-top:3px solid var(--p2)"><strong>2. Objectivabilite</strong><br><span style="font-size:.85em;color:var(--tx2)">Chaque point de controle est derive d une reference legale explicite (Code de la Securite sociale, Code General des Impots, normes ISA...). Aucun critere subjectif n entre en jeu.</span></div>
-<div class="card" style="border-top:3px solid var(--p2)"><strong>3. Reproductibilite</strong><br><span style="font-size:.85em;color:var(--tx2)">Avec les memes documents, NormaCheck produit toujours le meme score. Il n y a pas de coefficient arbitraire ni d appreciation discretionnaire.</span></div>
-<div class="card" style="border-top:3px solid var(--p2)"><strong>4. Transparence</strong><br><span style="font-size:.85em;color:var(--tx2)">Chaque constat est trace, source et justifie. Vous pouvez voir exactement quels elements ont impacte votre score et pourquoi.</span></div>
-</div>
-
-<h3 style="margin-top:18px">La formule en langage simple</h3>
-<div style="background:var(--bg);border-radius:10px;padding:16px;margin:8px 0;font-size:.9em;line-height:1.8">
-<p><strong>Etape 1 :</strong> NormaCheck analyse vos documents et identifie les <em>constats</em> (ecarts par rapport aux obligations legales).</p>
-<p><strong>Etape 2 :</strong> Chaque constat recoit un <em>poids de gravite</em> base sur la sanction legale associee :<br>
-&bull; <strong>Critique (4 pts)</strong> : manquement delibere, majoration 40%<br>
-&bull; <strong>Haute (3 pts)</strong> : retard ou omission, majoration 10%<br>
-&bull; <strong>Moyenne (2 pts)</strong> : ecart formel, droit a regularisation<br>
-&bull; <strong>Faible (1 pt)</strong> : anomalie mineure, pas de sanction directe</p>
-<p><strong>Etape 3 :</strong> Le score est calcule : plus vous avez de constats graves, plus le score baisse. <em>Aucun constat = score de 100.</em></p>
-<p><strong>Etape 4 :</strong> Un facteur de <em>couverture documentaire</em> ajuste le score : plus vous fournissez de documents, plus l analyse est fiable et complete.</p>
-</div>
-<p style="font-size:.85em;color:var(--tx2)"><button class="btn btn-s btn-sm" onclick="showS('score-details')">Voir les formules mathematiques detaillees &#8594;</button></p>
-</div>
-
-<div class="card">
-<h2 style="color:var(--p2)">&#128202; Les 3 axes d analyse</h2>
-<p style="font-size:.9em;line-height:1.7">NormaCheck evalue votre conformite sur 3 axes complementaires, correspondant aux 3 principaux risques de controle :</p>
-
-<div style="margin:16px 0">
-<div style="display:flex;align-items:center;gap:12px;padding:14px;background:var(--pl);border-radius:10px;margin-bottom:10px">
-<div style="min-width:50px;height:50px;border-radius:50%;background:var(--p2);color:#fff;display:flex;align-items:center;justify-content:center;font-weight:700;font-size:1.2em">40%</div>
-<div><strong style="color:var(--p2)">URSSAF - Conformite sociale</strong><br><span style="font-size:.85em;color:var(--tx2)">Cotisations sociales, bulletin de paie, DSN, reduction Fillon, plafond SS, FNAL, AT/MP, retraite complementaire... Reference : Code de la Securite sociale (CSS).</span></div>
-</div>
-<div style="display:flex;align-items:center;gap:12px;padding:14px;background:var(--pul);border-radius:10px;margin-bottom:10px">
-<div style="min-width:50px;height:50px;border-radius:50%;background:var(--pu);color:#fff;display:flex;align-items:center;justify-content:center;font-weight:700;font-size:1.2em">35%</div>
-<div><strong style="color:var(--pu)">DGFIP - Conformite fiscale</strong><br><span style="font-size:.85em;color:var(--tx2)">TVA, declarations fiscales, DAS-2, FEC, facturation, conservation des documents, CFE/CVAE, taxe sur les salaires... Reference : Code General des Impots (CGI).</span></div>
-</div>
-<div style="display:flex;align-items:center;gap:12px;padding:14px;background:#f0fdfa;border-radius:10px">
-<div style="min-width:50px;height:50px;border-radius:50%;background:var(--tl);color:#fff;display:flex;align-items:center;justify-content:center;font-weight:700;font-size:1.2em">25%</div>
-<div><strong style="color:var(--tl)">Cour des comptes - Regularite comptable</strong><br><span style="font-size:.85em;color:var(--tx2)">Regularite et sincerite des comptes, image fidele, continuite d exploitation, separation des exercices, controle interne... Reference : normes NEP / ISA.</span></div>
-</div>
-</div>
-<p style="font-size:.85em;color:var(--tx2)">Les poids de ponderation (40/35/25) refletent l importance relative du risque financier : les cotisations sociales representent le premier poste de charges pour la plupart des entreprises.</p>
-</div>
-
-<div class="card">
-<h2 style="color:var(--p2)">&#128170; Comment ameliorer votre score ?</h2>
-<div style="font-size:.9em;line-height:1.8">
-<p><strong>1. Fournissez davantage de documents</strong><br>
-Plus vous importez de documents (bulletins de paie, DSN, factures, bilans...), plus l analyse est precise. Le facteur de couverture documentaire ameliore la fiabilite du score.</p>
-<p><strong>2. Corrigez les anomalies critiques en priorite</strong><br>
-Concentrez-vous d abord sur les constats de gravite "critique" et "haute" - ce sont eux qui impactent le plus votre score ET qui presentent le plus grand risque en cas de controle.</p>
-<p><strong>3. Utilisez les recommandations</strong><br>
-Chaque constat est accompagne d une recommandation concrete et de la reference legale. Suivez ces recommandations pour corriger les ecarts identifies.</p>
-<p><strong>4. Verifiez regulierement</strong><br>
-La conformite n est pas un etat statique. Les regles changent (SMIC, taux, obligations declaratives). Effectuez des analyses regulieres pour maintenir votre conformite.</p>
-</div>
-</div>
-
-<div class="card">
-<h2 style="color:var(--p2)">&#128274; Garanties et limites</h2>
-<div style="font-size:.9em;line-height:1.8">
-<p><strong>Ce que NormaCheck fait :</strong></p>
-<ul>
-<li>Detecte automatiquement les ecarts par rapport aux obligations legales connues</li>
-<li>Applique une methodologie reproductible, transparente et non-discretionnaire</li>
-<li>Fournit des recommandations concretes et sourcees juridiquement</li>
-<li>Vous aide a preparer un eventuel controle en identifiant les points de risque</li>
-</ul>
-<p><strong>Ce que NormaCheck ne fait pas :</strong></p>
-<ul>
-<li>NormaCheck <strong>ne remplace pas</strong> un expert-comptable, un commissaire aux comptes ou un avocat specialise</li>
-<li>Les scores ne constituent <strong>pas une certification officielle</strong> et ne sont pas opposables aux administrations</li>
-<li>L analyse est basee sur les documents fournis - elle ne peut pas detecter ce qui n a pas ete importe</li>
-<li>Les regles de droit evoluent - NormaCheck est mis a jour regulierement mais un decalage temporaire est possible</li>
-</ul>
-</div>
-<div style="margin-top:12px;padding:14px;background:var(--ol);border-radius:10px;border:1px solid #fde68a;font-size:.84em">
-<strong>&#9878; Base juridique :</strong> La methodologie NormaCheck s appuie sur le Code de la Securite sociale (CSS), le Code General des Impots (CGI), le Livre des Procedures Fiscales (LPF), le Code de commerce, et les normes internationales d audit (ISA/NEP). Chaque point de controle reference l article de loi correspondant.
-</div>
-</div>
-
-<div class="card" style="text-align:center;padding:24px">
-<p style="font-size:.92em;color:var(--tx2)">Pour consulter les formules mathematiques detaillees et les references legales de chaque point de controle :</p>
-<button class="btn btn-blue" onclick="showS('score-details')" style="margin-top:8px">Voir le detail complet des formules &#8594;</button>
-</div>
-</div>
-
-</div><!-- end .page -->
-</div><!-- end .content -->
-</div><!-- end .layout -->
-"""
-
-
-APP_HTML += """
-<script>
-/* === AUTH CHECK === */
-(function(){fetch("/api/auth/me").then(function(r){if(!r.ok){
-/* Tenter un refresh du token avant de rediriger */
-return _tryRefreshToken().then(function(refreshed){
-if(refreshed){return fetch("/api/auth/me").then(function(r2){return r2.ok?r2.json():null;});}
-toast("Session expiree. Reconnexion dans 5 secondes...");setTimeout(function(){window.location.href="/";},5000);return null;
-});}return r.json();}).then(function(u){if(!u)return;_ncUser=u;var su=document.getElementById("sidebar-user");if(su)su.textContent=(u.prenom||"")+" "+(u.nom||"")+" ("+u.role+")";}).catch(function(e){console.error("Auth check failed:",e);toast("Erreur de connexion. Verifiez votre reseau.");});})();
-
-/* === INIT === */
-try{var _td=document.getElementById("topbar-date");if(_td)_td.textContent=new Date().toLocaleDateString("fr-FR",{day:"numeric",month:"long",year:"numeric"});}catch(e){}
-
-document.addEventListener("click",function(e){var a=e.target.closest(".anomalie[data-toggle]");if(a)a.classList.toggle("open");var td=e.target.closest("[data-toggle-detail]");if(td){var det=td.querySelector(".aud-detail,.al-detail");if(det)det.style.display=det.style.display==="none"?"block":"none";}var st=e.target.closest(".sub-toggle");if(st){var sd=st.querySelector(".sub-detail");if(sd)sd.style.display=sd.style.display==="none"?"block":"none";}});
-
-/* === DASHBOARD === */
-var analysisData=null;
-try{var _saved=sessionStorage.getItem("nc_analysis");if(_saved){analysisData=JSON.parse(_saved);}}catch(e){}
-function saveDashServer(data){fetch("/api/dashboard/save",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify(data),credentials:"same-origin"}).catch(function(){});}
-function loadDashServer(){if(analysisData)return;fetch("/api/dashboard/load",{credentials:"same-origin"}).then(safeJson).then(function(r){if(r.status==="ok"&&r.data){analysisData=r.data;try{sessionStorage.setItem("nc_analysis",JSON.stringify(r.data));}catch(e){}loadDash();var ra=document.getElementById("res-analyse");if(ra&&document.getElementById("s-analyse")&&document.getElementById("s-analyse").classList.contains("active")){ra.style.display="block";if(typeof showJsonResults==="function")showJsonResults(analysisData);}}}).catch(function(){});}
-/* Charger les donnees d'analyse depuis le serveur au demarrage si sessionStorage est vide */
-if(!analysisData){loadDashServer();}
-function loadDash(){
-try{
-if(!analysisData){loadDashServer();return;}
-/* Masquer le message de bienvenue quand une analyse existe */
-var welcomeEl=document.getElementById("dash-welcome");if(welcomeEl)welcomeEl.style.display="none";
-var d=analysisData,s=d.synthese||{};
-var impact=s.impact_financier_total||0;
-var constats=d.constats||[];
-document.getElementById("dash-anomalies").textContent=constats.length;
-document.getElementById("dash-anom-count").textContent=constats.length;
-document.getElementById("dash-impact").textContent=impact.toFixed(2)+" EUR";
-var conf=Math.max(0,100-(s.score_risque_global||0));
-document.getElementById("dash-conf").textContent=conf+"%";
-document.getElementById("gauge").style.setProperty("--pct",conf+"%");
-document.getElementById("gauge-val").textContent=conf+"%";
-renderAnomalies("dash-anomalies-list",constats);
-var byDest={"URSSAF":0,"Fiscal":0,"France Travail":0,"GUSO":0};
-constats.forEach(function(c){var dest=categToDest(c.categorie||"");byDest[dest]=(byDest[dest]||0)+Math.abs(c.montant_impact||0);});
-document.getElementById("dd-urssaf").textContent=byDest["URSSAF"].toFixed(0)+" EUR";
-document.getElementById("dd-fiscal").textContent=byDest["Fiscal"].toFixed(0)+" EUR";
-document.getElementById("dd-ft").textContent=byDest["France Travail"].toFixed(0)+" EUR";
-document.getElementById("dd-guso").textContent=byDest["GUSO"].toFixed(0)+" EUR";
-/* Triple scores */
-var ts=calculateTripleScore(d);
-function setGauge(id,valId,gradeId,sc){var g=document.getElementById(id);var v=document.getElementById(valId);var gr=document.getElementById(gradeId);if(g)g.style.setProperty("--pct",sc.score+"%");if(v)v.textContent=sc.score+"%";if(gr){var gcls=sc.score>=75?"color:var(--g)":sc.score>=45?"color:var(--o)":"color:var(--r)";gr.innerHTML="<span style='font-weight:700;"+gcls+"'>"+sc.grade+"</span>";}}
-setGauge("gauge-urssaf","gauge-urssaf-val","grade-urssaf",ts.urssaf);
-setGauge("gauge-fiscal","gauge-fiscal-val","grade-fiscal",ts.fiscal);
-setGauge("gauge-cdc","gauge-cdc-val","grade-cdc",ts.cdc);
-}catch(e){console.error("loadDash",e);}
-}
-
-function renderAnomalies(id,constats){
-var el=document.getElementById(id);if(!constats.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune anomalie detectee.</p>";return;}
-/* Trier : haute d'abord, puis moyenne, puis faible */
-var sevOrder={"haute":0,"moyenne":1,"faible":2};
-constats.sort(function(a,b){return (sevOrder[a.severite]||2)-(sevOrder[b.severite]||2);});
-var nbH=constats.filter(function(c){return c.severite==="haute"}).length;
-var nbM=constats.filter(function(c){return c.severite==="moyenne"}).length;
-var nbL=constats.length-nbH-nbM;
-var h="<div style='display:flex;gap:12px;flex-wrap:wrap;margin-bottom:14px;align-items:center'>";
-h+="<span style='font-weight:700;font-size:.95em'>"+constats.length+" anomalie(s) detectee(s)</span>";
-if(nbH)h+="<span class='badge badge-red'>"+nbH+" critique"+(nbH>1?"s":"")+"</span>";
-if(nbM)h+="<span class='badge badge-amber'>"+nbM+" moyenne"+(nbM>1?"s":"")+"</span>";
-if(nbL)h+="<span class='badge badge-green'>"+nbL+" mineure"+(nbL>1?"s":"")+"</span>";
-h+="</div>";
-constats.forEach(function(c,idx){
-var impact=c.montant_impact||0;var neg=impact>0;
-var sevCls=c.severite==="haute"?"high":(c.severite==="moyenne"?"med":"low");
-var dest=categToDest(c.categorie||"");
-var destCls={"URSSAF":"badge-blue","Fiscal":"badge-purple","France Travail":"badge-amber","GUSO":"badge-teal"}[dest]||"badge-blue";
-var sevBadge=c.severite==="haute"?"badge-red":(c.severite==="moyenne"?"badge-amber":"badge-green");
-var sevLabel=c.severite==="haute"?"Critique":(c.severite==="moyenne"?"Moyenne":"Mineure");
-h+="<div class='anomalie sev-"+sevCls+"' data-toggle='1'>";
-/* --- Ligne resume cliquable --- */
-h+="<div class='head'><div style='flex:1'>";
-h+="<span style='font-weight:700;font-size:.76em;color:var(--tx2);margin-right:6px'>#"+(idx+1)+"</span>";
-h+="<span class='title'>"+(c.titre||"Ecart")+"</span> ";
-h+="<span class='dest "+destCls+"'>"+dest+"</span> <span class='badge "+sevBadge+"'>"+sevLabel+"</span>";
-if(c.periode)h+=" <span class='badge' style='background:#e0e7ff;color:#3730a3'>"+c.periode+"</span>";
-h+="</div>";
-if(neg)h+="<div class='montant neg'>+"+Math.abs(impact).toFixed(2)+" EUR</div>";
-h+="</div>";
-/* --- Comparaison rapide (toujours visible) --- */
-if(c.valeur_constatee||c.valeur_attendue){
-h+="<div style='display:flex;gap:12px;flex-wrap:wrap;margin-top:8px;font-size:.85em'>";
-if(c.valeur_constatee)h+="<div style='background:var(--rl);padding:4px 10px;border-radius:6px;border:1px solid #fecaca'><strong style='color:var(--r)'>Constate :</strong> <span style='font-weight:600'>"+c.valeur_constatee+"</span></div>";
-if(c.valeur_attendue)h+="<div style='background:var(--gl);padding:4px 10px;border-radius:6px;border:1px solid #bbf7d0'><strong style='color:var(--g)'>Attendu :</strong> <span style='font-weight:600'>"+c.valeur_attendue+"</span></div>";
-if(neg)h+="<div style='background:var(--ol);padding:4px 10px;border-radius:6px;border:1px solid #fde68a'><strong style='color:var(--o)'>Impact :</strong> <span style='font-weight:600'>"+Math.abs(impact).toFixed(2)+" EUR</span></div>";
-h+="</div>";}
-/* --- Detail (deploye au clic) --- */
-h+="<div class='detail'>";
-/* Localisation */
-var docSrc=c.document_source||(c.documents_concernes&&c.documents_concernes.length?c.documents_concernes.join(", "):"");
-h+="<div style='background:var(--pl);border:1px solid #bfdbfe;border-radius:8px;padding:10px;margin-bottom:10px;font-size:.88em'>";
-h+="<strong style='color:var(--p2)'>&#128204; Localisation de l'erreur</strong><br>";
-if(docSrc)h+="<span>Document : <strong>"+docSrc+"</strong></span><br>";
-h+="<span>Categorie : "+(c.categorie||"-")+"</span>";
-if(c.rubrique&&c.rubrique!=="Generale")h+=" &bull; <span>Rubrique : "+c.rubrique+"</span>";
-if(c.periode)h+=" &bull; <span>Periode : "+c.periode+"</span>";
-h+="</div>";
-/* Explication claire */
-var desc=(c.description||"").replace(/\\n/g,"<br>");
-h+="<div style='border-radius:8px;padding:12px;margin-bottom:10px;font-size:.88em;line-height:1.6;background:var(--card-bg);border:1px solid var(--brd)'>"+desc+"</div>";
-/* Action recommandee */
-if(c.recommandation){
-h+="<div style='background:var(--gl);border:1px solid #a7f3d0;border-radius:8px;padding:10px;margin-bottom:8px;font-size:.88em'>";
-h+="<strong style='color:#065f46'>&#9989; Action a realiser :</strong> "+c.recommandation+"</div>";}
-/* Base legale */
-if(c.reference_legale){
-h+="<div style='font-size:.82em;color:var(--tx2);padding:6px 10px;background:var(--bg);border-radius:6px;border:1px solid var(--brd)'>";
-h+="<strong>&#9878; Base legale :</strong> "+c.reference_legale+"</div>";}
-h+="</div></div>";});el.innerHTML=h;}
-
-function categToDest(cat){var c=cat.toLowerCase();if(c.indexOf("fiscal")>=0||c.indexOf("impot")>=0)return"Fiscal";if(c.indexOf("france travail")>=0||c.indexOf("chomage")>=0)return"France Travail";if(c.indexOf("guso")>=0||c.indexOf("spectacle")>=0)return"GUSO";return"URSSAF";}
-
-/* === ANALYSE === */
-var fichiers=[];
-var dz=document.getElementById("dz-analyse"),fi=document.getElementById("fi-analyse");
-if(dz){["dragenter","dragover"].forEach(function(ev){dz.addEventListener(ev,function(e){e.preventDefault();});});
-dz.addEventListener("drop",function(e){e.preventDefault();addF(e.dataTransfer.files);});}
-if(fi){fi.addEventListener("change",function(e){addF(e.target.files);fi.value="";});}
-function addF(files){for(var i=0;i<files.length;i++){var f=files[i];var dup=false;for(var j=0;j<fichiers.length;j++){if(fichiers[j].name===f.name){dup=true;break;}}if(!dup&&fichiers.length<20)fichiers.push(f);}renderF();}
-function renderF(){var el=document.getElementById("fl-analyse");var h="";for(var i=0;i<fichiers.length;i++){h+="<div class='fi'><span class='nm'>"+fichiers[i].name+"</span><span style='color:var(--tx2);font-size:.8em'>"+(fichiers[i].size/1024).toFixed(1)+" Ko</span><button class='rm' onclick='rmF("+i+")'>&times;</button></div>";}el.innerHTML=h;document.getElementById("btn-az").disabled=fichiers.length===0;}
-function rmF(i){fichiers.splice(i,1);renderF();}
-
-
-function lancerAnalyse(){
-if(!fichiers.length)return;
-var btn=document.getElementById("btn-az"),prg=document.getElementById("prg-az"),fill=document.getElementById("pf-az"),txt=document.getElementById("pt-az");
-btn.disabled=true;prg.style.display="block";document.getElementById("res-analyse").style.display="none";
-var steps=[[10,"Import..."],[25,"SHA-256..."],[40,"Parsing + OCR..."],[55,"Coherence..."],[70,"Anomalies..."],[85,"Patterns..."],[95,"Rapport..."]];
-var si=0;var iv=setInterval(function(){if(si<steps.length){fill.style.width=steps[si][0]+"%";txt.textContent=steps[si][1];si++;}},900);
-var fd=new FormData();for(var i=0;i<fichiers.length;i++){fd.append("fichiers",fichiers[i]);}
-var integ=document.getElementById("chk-integrer").checked;
-var modeAz=document.getElementById("mode-analyse").value;
-fetch("/api/analyze?format_rapport=json&integrer="+integ+"&mode_analyse="+modeAz,{method:"POST",body:fd}).then(function(resp){
-clearInterval(iv);fill.style.width="100%";txt.textContent="Termine !";
-if(!resp.ok){if(resp.status===401){return _tryRefreshToken().then(function(ok){if(ok){toast("Session renouvelee. Relancez l analyse.","ok");}else{toast("Session expiree. Reconnexion...");setTimeout(function(){window.location.href="/";},5000);}throw new Error("Session expiree");});}return resp.json().then(function(e){throw new Error(e.detail||"Erreur")});}
-return resp.json().then(function(data){analysisData=data;try{sessionStorage.setItem("nc_analysis",JSON.stringify(data));}catch(e){}saveDashServer(data);showJsonResults(data);});
-}).then(function(){setTimeout(function(){prg.style.display="none";},800);document.getElementById("res-analyse").style.display="block";}).catch(function(e){clearInterval(iv);prg.style.display="none";toast(e.message);btn.disabled=false;});
-}
-
-function showJsonResults(data){
-var s=data.synthese||{};var impact=s.impact_financier_total||0;
-var dashNr=s.nb_fichiers_non_reconnus||0;
-var nbAno=(data.constats||[]).length;var ts=calculateTripleScore(data);
-var dashH="<div class='sc blue' style='cursor:pointer' data-scroll='az-findings' onclick='scrollToEl(this)'><div class='val'>"+nbAno+"</div><div class='lab'>Anomalies &#8595;</div></div>";
-dashH+="<div class='sc "+(impact>1000?"red":"green")+"' style='cursor:pointer' data-toggle='az-impact-detail' onclick='toggleDetailAttr(this)'><div class='val'>"+impact.toFixed(2)+" EUR</div><div class='lab'>Impact &#8595;</div></div>";
-dashH+="<div class='sc green' style='cursor:pointer' data-scroll='az-audit-card' onclick='scrollToEl(this)'><div class='val'>"+ts.global.score+"%</div><div class='lab'>Conformite &#8595;</div></div>";
-dashH+="<div class='sc'><div class='val'>"+(s.nb_fichiers||0)+"</div><div class='lab'>Fichiers</div></div>";
-dashH+="<div class='sc blue'><div class='val'>"+ts.urssaf.score+"%</div><div class='lab'>URSSAF</div></div>";
-dashH+="<div class='sc purple'><div class='val'>"+ts.fiscal.score+"%</div><div class='lab'>DGFIP</div></div>";
-dashH+="<div class='sc teal'><div class='val'>"+ts.cdc.score+"%</div><div class='lab'>CDC</div></div>";
-if(dashNr>0)dashH+="<div class='sc red'><div class='val'>"+dashNr+"</div><div class='lab'>Non reconnus</div></div>";
-document.getElementById("az-dashboard").innerHTML=dashH;
-var impactDetail=document.getElementById("az-impact-detail");
-if(impactDetail){
-var ih="<h3>Detail de l impact financier</h3>";
-var charges={};var constats=data.constats||[];
-for(var i=0;i<constats.length;i++){var c=constats[i];var cat=c.categorie||c.type||"Autre";if(!charges[cat])charges[cat]={total:0,items:[]};var imp=c.impact_financier||0;charges[cat].total+=imp;charges[cat].items.push({desc:c.description||c.titre||"",impact:imp,severity:c.severite||c.niveau||"info"});}
-ih+="<table><tr><th>Categorie</th><th class='num'>Impact (EUR)</th><th class='num'>Nb anomalies</th><th>Detail</th></tr>";
-for(var cat in charges){var g=charges[cat];ih+="<tr style='cursor:pointer' onclick='toggleNextRow(this)'><td><strong>"+cat+"</strong></td><td class='num' style='color:"+(g.total>500?"var(--r)":"var(--tx)")+"'>"+g.total.toFixed(2)+"</td><td class='num'>"+g.items.length+"</td><td style='font-size:.82em;color:var(--tx2)'>Cliquer pour voir</td></tr>";
-ih+="<tr style='display:none'><td colspan='4'><div style='padding:6px;background:var(--bg2);border-radius:6px;font-size:.84em'>";
-for(var j=0;j<g.items.length;j++){var it=g.items[j];ih+="<div style='display:flex;justify-content:space-between;padding:2px 0;border-bottom:1px solid var(--brd)'><span>"+it.desc+"</span><span class='num' style='min-width:80px'>"+(it.impact||0).toFixed(2)+" EUR</span></div>";}
-ih+="</div></td></tr>";}
-ih+="</table>";
-impactDetail.innerHTML=ih;impactDetail.style.display="block";}
-renderAnomalies("az-findings",data.constats||[]);
-var recos=data.recommandations||[];var rh="";for(var i=0;i<recos.length;i++){rh+="<div class='al info'><span class='ai'>&#128161;</span><span><strong>#"+(i+1)+"</strong> "+(recos[i].description||recos[i].titre||"")+"</span></div>";}
-document.getElementById("az-reco").innerHTML=rh||"<p style='color:var(--tx2)'>Aucune.</p>";
-if(data.html_report){document.getElementById("az-html-card").style.display="block";document.getElementById("az-html-frame").srcdoc=data.html_report;}else{document.getElementById("az-html-card").style.display="none";}
-showFileInterpretation(data);showAuditChecks(data);showIntegrationResults(data);
-document.getElementById("dash-docs").textContent=(s.nb_fichiers||0);loadDash();}
-function toggleDetail(id){var el=document.getElementById(id);if(el)el.style.display=el.style.display==="none"?"block":"none";}
-function toggleDetailAttr(src){var id=src.dataset.toggle;if(id)toggleDetail(id);}
-function toggleNextRow(tr){var next=tr.nextElementSibling;if(next)next.style.display=next.style.display==="none"?"":"none";}
-function scrollToEl(src){var id=src.dataset.scroll;var el=id?document.getElementById(id):null;if(el)el.scrollIntoView({behavior:"smooth"});}
-function resetAz(){fichiers=[];analysisData=null;try{sessionStorage.removeItem("nc_analysis");sessionStorage.removeItem("nc_integration");}catch(e){}renderF();document.getElementById("res-analyse").style.display="none";document.getElementById("az-audit-card").style.display="none";document.getElementById("az-integration-card").style.display="none";document.getElementById("btn-az").disabled=false;toast("Pret pour une nouvelle analyse.","ok");}
-
-/* === BIBLIOTHEQUE === */
-function loadKnowledge(){
-fetch("/api/bibliotheque/knowledge").then(safeJson).then(function(kb){
-var el=document.getElementById("biblio-knowledge");if(!el)return;
-var s=kb.summary||{};
-if(!s.derniere_maj){el.innerHTML="<div class='al info'><span class='ai'>&#128218;</span><span>Aucune donnee. Importez des documents via Import / Analyse pour alimenter la base.</span></div>";return;}
-var h="<div style='display:flex;gap:10px;flex-wrap:wrap;margin-bottom:14px'>";
-h+="<div class='sc blue'><div class='val'>"+s.nb_salaries_connus+"</div><div class='lab'>Salaries connus</div></div>";
-h+="<div class='sc green'><div class='val'>"+s.nb_employeurs+"</div><div class='lab'>Employeurs</div></div>";
-h+="<div class='sc'><div class='val'>"+s.nb_periodes+"</div><div class='lab'>Periodes</div></div>";
-h+="<div class='sc amber'><div class='val'>"+s.nb_cotisations_analysees+"</div><div class='lab'>Cotisations</div></div>";
-h+="<div class='sc'><div class='val'>"+s.total_masse_salariale.toFixed(0)+" EUR</div><div class='lab'>Masse salariale</div></div>";
-h+="<div class='sc "+(s.nb_anomalies>0?"red":"green")+"'><div class='val'>"+s.nb_anomalies+"</div><div class='lab'>Anomalies</div></div></div>";
-if(s.periodes&&s.periodes.length){h+="<p style='font-size:.84em;color:var(--tx2)'>Periodes couvertes : <strong>"+s.periodes.join(", ")+"</strong></p>";}
-if(s.pieces_disponibles&&s.pieces_disponibles.length){h+="<p style='font-size:.84em;color:var(--tx2)'>Pieces disponibles : ";for(var i=0;i<s.pieces_disponibles.length;i++){h+="<span class='badge badge-blue' style='margin:2px'>"+s.pieces_disponibles[i]+"</span>";}h+="</p>";}
-var sals=kb.salaries||{};var salKeys=Object.keys(sals);
-if(salKeys.length){h+="<h3 style='margin-top:16px'>Salaries identifies ("+salKeys.length+")</h3><table><tr><th>NIR</th><th>Nom</th><th>Prenom</th><th>Statut</th><th class='num'>Dernier brut</th><th>Periodes</th></tr>";
-for(var i=0;i<salKeys.length;i++){var sal=sals[salKeys[i]];h+="<tr><td style='font-size:.78em'>"+sal.nir+"</td><td>"+sal.nom+"</td><td>"+sal.prenom+"</td><td><span class='badge "+(sal.statut==="cadre"?"badge-purple":"badge-blue")+"'>"+sal.statut+"</span></td><td class='num'>"+(sal.dernier_brut||0).toFixed(2)+"</td><td style='font-size:.78em'>"+(sal.periodes_presentes||[]).join(", ")+"</td></tr>";}
-h+="</table>";}
-var emps=kb.employeurs||{};var empKeys=Object.keys(emps);
-if(empKeys.length){h+="<h3 style='margin-top:16px'>Employeurs identifies ("+empKeys.length+")</h3><table><tr><th>SIRET</th><th>Raison sociale</th><th>NAF</th><th class='num'>Effectif</th></tr>";
-for(var i=0;i<empKeys.length;i++){var emp=emps[empKeys[i]];h+="<tr><td>"+emp.siret+"</td><td>"+emp.raison_sociale+"</td><td>"+(emp.code_naf||"-")+"</td><td class='num'>"+(emp.effectif||"-")+"</td></tr>";}
-h+="</table>";}
-var ctx=kb.contexte_entreprise||{};
-if(ctx.convention_collective||ctx.code_naf||ctx.raison_sociale||ctx.effectif_moyen){
-h+="<h3 style='margin-top:16px'>Contexte entreprise</h3><div style='display:flex;gap:12px;flex-wrap:wrap'>";
-if(ctx.raison_sociale)h+="<span class='badge badge-blue'>"+ctx.raison_sociale+"</span>";
-if(ctx.code_naf)h+="<span class='badge badge-purple'>NAF: "+ctx.code_naf+"</span>";
-if(ctx.convention_collective)h+="<span class='badge badge-teal'>CCN: "+ctx.convention_collective+"</span>";
-if(ctx.effectif_moyen>0)h+="<span class='badge badge-green'>Effectif: "+ctx.effectif_moyen+"</span>";
-h+="</div>";}
-var accords=ctx.accords_entreprise||[];if(accords.length){
-h+="<h3 style='margin-top:16px'>Accords entreprise ("+accords.length+")</h3><table><tr><th>Accord</th><th>Type</th><th>Date</th></tr>";
-for(var ai=0;ai<accords.length;ai++){var ac=accords[ai];h+="<tr><td>"+ac.reference+"</td><td><span class='badge badge-teal'>"+ac.type.replace(/_/g," ")+"</span></td><td>"+(ac.date||"-")+"</td></tr>";}
-h+="</table>";}
-var dpt=kb.documents_par_type||{};var dptKeys=Object.keys(dpt);
-if(dptKeys.length){h+="<h3 style='margin-top:16px'>Documents par type</h3><div style='display:flex;gap:8px;flex-wrap:wrap'>";
-for(var di=0;di<dptKeys.length;di++){h+="<span class='badge badge-blue'>"+dptKeys[di].replace(/_/g," ")+" ("+dpt[dptKeys[di]].length+")</span>";}
-h+="</div>";}
-h+="<p style='font-size:.78em;color:var(--tx2);margin-top:12px'>Derniere mise a jour : "+s.derniere_maj+"</p>";
-el.innerHTML=h;}).catch(function(){});}
-function loadBiblio(){
-fetch("/api/documents/bibliotheque").then(safeJson).then(function(raw){var docs=(raw&&raw.items&&typeof raw.total==="number")?raw.items:raw;
-var el=document.getElementById("biblio-list");
-if(!docs||!docs.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun document. Importez des fichiers via l'onglet Analyse.</p>";return;}
-var h="";for(var i=0;i<docs.length;i++){var d=docs[i];var de=d.donnees_extraites||{};
-h+="<div class='doc-item'><div style='display:flex;justify-content:space-between;align-items:flex-start;flex-wrap:wrap;gap:6px'>";
-var bStatCls=d.statut==="non_reconnu"?"badge-red":(d.statut==="erreur"?"badge-red":"badge-blue");
-h+="<div><strong>"+d.nom+"</strong> <span class='badge "+bStatCls+"'>"+(d.statut==="non_reconnu"?"Non reconnu":d.statut)+"</span>";
-if(de.type_declaration)h+=" <span class='badge badge-purple'>"+de.type_declaration+"</span>";
-if(de.type_document&&de.type_document!=="inconnu")h+=" <span class='badge badge-teal'>"+de.type_document.replace(/_/g," ")+"</span>";
-h+="</div>";
-h+="<span style='font-size:.8em;color:var(--tx2)'>"+d.date_import.substring(0,10)+" | "+(d.taille/1024).toFixed(1)+" Ko</span></div>";
-if(de.nb_salaries||de.masse_salariale||de.employeur_nom){h+="<div style='margin-top:6px;font-size:.84em;display:flex;gap:12px;flex-wrap:wrap'>";
-if(de.employeur_nom)h+="<span><strong>Employeur:</strong> "+de.employeur_nom+"</span>";
-if(de.employeur_siret)h+="<span>SIRET: "+de.employeur_siret+"</span>";
-if(de.periode)h+="<span><strong>Periode:</strong> "+de.periode+"</span>";
-if(de.nb_salaries)h+="<span><strong>"+de.nb_salaries+"</strong> salarie(s)</span>";
-if(de.nb_cotisations)h+="<span><strong>"+de.nb_cotisations+"</strong> cotisation(s)</span>";
-if(de.masse_salariale)h+="<span><strong>Masse salariale:</strong> "+de.masse_salariale.toFixed(2)+" EUR</span>";
-h+="</div>";}
-if(de.salaries_noms&&de.salaries_noms.length){h+="<div style='margin-top:4px;font-size:.8em;color:var(--tx2)'>Salaries: "+de.salaries_noms.join(", ")+"</div>";}
-var acts=d.actions||[];if(acts.length){h+="<div style='margin-top:6px;font-size:.82em'><strong>Historique :</strong>";
-for(var j=0;j<acts.length;j++){h+=" <span class='badge badge-blue' style='margin:2px'>"+acts[j].action+" ("+acts[j].par+")</span>";}h+="</div>";}
-var errs=d.erreurs_corrigees||[];if(errs.length){h+="<div style='margin-top:6px;font-size:.82em;color:var(--r)'><strong>Corrections :</strong>";
-for(var k=0;k<errs.length;k++){h+=" "+errs[k].champ+": "+errs[k].ancienne_valeur+" -> "+errs[k].nouvelle_valeur;}h+="</div>";}
-h+="<div style='margin-top:8px'><button class='btn btn-s btn-sm btn-corriger' data-docid='"+d.id+"'>Corriger une erreur</button></div>";
-h+="</div>";}
-el.innerHTML=h;el.querySelectorAll(".btn-corriger").forEach(function(btn){btn.addEventListener("click",function(){corrigerDoc(btn.getAttribute("data-docid"));});});}).catch(function(){});}
-
-function corrigerDoc(docId){
-var champ=prompt("Champ a corriger (ex: montant, type, date) :");
-if(!champ)return;
-var ancien=prompt("Ancienne valeur :");
-var nouveau=prompt("Nouvelle valeur :");
-if(!nouveau)return;
-var fd=new FormData();fd.append("champ",champ);fd.append("ancienne_valeur",ancien||"");fd.append("nouvelle_valeur",nouveau);fd.append("corrige_par","utilisateur");
-fetch("/api/documents/bibliotheque/"+docId+"/corriger",{method:"POST",body:fd}).then(function(r){if(!r.ok)throw new Error("Erreur");return r.json();}).then(function(){toast("Correction enregistree.","ok");loadBiblio();}).catch(function(e){toast(e.message);});}
-
-/* === FACTURES === */
-
-var factFile=null;
-var _fiFact=document.getElementById("fi-fact");
-if(_fiFact){_fiFact.addEventListener("change",function(e){factFile=e.target.files[0];if(factFile){document.getElementById("fact-fn").innerHTML="<div class='fi'><span class='nm'>"+factFile.name+"</span></div>";document.getElementById("btn-fact").disabled=false;}});}
-
-function analyserFacture(){
-if(!factFile)return;var fd=new FormData();fd.append("fichier",factFile);
-fetch("/api/factures/analyser",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
-document.getElementById("fact-res").style.display="block";
-var h="<div class='g4'><div class='sc blue'><div class='val'>"+(d.type_document||"?")+"</div><div class='lab'>Type</div></div><div class='sc'><div class='val'>"+(d.montant_ttc||0).toFixed(2)+"</div><div class='lab'>TTC</div></div><div class='sc'><div class='val'>"+((d.confiance||0)*100).toFixed(0)+"%</div><div class='lab'>Confiance</div></div><div class='sc "+(d.ecriture_manuscrite?"amber":"green")+"'><div class='val'>"+(d.ecriture_manuscrite?"Oui":"Non")+"</div><div class='lab'>Manuscrit</div></div></div>";
-if(d.emetteur)h+="<p style='margin:10px 0'><strong>Emetteur :</strong> "+(d.emetteur.nom||"?")+" (SIRET: "+(d.emetteur.siret||"?")+")</p>";
-if(d.lignes&&d.lignes.length){h+="<table style='margin-top:8px'><tr><th>Description</th><th>Qte</th><th>PU</th><th>HT</th></tr>";for(var i=0;i<d.lignes.length;i++){var l=d.lignes[i];h+="<tr><td>"+l.description+"</td><td class='num'>"+l.quantite+"</td><td class='num'>"+l.prix_unitaire.toFixed(2)+"</td><td class='num'>"+l.montant_ht.toFixed(2)+"</td></tr>";}h+="</table>";}
-if(d.type_document)document.getElementById("f-type").value=d.type_document;
-if(d.date_piece)document.getElementById("f-date").value=d.date_piece;
-if(d.numero)document.getElementById("f-num").value=d.numero;
-if(d.emetteur)document.getElementById("f-tiers").value=d.emetteur.nom||"";
-document.getElementById("f-ht").value=d.montant_ht||0;document.getElementById("f-tva").value=d.montant_tva||0;document.getElementById("f-ttc").value=d.montant_ttc||0;
-document.getElementById("fact-det").innerHTML=h;document.getElementById("alerte-justif").style.display="none";
-}).catch(function(e){toast(e.message);});}
-
-function comptabiliserFacture(){
-var hasJustif=!!factFile;if(!hasJustif)document.getElementById("alerte-justif").style.display="flex";
-var fd=new FormData();fd.append("type_doc",document.getElementById("f-type").value);fd.append("date_piece",document.getElementById("f-date").value);fd.append("numero_piece",document.getElementById("f-num").value);fd.append("montant_ht",document.getElementById("f-ht").value||"0");fd.append("montant_tva",document.getElementById("f-tva").value||"0");fd.append("montant_ttc",document.getElementById("f-ttc").value||"0");fd.append("nom_tiers",document.getElementById("f-tiers").value);
-fetch("/api/factures/comptabiliser",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
-var h="<div class='al "+(hasJustif?"ok":"err")+"'><span class='ai'>"+(hasJustif?"&#9989;":"&#9888;")+"</span><span><strong>Ecriture "+(hasJustif?"generee":"sans justificatif")+"</strong> ID: "+d.ecriture_id+"</span></div>";
-h+="<table><tr><th>Compte</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th></tr>";
-for(var i=0;i<d.lignes.length;i++){var l=d.lignes[i];h+="<tr"+(hasJustif?"":" class='sans-just'")+"><td>"+l.compte+"</td><td>"+l.libelle+"</td><td class='num'>"+l.debit.toFixed(2)+"</td><td class='num'>"+l.credit.toFixed(2)+"</td></tr>";}h+="</table>";
-document.getElementById("fact-saisie-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-
-function toggleMontantPaye(){var sel=document.getElementById("pay-stat").value;document.getElementById("pay-montant-row").style.display=(sel==="partiellement_paye")?"block":"none";}
-function majStatutFacture(){
-var statut=document.getElementById("pay-stat").value;
-var fd=new FormData();fd.append("facture_id",document.getElementById("pay-id").value);fd.append("statut",statut);fd.append("date_paiement",document.getElementById("pay-date").value);fd.append("reference_paiement",document.getElementById("pay-ref").value);
-if(statut==="partiellement_paye"){fd.append("montant_paye",document.getElementById("pay-montant").value||"0");}
-fetch("/api/factures/statut",{method:"POST",body:fd}).then(function(r){if(!r.ok)throw new Error("Erreur");return r.json();}).then(function(){toast("Statut mis a jour.","ok");loadPayStatuses();}).catch(function(e){toast(e.message);});}
-
-function loadPayStatuses(){
-fetch("/api/factures/statuts").then(safeJson).then(function(list){
-var el=document.getElementById("pay-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun statut enregistre.</p>";return;}
-var h="<table><tr><th>Facture</th><th>Statut</th><th>Montant paye</th><th>Date paiement</th><th>Reference</th></tr>";
-for(var i=0;i<list.length;i++){var s=list[i];var cls=s.statut==="paye"?"badge-paye":(s.statut==="en_retard"?"badge-red":(s.statut==="partiellement_paye"?"badge-amber":"badge-impaye"));
-var mp=s.montant_paye?s.montant_paye.toFixed(2)+" EUR":"-";
-h+="<tr><td>"+s.facture_id+"</td><td><span class='badge "+cls+"'>"+s.statut.replace(/_/g," ")+"</span></td><td class='num'>"+mp+"</td><td>"+(s.date_paiement||"-")+"</td><td>"+(s.reference_paiement||"-")+"</td></tr>";}
-h+="</table>";el.innerHTML=h;}).catch(function(){});}
-
-/* === DSN GENERATION === */
-var dsnSalaries=[];
-var dsnPreFilled=false;
-function preFillDSN(){
-if(dsnPreFilled||!analysisData||!analysisData.declarations||!analysisData.declarations.length)return;
-var decl=analysisData.declarations[0];
-if(decl.employeur){
-var em=decl.employeur;
-var f1=document.getElementById("dsn-siren-em");
-var f2=document.getElementById("dsn-siren-ent");
-var f3=document.getElementById("dsn-raison");
-var f4=document.getElementById("dsn-nic");
-var f5=document.getElementById("dsn-eff");
-if(f1&&!f1.value&&em.siren)f1.value=em.siren;
-if(f2&&!f2.value&&em.siren)f2.value=em.siren;
-if(f3&&!f3.value&&em.raison_sociale)f3.value=em.raison_sociale;
-if(f4&&!f4.value&&em.siret)f4.value=em.siret.substring(9);
-if(f5&&em.effectif)f5.value=em.effectif;
-}
-if(decl.periode){
-var f6=document.getElementById("dsn-mois");
-if(f6&&!f6.value)f6.value=decl.periode;
-}
-if(decl.salaries&&decl.salaries.length&&!dsnSalaries.length){
-for(var i=0;i<decl.salaries.length;i++){
-var s=decl.salaries[i];
-dsnSalaries.push({nir:s.nir||"",nom:s.nom||"",prenom:s.prenom||"",date_naissance:s.date_naissance||"",brut_mensuel:s.brut_mensuel||0,net_fiscal:s.net_fiscal||0,heures:s.heures||"151.67",statut_conventionnel:s.statut_conventionnel||"02",num_contrat:s.num_contrat||("C"+String(i+1).padStart(4,"0"))});
-}
-renderDSNSalaries();
-}
-dsnPreFilled=true;
-if(decl.employeur||decl.salaries&&decl.salaries.length)toast("Donnees pre-remplies depuis l analyse.","ok");
-}
-function ajouterSalarieDSN(){
-var sal={
-nir:document.getElementById("dsn-nir").value,
-nom:document.getElementById("dsn-nom").value,
-prenom:document.getElementById("dsn-prenom").value,
-date_naissance:document.getElementById("dsn-ddn").value,
-brut_mensuel:parseFloat(document.getElementById("dsn-brut").value)||0,
-net_fiscal:parseFloat(document.getElementById("dsn-net").value)||0,
-heures:document.getElementById("dsn-heures").value,
-statut_conventionnel:document.getElementById("dsn-statut").value,
-num_contrat:document.getElementById("dsn-contrat").value||("C"+String(dsnSalaries.length+1).padStart(4,"0"))
-};
-if(!sal.nir||!sal.nom){toast("NIR et Nom obligatoires.");return;}
-dsnSalaries.push(sal);
-renderDSNSalaries();
-document.getElementById("dsn-nir").value="";document.getElementById("dsn-nom").value="";document.getElementById("dsn-prenom").value="";document.getElementById("dsn-ddn").value="";document.getElementById("dsn-brut").value="";document.getElementById("dsn-net").value="";
-toast(sal.prenom+" "+sal.nom+" ajoute.","ok");
-}
-
-function renderDSNSalaries(){
-document.getElementById("dsn-sal-count").textContent=dsnSalaries.length;
-var el=document.getElementById("dsn-sal-list");
-if(!dsnSalaries.length){el.innerHTML="";return;}
-var h="<table><tr><th>NIR</th><th>Nom</th><th>Prenom</th><th class='num'>Brut</th><th></th></tr>";
-for(var i=0;i<dsnSalaries.length;i++){var s=dsnSalaries[i];
-h+="<tr><td style='font-size:.8em'>"+s.nir+"</td><td>"+s.nom+"</td><td>"+s.prenom+"</td><td class='num'>"+s.brut_mensuel.toFixed(2)+"</td><td><button class='btn btn-red btn-sm btn-dsn-rm' data-idx='"+i+"'>&times;</button></td></tr>";}
-h+="</table>";el.innerHTML=h;
-el.querySelectorAll(".btn-dsn-rm").forEach(function(btn){btn.addEventListener("click",function(){dsnSalaries.splice(parseInt(btn.getAttribute("data-idx")),1);renderDSNSalaries();});});
-}
-
-function genererDSN(){
-if(!dsnSalaries.length){toast("Ajoutez au moins un salarie.");return;}
-var siren_em=document.getElementById("dsn-siren-em").value;
-var siren_ent=document.getElementById("dsn-siren-ent").value;
-var raison=document.getElementById("dsn-raison").value;
-var nic=document.getElementById("dsn-nic").value;
-if(!siren_ent||!raison||!nic){toast("SIREN, raison sociale et NIC obligatoires.");return;}
-var fd=new FormData();
-fd.append("siren_emetteur",siren_em||siren_ent);
-fd.append("siren_entreprise",siren_ent);
-fd.append("raison_sociale",raison);
-fd.append("nic_etablissement",nic);
-fd.append("effectif",document.getElementById("dsn-eff").value);
-fd.append("mois_declaration",document.getElementById("dsn-mois").value);
-fd.append("salaries_json",JSON.stringify(dsnSalaries));
-document.getElementById("btn-dsn-gen").disabled=true;
-fetch("/api/dsn/generer",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
-var h="<div class='al ok'><span class='ai'>&#9989;</span><span><strong>DSN generee</strong> - "+d.nb_salaries+" salarie(s), "+d.nb_lignes+" lignes</span></div>";
-h+="<div class='g3' style='margin:12px 0'><div class='sc blue'><div class='val'>"+d.nb_salaries+"</div><div class='lab'>Salaries</div></div>";
-h+="<div class='sc green'><div class='val'>"+d.total_brut.toFixed(2)+"</div><div class='lab'>Total brut</div></div>";
-h+="<div class='sc amber'><div class='val'>"+d.total_cotisations.toFixed(2)+"</div><div class='lab'>Cotisations</div></div></div>";
-h+="<div class='card' style='margin-top:10px'><h2>Apercu DSN</h2><pre style='background:var(--p);color:#e2e8f0;padding:16px;border-radius:10px;font-size:.78em;overflow-x:auto;white-space:pre-wrap'>"+d.apercu+"</pre></div>";
-h+="<div style='margin-top:12px'><button class='btn btn-blue' onclick='telechargerDSN()'>&#128190; Telecharger le fichier DSN</button></div>";
-document.getElementById("dsn-result").innerHTML=h;
-document.getElementById("dsn-result")._dsnContent=d.contenu_dsn;
-document.getElementById("dsn-result")._dsnMois=d.mois_declaration;
-document.getElementById("dsn-brouillons-card").style.display="block";
-loadDSNBrouillons();
-}).catch(function(e){toast(e.message);}).finally(function(){document.getElementById("btn-dsn-gen").disabled=false;});
-}
-
-function telechargerDSN(){
-var content=document.getElementById("dsn-result")._dsnContent;
-var mois=document.getElementById("dsn-result")._dsnMois||"000000";
-if(!content){toast("Aucune DSN generee.");return;}
-var blob=new Blob([content],{type:"text/plain;charset=utf-8"});
-var a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download="DSN_"+mois+".dsn";a.click();
-toast("Fichier DSN telecharge.","ok");
-}
-
-function loadDSNBrouillons(){
-fetch("/api/dsn/brouillons").then(safeJson).then(function(raw){var list=(raw&&raw.items&&typeof raw.total==="number")?raw.items:raw;
-var el=document.getElementById("dsn-brouillons");
-if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun brouillon.</p>";document.getElementById("dsn-brouillons-card").style.display="none";return;}
-document.getElementById("dsn-brouillons-card").style.display="block";
-var h="<table><tr><th>Date</th><th>Mois</th><th>Entreprise</th><th class='num'>Salaries</th><th class='num'>Brut total</th></tr>";
-for(var i=0;i<list.length;i++){var d=list[i];
-h+="<tr><td style='font-size:.8em'>"+d.date_creation.substring(0,10)+"</td><td>"+d.mois+"</td><td>"+d.raison_sociale+"</td><td class='num'>"+d.nb_salaries+"</td><td class='num'>"+d.total_brut.toFixed(2)+"</td></tr>";}
-h+="</table>";el.innerHTML=h;}).catch(function(){});}
-
-/* === COMPTABILITE === */
-function loadCompta(){try{
-var dd=document.getElementById("gl-dd").value;var df=document.getElementById("gl-df").value;
-
-fetch("/api/comptabilite/journal").then(safeJson).then(function(j){
-var h="";if(!j.length)h="<p style='color:var(--tx2)'>Aucune ecriture.</p>";
-for(var i=0;i<j.length;i++){var e=j[i];
-h+="<div style='border:1px solid var(--brd);border-radius:10px;padding:12px;margin:6px 0' data-ecr-id='"+e.id+"'>";
-h+="<div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:6px;flex-wrap:wrap;gap:4px'><strong>"+e.date+" | "+e.journal+" | "+e.piece+"</strong><span class='badge "+(e.validee?"badge-green":"badge-amber")+"'>"+(e.validee?"Validee":"Brouillon")+"</span></div>";
-if(e.validee){h+="<div style='color:var(--tx2);font-size:.86em;margin-bottom:6px'>"+e.libelle+"</div>";}
-else{h+="<div style='color:var(--tx2);font-size:.86em;margin-bottom:6px;display:flex;align-items:center;gap:6px'><span class='ecr-lib' id='ecr-lib-"+e.id+"'>"+e.libelle+"</span><button class='btn btn-s btn-sm edl-btn' style='padding:2px 8px;font-size:.78em' data-ecr='"+e.id+"' data-span='ecr-lib-"+e.id+"' data-lig='' title='Modifier le libelle'>&#9998;</button></div>";}
-h+="<table><tr><th>Compte</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th></tr>";
-for(var k=0;k<e.lignes.length;k++){var l=e.lignes[k];var sj=l.libelle.indexOf("[SANS JUSTIFICATIF]")>=0;
-if(e.validee){h+="<tr"+(sj?" class='sans-just'":"")+"><td>"+l.compte+"</td><td>"+l.libelle+(sj?" <span class='badge badge-red'>Sans justif.</span>":"")+"</td><td class='num'>"+l.debit.toFixed(2)+"</td><td class='num'>"+l.credit.toFixed(2)+"</td></tr>";}
-else{h+="<tr"+(sj?" class='sans-just'":"")+"><td>"+l.compte+"</td><td style='display:flex;align-items:center;gap:4px'><span id='ecr-lig-"+e.id+"-"+k+"'>"+l.libelle+"</span>"+(sj?" <span class='badge badge-red'>Sans justif.</span>":"")+"<button class='btn btn-s btn-sm edl-btn' style='padding:1px 6px;font-size:.72em' data-ecr='"+e.id+"' data-span='ecr-lig-"+e.id+"-"+k+"' data-lig='"+k+"' title='Modifier'>&#9998;</button></td><td class='num'>"+l.debit.toFixed(2)+"</td><td class='num'>"+l.credit.toFixed(2)+"</td></tr>";}}
-h+="</table></div>";}window._journalData=j;document.getElementById("ct-journal-c").innerHTML=h;filterJournal();}).catch(function(e){document.getElementById("ct-journal-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-
-fetch("/api/comptabilite/balance").then(safeJson).then(function(b){
-var h="";if(!b.length)h="<p style='color:var(--tx2)'>Aucune donnee.</p>";
-else{h="<table><tr><th>Compte</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th><th class='num'>Solde D</th><th class='num'>Solde C</th></tr>";
-for(var i=0;i<b.length;i++){var r2=b[i];h+="<tr><td>"+r2.compte+"</td><td>"+r2.libelle+"</td><td class='num'>"+r2.total_debit.toFixed(2)+"</td><td class='num'>"+r2.total_credit.toFixed(2)+"</td><td class='num'>"+r2.solde_debiteur.toFixed(2)+"</td><td class='num'>"+r2.solde_crediteur.toFixed(2)+"</td></tr>";}h+="</table>";}
-document.getElementById("ct-balance-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-balance-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-
-var glUrl="/api/comptabilite/grand-livre-detail";if(dd)glUrl+="?date_debut="+dd+(df?"&date_fin="+df:"");
-fetch(glUrl).then(safeJson).then(function(gl){
-var h="";if(!gl.length)h="<p style='color:var(--tx2)'>Aucune donnee.</p>";
-for(var i=0;i<gl.length;i++){var c=gl[i];h+="<div style='border:1px solid var(--brd);border-radius:10px;padding:12px;margin:6px 0'><strong>"+c.compte+" - "+(c.libelle||"")+"</strong>";
-var mvts=c.mouvements||[];if(mvts.length){h+="<table style='margin-top:6px'><tr><th>Date</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th></tr>";
-for(var k=0;k<mvts.length;k++){var m=mvts[k];var sj=m.sans_justificatif;h+="<tr"+(sj?" class='sans-just'":"")+"><td>"+(m.date||"")+"</td><td>"+(m.libelle||"")+(sj?" <span class='badge badge-red'>Sans justif.</span>":"")+"</td><td class='num'>"+(m.debit||0).toFixed(2)+"</td><td class='num'>"+(m.credit||0).toFixed(2)+"</td></tr>";}
-h+="</table>";}h+="</div>";}document.getElementById("ct-grandlivre-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-grandlivre-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-
-fetch("/api/comptabilite/compte-resultat").then(safeJson).then(function(cr){
-var clr=cr.resultat_net>=0?"var(--g)":"var(--r)";var bg=cr.resultat_net>=0?"var(--gl)":"var(--rl)";
-var h="<div class='g2'><div class='card' style='text-align:center'><h2>Charges</h2><div style='font-size:1.4em;font-weight:800;color:var(--r)'>"+cr.charges.total.toFixed(2)+" EUR</div></div>";
-h+="<div class='card' style='text-align:center'><h2>Produits</h2><div style='font-size:1.4em;font-weight:800;color:var(--g)'>"+cr.produits.total.toFixed(2)+" EUR</div></div></div>";
-h+="<div class='sc' style='margin-top:14px;background:"+bg+"'><div class='val' style='color:"+clr+"'>"+cr.resultat_net.toFixed(2)+" EUR</div><div class='lab'>Resultat net</div></div>";
-document.getElementById("ct-resultat-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-resultat-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-
-fetch("/api/comptabilite/bilan").then(safeJson).then(function(bi){
-var a=bi.actif,p=bi.passif;
-var h="<div class='g2'><div><h3 style='margin-bottom:8px;color:var(--p)'>Actif</h3><table><tr><th>Poste</th><th class='num'>Montant</th></tr>";
-h+="<tr><td>Immobilisations</td><td class='num'>"+a.immobilisations.toFixed(2)+"</td></tr><tr><td>Stocks</td><td class='num'>"+a.stocks.toFixed(2)+"</td></tr>";
-h+="<tr><td>Creances</td><td class='num'>"+a.creances.toFixed(2)+"</td></tr><tr><td>Tresorerie</td><td class='num'>"+a.tresorerie.toFixed(2)+"</td></tr>";
-h+="<tr style='font-weight:bold;background:var(--pl)'><td>TOTAL ACTIF</td><td class='num'>"+a.total.toFixed(2)+"</td></tr></table></div>";
-h+="<div><h3 style='margin-bottom:8px;color:var(--p)'>Passif</h3><table><tr><th>Poste</th><th class='num'>Montant</th></tr>";
-h+="<tr><td>Capitaux propres</td><td class='num'>"+p.capitaux_propres.toFixed(2)+"</td></tr><tr><td>Dettes financieres</td><td class='num'>"+p.dettes_financieres.toFixed(2)+"</td></tr>";
-h+="<tr><td>Dettes exploitation</td><td class='num'>"+p.dettes_exploitation.toFixed(2)+"</td></tr>";
-h+="<tr style='font-weight:bold;background:var(--pl)'><td>TOTAL PASSIF</td><td class='num'>"+p.total.toFixed(2)+"</td></tr></table></div></div>";
-document.getElementById("ct-bilan-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-bilan-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-
-(function(){var now=new Date();fetch("/api/comptabilite/declaration-tva?mois="+(now.getMonth()+1)+"&annee="+now.getFullYear()).then(safeJson).then(function(t){
-var h="<div class='g3'><div class='sc'><div class='val'>"+t.chiffre_affaires_ht.toFixed(2)+"</div><div class='lab'>CA HT</div></div><div class='sc'><div class='val'>"+t.tva_collectee.toFixed(2)+"</div><div class='lab'>TVA collectee</div></div><div class='sc'><div class='val'>"+t.tva_deductible_totale.toFixed(2)+"</div><div class='lab'>TVA deductible</div></div></div>";
-var net=t.tva_nette_a_payer>0?t.tva_nette_a_payer.toFixed(2)+" EUR a payer":t.credit_tva.toFixed(2)+" EUR credit";
-h+="<div class='sc' style='margin-top:12px'><div class='val'>"+net+"</div><div class='lab'>TVA nette</div></div>";
-document.getElementById("ct-tva-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-tva-c").innerHTML="<p style='color:var(--r)'>Erreur TVA: "+e.message+"</p>";});})();
-
-fetch("/api/comptabilite/charges-sociales-detail").then(safeJson).then(function(soc){
-var h="<div class='g4'>";var ds=soc.destinataires||[];var cls=["blue","amber","green","purple"];
-for(var i=0;i<ds.length;i++){var d=ds[i];h+="<div class='sc "+cls[i%4]+"'><div class='val'>"+(d.montant||0).toFixed(2)+"</div><div class='lab'>"+d.nom+"</div><div style='font-size:.7em;color:var(--tx2);margin-top:3px'>"+d.postes.join(", ")+"</div></div>";}h+="</div>";
-h+="<div class='g3' style='margin-top:12px'><div class='sc'><div class='val'>"+(soc.brut||0).toFixed(2)+"</div><div class='lab'>Bruts</div></div>";
-h+="<div class='sc amber'><div class='val'>"+(soc.total||0).toFixed(2)+"</div><div class='lab'>Total charges</div></div>";
-h+="<div class='sc blue'><div class='val'>"+(soc.cout_employeur||0).toFixed(2)+"</div><div class='lab'>Cout employeur</div></div></div>";
-document.getElementById("ct-social-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-social-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-
-fetch("/api/comptabilite/plan-comptable").then(safeJson).then(function(pc){
-var h="<input placeholder='Rechercher...' oninput='rechPC(this.value)' style='margin-bottom:10px'><table id='pc-t'><tr><th>N</th><th>Libelle</th><th>Classe</th></tr>";
-for(var i=0;i<pc.length;i++){h+="<tr><td>"+pc[i].numero+"</td><td>"+pc[i].libelle+"</td><td>"+pc[i].classe+"</td></tr>";}h+="</table>";
-document.getElementById("ct-plan-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-plan-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
-}catch(e){console.error("loadCompta error:",e);}}
-
-function filterJournal(){var searchEl=document.getElementById("ct-journal-search");if(!searchEl)return;var q=searchEl.value.toLowerCase().trim();var cards=document.querySelectorAll("#ct-journal-c > div[data-ecr-id]");if(!cards.length)return;cards.forEach(function(card){if(!q){card.style.display="";return;}var text=card.textContent.toLowerCase();card.style.display=text.indexOf(q)>=0?"":"none";});}
-
-function rechPC(t){fetch(t?"/api/comptabilite/plan-comptable?terme="+encodeURIComponent(t):"/api/comptabilite/plan-comptable").then(safeJson).then(function(pc){var tb=document.getElementById("pc-t");if(!tb)return;var h="<tr><th>N</th><th>Libelle</th><th>Classe</th></tr>";for(var i=0;i<pc.length;i++){h+="<tr><td>"+pc[i].numero+"</td><td>"+pc[i].libelle+"</td><td>"+pc[i].classe+"</td></tr>";}tb.innerHTML=h;}).catch(function(e){console.error("Plan comptable",e);});}
-function validerEcr(){fetch("/api/comptabilite/valider",{method:"POST"}).then(safeJson).then(function(d){toast("Validees: "+d.nb_validees+(d.erreurs.length?" | Erreurs: "+d.erreurs.join(", "):""),"ok");loadCompta();}).catch(function(e){toast(e.message);});}
-function editLibelle(ecrId,spanId,ligneIdx){var sp=document.getElementById(spanId);if(!sp)return;var old=sp.textContent;var inp=document.createElement("input");inp.type="text";inp.value=old;inp.style.cssText="font-size:.86em;padding:4px 8px;border:1px solid var(--p);border-radius:6px;width:100%;min-width:200px";sp.parentNode.replaceChild(inp,sp);inp.focus();inp.select();function save(){var nv=inp.value.trim();if(!nv||nv===old){var ns=document.createElement("span");ns.id=spanId;ns.textContent=old;inp.parentNode.replaceChild(ns,inp);return;}var body={};if(ligneIdx===null)body.libelle=nv;else{body.lignes={};body.lignes[ligneIdx]=nv;}fetch("/api/comptabilite/ecriture/"+ecrId+"/libelle",{method:"PUT",headers:{"Content-Type":"application/json"},body:JSON.stringify(body)}).then(safeJson).then(function(){var ns=document.createElement("span");ns.id=spanId;ns.textContent=nv;if(inp.parentNode)inp.parentNode.replaceChild(ns,inp);toast("Libelle modifie","ok");}).catch(function(e){toast(e.message||"Erreur");var ns=document.createElement("span");ns.id=spanId;ns.textContent=old;if(inp.parentNode)inp.parentNode.replaceChild(ns,inp);});}inp.addEventListener("keydown",function(ev){if(ev.key==="Enter")save();if(ev.key==="Escape"){var ns=document.createElement("span");ns.id=spanId;ns.textContent=old;inp.parentNode.replaceChild(ns,inp);}});inp.addEventListener("blur",save);}
-document.addEventListener("click",function(ev){var btn=ev.target.closest(".edl-btn");if(!btn)return;var ecrId=btn.getAttribute("data-ecr");var spanId=btn.getAttribute("data-span");var ligStr=btn.getAttribute("data-lig");var ligneIdx=(ligStr==="")?null:parseInt(ligStr,10);editLibelle(ecrId,spanId,ligneIdx);});
-var _sugTimer=null;
-function suggestCompte(inputId,sugId,counterpartId){
-clearTimeout(_sugTimer);_sugTimer=setTimeout(function(){
-var v=document.getElementById(inputId).value;if(v.length<2){closeSugs(sugId);return;}
-fetch("/api/comptabilite/suggestions?compte="+encodeURIComponent(v)+"&description="+encodeURIComponent(v)).then(safeJson).then(function(d){
-var box=document.getElementById(sugId);var items=d.suggestions||[];if(!items.length){closeSugs(sugId);return;}
-var h="<div class='sug-list show'>";for(var i=0;i<items.length&&i<8;i++){var num=items[i].numero;var cp=(d.contreparties||{})[num]||"";var expl=items[i].explication||"";h+="<div class='sug-item' style='flex-direction:column;align-items:flex-start;padding:8px 10px' data-num='"+num+"' data-cp='"+cp+"' data-iid='"+inputId+"' data-sid='"+sugId+"' data-cpid='"+counterpartId+"'><div><span class='sug-num'>"+num+"</span><span class='sug-lbl'>"+items[i].libelle+"</span></div>"+(expl?"<div style='font-size:.78em;color:var(--tx2);margin-top:2px;line-height:1.3'>"+expl+"</div>":"")+"</div>";}
-h+="</div>";box.innerHTML=h;box.querySelectorAll(".sug-item").forEach(function(el){el.addEventListener("click",function(){pickSug(el.getAttribute("data-iid"),el.getAttribute("data-sid"),el.getAttribute("data-num"),el.getAttribute("data-cpid"),el.getAttribute("data-cp"));});});}).catch(function(e){console.error("Suggestion error:",e);});},250);}
-var _sugSearchTimer=null;
-function suggestByDescription(){clearTimeout(_sugSearchTimer);_sugSearchTimer=setTimeout(function(){
-var v=document.getElementById("em-search").value;if(v.length<2){closeSugs("em-search-sug");return;}
-fetch("/api/comptabilite/suggestions?description="+encodeURIComponent(v)).then(safeJson).then(function(d){
-var box=document.getElementById("em-search-sug");var items=d.suggestions||[];if(!items.length){closeSugs("em-search-sug");return;}
-var h="<div class='sug-list show'>";for(var i=0;i<items.length&&i<10;i++){var item=items[i];var expl=item.explication||"";h+="<div class='sug-item' style='flex-direction:column;align-items:flex-start;padding:10px 12px;cursor:pointer' data-num='"+item.numero+"'><div style='display:flex;align-items:center;gap:8px'><span class='sug-num' style='font-size:.95em'>"+item.numero+"</span><span class='sug-lbl' style='font-weight:600;color:var(--tx)'>"+item.libelle+"</span></div>"+(expl?"<div style='font-size:.82em;color:var(--tx2);margin-top:3px;line-height:1.4'>&#128161; "+expl+"</div>":"")+"</div>";}
-h+="</div>";box.innerHTML=h;box.querySelectorAll(".sug-item").forEach(function(el){el.addEventListener("click",function(){var num=el.getAttribute("data-num");document.getElementById("em-deb").value=num;closeSugs("em-search-sug");suggestCompte("em-deb","em-deb-sug","em-cre");});});}).catch(function(){});},300);}
-function pickSug(inputId,sugId,val,cpId,cpVal){document.getElementById(inputId).value=val;closeSugs(sugId);if(cpId&&cpVal){var cpInput=document.getElementById(cpId);if(cpInput&&!cpInput.value)cpInput.value=cpVal;}}
-function closeSugs(sugId){var b=document.getElementById(sugId);if(b)b.innerHTML="";}
-document.addEventListener("click",function(e){if(!e.target.closest(".sug-box")&&!e.target.closest("input")){document.querySelectorAll(".sug-list").forEach(function(s){s.classList.remove("show");});}});
-function creerSousCompte(){var fd=new FormData();fd.append("compte_parent",document.getElementById("sc-parent").value);fd.append("libelle",document.getElementById("sc-lib").value);
-fetch("/api/comptabilite/sous-compte",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){document.getElementById("sc-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Sous-compte <strong>"+d.numero+"</strong> cree: "+d.libelle+"</span></div>";}).catch(function(e){document.getElementById("sc-res").innerHTML="<div class='al err'>"+e.message+"</div>";});}
-function saisirEcriture(){
-var deb=document.getElementById("em-deb").value;var cre=document.getElementById("em-cre").value;
-if(!deb||deb.length<3){toast("Compte debit invalide.");return;}if(!cre||cre.length<3){toast("Compte credit invalide.");return;}
-var fd=new FormData();fd.append("date_piece",document.getElementById("em-date").value);fd.append("libelle",document.getElementById("em-lib").value);fd.append("compte_debit",deb);fd.append("compte_credit",cre);fd.append("montant",document.getElementById("em-mt").value||"0");
-var fj=document.getElementById("em-just-file");fd.append("has_justificatif",fj&&fj.files&&fj.files.length>0?"true":"false");
-fetch("/api/comptabilite/ecriture/manuelle",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
-var cls=d.sans_justificatif?"warn":"ok";var icon=d.sans_justificatif?"&#9888;":"&#9989;";
-document.getElementById("em-res").innerHTML="<div class='al "+cls+"'><span class='ai'>"+icon+"</span><span>"+(d.alerte||"Ecriture enregistree.")+(d.sans_justificatif?" <em style='color:var(--r)'>(justificatif manquant)</em>":"")+"</span></div>";loadCompta();}).catch(function(e){document.getElementById("em-res").innerHTML="<div class='al err'>"+e.message+"</div>";});}
-
-/* === SIMULATION === */
-function simBulletin(){var brut=document.getElementById("sim-brut").value;if(!brut||parseFloat(brut)<=0){toast("Saisissez un salaire brut valide.");return;}var absJ=gv("sim-abs-jours")||"0";var absT=gv("sim-abs-type")||"";fetch("/api/simulation/bulletin?brut_mensuel="+brut+"&effectif="+document.getElementById("sim-eff").value+"&est_cadre="+document.getElementById("sim-cadre").value+"&jours_absence="+absJ+"&type_absence="+encodeURIComponent(absT)).then(safeJson).then(function(r){var h="";if(r.alertes&&r.alertes.length>0){for(var a=0;a<r.alertes.length;a++){var al=r.alertes[a];var cls=al.niveau==="haute"?"err":"warn";h+="<div class='al "+cls+"' style='margin-bottom:8px'><span class='ai'>&#9888;</span><span>"+al.message+"</span></div>";}}h+="<div class='g4'><div class='sc blue'><div class='val'>"+r.brut_mensuel.toFixed(2)+"</div><div class='lab'>Brut contractuel</div></div><div class='sc "+(r.retenue_absences>0?"amber":"blue")+"'><div class='val'>"+r.brut_effectif.toFixed(2)+"</div><div class='lab'>Brut effectif</div></div><div class='sc green'><div class='val'>"+r.net_a_payer.toFixed(2)+"</div><div class='lab'>Net a payer</div></div><div class='sc amber'><div class='val'>"+r.cout_total_employeur.toFixed(2)+"</div><div class='lab'>Cout employeur</div></div></div>";if(r.info_absences){var ab=r.info_absences;var typeLabels={"maladie":"Maladie","at_mp":"AT/Maladie pro.","maternite":"Maternite/Paternite","conge_sans_solde":"Conge sans solde","non_precise":"Non precise"};h+="<div style='margin-top:10px;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--o)'><strong>&#128197; Absences : "+ab.jours+" jour(s) - "+(typeLabels[ab.type]||ab.type)+"</strong><div style='font-size:.84em;margin-top:4px'>Retenue sur brut : <b style=\"color:var(--r)\">-"+ab.retenue_brut.toFixed(2)+" EUR</b> | Brut contractuel : "+ab.brut_contractuel.toFixed(2)+" EUR &rarr; Brut effectif : <b>"+ab.brut_apres_absences.toFixed(2)+" EUR</b>";if(ab.ijss_estimees>0)h+="<br>IJSS estimees : <b style=\"color:#16a34a\">"+ab.ijss_estimees.toFixed(2)+" EUR</b>";if(ab.complement_employeur>0)h+=" | Complement employeur : <b>"+ab.complement_employeur.toFixed(2)+" EUR</b>";h+="</div></div>";}h+="<table style='margin-top:12px'><tr><th>Rubrique</th><th class='num'>Patronal</th><th class='num'>Salarial</th></tr>";var ls=r.lignes||[];for(var i=0;i<ls.length;i++){h+="<tr><td>"+ls[i].libelle+"</td><td class='num'>"+ls[i].montant_patronal.toFixed(2)+"</td><td class='num'>"+ls[i].montant_salarial.toFixed(2)+"</td></tr>";}h+="</table>";document.getElementById("sim-bull-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function ccnAutoSearch(){var t=document.getElementById("ccn-search").value;if(t.length<2){document.getElementById("ccn-search-results").innerHTML="";return;}fetch("/api/simulation/recherche-ccn?terme="+encodeURIComponent(t)).then(safeJson).then(function(r){var box=document.getElementById("ccn-search-results");if(!r.resultats||!r.resultats.length){box.innerHTML="";return;}var container=document.createElement("div");container.style.cssText="background:var(--bg2);border-radius:6px;padding:6px";for(var i=0;i<Math.min(r.resultats.length,8);i++){(function(c){var d=document.createElement("div");d.style.cssText="padding:4px 8px;cursor:pointer;border-radius:4px;font-size:.85em";d.innerHTML="<strong>IDCC "+c.idcc+"<\/strong> - "+c.nom;d.onmouseover=function(){d.style.background="var(--bg3)";};d.onmouseout=function(){d.style.background="";};d.onclick=function(){document.getElementById("ccn-search").value=c.idcc;box.innerHTML="";};container.appendChild(d);})(r.resultats[i]);}box.innerHTML="";box.appendChild(container);}).catch(function(){});}
-function simCCN(){var ccn=document.getElementById("ccn-search").value;if(!ccn){toast("Saisissez un IDCC ou un nom de convention collective");return;}var p="ccn="+encodeURIComponent(ccn)+"&brut_mensuel="+gv("ccn-brut")+"&est_cadre="+gv("ccn-cadre")+"&effectif="+gv("ccn-eff");fetch("/api/simulation/ccn?"+p).then(safeJson).then(function(r){var h="";if(r.ccn_identifiee){h+="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#9989;</span><span><strong>IDCC "+r.idcc+" - "+r.nom_ccn+"</strong>"+(r.secteur?" ("+r.secteur+")":"")+"</span></div>";}else{h+="<div class='al warn' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span><strong>Convention non identifiee</strong> — les minimums legaux sont appliques. Essayez un numero IDCC (ex: 1486).</span></div>";}if(r.alerte_salaire_minimum){var cls=r.alerte_salaire_minimum.niveau==="haute"?"err":"warn";h+="<div class='al "+cls+"' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span>"+r.alerte_salaire_minimum.message+"</span></div>";}h+="<div class='g4'><div class='sc blue'><div class='val'>"+r.bulletin.brut_mensuel.toFixed(2)+"</div><div class='lab'>Brut mensuel</div></div><div class='sc green'><div class='val'>"+r.bulletin.net_avant_impot.toFixed(2)+"</div><div class='lab'>Net avant impot</div></div><div class='sc amber'><div class='val'>"+r.bulletin.cout_total_employeur.toFixed(2)+"</div><div class='lab'>Cout employeur</div></div><div class='sc'><div class='val'>"+r.prevoyance_ccn.montant_mensuel.toFixed(2)+"</div><div class='lab'>Prevoyance CCN/mois</div></div></div>";if(r.salaire_minimum_conventionnel||r.smic_mensuel){h+="<div style='margin:10px 0;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--p)'><strong>&#128176; Salaires minimums applicables</strong><div style='margin-top:6px;font-size:.88em'><span>SMIC legal : <b>"+r.smic_mensuel.toFixed(2)+" EUR/mois</b></span>";if(r.salaire_minimum_conventionnel){h+=" | Minimum conventionnel : <b style='color:"+(r.salaire_minimum_conventionnel>r.smic_mensuel?"#16a34a":"var(--tx)")+"'>"+r.salaire_minimum_conventionnel.toFixed(2)+" EUR/mois</b>";}h+="</div></div>";};h+="<h3 style='margin-top:16px'>&#9878; Obligations conventionnelles vs legales</h3>";if(r.obligations_conventionnelles&&r.obligations_conventionnelles.length>0){h+="<table><thead><tr><th>Obligation</th><th>Disposition conventionnelle</th><th>Minimum legal</th><th>+Favorable?</th></tr></thead><tbody>";for(var i=0;i<r.obligations_conventionnelles.length;i++){var o=r.obligations_conventionnelles[i];var badge=o.plus_favorable===true?"<span style='color:#16a34a'>&#10004; Oui</span>":o.plus_favorable===false?"<span style='color:#dc2626'>&#10008; Non</span>":"<span style='color:#d97706'>&#8212;</span>";h+="<tr><td><strong>"+o.obligation+"</strong></td><td>"+o.conventionnel+"</td><td>"+(o.legal||"-")+"</td><td>"+badge+"</td></tr>";}h+="</tbody></table>";h+="<p style='margin-top:8px;font-size:.85em;color:var(--tx2)'><strong>"+r.nb_obligations_plus_favorables+"</strong> disposition(s) conventionnelle(s) plus favorable(s) que la loi.</p>";}else{h+="<p style='color:var(--tx2);font-style:italic'>Aucune specificite conventionnelle identifiee au-dela du minimum legal.</p>";}h+="<h3 style='margin-top:16px'>&#128214; Rappel obligations legales (Code du travail / ANI)</h3>";if(r.obligations_legales){h+="<table><thead><tr><th>Obligation</th><th>Minimum legal</th></tr></thead><tbody>";for(var j=0;j<r.obligations_legales.length;j++){var ol=r.obligations_legales[j];h+="<tr><td>"+ol.obligation+"</td><td>"+ol.legal+"</td></tr>";}h+="</tbody></table>";}h+="<p style='margin-top:10px;font-size:.83em;color:var(--tx2);font-style:italic'>"+r.rappel+"</p>";document.getElementById("sim-ccn-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simMicro(){fetch("/api/simulation/micro-entrepreneur?chiffre_affaires="+document.getElementById("sim-ca").value+"&activite="+document.getElementById("sim-act").value+"&acre="+document.getElementById("sim-acre").value).then(safeJson).then(function(r){var h="<div class='g4'>";for(var k in r){if(typeof r[k]==="number")h+="<div class='sc'><div class='val'>"+r[k].toFixed(2)+"</div><div class='lab'>"+k.replace(/_/g," ")+"</div></div>";}h+="</div>";document.getElementById("sim-micro-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simTNS(){fetch("/api/simulation/tns?revenu_net="+document.getElementById("sim-rev").value+"&type_statut="+document.getElementById("sim-stat").value+"&acre="+document.getElementById("sim-tacre").value).then(safeJson).then(function(r){var h="<div class='g4'>";for(var k in r){if(typeof r[k]==="number")h+="<div class='sc'><div class='val'>"+r[k].toFixed(2)+"</div><div class='lab'>"+k.replace(/_/g," ")+"</div></div>";}h+="</div>";document.getElementById("sim-tns-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simGUSO(){var p="salaire_brut="+gv("sim-gbrut")+"&nb_heures="+gv("sim-gh")+"&type_contrat="+gv("sim-gtype")+"&est_artiste="+gv("sim-gartiste");fetch("/api/simulation/guso?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+fmtN(r.salaire_brut)+"</div><div class='lab'>Brut "+r.type_contrat+"</div></div><div class='sc green'><div class='val'>"+fmtN(r.net_artiste)+"</div><div class='lab'>Net "+(r.est_artiste?"artiste":"technicien")+"</div></div><div class='sc amber'><div class='val'>"+fmtN(r.total_charges_guso)+"</div><div class='lab'>Total charges GUSO</div></div><div class='sc red'><div class='val'>"+fmtN(r.cout_total_employeur)+"</div><div class='lab'>Cout total employeur</div></div></div>";h+="<h3 style='margin-top:14px'>Detail des cotisations spectacle</h3><table><thead><tr><th>Cotisation</th><th class='num'>Montant</th><th>Base</th></tr></thead><tbody>";h+="<tr><td>Cotisations patronales URSSAF</td><td class='num'>"+fmtN(r.cotisations_patronales_urssaf)+"</td><td>Droit commun</td></tr>";h+="<tr><td><strong>Conge spectacle (15.5%)</strong></td><td class='num'>"+fmtN(r.conge_spectacle_15_5pct)+"</td><td>Obligatoire spectacle</td></tr>";h+="<tr><td>Audiens prevoyance (1.5%)</td><td class='num'>"+fmtN(r.audiens_prevoyance)+"</td><td>CCN Spectacle</td></tr>";h+="<tr><td>Audiens sante (0.82%)</td><td class='num'>"+fmtN(r.audiens_sante)+"</td><td>Complementaire obligatoire</td></tr>";h+="<tr><td>FCAP (0.5%)</td><td class='num'>"+fmtN(r.fcap)+"</td><td>Pole emploi spectacle</td></tr>";h+="<tr><td>Medecine du travail</td><td class='num'>"+fmtN(r.medecine_travail)+"</td><td>0.46 EUR/heure</td></tr>";h+="</tbody></table>";if(r.detail_csg_crds){var csg=r.detail_csg_crds;h+="<h3 style='margin-top:14px'>CSG/CRDS (prelevements salarie)</h3><table><thead><tr><th>Prelevement</th><th class='num'>Montant</th></tr></thead><tbody>";h+="<tr><td>CSG deductible (6.8%)</td><td class='num'>"+fmtN(csg.csg_deductible_6_8)+"</td></tr>";h+="<tr><td>CSG non deductible (2.4%)</td><td class='num'>"+fmtN(csg.csg_non_deductible_2_4)+"</td></tr>";h+="<tr><td>CRDS (0.5%)</td><td class='num'>"+fmtN(csg.crds_0_5)+"</td></tr>";h+="<tr style='font-weight:600'><td>Total CSG/CRDS</td><td class='num'>"+fmtN(csg.total)+"</td></tr>";h+="</tbody></table>";}if(r.rappel){h+="<p style='margin-top:10px;font-size:.83em;color:var(--tx2);font-style:italic'>"+r.rappel+"</p>";}document.getElementById("sim-guso-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simIR(){fetch("/api/simulation/impot-independant?benefice="+document.getElementById("sim-ben").value+"&nb_parts="+document.getElementById("sim-parts").value+"&autres_revenus="+document.getElementById("sim-autres").value).then(safeJson).then(function(r){var h="<div class='g4'>";for(var k in r){if(typeof r[k]==="number")h+="<div class='sc'><div class='val'>"+r[k].toFixed(2)+"</div><div class='lab'>"+k.replace(/_/g," ")+"</div></div>";}h+="</div>";document.getElementById("sim-ir-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simEpargne(){var fd=new FormData();fd.append("type_dispositif",gv("ep-type"));fd.append("masse_salariale_brute",gv("ep-ms"));fd.append("effectif",gv("ep-eff"));fd.append("montant_verse",gv("ep-montant"));fd.append("abondement_pct",gv("ep-abond"));fd.append("plafond_abondement",gv("ep-plaf"));fd.append("taux_forfait_social",gv("ep-fs"));fd.append("benefice_net",gv("ep-bn"));fetch("/api/simulation/epargne-salariale",{method:"POST",body:fd}).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+r.type_dispositif+"</div><div class='lab'>Dispositif</div></div><div class='sc green'><div class='val'>"+fmtN(r.montant_verse)+"</div><div class='lab'>Montant verse</div></div><div class='sc amber'><div class='val'>"+fmtN(r.cout_total_entreprise)+"</div><div class='lab'>Cout total entreprise</div></div><div class='sc green'><div class='val'>"+fmtN(r.economie_entreprise)+"</div><div class='lab'>Economie vs prime ("+r.economie_entreprise_pct+"%)</div></div></div>";h+="<div class='g4' style='margin-top:10px'><div class='sc'><div class='val'>"+fmtN(r.abondement_employeur)+"</div><div class='lab'>Abondement total</div></div><div class='sc'><div class='val'>"+r.taux_forfait_social+"%</div><div class='lab'>Taux forfait social</div></div><div class='sc'><div class='val'>"+fmtN(r.forfait_social)+"</div><div class='lab'>Forfait social</div></div><div class='sc'><div class='val'>"+fmtN(r.deduction_is)+"</div><div class='lab'>Deduction IS</div></div></div>";h+="<h3 style='margin-top:14px'>&#9878; Comparaison prime classique vs epargne salariale</h3><table><thead><tr><th></th><th class='num'>Prime classique</th><th class='num'>Epargne salariale</th><th class='num'>Ecart</th></tr></thead><tbody>";h+="<tr><td>Cout employeur</td><td class='num'>"+fmtN(r.comparaison_prime.cout_total_prime)+"</td><td class='num'>"+fmtN(r.cout_total_entreprise)+"</td><td class='num' style='color:#16a34a'>"+fmtN(r.economie_entreprise)+"</td></tr>";h+="<tr><td>Net percu salarie</td><td class='num'>"+fmtN(r.comparaison_prime.net_salarie_prime)+"</td><td class='num'>"+fmtN(r.net_salarie_epargne)+"</td><td class='num' style='color:#16a34a'>"+fmtN(r.gain_net_salarie)+"</td></tr>";h+="<tr><td>Charges patronales</td><td class='num'>"+fmtN(r.comparaison_prime.charges_patronales)+"</td><td class='num'>"+fmtN(r.forfait_social)+"</td><td class='num'></td></tr>";h+="<tr><td>CSG/CRDS salarie</td><td class='num'>-</td><td class='num'>"+fmtN(r.csg_crds_salarie)+"</td><td class='num'></td></tr>";h+="</tbody></table>";h+="<div class='al ok' style='margin-top:12px'><span class='ai'>&#9989;</span><span><strong>Cout net apres IS : "+fmtN(r.cout_net_apres_is)+" EUR</strong></span></div>";if(r.rappel_regles){h+="<p style='margin-top:8px;font-size:.84em;color:var(--tx2);font-style:italic'>"+r.rappel_regles+"</p>";}document.getElementById("sim-epargne-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function creerContratEpargne(){var fd=new FormData();fd.append("type_dispositif",gv("epc-type"));fd.append("nom_contrat",gv("epc-nom"));fd.append("organisme",gv("epc-org"));fd.append("date_mise_en_place",gv("epc-date"));fd.append("duree_accord",gv("epc-duree"));fd.append("montant_prevu",gv("epc-montant"));fd.append("abondement_pct",gv("epc-abond"));fd.append("plafond_abondement",gv("epc-plaf"));fd.append("beneficiaires",gv("epc-benef"));fd.append("observations",gv("epc-obs"));fetch("/api/epargne-salariale/contrats",{method:"POST",body:fd}).then(safeJson).then(function(r){if(r.ok){toast("Contrat cree avec succes");loadContratsEpargne();}else{toast(r.error||"Erreur");}}).catch(function(e){toast(e.message);});}
-function loadContratsEpargne(){fetch("/api/epargne-salariale/contrats").then(safeJson).then(function(r){var el=document.getElementById("epargne-contrats-list");if(!r.contrats||r.contrats.length===0){el.innerHTML="<p style='color:var(--tx2);font-style:italic'>Aucun contrat enregistre.</p>";return;}var h="<table><thead><tr><th>Type</th><th>Nom</th><th>Organisme</th><th>Date</th><th>Duree</th><th>Montant prevu</th><th>Abond.</th><th>Statut</th><th></th></tr></thead><tbody>";for(var i=0;i<r.contrats.length;i++){var c=r.contrats[i];h+="<tr><td><strong>"+_esc(c.type_dispositif)+"</strong></td><td>"+_esc(c.nom_contrat)+"</td><td>"+_esc(c.organisme)+"</td><td>"+_esc(c.date_mise_en_place)+"</td><td>"+c.duree_accord_ans+" ans</td><td>"+fmtN(c.montant_prevu)+"</td><td>"+c.abondement_pct+"%</td><td><span style='color:#16a34a'>"+_esc(c.statut)+"</span></td><td><button class='btn btn-red' style='padding:2px 8px;font-size:.8em' onclick='supprimerContratEpargne("+JSON.stringify(c.id)+")'>Suppr.</button></td></tr>";}h+="</tbody></table>";el.innerHTML=h;}).catch(function(e){toast(e.message);});}
-function supprimerContratEpargne(id){if(!confirm("Supprimer ce contrat ?"))return;fetch("/api/epargne-salariale/contrats/"+id,{method:"DELETE"}).then(safeJson).then(function(r){if(r.ok){toast("Contrat supprime");loadContratsEpargne();}else{toast(r.error||"Erreur");}}).catch(function(e){toast(e.message);});}
-function simCout(){var p="brut_mensuel="+gv("ce-brut")+"&effectif="+gv("ce-eff")+"&est_cadre="+gv("ce-cadre")+"&primes="+gv("ce-primes")+"&avantages_nature="+gv("ce-avantages")+"&frais_km="+gv("ce-km")+"&tickets_restaurant="+gv("ce-tr")+"&mutuelle_employeur="+gv("ce-mut");fetch("/api/simulation/cout-employeur?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+r.brut_total.toFixed(2)+"</div><div class='lab'>Brut total</div></div><div class='sc green'><div class='val'>"+r.net_a_payer.toFixed(2)+"</div><div class='lab'>Net a payer</div></div><div class='sc amber'><div class='val'>"+r.cout_total_mensuel.toFixed(2)+"</div><div class='lab'>Cout total/mois</div></div><div class='sc'><div class='val'>"+r.cout_total_annuel.toFixed(2)+"</div><div class='lab'>Cout total/an</div></div></div>";h+="<table style='margin-top:12px'><tr><th>Poste</th><th class='num'>Montant</th></tr>";h+="<tr><td>Charges patronales URSSAF</td><td class='num'>"+r.charges_patronales_urssaf.toFixed(2)+"</td></tr>";h+="<tr><td>Charges salariales</td><td class='num'>"+r.charges_salariales.toFixed(2)+"</td></tr>";h+="<tr><td>Formation professionnelle</td><td class='num'>"+r.formation_professionnelle.toFixed(2)+"</td></tr>";h+="<tr><td>Taxe apprentissage</td><td class='num'>"+r.taxe_apprentissage.toFixed(2)+"</td></tr>";h+="<tr><td>Effort construction</td><td class='num'>"+r.effort_construction.toFixed(2)+"</td></tr>";h+="<tr><td>Participation obligatoire</td><td class='num'>"+r.participation_obligatoire.toFixed(2)+"</td></tr>";h+="<tr style='font-weight:600'><td>Total charges annexes</td><td class='num'>"+r.total_charges_annexes.toFixed(2)+"</td></tr>";h+="<tr><td>Avantages nature</td><td class='num'>"+r.avantages_nature.toFixed(2)+"</td></tr>";h+="<tr><td>Frais km rembourses</td><td class='num'>"+r.frais_km_rembourses.toFixed(2)+"</td></tr>";h+="<tr><td>Tickets restaurant</td><td class='num'>"+r.tickets_restaurant.toFixed(2)+"</td></tr>";h+="<tr><td>Mutuelle employeur</td><td class='num'>"+r.mutuelle_employeur.toFixed(2)+"</td></tr>";h+="<tr style='font-weight:600'><td>Total avantages</td><td class='num'>"+r.total_avantages.toFixed(2)+"</td></tr></table>";h+="<div class='g4' style='margin-top:12px'><div class='sc'><div class='val'>"+r.repartition.salaire_net+"%</div><div class='lab'>Salaire net</div></div><div class='sc'><div class='val'>"+r.repartition.charges_salariales+"%</div><div class='lab'>Charges sal.</div></div><div class='sc'><div class='val'>"+r.repartition.charges_patronales+"%</div><div class='lab'>Charges pat.</div></div><div class='sc'><div class='val'>"+r.repartition.annexes_avantages+"%</div><div class='lab'>Annexes+Avantages</div></div></div>";h+="<p style='margin-top:10px;color:var(--tx2);font-size:.84em'>Ratio cout/net : <b>"+r.ratio_cout_net+"x</b> - Pour 1 EUR net verse, l employeur depense "+r.ratio_cout_net+" EUR</p>";document.getElementById("sim-cout-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function toggleLodeom(){var z=gv("exo-zone");document.getElementById("lodeom-bareme-wrap").style.display=z==="outremer"?"block":"none";}
-function simExo(){var p="brut_mensuel="+gv("exo-brut")+"&effectif="+gv("exo-eff")+"&age_salarie="+gv("exo-age")+"&duree_contrat_mois="+gv("exo-duree")+"&zone="+gv("exo-zone")+"&statut_salarie="+gv("exo-statut")+"&heures_supplementaires="+(gv("exo-hs")||"0")+"&ccn="+encodeURIComponent(gv("exo-ccn"))+"&nb_heures_mensuelles="+(gv("exo-heures")||"151.67")+"&temps_partiel_pct="+(gv("exo-tp")||"100")+"&jours_absence="+(gv("exo-abs-jours")||"0")+"&type_absence="+gv("exo-abs-type")+"&bareme_lodeom="+gv("exo-lodeom")+"&est_cadre="+gv("exo-cadre")+"&taux_at="+(gv("exo-at")||"0")+"&nb_salaries_simules="+(gv("exo-nb")||"1")+"&annee="+gv("exo-annee");
-fetch("/api/simulation/exonerations?"+p).then(safeJson).then(function(r){
-var h="<div class='al ok' style='margin-bottom:10px'><span class='ai'>&#128197;</span><span><strong>Baremes "+r.annee_baremes+"</strong> - "+r.baremes_appliques+"</span></div>";
-h+="<div class='g3'><div class='sc green'><div class='val'>"+fmtN(r.total_exonerations_mensuelles)+"</div><div class='lab'>Exonerations/mois</div></div><div class='sc blue'><div class='val'>"+fmtN(r.total_exonerations_annuelles)+"</div><div class='lab'>Exonerations/an</div></div><div class='sc amber'><div class='val'>"+r.economie_pct.toFixed(1)+"%</div><div class='lab'>Economie charges</div></div></div>";
-h+="<div class='g4' style='margin-top:10px'><div class='sc'><div class='val'>"+fmtN(r.charges_patronales_normales)+"</div><div class='lab'>Charges normales</div></div><div class='sc green'><div class='val'>"+fmtN(r.charges_patronales_apres_exo)+"</div><div class='lab'>Charges apres exo</div></div><div class='sc'><div class='val'>"+r.ratio_smic+"</div><div class='lab'>Ratio SMIC</div></div><div class='sc'><div class='val'>"+fmtN(r.smic_retabli)+"</div><div class='lab'>SMIC retabli</div></div></div>";
-// Multi-salaries
-if(r.multi_salaries){var m=r.multi_salaries;h+="<div style='margin-top:10px;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--p)'><strong>&#128101; Simulation groupee ("+m.nb+" salaries identiques)</strong><div class='g3' style='margin-top:8px'><div class='sc green'><div class='val'>"+fmtN(m.total_exonerations_mensuelles)+"</div><div class='lab'>Exo totales/mois</div></div><div class='sc blue'><div class='val'>"+fmtN(m.total_exonerations_annuelles)+"</div><div class='lab'>Exo totales/an</div></div><div class='sc'><div class='val'>"+fmtN(m.charges_normales_totales-m.charges_apres_exo_totales)+"</div><div class='lab'>Economie totale/mois</div></div></div></div>";}
-// Taux patronaux detailles
-if(r.taux_patronal_detaille){var tp=r.taux_patronal_detaille;h+="<div style='margin-top:12px'><details><summary style='cursor:pointer;font-weight:600;font-size:.9em'>&#128200; Detail taux patronaux ("+( tp.total*100).toFixed(2)+"%)"+(r.est_cadre?" - Cadre":" - Non cadre")+"</summary><table style='margin-top:6px'><tr><th>Cotisation</th><th class='num'>Taux</th></tr>";
-for(var k in tp){if(k!=="total")h+="<tr><td>"+k.replace(/_/g," ")+"</td><td class='num'>"+(tp[k]*100).toFixed(2)+"%</td></tr>";}
-h+="<tr style='font-weight:600;background:var(--bg2)'><td>TOTAL</td><td class='num'>"+(tp.total*100).toFixed(2)+"%</td></tr></table></details></div>";}
-// Absences
-if(r.info_absences){var ab=r.info_absences;h+="<div style='margin-top:10px;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--o)'><strong>&#128197; Impact absences ("+ab.jours+" jours - "+ab.type+")</strong><div style='font-size:.84em;margin-top:4px'>Retenue absences: <b>"+fmtN(ab.retenue_absences)+" EUR</b> | Brut contractuel: <b>"+fmtN(ab.brut_contractuel)+" EUR</b> &rarr; Brut apres absences: <b>"+fmtN(ab.brut_apres_absences)+" EUR</b>";if(ab.ijss_estimees>0)h+="<br>IJSS estimees: <b>"+fmtN(ab.ijss_estimees)+" EUR</b>";if(ab.complement_employeur>0)h+=" | Complement employeur: <b>"+fmtN(ab.complement_employeur)+" EUR</b>";h+="<br>"+ab.impact_smic_retabli+" | "+ab.impact_ratio+"</div></div>";}
-// Tableau exonerations
-h+="<table style='margin-top:12px'><tr><th>Exoneration</th><th>Reference</th><th class='num'>Mensuel (EUR)</th><th class='num'>Annuel (EUR)</th><th>Statut</th></tr>";
-var exos=r.exonerations||[];for(var i=0;i<exos.length;i++){var e=exos[i];var cls=e.applicable?"":"color:var(--tx2);opacity:.6";
-var isNonCumul=e.conditions&&e.conditions.indexOf("NON CUMULABLE")>=0;
-h+="<tr style='"+cls+"'><td>"+e.nom+(isNonCumul?" <span class='badge badge-amber' style='font-size:.7em'>Non cumulable</span>":"")+"</td><td style='font-size:.78em'>"+e.reference+"</td><td class='num'>"+e.montant_mensuel.toFixed(2)+"</td><td class='num'>"+e.montant_annuel.toFixed(2)+"</td><td>"+(e.applicable?"<span class='badge badge-green'>Applicable</span>":(isNonCumul?"<span class='badge badge-amber'>Ecartee (non cumul)</span>":"<span class='badge' style='background:var(--bg2)'>Non applicable</span>"))+"</td></tr>";
-if(e.conditions){h+="<tr style='"+cls+"'><td colspan='5' style='font-size:.78em;color:var(--tx2);padding:2px 8px 6px;border-top:none'>"+e.conditions+"</td></tr>";}}
-h+="</table>";
-h+="<p style='margin-top:8px;color:var(--tx2);font-size:.82em'>Zone: "+r.zone+" | Heures contrat: "+r.heures_contrat+"h | TP: "+r.temps_partiel_pct+"% | Presence: "+(r.coeff_presence*100).toFixed(0)+"%"+(r.bareme_lodeom?" | LODEOM: "+r.bareme_lodeom:"")+"</p>";
-document.getElementById("sim-exo-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simMasse(){var p="brut_moyen="+gv("ms-brut")+"&effectif="+gv("ms-eff")+"&augmentation_pct="+gv("ms-aug")+"&inflation_pct="+gv("ms-infl")+"&frais_km_moyen="+gv("ms-km")+"&avantages_nature_moyen="+gv("ms-an")+"&primes_variables_pct="+gv("ms-primes")+"&turnover_pct="+gv("ms-turn");fetch("/api/simulation/masse-salariale?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+fmt(r.masse_actuelle)+"</div><div class='lab'>Masse actuelle</div></div><div class='sc amber'><div class='val'>"+fmt(r.masse_apres_augmentation)+"</div><div class='lab'>Apres augmentation</div></div><div class='sc'><div class='val'>"+fmt(r.cout_global_projete)+"</div><div class='lab'>Cout global projete</div></div><div class='sc "+(r.evolution_pct>0?"red":"green")+"'><div class='val'>"+(r.evolution_pct>0?"+":"")+r.evolution_pct+"%</div><div class='lab'>Evolution</div></div></div>";h+="<table style='margin-top:12px'><tr><th>Poste</th><th class='num'>Montant annuel</th></tr>";h+="<tr><td>Masse actuelle (brut)</td><td class='num'>"+fmt(r.masse_actuelle)+"</td></tr>";h+="<tr><td>Charges patronales actuelles (45%)</td><td class='num'>"+fmt(r.charges_patronales_actuelles)+"</td></tr>";h+="<tr style='font-weight:600'><td>Cout total actuel</td><td class='num'>"+fmt(r.cout_total_actuel)+"</td></tr>";h+="<tr><td colspan='2' style='background:var(--bg2);font-weight:600;padding-top:8px'>Impact augmentation (+"+r.augmentation_pct+"%)</td></tr>";h+="<tr><td>Nouveau brut moyen</td><td class='num'>"+r.nouveau_brut_moyen.toFixed(2)+" EUR/mois</td></tr>";h+="<tr><td>Cout augmentation (brut)</td><td class='num'>"+fmt(r.cout_augmentation_brut)+"</td></tr>";h+="<tr><td>Charges supplementaires</td><td class='num'>"+fmt(r.cout_augmentation_charges)+"</td></tr>";h+="<tr style='font-weight:600'><td>Cout total augmentation</td><td class='num'>"+fmt(r.cout_augmentation_total)+"</td></tr>";h+="<tr><td colspan='2' style='background:var(--bg2);font-weight:600;padding-top:8px'>Autres postes</td></tr>";h+="<tr><td>Perte pouvoir achat (inflation "+r.augmentation_pct+"% vs "+gv("ms-infl")+"%)</td><td class='num'>"+fmt(r.perte_pouvoir_achat_inflation)+"</td></tr>";h+="<tr><td>Ecart augmentation/inflation</td><td class='num'>"+fmt(r.ecart_augmentation_inflation)+"</td></tr>";h+="<tr><td>Primes variables</td><td class='num'>"+fmt(r.primes_variables_total)+"</td></tr>";h+="<tr><td>Charges sur primes</td><td class='num'>"+fmt(r.charges_primes)+"</td></tr>";h+="<tr><td>Frais kilometriques (non soumis)</td><td class='num'>"+fmt(r.frais_km_total)+"</td></tr>";h+="<tr><td>Avantages en nature (soumis)</td><td class='num'>"+fmt(r.avantages_nature_total)+"</td></tr>";h+="<tr><td>Charges sur avantages</td><td class='num'>"+fmt(r.charges_avantages)+"</td></tr>";h+="<tr><td>Cout turnover estime</td><td class='num'>"+fmt(r.cout_turnover_estime)+"</td></tr>";h+="<tr style='font-weight:600;background:var(--bg2)'><td>COUT GLOBAL PROJETE</td><td class='num'>"+fmt(r.cout_global_projete)+"</td></tr></table>";document.getElementById("sim-masse-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simSeuils(){fetch("/api/simulation/seuils-effectif?effectif_actuel="+gv("se-eff")+"&masse_salariale_annuelle="+gv("se-masse")).then(safeJson).then(function(r){var h="";if(r.prochain_seuil){h+="<div class='g3'><div class='sc amber'><div class='val'>"+r.prochain_seuil+"</div><div class='lab'>Prochain seuil</div></div><div class='sc blue'><div class='val'>"+r.marge_avant_seuil+"</div><div class='lab'>Salaries avant seuil</div></div><div class='sc red'><div class='val'>"+fmt(r.cout_prochain_seuil)+"</div><div class='lab'>Cout franchissement</div></div></div>";}h+="<div class='g2' style='margin-top:10px'><div class='sc'><div class='val'>"+r.effectif_actuel+"</div><div class='lab'>Effectif actuel</div></div><div class='sc amber'><div class='val'>"+fmt(r.total_obligations_actuelles)+"</div><div class='lab'>Obligations actuelles</div></div></div>";var seuils=r.seuils||[];for(var i=0;i<seuils.length;i++){var s=seuils[i];var obligs=s.obligations||[];var franchi=obligs.length>0&&obligs[0].franchi;h+="<div style='margin-top:14px;padding:10px;border-radius:8px;background:"+(franchi?"var(--bg2)":"var(--bg1)")+";border:1px solid "+(franchi?"var(--green)":"var(--border)")+"'>";h+="<h3 style='margin:0 0 6px'>"+(franchi?"&#9989; ":"&#9898; ")+"Seuil "+s.seuil+" salaries</h3>";h+="<table style='margin:0'><tr><th>Obligation</th><th>Reference</th><th class='num'>Cout estime</th><th>Detail</th></tr>";for(var j=0;j<obligs.length;j++){var o=obligs[j];h+="<tr><td>"+o.nom+"</td><td style='font-size:.8em'>"+o.reference+"</td><td class='num'>"+fmt(o.cout_estime)+"</td><td style='font-size:.84em;color:var(--tx2)'>"+o.detail+"</td></tr>";}h+="</table></div>";}document.getElementById("sim-seuils-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simFinContrat(){var p="type_fin="+gv("fc-type")+"&salaire_brut="+gv("fc-brut")+"&anciennete_mois="+gv("fc-anc")+"&est_cadre="+gv("fc-cadre")+"&motif="+gv("fc-motif");fetch("/api/simulation/fin-contrat?"+p).then(safeJson).then(function(r){var h="<div class='g3'><div class='sc blue'><div class='val'>"+r.type_fin.replace(/_/g," ")+"</div><div class='lab'>Type</div></div><div class='sc'><div class='val'>"+r.anciennete_ans+" ans</div><div class='lab'>Anciennete</div></div><div class='sc red'><div class='val'>"+fmt(r.cout_total)+"</div><div class='lab'>Cout total</div></div></div>";h+="<table style='margin-top:12px'><tr><th>Poste</th><th class='num'>Montant</th></tr>";var skip={"type_fin":1,"salaire_brut":1,"anciennete_mois":1,"anciennete_ans":1,"cout_total":1,"reference":1,"motif":1,"note":1,"exceptions":1};for(var k in r){if(!skip[k]&&typeof r[k]==="number"){h+="<tr><td>"+k.replace(/_/g," ")+"</td><td class='num'>"+r[k].toFixed(2)+"</td></tr>";}}h+="<tr style='font-weight:600;background:var(--bg2)'><td>COUT TOTAL</td><td class='num'>"+r.cout_total.toFixed(2)+"</td></tr></table>";if(r.reference)h+="<p style='margin-top:8px;font-size:.82em;color:var(--tx2)'>Ref: "+r.reference+"</p>";if(r.note)h+="<p style='font-size:.82em;color:var(--amber)'>"+r.note+"</p>";if(r.exceptions)h+="<p style='font-size:.82em;color:var(--tx2)'>"+r.exceptions+"</p>";document.getElementById("sim-fc-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simOptim(){var p="benefice_net="+gv("op-benef")+"&remuneration_gerant="+gv("op-rem")+"&dividendes="+gv("op-div")+"&interessement="+gv("op-int")+"&participation="+gv("op-part")+"&frais_pro="+gv("op-frais")+"&pee_abondement="+gv("op-pee")+"&nb_parts="+gv("op-parts")+"&forme_juridique="+gv("op-forme");fetch("/api/simulation/optimisation?"+p).then(safeJson).then(function(r){var h="";h+="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#127942;</span><span><strong>Meilleur scenario : "+r.meilleur_scenario+"</strong> — ecart max entre scenarios : <b>"+fmtN(r.ecart_max)+" EUR</b></span></div>";var sc=r.scenarios||[];for(var i=0;i<sc.length;i++){var s=sc[i];var isBest=s.nom===r.meilleur_scenario;var border=isBest?"border:2px solid #16a34a;":"border:1px solid var(--border);";h+="<div style='"+border+"border-radius:10px;padding:14px;margin-bottom:14px;background:var(--bg1)'>";h+="<div style='display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:8px'>";h+="<h3 style='margin:0;font-size:1em'>"+(isBest?"&#127942; ":"")+"Scenario "+(i+1)+" : "+s.nom+"</h3>";h+="<div style='font-size:1.2em;font-weight:700;color:"+(isBest?"#16a34a":"var(--tx)")+"'>"+fmtN(s.net_disponible)+" EUR net</div></div>";if(s.description){h+="<p style='margin:6px 0 10px;font-size:.84em;color:var(--tx2)'>"+s.description+"</p>";}h+="<div class='g3' style='margin-bottom:8px'><div class='sc blue'><div class='val'>"+fmtN(s.salaire_brut)+"</div><div class='lab'>Salaire brut annuel</div></div><div class='sc amber'><div class='val'>"+fmtN(s.charges_sociales)+"</div><div class='lab'>Charges patronales</div></div><div class='sc green'><div class='val' style='font-size:1.1em'>"+fmtN(s.net_disponible)+"</div><div class='lab'>Net disponible</div></div></div>";h+="<table style='margin:0'><thead><tr><th>Poste</th><th class='num'>Montant (EUR)</th><th>Detail</th></tr></thead><tbody>";h+="<tr><td>Salaire brut annuel</td><td class='num'>"+fmtN(s.salaire_brut)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+fmtN(s.salaire_brut/12)+" EUR/mois</td></tr>";h+="<tr><td>Charges patronales (42%)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.charges_sociales)+"</td><td style='font-size:.82em;color:var(--tx2)'>A la charge de l entreprise</td></tr>";h+="<tr><td>IS (Impot sur les societes)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.is_entreprise||0)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+(s.is_entreprise>0?"15% jusqu a 42 500 EUR puis 25%":"Pas d IS (tout en salaire)")+"</td></tr>";h+="<tr><td>Dividendes distribues</td><td class='num'>"+fmtN(s.dividendes||0)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+(s.dividendes>0?"Apres IS, nets de l entreprise":"")+"</td></tr>";h+="<tr><td>PFU sur dividendes (30%)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.pfu_dividendes||0)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+(s.pfu_dividendes>0?"Flat tax : 12.8% IR + 17.2% PS":"")+"</td></tr>";if(s.interessement){h+="<tr><td>Interessement</td><td class='num'>"+fmtN(s.interessement)+"</td><td style='font-size:.82em;color:var(--tx2)'>Exonere d IR si PEE (bloque 5 ans)</td></tr>";}if(s.participation){h+="<tr><td>Participation</td><td class='num'>"+fmtN(s.participation)+"</td><td style='font-size:.82em;color:var(--tx2)'>Exoneree d IR si PEE (bloquee 5 ans)</td></tr>";}if(s.abondement_pee){h+="<tr><td>Abondement PEE</td><td class='num'>"+fmtN(s.abondement_pee)+"</td><td style='font-size:.82em;color:var(--tx2)'>Plafond 2026 : 3 709 EUR</td></tr>";}if(s.forfait_social){h+="<tr><td>Forfait social (20%)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.forfait_social)+"</td><td style='font-size:.82em;color:var(--tx2)'>Sur epargne salariale</td></tr>";}h+="<tr><td>IR (Impot sur le revenu)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.ir)+"</td><td style='font-size:.82em;color:var(--tx2)'>Bareme progressif "+r.forme_juridique.toUpperCase()+"</td></tr>";h+="<tr style='font-weight:700;background:var(--bg2)'><td>NET DISPONIBLE</td><td class='num' style='color:#16a34a;font-size:1.05em'>"+fmtN(s.net_disponible)+"</td><td style='font-size:.82em'>Somme percue apres tous prelevements</td></tr>";h+="</tbody></table>";h+="<div style='margin-top:6px;font-size:.82em;color:var(--tx2)'>&#128737; Protection sociale : "+s.protection_sociale+"</div>";if(s.tresorerie_residuelle>0){h+="<div style='margin-top:4px;font-size:.82em;color:var(--tx2)'>&#128176; Tresorerie residuelle en entreprise : "+fmtN(s.tresorerie_residuelle)+" EUR</div>";}h+="</div>";}if(r.frais_professionnels){var fp=r.frais_professionnels;h+="<div style='margin-top:14px;padding:10px;background:var(--bg2);border-radius:8px'><h3 style='margin:0 0 6px'>Frais professionnels deductibles</h3>";h+="<p style='margin:0 0 6px;font-size:.84em'>Frais declares: <b>"+fp.frais_declares.toFixed(2)+" EUR</b> - Economie IS: <b>"+fp.economie_is.toFixed(2)+" EUR</b></p>";h+="<div style='font-size:.84em;color:var(--tx2)'>Types eligibles: "+fp.types_eligibles.join(" | ")+"</div></div>";}document.getElementById("sim-optim-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-function simRisques(){var p="code_naf="+encodeURIComponent(gv("rs-naf"))+"&effectif="+gv("rs-eff")+"&masse_salariale="+gv("rs-masse");fetch("/api/simulation/risques-sectoriels?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+r.secteur+"</div><div class='lab'>Secteur</div></div><div class='sc amber'><div class='val'>"+r.taux_at_moyen+"%</div><div class='lab'>Taux AT moyen</div></div><div class='sc red'><div class='val'>"+fmt(r.cout_at_annuel)+"</div><div class='lab'>Cout AT annuel</div></div><div class='sc'><div class='val'>"+r.effectif+"</div><div class='lab'>Effectif</div></div></div>";h+="<div style='margin-top:14px'><h3>Risques specifiques du secteur</h3><ul style='margin:6px 0;padding-left:20px'>";var rs=r.risques_specifiques||[];for(var i=0;i<rs.length;i++)h+="<li style='margin:3px 0'>"+rs[i]+"</li>";h+="</ul></div>";h+="<h3 style='margin-top:14px'>Risques financiers</h3><table><tr><th>Risque</th><th class='num'>Impact estime</th><th>Detail</th></tr>";var rf=r.risques_financiers||[];for(var i=0;i<rf.length;i++){h+="<tr><td>"+rf[i].risque+"</td><td class='num'>"+fmt(rf[i].impact_estime)+"</td><td style='font-size:.84em'>"+rf[i].detail+"</td></tr>";}h+="</table>";h+="<h3 style='margin-top:14px'>Subventions eligibles</h3><table><tr><th>Subvention</th><th class='num'>Montant max</th><th>Condition</th></tr>";var sb=r.subventions_eligibles||[];for(var i=0;i<sb.length;i++){h+="<tr><td>"+sb[i].nom+"</td><td class='num'>"+fmt(sb[i].montant_max)+"</td><td style='font-size:.84em'>"+sb[i].condition+"</td></tr>";}h+="</table>";h+="<div style='margin-top:12px;padding:10px;background:var(--bg2);border-radius:8px'><h3 style='margin:0 0 6px'>Recommandations</h3><ul style='margin:0;padding-left:20px'>";var rc=r.recommandations||[];for(var i=0;i<rc.length;i++)h+="<li style='margin:3px 0'>"+rc[i]+"</li>";h+="</ul></div>";document.getElementById("sim-risques-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
-
-/* === SUBVENTIONS === */
-var _subData=null;
-function rechercherSubventions(){
-var p="code_naf="+encodeURIComponent(gv("sub-naf"))+"&effectif="+gv("sub-eff")+"&forme_juridique="+encodeURIComponent(document.getElementById("sub-forme").value)+"&region="+encodeURIComponent(document.getElementById("sub-region").value)+"&zone="+encodeURIComponent(document.getElementById("sub-zone").value)+"&ca="+(gv("sub-ca")||0)+"&age_entreprise="+(gv("sub-age")||5)+"&masse_salariale="+(gv("sub-masse")||0)+"&innovation="+(document.getElementById("sub-innovation").checked)+"&environnement="+(document.getElementById("sub-environnement").checked)+"&numerique="+(document.getElementById("sub-numerique").checked)+"&export_intl="+(document.getElementById("sub-export").checked)+"&formation="+(document.getElementById("sub-formation").checked)+"&creation_reprise="+(document.getElementById("sub-creation-reprise").checked)+"&investissement="+(document.getElementById("sub-investissement").checked)+"&ess="+(document.getElementById("sub-ess").checked);
-fetch("/api/subventions/recherche?"+p).then(safeJson).then(function(r){
-_subData=r;
-document.getElementById("sub-results").style.display="block";
-document.getElementById("sub-total").textContent=r.total;
-document.getElementById("sub-montant").textContent=fmt(r.montant_potentiel_estime||0)+(r.nb_aides_chiffrees?" ("+r.nb_aides_chiffrees+" aides estimees)":"");
-document.getElementById("sub-nationales").textContent=r.par_niveau.national||0;
-document.getElementById("sub-europeennes").textContent=r.par_niveau.europeen||0;
-afficherSubventions(r.aides);
-}).catch(function(e){toast(e.message||"Erreur recherche subventions");});
-}
-function afficherSubventions(aides){
-var container=document.getElementById("sub-liste");
-if(!aides||aides.length===0){container.innerHTML="<div class='al info'><span class='ai'>&#128161;</span><span>Aucune aide trouvee avec ces criteres. Essayez d elargir vos criteres de recherche.</span></div>";document.getElementById("sub-recapitulatif").style.display="none";return;}
-var h="";
-var niveauColors={"national":"blue","regional":"purple","europeen":"teal","local":"amber"};
-var typeLabels={"subvention":"Subvention","credit_impot":"Credit d impot","exoneration":"Exoneration","pret":"Pret / Avance","garantie":"Garantie","accompagnement":"Accompagnement"};
-var catLabels={"innovation":"Innovation / R&D","environnement":"Environnement","emploi":"Emploi / Formation","numerique":"Numerique","export":"Export","creation":"Creation / Reprise","investissement":"Investissement","fiscal":"Avantage fiscal","social":"Exoneration sociale","ess":"ESS / Impact"};
-for(var i=0;i<aides.length;i++){var a=aides[i];
-var nc=niveauColors[a.niveau]||"blue";
-h+="<div class='card sub-toggle' style='cursor:pointer;border-left:4px solid var(--"+(nc==="blue"?"p3":nc==="purple"?"pu":nc==="teal"?"tl":"o")+")'>";
-h+="<div style='display:flex;justify-content:space-between;align-items:flex-start;flex-wrap:wrap;gap:8px'>";
-h+="<div><h2 style='margin-bottom:4px'>"+a.nom+"</h2><div style='font-size:.82em;color:var(--tx2)'>"+a.organisme+"</div></div>";
-h+="<div style='display:flex;gap:6px;flex-wrap:wrap'>";
-h+="<span class='badge badge-"+nc+"'>"+a.niveau.charAt(0).toUpperCase()+a.niveau.slice(1)+"</span>";
-h+="<span class='badge badge-green'>"+(typeLabels[a.type_aide]||a.type_aide)+"</span>";
-h+="<span class='badge badge-blue'>"+(catLabels[a.categorie]||a.categorie)+"</span>";
-h+="</div></div>";
-h+="<div style='margin-top:8px;font-size:.88em;color:var(--tx)'>"+a.description+"</div>";
-h+="<div style='margin-top:8px;display:flex;gap:16px;flex-wrap:wrap'>";
-h+="<div style='font-size:.84em'><strong>Montant max :</strong> "+a.montant_max+"</div>";
-if(a.montant_estime)h+="<div style='font-size:.84em;color:var(--g)'><strong>Estimation pour vous :</strong> "+fmt(a.montant_estime)+"</div>";
-h+="</div>";
-h+="<div class='sub-detail' style='display:none;margin-top:12px;padding-top:12px;border-top:1px solid var(--brd)'>";
-h+="<h3 style='font-size:.9em;margin-bottom:6px'>Conditions d eligibilite :</h3><ul style='padding-left:20px;margin:0'>";
-var conds=a.conditions||[];for(var c=0;c<conds.length;c++)h+="<li style='font-size:.84em;margin:3px 0;color:var(--tx)'>"+conds[c]+"</li>";
-h+="</ul>";
-if(a.tailles&&a.tailles.length){h+="<div style='margin-top:8px;font-size:.82em'><strong>Tailles eligibles :</strong> ";var tl=[];for(var t=0;t<a.tailles.length;t++){var labels={"tpe":"TPE","pme":"PME","eti":"ETI","ge":"GE"};tl.push(labels[a.tailles[t]]||a.tailles[t]);}h+=tl.join(", ")+"</div>";}
-if(a.url_info)h+="<div style='margin-top:8px'><a href='"+a.url_info+"' target='_blank' rel='noopener' style='font-size:.84em;color:var(--p3)'>En savoir plus &#8599;</a></div>";
-h+="</div></div>";
-}
-container.innerHTML=h;
-// Recap table
-var recap=document.getElementById("sub-recapitulatif");recap.style.display="block";
-var tb=document.getElementById("sub-recap-table");
-var rows="<tr><th>Aide</th><th>Niveau</th><th>Type</th><th>Montant max</th><th>Organisme</th><th>Eligibilite</th></tr>";
-for(var i=0;i<aides.length;i++){var a=aides[i];
-rows+="<tr><td><strong>"+a.nom+"</strong></td><td><span class='badge badge-"+(niveauColors[a.niveau]||"blue")+"'>"+a.niveau+"</span></td><td>"+(typeLabels[a.type_aide]||a.type_aide)+"</td><td class='num'>"+a.montant_max+"</td><td style='font-size:.84em'>"+a.organisme+"</td><td style='font-size:.78em'>"+((a.conditions||[]).slice(0,2).join("; "))+"</td></tr>";}
-tb.innerHTML=rows;
-}
-function filtrerSubventions(){
-if(!_subData)return;
-var niv=document.getElementById("sub-filtre-niveau").value;
-var cat=document.getElementById("sub-filtre-cat").value;
-var typ=document.getElementById("sub-filtre-type").value;
-var tai=document.getElementById("sub-filtre-taille").value;
-var filtered=_subData.aides.filter(function(a){
-if(niv&&a.niveau!==niv)return false;
-if(cat&&a.categorie!==cat)return false;
-if(typ&&a.type_aide!==typ)return false;
-if(tai&&a.tailles&&a.tailles.indexOf(tai)<0)return false;
-return true;
-});
-afficherSubventions(filtered);
-}
-function exportSubventions(){
-if(!_subData||!_subData.aides)return;
-var csv="Nom;Organisme;Niveau;Categorie;Type;Montant max;Conditions\\n";
-for(var i=0;i<_subData.aides.length;i++){var a=_subData.aides[i];csv+='"'+a.nom+'";"'+a.organisme+'";"'+a.niveau+'";"'+a.categorie+'";"'+a.type_aide+'";"'+a.montant_max+'";"'+((a.conditions||[]).join(", "))+'"\\n';}
-var b=new Blob([csv],{type:"text/csv;charset=utf-8"});var u=URL.createObjectURL(b);var l=document.createElement("a");l.href=u;l.download="subventions_eligibles.csv";l.click();URL.revokeObjectURL(u);
-}
-function imprimerSubventions(){window.print();}
-function prefillSubventions(){
-try{
-fetch("/api/config/entete").then(safeJson).then(function(cfg){
-if(cfg.code_naf)document.getElementById("sub-naf").value=cfg.code_naf;
-if(cfg.forme_juridique){var sel=document.getElementById("sub-forme");for(var i=0;i<sel.options.length;i++){if(sel.options[i].value&&cfg.forme_juridique.toUpperCase().indexOf(sel.options[i].value)>=0){sel.selectedIndex=i;break;}}}
-}).catch(function(){});
-}catch(e){}
-}
-
-/* === VEILLE === */
-function _toggleBaremesDetails(btn,count){var el=document.getElementById("v-baremes-full");if(!el)return;if(el.style.display==="none"){el.style.display="block";btn.textContent="Masquer les details";}else{el.style.display="none";btn.textContent="Afficher tous les baremes ("+count+")";}}
-function loadVeille(){var a=document.getElementById("v-annee").value;document.getElementById("v-res").style.display="block";
-fetch("/api/veille/baremes/"+a).then(safeJson).then(function(b){var keys=Object.keys(b);var essentiels=["pass_annuel","pass_mensuel","smic_horaire","smic_mensuel","taux_maladie_patronal","taux_vieillesse_plafonnee_patronal","taux_af_patronal","taux_at_moyen","taux_chomage_patronal","taux_csg_deductible","taux_crds"];var h="<table><tr><th>Parametre</th><th class='num'>Valeur</th></tr>";var hFull="";var nbShown=0;for(var i=0;i<keys.length;i++){var k=keys[i];var row="<tr><td>"+k.replace(/_/g," ")+"</td><td class='num'>"+b[k]+"</td></tr>";if(essentiels.indexOf(k)>=0){h+=row;nbShown++;}else{hFull+=row;}}h+="</table>";if(hFull){h+="<div id='v-baremes-full' style='display:none'><table><tr><th>Parametre</th><th class='num'>Valeur</th></tr>"+hFull+"</table></div>";h+="<button class='btn btn-s btn-sm' style='margin-top:8px' onclick='_toggleBaremesDetails(this,"+keys.length+")'>"+"Afficher tous les baremes ("+keys.length+")</button>";}document.getElementById("v-baremes").innerHTML=h;}).catch(function(){});
-fetch("/api/veille/legislation/"+a).then(safeJson).then(function(l){var h="<p style='margin-bottom:10px'><strong>"+l.description+"</strong></p>";var tx=l.textes_cles||[];for(var i=0;i<tx.length;i++){h+="<div class='al info' style='margin:4px 0'><span class='ai'>&#9878;</span><span><strong>"+tx[i].reference+"</strong> - "+tx[i].titre+"<br><small>"+tx[i].resume+"</small></span></div>";}document.getElementById("v-legis").innerHTML=h;}).catch(function(){});}
-function compAnnees(){var a2=parseInt(document.getElementById("v-annee").value),a1=a2-1;fetch("/api/veille/baremes/comparer/"+a1+"/"+a2).then(safeJson).then(function(d){if(!d.length){toast("Pas de differences.","info");return;}var h="<table><tr><th>Parametre</th><th class='num'>"+a1+"</th><th class='num'>"+a2+"</th><th>Evolution</th></tr>";for(var i=0;i<d.length;i++){h+="<tr><td>"+d[i].parametre+"</td><td class='num'>"+(d[i]["valeur_"+a1]||"-")+"</td><td class='num'>"+(d[i]["valeur_"+a2]||"-")+"</td><td>"+d[i].evolution+"</td></tr>";}h+="</table>";document.getElementById("v-comp").innerHTML=h;document.getElementById("v-comp-card").style.display="block";}).catch(function(e){toast(e.message);});}
-
-/* === PORTEFEUILLE === */
-var _tiStatutLabels={"gerant_majoritaire":"Gerant majoritaire","micro_entrepreneur":"Micro-entrepreneur","profession_liberale":"Profession liberale","entreprise_individuelle_ir":"EI (IR)","entreprise_individuelle_is":"EI (IS)","artisan":"Artisan","commercant":"Commercant"};
-
-function ajouterEnt(){var fd=new FormData();fd.append("siret",document.getElementById("ent-siret").value);fd.append("raison_sociale",document.getElementById("ent-raison").value);fd.append("forme_juridique",document.getElementById("ent-forme").value);fd.append("code_naf",document.getElementById("ent-naf").value);fd.append("effectif",document.getElementById("ent-eff").value||"0");fd.append("ville",document.getElementById("ent-ville").value);
-fetch("/api/entreprises",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(){toast("Entreprise ajoutee !","ok");rechEnt();document.getElementById("ent-siret").value="";document.getElementById("ent-raison").value="";}).catch(function(e){toast(e.message);});}
-
-function rechEnt(){var q=(document.getElementById("ent-search")||{}).value||"";
-fetch("/api/entreprises?q="+encodeURIComponent(q)).then(safeJson).then(function(d){
-var el=document.getElementById("ent-list");if(!d.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune entreprise.</p>";return;}
-var h="";for(var i=0;i<d.length;i++){var e=d[i];
-h+="<div class='ent-item'><div style='display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:4px'><strong>"+e.raison_sociale+"</strong>";
-if(e.forme_juridique)h+="<span class='badge badge-blue'>"+e.forme_juridique+"</span>";
-h+="<span class='badge badge-green' style='font-size:.7em'>Employeur</span>";
-h+="</div><div style='font-size:.84em;color:var(--tx2);margin-top:4px'>SIRET: "+e.siret;
-if(e.ville)h+=" | "+e.ville;if(e.code_naf)h+=" | NAF: "+e.code_naf;
-if(e.effectif)h+=" | "+e.effectif+" sal.";h+="</div></div>";}
-el.innerHTML=h;}).catch(function(){});}
-
-/* === T.I. (Travailleur Independant) === */
-function ajouterTI(){var fd=new FormData();
-fd.append("type_statut",document.getElementById("ti-statut").value);
-fd.append("siret",document.getElementById("ti-siret").value);
-fd.append("code_naf",document.getElementById("ti-naf").value);
-fd.append("activite",document.getElementById("ti-activite").value);
-fd.append("regime_fiscal",document.getElementById("ti-regime").value);
-fd.append("caisse_retraite",document.getElementById("ti-caisse").value);
-fd.append("acre",document.getElementById("ti-acre").value);
-fd.append("option_is",document.getElementById("ti-is").value);
-fd.append("tva_franchise",document.getElementById("ti-tva").value);
-fd.append("annee_creation",document.getElementById("ti-annee").value||"0");
-fd.append("chiffre_affaires_annuel",document.getElementById("ti-ca").value||"0");
-fd.append("benefice_annuel",document.getElementById("ti-benefice").value||"0");
-fd.append("remuneration_nette",document.getElementById("ti-remun").value||"0");
-fetch("/api/independants",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(){toast("Profil T.I. ajoute !","ok");rechTI();}).catch(function(e){toast(e.message);});}
-
-function rechTI(){var q=(document.getElementById("ti-search")||{}).value||"";
-fetch("/api/independants?q="+encodeURIComponent(q)).then(safeJson).then(function(d){
-var el=document.getElementById("ti-list");if(!d.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun profil T.I. enregistre.</p>";return;}
-var h="";for(var i=0;i<d.length;i++){var t=d[i];var label=_tiStatutLabels[t.type_statut]||t.type_statut;
-h+="<div class='ent-item' style='border-left:3px solid var(--b)'><div style='display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:4px'>";
-h+="<strong>"+(t.activite||label)+"</strong>";
-h+="<span class='badge badge-amber'>"+label+"</span>";
-h+="<span class='badge' style='background:var(--p);color:#fff;font-size:.7em'>T.I.</span>";
-h+="</div><div style='font-size:.84em;color:var(--tx2);margin-top:4px'>";
-if(t.siret)h+="SIRET: "+t.siret+" | ";
-if(t.code_naf)h+="NAF: "+t.code_naf+" | ";
-if(t.regime_fiscal)h+="Regime: "+t.regime_fiscal+" | ";
-if(t.chiffre_affaires_annuel)h+="CA: "+fmtN(t.chiffre_affaires_annuel)+" EUR | ";
-if(t.acre)h+="<span class='badge badge-green' style='font-size:.72em'>ACRE</span> ";
-h+="</div><div style='display:flex;gap:6px;margin-top:8px'>";
-h+="<button class='btn btn-s btn-sm' data-action='dashTI' data-id='"+t.id+"'>&#128202; Dashboard</button>";
-h+="<button class='btn btn-sm' style='background:var(--r);color:#fff' data-action='suppTI' data-id='"+t.id+"'>&#128465; Supprimer</button>";
-h+="</div></div>";}
-el.innerHTML=h;}).catch(function(){});}
-
-function supprimerTI(id){if(!confirm("Supprimer ce profil T.I. ?"))return;
-fetch("/api/independants/"+id,{method:"DELETE"}).then(safeJson).then(function(){toast("Profil T.I. supprime.","ok");rechTI();}).catch(function(e){toast(e.message);});}
-
-function voirDashTI(id){
-fetch("/api/independants/"+id+"/dashboard").then(safeJson).then(function(d){
-var p=d.profil;var c=d.cotisations_estimees||{};var label=_tiStatutLabels[p.type_statut]||p.type_statut;
-var h="<div class='card' style='border-left:4px solid var(--p)'><h2>&#128188; "+label;
-if(p.activite)h+=" - "+p.activite;h+="</h2>";
-h+="<div class='g3' style='margin:12px 0'>";
-if(p.siret)h+="<div><strong>SIRET</strong><br>"+p.siret+"</div>";
-if(p.regime_fiscal)h+="<div><strong>Regime fiscal</strong><br>"+p.regime_fiscal+"</div>";
-if(p.caisse_retraite)h+="<div><strong>Caisse retraite</strong><br>"+p.caisse_retraite+"</div>";
-if(p.annee_creation)h+="<div><strong>Annee creation</strong><br>"+p.annee_creation+"</div>";
-h+="<div><strong>ACRE</strong><br>"+(p.acre?"Oui":"Non")+"</div>";
-h+="<div><strong>Franchise TVA</strong><br>"+(p.tva_franchise?"Oui":"Non")+"</div>";
-h+="</div>";
-if(c.total_cotisations!==undefined){
-h+="<h3 style='margin-top:16px'>&#128176; Cotisations sociales estimees</h3>";
-h+="<table><tr><th>Poste</th><th class='num'>Montant (EUR)</th></tr>";
-for(var k in c){if(k==="base_ca"||k==="base_revenu"||k==="taux")continue;
-var lbl=k.replace(/_/g," ").replace(/^./, function(m){return m.toUpperCase();});
-var cls=k==="total_cotisations"?"font-weight:700;color:var(--r)":k==="net_apres_cotisations"?"font-weight:700;color:var(--g)":"";
-h+="<tr><td>"+lbl+"</td><td class='num' style='"+cls+"'>"+fmtN(c[k])+"</td></tr>";}
-h+="</table>";}
-if(d.nb_analyses>0){h+="<h3 style='margin-top:16px'>&#128200; "+d.nb_analyses+" analyse(s)</h3>";}
-h+="</div>";
-var el=document.getElementById("ti-list");el.innerHTML=h+"<br><button class='btn btn-s' onclick='rechTI()'>&#8592; Retour a la liste</button>";
-}).catch(function(e){toast(e.message);});}
-
-function loadPortVue(){
-Promise.all([fetch("/api/entreprises?q=").then(safeJson),fetch("/api/independants?q=").then(safeJson)]).then(function(r){
-var emps=r[0],tis=r[1];
-document.getElementById("port-nb-emp").textContent=emps.length;
-document.getElementById("port-nb-ti").textContent=tis.length;
-document.getElementById("port-nb-total").textContent=emps.length+tis.length;
-var he="";if(!emps.length)he="<p style='color:var(--tx2)'>Aucun compte employeur.</p>";
-for(var i=0;i<emps.length;i++){var e=emps[i];he+="<div class='ent-item'><span class='badge badge-green' style='font-size:.7em'>Employeur</span> <strong>"+e.raison_sociale+"</strong>";
-if(e.forme_juridique)he+=" <span class='badge badge-blue'>"+e.forme_juridique+"</span>";
-he+="<div style='font-size:.82em;color:var(--tx2)'>SIRET: "+e.siret;if(e.effectif)he+=" | "+e.effectif+" sal.";he+="</div></div>";}
-document.getElementById("port-vue-emp").innerHTML=he;
-var ht="";if(!tis.length)ht="<p style='color:var(--tx2)'>Aucun compte T.I.</p>";
-for(var j=0;j<tis.length;j++){var t=tis[j];var label=_tiStatutLabels[t.type_statut]||t.type_statut;
-ht+="<div class='ent-item' style='border-left:3px solid var(--p)'><span class='badge' style='background:var(--p);color:#fff;font-size:.7em'>T.I.</span> <strong>"+(t.activite||label)+"</strong> <span class='badge badge-amber'>"+label+"</span>";
-ht+="<div style='font-size:.82em;color:var(--tx2)'>";if(t.siret)ht+="SIRET: "+t.siret+" | ";if(t.chiffre_affaires_annuel)ht+="CA: "+fmtN(t.chiffre_affaires_annuel)+" EUR";ht+="</div></div>";}
-document.getElementById("port-vue-ti").innerHTML=ht;
-}).catch(function(){});}
-
-/* === EQUIPE === */
-function inviterCollab(){
-var fd=new FormData();fd.append("email_invite",document.getElementById("inv-email").value);fd.append("role",document.getElementById("inv-role").value);
-fetch("/api/collaboration/inviter",{method:"POST",body:fd}).then(function(r){if(!r.ok)throw new Error("Erreur");return r.json();}).then(function(d){
-document.getElementById("inv-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Invitation creee pour <strong>"+d.email+"</strong>. Lien : <a href='"+d.lien_validation+"' target='_blank'>"+d.lien_validation+"</a></span></div>";
-loadEquipe();}).catch(function(e){toast(e.message);});}
-
-function loadEquipe(){
-fetch("/api/collaboration/equipe").then(safeJson).then(function(data){
-var invs=data.invitations||[];var el=document.getElementById("equipe-list");
-if(!invs.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun collaborateur invite.</p>";}else{
-var h="<table><tr><th>Email</th><th>Role</th><th>Statut</th><th>Date</th><th>Invite par</th></tr>";
-for(var i=0;i<invs.length;i++){var inv=invs[i];var cls=inv.statut==="active"?"badge-green":"badge-amber";
-h+="<tr><td>"+inv.email+"</td><td><span class='badge badge-blue'>"+inv.role+"</span></td><td><span class='badge "+cls+"'>"+inv.statut+"</span></td><td>"+inv.date.substring(0,10)+"</td><td>"+inv.invite_par+"</td></tr>";}
-h+="</table>";el.innerHTML=h;}
-var logs=data.audit_log||[];var lel=document.getElementById("audit-log");
-if(!logs.length){lel.innerHTML="<p style='color:var(--tx2)'>Aucune action enregistree.</p>";}else{
-var lh="<table><tr><th>Date</th><th>Profil</th><th>Action</th><th>Details</th></tr>";
-for(var j=logs.length-1;j>=Math.max(0,logs.length-20);j--){var lg=logs[j];
-lh+="<tr><td style='font-size:.8em'>"+lg.date.substring(0,19).replace("T"," ")+"</td><td>"+lg.profil+"</td><td><span class='badge badge-blue'>"+lg.action+"</span></td><td style='font-size:.82em'>"+lg.details+"</td></tr>";}
-lh+="</table>";lel.innerHTML=lh;}
-}).catch(function(){});}
-
-/* === EXPORT === */
-function exportSection(name){
-var el=document.querySelector("#s-"+name+" .card")||document.querySelector("#res-analyse");
-if(!el){toast("Rien a exporter.","warn");return;}
-var tables=el.querySelectorAll("table");
-if(tables.length===0){toast("Aucune donnee tabulaire.","warn");return;}
-var csv="";for(var t=0;t<tables.length;t++){var rows=tables[t].querySelectorAll("tr");for(var i=0;i<rows.length;i++){var cells=rows[i].querySelectorAll("th,td");var line=[];for(var j=0;j<cells.length;j++){var txt=cells[j].textContent.replace(/"/g,'""');line.push('"'+txt+'"');}csv+=line.join(";")+"\\n";}csv+="\\n";}
-var blob=new Blob([csv],{type:"text/csv;charset=utf-8"});var a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download="normacheck_"+name+".csv";a.click();toast("Export telecharge.","ok");}
-
-/* === MODE ANALYSE === */
-var _modeAzSel=document.getElementById("mode-analyse");
-if(_modeAzSel){_modeAzSel.addEventListener("change",function(){
-var m=this.value;var msgs={"simple":"Analyse simple : detection des ecarts de taux et montants.","social":"Audit social : verification complete des cotisations, DSN, conges, conventions collectives.","fiscal":"Audit fiscal : coherence TVA, charges deductibles, IS/IR, declarations fiscales.","complet":"Audit complet : verification de toutes les coherences sociales, fiscales, DSN et rapprochements."};
-document.getElementById("mode-info").innerHTML="<span class='ai'>&#128161;</span><span>"+msgs[m]+"</span>";});}
-
-/* === FILE INTERPRETATION + AUDIT === */
-function showFileInterpretation(data){
-var fl=document.getElementById("az-fichiers-list");
-if(!data||!data.declarations||!data.declarations.length){fl.innerHTML="<p style='color:var(--tx2)'>Aucun fichier interprete.</p>";return;}
-var fi=data.fichiers_info||[];
-var nbNR=data.synthese?data.synthese.nb_fichiers_non_reconnus||0:0;
-var nbErr=data.synthese?data.synthese.nb_fichiers_erreur||0:0;
-var h="";
-if(nbNR>0||nbErr>0){h+="<div class='al warn' style='margin-bottom:10px'><span class='ai'>&#9888;</span><span>"+(nbNR>0?"<strong>"+nbNR+" document(s) non reconnu(s)</strong> : le type n a pas pu etre identifie automatiquement. Les donnees detectees ont ete extraites en mode generique.":"")+(nbErr>0?(nbNR>0?" | ":"")+"<strong>"+nbErr+" fichier(s) en erreur</strong> : format non supporte ou erreur d analyse.":"")+"</span></div>";}
-for(var fi_i=0;fi_i<fi.length;fi_i++){var fst=fi[fi_i];if(fst.statut==="format_non_supporte"){h+="<div class='al err' style='margin-bottom:6px;font-size:.88em'><span class='ai'>&#10060;</span><span><strong>"+fst.nom+"</strong> : "+(fst.message||"Format non supporte")+"</span></div>";}}
-h+="<table><tr><th>Fichier</th><th>Nature detectee</th><th>Employeur</th><th>Periode</th><th class='num'>Salaries</th><th class='num'>Cotisations</th><th class='num'>Masse sal.</th></tr>";
-for(var i=0;i<data.declarations.length;i++){var d=data.declarations[i];
-var nature=d.nature||"Document";
-var fname=(i<fi.length?fi[i].nom:"")||(d.reference||"fichier "+(i+1));
-var fstat=(i<fi.length)?fi[i].statut:"";
-if(fstat==="non_reconnu"){nature="Document non reconnu";}
-var empName=d.employeur?(d.employeur.raison_sociale||d.employeur.siret||"-"):"-";
-var badgeCls="badge-blue";
-if(fstat==="non_reconnu")badgeCls="badge-red";
-else if(nature.indexOf("Bulletin")>=0)badgeCls="badge-green";
-else if(nature.indexOf("DSN")>=0)badgeCls="badge-purple";
-else if(nature.indexOf("Livre")>=0||nature.indexOf("Recapitulatif")>=0)badgeCls="badge-amber";
-else if(nature.indexOf("Bordereau")>=0)badgeCls="badge-teal";
-else if(nature.indexOf("Facture")>=0)badgeCls="badge-blue";
-else if(nature.indexOf("Contrat")>=0)badgeCls="badge-purple";
-else if(nature.indexOf("Attestation")>=0)badgeCls="badge-amber";
-else if(nature.indexOf("interessement")>=0||nature.indexOf("participation")>=0)badgeCls="badge-teal";
-else if(nature.indexOf("Accord")>=0||nature.indexOf("NAO")>=0||nature.indexOf("GPEC")>=0)badgeCls="badge-teal";
-else if(nature.indexOf("assemblee")>=0||nature.indexOf("PV")>=0)badgeCls="badge-purple";
-else if(nature.indexOf("prestation")>=0)badgeCls="badge-amber";
-var masse=(d.masse_salariale_brute||0);
-var extraInfo="";
-if(d.net_a_payer)extraInfo+=" | Net: "+d.net_a_payer.toFixed(2)+" EUR";
-if(d.date_virement)extraInfo+=" | Virement: "+d.date_virement;
-if(d.total_patronal)extraInfo+=" | Pat: "+d.total_patronal.toFixed(2);
-if(d.total_salarial)extraInfo+=" | Sal: "+d.total_salarial.toFixed(2);
-if(d.montant_ht)extraInfo=" | HT: "+d.montant_ht.toFixed(2)+" | TVA: "+(d.montant_tva||0).toFixed(2)+" | TTC: "+(d.montant_ttc||0).toFixed(2);
-if(d.tiers)extraInfo+=" | Tiers: "+d.tiers;
-if(d.type_contrat)extraInfo=" | Type: "+d.type_contrat;
-if(d.remuneration_brute)extraInfo+=" | Remun: "+d.remuneration_brute.toFixed(2)+" EUR";
-if(d.convention_collective)extraInfo+=" | CCN: "+d.convention_collective;
-if(d.date_accord)extraInfo+=" | Date: "+d.date_accord;
-if(d.signataires&&d.signataires.length)extraInfo+=" | Signataires: "+d.signataires.join(", ");
-if(d.date_ag)extraInfo+=" | AG du: "+d.date_ag;
-if(d.nb_resolutions)extraInfo+=" | "+d.nb_resolutions+" resolution(s)";
-if(d.resultat_exercice)extraInfo+=" | Resultat: "+d.resultat_exercice.toFixed(2)+" EUR";
-if(d.prestataire)extraInfo+=" | Prestataire: "+d.prestataire;
-if(d.objet)extraInfo+=" | Objet: "+d.objet;
-h+="<tr><td style='font-size:.84em'>"+fname+"</td><td><span class='badge "+badgeCls+"'>"+nature+"</span></td><td>"+empName+"</td><td>"+(d.periode||"-")+"</td><td class='num'>"+(d.nb_salaries||0)+"</td><td class='num'>"+(d.nb_cotisations||0)+"</td><td class='num'>"+(masse>0?masse.toFixed(2)+" EUR":"-")+"</td></tr>";
-if(fstat==="non_reconnu"){extraInfo+=" | <span style='color:var(--r)'>Type de document non identifie. Extraction en mode generique.</span>";}
-if(extraInfo){h+="<tr><td colspan='7' style='font-size:.82em;color:var(--tx2);padding:2px 8px;border-top:none'>"+extraInfo+"</td></tr>";}
-if(d.salaries&&d.salaries.length>0){for(var si=0;si<d.salaries.length;si++){var s=d.salaries[si];h+="<tr style='font-size:.82em;color:var(--tx2)'><td></td><td colspan='2'>"+((s.prenom||"")+" "+(s.nom||"")).trim()||"Salarie "+(si+1)+"</td><td>"+(s.nir?"NIR: "+s.nir.substring(0,5)+"...":"-")+"</td><td class='num'>"+s.brut_mensuel.toFixed(2)+" EUR</td><td class='num'>"+s.net_fiscal.toFixed(2)+" EUR</td><td></td></tr>";}}}
-if(data.declarations.length>1){var totMasse=0;var totSal=0;for(var j=0;j<data.declarations.length;j++){totMasse+=(data.declarations[j].masse_salariale_brute||0);totSal+=(data.declarations[j].nb_salaries||0);}
-h+="<tr style='font-weight:bold;background:var(--pl)'><td colspan='4'>TOTAL</td><td class='num'>"+totSal+"</td><td></td><td class='num'>"+totMasse.toFixed(2)+" EUR</td></tr>";}
-h+="</table>";
-for(var k=0;k<data.declarations.length;k++){var dk=data.declarations[k];if(dk.s89_total_brut&&dk.masse_salariale_brute){var ecS89=Math.abs(dk.s89_total_brut-dk.masse_salariale_brute);if(ecS89>10){h+="<div class='al warn' style='margin-top:6px'><span class='ai'>&#9888;</span><span><strong>Ecart S89 :</strong> Total brut declare (S89) = "+dk.s89_total_brut.toFixed(2)+" EUR vs masse salariale calculee = "+dk.masse_salariale_brute.toFixed(2)+" EUR (ecart: "+ecS89.toFixed(2)+" EUR)</span></div>";}}}
-if(data.knowledge_summary){var ks=data.knowledge_summary;h+="<div class='al info' style='margin-top:10px'><span class='ai'>&#128218;</span><span><strong>Donnees integrees :</strong> "+ks.nb_salaries_connus+" salarie(s) identifie(s), "+ks.nb_cotisations_analysees+" cotisation(s), masse salariale "+ks.total_masse_salariale.toFixed(2)+" EUR"+(ks.nb_contrats_rh>0?" | "+ks.nb_contrats_rh+" fiche(s) RH (a verifier)":"")+"</span></div>";
-var kctx=ks.contexte_entreprise||{};if(kctx.convention_collective||kctx.code_naf){h+="<div class='al info' style='margin-top:6px'><span class='ai'>&#127970;</span><span><strong>Contexte :</strong>"+(kctx.convention_collective?" CCN: "+kctx.convention_collective:"")+(kctx.code_naf?" | NAF: "+kctx.code_naf:"")+(kctx.effectif_moyen>0?" | Effectif: "+kctx.effectif_moyen:"")+"</span></div>";}
-var kaccords=(kctx.accords_entreprise||[]);if(kaccords.length>0){h+="<div class='al info' style='margin-top:6px'><span class='ai'>&#128220;</span><span><strong>"+kaccords.length+" accord(s) entreprise</strong> detecte(s) et integre(s) a la base de connaissances.</span></div>";}}
-fl.innerHTML=h;}
-
-function showIntegrationResults(data){
-var card=document.getElementById("az-integration-card");var el=document.getElementById("az-integration-results");
-var ig=data.integration;
-if(!ig){card.style.display="none";return;}
-card.style.display="block";
-var h="<div style='display:flex;gap:10px;flex-wrap:wrap;margin-bottom:12px'>";
-var np=ig.compta_ecritures_paie||0;var nf=ig.compta_ecritures_facture||0;var nr=ig.rh_fiches_deduites||0;var nu=ig.rh_contrats_maj||0;var nsal=ig.salaries_uniques||0;
-h+="<div class='sc "+(nsal>0?"blue":"amber")+"'><div class='val'>"+nsal+"</div><div class='lab'>Salaries identifies</div></div>";
-if(nr>0)h+="<div class='sc amber'><div class='val'>"+nr+"</div><div class='lab'>Fiches a verifier</div></div>";
-if(nu>0)h+="<div class='sc blue'><div class='val'>"+nu+"</div><div class='lab'>Fiches mises a jour</div></div>";
-h+="<div class='sc "+(np>0?"green":"amber")+"'><div class='val'>"+np+"</div><div class='lab'>Ecritures paie</div></div>";
-if(nf>0)h+="<div class='sc "+(nf>0?"green":"amber")+"'><div class='val'>"+nf+"</div><div class='lab'>Ecritures facture</div></div>";
-h+="</div>";
-if(np>0||nf>0){h+="<div class='al ok'><span class='ai'>&#9989;</span><span><strong>Comptabilite :</strong> "+np+" ecriture(s) de paie"+(nf>0?" + "+nf+" facture(s)":"")+" generee(s) automatiquement.</span></div>";}
-else{h+="<div class='al warn'><span class='ai'>&#9888;</span><span><strong>Comptabilite :</strong> Aucune ecriture generee. Les documents ne contiennent pas suffisamment de donnees exploitables.</span></div>";}
-if(nr>0){
-var sals=ig.salaries_deduits||[];
-h+="<div class='al warn' style='border-left:4px solid var(--p)'><span class='ai'>&#128100;</span><span><strong>"+nr+" fiche(s) salarie(s) deduite(s)</strong> des documents importes.<br>";
-h+="<em style='color:var(--tx2)'>Ces fiches ont ete pre-remplies a partir des informations detectees. Elles sont <strong>a verifier et completer</strong> par vos soins.</em></span></div>";
-if(sals.length>0){
-h+="<div style='margin:8px 0;overflow-x:auto'><table class='tb' style='font-size:.88em'><thead><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Brut</th><th>Statut</th></tr></thead><tbody>";
-for(var si=0;si<sals.length;si++){var s=sals[si];
-h+="<tr><td><strong>"+s.nom+"</strong></td><td>"+s.prenom+"</td><td>"+s.poste+"</td><td class='num'>"+(parseFloat(s.brut)||0).toFixed(2)+" EUR</td>";
-h+="<td><span class='badge badge-amber'>A verifier</span></td></tr>";}
-h+="</tbody></table></div>";}
-h+="<div style='display:flex;gap:8px;flex-wrap:wrap;margin:10px 0'>";
-h+="<button class='btn btn-blue btn-sm' onclick='goToRH()'>Consulter et modifier dans RH</button>";
-h+="</div>";
-}
-else if(nu>0){h+="<div class='al info'><span class='ai'>&#128260;</span><span><strong>Ressources humaines :</strong> "+nu+" fiche(s) existante(s) mise(s) a jour avec les nouvelles donnees.</span></div>";}
-else{h+="<div class='al warn'><span class='ai'>&#9888;</span><span><strong>Ressources humaines :</strong> Aucun salarie identifie dans les documents importes.</span></div>";}
-var alRH=ig.alertes_rh||[];if(alRH.length>0){h+="<div style='margin-top:14px'><h4 style='margin-bottom:8px'>Documents obligatoires manquants</h4>";
-for(var ai=0;ai<alRH.length;ai++){var al=alRH[ai];var alcls=al.severite==="haute"?"err":(al.severite==="moyenne"?"warn":"info");
-var actionBtn="";
-if(al.titre&&al.titre.indexOf("DPAE")>=0)actionBtn="<br><em style='font-size:.85em'>Importez les accuses de reception DPAE pour validation de conformite.</em>";
-if(al.titre&&al.titre.indexOf("Registre")>=0)actionBtn="<br><button class='btn btn-s btn-sm' style='margin-top:6px' onclick='genererRegistre()'>Generer le registre du personnel (modifiable)</button>";
-if(al.titre&&al.titre.indexOf("Contrat de travail")>=0)actionBtn="<br><button class='btn btn-s btn-sm' style='margin-top:6px' onclick='goToRHContrats()'>Verifier et completer les contrats</button>";
-h+="<div class='al "+alcls+"' style='margin-bottom:6px'><span class='ai'>"+(al.severite==="haute"?"&#9888;":"&#128161;")+"</span><span><strong>"+al.titre+"</strong> - "+al.description;
-if(al.reference_legale)h+="<br><em style='font-size:.85em;color:var(--tx2)'>"+al.reference_legale+"</em>";
-h+=actionBtn+"</span></div>";}h+="</div>";}
-if(ig.documents_detectes&&ig.documents_detectes.length>0){h+="<div class='al info' style='margin-top:8px'><span class='ai'>&#128196;</span><span><strong>Types de documents detectes :</strong> "+ig.documents_detectes.join(", ")+"</span></div>";}
-var log=ig.log||[];if(log.length>0){
-h+="<details style='margin-top:8px'><summary style='cursor:pointer;color:var(--tx2);font-size:.85em'>Detail du traitement ("+log.length+" etapes)</summary>";
-h+="<div style='background:var(--bg2);border-radius:8px;padding:10px;margin-top:6px;font-family:monospace;font-size:.8em;max-height:200px;overflow-y:auto'>";
-for(var li=0;li<log.length;li++){var cls=(log[li].indexOf("ERREUR")>=0)?"color:var(--r)":(log[li].indexOf("OK")>=0?"color:var(--g)":"color:var(--tx2)");h+="<div style='"+cls+"'>"+log[li]+"</div>";}
-h+="</div></details>";}
-el.innerHTML=h;
-try{sessionStorage.setItem("nc_integration",JSON.stringify(ig));}catch(e){}}
-
-function showAuditChecks(data){
-var mode=data.mode_analyse||document.getElementById("mode-analyse").value;
-var card=document.getElementById("az-audit-card");var el=document.getElementById("az-audit-checks");
-if(mode==="simple"){card.style.display="none";return;}
-card.style.display="block";
-var adeb=document.getElementById("audit-annee-debut");var afin=document.getElementById("audit-annee-fin");
-var qp="";if(adeb&&afin&&adeb.value&&afin.value){qp="?annee_debut="+adeb.value+"&annee_fin="+afin.value;}
-el.innerHTML="<p style='color:var(--tx2)'>Chargement de l audit depuis la base de connaissances...</p>";
-fetch("/api/bibliotheque/knowledge/audit"+qp).then(function(r){if(!r.ok)throw new Error("Erreur serveur ("+r.status+")");return r.json();}).then(function(audit){
-var h="";var sc=audit.score_audit||{};
-var cp=audit.controle_pluriannuel||{};
-if(cp.annee_debut){h+="<div class='al info' style='margin-bottom:12px'><span class='ai'><svg width='16' height='16' viewBox='0 0 24 24' fill='none' stroke='currentColor' stroke-width='2'><rect x='3' y='4' width='18' height='18' rx='2'/><line x1='16' y1='2' x2='16' y2='6'/><line x1='8' y1='2' x2='8' y2='6'/><line x1='3' y1='10' x2='21' y2='10'/></svg></span><span><strong>Controle pluri-annuel "+cp.annee_debut+"-"+cp.annee_fin+"</strong> | Annees documentees: "+(cp.annees_documentees||[]).join(", ")+(cp.annees_manquantes&&cp.annees_manquantes.length>0?" | <span style='color:var(--r);font-weight:700'>Manquantes: "+cp.annees_manquantes.join(", ")+"</span>":"")+"</span></div>";}
-
-h+="<div style='display:flex;gap:12px;flex-wrap:wrap;margin-bottom:16px'>";
-h+="<div class='sc blue'><div class='val'>"+sc.total_checks+"</div><div class='lab'>Points de controle</div></div>";
-h+="<div class='sc green'><div class='val'>"+sc.verifies+"</div><div class='lab'>Verifies</div></div>";
-h+="<div class='sc "+(sc.pourcentage>=60?"green":"red")+"'><div class='val'>"+sc.pourcentage+"%</div><div class='lab'>Couverture</div></div>";
-h+="</div>";
-var ks=audit.knowledge_summary||{};
-if(ks.nb_salaries_connus>0||ks.nb_contrats_rh>0){
-h+="<div class='al info' style='margin-bottom:12px'><span class='ai'>&#128218;</span><span><strong>Base de connaissances :</strong> "+ks.nb_salaries_connus+" salarie(s), "+ks.nb_contrats_rh+" contrat(s), "+(ks.periodes||[]).length+" periode(s), "+(ks.pieces_disponibles||[]).join(", ")+"</span></div>";}
-function renderChecks(checks,titre,prefix){
-if(!checks||!checks.length)return"";
-var nb_ok=0;for(var i=0;i<checks.length;i++){if(checks[i].present)nb_ok++;}
-var out="<h3 style='color:var(--p);margin:16px 0 8px'>"+titre+" <span class='badge "+(nb_ok===checks.length?"badge-green":"badge-amber")+"'>"+nb_ok+"/"+checks.length+"</span></h3>";
-for(var i=0;i<checks.length;i++){var c=checks[i];var cls=c.present?(c.alerte?"warn":"ok"):"warn";
-out+="<div class='al "+cls+"' style='cursor:pointer' data-toggle-detail='1'><span class='ai'>"+(c.present?"&#9989;":"&#9888;")+"</span><span><strong>"+c.nom+"</strong> - "+(c.present?c.detail:"Documents insuffisants");
-out+="<div class='aud-detail' style='display:none;margin-top:8px;font-size:.9em;padding-top:8px;border-top:1px solid rgba(0,0,0,.1)'>";
-out+="<p><strong>Etat :</strong> "+c.detail+"</p>";
-if(!c.present)out+="<p style='margin-top:4px'><strong>Documents necessaires :</strong> "+c.documents_requis+"</p>";
-if(c.incidence_legale)out+="<p style='margin-top:4px;color:var(--r);font-weight:600'>Consequence : "+c.incidence_legale+"</p>";
-out+="<p style='margin-top:4px;color:var(--tx2)'><em>Ref: "+c.reference+"</em></p>";
-out+="</div></span></div>";}return out;}
-if(mode==="social"||mode==="complet"){h+=renderChecks(audit.social,"Audit social - Code de la securite sociale + Code du travail ("+sc.social_verifies+"/"+sc.social_total+")","social");}
-if(mode==="fiscal"||mode==="complet"){h+=renderChecks(audit.fiscal,"Audit fiscal - Code general des impots ("+sc.fiscal_verifies+"/"+sc.fiscal_total+")","fiscal");}
-if(mode==="complet"){h+=renderChecks(audit.cour_des_comptes,"Controle Cour des comptes ("+sc.cdc_verifies+"/"+sc.cdc_total+")","cdc");}
-var rm=audit.rapprochement_masses;
-if(rm&&rm.periodes&&rm.periodes.length>0&&(mode==="social"||mode==="complet")){
-h+="<h3 style='color:var(--p);margin:20px 0 8px'>Rapprochement des masses salariales par periode</h3>";
-h+="<div style='overflow-x:auto'><table class='tb'><thead><tr><th>Periode</th><th>BS (Brut)</th><th>DSN (Brut)</th><th>LDP (Brut)</th><th>Ecart BS/DSN</th><th>Statut</th></tr></thead><tbody>";
-for(var pi=0;pi<rm.periodes.length;pi++){var pp=rm.periodes[pi];
-var bsv=rm.masses_bs[pp];var dsnv=rm.masses_dsn[pp];var ldpv=rm.masses_ldp[pp];
-var bsb=bsv?bsv.brut:0;var dsnb=dsnv?dsnv.brut:0;var ldpb=ldpv?ldpv.brut:0;
-var ecart=0;var statut="";var cls="";
-if(bsb>0&&dsnb>0){ecart=Math.abs(bsb-dsnb);var ref2=Math.max(bsb,dsnb);var pct=ref2>0?(ecart/ref2*100):0;
-if(pct<=1){statut="Conforme";cls="color:var(--g)";}else{statut="Ecart "+pct.toFixed(1)+"%";cls="color:var(--r);font-weight:600";}}
-else if(bsb>0||dsnb>0){statut="Source unique";cls="color:var(--tx2)";}
-else{statut="-";cls="color:var(--tx2)";}
-h+="<tr><td><strong>"+pp+"</strong></td>";
-h+="<td>"+(bsb>0?bsb.toFixed(2)+" EUR":"-")+"</td>";
-h+="<td>"+(dsnb>0?dsnb.toFixed(2)+" EUR":"-")+"</td>";
-h+="<td>"+(ldpb>0?ldpb.toFixed(2)+" EUR":"-")+"</td>";
-h+="<td>"+(ecart>0?ecart.toFixed(2)+" EUR":"-")+"</td>";
-h+="<td style='"+cls+"'>"+statut+"</td></tr>";}
-h+="</tbody></table></div>";
-if(rm.ecarts&&rm.ecarts.length>0){
-h+="<div class='al err' style='margin-top:8px'><span class='ai'>&#9888;</span><span><strong>"+rm.ecarts.length+" ecart(s) significatif(s) detecte(s)</strong> (seuil: "+rm.seuil_tolerance_pct+"%) - Un rapprochement detaille est necessaire. Verifier les elements de paie et declarations pour identifier l origine des ecarts.</span></div>";}
-else if(Object.keys(rm.masses_bs).length>0&&Object.keys(rm.masses_dsn).length>0){
-h+="<div class='al ok' style='margin-top:8px'><span class='ai'>&#9989;</span><span><strong>Masses concordantes</strong> - Les montants declares (DSN) correspondent aux montants verses (bulletins).</span></div>";}}
-var tc=ks.types_cotisations;
-if(tc&&Object.keys(tc).length>0&&(mode==="social"||mode==="complet")){
-h+="<h3 style='color:var(--p);margin:20px 0 8px'>Matrice des cotisations detectees</h3>";
-var obligatoires=["maladie","vieillesse_plafonnee","vieillesse_deplafonnee","allocations_familiales","accident_travail","csg_deductible","crds","assurance_chomage","ags","retraite_complementaire_t1","fnal","csa","formation_professionnelle","taxe_apprentissage","versement_mobilite","peec"];
-var labels={"maladie":"Maladie","vieillesse_plafonnee":"Vieillesse plaf.","vieillesse_deplafonnee":"Vieillesse deplaf.","allocations_familiales":"Alloc. familiales","accident_travail":"AT/MP","csg_deductible":"CSG deductible","crds":"CRDS","assurance_chomage":"Chomage","ags":"AGS","retraite_complementaire_t1":"Retraite T1","fnal":"FNAL","csa":"CSA","formation_professionnelle":"Formation pro","taxe_apprentissage":"Taxe apprentissage","versement_mobilite":"Versement mobilite","peec":"PEEC (1% logement)"};
-var seuils={"versement_mobilite":11,"peec":20};
-var eff=ks.nb_salaries_connus||0;
-h+="<div style='overflow-x:auto'><table class='tb'><thead><tr><th>Cotisation</th><th>Obligatoire</th><th>Detectee</th><th>Nb lignes</th><th>Total patronal</th></tr></thead><tbody>";
-for(var ci=0;ci<obligatoires.length;ci++){var co=obligatoires[ci];var lb=labels[co]||co;
-var oblig=true;var seuilC=seuils[co];if(seuilC&&eff<seuilC&&eff>0){oblig=false;}
-var det=tc[co];var found=!!det;
-var cls2=found?"color:var(--g)":"color:var(--r);font-weight:600";
-if(!oblig&&!found)cls2="color:var(--tx2)";
-h+="<tr><td>"+lb+"</td>";
-h+="<td>"+(oblig?(seuilC?"Oui (>= "+seuilC+" sal.)":"Oui"):"Non applicable")+"</td>";
-h+="<td style='"+cls2+"'>"+(found?"&#9989; Oui":"&#10060; Non")+"</td>";
-h+="<td class='num'>"+(det?det.count:"-")+"</td>";
-h+="<td class='num'>"+(det?det.total_patronal.toFixed(2)+" EUR":"-")+"</td></tr>";}
-h+="</tbody></table></div>";}
-el.innerHTML=h;}).catch(function(e){el.innerHTML="<div class='al err'>Erreur chargement audit: "+e.message+"</div>";});}
-
-/* === CONFORMITY SCORE === */
-function categToDomain(cat,ref,titre){
-var c=(cat||"").toLowerCase();var r=(ref||"").toLowerCase();var t=(titre||"").toLowerCase();
-var result={domain:"urssaf",regle:"defaut"};
-/* URSSAF-specific: taxe apprentissage (CT L6241-1), formation pro are URSSAF even if "taxe" in name */
-if(c.indexOf("apprentissage")>=0||c.indexOf("formation_pro")>=0){result={domain:"urssaf",regle:"categorie apprentissage/formation_pro -> URSSAF (CT L6241-1)"};}
-else if(r.indexOf("code du travail")>=0&&r.indexOf("cgi")<0){result={domain:"urssaf",regle:"reference Code du travail -> URSSAF"};}
-/* Fiscal domain: CGI, LPF, taxe sur salaires, TVA, impots */
-else if(c.indexOf("fiscal")>=0||c.indexOf("tva")>=0||c.indexOf("impot")>=0||r.indexOf("cgi")>=0||r.indexOf("lpf")>=0||c.indexOf("taxe_sur_salaires")>=0){result={domain:"fiscal",regle:"categorie/reference fiscale (CGI/LPF/TVA) -> DGFIP"};}
-/* CDC domain: NEP, ISA, code de commerce, comptabilite, totaux/sous-totaux, doublons total/detail */
-else if(r.indexOf("nep")>=0||r.indexOf("isa")>=0||r.indexOf("code de commerce")>=0||r.indexOf("pcg")>=0||c.indexOf("comptab")>=0){result={domain:"cdc",regle:"reference NEP/ISA/Code de commerce -> CDC"};}
-/* CDC par titre: coherence comptable, totaux, doublons total/detail, base x taux, S89 */
-else if(t.indexOf("total")>=0&&t.indexOf("detail")>=0){result={domain:"cdc",regle:"titre total+detail (coherence comptable) -> CDC"};}
-else if(t.indexOf("ecart calcul cotisation")>=0||t.indexOf("base x taux")>=0){result={domain:"cdc",regle:"titre ecart calcul/base x taux -> CDC"};}
-else if(t.indexOf("s89")>=0){result={domain:"cdc",regle:"titre S89 -> CDC"};}
-else if(t.indexOf("masse salariale")>=0&&t.indexOf("bases individuelles")>=0){result={domain:"cdc",regle:"titre masse salariale vs bases individuelles -> CDC"};}
-/*
- * INCOHERENCE cross-document: distribuer entre domaines selon le contenu.
- * Les incoherences de taux/montants entre documents sont des enjeux CDC (fiabilite comptable).
- * Les incoherences SIRET/effectif/employes sont des enjeux URSSAF (declarations sociales).
- */
-else if(c==="incoherence"){
-/* Taux, montants, bases entre documents = fiabilite comptable = CDC */
-if(t.indexOf("total patronal")>=0||t.indexOf("taux at")>=0){result={domain:"cdc",regle:"incoherence taux/montant inter-documents -> CDC (fiabilite comptable)"};}
-/* Convention collective, statut = impact fiscal aussi (minima, avantages en nature) */
-else if(t.indexOf("convention collective")>=0||t.indexOf("statut divergent")>=0){result={domain:"fiscal",regle:"incoherence convention/statut -> DGFIP (impact minima/avantages)"};}
-else{result={domain:"urssaf",regle:"incoherence non classee -> URSSAF (declarations sociales)"};}
-}
-/* Donnee manquante: certaines sont fiscales (declarations absentes = enjeu declaration fiscale) */
-else if(c==="donnee_manquante"&&(t.indexOf("mois de declaration manquants")>=0)){result={domain:"fiscal",regle:"donnee manquante mois declaration -> DGFIP"};}
-/* Pattern suspect: distribution Benford et outliers = enjeu comptabilite (CDC) */
-else if(c==="pattern_suspect"&&(t.indexOf("benford")>=0||t.indexOf("valeur atypique")>=0)){result={domain:"cdc",regle:"pattern suspect Benford/outlier -> CDC (regularite comptable)"};}
-else{result={domain:"urssaf",regle:"aucune regle specifique -> URSSAF par defaut"};}
-return result;}
-/*
- * METHODOLOGIE DE SCORING v4.0 - Approche proportionnelle non-discretionnaire
- *
- * Principes fondateurs :
- * 1. PROPORTIONNALITE : la deduction est proportionnelle a la gravite reglementaire
- *    (basee sur les majorations legales : 40% manquement delibere, 10% retard, etc.)
- * 2. OBJECTIVABILITE : chaque parametre est derive d'une reference legale explicite
- * 3. REPRODUCTIBILITE : a constats identiques, score identique (pas de bonus subjectif)
- * 4. NON-DISCRETIONNAIRE : aucun coefficient arbitraire
- *
- * Gravite reglementaire (Wk) - derivee des sanctions legales :
- *   - Critique (Wk=4) : manquement delibere, majoration 40% (CSS L243-7-7, CGI art. 1729)
- *   - Haute (Wk=3) : retard/omission significatif, majoration 10% (CSS L243-7-2, CGI art. 1728)
- *   - Moyenne (Wk=2) : ecart formel, droit a regularisation (CSS L243-6-7, tolerance BOSS)
- *   - Faible (Wk=1) : anomalie mineure, pas de sanction directe
- *
- * Formule par domaine :
- *   S = max(0, 100 * (1 - Sigma(Wk) / Wmax))
- *   ou Wmax = max(Sigma(Wk), 4*Npoints) avec Npoints = nb de points de controle
- *   -> Garantit S in [0,100], converge vers 0 si beaucoup d anomalies
- *
- * Couverture documentaire (facteur continu) :
- *   Fc = min(1, nbDecl / 3)  -> lineaire de 0 a 1, seuil a 3 documents
- *   Score final = S * (0.5 + 0.5 * Fc)
- *   -> Minimum = 50% du score brut (jamais de plafond arbitraire)
- *
- * Pas de bonus : seuls les constats negatifs impactent le score.
- */
-var SEVERITY_WEIGHT={critique:4,haute:3,high:3,moyenne:2,medium:2,faible:1,low:1};
-var DOMAIN_CONTROL_POINTS={urssaf:10,fiscal:10,cdc:8};
-function _scoreOne(constats,nbDecl,domainKey){
-var details=[];var nbCrit=0,nbHaut=0,nbMoy=0,nbBas=0;var totalW=0;
-var Npoints=DOMAIN_CONTROL_POINTS[domainKey]||10;
-for(var i=0;i<constats.length;i++){var c=constats[i];var sev=(c.severite||"faible").toLowerCase();
-var wk=SEVERITY_WEIGHT[sev]||1;totalW+=wk;
-if(sev==="critique"){nbCrit++;}
-else if(sev==="haute"||sev==="high"){nbHaut++;}
-else if(sev==="moyenne"||sev==="medium"){nbMoy++;}
-else{nbBas++;}
-details.push({deduction:-wk,raison:c.titre||("Constat "+sev),ref:c.reference_legale||"",severite:sev,poids:wk});}
-/* Wmax = max(totalW, 4*Npoints) — normalisation par la capacite de controle */
-var Wmax=Math.max(totalW,4*Npoints);
-var Sbrut=Math.max(0,Math.round(100*(1-totalW/Wmax)));
-/* Facteur couverture documentaire (continu, non-discretionnaire) */
-var Fc=Math.min(1,nbDecl/3);
-var score=Math.round(Sbrut*(0.5+0.5*Fc));
-score=Math.max(0,Math.min(100,score));
-if(Fc<1){details.push({deduction:0,raison:"Facteur couverture documentaire : Fc="+Fc.toFixed(2)+" ("+nbDecl+"/3 sources). Score ajuste de "+Sbrut+" a "+score,ref:"Methodologie NormaCheck v4.0",severite:"info",poids:0});}
-var grade="F";if(score>=90)grade="A";else if(score>=75)grade="B";else if(score>=60)grade="C";else if(score>=45)grade="D";else if(score>=30)grade="E";
-/* Intervalle de confiance : marge proportionnelle a l incertitude documentaire */
-var marge=Math.round((1-Fc)*15+constats.length*0.5);
-marge=Math.min(marge,20);
-var scoreBas=Math.max(0,score-marge);
-var scoreHaut=Math.min(100,score+marge);
-/* Nombre de constats contestables (patterns statistiques = interpretables) */
-var nbContest=0;
-for(var j=0;j<constats.length;j++){var cc=constats[j];var ct=(cc.categorie||"").toLowerCase();if(ct==="pattern_suspect")nbContest++;}
-return{score:score,grade:grade,details:details,nb_critiques:nbCrit,nb_hautes:nbHaut,nb_moyennes:nbMoy,nb_basses:nbBas,totalW:totalW,Wmax:Wmax,Sbrut:Sbrut,Fc:Fc,intervalle:{bas:scoreBas,haut:scoreHaut,marge:marge},nb_constats_contestables:nbContest};}
-function calculateTripleScore(data){
-var constats=data.constats||[];var nbDecl=(data.declarations||[]).length;
-/* Deduplication des constats (principe non bis in idem) :
- * triplet (titre_normalise, categorie, severite) identifie un constat unique */
-var seen={};var deduped=[];
-for(var di=0;di<constats.length;di++){
-var dc=constats[di];var dkey=((dc.titre||"").toLowerCase().trim())+"|"+((dc.categorie||"").toLowerCase())+"|"+((dc.severite||"").toLowerCase());
-if(!seen[dkey]){seen[dkey]=true;deduped.push(dc);}}
-var nbDeduplicated=constats.length-deduped.length;
-constats=deduped;
-var urssafC=[],fiscalC=[],cdcC=[],routageTrace=[];var nbRoutageDefaut=0;
-for(var i=0;i<constats.length;i++){var c=constats[i];var routing=categToDomain(c.categorie,c.reference_legale,c.titre);var dom=routing.domain;
-if(routing.regle.indexOf("defaut")>=0||routing.regle.indexOf("aucune regle")>=0)nbRoutageDefaut++;
-routageTrace.push({constat:c.titre||"",categorie:c.categorie||"",domaine_affecte:dom,regle_appliquee:routing.regle});
-if(dom==="fiscal")fiscalC.push(c);else if(dom==="cdc")cdcC.push(c);else urssafC.push(c);}
-var su=_scoreOne(urssafC,nbDecl,"urssaf");var sf=_scoreOne(fiscalC,nbDecl,"fiscal");var sc=_scoreOne(cdcC,nbDecl,"cdc");
-su.domaine="URSSAF";su.ref_legal="Code de la securite sociale (CSS)";su.organisme="URSSAF / Caisse Nationale";
-sf.domaine="DGFIP";sf.ref_legal="Code general des impots (CGI)";sf.organisme="Direction Generale des Finances Publiques";
-sc.domaine="Cour des comptes";sc.ref_legal="Code de commerce / Normes NEP-ISA";sc.organisme="Cour des comptes / CRC";
-/*
- * Score global : moyenne arithmetique ponderee par le nombre de points de controle (Nk)
- * W_urssaf = 10, W_fiscal = 10, W_cdc = 8 -> total = 28
- * Poids = Nk / Somme(Nk) => URSSAF=10/28, DGFIP=10/28, CDC=8/28
- * Justification : le poids de chaque domaine est proportionnel au nombre de
- * points de controle legaux identifies (objectivable et reproductible).
- * Aucun coefficient discretionnaire n est utilise.
- */
-var Nu=DOMAIN_CONTROL_POINTS.urssaf,Nf=DOMAIN_CONTROL_POINTS.fiscal,Nc=DOMAIN_CONTROL_POINTS.cdc;
-var Nt=Nu+Nf+Nc;
-var wu=Nu/Nt,wf=Nf/Nt,wc=Nc/Nt;
-var global=Math.round(su.score*wu+sf.score*wf+sc.score*wc);
-/*
- * Penalite d accumulation d incoherences inter-documents :
- * Si le nombre total d INCOHERENCES depasse 5, une penalite supplementaire
- * s applique au score global. Cela evite qu un grand nombre d incoherences
- * reparties entre domaines soit absorbe par la normalisation Wmax.
- * Penalite = min(15, (nbIncoherences - 5) * 2) points.
- */
-var nbIncoherences=0;
-for(var ic=0;ic<constats.length;ic++){if((constats[ic].categorie||"").toLowerCase()==="incoherence")nbIncoherences++;}
-var penaliteIncoherences=0;
-if(nbIncoherences>5){penaliteIncoherences=Math.min(15,(nbIncoherences-5)*2);global=Math.max(0,global-penaliteIncoherences);}
-var ggrade="F";if(global>=90)ggrade="A";else if(global>=75)ggrade="B";else if(global>=60)ggrade="C";else if(global>=45)ggrade="D";else if(global>=30)ggrade="E";
-/* Avertissement incertitude si marge > 10 sur un domaine */
-var avertissements=[];
-if(su.intervalle&&su.intervalle.marge>10)avertissements.push("URSSAF: incertitude significative (marge="+su.intervalle.marge+")");
-if(sf.intervalle&&sf.intervalle.marge>10)avertissements.push("DGFIP: incertitude significative (marge="+sf.intervalle.marge+")");
-if(sc.intervalle&&sc.intervalle.marge>10)avertissements.push("CDC: incertitude significative (marge="+sc.intervalle.marge+")");
-if(nbRoutageDefaut>0&&constats.length>0&&nbRoutageDefaut/constats.length>0.2)
-avertissements.push("Routage par defaut: "+nbRoutageDefaut+"/"+constats.length+" constats routes vers URSSAF par defaut (>20%)");
-return{urssaf:su,fiscal:sf,cdc:sc,global:{score:global,grade:ggrade},nb_constats_total:constats.length,
-nb_constats_dedupliques:nbDeduplicated,
-nb_incoherences:nbIncoherences,penalite_incoherences:penaliteIncoherences,
-nb_routage_defaut:nbRoutageDefaut,
-poids:{urssaf:wu,fiscal:wf,cdc:wc},methode:"Moyenne ponderee par nombre de points de controle (Nk/Somme_Nk)",
-routage_domaine:routageTrace,statut_validation:"provisoire",avertissements:avertissements};}
-function calculateConformityScore(data){
-var ts=calculateTripleScore(data);var g=ts.global;var p=ts.poids;
-var allDetails=ts.urssaf.details.concat(ts.fiscal.details).concat(ts.cdc.details);
-var explication="Score global NormaCheck v4.0 : "+g.score+"/100 ("+g.grade+"). ";
-explication+="URSSAF: "+ts.urssaf.score+"/100 ("+ts.urssaf.grade+") | DGFIP: "+ts.fiscal.score+"/100 ("+ts.fiscal.grade+") | CDC: "+ts.cdc.score+"/100 ("+ts.cdc.grade+"). ";
-explication+="Ponderation proportionnelle: URSSAF*"+(p.urssaf).toFixed(4)+" + DGFIP*"+(p.fiscal).toFixed(4)+" + CDC*"+(p.cdc).toFixed(4)+" (basee sur Nk/Somme_Nk).";
-return{score:g.score,grade:g.grade,explanation:explication,details:allDetails,
-nb_critiques:ts.urssaf.nb_critiques+ts.fiscal.nb_critiques+ts.cdc.nb_critiques,
-nb_hautes:ts.urssaf.nb_hautes+ts.fiscal.nb_hautes+ts.cdc.nb_hautes,
-nb_moyennes:ts.urssaf.nb_moyennes+ts.fiscal.nb_moyennes+ts.cdc.nb_moyennes,
-nb_basses:ts.urssaf.nb_basses+ts.fiscal.nb_basses+ts.cdc.nb_basses,
-tripleScore:ts};}
-/* --- Scellement du score dans la chaine de preuve --- */
-function sealScoreProof(data,ts){
-try{var sid=data.session_id||"";
-fetch("/api/proof/seal-score",{method:"POST",headers:{"Content-Type":"application/json"},
-body:JSON.stringify({session_id:sid,scores:{urssaf:ts.urssaf,fiscal:ts.fiscal,cdc:ts.cdc,global:ts.global},
-constats:data.constats||[],nb_documents:(data.declarations||[]).length}),
-credentials:"same-origin"}).then(safeJson).then(function(d){
-if(d.status==="ok")console.info("Score scelle dans la chaine de preuve: seq="+d.seq+", hash="+d.hash);
-}).catch(function(e){console.warn("Erreur scellement preuve:",e);});}catch(e){}}
-function renderScoreDetails(){
-if(!analysisData)return;
-var ts=calculateTripleScore(analysisData);var p=ts.poids;
-/* Sceller le score dans la chaine de preuve a chaque affichage */
-sealScoreProof(analysisData,ts);
-function renderDomainDetail(elId,sc){
-var el=document.getElementById(elId);if(!el)return;
-var h="<h3>Resultat : "+sc.score+"/100 ("+sc.grade+") - "+sc.domaine+"</h3>";
-h+="<div style='margin:8px 0;font-size:.86em'><strong>Constats pris en compte :</strong> critiques="+sc.nb_critiques+" (Wk=4) | hautes="+sc.nb_hautes+" (Wk=3) | moyennes="+sc.nb_moyennes+" (Wk=2) | faibles="+sc.nb_basses+" (Wk=1)</div>";
-h+="<div style='margin:4px 0;font-size:.84em;color:var(--tx2)'>Somme poids Wk = "+sc.totalW+" | Wmax = "+sc.Wmax+" | Score brut = "+sc.Sbrut+" | Fc = "+sc.Fc.toFixed(2)+"</div>";
-h+="<table><thead><tr><th>Poids (Wk)</th><th>Severite</th><th>Constat</th><th>Reference legale</th></tr></thead><tbody>";
-for(var i=0;i<sc.details.length;i++){var d=sc.details[i];
-if(d.poids===0){h+="<tr><td style='color:var(--tx2)'>-</td><td>info</td><td colspan='2' style='font-size:.84em;color:var(--tx2)'>"+d.raison+"</td></tr>";}
-else{h+="<tr><td style='font-weight:700;color:var(--r)'>"+d.poids+"</td><td>"+(d.severite||"")+"</td><td>"+d.raison+"</td><td style='font-size:.82em;color:var(--tx2)'>"+d.ref+"</td></tr>";}}
-h+="</tbody></table>";
-h+="<div style='margin-top:10px;padding:10px;background:var(--bg);border-radius:8px;font-family:monospace;font-size:.84em'>";
-h+="S<sub>"+sc.domaine+"</sub> = max(0, 100 &times; (1 - &Sigma;Wk/Wmax)) &times; (0.5 + 0.5 &times; Fc)<br>";
-h+="= max(0, 100 &times; (1 - "+sc.totalW+"/"+sc.Wmax+")) &times; (0.5 + 0.5 &times; "+sc.Fc.toFixed(2)+")<br>";
-h+="= "+sc.Sbrut+" &times; "+(0.5+0.5*sc.Fc).toFixed(2)+" = <strong>"+sc.score+"</strong></div>";
-if(sc.intervalle){h+="<div style='margin-top:8px;padding:8px;background:var(--pl);border-radius:6px;font-size:.84em'><strong>Intervalle de confiance :</strong> ["+sc.intervalle.bas+" - "+sc.intervalle.haut+"] (&plusmn;"+sc.intervalle.marge+" pts)";
-if(sc.nb_constats_contestables>0){h+=" | <span style='color:var(--r)'>"+sc.nb_constats_contestables+" constat(s) statistique(s) contestable(s) (patterns)</span>";}
-h+="<br><span style='font-size:.9em;color:var(--tx2)'>L intervalle reflete l incertitude liee a la couverture documentaire et au nombre de constats. Les constats de type pattern_suspect sont des indicateurs statistiques non probants.</span></div>";}
-el.innerHTML=h;}
-renderDomainDetail("score-detail-urssaf",ts.urssaf);
-renderDomainDetail("score-detail-fiscal",ts.fiscal);
-renderDomainDetail("score-detail-cdc",ts.cdc);
-var gel=document.getElementById("score-detail-global");
-if(gel){var gh="";
-/* Bandeau statut provisoire / valide (art. 22 RGPD) */
-gh+="<div style='margin-bottom:12px;padding:12px 16px;border-radius:8px;border:2px solid #f59e0b;background:#fffbeb;font-size:.9em'>";
-gh+="<strong style='color:#92400e'>&#9888; SCORE PROVISOIRE</strong> &mdash; ";
-gh+="Ce score est un indicateur d'aide a la decision (art. 22 RGPD). ";
-gh+="Il ne constitue pas une decision automatisee et ne peut etre utilise a des fins decisionnelles ";
-gh+="sans validation prealable par un professionnel qualifie.";
-gh+="<div style='margin-top:8px'>";
-gh+="<button onclick='demanderValidationHumaine()' style='padding:6px 14px;background:#1e40af;color:#fff;border:none;border-radius:6px;cursor:pointer;font-size:.85em;margin-right:8px'>Demander une validation humaine</button>";
-gh+="<button onclick='contesterScore()' style='padding:6px 14px;background:#dc2626;color:#fff;border:none;border-radius:6px;cursor:pointer;font-size:.85em'>Contester ce score</button>";
-gh+="</div></div>";
-gh+="<div style='font-size:.9em;line-height:1.8'>";
-gh+="<strong>Methode :</strong> Moyenne ponderee par nombre de points de controle (Nk/&Sigma;Nk) - non discretionnaire<br>";
-gh+="<strong>Calcul :</strong> S<sub>global</sub> = ("+ts.urssaf.score+" &times; "+p.urssaf.toFixed(4)+") + ("+ts.fiscal.score+" &times; "+p.fiscal.toFixed(4)+") + ("+ts.cdc.score+" &times; "+p.cdc.toFixed(4)+") = <strong>"+ts.global.score+"/100 ("+ts.global.grade+")</strong></div>";
-gh+="<div style='margin-top:10px;padding:10px;background:var(--pl);border-radius:8px;font-size:.84em'><strong>Avertissement juridique (art. 22 RGPD) :</strong> Ce score est un indicateur methodologique provisoire, non opposable aux administrations. Il ne constitue pas une decision automatisee au sens de l'art. 22 RGPD. Les constats de type pattern_suspect sont des indicateurs statistiques non probants (art. L243-7 CSS). Tout constat est soumis a procedure contradictoire (art. L121-1 CRPA). L'entite auditee dispose d'un droit d'intervention humaine, d'expression et de contestation.</div>";
-/* Tracabilite du routage domaine (explicabilite art. 13-14 RGPD) */
-if(ts.routage_domaine&&ts.routage_domaine.length>0){
-gh+="<details style='margin-top:10px;font-size:.84em'><summary style='cursor:pointer;font-weight:700;color:var(--tx2)'>Tracabilite du routage domaine ("+ts.routage_domaine.length+" constats routes)</summary>";
-gh+="<table style='width:100%;margin-top:6px'><thead><tr><th style='text-align:left'>Constat</th><th style='text-align:left'>Domaine</th><th style='text-align:left'>Regle appliquee</th></tr></thead><tbody>";
-for(var ri=0;ri<ts.routage_domaine.length;ri++){var rt=ts.routage_domaine[ri];
-gh+="<tr><td style='font-size:.82em'>"+rt.constat+"</td><td><strong>"+rt.domaine_affecte.toUpperCase()+"</strong></td><td style='font-size:.82em;color:var(--tx2)'>"+rt.regle_appliquee+"</td></tr>";}
-gh+="</tbody></table></details>";}
-gh+="<div class='g3' style='margin-top:12px'>";
-gh+="<div class='sc blue'><div class='val'>"+ts.urssaf.score+"%</div><div class='lab'>URSSAF (N="+DOMAIN_CONTROL_POINTS.urssaf+", w="+(p.urssaf*100).toFixed(1)+"%)</div></div>";
-gh+="<div class='sc purple'><div class='val'>"+ts.fiscal.score+"%</div><div class='lab'>DGFIP (N="+DOMAIN_CONTROL_POINTS.fiscal+", w="+(p.fiscal*100).toFixed(1)+"%)</div></div>";
-gh+="<div class='sc teal'><div class='val'>"+ts.cdc.score+"%</div><div class='lab'>CDC (N="+DOMAIN_CONTROL_POINTS.cdc+", w="+(p.cdc*100).toFixed(1)+"%)</div></div>";
-gh+="</div>";gel.innerHTML=gh;}}
-/* === RGPD ART. 22 - VALIDATION HUMAINE ET CONTESTATION === */
-function demanderValidationHumaine(){
-if(!analysisData){toast("Aucune analyse en cours.","warn");return;}
-var sid=analysisData.session_id||"session_"+Date.now();
-var ts=calculateTripleScore(analysisData);
-var justif=prompt("Justification de la demande de validation (facultatif pour validation simple) :");
-fetch("/api/scores/validation-humaine",{method:"POST",headers:{"Content-Type":"application/json"},
-body:JSON.stringify({session_id:sid,action:"valider",score_original:ts.global,justification:justif||"Validation demandee par l operateur"}),
-credentials:"same-origin"}).then(safeJson).then(function(d){
-if(d.status==="ok"){toast("Score valide par intervention humaine. Ref: seq="+d.validation.proof_seq+", hash="+d.validation.proof_hash.substring(0,12)+"...","ok");
-/* Mettre a jour l indicateur visuel */
-var banner=document.querySelector("#score-detail-global > div:first-child");
-if(banner){banner.style.borderColor="#16a34a";banner.style.background="#f0fdf4";
-banner.innerHTML="<strong style='color:#166534'>&#10003; SCORE VALIDE</strong> &mdash; Score valide par un operateur humain le "+new Date().toLocaleDateString("fr-FR")+". Ref preuve : "+d.validation.proof_hash.substring(0,12)+"... (art. 22 RGPD)";}
-}else{toast("Erreur: "+(d.detail||"Echec validation"),"warn");}
-}).catch(function(e){toast("Erreur validation: "+e.message,"warn");});}
-function contesterScore(){
-if(!analysisData){toast("Aucune analyse en cours.","warn");return;}
-var sid=analysisData.session_id||"session_"+Date.now();
-var motif=prompt("Motif de la contestation (obligatoire) :");
-if(!motif){toast("La contestation necessite un motif.","warn");return;}
-var constatsStr=prompt("Titre(s) des constats contestes (separes par des virgules, ou vide pour contester le score global) :");
-var constatsContestes=constatsStr?constatsStr.split(",").map(function(s){return s.trim();}):[];
-fetch("/api/scores/contestation",{method:"POST",headers:{"Content-Type":"application/json"},
-body:JSON.stringify({session_id:sid,constats_contestes:constatsContestes,motif:motif}),
-credentials:"same-origin"}).then(safeJson).then(function(d){
-if(d.status==="ok"){toast("Contestation enregistree (ref: seq="+d.contestation.proof_seq+"). Reexamen humain sous 30 jours.","ok");
-var banner=document.querySelector("#score-detail-global > div:first-child");
-if(banner){banner.style.borderColor="#dc2626";banner.style.background="#fef2f2";
-banner.innerHTML="<strong style='color:#991b1b'>&#9888; SCORE CONTESTE</strong> &mdash; Contestation enregistree le "+new Date().toLocaleDateString("fr-FR")+". Un reexamen humain sera effectue sous 30 jours (art. R*243-59 CSS). Ref: "+d.contestation.proof_hash.substring(0,12)+"...";}
-}else{toast("Erreur: "+(d.detail||"Echec contestation"),"warn");}
-}).catch(function(e){toast("Erreur contestation: "+e.message,"warn");});}
-
-/* === PDF EXPORT === */
-function exportPDF(){
-if(!analysisData){toast("Aucun rapport a exporter.","warn");return;}
-var mode=analysisData.mode_analyse||document.getElementById("mode-analyse").value;
-var titres={"simple":"Rapport d analyse NormaCheck","social":"Audit social NormaCheck","fiscal":"Audit fiscal NormaCheck","complet":"Audit NormaCheck complet"};
-var titre=titres[mode]||"Rapport NormaCheck";
-var scoreData=calculateConformityScore(analysisData);
-var constats=analysisData.constats||[];
-var w=window.open("","_blank");
-var ent={}; try{var xe=new XMLHttpRequest();xe.open("GET","/api/config/entete",false);xe.send();if(xe.status===200)ent=JSON.parse(xe.responseText);}catch(e){}
-var entHtml="";
-if(ent.nom_entreprise){entHtml="<div style='text-align:center;border-bottom:2px solid #1e40af;padding-bottom:16px;margin-bottom:20px'><h1 style='color:#1e40af;margin:0'>"+ent.nom_entreprise+"</h1><p style='color:#64748b'>"+((ent.forme_juridique||"")+" - "+(ent.adresse||""))+"</p><p style='color:#64748b'>SIRET: "+(ent.siret||"")+" | Tel: "+(ent.telephone||"")+"</p></div>";}
-var socialH="",fiscalH="";
-for(var i=0;i<constats.length;i++){var c=constats[i];var cat=(c.categorie||"").toLowerCase();
-var item="<div style='border:1px solid #e2e8f0;border-left:4px solid "+(Math.abs(c.montant_impact||0)>5000?"#ef4444":"#f59e0b")+";border-radius:8px;padding:12px;margin:8px 0'><strong>"+c.titre+"</strong><p style='color:#64748b;margin:4px 0'>"+(c.description||"")+"</p><p><strong>Impact:</strong> "+Math.abs(c.montant_impact||0).toFixed(2)+" EUR</p>"+(c.reference_legale?"<p style='font-size:.85em;color:#64748b'>Ref: "+c.reference_legale+"</p>":"")+(c.recommandation?"<p style='color:#1e40af;font-style:italic'>"+c.recommandation+"</p>":"")+"</div>";
-if(cat.indexOf("fiscal")>=0||cat.indexOf("tva")>=0||cat.indexOf("impot")>=0)fiscalH+=item;else socialH+=item;}
-var html="<!DOCTYPE html><html><head><meta charset='UTF-8'><title>"+titre+"</title><style>body{font-family:Segoe UI,sans-serif;max-width:900px;margin:0 auto;padding:30px;color:#1e293b}h1{color:#1e40af}h2{color:#1e40af;border-bottom:1px solid #e2e8f0;padding-bottom:6px;margin-top:30px}.score{text-align:center;padding:20px;background:#f8fafc;border-radius:12px;border:2px solid #e2e8f0;margin:20px 0}.grade{font-size:3em;font-weight:800;color:#1e40af}.badge{display:inline-block;padding:3px 10px;border-radius:20px;font-size:.8em;font-weight:700}@media print{body{padding:10px}}</style></head><body>";
-html+=entHtml;
-html+="<h1 style='text-align:center'>"+titre+"</h1>";
-html+="<p style='text-align:center;color:#64748b'>Date: "+new Date().toLocaleDateString("fr-FR")+" | "+((analysisData.synthese||{}).nb_fichiers||0)+" fichier(s) analyse(s)</p>";
-var ts=scoreData.tripleScore||calculateTripleScore(analysisData);
-html+="<div style='margin:16px 0;padding:12px;background:#fffbeb;border:2px solid #f59e0b;border-radius:8px;font-size:.9em;color:#92400e'><strong>&#9888; SCORE PROVISOIRE</strong> &mdash; Ce score est un indicateur d'aide a la decision (art. 22 RGPD). Il ne constitue pas une decision automatisee et necessite une validation par un professionnel qualifie avant toute utilisation a des fins decisionnelles. L'entite auditee dispose d'un droit d'intervention humaine, d'expression et de contestation (art. 22(3) RGPD, art. L121-1 CRPA).</div>";
-html+="<div class='score'><div class='grade'>"+scoreData.grade+"</div><div style='font-size:2em;font-weight:700'>Score global : "+scoreData.score+" / 100</div><p style='color:#64748b;margin-top:8px'>"+scoreData.explanation+"</p></div>";
-html+="<div style='display:flex;gap:16px;justify-content:center;margin:20px 0;flex-wrap:wrap'>";
-html+="<div style='flex:1;min-width:200px;text-align:center;padding:16px;border:2px solid #3b82f6;border-radius:12px'><div style='font-size:.75em;text-transform:uppercase;color:#64748b;margin-bottom:4px'>URSSAF / CSS</div><div style='font-size:2em;font-weight:800;color:#1e40af'>"+ts.urssaf.score+"/100</div><div style='font-size:1.2em;font-weight:700;color:"+(ts.urssaf.score>=75?"#16a34a":ts.urssaf.score>=45?"#d97706":"#ef4444")+"'>"+ts.urssaf.grade+"</div><div style='font-size:.8em;color:#64748b;margin-top:4px'>"+ts.urssaf.nb_critiques+" critique(s) | "+ts.urssaf.details.length+" constat(s)</div></div>";
-html+="<div style='flex:1;min-width:200px;text-align:center;padding:16px;border:2px solid #a855f7;border-radius:12px'><div style='font-size:.75em;text-transform:uppercase;color:#64748b;margin-bottom:4px'>DGFIP / CGI</div><div style='font-size:2em;font-weight:800;color:#7c3aed'>"+ts.fiscal.score+"/100</div><div style='font-size:1.2em;font-weight:700;color:"+(ts.fiscal.score>=75?"#16a34a":ts.fiscal.score>=45?"#d97706":"#ef4444")+"'>"+ts.fiscal.grade+"</div><div style='font-size:.8em;color:#64748b;margin-top:4px'>"+ts.fiscal.nb_critiques+" critique(s) | "+ts.fiscal.details.length+" constat(s)</div></div>";
-html+="<div style='flex:1;min-width:200px;text-align:center;padding:16px;border:2px solid #0d9488;border-radius:12px'><div style='font-size:.75em;text-transform:uppercase;color:#64748b;margin-bottom:4px'>COUR DES COMPTES</div><div style='font-size:2em;font-weight:800;color:#0d9488'>"+ts.cdc.score+"/100</div><div style='font-size:1.2em;font-weight:700;color:"+(ts.cdc.score>=75?"#16a34a":ts.cdc.score>=45?"#d97706":"#ef4444")+"'>"+ts.cdc.grade+"</div><div style='font-size:.8em;color:#64748b;margin-top:4px'>"+ts.cdc.nb_critiques+" critique(s) | "+ts.cdc.details.length+" constat(s)</div></div>";
-html+="</div>";
-var pp=ts.poids||{urssaf:10/28,fiscal:10/28,cdc:8/28};
-html+="<div style='text-align:center;padding:10px;background:#f8fafc;border-radius:8px;margin:10px 0;font-size:.85em'><strong>Ponderation proportionnelle (Nk/&Sigma;Nk) :</strong> S<sub>global</sub> = URSSAF("+ts.urssaf.score+") &times; "+(pp.urssaf).toFixed(4)+" + DGFIP("+ts.fiscal.score+") &times; "+(pp.fiscal).toFixed(4)+" + CDC("+ts.cdc.score+") &times; "+(pp.cdc).toFixed(4)+" = <strong>"+ts.global.score+"</strong><br><span style='color:#64748b;font-size:.9em'>Methode v4.0 : poids derives du nombre de points de controle legaux par domaine (non discretionnaire)</span></div>";
-if(socialH){html+="<h2>Partie sociale - Constats URSSAF</h2><p style='color:#64748b'>Points de controle relevant de la legislation sociale (Code de la securite sociale, Code du travail)</p>"+socialH;}
-if(fiscalH){html+="<h2>Partie fiscale - Constats DGFIP</h2><p style='color:#64748b'>Points de controle relevant de la legislation fiscale (Code general des impots)</p>"+fiscalH;}
-if(!socialH&&!fiscalH){html+="<h2>Constats</h2>";for(var i=0;i<constats.length;i++){var c=constats[i];html+="<div style='border:1px solid #e2e8f0;border-radius:8px;padding:12px;margin:8px 0'><strong>"+c.titre+"</strong><p>"+c.description+"</p><p>Impact: "+Math.abs(c.montant_impact||0).toFixed(2)+" EUR</p></div>";}}
-html+="<h2>Recommandations</h2>";var recos=analysisData.recommandations||[];for(var i=0;i<recos.length;i++){html+="<p>"+(i+1)+". "+(recos[i].description||recos[i].titre||"")+"</p>";}
-function _pdfScoreTable(sc,title,color){
-html+="<div style='margin-top:20px;padding:16px;background:#f8fafc;border-radius:8px;border:1px solid #e2e8f0;border-left:4px solid "+color+";font-size:.85em'>";
-html+="<h3 style='color:"+color+"'>"+title+" - "+sc.score+"/100 ("+sc.grade+")</h3>";
-html+="<p style='margin:6px 0'>Formule : S = max(0, 100 &times; (1 - &Sigma;Wk / Wmax)) &times; (0.5 + 0.5 &times; Fc). Poids : critique(Wk=4), haute(Wk=3), moyenne(Wk=2), faible(Wk=1).</p>";
-html+="<table style='width:100%;border-collapse:collapse;margin-top:8px'><tr style='background:"+color+";color:#fff'><th style='padding:6px 10px;text-align:left'>Points</th><th style='padding:6px 10px;text-align:left'>Raison</th><th style='padding:6px 10px;text-align:left'>Reference</th></tr>";
-for(var i=0;i<sc.details.length;i++){var d=sc.details[i];html+="<tr style='border-bottom:1px solid #e2e8f0'><td style='padding:4px 10px;color:"+(d.deduction>0?"#16a34a":"#ef4444")+"'>"+(d.deduction>0?"+":"")+d.deduction+"</td><td style='padding:4px 10px'>"+d.raison+"</td><td style='padding:4px 10px;font-size:.9em;color:#64748b'>"+(d.ref||"")+"</td></tr>";}
-html+="</table></div>";}
-_pdfScoreTable(ts.urssaf,"Score URSSAF (Securite sociale)","#1e40af");
-_pdfScoreTable(ts.fiscal,"Score DGFIP (Fiscal)","#7c3aed");
-_pdfScoreTable(ts.cdc,"Score Cour des comptes (Regularite comptable)","#0d9488");
-html+="<p style='text-align:center;margin-top:30px;font-size:.8em;color:#94a3b8'>Document genere par NormaCheck v4.0 - SCORE PROVISOIRE - Outil d'aide a la decision, non decision automatisee (art. 22 RGPD). Indicateur methodologique interne, non opposable aux administrations (art. L.243-6-3 CSS). Score indicatif soumis a procedure contradictoire (art. L121-1 CRPA). Validation humaine requise avant utilisation decisionnelle.</p></body></html>";
-w.document.write(html);w.document.close();setTimeout(function(){w.print();},600);}
-function exportPDFServer(){if(!analysisData){toast("Aucun rapport a exporter.","warn");return;}fetch("/api/export/pdf",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({data:analysisData}),credentials:"same-origin"}).then(function(r){if(!r.ok)throw new Error("Erreur export");return r.blob();}).then(function(blob){var a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download="normacheck_rapport.html";a.click();toast("Rapport telecharge.","ok");}).catch(function(e){toast(e.message);exportPDF();});}
-
-/* === RH SALARIES AUTOCOMPLETE === */
-var _salariesCache=null;
-function loadSalariesCache(cb){
-if(_salariesCache){if(cb)cb(_salariesCache);return;}
-fetch("/api/rh/salaries").then(safeJson).then(function(list){
-_salariesCache=Array.isArray(list)?list:[];
-if(cb)cb(_salariesCache);
-}).catch(function(){_salariesCache=[];if(cb)cb([]);});}
-
-function setupSalarieAutocomplete(inputId){
-var inp=document.getElementById(inputId);if(!inp)return;
-inp.setAttribute("autocomplete","off");
-var sugId=inputId+"-sug";
-var existing=document.getElementById(sugId);
-if(!existing){var box=document.createElement("div");box.id=sugId;box.className="sug-box";box.style.cssText="position:relative;z-index:10";inp.parentNode.insertBefore(box,inp.nextSibling);}
-inp.addEventListener("input",function(){
-var q=inp.value.toLowerCase().trim();
-var box=document.getElementById(sugId);if(!box)return;
-if(q.length<1){box.innerHTML="";return;}
-loadSalariesCache(function(list){
-var matches=list.filter(function(s){return(s.nom_complet||"").toLowerCase().indexOf(q)>=0||(s.nom||"").toLowerCase().indexOf(q)>=0||(s.prenom||"").toLowerCase().indexOf(q)>=0;});
-if(!matches.length){box.innerHTML="";return;}
-var h="<div class='sug-list show' style='position:absolute;width:100%;background:var(--card-bg);border:1px solid var(--brd);border-radius:8px;box-shadow:var(--sh);max-height:200px;overflow-y:auto;z-index:100'>";
-for(var i=0;i<Math.min(matches.length,8);i++){var s=matches[i];
-h+="<div class='sug-item' style='padding:8px 12px;cursor:pointer;font-size:.85em;border-bottom:1px solid var(--brd)' data-val='"+_esc(s.nom_complet||s.id)+"'><strong>"+_esc(s.nom_complet||s.id)+"</strong>"+(s.type_contrat?" <span style='color:var(--tx2);font-size:.8em'>"+_esc(s.type_contrat)+"</span>":"")+"</div>";}
-h+="</div>";box.innerHTML=h;
-box.querySelectorAll(".sug-item").forEach(function(el){el.addEventListener("click",function(){inp.value=el.getAttribute("data-val");box.innerHTML="";});});
-});
-});
-inp.addEventListener("focus",function(){if(inp.value.length>=1)inp.dispatchEvent(new Event("input"));});
-}
-
-/* === RH MODULE === */
-function _btnLoading(btn,loading){if(!btn)return;if(loading){btn._origText=btn.innerHTML;btn.classList.add("loading");btn.disabled=true;btn.innerHTML="&#9203; Chargement...";}else{btn.classList.remove("loading");btn.disabled=false;if(btn._origText)btn.innerHTML=btn._origText;}}
-function rhPost(url,fd,cb){var btn=null;try{if(window.event&&window.event.target)btn=window.event.target.closest(".btn");}catch(e){}if(btn)_btnLoading(btn,true);fetch(url,{method:"POST",body:fd}).then(safeJson).then(function(d){if(btn)_btnLoading(btn,false);cb(d);}).catch(function(e){if(btn)_btnLoading(btn,false);toast(e.message);});}
-function rhGet(url,cb){fetch(url).then(safeJson).then(function(d){return (d&&d.items&&typeof d.total==="number")?d.items:d;}).then(cb).catch(function(e){console.error("rhGet "+url,e);toast("Erreur chargement: "+e.message);});}
-
-function creerContrat(){var nom=document.getElementById("rh-ctr-nom").value;var prenom=document.getElementById("rh-ctr-prenom").value;if(!nom||!prenom){toast("Nom et prenom du salarie sont obligatoires.");return;}var fd=new FormData();fd.append("type_contrat",document.getElementById("rh-type-ctr").value);fd.append("nom_salarie",document.getElementById("rh-ctr-nom").value);fd.append("prenom_salarie",document.getElementById("rh-ctr-prenom").value);fd.append("poste",document.getElementById("rh-ctr-poste").value);fd.append("date_debut",document.getElementById("rh-ctr-debut").value);fd.append("date_fin",document.getElementById("rh-ctr-fin").value);fd.append("salaire_brut",document.getElementById("rh-ctr-salaire").value||"0");fd.append("temps_travail",document.getElementById("rh-ctr-temps").value);fd.append("duree_hebdo",document.getElementById("rh-ctr-heures").value);fd.append("convention_collective",document.getElementById("rh-ctr-ccn").value);fd.append("periode_essai_jours",document.getElementById("rh-ctr-essai").value);fd.append("motif_cdd",document.getElementById("rh-ctr-motif").value);var nirEl=document.getElementById("rh-ctr-nir");if(nirEl)fd.append("nir",nirEl.value);
-rhPost("/api/rh/contrats",fd,function(d){toast("Contrat genere.","ok");
-var h="";
-if(d.doublons_detectes&&d.doublons_detectes.length>0){h+="<div class='al warn' style='margin-bottom:10px'><span class='ai'>&#9888;</span><span><strong>Doublon potentiel detecte !</strong> "+d.alerte_doublon+"</span></div>";h+="<div style='background:var(--ol);border:1px solid #fde68a;border-radius:8px;padding:12px;margin-bottom:12px'><strong>Fiche(s) existante(s) :</strong><table style='margin-top:6px'><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Contrat</th><th>Debut</th><th>NIR</th><th>Motif</th><th>Action</th></tr>";
-for(var i=0;i<d.doublons_detectes.length;i++){var dup=d.doublons_detectes[i];var motifLabel=dup.motif==="nir_identique"?"<span class='badge badge-red'>NIR identique</span>":"<span class='badge badge-amber'>Nom/Prenom</span>";h+="<tr><td>"+dup.nom+"</td><td>"+dup.prenom+"</td><td>"+dup.poste+"</td><td>"+dup.type_contrat+"</td><td>"+dup.date_debut+"</td><td style='font-size:.8em'>"+(dup.nir||"-")+"</td><td>"+motifLabel+"</td><td><button class='btn btn-s btn-sm' onclick='fusionnerDoublon("+JSON.stringify(d.id)+","+JSON.stringify(dup.id)+")'>Fusionner</button></td></tr>";}h+="</table></div>";}
-h+="<div class='al ok'><span class='ai'>&#9989;</span><span>Contrat <strong>"+d.type_contrat+" - "+d.nom_salarie+" "+d.prenom_salarie+"</strong> cree (ID: "+d.id+")</span></div>";
-h+="<button class='btn btn-s btn-sm' style='margin:8px 4px 0 0' onclick='voirContrat("+JSON.stringify(d.id)+")'>Visualiser le contrat</button>";
-var eff=d.cascading_effects;if(eff){h+="<div style='margin-top:12px;padding:10px;background:var(--pl);border-radius:8px'><strong>Effets en cascade :</strong><ul style='margin:6px 0 0 16px;font-size:.86em'>";
-if(eff.dpae)h+="<li>&#9888; Rappel : effectuez la DPAE sur net-entreprises.fr avant embauche (ref contrat: "+d.id+")</li>";
-if(eff.visite_medicale)h+="<li>&#128197; Visite medicale programmee avant le "+eff.visite_medicale.echeance+"</li>";
-if(eff.planning_suggestion)h+="<li>&#128197; "+eff.planning_suggestion.message+"</li>";
-if(eff.ecriture_comptable)h+="<li>&#128181; Ecriture comptable provisionnee ("+eff.ecriture_comptable.libelle+")</li>";
-h+="</ul></div>";}
-document.getElementById("rh-ctr-res").innerHTML=h;loadRHContrats();});
-}
-function fusionnerDoublon(idGarder,idSupprimer){if(!confirm("Fusionner les deux fiches ? La fiche la plus ancienne sera completee puis le doublon supprime."))return;fetch("/api/rh/doublons/fusionner",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({id_garder:idGarder,id_supprimer:idSupprimer}),credentials:"same-origin"}).then(safeJson).then(function(r){toast(r.message,"ok");loadRHSalaries();loadRHContrats();}).catch(function(e){toast(e.message||"Erreur fusion");});}
-function detecterDoublons(){fetch("/api/rh/doublons",{credentials:"same-origin"}).then(safeJson).then(function(r){var el=document.getElementById("rh-doublons-alert");if(!r.doublons||!r.doublons.length){el.innerHTML="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#9989;</span><span>Aucun doublon detecte parmi vos salaries.</span></div>";el.style.display="block";return;}el.style.display="block";var h="<div class='al warn' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span><strong>"+r.nb_doublons+" doublon(s) potentiel(s) detecte(s) !</strong> Des salaries apparaissent dans plusieurs fiches. Verifiez et fusionnez si necessaire.</span></div>";for(var i=0;i<r.doublons.length;i++){var d=r.doublons[i];var typeLabel=d.type==="nir"?"<span class='badge badge-red'>Meme NIR : "+d.valeur+"</span>":"<span class='badge badge-amber'>Meme Nom/Prenom : "+d.valeur+"</span>";h+="<div style='border:1px solid var(--brd);border-radius:10px;padding:12px;margin:6px 0'><div style='display:flex;align-items:center;gap:8px;margin-bottom:8px'><strong>"+d.nb_occurrences+" fiches</strong> "+typeLabel+"</div>";h+="<table><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Contrat</th><th>Debut</th><th>NIR</th><th>Source</th><th>Brut</th><th>Action</th></tr>";for(var j=0;j<d.fiches.length;j++){var f=d.fiches[j];var nirAff=f.nir?(f.nir.length>8?f.nir.substring(0,8)+"...":f.nir):"-";h+="<tr><td>"+f.nom+"</td><td>"+f.prenom+"</td><td>"+f.poste+"</td><td>"+f.type_contrat+"</td><td>"+f.date_debut+"</td><td style='font-size:.8em'>"+nirAff+"</td><td style='font-size:.78em'>"+f.source+"</td><td class='num'>"+(parseFloat(f.salaire_brut)||0).toFixed(0)+" EUR</td>";if(j>0)h+="<td><button class='btn btn-s btn-sm' onclick='fusionnerDoublon("+JSON.stringify(d.fiches[0].id)+","+JSON.stringify(f.id)+")'>Fusionner dans 1ere</button></td>";else h+="<td><span class='badge badge-green'>Principale</span></td>";h+="</tr>";}h+="</table></div>";}el.innerHTML=h;}).catch(function(e){toast(e.message||"Erreur detection");});}
-
-function loadRHSalaries(){
-rhGet("/api/rh/contrats",function(list){
-var el=document.getElementById("rh-sal-list");
-if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun salarie detecte. Importez des bulletins de paie, DSN ou contrats dans l onglet Import / Analyse.</p>";return;}
-var nbNonVerif=0;for(var i=0;i<list.length;i++){if(list[i].verifie===false)nbNonVerif++;}
-var h="<div style='display:flex;gap:10px;flex-wrap:wrap;margin-bottom:14px'>";
-h+="<div class='sc blue'><div class='val'>"+list.length+"</div><div class='lab'>Salaries</div></div>";
-var actifs=0;var totalBrut=0;for(var i=0;i<list.length;i++){if(list[i].statut==="actif")actifs++;totalBrut+=parseFloat(list[i].salaire_brut||0);}
-h+="<div class='sc green'><div class='val'>"+actifs+"</div><div class='lab'>Actifs</div></div>";
-h+="<div class='sc'><div class='val'>"+totalBrut.toFixed(0)+" EUR</div><div class='lab'>Masse brute</div></div>";
-if(nbNonVerif>0)h+="<div class='sc amber'><div class='val'>"+nbNonVerif+"</div><div class='lab'>A verifier</div></div>";
-h+="</div>";
-if(nbNonVerif>0){h+="<div class='al warn' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span><strong>"+nbNonVerif+" fiche(s) deduite(s) automatiquement</strong> des documents importes. Cliquez sur <em>Modifier</em> pour verifier et completer les informations.</span></div>";}
-h+="<table class='tb'><thead><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Type</th><th>Debut</th><th class='num'>Brut</th><th>NIR</th><th>Statut</th><th>Source</th><th>Actions</th></tr></thead><tbody>";
-for(var i=0;i<list.length;i++){var c=list[i];
-var isDeduced=(c.verifie===false);
-var cls=isDeduced?"badge-amber":(c.statut==="actif"?"badge-green":(c.statut==="suspendu"?"badge-amber":"badge-red"));
-var statutLabel=isDeduced?"A verifier":c.statut;
-var nirAff=c.nir?(c.nir.length>5?c.nir.substring(0,5)+"...":c.nir):"<em style='color:var(--tx2)'>non renseigne</em>";
-var src=(c.source||"").replace("deduit_analyse","Deduit").replace("analyse_automatique","Auto");
-var rowStyle=isDeduced?"background:rgba(245,158,11,0.08)":"";
-h+="<tr style='"+rowStyle+"'><td><strong>"+c.nom_salarie+"</strong></td><td>"+c.prenom_salarie+"</td><td>"+c.poste+"</td>";
-h+="<td><span class='badge badge-blue'>"+c.type_contrat+"</span></td>";
-h+="<td>"+c.date_debut+"</td>";
-h+="<td class='num'>"+parseFloat(c.salaire_brut||0).toFixed(2)+" EUR</td>";
-h+="<td style='font-size:.8em'>"+nirAff+"</td>";
-h+="<td><span class='badge "+cls+"'>"+statutLabel+"</span></td>";
-h+="<td style='font-size:.78em;color:var(--tx2)'>"+src+"</td>";
-h+="<td><button class='btn btn-s btn-sm' data-action='edit' data-id='"+c.id+"'>Modifier</button></td></tr>";}
-h+="</tbody></table>";
-el.innerHTML=h;
-el.querySelectorAll("[data-action=edit]").forEach(function(b){b.onclick=function(){editSalarie(this.dataset.id);};});
-/* Auto-detection des doublons au chargement */
-if(list.length>1){fetch("/api/rh/doublons",{credentials:"same-origin"}).then(safeJson).then(function(r){var da=document.getElementById("rh-doublons-alert");if(r.doublons&&r.doublons.length>0){da.innerHTML="<div class='al warn' style='margin-bottom:8px;cursor:pointer' onclick='detecterDoublons()'><span class='ai'>&#9888;</span><span><strong>"+r.nb_doublons+" doublon(s) potentiel(s) detecte(s)</strong> parmi vos salaries (meme nom/prenom ou NIR). <u>Cliquez ici pour voir et fusionner.</u></span></div>";da.style.display="block";}else{da.style.display="none";}}).catch(function(){});}
-});
-}
-
-function loadRHContrats(){rhGet("/api/rh/contrats",function(list){
-var el=document.getElementById("rh-ctr-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun contrat.</p>";return;}
-var h="<table class='tb'><thead><tr><th>Type</th><th>Salarie</th><th>Poste</th><th>Debut</th><th>Fin</th><th class='num'>Brut</th><th>Statut</th><th>Actions</th></tr></thead><tbody>";
-for(var i=0;i<list.length;i++){var c=list[i];
-var isDeduced=(c.verifie===false);var cls=isDeduced?"badge-amber":"badge-green";var label=isDeduced?"A verifier":"Verifie";
-var rowStyle=isDeduced?"background:rgba(245,158,11,0.08)":"";
-h+="<tr style='"+rowStyle+"'><td><span class='badge badge-blue'>"+c.type_contrat+"</span></td><td>"+c.prenom_salarie+" "+c.nom_salarie+"</td><td>"+c.poste+"</td><td>"+c.date_debut+"</td><td>"+(c.date_fin||"-")+"</td><td class='num'>"+parseFloat(c.salaire_brut).toFixed(2)+" EUR</td>";
-h+="<td><span class='badge "+cls+"'>"+label+"</span></td>";
-h+="<td><button class='btn btn-s btn-sm' data-action='edit' data-id='"+c.id+"'>Modifier</button>"+(isDeduced?" <button class='btn btn-blue btn-sm' data-action='validate' data-id='"+c.id+"'>Valider</button>":"")+"</td></tr>";}
-h+="</tbody></table>";
-el.innerHTML=h;
-el.querySelectorAll("[data-action=edit]").forEach(function(b){b.onclick=function(){editSalarie(this.dataset.id);};});
-el.querySelectorAll("[data-action=validate]").forEach(function(b){b.onclick=function(){validerFiche(this.dataset.id);};});
-});}
-
-function editSalarie(id){
-rhGet("/api/rh/contrats/"+id,function(c){
-if(!c||c.detail){toast("Fiche introuvable.");return;}
-var h="<div class='card' style='background:var(--pl);border:2px solid var(--p);margin:12px 0'>";
-h+="<h3 style='margin-bottom:12px'>Modifier la fiche de "+c.prenom_salarie+" "+c.nom_salarie+"</h3>";
-h+="<div class='g2'>";
-h+="<div><label>Nom</label><input id='ed-nom' value='"+c.nom_salarie+"'></div>";
-h+="<div><label>Prenom</label><input id='ed-prenom' value='"+c.prenom_salarie+"'></div>";
-h+="<div><label>Poste</label><input id='ed-poste' value='"+c.poste+"'></div>";
-h+="<div><label>Type contrat</label><select id='ed-type'><option"+(c.type_contrat==="CDI"?" selected":"")+">CDI</option><option"+(c.type_contrat==="CDD"?" selected":"")+">CDD</option><option"+(c.type_contrat==="Alternance"?" selected":"")+">Alternance</option><option"+(c.type_contrat==="Stage"?" selected":"")+">Stage</option></select></div>";
-h+="<div><label>Date debut</label><input type='date' id='ed-debut' value='"+c.date_debut+"'></div>";
-h+="<div><label>Date fin</label><input type='date' id='ed-fin' value='"+(c.date_fin||"")+"'></div>";
-h+="<div><label>Salaire brut mensuel</label><input type='number' step='0.01' id='ed-brut' value='"+c.salaire_brut+"'></div>";
-h+="<div><label>NIR (Securite sociale)</label><input id='ed-nir' value='"+(c.nir||"")+"' maxlength='15'></div>";
-h+="<div><label>Convention collective</label><input id='ed-ccn' value='"+(c.convention_collective||"")+"'></div>";
-h+="<div><label>Temps de travail</label><select id='ed-temps'><option value='temps_complet'"+(c.temps_travail==="temps_complet"?" selected":"")+">Temps complet</option><option value='temps_partiel'"+(c.temps_travail==="temps_partiel"?" selected":"")+">Temps partiel</option></select></div>";
-h+="</div>";
-h+="<div style='display:flex;gap:8px;margin-top:14px'>";
-h+="<button class='btn btn-blue' id='btn-sauver-sal'>Enregistrer et valider</button>";
-h+="<button class='btn btn-s' onclick='loadRHSalaries()'>Annuler</button>";
-h+="</div></div>";
-document.getElementById("rh-sal-list").innerHTML+=h;
-document.getElementById("btn-sauver-sal").onclick=function(){sauverSalarie(id);};
-document.getElementById("ed-nom").scrollIntoView({behavior:"smooth"});
-});}
-
-function sauverSalarie(id){
-var fd=new FormData();
-fd.append("nom_salarie",document.getElementById("ed-nom").value);
-fd.append("prenom_salarie",document.getElementById("ed-prenom").value);
-fd.append("poste",document.getElementById("ed-poste").value);
-fd.append("type_contrat",document.getElementById("ed-type").value);
-fd.append("date_debut",document.getElementById("ed-debut").value);
-fd.append("date_fin",document.getElementById("ed-fin").value);
-fd.append("salaire_brut",document.getElementById("ed-brut").value);
-fd.append("nir",document.getElementById("ed-nir").value);
-fd.append("convention_collective",document.getElementById("ed-ccn").value);
-fd.append("temps_travail",document.getElementById("ed-temps").value);
-fd.append("verifie","true");
-rhPost("/api/rh/contrats/"+id+"/modifier",fd,function(){toast("Fiche mise a jour et validee.","ok");loadRHSalaries();loadRHContrats();});}
-
-function validerFiche(id){
-var fd=new FormData();fd.append("verifie","true");
-rhPost("/api/rh/contrats/"+id+"/modifier",fd,function(){toast("Fiche validee.","ok");loadRHSalaries();loadRHContrats();});}
-
-function genererRegistre(){
-rhGet("/api/rh/contrats",function(list){
-if(!list.length){toast("Aucun salarie pour generer le registre.");return;}
-var h="<div style='margin:16px 0'><h3>Registre unique du personnel (modifiable)</h3>";
-h+="<div class='al info' style='margin:8px 0'><span class='ai'>&#128196;</span><span>Ce registre est genere automatiquement a partir des fiches salaries. Vous pouvez le modifier, l imprimer ou l exporter.</span></div>";
-h+="<div id='registre-content' contenteditable='true' style='overflow-x:auto;margin:12px 0;border:1px solid var(--brd);border-radius:8px;padding:12px;background:#fff'>";
-h+="<table class='tb' style='font-size:.88em'><thead><tr><th>N</th><th>Nom</th><th>Prenom</th><th>Date naissance</th><th>NIR</th><th>Nationalite</th><th>Emploi</th><th>Qualification</th><th>Date entree</th><th>Date sortie</th><th>Type contrat</th></tr></thead><tbody>";
-for(var i=0;i<list.length;i++){var c=list[i];
-h+="<tr><td>"+(i+1)+"</td><td>"+c.nom_salarie+"</td><td>"+c.prenom_salarie+"</td><td>-</td><td>"+(c.nir||"-")+"</td><td>-</td><td>"+c.poste+"</td><td>"+c.poste+"</td><td>"+c.date_debut+"</td><td>"+(c.date_fin||"-")+"</td><td>"+c.type_contrat+"</td></tr>";}
-h+="</tbody></table></div>";
-h+="<div style='display:flex;gap:8px'><button class='btn btn-s btn-sm' onclick='window.print()'>Imprimer le registre</button><button class='btn btn-s btn-sm' onclick='exportRegistreCSV()'>Exporter CSV</button></div></div>";
-var target=document.getElementById("rh-sal-list");
-target.innerHTML+=h;
-toast("Registre du personnel genere. Vous pouvez le modifier directement.","ok");
-});}
-
-function exportRegistreCSV(){
-rhGet("/api/rh/contrats",function(list){
-var csv="N;Nom;Prenom;NIR;Emploi;Date entree;Date sortie;Type contrat\\n";
-for(var i=0;i<list.length;i++){var c=list[i];csv+=(i+1)+";"+c.nom_salarie+";"+c.prenom_salarie+";"+(c.nir||"")+";"+c.poste+";"+c.date_debut+";"+(c.date_fin||"")+";"+c.type_contrat+"\\n";}
-var blob=new Blob([csv],{type:"text/csv;charset=utf-8"});var url=URL.createObjectURL(blob);var a=document.createElement("a");a.href=url;a.download="registre_personnel.csv";document.body.appendChild(a);a.click();document.body.removeChild(a);URL.revokeObjectURL(url);
-toast("Registre exporte en CSV.","ok");});}
-
-function creerAvenant(){var fd=new FormData();fd.append("contrat_id",document.getElementById("rh-av-ctr").value);fd.append("type_avenant",document.getElementById("rh-av-type").value);fd.append("description",document.getElementById("rh-av-desc").value);fd.append("date_effet",document.getElementById("rh-av-date").value);fd.append("nouvelles_conditions",document.getElementById("rh-av-desc").value);
-rhPost("/api/rh/avenants",fd,function(){toast("Avenant enregistre.","ok");loadRHAvenants();});}
-function loadRHAvenants(){rhGet("/api/rh/avenants",function(list){var el=document.getElementById("rh-av-list");if(!list.length){el.innerHTML="";return;}var h="<table><tr><th>Contrat</th><th>Type</th><th>Date effet</th><th>Description</th></tr>";for(var i=0;i<list.length;i++){var a=list[i];h+="<tr><td>"+a.contrat_id+"</td><td><span class='badge badge-blue'>"+a.type_avenant+"</span></td><td>"+a.date_effet+"</td><td>"+a.description+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function enregConge(){var sal=document.getElementById("rh-cg-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("nom_salarie",sal);fd.append("type_conge",document.getElementById("rh-cg-type").value);fd.append("date_debut",document.getElementById("rh-cg-dd").value);fd.append("date_fin",document.getElementById("rh-cg-df").value);fd.append("nb_jours",document.getElementById("rh-cg-jours").value);fd.append("statut",document.getElementById("rh-cg-stat").value);
-rhPost("/api/rh/conges",fd,function(){toast("Conge enregistre.","ok");loadRHConges();});}
-function loadRHConges(){rhGet("/api/rh/conges",function(list){var el=document.getElementById("rh-cg-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun conge enregistre.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Debut</th><th>Fin</th><th>Jours</th><th>Statut</th></tr>";for(var i=0;i<list.length;i++){var c=list[i];var cls=c.statut==="valide"?"badge-green":(c.statut==="refuse"?"badge-red":"badge-amber");h+="<tr><td>"+c.salarie_id+"</td><td>"+c.type_conge+"</td><td>"+c.date_debut+"</td><td>"+c.date_fin+"</td><td class='num'>"+c.nb_jours+"</td><td><span class='badge "+cls+"'>"+c.statut+"</span></td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function enregArret(){var sal=document.getElementById("rh-ar-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_arret",document.getElementById("rh-ar-type").value);fd.append("date_debut",document.getElementById("rh-ar-dd").value);fd.append("date_fin",document.getElementById("rh-ar-df").value);fd.append("prolongation",document.getElementById("rh-ar-prol").value);fd.append("subrogation",document.getElementById("rh-ar-sub").value);
-rhPost("/api/rh/arrets",fd,function(){toast("Arret enregistre.","ok");loadRHArrets();});}
-function loadRHArrets(){rhGet("/api/rh/arrets",function(list){var el=document.getElementById("rh-ar-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun arret.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Debut</th><th>Fin</th><th>Subrogation</th></tr>";for(var i=0;i<list.length;i++){var a=list[i];h+="<tr><td>"+a.salarie_id+"</td><td><span class='badge badge-amber'>"+a.type_arret+"</span></td><td>"+a.date_debut+"</td><td>"+a.date_fin+"</td><td>"+(a.subrogation===true||a.subrogation==="true"?"Oui":"Non")+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function enregSanction(){var sal=document.getElementById("rh-sa-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_sanction",document.getElementById("rh-sa-type").value);fd.append("date_sanction",document.getElementById("rh-sa-date").value);fd.append("motif",document.getElementById("rh-sa-motif").value);fd.append("description",document.getElementById("rh-sa-desc").value);fd.append("date_entretien_prealable",document.getElementById("rh-sa-epr").value);
-rhPost("/api/rh/sanctions",fd,function(){toast("Sanction enregistree.","ok");loadRHSanctions();});}
-function loadRHSanctions(){rhGet("/api/rh/sanctions",function(list){var el=document.getElementById("rh-sa-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune sanction.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Motif</th></tr>";for(var i=0;i<list.length;i++){var s=list[i];h+="<tr><td>"+s.salarie_id+"</td><td><span class='badge badge-red'>"+s.type_sanction+"</span></td><td>"+s.date_sanction+"</td><td>"+s.motif+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function enregEntretien(){var sal=document.getElementById("rh-en-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_entretien",document.getElementById("rh-en-type").value);fd.append("date_entretien",document.getElementById("rh-en-date").value);fd.append("compte_rendu",document.getElementById("rh-en-cr").value);fd.append("date_prochain",document.getElementById("rh-en-next").value);
-rhPost("/api/rh/entretiens",fd,function(){toast("Entretien enregistre.","ok");loadRHEntretiens();});}
-function loadRHEntretiens(){rhGet("/api/rh/entretiens",function(list){var el=document.getElementById("rh-en-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun entretien.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Prochain</th></tr>";for(var i=0;i<list.length;i++){var e=list[i];h+="<tr><td>"+e.salarie_id+"</td><td><span class='badge badge-blue'>"+e.type_entretien+"</span></td><td>"+e.date_entretien+"</td><td>"+(e.date_prochain||"-")+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function enregVisite(){var sal=document.getElementById("rh-vm-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_visite",document.getElementById("rh-vm-type").value);fd.append("date_visite",document.getElementById("rh-vm-date").value);fd.append("resultat",document.getElementById("rh-vm-res").value);fd.append("remarques",document.getElementById("rh-vm-rem").value);fd.append("date_prochaine",document.getElementById("rh-vm-next").value);
-rhPost("/api/rh/visites-medicales",fd,function(){toast("Visite enregistree.","ok");loadRHVisites();});}
-function loadRHVisites(){rhGet("/api/rh/visites-medicales",function(list){var el=document.getElementById("rh-vm-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune visite.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Resultat</th><th>Prochaine</th></tr>";for(var i=0;i<list.length;i++){var v=list[i];var cls=v.resultat==="apte"?"badge-green":(v.resultat==="inapte"?"badge-red":"badge-amber");h+="<tr><td>"+v.salarie_id+"</td><td>"+v.type_visite+"</td><td>"+v.date_visite+"</td><td><span class='badge "+cls+"'>"+v.resultat+"</span></td><td>"+(v.date_prochaine||"-")+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function genererAttestation(){var sal=document.getElementById("rh-at-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_attestation",document.getElementById("rh-at-type").value);fd.append("date_generation",new Date().toISOString().substring(0,10));var btn=event&&event.target?event.target.closest(".btn"):null;
-rhPost("/api/rh/attestations/generer",fd,function(d){document.getElementById("rh-at-res").innerHTML="<div class='card' style='background:var(--pl);margin-top:8px'><pre style='white-space:pre-wrap;font-size:.82em;line-height:1.6'>"+(d.texte||d.contenu||"Erreur generation")+"</pre><button class='btn btn-s btn-sm' onclick='window.print()'>Imprimer</button></div>";toast("Attestation generee.","ok");loadRHAttestations();});}
-function loadRHAttestations(){rhGet("/api/rh/attestations",function(list){var el=document.getElementById("rh-at-list");if(!list.length){el.innerHTML="";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th></tr>";for(var i=0;i<list.length;i++){var a=list[i];h+="<tr><td>"+a.salarie_id+"</td><td><span class='badge badge-blue'>"+a.type_attestation+"</span></td><td>"+a.date_generation+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-var _planningView="semaine";
-var _planningDate=new Date();
-var _planningColors={"normal":"#3b82f6","astreinte":"#f59e0b","nuit":"#6366f1","dimanche":"#ef4444","ferie":"#22c55e"};
-var _statutColors={"present":"#22c55e","conge_cp":"#f97316","conge_maladie":"#e11d48","arret_maladie":"#e11d48","arret_accident_travail":"#dc2626","formation":"#0ea5e9","teletravail":"#8b5cf6"};
-
-function setPlanningView(v){_planningView=v;
-["jour","semaine","mois","annee"].forEach(function(k){var b=document.getElementById("pl-v-"+k);if(b){b.style.border="2px solid transparent";b.style.background="";b.style.color="";}});
-var ab=document.getElementById("pl-v-"+v);if(ab){ab.style.border="2px solid var(--p2)";ab.style.background="var(--p2)";ab.style.color="#fff";}
-renderPlanningView();}
-
-function planningNav(dir){
-if(_planningView==="jour"){_planningDate.setDate(_planningDate.getDate()+dir);}
-else if(_planningView==="semaine"){_planningDate.setDate(_planningDate.getDate()+7*dir);}
-else if(_planningView==="mois"){_planningDate.setMonth(_planningDate.getMonth()+dir);}
-else if(_planningView==="annee"){_planningDate.setFullYear(_planningDate.getFullYear()+dir);}
-document.getElementById("rh-pl-sem").value=_planningDate.toISOString().substring(0,10);
-renderPlanningView();}
-
-function planningGoToday(){_planningDate=new Date();document.getElementById("rh-pl-sem").value=_planningDate.toISOString().substring(0,10);renderPlanningView();}
-
-function renderPlanningView(){
-var semInput=document.getElementById("rh-pl-sem");
-if(semInput&&semInput.value){var parsed=new Date(semInput.value+"T12:00:00");if(!isNaN(parsed.getTime()))_planningDate=parsed;}
-if(!semInput.value){semInput.value=_planningDate.toISOString().substring(0,10);}
-if(_planningView==="jour")renderPlanningJour();
-else if(_planningView==="semaine")renderPlanningHebdo();
-else if(_planningView==="mois")renderPlanningMois();
-else if(_planningView==="annee")renderPlanningAnnee();}
-
-function _plFilter(){return(document.getElementById("rh-pl-filter")||{}).value||"";}
-function _plStatutFilter(){return(document.getElementById("rh-pl-statut-filter")||{}).value||"";}
-function _plFmtDate(d){return d.toLocaleDateString("fr-FR",{weekday:"long",day:"numeric",month:"long",year:"numeric"});}
-function _plChangeStatut(sel){if(!sel.value)return;var fd=new FormData();fd.append("salarie_id",sel.getAttribute("data-sid"));fd.append("date",sel.getAttribute("data-date"));fd.append("statut",sel.value);rhPost("/api/rh/planning",fd,function(){toast("Statut modifie.","ok");renderPlanningView();});}
-function _plStatutBadge(st){var c=_statutColors[st]||"#94a3b8";var labels={"present":"Present","conge_cp":"Conge CP","conge_maladie":"Arret maladie","arret_maladie":"Arret maladie","arret_accident_travail":"AT","formation":"Formation","teletravail":"Teletravail"};return "<span style='background:"+c+";color:#fff;border-radius:4px;padding:1px 6px;font-size:.75em'>"+(labels[st]||st||"Present")+"</span>";}
-function _plSlotDiv(s){var tp=s.type_poste||s.type||"normal";var bg=_planningColors[tp]||"#3b82f6";var pid=s.id||"";var sid=s.salarie_id||"";var dt=s.date||"";var h="<div style='background:"+bg+";color:#fff;border-radius:4px;padding:2px 6px;margin:1px 0;font-size:.78em;display:inline-flex;align-items:center;gap:4px;position:relative' class='pl-slot'>"+(s.heure_debut||"")+"-"+(s.heure_fin||"");if(pid){h+=" <span data-pl-action='delete' data-pl-id='"+pid+"' style='cursor:pointer;opacity:.7;font-size:.9em' title='Supprimer'>&#10005;</span>";}h+="</div>";return h;}
-
-function renderPlanningJour(){
-var ds=_planningDate.toISOString().substring(0,10);
-var label=document.getElementById("rh-pl-period-label");if(label)label.textContent=_plFmtDate(_planningDate);
-var filter=_plFilter().toLowerCase();var stFilter=_plStatutFilter();
-var url="/api/rh/planning/jour?date_jour="+ds;if(stFilter)url+="&statut="+stFilter;
-rhGet(url,function(data){
-var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
-var entrees=data.entrees||[];if(filter)entrees=entrees.filter(function(e){return(e.salarie_nom||e.salarie_id||"").toLowerCase().indexOf(filter)>=0;});
-var h="<div style='text-align:center;margin:8px 0;font-size:.85em;color:var(--tx2)'>"+data.jour+" &mdash; <b>"+data.nb_presents+"</b> present(s), <b>"+data.nb_absents+"</b> absent(s)</div>";
-h+="<table style='width:100%;border-collapse:collapse;font-size:.85em'><tr style='background:var(--p2);color:#fff'><th style='padding:8px;text-align:left'>Salarie</th><th>Horaires</th><th>Type</th><th>Statut</th></tr>";
-if(!entrees.length){h+="<tr><td colspan='4' style='text-align:center;padding:20px;color:var(--tx2)'>Aucun salarie ce jour.</td></tr>";}
-for(var i=0;i<entrees.length;i++){var e=entrees[i];var st=e.statut_reel||e.statut||"present";var stc=_statutColors[st]||"#94a3b8";
-h+="<tr style='border-bottom:1px solid var(--brd)'><td style='padding:6px;font-weight:600'>"+_esc(e.salarie_nom||e.salarie_id||"?")+"</td>";
-h+="<td style='text-align:center'>"+((e.heure_debut&&e.heure_fin)?_plSlotDiv(e):"<span style='color:#cbd5e1'>-</span>")+"</td>";
-h+="<td style='text-align:center'><span class='badge badge-blue'>"+(e.type_poste||"-")+"</span></td>";
-h+="<td style='text-align:center'>"+_plStatutBadge(st)+"</td></tr>";}
-h+="</table>";
-cal.innerHTML=h;
-_renderPlanningStats(data);});}
-
-function renderPlanningHebdo(){
-var startDate=new Date(_planningDate);startDate.setDate(startDate.getDate()-startDate.getDay()+1);
-var endDate=new Date(startDate);endDate.setDate(endDate.getDate()+6);
-var label=document.getElementById("rh-pl-period-label");
-if(label)label.textContent=startDate.toLocaleDateString("fr-FR",{day:"numeric",month:"short"})+" - "+endDate.toLocaleDateString("fr-FR",{day:"numeric",month:"short",year:"numeric"});
-var filter=_plFilter().toLowerCase();var stFilter=_plStatutFilter();
-rhGet("/api/rh/planning",function(list){
-var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
-if(Array.isArray(list)===false&&list.entrees)list=list.entrees;
-if(!Array.isArray(list))list=[];
-var jours=["Lun","Mar","Mer","Jeu","Ven","Sam","Dim"];
-var h="<table style='width:100%;border-collapse:collapse;font-size:.82em'><tr style='background:var(--p2);color:#fff'><th style='padding:8px;text-align:left;min-width:120px'>Salarie</th>";
-for(var j=0;j<7;j++){var d=new Date(startDate);d.setDate(d.getDate()+j);var isToday=d.toISOString().substring(0,10)===new Date().toISOString().substring(0,10);h+="<th style='padding:8px;text-align:center;"+(isToday?"background:#1e40af;":"")+"'>"+jours[j]+"<br><small>"+d.toLocaleDateString("fr-FR",{day:"numeric",month:"short"})+"</small></th>";}
-h+="</tr>";
-var salaries={};for(var i=0;i<list.length;i++){var p=list[i];var sid=p.salarie_nom||p.salarie_id||"?";if(filter&&sid.toLowerCase().indexOf(filter)<0)continue;var st=p.statut_reel||p.statut||"present";if(stFilter&&st!==stFilter)continue;if(!salaries[sid])salaries[sid]={statut:st,_sid:p.salarie_id||sid};var pd=new Date(p.date+"T12:00:00");for(var j=0;j<7;j++){var cd=new Date(startDate);cd.setDate(cd.getDate()+j);if(pd.toISOString().substring(0,10)===cd.toISOString().substring(0,10)){if(!salaries[sid][j])salaries[sid][j]=[];salaries[sid][j].push(p);}}}
-var nbPresent=0,nbAbsent=0;
-for(var sid in salaries){var st=salaries[sid].statut||"present";var stc=_statutColors[st]||"#94a3b8";
-h+="<tr><td style='padding:6px;font-weight:600;border-bottom:1px solid var(--brd);border-left:4px solid "+stc+"'>"+_esc(sid)+" "+_plStatutBadge(st)+" <select style='font-size:.7em;padding:1px 4px;border-radius:4px;border:1px solid var(--brd);margin-left:4px' data-sid='"+_esc(salaries[sid]._sid||sid)+"' data-date='"+startDate.toISOString().substring(0,10)+"' onchange='_plChangeStatut(this)'><option value=''>Modifier...</option><option value='present'>Present</option><option value='conge_cp'>Conge CP</option><option value='conge_maladie'>Arret maladie</option><option value='formation'>Formation</option><option value='teletravail'>Teletravail</option></select></td>";
-if(st==="present")nbPresent++;else nbAbsent++;
-for(var j=0;j<7;j++){var isToday2=false;var cd2=new Date(startDate);cd2.setDate(cd2.getDate()+j);if(cd2.toISOString().substring(0,10)===new Date().toISOString().substring(0,10))isToday2=true;
-h+="<td style='padding:4px;border-bottom:1px solid var(--brd);text-align:center;vertical-align:top;"+(isToday2?"background:rgba(59,130,246,.06);":"")+"'>";var slots=salaries[sid][j]||[];for(var k=0;k<slots.length;k++){h+=_plSlotDiv(slots[k]);}
-if(!slots.length)h+="<span style='color:#cbd5e1'>-</span>";h+="</td>";}h+="</tr>";}
-if(!Object.keys(salaries).length){h+="<tr><td colspan='8' style='text-align:center;padding:20px;color:var(--tx2)'>Aucun creneau pour cette semaine.</td></tr>";}
-h+="</table>";
-cal.innerHTML=h;
-var statsEl=document.getElementById("rh-pl-stats");if(statsEl)statsEl.innerHTML="<div class='card' style='padding:8px 14px;background:#f0fdf4;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#16a34a'>"+nbPresent+"</div><div style='font-size:.78em;color:#166534'>Presents</div></div><div class='card' style='padding:8px 14px;background:#fef2f2;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#dc2626'>"+nbAbsent+"</div><div style='font-size:.78em;color:#991b1b'>Absents</div></div>";});}
-
-function renderPlanningMois(){
-var y=_planningDate.getFullYear();var m=_planningDate.getMonth()+1;
-var moisNoms=["","Janvier","Fevrier","Mars","Avril","Mai","Juin","Juillet","Aout","Septembre","Octobre","Novembre","Decembre"];
-var label=document.getElementById("rh-pl-period-label");if(label)label.textContent=moisNoms[m]+" "+y;
-var filter=_plFilter().toLowerCase();var stFilter=_plStatutFilter();
-var url="/api/rh/planning/mois?annee="+y+"&mois="+m;if(stFilter)url+="&statut="+stFilter;
-rhGet(url,function(data){
-var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
-var jours=data.jours||[];
-var joursSem=["Lun","Mar","Mer","Jeu","Ven","Sam","Dim"];
-var h="<table style='width:100%;border-collapse:collapse;font-size:.78em;table-layout:fixed'>";
-h+="<tr style='background:var(--p2);color:#fff'>";for(var j=0;j<7;j++)h+="<th style='padding:6px;text-align:center;width:14.28%'>"+joursSem[j]+"</th>";h+="</tr>";
-var firstDay=new Date(y,m-1,1);var startDow=(firstDay.getDay()+6)%7;
-var todayStr=new Date().toISOString().substring(0,10);
-h+="<tr>";for(var i=0;i<startDow;i++)h+="<td style='border:1px solid var(--brd);padding:4px;vertical-align:top;min-height:60px'></td>";
-var cellCount=startDow;
-for(var d=0;d<jours.length;d++){if(cellCount>0&&cellCount%7===0)h+="</tr><tr>";
-var jour=jours[d];var isToday=jour.date===todayStr;
-var bgCol=isToday?"rgba(59,130,246,.1)":"";
-h+="<td style='border:1px solid var(--brd);padding:4px;vertical-align:top;min-height:70px;background:"+bgCol+"'>";
-h+="<div style='font-weight:600;font-size:1em;margin-bottom:2px;"+(isToday?"color:var(--p2);":"")+"'>"+(d+1)+"</div>";
-if(jour.nb_salaries>0){
-h+="<div style='display:flex;gap:3px;flex-wrap:wrap'>";
-if(jour.nb_presents>0)h+="<span style='background:#22c55e;color:#fff;border-radius:3px;padding:0 4px;font-size:.72em'>"+jour.nb_presents+" P</span>";
-if(jour.nb_absents>0)h+="<span style='background:#ef4444;color:#fff;border-radius:3px;padding:0 4px;font-size:.72em'>"+jour.nb_absents+" A</span>";
-h+="</div>";
-var entrees=jour.entrees||[];if(filter)entrees=entrees.filter(function(e){return(e.salarie_nom||e.salarie_id||"").toLowerCase().indexOf(filter)>=0;});
-for(var e=0;e<Math.min(entrees.length,3);e++){var en=entrees[e];var stc=_statutColors[en.statut]||"#94a3b8";
-h+="<div style='font-size:.68em;margin-top:1px;border-left:3px solid "+stc+";padding-left:3px;white-space:nowrap;overflow:hidden;text-overflow:ellipsis' title='"+_esc(en.salarie_nom||en.salarie_id)+" - "+_esc(en.statut||"present")+"'>"+_esc(en.salarie_nom||en.salarie_id||"?")+"</div>";}
-if(entrees.length>3)h+="<div style='font-size:.65em;color:var(--tx2)'>+"+(entrees.length-3)+" autres</div>";}
-h+="</td>";cellCount++;}
-while(cellCount%7!==0){h+="<td style='border:1px solid var(--brd);padding:4px'></td>";cellCount++;}
-h+="</tr></table>";
-cal.innerHTML=h;
-var statsEl=document.getElementById("rh-pl-stats");if(statsEl){var totH=data.total_heures_planifiees||0;statsEl.innerHTML="<div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:var(--p2)'>"+totH+"h</div><div style='font-size:.78em;color:var(--tx2)'>Heures planifiees</div></div>";}});}
-
-function renderPlanningAnnee(){
-var y=_planningDate.getFullYear();
-var label=document.getElementById("rh-pl-period-label");if(label)label.textContent="Annee "+y;
-var filter=_plFilter().toLowerCase();
-var url="/api/rh/planning/annee?annee="+y;if(filter)url+="&salarie_id="+encodeURIComponent(filter);
-rhGet(url,function(data){
-var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
-var moisData=data.mois||[];
-var moisNoms=["","Jan","Fev","Mar","Avr","Mai","Jun","Jul","Aou","Sep","Oct","Nov","Dec"];
-var h="<div style='display:grid;grid-template-columns:repeat(4,1fr);gap:10px;padding:8px'>";
-for(var i=0;i<moisData.length;i++){var md=moisData[i];
-var pct=md.jours_travailles>0?Math.round((md.jours_travailles/(md.jours_travailles+md.jours_absence||1))*100):0;
-var barColor=pct>75?"#22c55e":(pct>50?"#f59e0b":"#ef4444");
-h+="<div class='card' style='padding:10px;cursor:pointer' onclick='_planningDate=new Date("+y+","+(md.mois-1)+",1);setPlanningView("+JSON.stringify("mois")+")'>";
-h+="<div style='font-weight:700;font-size:.95em;margin-bottom:6px'>"+moisNoms[md.mois]+"</div>";
-h+="<div style='display:flex;justify-content:space-between;font-size:.78em;color:var(--tx2)'><span>"+md.jours_travailles+"j trav.</span><span>"+md.heures_planifiees+"h</span></div>";
-if(md.jours_absence>0)h+="<div style='font-size:.75em;color:#e11d48;margin-top:2px'>"+md.jours_absence+"j absence</div>";
-h+="<div style='background:#e5e7eb;border-radius:4px;height:6px;margin-top:6px'><div style='background:"+barColor+";border-radius:4px;height:6px;width:"+pct+"%'></div></div>";
-h+="</div>";}
-h+="</div>";
-cal.innerHTML=h;
-var statsEl=document.getElementById("rh-pl-stats");if(statsEl)statsEl.innerHTML="<div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:var(--p2)'>"+data.total_heures+"h</div><div style='font-size:.78em;color:var(--tx2)'>Total heures "+y+"</div></div><div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#16a34a'>"+data.total_jours_travailles+"</div><div style='font-size:.78em;color:var(--tx2)'>Jours travailles</div></div><div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#dc2626'>"+data.total_jours_absence+"</div><div style='font-size:.78em;color:var(--tx2)'>Jours absence</div></div>";});}
-
-function _renderPlanningStats(data){var el=document.getElementById("rh-pl-stats");if(!el)return;el.innerHTML="<div class='card' style='padding:8px 14px;background:#f0fdf4;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#16a34a'>"+(data.nb_presents||0)+"</div><div style='font-size:.78em;color:#166534'>Presents</div></div><div class='card' style='padding:8px 14px;background:#fef2f2;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#dc2626'>"+(data.nb_absents||0)+"</div><div style='font-size:.78em;color:#991b1b'>Absents</div></div>";}
-
-function integrerSalaries(){
-var today=new Date();var nextWeek=new Date();nextWeek.setDate(nextWeek.getDate()+7);
-document.getElementById("rh-pl-int-debut").value=today.toISOString().substring(0,10);
-document.getElementById("rh-pl-int-fin").value=nextWeek.toISOString().substring(0,10);
-document.getElementById("rh-pl-integrer-section").open=true;
-document.getElementById("rh-pl-integrer-section").scrollIntoView({behavior:"smooth"});}
-
-function integrerSalariesManuel(){
-var fd=new FormData();
-fd.append("date_debut",document.getElementById("rh-pl-int-debut").value);
-fd.append("date_fin",document.getElementById("rh-pl-int-fin").value);
-fd.append("heure_debut",document.getElementById("rh-pl-int-hd").value);
-fd.append("heure_fin",document.getElementById("rh-pl-int-hf").value);
-fd.append("jours_semaine",document.getElementById("rh-pl-int-jours").value);
-rhPost("/api/rh/planning/integrer-salaries",fd,function(d){
-var res=document.getElementById("rh-pl-int-result");
-res.innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span><b>"+d.nb_entrees_creees+"</b> creneaux crees pour <b>"+d.nb_salaries+"</b> salaries.</span></div>";
-toast(d.nb_entrees_creees+" creneaux crees","ok");renderPlanningView();});}
-
-function ajouterPlanning(){var fd=new FormData();var sal=document.getElementById("rh-pl-sal").value;if(!sal){toast("Veuillez saisir un salarie.");return;}fd.append("salarie_id",sal);fd.append("date",document.getElementById("rh-pl-date").value);var dateFin=document.getElementById("rh-pl-date-fin").value;if(dateFin)fd.append("date_fin",dateFin);fd.append("heure_debut",document.getElementById("rh-pl-hd").value);fd.append("heure_fin",document.getElementById("rh-pl-hf").value);fd.append("type_poste",document.getElementById("rh-pl-type").value);var statut=(document.getElementById("rh-pl-statut")||{}).value;if(statut)fd.append("statut",statut);var jours=(document.getElementById("rh-pl-jours")||{}).value;if(jours)fd.append("jours_semaine",jours);
-rhPost("/api/rh/planning",fd,function(d){if(d.nb_creneaux_crees){toast(d.nb_creneaux_crees+" creneaux crees sur la periode.","ok");}else{toast("Planning mis a jour.","ok");}renderPlanningView();});}
-function loadRHPlanning(){var semInput=document.getElementById("rh-pl-sem");if(semInput&&!semInput.value){semInput.value=new Date().toISOString().substring(0,10);}renderPlanningView();}
-function renderCalendar(){renderPlanningView();}
-/* Interactive planning: click on slot to edit, drag to extend */
-document.addEventListener("click",function(ev){
-var target=ev.target.closest("[data-pl-action]");if(!target)return;
-var action=target.getAttribute("data-pl-action");var pid=target.getAttribute("data-pl-id");var sid=target.getAttribute("data-pl-sid");
-if(action==="delete"){if(!confirm("Supprimer ce creneau ?"))return;fetch("/api/rh/planning/"+pid,{method:"DELETE"}).then(safeJson).then(function(){toast("Creneau supprime.","ok");renderPlanningView();}).catch(function(e){toast(e.message);});}
-if(action==="edit-statut"){var newSt=target.getAttribute("data-pl-statut");var fd=new FormData();fd.append("salarie_id",sid);fd.append("date",target.getAttribute("data-pl-date"));fd.append("statut",newSt);rhPost("/api/rh/planning",fd,function(){toast("Statut modifie.","ok");renderPlanningView();});}
-});
-function voirContrat(id){window.open("/api/rh/contrats/"+id+"/document","_blank");}
-function voirBulletinDoc(el){var bid=el.dataset.bid;if(bid)window.open("/api/rh/bulletins/"+bid+"/document","_blank");}
-
-function enregEchange(){var sal=document.getElementById("rh-ec-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("objet",document.getElementById("rh-ec-obj").value);fd.append("contenu",document.getElementById("rh-ec-txt").value);fd.append("type_echange",document.getElementById("rh-ec-type").value);fd.append("date_echange",document.getElementById("rh-ec-date").value);
-rhPost("/api/rh/echanges",fd,function(){toast("Echange enregistre.","ok");loadRHEchanges();});}
-function loadRHEchanges(){rhGet("/api/rh/echanges",function(list){var el=document.getElementById("rh-ec-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun echange.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Objet</th></tr>";for(var i=0;i<list.length;i++){var e=list[i];h+="<tr><td>"+e.salarie_id+"</td><td><span class='badge badge-blue'>"+e.type_echange+"</span></td><td>"+e.date_echange+"</td><td>"+e.objet+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
-
-function loadRHAlertes(){rhGet("/api/rh/alertes",function(resp){
-var list=(resp&&resp.alertes)?resp.alertes:(Array.isArray(resp)?resp:[]);
-_rhAlertesData=list;renderAlertesList(list);});}
-var _rhAlertesData=null;
-function filtrerAlertesUrgence(urg){if(!_rhAlertesData)return;var list=_rhAlertesData;if(urg)list=list.filter(function(a){return a.urgence===urg;});renderAlertesList(list);}
-function renderAlertesList(list){var el=document.getElementById("rh-alertes-list");
-if(!list||!list.length){el.innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Aucune alerte en cours.</span></div>";return;}
-var h="<p style='color:var(--tx2);font-size:.82em;margin-bottom:8px'>"+list.length+" alerte(s)</p>";
-for(var i=0;i<list.length;i++){var a=list[i];var cls=a.urgence==="haute"?"err":(a.urgence==="moyenne"?"warn":"info");
-var icon=a.urgence==="haute"?"&#9888;":(a.urgence==="moyenne"?"&#128161;":"&#8505;");
-h+="<div class='anomalie sev-"+(a.urgence==="haute"?"high":(a.urgence==="moyenne"?"med":"low"))+"' data-toggle='1' style='margin:6px 0'>";
-h+="<div class='head'><div class='title'>"+(a.titre||a.type||"Alerte");
-if(a.est_libre)h+=" <span class='badge badge-purple' style='font-size:.68em;vertical-align:middle'>Personnalisee</span>";
-if(a.recurrence)h+=" <span class='badge badge-teal' style='font-size:.68em;vertical-align:middle'>"+a.recurrence+"</span>";
-h+="</div><div style='display:flex;gap:4px;align-items:center'>";
-if(a.echeance)h+="<span class='badge badge-amber'>"+a.echeance+"</span>";
-h+="<span class='badge badge-"+cls+"'>"+a.urgence+"</span>";
-h+="</div></div>";
-h+="<div style='font-size:.84em;color:var(--tx2);margin-top:4px'>"+(a.description||"")+"</div>";
-h+="<div class='detail'>";
-if(a.incidence_legale)h+="<p style='color:var(--r);font-weight:600;margin:4px 0'>&#9888; Consequence legale : "+a.incidence_legale+"</p>";
-if(a.reference)h+="<p style='margin:4px 0;color:var(--tx2)'>Reference : "+a.reference+"</p>";
-if(a.action_requise)h+="<p style='margin:4px 0'><strong>Action requise :</strong> "+a.action_requise+"</p>";
-if(a.notes)h+="<p style='margin:4px 0;font-style:italic;color:var(--tx2)'>Notes : "+a.notes+"</p>";
-if(a.message_personnalise)h+="<p style='margin:4px 0;color:var(--p2)'>["+a.message_personnalise+"]</p>";
-if(a.est_libre)h+="<div style='margin-top:8px'><button class='btn btn-sm' style='background:var(--ol);color:#92400e' data-action='traiterAlerte' data-id='"+a.id+"'>Marquer traitee</button> <button class='btn btn-sm btn-red' data-action='suppAlerte' data-id='"+a.id+"'>Supprimer</button></div>";
-h+="</div></div>";}
-el.innerHTML=h;}
-function creerAlerteLibre(){var titre=document.getElementById("al-titre").value;if(!titre){toast("Le titre est obligatoire.");return;}
-var fd=new FormData();fd.append("titre",titre);fd.append("description",document.getElementById("al-desc").value);fd.append("categorie",document.getElementById("al-categorie").value);fd.append("urgence",document.getElementById("al-urgence").value);fd.append("date_echeance",document.getElementById("al-echeance").value);fd.append("recurrence",document.getElementById("al-recurrence").value);fd.append("action_requise",document.getElementById("al-action").value);fd.append("destinataire",document.getElementById("al-destinataire").value);fd.append("reference_legale",document.getElementById("al-ref").value);fd.append("delai_rappel_jours",document.getElementById("al-delai").value);fd.append("notes",document.getElementById("al-notes").value);
-rhPost("/api/rh/alertes/libres",fd,function(d){document.getElementById("al-creer-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Alerte <strong>"+d.titre+"</strong> creee avec succes.</span></div>";document.getElementById("al-titre").value="";document.getElementById("al-desc").value="";document.getElementById("al-action").value="";document.getElementById("al-destinataire").value="";document.getElementById("al-ref").value="";document.getElementById("al-notes").value="";document.getElementById("al-echeance").value="";toast("Alerte personnalisee creee.","ok");});}
-function loadAlertesLibres(){rhGet("/api/rh/alertes/libres",function(list){var el=document.getElementById("rh-alertes-libres-list");
-if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune alerte personnalisee configuree. Utilisez l onglet <strong>Creer une alerte</strong> pour ajouter vos propres rappels.</p>";return;}
-var h="<p style='color:var(--tx2);font-size:.82em;margin-bottom:8px'>"+list.length+" alerte(s) personnalisee(s)</p>";
-var urgColors={"haute":"err","moyenne":"warn","info":"info"};
-var statutLabels={"active":"badge-green","traitee":"badge-blue","reportee":"badge-amber","archivee":"badge-red"};
-for(var i=0;i<list.length;i++){var a=list[i];
-h+="<div class='card' style='margin:8px 0;padding:16px;border-left:4px solid var(--"+(a.urgence==="haute"?"r":(a.urgence==="moyenne"?"o":"p3"))+")'>";
-h+="<div style='display:flex;justify-content:space-between;align-items:flex-start;flex-wrap:wrap;gap:6px'>";
-h+="<div><strong>"+a.titre+"</strong>";
-if(a.categorie&&a.categorie!=="autre")h+=" <span class='badge badge-blue'>"+a.categorie+"</span>";
-h+="</div><div style='display:flex;gap:4px'>";
-h+="<span class='badge badge-"+(urgColors[a.urgence]||"info")+"'>"+a.urgence+"</span>";
-h+="<span class='badge "+(statutLabels[a.statut]||"badge-green")+"'>"+(a.statut||"active")+"</span>";
-if(a.recurrence)h+="<span class='badge badge-teal'>"+a.recurrence+"</span>";
-h+="</div></div>";
-if(a.description)h+="<div style='font-size:.86em;color:var(--tx);margin-top:6px'>"+a.description+"</div>";
-var details=[];
-if(a.date_echeance)details.push("<strong>Echeance :</strong> "+a.date_echeance);
-if(a.action_requise)details.push("<strong>Action :</strong> "+a.action_requise);
-if(a.destinataire)details.push("<strong>Responsable :</strong> "+a.destinataire);
-if(a.reference_legale)details.push("<strong>Ref. legale :</strong> "+a.reference_legale);
-if(a.delai_rappel_jours)details.push("<strong>Rappel :</strong> "+a.delai_rappel_jours+" jours avant");
-if(details.length)h+="<div style='margin-top:8px;font-size:.82em;color:var(--tx2)'>"+details.join(" &bull; ")+"</div>";
-if(a.notes)h+="<div style='margin-top:4px;font-size:.82em;font-style:italic;color:var(--tx2)'>"+a.notes+"</div>";
-h+="<div style='margin-top:10px;display:flex;gap:6px'>";
-if(a.statut!=="traitee")h+="<button class='btn btn-sm btn-green' data-action='traiterAlerte' data-id='"+a.id+"'>Traitee</button>";
-if(a.statut!=="archivee")h+="<button class='btn btn-sm btn-s' data-action='archiverAlerte' data-id='"+a.id+"'>Archiver</button>";
-h+="<button class='btn btn-sm btn-red' data-action='suppAlerte' data-id='"+a.id+"'>Supprimer</button>";
-h+="</div></div>";}
-el.innerHTML=h;});}
-function marquerAlerteTraitee(id){var fd=new FormData();fd.append("statut","traitee");fetch("/api/rh/alertes/libres/"+id,{method:"PUT",body:fd}).then(safeJson).then(function(){toast("Alerte marquee comme traitee.","ok");loadAlertesLibres();loadRHAlertes();}).catch(function(e){toast(e.message);});}
-function archiverAlerteLibre(id){var fd=new FormData();fd.append("statut","archivee");fetch("/api/rh/alertes/libres/"+id,{method:"PUT",body:fd}).then(safeJson).then(function(){toast("Alerte archivee.","ok");loadAlertesLibres();loadRHAlertes();}).catch(function(e){toast(e.message);});}
-function supprimerAlerteLibre(id){if(!confirm("Supprimer cette alerte ?"))return;fetch("/api/rh/alertes/libres/"+id,{method:"DELETE"}).then(safeJson).then(function(){toast("Alerte supprimee.","ok");loadAlertesLibres();loadRHAlertes();}).catch(function(e){toast(e.message);});}
-function exportAlertes(){if(!_rhAlertesData||!_rhAlertesData.length)return;var csv="Urgence;Titre;Description;Reference;Action requise;Echeance\\n";for(var i=0;i<_rhAlertesData.length;i++){var a=_rhAlertesData[i];csv+='"'+(a.urgence||"")+'";"'+(a.titre||"")+'";"'+((a.description||"").replace(/"/g,"'"))+'";"'+(a.reference||"")+'";"'+(a.action_requise||"")+'";"'+(a.echeance||"")+'"'+"\\n";}var b=new Blob([csv],{type:"text/csv;charset=utf-8"});var u=URL.createObjectURL(b);var l=document.createElement("a");l.href=u;l.download="alertes_rh.csv";l.click();URL.revokeObjectURL(u);}
-function prefillBulletin(cid){if(!cid)return;rhGet("/api/rh/contrats",function(list){for(var i=0;i<list.length;i++){var c=list[i];if(c.id===cid){document.getElementById("rh-bp-nom").value=c.nom_salarie||c.nom||"";document.getElementById("rh-bp-prenom").value=c.prenom_salarie||c.prenom||"";document.getElementById("rh-bp-brut").value=c.salaire_brut||"";if(c.duree_hebdo)document.getElementById("rh-bp-heures").value=(parseFloat(c.duree_hebdo)/35*151.67).toFixed(2);break;}}});}
-function genererBulletin(){var nom=document.getElementById("rh-bp-nom").value;var brut=document.getElementById("rh-bp-brut").value;if(!nom){toast("Veuillez saisir le nom du salarie.");return;}if(!brut||parseFloat(brut)<=0){toast("Veuillez saisir un salaire brut valide.");return;}var fd=new FormData();fd.append("contrat_id",document.getElementById("rh-bp-ctr").value);fd.append("nom_salarie",document.getElementById("rh-bp-nom").value);fd.append("prenom_salarie",document.getElementById("rh-bp-prenom").value);fd.append("mois",document.getElementById("rh-bp-mois").value);fd.append("salaire_brut",document.getElementById("rh-bp-brut").value||"0");fd.append("est_cadre",document.getElementById("rh-bp-cadre").value);fd.append("heures_supplementaires",document.getElementById("rh-bp-hs").value||"0");fd.append("primes",document.getElementById("rh-bp-primes").value||"0");fd.append("avantages_nature",document.getElementById("rh-bp-avantages").value||"0");fd.append("absences_jours",document.getElementById("rh-bp-abs").value||"0");fd.append("heures_travaillees",document.getElementById("rh-bp-heures").value||"151.67");
-rhPost("/api/rh/bulletins/generer",fd,function(d){
-var h="";
-if(d.alertes&&d.alertes.length){for(var a=0;a<d.alertes.length;a++){h+="<div class='al "+(d.alertes[a].niveau==="haute"?"err":"warn")+"'><span class='ai'>&#9888;</span><span>"+d.alertes[a].message+"</span></div>";}}
-h+="<div class='al ok'><span class='ai'>&#9989;</span><span>Bulletin genere pour <strong>"+d.mois+"</strong> - "+(d.prenom_salarie||"")+" "+(d.nom_salarie||"")+"</span></div>";
-h+="<div class='card' style='background:var(--pl);margin-top:8px'>";
-h+="<div class='g4'><div class='sc blue'><div class='val'>"+(d.brut_total||0).toFixed(2)+"</div><div class='lab'>Brut total</div></div><div class='sc green'><div class='val'>"+(d.net_a_payer||0).toFixed(2)+"</div><div class='lab'>Net a payer</div></div><div class='sc amber'><div class='val'>"+(d.cout_total_employeur||0).toFixed(2)+"</div><div class='lab'>Cout employeur</div></div><div class='sc'><div class='val'>"+(d.taux_horaire||0).toFixed(2)+" EUR/h</div><div class='lab'>Taux horaire</div></div></div>";
-h+="<div style='display:flex;gap:12px;flex-wrap:wrap;margin:10px 0;font-size:.84em'>";
-h+="<span><strong>Heures:</strong> "+(d.heures_travaillees||151.67)+"h</span>";
-h+="<span><strong>Base:</strong> "+(d.salaire_base||0).toFixed(2)+" EUR</span>";
-if(d.heures_supplementaires>0)h+="<span><strong>HS:</strong> "+d.heures_supplementaires+"h = "+(d.montant_hs||0).toFixed(2)+" EUR</span>";
-if(d.retenue_absences>0)h+="<span style='color:var(--r)'><strong>Absences:</strong> -"+(d.retenue_absences||0).toFixed(2)+" EUR</span>";
-h+="</div>";
-if(d.lignes){h+="<table style='margin-top:10px'><tr><th>Rubrique</th><th class='num'>Base</th><th class='num'>Taux sal.</th><th class='num'>Part sal.</th><th class='num'>Taux pat.</th><th class='num'>Part pat.</th></tr>";for(var i=0;i<d.lignes.length;i++){var l=d.lignes[i];h+="<tr><td>"+l.libelle+"</td><td class='num'>"+(l.base||0).toFixed(2)+"</td><td class='num'>"+(l.taux_salarial||0).toFixed(2)+"%</td><td class='num'>"+(l.montant_salarial||0).toFixed(2)+"</td><td class='num'>"+(l.taux_patronal||0).toFixed(2)+"%</td><td class='num'>"+(l.montant_patronal||0).toFixed(2)+"</td></tr>";}h+="</table>";}
-h+="<button class='btn btn-s btn-sm' style='margin-top:8px' data-bid='"+d.id+"' onclick='voirBulletinDoc(this)'>Visualiser / Imprimer</button></div>";
-document.getElementById("rh-bp-res").innerHTML=h;loadRHBulletins();});}
-function loadRHBulletins(){rhGet("/api/rh/bulletins",function(list){var el=document.getElementById("rh-bp-list");if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun bulletin.</p>";return;}
-var h="<table><tr><th>Mois</th><th>Salarie</th><th class='num'>Brut</th><th class='num'>Net</th><th>Actions</th></tr>";
-for(var i=0;i<list.length;i++){var b=list[i];h+="<tr><td>"+b.mois+"</td><td>"+(b.nom_salarie||"-")+"</td><td class='num'>"+(b.brut_total||0).toFixed(2)+"</td><td class='num'>"+(b.net_a_payer||0).toFixed(2)+"</td><td><button class='btn btn-s btn-sm' onclick='window.open("+JSON.stringify("/api/rh/bulletins/"+b.id+"/document")+","+JSON.stringify("_blank")+")'>Voir</button></td></tr>";}
-h+="</table>";el.innerHTML=h;});}
-function sauverAlertConfig(){var fd=new FormData();fd.append("type_alerte",document.getElementById("cfg-al-type").value);fd.append("actif",document.getElementById("cfg-al-actif").value);fd.append("delai_jours",document.getElementById("cfg-al-delai").value);var msg=document.getElementById("cfg-al-msg").value;if(msg)fd.append("message_personnalise",msg);
-rhPost("/api/rh/alertes/personnaliser",fd,function(d){document.getElementById("cfg-al-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Configuration alerte sauvegardee : "+d.type_alerte+" ("+(d.actif?"actif":"inactif")+")</span></div>";loadAlertConfigs();toast("Configuration alerte sauvegardee.","ok");});}
-function creerAlerteLibreDepuisConfig(){var titre=document.getElementById("cfg-al-libre-titre").value;if(!titre){toast("Le nom de l alerte est obligatoire.");return;}var fd=new FormData();fd.append("titre",titre);fd.append("urgence",document.getElementById("cfg-al-libre-urgence").value);fd.append("date_echeance",document.getElementById("cfg-al-libre-echeance").value||"");fd.append("description",document.getElementById("cfg-al-libre-desc").value||"");rhPost("/api/rh/alertes/libres",fd,function(d){document.getElementById("cfg-al-libre-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Alerte <strong>"+d.titre+"</strong> creee.</span></div>";document.getElementById("cfg-al-libre-titre").value="";document.getElementById("cfg-al-libre-desc").value="";document.getElementById("cfg-al-libre-echeance").value="";toast("Alerte creee.","ok");});}
-function loadAlertConfigs(){rhGet("/api/rh/alertes/config",function(list){var el=document.getElementById("cfg-alertes-list");if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Configuration par defaut (toutes alertes actives).</p>";return;}
-var h="<table><tr><th>Type</th><th>Actif</th><th>Delai (j)</th><th>Message</th></tr>";for(var i=0;i<list.length;i++){var c=list[i];h+="<tr><td><span class='badge "+(c.actif?"badge-green":"badge-red")+"'>"+c.type_alerte+"</span></td><td>"+(c.actif?"Oui":"Non")+"</td><td class='num'>"+(c.delai_jours||30)+"</td><td>"+(c.message_personnalise||"-")+"</td></tr>";}
-h+="</table>";el.innerHTML=h;});}
-
-/* === CONFIGURATION === */
-var _urssafComptes=[];
-function sauverEntete(){var fd=new FormData();fd.append("nom_entreprise",document.getElementById("cfg-nom").value);fd.append("logo_url",document.getElementById("cfg-logo").value);fd.append("adresse",document.getElementById("cfg-adresse").value);fd.append("telephone",document.getElementById("cfg-tel").value);fd.append("email",document.getElementById("cfg-email").value);fd.append("siret",document.getElementById("cfg-siret").value);fd.append("code_naf",document.getElementById("cfg-naf").value);fd.append("forme_juridique",document.getElementById("cfg-forme").value);fd.append("capital",document.getElementById("cfg-capital").value);fd.append("rcs",document.getElementById("cfg-rcs").value);fd.append("tva_intracom",document.getElementById("cfg-tva").value);
-rhPost("/api/config/entete",fd,function(){toast("En-tete sauvegarde.","ok");document.getElementById("cfg-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Configuration enregistree.</span></div>";});}
-function loadEntete(){rhGet("/api/config/entete",function(d){if(!d||!d.nom_entreprise)return;document.getElementById("cfg-nom").value=d.nom_entreprise||"";document.getElementById("cfg-adresse").value=d.adresse||"";document.getElementById("cfg-tel").value=d.telephone||"";document.getElementById("cfg-email").value=d.email||"";document.getElementById("cfg-siret").value=d.siret||"";document.getElementById("cfg-naf").value=d.code_naf||"";document.getElementById("cfg-forme").value=d.forme_juridique||"";document.getElementById("cfg-capital").value=d.capital||"";document.getElementById("cfg-rcs").value=d.rcs||"";document.getElementById("cfg-tva").value=d.tva_intracom||"";document.getElementById("cfg-logo").value=d.logo_url||"";});}
-
-function ajouterCompteURSSAF(){var c={siret:document.getElementById("urssaf-siret").value,compte:document.getElementById("urssaf-compte").value,caisse:document.getElementById("urssaf-caisse").value,taux_at:document.getElementById("urssaf-at").value};if(!c.siret||!c.compte){toast("SIRET et N compte obligatoires.");return;}_urssafComptes.push(c);renderComptesURSSAF();toast("Compte URSSAF ajoute.","ok");}
-function renderComptesURSSAF(){var el=document.getElementById("urssaf-list");if(!_urssafComptes.length){el.innerHTML="";return;}var h="<table><tr><th>SIRET</th><th>N Compte</th><th>Caisse</th><th>Taux AT</th></tr>";for(var i=0;i<_urssafComptes.length;i++){var c=_urssafComptes[i];h+="<tr><td>"+c.siret+"</td><td>"+c.compte+"</td><td>"+c.caisse+"</td><td>"+c.taux_at+"%</td></tr>";}h+="</table>";el.innerHTML=h;}
-
-/* === SIGNATURE ELECTRONIQUE === */
-function signerDocument(){var fd=new FormData();fd.append("document_id",gv("sig-docid"));fd.append("document_nom",gv("sig-docnom"));fd.append("signataire_nom",gv("sig-nom"));fd.append("signataire_email",gv("sig-email"));fd.append("signataire_qualite",gv("sig-qualite"));fd.append("niveau_signature",gv("sig-niveau"));fd.append("motif",gv("sig-motif"));
-if(!gv("sig-docid")||!gv("sig-nom")||!gv("sig-email")){toast("Document, nom et email du signataire obligatoires.");return;}
-fetch("/api/config/signature",{method:"POST",body:fd}).then(safeJson).then(function(s){
-var h="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#9989;</span><span><strong>Document signe avec succes</strong> — "+_esc(s.niveau)+" conforme eIDAS</span></div>";
-h+="<div class='g4'><div class='sc blue'><div class='val'>"+_esc(s.niveau)+"</div><div class='lab'>Niveau</div></div><div class='sc green'><div class='val'>Valide</div><div class='lab'>Statut</div></div><div class='sc'><div class='val'>"+_esc(s.horodatage.substring(0,19))+"</div><div class='lab'>Horodatage</div></div><div class='sc'><div class='val'>"+_esc(s.empreinte_sha256.substring(0,16))+"...</div><div class='lab'>Empreinte SHA-256</div></div></div>";
-h+="<table style='margin-top:12px'><tr><th>Champ</th><th>Valeur</th></tr>";
-h+="<tr><td>Document</td><td><strong>"+_esc(s.document_nom)+"</strong> ("+_esc(s.document_id)+")</td></tr>";
-h+="<tr><td>Signataire</td><td>"+_esc(s.signataire_nom)+" ("+_esc(s.signataire_email)+")</td></tr>";
-h+="<tr><td>Qualite</td><td>"+_esc(s.signataire_qualite||"-")+"</td></tr>";
-h+="<tr><td>Motif</td><td>"+_esc(s.motif||"-")+"</td></tr>";
-h+="<tr><td>Reference eIDAS</td><td>"+_esc(s.reference_eidas)+"</td></tr>";
-h+="<tr><td>Valeur juridique</td><td><strong>"+_esc(s.valeur_juridique)+"</strong></td></tr>";
-h+="<tr><td>Empreinte SHA-256</td><td style='font-family:monospace;font-size:.82em'>"+_esc(s.empreinte_sha256)+"</td></tr>";
-h+="</table>";
-document.getElementById("sig-res").innerHTML=h;toast("Signature "+s.niveau+" enregistree.","ok");
-}).catch(function(e){toast(e.message);});}
-function loadSignatures(){fetch("/api/config/signatures").then(safeJson).then(function(r){
-var el=document.getElementById("sig-list");
-if(!r.signatures||!r.signatures.length){el.innerHTML="<p style='color:var(--tx2);font-style:italic'>Aucune signature enregistree.</p>";return;}
-var h="<table><tr><th>Document</th><th>Signataire</th><th>Niveau</th><th>Date</th><th>Empreinte</th><th>Statut</th><th></th></tr>";
-for(var i=0;i<r.signatures.length;i++){var s=r.signatures[i];
-h+="<tr><td><strong>"+_esc(s.document_nom||s.document_id)+"</strong></td><td>"+_esc(s.signataire_nom)+"<br><span style='font-size:.8em;color:var(--tx2)'>"+_esc(s.signataire_email)+"</span></td><td><span class='badge "+(s.niveau==="SEQ"?"badge-green":"badge-blue")+"'>"+s.niveau+"</span></td><td style='font-size:.84em'>"+_esc(s.horodatage.substring(0,19))+"</td><td style='font-family:monospace;font-size:.78em'>"+_esc(s.empreinte_sha256.substring(0,12))+"...</td><td><span class='badge badge-green'>"+_esc(s.statut)+"</span></td><td><button class='btn btn-s btn-sm' onclick='verifierSignature("+JSON.stringify(s.id)+")'>Verifier</button></td></tr>";}
-h+="</table>";el.innerHTML=h;
-}).catch(function(e){toast(e.message);});}
-function verifierSignature(id){fetch("/api/config/signature/"+id+"/verifier").then(safeJson).then(function(r){
-toast("Signature "+r.signature.niveau+" — Integrite: "+r.integrite+" — Confiance: "+r.niveau_confiance,"ok");
-}).catch(function(e){toast(e.message);});}
-
-/* === JOURNAL AUDIT MULTI-UTILISATEURS === */
-function loadAuditLog(){fetch("/api/audit-log?limit=200").then(safeJson).then(function(logs){
-var el=document.getElementById("cfg-audit-log");
-if(!logs||!logs.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune action enregistree.</p>";return;}
-var h="<table><tr><th>Date</th><th>Utilisateur</th><th>Action</th><th>Details</th></tr>";
-for(var i=logs.length-1;i>=Math.max(0,logs.length-100);i--){var l=logs[i];
-h+="<tr><td style='font-size:.82em;white-space:nowrap'>"+_esc((l.date||"").substring(0,19))+"</td><td><strong>"+_esc(l.profil)+"</strong>"+(l.tenant_id?" <span style='font-size:.75em;color:var(--tx2)'>("+_esc(l.tenant_id)+")</span>":"")+"</td><td><span class='badge badge-blue'>"+_esc(l.action)+"</span></td><td style='font-size:.84em;color:var(--tx2)'>"+_esc(l.details||"-")+"</td></tr>";}
-h+="</table>";el.innerHTML=h;
-}).catch(function(e){toast(e.message);});}
-
-/* === HELPERS === */
-function _esc(s){if(!s)return"";return String(s).replace(/&/g,"&amp;").replace(/</g,"&lt;").replace(/>/g,"&gt;").replace(/"/g,"&quot;");}
-
-/* === TOAST === */
-var _toastStack=[];
-function toast(msg,type){
-type=type||"err";var d=document.createElement("div");
-d.setAttribute("role","alert");d.setAttribute("aria-live","polite");
-var offset=20+_toastStack.length*60;
-d.style.cssText="position:fixed;top:"+offset+"px;right:20px;z-index:9999;padding:14px 20px;border-radius:12px;font-size:.88em;max-width:420px;box-shadow:0 8px 30px rgba(0,0,0,.15);font-family:inherit;transform:translateX(120%);transition:transform .35s cubic-bezier(.4,0,.2,1),opacity .3s;display:flex;align-items:center;gap:8px";
-var icon="";
-if(type==="ok"){d.style.background="#f0fdf4";d.style.color="#166534";d.style.border="1px solid #bbf7d0";icon="&#9989; ";}
-else if(type==="warn"||type==="info"){d.style.background="#eff6ff";d.style.color="#1e40af";d.style.border="1px solid #bfdbfe";icon="&#128161; ";}
-else{d.style.background="#fef2f2";d.style.color="#991b1b";d.style.border="1px solid #fecaca";icon="&#9888; ";}
-d.innerHTML="<span>"+icon+"<"+"/span><span>"+msg.replace(RegExp(String.fromCharCode(60),"g"),"&lt;").replace(/>/g,"&gt;")+"<"+"/span>";
-document.body.appendChild(d);_toastStack.push(d);
-requestAnimationFrame(function(){requestAnimationFrame(function(){d.style.transform="translateX(0)";});});
-setTimeout(function(){d.style.opacity="0";d.style.transform="translateX(120%)";setTimeout(function(){d.remove();var idx=_toastStack.indexOf(d);if(idx>-1)_toastStack.splice(idx,1);},350);},4000);}
-
-/* === GLOBAL BUTTON CLICK FEEDBACK === */
-document.addEventListener("click",function(e){
-var btn=e.target.closest(".btn-blue:not(:disabled):not(.loading)");
-if(!btn||!btn.getAttribute("onclick"))return;
-/* Add brief visual feedback for all blue buttons */
-btn.style.opacity="0.8";
-setTimeout(function(){if(btn)btn.style.opacity="";},300);
-},true);
-
-/* === DELEGATED CLICK HANDLERS === */
-document.addEventListener("click",function(e){var btn=e.target.closest("[data-action]");if(!btn)return;var action=btn.dataset.action;var id=btn.dataset.id;e.stopPropagation();if(action==="dashTI"&&typeof voirDashTI==="function")voirDashTI(id);else if(action==="suppTI"&&typeof supprimerTI==="function")supprimerTI(id);else if(action==="traiterAlerte"&&typeof marquerAlerteTraitee==="function")marquerAlerteTraitee(id);else if(action==="suppAlerte"&&typeof supprimerAlerteLibre==="function")supprimerAlerteLibre(id);else if(action==="archiverAlerte"&&typeof archiverAlerteLibre==="function")archiverAlerteLibre(id);});
-
-/* === KEYBOARD NAV === */
-document.addEventListener("keydown",function(e){
-if(e.key==="Escape"){closeSidebar();}
-if(e.key==="Enter"&&e.target.classList.contains("nl")){e.target.click();}
-if(e.altKey&&e.key>="1"&&e.key<="9"){
-var sections=["dashboard","analyse","biblio","compta","factures","dsn","rh","simulation","veille"];
-var idx=parseInt(e.key)-1;
-if(idx<sections.length){e.preventDefault();showS(sections[idx]);}
-}
-});
-
-/* === NAVIGATION AUDIT SYSTEM === */
-function auditNavigation(){
-var report={ok:[],warn:[],err:[],timestamp:new Date().toISOString()};
-
-/* 1. Check all sidebar navigation links */
-var sidebarLinks=document.querySelectorAll(".sidebar .nl[onclick]");
-sidebarLinks.forEach(function(link){
-var match=link.getAttribute("onclick").match(/showS\(['"](\w+)['"]/);
-if(!match){report.warn.push("Sidebar link sans section: "+link.textContent.trim());return;}
-var secId="s-"+match[1];
-var sec=document.getElementById(secId);
-if(sec){report.ok.push("Section '"+match[1]+"' ("+secId+") existe");}
-else{report.err.push("Section MANQUANTE: "+secId+" (lien: "+link.textContent.trim()+")");}
-});
-
-/* 2. Check all tab panels have matching content divs */
-var tabSystems=[
-{tabs:"#compta-tabs .tab",prefix:"ct-",section:"Comptabilite"},
-{tabs:"#rh-tabs .tab",prefix:"rh-",section:"RH"},
-{tabs:"#s-simulation .tabs .tab",prefix:"sim-",section:"Simulation"},
-{tabs:"#fact-tabs .tab",prefix:"ft-",section:"Factures"}
-];
-tabSystems.forEach(function(ts){
-var tabs=document.querySelectorAll(ts.tabs);
-tabs.forEach(function(tab){
-var onclick=tab.getAttribute("onclick")||"";
-var match=onclick.match(/show\w+Tab\(['"](\w+)['"]/);
-if(!match)return;
-var tcId=ts.prefix+match[1];
-var tc=document.getElementById(tcId);
-if(tc){report.ok.push(ts.section+" tab '"+match[1]+"' -> #"+tcId+" existe");}
-else{report.err.push(ts.section+" tab '"+match[1]+"' -> #"+tcId+" MANQUANT");}
-});
-});
-
-/* 3. Check all blue buttons have valid onclick handlers */
-var blueButtons=document.querySelectorAll(".btn-blue[onclick]");
-blueButtons.forEach(function(btn){
-var onclick=btn.getAttribute("onclick");
-var funcMatch=onclick.match(/^(\w+)\(/);
-if(!funcMatch)return;
-var funcName=funcMatch[1];
-if(typeof window[funcName]==="function"){
-report.ok.push("Bouton '"+btn.textContent.trim().substring(0,30)+"' -> "+funcName+"() OK");
-}else{
-report.err.push("Bouton '"+btn.textContent.trim().substring(0,30)+"' -> "+funcName+"() FONCTION MANQUANTE");
-}
-});
-
-/* 4. Check all form inputs referenced by buttons exist */
-var criticalInputs=[
-{id:"rh-pl-sem",label:"Planning date"},
-{id:"gl-dd",label:"Compta date debut"},
-{id:"gl-df",label:"Compta date fin"},
-{id:"em-search",label:"Ecritures recherche"},
-{id:"rh-at-sal",label:"Attestation salarie"},
-{id:"rh-ctr-nom",label:"Contrat nom"},
-{id:"rh-bp-nom",label:"Bulletin nom"}
-];
-criticalInputs.forEach(function(inp){
-var el=document.getElementById(inp.id);
-if(el){report.ok.push("Input '"+inp.label+"' (#"+inp.id+") present");}
-else{report.err.push("Input MANQUANT: '"+inp.label+"' (#"+inp.id+")");}
-});
-
-/* 5. Check disabled buttons have proper visual styling */
-var disabledBtns=document.querySelectorAll(".btn-blue:disabled");
-disabledBtns.forEach(function(btn){
-report.warn.push("Bouton desactive: '"+btn.textContent.trim().substring(0,30)+"' (ID: "+(btn.id||"sans id")+")");
-});
-
-/* Summary */
-var summary="Navigation Audit - "+report.timestamp+"\\n";
-summary+="OK: "+report.ok.length+" | Warnings: "+report.warn.length+" | Erreurs: "+report.err.length+"\\n\\n";
-if(report.err.length){summary+="=== ERREURS ===\\n";report.err.forEach(function(e){summary+="  [ERR] "+e+"\\n";});}
-if(report.warn.length){summary+="\\n=== AVERTISSEMENTS ===\\n";report.warn.forEach(function(w){summary+="  [WARN] "+w+"\\n";});}
-
-console.log("%c[Navigation Audit]","color:#2563eb;font-weight:bold","\\n"+summary);
-
-/* Show results in toast */
-if(report.err.length){toast(report.err.length+" erreur(s) de navigation detectee(s). Voir la console (F12).");}
-else if(report.warn.length){toast(report.warn.length+" avertissement(s). Navigation globalement OK.","warn");}
-else{toast("Audit navigation : tout est OK ("+report.ok.length+" verifications).","ok");}
-
-return report;
-}
-
-/* Run audit automatically on load (results in console only - dev tool) */
-function _autoAuditNav(){
-try{
-var r=auditNavigation();
-if(r.err.length>0){console.warn("[Nav Audit] "+r.err.length+" erreur(s) detectee(s)");}
-}catch(e){console.error("[Nav Audit] Erreur audit:",e);}
-}
-
-/* === INITIALIZATION === */
-(function initApp(){
-loadDash();
-loadDashServer();
-/* Delayed navigation audit (after DOM fully rendered) */
-setTimeout(_autoAuditNav,2000);
-})();
-</script>
-</body>
-</html>"""
@@ -0,0 +1,69 @@
+/* === CORE NAV (inline before content to guarantee availability) === */
+var _ncUser=null;
+var _refreshingToken=false;
+var _refreshPromise=null;
+/* Global fetch wrapper: auto-include credentials for API calls */
+(function(){var _origFetch=window.fetch;window.fetch=function(url,opts){opts=opts||{};if(typeof url==="string"&&url.indexOf("/api/")>=0){if(!opts.credentials)opts.credentials="same-origin";}return _origFetch.call(this,url,opts);};})();
+/* Token auto-refresh: renouvelle le cookie JWT toutes les 20 min pour eviter les deconnexions */
+var _tokenRefreshInterval=setInterval(function(){
+if(!_ncUser)return;
+fetch("/api/auth/refresh",{method:"POST"}).then(function(r){
+if(!r.ok&&r.status===401){clearInterval(_tokenRefreshInterval);toast("Session expiree. Reconnexion dans 5 secondes...");setTimeout(function(){window.location.href="/";},5000);}
+}).catch(function(){});
+},20*60*1000);
+/* Fonction de refresh token utilisable par safeJson */
+function _tryRefreshToken(){
+if(_refreshingToken)return _refreshPromise;
+_refreshingToken=true;
+_refreshPromise=fetch("/api/auth/refresh",{method:"POST"}).then(function(r){_refreshingToken=false;return r.ok;}).catch(function(){_refreshingToken=false;return false;});
+return _refreshPromise;
+}
+var titles={"dashboard":"Dashboard","analyse":"Import / Analyse","biblio":"Bibliotheque","factures":"Factures","dsn":"DSN","compta":"Comptabilite","rh":"Ressources humaines","simulation":"Simulation","subventions":"Aides & Subventions","veille":"Veille juridique","portefeuille":"Portefeuille","equipe":"Equipe","config":"Configuration","score-details":"Details des scores de conformite","ensavoirplus":"En savoir plus"};
+function toggleSidebar(){var sb=document.getElementById("sidebar");var ov=document.getElementById("sidebar-overlay");if(sb)sb.classList.toggle("open");if(ov)ov.classList.toggle("show");}
+function closeSidebar(){var sb=document.getElementById("sidebar");var ov=document.getElementById("sidebar-overlay");if(sb)sb.classList.remove("open");if(ov)ov.classList.remove("show");}
+function resetTabs(tabsSel,secSel,defaultId){var tabs=document.querySelectorAll(tabsSel+" .tab");tabs.forEach(function(t){t.classList.remove("active")});if(tabs.length)tabs[0].classList.add("active");document.querySelectorAll(secSel+" .tc").forEach(function(t){t.classList.remove("active")});var def=document.getElementById(defaultId);if(def)def.classList.add("active");}
+function showS(n,el){
+try{
+closeSidebar();
+document.querySelectorAll(".sec").forEach(function(s){s.classList.remove("active")});
+document.querySelectorAll(".sidebar .nl").forEach(function(l){l.classList.remove("active")});
+var sec=document.getElementById("s-"+n);if(sec)sec.classList.add("active");
+if(el){el.classList.add("active");}else{document.querySelectorAll(".sidebar .nl").forEach(function(l){if(l.getAttribute("onclick")&&l.getAttribute("onclick").indexOf("'"+n+"'")>=0)l.classList.add("active");});}
+var pt=document.getElementById("page-title");if(pt)pt.textContent=titles[n]||n;
+if(typeof loadCompta==="function"&&n==="compta"){resetTabs("#compta-tabs","#s-compta","ct-journal");loadCompta();}
+if(typeof rechEnt==="function"&&n==="portefeuille"){rechEnt();if(typeof rechTI==="function")rechTI();if(typeof loadPortVue==="function")loadPortVue();}
+if(typeof loadDash==="function"&&n==="dashboard")loadDash();
+if(typeof loadBiblio==="function"&&n==="biblio"){loadBiblio();if(typeof loadKnowledge==="function")loadKnowledge();}
+if(typeof loadEquipe==="function"&&n==="equipe")loadEquipe();
+if(typeof loadPayStatuses==="function"&&n==="factures"){resetTabs("#fact-tabs","#s-factures","ft-analyse");loadPayStatuses();}
+if(typeof preFillDSN==="function"&&n==="dsn"){preFillDSN();if(typeof loadDSNBrouillons==="function")loadDSNBrouillons();}
+if(typeof loadRHSalaries==="function"&&n==="rh"){resetTabs("#rh-tabs","#s-rh","rh-salaries");loadRHSalaries();if(typeof loadRHAlertes==="function")loadRHAlertes();}
+if(n==="analyse"){if(typeof analysisData!=="undefined"&&analysisData){var ra=document.getElementById("res-analyse");if(ra)ra.style.display="block";if(typeof showJsonResults==="function")showJsonResults(analysisData);}else{fetch("/api/dashboard/load",{credentials:"same-origin"}).then(safeJson).then(function(r){if(r.status==="ok"&&r.data){analysisData=r.data;try{sessionStorage.setItem("nc_analysis",JSON.stringify(r.data));}catch(e){}var ra=document.getElementById("res-analyse");if(ra)ra.style.display="block";if(typeof showJsonResults==="function")showJsonResults(analysisData);loadDash();}}).catch(function(){});}}
+if(n==="simulation"){resetTabs("#s-simulation .tabs","#s-simulation","sim-bulletin");}
+if(n==="subventions"&&typeof prefillSubventions==="function"){prefillSubventions();}
+if(typeof loadVeille==="function"&&n==="veille"){loadVeille();}
+if(typeof loadEntete==="function"&&n==="config"){loadEntete();if(typeof loadAlertConfigs==="function")loadAlertConfigs();if(typeof loadSignatures==="function")loadSignatures();}
+if(typeof renderScoreDetails==="function"&&n==="score-details"){renderScoreDetails();}
+}catch(e){console.error("showS error:",n,e);}
+}
+function doLogout(){fetch("/api/auth/logout",{method:"POST",credentials:"same-origin"}).then(function(){sessionStorage.removeItem("nc_user");sessionStorage.removeItem("nc_analysis");window.location.href="/";}).catch(function(){window.location.href="/";});}
+function goToRH(){showS('rh');}
+function goToRHContrats(){showS('rh');setTimeout(function(){if(typeof showRHTab==="function")showRHTab('contrats',document.querySelector('#rh-tabs .tab:nth-child(2)'));},200);}
+function safeJson(r){if(!r.ok){if(r.status===401){return _tryRefreshToken().then(function(refreshed){if(refreshed){toast("Session renouvelee. Veuillez reessayer.","ok");throw new Error("Session renouvelee - reessayez");}else{toast("Session expiree. Reconnexion dans 5 secondes...");setTimeout(function(){window.location.href="/";},5000);throw new Error("Session expiree - reconnectez-vous");}});}return r.json().then(function(e){throw new Error(e.detail||"Erreur serveur ("+r.status+")")}).catch(function(parseErr){if(parseErr.message&&parseErr.message!=="Erreur serveur ("+r.status+")")throw parseErr;throw new Error("Erreur serveur ("+r.status+")");});}return r.json();}
+function gv(id){var el=document.getElementById(id);return el?el.value:"";}
+function fmt(n){return typeof n==="number"?n.toFixed(2).replace(/\B(?=(\d{3})+(?!\d))/g," ")+" EUR":n;}
+function fmtN(n){return typeof n==="number"?n.toFixed(2).replace(/\B(?=(\d{3})+(?!\d))/g," "):String(n);}
+function showSimTab(n,el){try{document.querySelectorAll("#s-simulation .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-simulation .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("sim-"+n);if(tc)tc.classList.add("active");}catch(e){console.error("showSimTab error:",n,e);}}
+function showRHTab(n,el){try{document.querySelectorAll("#rh-tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-rh .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("rh-"+n);if(tc)tc.classList.add("active");
+if(typeof loadRHSalaries==="function"&&n==="salaries")loadRHSalaries();if(n==="contrats"){if(typeof loadRHContrats==="function")loadRHContrats();if(typeof loadRHAvenants==="function")loadRHAvenants();}if(typeof loadRHConges==="function"&&n==="conges")loadRHConges();if(typeof loadRHArrets==="function"&&n==="arrets")loadRHArrets();if(typeof loadRHSanctions==="function"&&n==="sanctions")loadRHSanctions();if(typeof loadRHEntretiens==="function"&&n==="entretiens")loadRHEntretiens();if(typeof loadRHVisites==="function"&&n==="visites")loadRHVisites();if(typeof loadRHAttestations==="function"&&n==="attestations")loadRHAttestations();if(n==="planning"){if(typeof loadRHPlanning==="function")loadRHPlanning();if(typeof renderCalendar==="function")renderCalendar();}if(typeof loadRHEchanges==="function"&&n==="echanges")loadRHEchanges();if(typeof loadRHAlertes==="function"&&n==="alertes")loadRHAlertes();if(typeof loadRHBulletins==="function"&&n==="bulletins")loadRHBulletins();
+/* Setup autocomplete on salarie input fields */
+var salInputs={"conges":"rh-cg-sal","arrets":"rh-ar-sal","sanctions":"rh-sa-sal","entretiens":"rh-en-sal","visites":"rh-vm-sal","attestations":"rh-at-sal","echanges":"rh-ec-sal","planning":"rh-pl-sal","bulletins":"rh-bp-nom"};
+if(salInputs[n]&&typeof setupSalarieAutocomplete==="function"){_salariesCache=null;setupSalarieAutocomplete(salInputs[n]);}}catch(e){console.error("showRHTab error:",n,e);}}
+function showPortTab(name,el){document.querySelectorAll("#s-portefeuille .port-panel").forEach(function(p){p.style.display="none";});
+var panel=document.getElementById("port-"+name);if(panel)panel.style.display="block";
+document.querySelectorAll("#s-portefeuille > div:first-child .tab").forEach(function(t){t.classList.remove("active");});
+if(el)el.classList.add("active");
+if(typeof loadPortVue==="function"&&name==="vue")loadPortVue();if(typeof rechTI==="function"&&name==="ti")rechTI();if(typeof rechEnt==="function"&&name==="employeur")rechEnt();}
+function showFT(n,el){try{document.querySelectorAll("#fact-tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-factures .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("ft-"+n);if(tc)tc.classList.add("active");if(typeof loadPayStatuses==="function"&&n==="suivi")loadPayStatuses();}catch(e){console.error("showFT error:",n,e);}}
+function showCT(n,el){try{document.querySelectorAll("#compta-tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#s-compta .tc").forEach(function(t){t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("ct-"+n);if(tc)tc.classList.add("active");var ps=document.getElementById("period-sel");if(ps)ps.style.display=(n==="grandlivre"||n==="balance"||n==="bilan")?"block":"none";if(typeof loadCompta==="function")loadCompta();}catch(e){console.error("showCT error:",n,e);}}
+function showAlTab(n,el){document.querySelectorAll("#rh-alertes .tabs .tab").forEach(function(t){t.classList.remove("active")});document.querySelectorAll("#rh-alertes .al-panel").forEach(function(t){t.style.display="none";t.classList.remove("active")});if(el)el.classList.add("active");var tc=document.getElementById("al-"+n);if(tc){tc.style.display="block";tc.classList.add("active");}if(typeof loadAlertesLibres==="function"&&n==="libres")loadAlertesLibres();if(typeof loadRHAlertes==="function"&&n==="auto")loadRHAlertes();}
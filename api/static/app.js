@@ -0,0 +1,1958 @@
+/* === AUTH CHECK === */
+(function(){fetch("/api/auth/me").then(function(r){if(!r.ok){
+/* Tenter un refresh du token avant de rediriger */
+return _tryRefreshToken().then(function(refreshed){
+if(refreshed){return fetch("/api/auth/me").then(function(r2){return r2.ok?r2.json():null;});}
+toast("Session expiree. Reconnexion dans 5 secondes...");setTimeout(function(){window.location.href="/";},5000);return null;
+});}return r.json();}).then(function(u){if(!u)return;_ncUser=u;var su=document.getElementById("sidebar-user");if(su)su.textContent=(u.prenom||"")+" "+(u.nom||"")+" ("+u.role+")";}).catch(function(e){console.error("Auth check failed:",e);toast("Erreur de connexion. Verifiez votre reseau.");});})();
+
+/* === INIT === */
+try{var _td=document.getElementById("topbar-date");if(_td)_td.textContent=new Date().toLocaleDateString("fr-FR",{day:"numeric",month:"long",year:"numeric"});}catch(e){}
+
+document.addEventListener("click",function(e){var a=e.target.closest(".anomalie[data-toggle]");if(a)a.classList.toggle("open");var td=e.target.closest("[data-toggle-detail]");if(td){var det=td.querySelector(".aud-detail,.al-detail");if(det)det.style.display=det.style.display==="none"?"block":"none";}var st=e.target.closest(".sub-toggle");if(st){var sd=st.querySelector(".sub-detail");if(sd)sd.style.display=sd.style.display==="none"?"block":"none";}});
+
+/* === DASHBOARD === */
+var analysisData=null;
+try{var _saved=sessionStorage.getItem("nc_analysis");if(_saved){analysisData=JSON.parse(_saved);}}catch(e){}
+function saveDashServer(data){fetch("/api/dashboard/save",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify(data),credentials:"same-origin"}).catch(function(){});}
+function loadDashServer(){if(analysisData)return;fetch("/api/dashboard/load",{credentials:"same-origin"}).then(safeJson).then(function(r){if(r.status==="ok"&&r.data){analysisData=r.data;try{sessionStorage.setItem("nc_analysis",JSON.stringify(r.data));}catch(e){}loadDash();var ra=document.getElementById("res-analyse");if(ra&&document.getElementById("s-analyse")&&document.getElementById("s-analyse").classList.contains("active")){ra.style.display="block";if(typeof showJsonResults==="function")showJsonResults(analysisData);}}}).catch(function(){});}
+/* Charger les donnees d'analyse depuis le serveur au demarrage si sessionStorage est vide */
+if(!analysisData){loadDashServer();}
+function loadDash(){
+try{
+if(!analysisData){loadDashServer();return;}
+/* Masquer le message de bienvenue quand une analyse existe */
+var welcomeEl=document.getElementById("dash-welcome");if(welcomeEl)welcomeEl.style.display="none";
+var d=analysisData,s=d.synthese||{};
+var impact=s.impact_financier_total||0;
+var constats=d.constats||[];
+document.getElementById("dash-anomalies").textContent=constats.length;
+document.getElementById("dash-anom-count").textContent=constats.length;
+document.getElementById("dash-impact").textContent=impact.toFixed(2)+" EUR";
+var conf=Math.max(0,100-(s.score_risque_global||0));
+document.getElementById("dash-conf").textContent=conf+"%";
+document.getElementById("gauge").style.setProperty("--pct",conf+"%");
+document.getElementById("gauge-val").textContent=conf+"%";
+renderAnomalies("dash-anomalies-list",constats);
+var byDest={"URSSAF":0,"Fiscal":0,"France Travail":0,"GUSO":0};
+constats.forEach(function(c){var dest=categToDest(c.categorie||"");byDest[dest]=(byDest[dest]||0)+Math.abs(c.montant_impact||0);});
+document.getElementById("dd-urssaf").textContent=byDest["URSSAF"].toFixed(0)+" EUR";
+document.getElementById("dd-fiscal").textContent=byDest["Fiscal"].toFixed(0)+" EUR";
+document.getElementById("dd-ft").textContent=byDest["France Travail"].toFixed(0)+" EUR";
+document.getElementById("dd-guso").textContent=byDest["GUSO"].toFixed(0)+" EUR";
+/* Triple scores */
+var ts=calculateTripleScore(d);
+function setGauge(id,valId,gradeId,sc){var g=document.getElementById(id);var v=document.getElementById(valId);var gr=document.getElementById(gradeId);if(g)g.style.setProperty("--pct",sc.score+"%");if(v)v.textContent=sc.score+"%";if(gr){var gcls=sc.score>=75?"color:var(--g)":sc.score>=45?"color:var(--o)":"color:var(--r)";gr.innerHTML="<span style='font-weight:700;"+gcls+"'>"+sc.grade+"</span>";}}
+setGauge("gauge-urssaf","gauge-urssaf-val","grade-urssaf",ts.urssaf);
+setGauge("gauge-fiscal","gauge-fiscal-val","grade-fiscal",ts.fiscal);
+setGauge("gauge-cdc","gauge-cdc-val","grade-cdc",ts.cdc);
+}catch(e){console.error("loadDash",e);}
+}
+
+function renderAnomalies(id,constats){
+var el=document.getElementById(id);if(!constats.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune anomalie detectee.</p>";return;}
+/* Trier : haute d'abord, puis moyenne, puis faible */
+var sevOrder={"haute":0,"moyenne":1,"faible":2};
+constats.sort(function(a,b){return (sevOrder[a.severite]||2)-(sevOrder[b.severite]||2);});
+var nbH=constats.filter(function(c){return c.severite==="haute"}).length;
+var nbM=constats.filter(function(c){return c.severite==="moyenne"}).length;
+var nbL=constats.length-nbH-nbM;
+var h="<div style='display:flex;gap:12px;flex-wrap:wrap;margin-bottom:14px;align-items:center'>";
+h+="<span style='font-weight:700;font-size:.95em'>"+constats.length+" anomalie(s) detectee(s)</span>";
+if(nbH)h+="<span class='badge badge-red'>"+nbH+" critique"+(nbH>1?"s":"")+"</span>";
+if(nbM)h+="<span class='badge badge-amber'>"+nbM+" moyenne"+(nbM>1?"s":"")+"</span>";
+if(nbL)h+="<span class='badge badge-green'>"+nbL+" mineure"+(nbL>1?"s":"")+"</span>";
+h+="</div>";
+constats.forEach(function(c,idx){
+var impact=c.montant_impact||0;var neg=impact>0;
+var sevCls=c.severite==="haute"?"high":(c.severite==="moyenne"?"med":"low");
+var dest=categToDest(c.categorie||"");
+var destCls={"URSSAF":"badge-blue","Fiscal":"badge-purple","France Travail":"badge-amber","GUSO":"badge-teal"}[dest]||"badge-blue";
+var sevBadge=c.severite==="haute"?"badge-red":(c.severite==="moyenne"?"badge-amber":"badge-green");
+var sevLabel=c.severite==="haute"?"Critique":(c.severite==="moyenne"?"Moyenne":"Mineure");
+h+="<div class='anomalie sev-"+sevCls+"' data-toggle='1'>";
+/* --- Ligne resume cliquable --- */
+h+="<div class='head'><div style='flex:1'>";
+h+="<span style='font-weight:700;font-size:.76em;color:var(--tx2);margin-right:6px'>#"+(idx+1)+"</span>";
+h+="<span class='title'>"+(c.titre||"Ecart")+"</span> ";
+h+="<span class='dest "+destCls+"'>"+dest+"</span> <span class='badge "+sevBadge+"'>"+sevLabel+"</span>";
+if(c.periode)h+=" <span class='badge' style='background:#e0e7ff;color:#3730a3'>"+c.periode+"</span>";
+h+="</div>";
+if(neg)h+="<div class='montant neg'>+"+Math.abs(impact).toFixed(2)+" EUR</div>";
+h+="</div>";
+/* --- Comparaison rapide (toujours visible) --- */
+if(c.valeur_constatee||c.valeur_attendue){
+h+="<div style='display:flex;gap:12px;flex-wrap:wrap;margin-top:8px;font-size:.85em'>";
+if(c.valeur_constatee)h+="<div style='background:var(--rl);padding:4px 10px;border-radius:6px;border:1px solid #fecaca'><strong style='color:var(--r)'>Constate :</strong> <span style='font-weight:600'>"+c.valeur_constatee+"</span></div>";
+if(c.valeur_attendue)h+="<div style='background:var(--gl);padding:4px 10px;border-radius:6px;border:1px solid #bbf7d0'><strong style='color:var(--g)'>Attendu :</strong> <span style='font-weight:600'>"+c.valeur_attendue+"</span></div>";
+if(neg)h+="<div style='background:var(--ol);padding:4px 10px;border-radius:6px;border:1px solid #fde68a'><strong style='color:var(--o)'>Impact :</strong> <span style='font-weight:600'>"+Math.abs(impact).toFixed(2)+" EUR</span></div>";
+h+="</div>";}
+/* --- Detail (deploye au clic) --- */
+h+="<div class='detail'>";
+/* Localisation */
+var docSrc=c.document_source||(c.documents_concernes&&c.documents_concernes.length?c.documents_concernes.join(", "):"");
+h+="<div style='background:var(--pl);border:1px solid #bfdbfe;border-radius:8px;padding:10px;margin-bottom:10px;font-size:.88em'>";
+h+="<strong style='color:var(--p2)'>&#128204; Localisation de l'erreur</strong><br>";
+if(docSrc)h+="<span>Document : <strong>"+docSrc+"</strong></span><br>";
+h+="<span>Categorie : "+(c.categorie||"-")+"</span>";
+if(c.rubrique&&c.rubrique!=="Generale")h+=" &bull; <span>Rubrique : "+c.rubrique+"</span>";
+if(c.periode)h+=" &bull; <span>Periode : "+c.periode+"</span>";
+h+="</div>";
+/* Explication claire */
+var desc=(c.description||"").replace(/\n/g,"<br>");
+h+="<div style='border-radius:8px;padding:12px;margin-bottom:10px;font-size:.88em;line-height:1.6;background:var(--card-bg);border:1px solid var(--brd)'>"+desc+"</div>";
+/* Action recommandee */
+if(c.recommandation){
+h+="<div style='background:var(--gl);border:1px solid #a7f3d0;border-radius:8px;padding:10px;margin-bottom:8px;font-size:.88em'>";
+h+="<strong style='color:#065f46'>&#9989; Action a realiser :</strong> "+c.recommandation+"</div>";}
+/* Base legale */
+if(c.reference_legale){
+h+="<div style='font-size:.82em;color:var(--tx2);padding:6px 10px;background:var(--bg);border-radius:6px;border:1px solid var(--brd)'>";
+h+="<strong>&#9878; Base legale :</strong> "+c.reference_legale+"</div>";}
+h+="</div></div>";});el.innerHTML=h;}
+
+function categToDest(cat){var c=cat.toLowerCase();if(c.indexOf("fiscal")>=0||c.indexOf("impot")>=0)return"Fiscal";if(c.indexOf("france travail")>=0||c.indexOf("chomage")>=0)return"France Travail";if(c.indexOf("guso")>=0||c.indexOf("spectacle")>=0)return"GUSO";return"URSSAF";}
+
+/* === ANALYSE === */
+var fichiers=[];
+var dz=document.getElementById("dz-analyse"),fi=document.getElementById("fi-analyse");
+if(dz){["dragenter","dragover"].forEach(function(ev){dz.addEventListener(ev,function(e){e.preventDefault();});});
+dz.addEventListener("drop",function(e){e.preventDefault();addF(e.dataTransfer.files);});}
+if(fi){fi.addEventListener("change",function(e){addF(e.target.files);fi.value="";});}
+function addF(files){for(var i=0;i<files.length;i++){var f=files[i];var dup=false;for(var j=0;j<fichiers.length;j++){if(fichiers[j].name===f.name){dup=true;break;}}if(!dup&&fichiers.length<20)fichiers.push(f);}renderF();}
+function renderF(){var el=document.getElementById("fl-analyse");var h="";for(var i=0;i<fichiers.length;i++){h+="<div class='fi'><span class='nm'>"+fichiers[i].name+"</span><span style='color:var(--tx2);font-size:.8em'>"+(fichiers[i].size/1024).toFixed(1)+" Ko</span><button class='rm' onclick='rmF("+i+")'>&times;</button></div>";}el.innerHTML=h;document.getElementById("btn-az").disabled=fichiers.length===0;}
+function rmF(i){fichiers.splice(i,1);renderF();}
+
+
+function lancerAnalyse(){
+if(!fichiers.length)return;
+var btn=document.getElementById("btn-az"),prg=document.getElementById("prg-az"),fill=document.getElementById("pf-az"),txt=document.getElementById("pt-az");
+btn.disabled=true;prg.style.display="block";document.getElementById("res-analyse").style.display="none";
+var steps=[[10,"Import..."],[25,"SHA-256..."],[40,"Parsing + OCR..."],[55,"Coherence..."],[70,"Anomalies..."],[85,"Patterns..."],[95,"Rapport..."]];
+var si=0;var iv=setInterval(function(){if(si<steps.length){fill.style.width=steps[si][0]+"%";txt.textContent=steps[si][1];si++;}},900);
+var fd=new FormData();for(var i=0;i<fichiers.length;i++){fd.append("fichiers",fichiers[i]);}
+var integ=document.getElementById("chk-integrer").checked;
+var modeAz=document.getElementById("mode-analyse").value;
+fetch("/api/analyze?format_rapport=json&integrer="+integ+"&mode_analyse="+modeAz,{method:"POST",body:fd}).then(function(resp){
+clearInterval(iv);fill.style.width="100%";txt.textContent="Termine !";
+if(!resp.ok){if(resp.status===401){return _tryRefreshToken().then(function(ok){if(ok){toast("Session renouvelee. Relancez l analyse.","ok");}else{toast("Session expiree. Reconnexion...");setTimeout(function(){window.location.href="/";},5000);}throw new Error("Session expiree");});}return resp.json().then(function(e){throw new Error(e.detail||"Erreur")});}
+return resp.json().then(function(data){analysisData=data;try{sessionStorage.setItem("nc_analysis",JSON.stringify(data));}catch(e){}saveDashServer(data);showJsonResults(data);});
+}).then(function(){setTimeout(function(){prg.style.display="none";},800);document.getElementById("res-analyse").style.display="block";}).catch(function(e){clearInterval(iv);prg.style.display="none";toast(e.message);btn.disabled=false;});
+}
+
+function showJsonResults(data){
+var s=data.synthese||{};var impact=s.impact_financier_total||0;
+var dashNr=s.nb_fichiers_non_reconnus||0;
+var nbAno=(data.constats||[]).length;var ts=calculateTripleScore(data);
+var dashH="<div class='sc blue' style='cursor:pointer' data-scroll='az-findings' onclick='scrollToEl(this)'><div class='val'>"+nbAno+"</div><div class='lab'>Anomalies &#8595;</div></div>";
+dashH+="<div class='sc "+(impact>1000?"red":"green")+"' style='cursor:pointer' data-toggle='az-impact-detail' onclick='toggleDetailAttr(this)'><div class='val'>"+impact.toFixed(2)+" EUR</div><div class='lab'>Impact &#8595;</div></div>";
+dashH+="<div class='sc green' style='cursor:pointer' data-scroll='az-audit-card' onclick='scrollToEl(this)'><div class='val'>"+ts.global.score+"%</div><div class='lab'>Conformite &#8595;</div></div>";
+dashH+="<div class='sc'><div class='val'>"+(s.nb_fichiers||0)+"</div><div class='lab'>Fichiers</div></div>";
+dashH+="<div class='sc blue'><div class='val'>"+ts.urssaf.score+"%</div><div class='lab'>URSSAF</div></div>";
+dashH+="<div class='sc purple'><div class='val'>"+ts.fiscal.score+"%</div><div class='lab'>DGFIP</div></div>";
+dashH+="<div class='sc teal'><div class='val'>"+ts.cdc.score+"%</div><div class='lab'>CDC</div></div>";
+if(dashNr>0)dashH+="<div class='sc red'><div class='val'>"+dashNr+"</div><div class='lab'>Non reconnus</div></div>";
+document.getElementById("az-dashboard").innerHTML=dashH;
+var impactDetail=document.getElementById("az-impact-detail");
+if(impactDetail){
+var ih="<h3>Detail de l impact financier</h3>";
+var charges={};var constats=data.constats||[];
+for(var i=0;i<constats.length;i++){var c=constats[i];var cat=c.categorie||c.type||"Autre";if(!charges[cat])charges[cat]={total:0,items:[]};var imp=c.impact_financier||0;charges[cat].total+=imp;charges[cat].items.push({desc:c.description||c.titre||"",impact:imp,severity:c.severite||c.niveau||"info"});}
+ih+="<table><tr><th>Categorie</th><th class='num'>Impact (EUR)</th><th class='num'>Nb anomalies</th><th>Detail</th></tr>";
+for(var cat in charges){var g=charges[cat];ih+="<tr style='cursor:pointer' onclick='toggleNextRow(this)'><td><strong>"+cat+"</strong></td><td class='num' style='color:"+(g.total>500?"var(--r)":"var(--tx)")+"'>"+g.total.toFixed(2)+"</td><td class='num'>"+g.items.length+"</td><td style='font-size:.82em;color:var(--tx2)'>Cliquer pour voir</td></tr>";
+ih+="<tr style='display:none'><td colspan='4'><div style='padding:6px;background:var(--bg2);border-radius:6px;font-size:.84em'>";
+for(var j=0;j<g.items.length;j++){var it=g.items[j];ih+="<div style='display:flex;justify-content:space-between;padding:2px 0;border-bottom:1px solid var(--brd)'><span>"+it.desc+"</span><span class='num' style='min-width:80px'>"+(it.impact||0).toFixed(2)+" EUR</span></div>";}
+ih+="</div></td></tr>";}
+ih+="</table>";
+impactDetail.innerHTML=ih;impactDetail.style.display="block";}
+renderAnomalies("az-findings",data.constats||[]);
+var recos=data.recommandations||[];var rh="";for(var i=0;i<recos.length;i++){rh+="<div class='al info'><span class='ai'>&#128161;</span><span><strong>#"+(i+1)+"</strong> "+(recos[i].description||recos[i].titre||"")+"</span></div>";}
+document.getElementById("az-reco").innerHTML=rh||"<p style='color:var(--tx2)'>Aucune.</p>";
+if(data.html_report){document.getElementById("az-html-card").style.display="block";document.getElementById("az-html-frame").srcdoc=data.html_report;}else{document.getElementById("az-html-card").style.display="none";}
+showFileInterpretation(data);showAuditChecks(data);showIntegrationResults(data);
+document.getElementById("dash-docs").textContent=(s.nb_fichiers||0);loadDash();}
+function toggleDetail(id){var el=document.getElementById(id);if(el)el.style.display=el.style.display==="none"?"block":"none";}
+function toggleDetailAttr(src){var id=src.dataset.toggle;if(id)toggleDetail(id);}
+function toggleNextRow(tr){var next=tr.nextElementSibling;if(next)next.style.display=next.style.display==="none"?"":"none";}
+function scrollToEl(src){var id=src.dataset.scroll;var el=id?document.getElementById(id):null;if(el)el.scrollIntoView({behavior:"smooth"});}
+function resetAz(){fichiers=[];analysisData=null;try{sessionStorage.removeItem("nc_analysis");sessionStorage.removeItem("nc_integration");}catch(e){}renderF();document.getElementById("res-analyse").style.display="none";document.getElementById("az-audit-card").style.display="none";document.getElementById("az-integration-card").style.display="none";document.getElementById("btn-az").disabled=false;toast("Pret pour une nouvelle analyse.","ok");}
+
+/* === BIBLIOTHEQUE === */
+function loadKnowledge(){
+fetch("/api/bibliotheque/knowledge").then(safeJson).then(function(kb){
+var el=document.getElementById("biblio-knowledge");if(!el)return;
+var s=kb.summary||{};
+if(!s.derniere_maj){el.innerHTML="<div class='al info'><span class='ai'>&#128218;</span><span>Aucune donnee. Importez des documents via Import / Analyse pour alimenter la base.</span></div>";return;}
+var h="<div style='display:flex;gap:10px;flex-wrap:wrap;margin-bottom:14px'>";
+h+="<div class='sc blue'><div class='val'>"+s.nb_salaries_connus+"</div><div class='lab'>Salaries connus</div></div>";
+h+="<div class='sc green'><div class='val'>"+s.nb_employeurs+"</div><div class='lab'>Employeurs</div></div>";
+h+="<div class='sc'><div class='val'>"+s.nb_periodes+"</div><div class='lab'>Periodes</div></div>";
+h+="<div class='sc amber'><div class='val'>"+s.nb_cotisations_analysees+"</div><div class='lab'>Cotisations</div></div>";
+h+="<div class='sc'><div class='val'>"+s.total_masse_salariale.toFixed(0)+" EUR</div><div class='lab'>Masse salariale</div></div>";
+h+="<div class='sc "+(s.nb_anomalies>0?"red":"green")+"'><div class='val'>"+s.nb_anomalies+"</div><div class='lab'>Anomalies</div></div></div>";
+if(s.periodes&&s.periodes.length){h+="<p style='font-size:.84em;color:var(--tx2)'>Periodes couvertes : <strong>"+s.periodes.join(", ")+"</strong></p>";}
+if(s.pieces_disponibles&&s.pieces_disponibles.length){h+="<p style='font-size:.84em;color:var(--tx2)'>Pieces disponibles : ";for(var i=0;i<s.pieces_disponibles.length;i++){h+="<span class='badge badge-blue' style='margin:2px'>"+s.pieces_disponibles[i]+"</span>";}h+="</p>";}
+var sals=kb.salaries||{};var salKeys=Object.keys(sals);
+if(salKeys.length){h+="<h3 style='margin-top:16px'>Salaries identifies ("+salKeys.length+")</h3><table><tr><th>NIR</th><th>Nom</th><th>Prenom</th><th>Statut</th><th class='num'>Dernier brut</th><th>Periodes</th></tr>";
+for(var i=0;i<salKeys.length;i++){var sal=sals[salKeys[i]];h+="<tr><td style='font-size:.78em'>"+sal.nir+"</td><td>"+sal.nom+"</td><td>"+sal.prenom+"</td><td><span class='badge "+(sal.statut==="cadre"?"badge-purple":"badge-blue")+"'>"+sal.statut+"</span></td><td class='num'>"+(sal.dernier_brut||0).toFixed(2)+"</td><td style='font-size:.78em'>"+(sal.periodes_presentes||[]).join(", ")+"</td></tr>";}
+h+="</table>";}
+var emps=kb.employeurs||{};var empKeys=Object.keys(emps);
+if(empKeys.length){h+="<h3 style='margin-top:16px'>Employeurs identifies ("+empKeys.length+")</h3><table><tr><th>SIRET</th><th>Raison sociale</th><th>NAF</th><th class='num'>Effectif</th></tr>";
+for(var i=0;i<empKeys.length;i++){var emp=emps[empKeys[i]];h+="<tr><td>"+emp.siret+"</td><td>"+emp.raison_sociale+"</td><td>"+(emp.code_naf||"-")+"</td><td class='num'>"+(emp.effectif||"-")+"</td></tr>";}
+h+="</table>";}
+var ctx=kb.contexte_entreprise||{};
+if(ctx.convention_collective||ctx.code_naf||ctx.raison_sociale||ctx.effectif_moyen){
+h+="<h3 style='margin-top:16px'>Contexte entreprise</h3><div style='display:flex;gap:12px;flex-wrap:wrap'>";
+if(ctx.raison_sociale)h+="<span class='badge badge-blue'>"+ctx.raison_sociale+"</span>";
+if(ctx.code_naf)h+="<span class='badge badge-purple'>NAF: "+ctx.code_naf+"</span>";
+if(ctx.convention_collective)h+="<span class='badge badge-teal'>CCN: "+ctx.convention_collective+"</span>";
+if(ctx.effectif_moyen>0)h+="<span class='badge badge-green'>Effectif: "+ctx.effectif_moyen+"</span>";
+h+="</div>";}
+var accords=ctx.accords_entreprise||[];if(accords.length){
+h+="<h3 style='margin-top:16px'>Accords entreprise ("+accords.length+")</h3><table><tr><th>Accord</th><th>Type</th><th>Date</th></tr>";
+for(var ai=0;ai<accords.length;ai++){var ac=accords[ai];h+="<tr><td>"+ac.reference+"</td><td><span class='badge badge-teal'>"+ac.type.replace(/_/g," ")+"</span></td><td>"+(ac.date||"-")+"</td></tr>";}
+h+="</table>";}
+var dpt=kb.documents_par_type||{};var dptKeys=Object.keys(dpt);
+if(dptKeys.length){h+="<h3 style='margin-top:16px'>Documents par type</h3><div style='display:flex;gap:8px;flex-wrap:wrap'>";
+for(var di=0;di<dptKeys.length;di++){h+="<span class='badge badge-blue'>"+dptKeys[di].replace(/_/g," ")+" ("+dpt[dptKeys[di]].length+")</span>";}
+h+="</div>";}
+h+="<p style='font-size:.78em;color:var(--tx2);margin-top:12px'>Derniere mise a jour : "+s.derniere_maj+"</p>";
+el.innerHTML=h;}).catch(function(){});}
+function loadBiblio(){
+fetch("/api/documents/bibliotheque").then(safeJson).then(function(raw){var docs=(raw&&raw.items&&typeof raw.total==="number")?raw.items:raw;
+var el=document.getElementById("biblio-list");
+if(!docs||!docs.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun document. Importez des fichiers via l'onglet Analyse.</p>";return;}
+var h="";for(var i=0;i<docs.length;i++){var d=docs[i];var de=d.donnees_extraites||{};
+h+="<div class='doc-item'><div style='display:flex;justify-content:space-between;align-items:flex-start;flex-wrap:wrap;gap:6px'>";
+var bStatCls=d.statut==="non_reconnu"?"badge-red":(d.statut==="erreur"?"badge-red":"badge-blue");
+h+="<div><strong>"+d.nom+"</strong> <span class='badge "+bStatCls+"'>"+(d.statut==="non_reconnu"?"Non reconnu":d.statut)+"</span>";
+if(de.type_declaration)h+=" <span class='badge badge-purple'>"+de.type_declaration+"</span>";
+if(de.type_document&&de.type_document!=="inconnu")h+=" <span class='badge badge-teal'>"+de.type_document.replace(/_/g," ")+"</span>";
+h+="</div>";
+h+="<span style='font-size:.8em;color:var(--tx2)'>"+d.date_import.substring(0,10)+" | "+(d.taille/1024).toFixed(1)+" Ko</span></div>";
+if(de.nb_salaries||de.masse_salariale||de.employeur_nom){h+="<div style='margin-top:6px;font-size:.84em;display:flex;gap:12px;flex-wrap:wrap'>";
+if(de.employeur_nom)h+="<span><strong>Employeur:</strong> "+de.employeur_nom+"</span>";
+if(de.employeur_siret)h+="<span>SIRET: "+de.employeur_siret+"</span>";
+if(de.periode)h+="<span><strong>Periode:</strong> "+de.periode+"</span>";
+if(de.nb_salaries)h+="<span><strong>"+de.nb_salaries+"</strong> salarie(s)</span>";
+if(de.nb_cotisations)h+="<span><strong>"+de.nb_cotisations+"</strong> cotisation(s)</span>";
+if(de.masse_salariale)h+="<span><strong>Masse salariale:</strong> "+de.masse_salariale.toFixed(2)+" EUR</span>";
+h+="</div>";}
+if(de.salaries_noms&&de.salaries_noms.length){h+="<div style='margin-top:4px;font-size:.8em;color:var(--tx2)'>Salaries: "+de.salaries_noms.join(", ")+"</div>";}
+var acts=d.actions||[];if(acts.length){h+="<div style='margin-top:6px;font-size:.82em'><strong>Historique :</strong>";
+for(var j=0;j<acts.length;j++){h+=" <span class='badge badge-blue' style='margin:2px'>"+acts[j].action+" ("+acts[j].par+")</span>";}h+="</div>";}
+var errs=d.erreurs_corrigees||[];if(errs.length){h+="<div style='margin-top:6px;font-size:.82em;color:var(--r)'><strong>Corrections :</strong>";
+for(var k=0;k<errs.length;k++){h+=" "+errs[k].champ+": "+errs[k].ancienne_valeur+" -> "+errs[k].nouvelle_valeur;}h+="</div>";}
+h+="<div style='margin-top:8px'><button class='btn btn-s btn-sm btn-corriger' data-docid='"+d.id+"'>Corriger une erreur</button></div>";
+h+="</div>";}
+el.innerHTML=h;el.querySelectorAll(".btn-corriger").forEach(function(btn){btn.addEventListener("click",function(){corrigerDoc(btn.getAttribute("data-docid"));});});}).catch(function(){});}
+
+function corrigerDoc(docId){
+var champ=prompt("Champ a corriger (ex: montant, type, date) :");
+if(!champ)return;
+var ancien=prompt("Ancienne valeur :");
+var nouveau=prompt("Nouvelle valeur :");
+if(!nouveau)return;
+var fd=new FormData();fd.append("champ",champ);fd.append("ancienne_valeur",ancien||"");fd.append("nouvelle_valeur",nouveau);fd.append("corrige_par","utilisateur");
+fetch("/api/documents/bibliotheque/"+docId+"/corriger",{method:"POST",body:fd}).then(function(r){if(!r.ok)throw new Error("Erreur");return r.json();}).then(function(){toast("Correction enregistree.","ok");loadBiblio();}).catch(function(e){toast(e.message);});}
+
+/* === FACTURES === */
+
+var factFile=null;
+var _fiFact=document.getElementById("fi-fact");
+if(_fiFact){_fiFact.addEventListener("change",function(e){factFile=e.target.files[0];if(factFile){document.getElementById("fact-fn").innerHTML="<div class='fi'><span class='nm'>"+factFile.name+"</span></div>";document.getElementById("btn-fact").disabled=false;}});}
+
+function analyserFacture(){
+if(!factFile)return;var fd=new FormData();fd.append("fichier",factFile);
+fetch("/api/factures/analyser",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
+document.getElementById("fact-res").style.display="block";
+var h="<div class='g4'><div class='sc blue'><div class='val'>"+(d.type_document||"?")+"</div><div class='lab'>Type</div></div><div class='sc'><div class='val'>"+(d.montant_ttc||0).toFixed(2)+"</div><div class='lab'>TTC</div></div><div class='sc'><div class='val'>"+((d.confiance||0)*100).toFixed(0)+"%</div><div class='lab'>Confiance</div></div><div class='sc "+(d.ecriture_manuscrite?"amber":"green")+"'><div class='val'>"+(d.ecriture_manuscrite?"Oui":"Non")+"</div><div class='lab'>Manuscrit</div></div></div>";
+if(d.emetteur)h+="<p style='margin:10px 0'><strong>Emetteur :</strong> "+(d.emetteur.nom||"?")+" (SIRET: "+(d.emetteur.siret||"?")+")</p>";
+if(d.lignes&&d.lignes.length){h+="<table style='margin-top:8px'><tr><th>Description</th><th>Qte</th><th>PU</th><th>HT</th></tr>";for(var i=0;i<d.lignes.length;i++){var l=d.lignes[i];h+="<tr><td>"+l.description+"</td><td class='num'>"+l.quantite+"</td><td class='num'>"+l.prix_unitaire.toFixed(2)+"</td><td class='num'>"+l.montant_ht.toFixed(2)+"</td></tr>";}h+="</table>";}
+if(d.type_document)document.getElementById("f-type").value=d.type_document;
+if(d.date_piece)document.getElementById("f-date").value=d.date_piece;
+if(d.numero)document.getElementById("f-num").value=d.numero;
+if(d.emetteur)document.getElementById("f-tiers").value=d.emetteur.nom||"";
+document.getElementById("f-ht").value=d.montant_ht||0;document.getElementById("f-tva").value=d.montant_tva||0;document.getElementById("f-ttc").value=d.montant_ttc||0;
+document.getElementById("fact-det").innerHTML=h;document.getElementById("alerte-justif").style.display="none";
+}).catch(function(e){toast(e.message);});}
+
+function comptabiliserFacture(){
+var hasJustif=!!factFile;if(!hasJustif)document.getElementById("alerte-justif").style.display="flex";
+var fd=new FormData();fd.append("type_doc",document.getElementById("f-type").value);fd.append("date_piece",document.getElementById("f-date").value);fd.append("numero_piece",document.getElementById("f-num").value);fd.append("montant_ht",document.getElementById("f-ht").value||"0");fd.append("montant_tva",document.getElementById("f-tva").value||"0");fd.append("montant_ttc",document.getElementById("f-ttc").value||"0");fd.append("nom_tiers",document.getElementById("f-tiers").value);
+fetch("/api/factures/comptabiliser",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
+var h="<div class='al "+(hasJustif?"ok":"err")+"'><span class='ai'>"+(hasJustif?"&#9989;":"&#9888;")+"</span><span><strong>Ecriture "+(hasJustif?"generee":"sans justificatif")+"</strong> ID: "+d.ecriture_id+"</span></div>";
+h+="<table><tr><th>Compte</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th></tr>";
+for(var i=0;i<d.lignes.length;i++){var l=d.lignes[i];h+="<tr"+(hasJustif?"":" class='sans-just'")+"><td>"+l.compte+"</td><td>"+l.libelle+"</td><td class='num'>"+l.debit.toFixed(2)+"</td><td class='num'>"+l.credit.toFixed(2)+"</td></tr>";}h+="</table>";
+document.getElementById("fact-saisie-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+
+function toggleMontantPaye(){var sel=document.getElementById("pay-stat").value;document.getElementById("pay-montant-row").style.display=(sel==="partiellement_paye")?"block":"none";}
+function majStatutFacture(){
+var statut=document.getElementById("pay-stat").value;
+var fd=new FormData();fd.append("facture_id",document.getElementById("pay-id").value);fd.append("statut",statut);fd.append("date_paiement",document.getElementById("pay-date").value);fd.append("reference_paiement",document.getElementById("pay-ref").value);
+if(statut==="partiellement_paye"){fd.append("montant_paye",document.getElementById("pay-montant").value||"0");}
+fetch("/api/factures/statut",{method:"POST",body:fd}).then(function(r){if(!r.ok)throw new Error("Erreur");return r.json();}).then(function(){toast("Statut mis a jour.","ok");loadPayStatuses();}).catch(function(e){toast(e.message);});}
+
+function loadPayStatuses(){
+fetch("/api/factures/statuts").then(safeJson).then(function(list){
+var el=document.getElementById("pay-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun statut enregistre.</p>";return;}
+var h="<table><tr><th>Facture</th><th>Statut</th><th>Montant paye</th><th>Date paiement</th><th>Reference</th></tr>";
+for(var i=0;i<list.length;i++){var s=list[i];var cls=s.statut==="paye"?"badge-paye":(s.statut==="en_retard"?"badge-red":(s.statut==="partiellement_paye"?"badge-amber":"badge-impaye"));
+var mp=s.montant_paye?s.montant_paye.toFixed(2)+" EUR":"-";
+h+="<tr><td>"+s.facture_id+"</td><td><span class='badge "+cls+"'>"+s.statut.replace(/_/g," ")+"</span></td><td class='num'>"+mp+"</td><td>"+(s.date_paiement||"-")+"</td><td>"+(s.reference_paiement||"-")+"</td></tr>";}
+h+="</table>";el.innerHTML=h;}).catch(function(){});}
+
+/* === DSN GENERATION === */
+var dsnSalaries=[];
+var dsnPreFilled=false;
+function preFillDSN(){
+if(dsnPreFilled||!analysisData||!analysisData.declarations||!analysisData.declarations.length)return;
+var decl=analysisData.declarations[0];
+if(decl.employeur){
+var em=decl.employeur;
+var f1=document.getElementById("dsn-siren-em");
+var f2=document.getElementById("dsn-siren-ent");
+var f3=document.getElementById("dsn-raison");
+var f4=document.getElementById("dsn-nic");
+var f5=document.getElementById("dsn-eff");
+if(f1&&!f1.value&&em.siren)f1.value=em.siren;
+if(f2&&!f2.value&&em.siren)f2.value=em.siren;
+if(f3&&!f3.value&&em.raison_sociale)f3.value=em.raison_sociale;
+if(f4&&!f4.value&&em.siret)f4.value=em.siret.substring(9);
+if(f5&&em.effectif)f5.value=em.effectif;
+}
+if(decl.periode){
+var f6=document.getElementById("dsn-mois");
+if(f6&&!f6.value)f6.value=decl.periode;
+}
+if(decl.salaries&&decl.salaries.length&&!dsnSalaries.length){
+for(var i=0;i<decl.salaries.length;i++){
+var s=decl.salaries[i];
+dsnSalaries.push({nir:s.nir||"",nom:s.nom||"",prenom:s.prenom||"",date_naissance:s.date_naissance||"",brut_mensuel:s.brut_mensuel||0,net_fiscal:s.net_fiscal||0,heures:s.heures||"151.67",statut_conventionnel:s.statut_conventionnel||"02",num_contrat:s.num_contrat||("C"+String(i+1).padStart(4,"0"))});
+}
+renderDSNSalaries();
+}
+dsnPreFilled=true;
+if(decl.employeur||decl.salaries&&decl.salaries.length)toast("Donnees pre-remplies depuis l analyse.","ok");
+}
+function ajouterSalarieDSN(){
+var sal={
+nir:document.getElementById("dsn-nir").value,
+nom:document.getElementById("dsn-nom").value,
+prenom:document.getElementById("dsn-prenom").value,
+date_naissance:document.getElementById("dsn-ddn").value,
+brut_mensuel:parseFloat(document.getElementById("dsn-brut").value)||0,
+net_fiscal:parseFloat(document.getElementById("dsn-net").value)||0,
+heures:document.getElementById("dsn-heures").value,
+statut_conventionnel:document.getElementById("dsn-statut").value,
+num_contrat:document.getElementById("dsn-contrat").value||("C"+String(dsnSalaries.length+1).padStart(4,"0"))
+};
+if(!sal.nir||!sal.nom){toast("NIR et Nom obligatoires.");return;}
+dsnSalaries.push(sal);
+renderDSNSalaries();
+document.getElementById("dsn-nir").value="";document.getElementById("dsn-nom").value="";document.getElementById("dsn-prenom").value="";document.getElementById("dsn-ddn").value="";document.getElementById("dsn-brut").value="";document.getElementById("dsn-net").value="";
+toast(sal.prenom+" "+sal.nom+" ajoute.","ok");
+}
+
+function renderDSNSalaries(){
+document.getElementById("dsn-sal-count").textContent=dsnSalaries.length;
+var el=document.getElementById("dsn-sal-list");
+if(!dsnSalaries.length){el.innerHTML="";return;}
+var h="<table><tr><th>NIR</th><th>Nom</th><th>Prenom</th><th class='num'>Brut</th><th></th></tr>";
+for(var i=0;i<dsnSalaries.length;i++){var s=dsnSalaries[i];
+h+="<tr><td style='font-size:.8em'>"+s.nir+"</td><td>"+s.nom+"</td><td>"+s.prenom+"</td><td class='num'>"+s.brut_mensuel.toFixed(2)+"</td><td><button class='btn btn-red btn-sm btn-dsn-rm' data-idx='"+i+"'>&times;</button></td></tr>";}
+h+="</table>";el.innerHTML=h;
+el.querySelectorAll(".btn-dsn-rm").forEach(function(btn){btn.addEventListener("click",function(){dsnSalaries.splice(parseInt(btn.getAttribute("data-idx")),1);renderDSNSalaries();});});
+}
+
+function genererDSN(){
+if(!dsnSalaries.length){toast("Ajoutez au moins un salarie.");return;}
+var siren_em=document.getElementById("dsn-siren-em").value;
+var siren_ent=document.getElementById("dsn-siren-ent").value;
+var raison=document.getElementById("dsn-raison").value;
+var nic=document.getElementById("dsn-nic").value;
+if(!siren_ent||!raison||!nic){toast("SIREN, raison sociale et NIC obligatoires.");return;}
+var fd=new FormData();
+fd.append("siren_emetteur",siren_em||siren_ent);
+fd.append("siren_entreprise",siren_ent);
+fd.append("raison_sociale",raison);
+fd.append("nic_etablissement",nic);
+fd.append("effectif",document.getElementById("dsn-eff").value);
+fd.append("mois_declaration",document.getElementById("dsn-mois").value);
+fd.append("salaries_json",JSON.stringify(dsnSalaries));
+document.getElementById("btn-dsn-gen").disabled=true;
+fetch("/api/dsn/generer",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
+var h="<div class='al ok'><span class='ai'>&#9989;</span><span><strong>DSN generee</strong> - "+d.nb_salaries+" salarie(s), "+d.nb_lignes+" lignes</span></div>";
+h+="<div class='g3' style='margin:12px 0'><div class='sc blue'><div class='val'>"+d.nb_salaries+"</div><div class='lab'>Salaries</div></div>";
+h+="<div class='sc green'><div class='val'>"+d.total_brut.toFixed(2)+"</div><div class='lab'>Total brut</div></div>";
+h+="<div class='sc amber'><div class='val'>"+d.total_cotisations.toFixed(2)+"</div><div class='lab'>Cotisations</div></div></div>";
+h+="<div class='card' style='margin-top:10px'><h2>Apercu DSN</h2><pre style='background:var(--p);color:#e2e8f0;padding:16px;border-radius:10px;font-size:.78em;overflow-x:auto;white-space:pre-wrap'>"+d.apercu+"</pre></div>";
+h+="<div style='margin-top:12px'><button class='btn btn-blue' onclick='telechargerDSN()'>&#128190; Telecharger le fichier DSN</button></div>";
+document.getElementById("dsn-result").innerHTML=h;
+document.getElementById("dsn-result")._dsnContent=d.contenu_dsn;
+document.getElementById("dsn-result")._dsnMois=d.mois_declaration;
+document.getElementById("dsn-brouillons-card").style.display="block";
+loadDSNBrouillons();
+}).catch(function(e){toast(e.message);}).finally(function(){document.getElementById("btn-dsn-gen").disabled=false;});
+}
+
+function telechargerDSN(){
+var content=document.getElementById("dsn-result")._dsnContent;
+var mois=document.getElementById("dsn-result")._dsnMois||"000000";
+if(!content){toast("Aucune DSN generee.");return;}
+var blob=new Blob([content],{type:"text/plain;charset=utf-8"});
+var a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download="DSN_"+mois+".dsn";a.click();
+toast("Fichier DSN telecharge.","ok");
+}
+
+function loadDSNBrouillons(){
+fetch("/api/dsn/brouillons").then(safeJson).then(function(raw){var list=(raw&&raw.items&&typeof raw.total==="number")?raw.items:raw;
+var el=document.getElementById("dsn-brouillons");
+if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun brouillon.</p>";document.getElementById("dsn-brouillons-card").style.display="none";return;}
+document.getElementById("dsn-brouillons-card").style.display="block";
+var h="<table><tr><th>Date</th><th>Mois</th><th>Entreprise</th><th class='num'>Salaries</th><th class='num'>Brut total</th></tr>";
+for(var i=0;i<list.length;i++){var d=list[i];
+h+="<tr><td style='font-size:.8em'>"+d.date_creation.substring(0,10)+"</td><td>"+d.mois+"</td><td>"+d.raison_sociale+"</td><td class='num'>"+d.nb_salaries+"</td><td class='num'>"+d.total_brut.toFixed(2)+"</td></tr>";}
+h+="</table>";el.innerHTML=h;}).catch(function(){});}
+
+/* === COMPTABILITE === */
+function loadCompta(){try{
+var dd=document.getElementById("gl-dd").value;var df=document.getElementById("gl-df").value;
+
+fetch("/api/comptabilite/journal").then(safeJson).then(function(j){
+var h="";if(!j.length)h="<p style='color:var(--tx2)'>Aucune ecriture.</p>";
+for(var i=0;i<j.length;i++){var e=j[i];
+h+="<div style='border:1px solid var(--brd);border-radius:10px;padding:12px;margin:6px 0' data-ecr-id='"+e.id+"'>";
+h+="<div style='display:flex;justify-content:space-between;align-items:center;margin-bottom:6px;flex-wrap:wrap;gap:4px'><strong>"+e.date+" | "+e.journal+" | "+e.piece+"</strong><span class='badge "+(e.validee?"badge-green":"badge-amber")+"'>"+(e.validee?"Validee":"Brouillon")+"</span></div>";
+if(e.validee){h+="<div style='color:var(--tx2);font-size:.86em;margin-bottom:6px'>"+e.libelle+"</div>";}
+else{h+="<div style='color:var(--tx2);font-size:.86em;margin-bottom:6px;display:flex;align-items:center;gap:6px'><span class='ecr-lib' id='ecr-lib-"+e.id+"'>"+e.libelle+"</span><button class='btn btn-s btn-sm edl-btn' style='padding:2px 8px;font-size:.78em' data-ecr='"+e.id+"' data-span='ecr-lib-"+e.id+"' data-lig='' title='Modifier le libelle'>&#9998;</button></div>";}
+h+="<table><tr><th>Compte</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th></tr>";
+for(var k=0;k<e.lignes.length;k++){var l=e.lignes[k];var sj=l.libelle.indexOf("[SANS JUSTIFICATIF]")>=0;
+if(e.validee){h+="<tr"+(sj?" class='sans-just'":"")+"><td>"+l.compte+"</td><td>"+l.libelle+(sj?" <span class='badge badge-red'>Sans justif.</span>":"")+"</td><td class='num'>"+l.debit.toFixed(2)+"</td><td class='num'>"+l.credit.toFixed(2)+"</td></tr>";}
+else{h+="<tr"+(sj?" class='sans-just'":"")+"><td>"+l.compte+"</td><td style='display:flex;align-items:center;gap:4px'><span id='ecr-lig-"+e.id+"-"+k+"'>"+l.libelle+"</span>"+(sj?" <span class='badge badge-red'>Sans justif.</span>":"")+"<button class='btn btn-s btn-sm edl-btn' style='padding:1px 6px;font-size:.72em' data-ecr='"+e.id+"' data-span='ecr-lig-"+e.id+"-"+k+"' data-lig='"+k+"' title='Modifier'>&#9998;</button></td><td class='num'>"+l.debit.toFixed(2)+"</td><td class='num'>"+l.credit.toFixed(2)+"</td></tr>";}}
+h+="</table></div>";}window._journalData=j;document.getElementById("ct-journal-c").innerHTML=h;filterJournal();}).catch(function(e){document.getElementById("ct-journal-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+
+fetch("/api/comptabilite/balance").then(safeJson).then(function(b){
+var h="";if(!b.length)h="<p style='color:var(--tx2)'>Aucune donnee.</p>";
+else{h="<table><tr><th>Compte</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th><th class='num'>Solde D</th><th class='num'>Solde C</th></tr>";
+for(var i=0;i<b.length;i++){var r2=b[i];h+="<tr><td>"+r2.compte+"</td><td>"+r2.libelle+"</td><td class='num'>"+r2.total_debit.toFixed(2)+"</td><td class='num'>"+r2.total_credit.toFixed(2)+"</td><td class='num'>"+r2.solde_debiteur.toFixed(2)+"</td><td class='num'>"+r2.solde_crediteur.toFixed(2)+"</td></tr>";}h+="</table>";}
+document.getElementById("ct-balance-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-balance-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+
+var glUrl="/api/comptabilite/grand-livre-detail";if(dd)glUrl+="?date_debut="+dd+(df?"&date_fin="+df:"");
+fetch(glUrl).then(safeJson).then(function(gl){
+var h="";if(!gl.length)h="<p style='color:var(--tx2)'>Aucune donnee.</p>";
+for(var i=0;i<gl.length;i++){var c=gl[i];h+="<div style='border:1px solid var(--brd);border-radius:10px;padding:12px;margin:6px 0'><strong>"+c.compte+" - "+(c.libelle||"")+"</strong>";
+var mvts=c.mouvements||[];if(mvts.length){h+="<table style='margin-top:6px'><tr><th>Date</th><th>Libelle</th><th class='num'>Debit</th><th class='num'>Credit</th></tr>";
+for(var k=0;k<mvts.length;k++){var m=mvts[k];var sj=m.sans_justificatif;h+="<tr"+(sj?" class='sans-just'":"")+"><td>"+(m.date||"")+"</td><td>"+(m.libelle||"")+(sj?" <span class='badge badge-red'>Sans justif.</span>":"")+"</td><td class='num'>"+(m.debit||0).toFixed(2)+"</td><td class='num'>"+(m.credit||0).toFixed(2)+"</td></tr>";}
+h+="</table>";}h+="</div>";}document.getElementById("ct-grandlivre-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-grandlivre-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+
+fetch("/api/comptabilite/compte-resultat").then(safeJson).then(function(cr){
+var clr=cr.resultat_net>=0?"var(--g)":"var(--r)";var bg=cr.resultat_net>=0?"var(--gl)":"var(--rl)";
+var h="<div class='g2'><div class='card' style='text-align:center'><h2>Charges</h2><div style='font-size:1.4em;font-weight:800;color:var(--r)'>"+cr.charges.total.toFixed(2)+" EUR</div></div>";
+h+="<div class='card' style='text-align:center'><h2>Produits</h2><div style='font-size:1.4em;font-weight:800;color:var(--g)'>"+cr.produits.total.toFixed(2)+" EUR</div></div></div>";
+h+="<div class='sc' style='margin-top:14px;background:"+bg+"'><div class='val' style='color:"+clr+"'>"+cr.resultat_net.toFixed(2)+" EUR</div><div class='lab'>Resultat net</div></div>";
+document.getElementById("ct-resultat-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-resultat-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+
+fetch("/api/comptabilite/bilan").then(safeJson).then(function(bi){
+var a=bi.actif,p=bi.passif;
+var h="<div class='g2'><div><h3 style='margin-bottom:8px;color:var(--p)'>Actif</h3><table><tr><th>Poste</th><th class='num'>Montant</th></tr>";
+h+="<tr><td>Immobilisations</td><td class='num'>"+a.immobilisations.toFixed(2)+"</td></tr><tr><td>Stocks</td><td class='num'>"+a.stocks.toFixed(2)+"</td></tr>";
+h+="<tr><td>Creances</td><td class='num'>"+a.creances.toFixed(2)+"</td></tr><tr><td>Tresorerie</td><td class='num'>"+a.tresorerie.toFixed(2)+"</td></tr>";
+h+="<tr style='font-weight:bold;background:var(--pl)'><td>TOTAL ACTIF</td><td class='num'>"+a.total.toFixed(2)+"</td></tr></table></div>";
+h+="<div><h3 style='margin-bottom:8px;color:var(--p)'>Passif</h3><table><tr><th>Poste</th><th class='num'>Montant</th></tr>";
+h+="<tr><td>Capitaux propres</td><td class='num'>"+p.capitaux_propres.toFixed(2)+"</td></tr><tr><td>Dettes financieres</td><td class='num'>"+p.dettes_financieres.toFixed(2)+"</td></tr>";
+h+="<tr><td>Dettes exploitation</td><td class='num'>"+p.dettes_exploitation.toFixed(2)+"</td></tr>";
+h+="<tr style='font-weight:bold;background:var(--pl)'><td>TOTAL PASSIF</td><td class='num'>"+p.total.toFixed(2)+"</td></tr></table></div></div>";
+document.getElementById("ct-bilan-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-bilan-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+
+(function(){var now=new Date();fetch("/api/comptabilite/declaration-tva?mois="+(now.getMonth()+1)+"&annee="+now.getFullYear()).then(safeJson).then(function(t){
+var h="<div class='g3'><div class='sc'><div class='val'>"+t.chiffre_affaires_ht.toFixed(2)+"</div><div class='lab'>CA HT</div></div><div class='sc'><div class='val'>"+t.tva_collectee.toFixed(2)+"</div><div class='lab'>TVA collectee</div></div><div class='sc'><div class='val'>"+t.tva_deductible_totale.toFixed(2)+"</div><div class='lab'>TVA deductible</div></div></div>";
+var net=t.tva_nette_a_payer>0?t.tva_nette_a_payer.toFixed(2)+" EUR a payer":t.credit_tva.toFixed(2)+" EUR credit";
+h+="<div class='sc' style='margin-top:12px'><div class='val'>"+net+"</div><div class='lab'>TVA nette</div></div>";
+document.getElementById("ct-tva-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-tva-c").innerHTML="<p style='color:var(--r)'>Erreur TVA: "+e.message+"</p>";});})();
+
+fetch("/api/comptabilite/charges-sociales-detail").then(safeJson).then(function(soc){
+var h="<div class='g4'>";var ds=soc.destinataires||[];var cls=["blue","amber","green","purple"];
+for(var i=0;i<ds.length;i++){var d=ds[i];h+="<div class='sc "+cls[i%4]+"'><div class='val'>"+(d.montant||0).toFixed(2)+"</div><div class='lab'>"+d.nom+"</div><div style='font-size:.7em;color:var(--tx2);margin-top:3px'>"+d.postes.join(", ")+"</div></div>";}h+="</div>";
+h+="<div class='g3' style='margin-top:12px'><div class='sc'><div class='val'>"+(soc.brut||0).toFixed(2)+"</div><div class='lab'>Bruts</div></div>";
+h+="<div class='sc amber'><div class='val'>"+(soc.total||0).toFixed(2)+"</div><div class='lab'>Total charges</div></div>";
+h+="<div class='sc blue'><div class='val'>"+(soc.cout_employeur||0).toFixed(2)+"</div><div class='lab'>Cout employeur</div></div></div>";
+document.getElementById("ct-social-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-social-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+
+fetch("/api/comptabilite/plan-comptable").then(safeJson).then(function(pc){
+var h="<input placeholder='Rechercher...' oninput='rechPC(this.value)' style='margin-bottom:10px'><table id='pc-t'><tr><th>N</th><th>Libelle</th><th>Classe</th></tr>";
+for(var i=0;i<pc.length;i++){h+="<tr><td>"+pc[i].numero+"</td><td>"+pc[i].libelle+"</td><td>"+pc[i].classe+"</td></tr>";}h+="</table>";
+document.getElementById("ct-plan-c").innerHTML=h;}).catch(function(e){document.getElementById("ct-plan-c").innerHTML="<p style='color:var(--r)'>Erreur: "+e.message+"</p>";});
+}catch(e){console.error("loadCompta error:",e);}}
+
+function filterJournal(){var searchEl=document.getElementById("ct-journal-search");if(!searchEl)return;var q=searchEl.value.toLowerCase().trim();var cards=document.querySelectorAll("#ct-journal-c > div[data-ecr-id]");if(!cards.length)return;cards.forEach(function(card){if(!q){card.style.display="";return;}var text=card.textContent.toLowerCase();card.style.display=text.indexOf(q)>=0?"":"none";});}
+
+function rechPC(t){fetch(t?"/api/comptabilite/plan-comptable?terme="+encodeURIComponent(t):"/api/comptabilite/plan-comptable").then(safeJson).then(function(pc){var tb=document.getElementById("pc-t");if(!tb)return;var h="<tr><th>N</th><th>Libelle</th><th>Classe</th></tr>";for(var i=0;i<pc.length;i++){h+="<tr><td>"+pc[i].numero+"</td><td>"+pc[i].libelle+"</td><td>"+pc[i].classe+"</td></tr>";}tb.innerHTML=h;}).catch(function(e){console.error("Plan comptable",e);});}
+function validerEcr(){fetch("/api/comptabilite/valider",{method:"POST"}).then(safeJson).then(function(d){toast("Validees: "+d.nb_validees+(d.erreurs.length?" | Erreurs: "+d.erreurs.join(", "):""),"ok");loadCompta();}).catch(function(e){toast(e.message);});}
+function editLibelle(ecrId,spanId,ligneIdx){var sp=document.getElementById(spanId);if(!sp)return;var old=sp.textContent;var inp=document.createElement("input");inp.type="text";inp.value=old;inp.style.cssText="font-size:.86em;padding:4px 8px;border:1px solid var(--p);border-radius:6px;width:100%;min-width:200px";sp.parentNode.replaceChild(inp,sp);inp.focus();inp.select();function save(){var nv=inp.value.trim();if(!nv||nv===old){var ns=document.createElement("span");ns.id=spanId;ns.textContent=old;inp.parentNode.replaceChild(ns,inp);return;}var body={};if(ligneIdx===null)body.libelle=nv;else{body.lignes={};body.lignes[ligneIdx]=nv;}fetch("/api/comptabilite/ecriture/"+ecrId+"/libelle",{method:"PUT",headers:{"Content-Type":"application/json"},body:JSON.stringify(body)}).then(safeJson).then(function(){var ns=document.createElement("span");ns.id=spanId;ns.textContent=nv;if(inp.parentNode)inp.parentNode.replaceChild(ns,inp);toast("Libelle modifie","ok");}).catch(function(e){toast(e.message||"Erreur");var ns=document.createElement("span");ns.id=spanId;ns.textContent=old;if(inp.parentNode)inp.parentNode.replaceChild(ns,inp);});}inp.addEventListener("keydown",function(ev){if(ev.key==="Enter")save();if(ev.key==="Escape"){var ns=document.createElement("span");ns.id=spanId;ns.textContent=old;inp.parentNode.replaceChild(ns,inp);}});inp.addEventListener("blur",save);}
+document.addEventListener("click",function(ev){var btn=ev.target.closest(".edl-btn");if(!btn)return;var ecrId=btn.getAttribute("data-ecr");var spanId=btn.getAttribute("data-span");var ligStr=btn.getAttribute("data-lig");var ligneIdx=(ligStr==="")?null:parseInt(ligStr,10);editLibelle(ecrId,spanId,ligneIdx);});
+var _sugTimer=null;
+function suggestCompte(inputId,sugId,counterpartId){
+clearTimeout(_sugTimer);_sugTimer=setTimeout(function(){
+var v=document.getElementById(inputId).value;if(v.length<2){closeSugs(sugId);return;}
+fetch("/api/comptabilite/suggestions?compte="+encodeURIComponent(v)+"&description="+encodeURIComponent(v)).then(safeJson).then(function(d){
+var box=document.getElementById(sugId);var items=d.suggestions||[];if(!items.length){closeSugs(sugId);return;}
+var h="<div class='sug-list show'>";for(var i=0;i<items.length&&i<8;i++){var num=items[i].numero;var cp=(d.contreparties||{})[num]||"";var expl=items[i].explication||"";h+="<div class='sug-item' style='flex-direction:column;align-items:flex-start;padding:8px 10px' data-num='"+num+"' data-cp='"+cp+"' data-iid='"+inputId+"' data-sid='"+sugId+"' data-cpid='"+counterpartId+"'><div><span class='sug-num'>"+num+"</span><span class='sug-lbl'>"+items[i].libelle+"</span></div>"+(expl?"<div style='font-size:.78em;color:var(--tx2);margin-top:2px;line-height:1.3'>"+expl+"</div>":"")+"</div>";}
+h+="</div>";box.innerHTML=h;box.querySelectorAll(".sug-item").forEach(function(el){el.addEventListener("click",function(){pickSug(el.getAttribute("data-iid"),el.getAttribute("data-sid"),el.getAttribute("data-num"),el.getAttribute("data-cpid"),el.getAttribute("data-cp"));});});}).catch(function(e){console.error("Suggestion error:",e);});},250);}
+var _sugSearchTimer=null;
+function suggestByDescription(){clearTimeout(_sugSearchTimer);_sugSearchTimer=setTimeout(function(){
+var v=document.getElementById("em-search").value;if(v.length<2){closeSugs("em-search-sug");return;}
+fetch("/api/comptabilite/suggestions?description="+encodeURIComponent(v)).then(safeJson).then(function(d){
+var box=document.getElementById("em-search-sug");var items=d.suggestions||[];if(!items.length){closeSugs("em-search-sug");return;}
+var h="<div class='sug-list show'>";for(var i=0;i<items.length&&i<10;i++){var item=items[i];var expl=item.explication||"";h+="<div class='sug-item' style='flex-direction:column;align-items:flex-start;padding:10px 12px;cursor:pointer' data-num='"+item.numero+"'><div style='display:flex;align-items:center;gap:8px'><span class='sug-num' style='font-size:.95em'>"+item.numero+"</span><span class='sug-lbl' style='font-weight:600;color:var(--tx)'>"+item.libelle+"</span></div>"+(expl?"<div style='font-size:.82em;color:var(--tx2);margin-top:3px;line-height:1.4'>&#128161; "+expl+"</div>":"")+"</div>";}
+h+="</div>";box.innerHTML=h;box.querySelectorAll(".sug-item").forEach(function(el){el.addEventListener("click",function(){var num=el.getAttribute("data-num");document.getElementById("em-deb").value=num;closeSugs("em-search-sug");suggestCompte("em-deb","em-deb-sug","em-cre");});});}).catch(function(){});},300);}
+function pickSug(inputId,sugId,val,cpId,cpVal){document.getElementById(inputId).value=val;closeSugs(sugId);if(cpId&&cpVal){var cpInput=document.getElementById(cpId);if(cpInput&&!cpInput.value)cpInput.value=cpVal;}}
+function closeSugs(sugId){var b=document.getElementById(sugId);if(b)b.innerHTML="";}
+document.addEventListener("click",function(e){if(!e.target.closest(".sug-box")&&!e.target.closest("input")){document.querySelectorAll(".sug-list").forEach(function(s){s.classList.remove("show");});}});
+function creerSousCompte(){var fd=new FormData();fd.append("compte_parent",document.getElementById("sc-parent").value);fd.append("libelle",document.getElementById("sc-lib").value);
+fetch("/api/comptabilite/sous-compte",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){document.getElementById("sc-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Sous-compte <strong>"+d.numero+"</strong> cree: "+d.libelle+"</span></div>";}).catch(function(e){document.getElementById("sc-res").innerHTML="<div class='al err'>"+e.message+"</div>";});}
+function saisirEcriture(){
+var deb=document.getElementById("em-deb").value;var cre=document.getElementById("em-cre").value;
+if(!deb||deb.length<3){toast("Compte debit invalide.");return;}if(!cre||cre.length<3){toast("Compte credit invalide.");return;}
+var fd=new FormData();fd.append("date_piece",document.getElementById("em-date").value);fd.append("libelle",document.getElementById("em-lib").value);fd.append("compte_debit",deb);fd.append("compte_credit",cre);fd.append("montant",document.getElementById("em-mt").value||"0");
+var fj=document.getElementById("em-just-file");fd.append("has_justificatif",fj&&fj.files&&fj.files.length>0?"true":"false");
+fetch("/api/comptabilite/ecriture/manuelle",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(d){
+var cls=d.sans_justificatif?"warn":"ok";var icon=d.sans_justificatif?"&#9888;":"&#9989;";
+document.getElementById("em-res").innerHTML="<div class='al "+cls+"'><span class='ai'>"+icon+"</span><span>"+(d.alerte||"Ecriture enregistree.")+(d.sans_justificatif?" <em style='color:var(--r)'>(justificatif manquant)</em>":"")+"</span></div>";loadCompta();}).catch(function(e){document.getElementById("em-res").innerHTML="<div class='al err'>"+e.message+"</div>";});}
+
+/* === SIMULATION === */
+function simBulletin(){var brut=document.getElementById("sim-brut").value;if(!brut||parseFloat(brut)<=0){toast("Saisissez un salaire brut valide.");return;}var absJ=gv("sim-abs-jours")||"0";var absT=gv("sim-abs-type")||"";fetch("/api/simulation/bulletin?brut_mensuel="+brut+"&effectif="+document.getElementById("sim-eff").value+"&est_cadre="+document.getElementById("sim-cadre").value+"&jours_absence="+absJ+"&type_absence="+encodeURIComponent(absT)).then(safeJson).then(function(r){var h="";if(r.alertes&&r.alertes.length>0){for(var a=0;a<r.alertes.length;a++){var al=r.alertes[a];var cls=al.niveau==="haute"?"err":"warn";h+="<div class='al "+cls+"' style='margin-bottom:8px'><span class='ai'>&#9888;</span><span>"+al.message+"</span></div>";}}h+="<div class='g4'><div class='sc blue'><div class='val'>"+r.brut_mensuel.toFixed(2)+"</div><div class='lab'>Brut contractuel</div></div><div class='sc "+(r.retenue_absences>0?"amber":"blue")+"'><div class='val'>"+r.brut_effectif.toFixed(2)+"</div><div class='lab'>Brut effectif</div></div><div class='sc green'><div class='val'>"+r.net_a_payer.toFixed(2)+"</div><div class='lab'>Net a payer</div></div><div class='sc amber'><div class='val'>"+r.cout_total_employeur.toFixed(2)+"</div><div class='lab'>Cout employeur</div></div></div>";if(r.info_absences){var ab=r.info_absences;var typeLabels={"maladie":"Maladie","at_mp":"AT/Maladie pro.","maternite":"Maternite/Paternite","conge_sans_solde":"Conge sans solde","non_precise":"Non precise"};h+="<div style='margin-top:10px;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--o)'><strong>&#128197; Absences : "+ab.jours+" jour(s) - "+(typeLabels[ab.type]||ab.type)+"</strong><div style='font-size:.84em;margin-top:4px'>Retenue sur brut : <b style="color:var(--r)">-"+ab.retenue_brut.toFixed(2)+" EUR</b> | Brut contractuel : "+ab.brut_contractuel.toFixed(2)+" EUR &rarr; Brut effectif : <b>"+ab.brut_apres_absences.toFixed(2)+" EUR</b>";if(ab.ijss_estimees>0)h+="<br>IJSS estimees : <b style="color:#16a34a">"+ab.ijss_estimees.toFixed(2)+" EUR</b>";if(ab.complement_employeur>0)h+=" | Complement employeur : <b>"+ab.complement_employeur.toFixed(2)+" EUR</b>";h+="</div></div>";}h+="<table style='margin-top:12px'><tr><th>Rubrique</th><th class='num'>Patronal</th><th class='num'>Salarial</th></tr>";var ls=r.lignes||[];for(var i=0;i<ls.length;i++){h+="<tr><td>"+ls[i].libelle+"</td><td class='num'>"+ls[i].montant_patronal.toFixed(2)+"</td><td class='num'>"+ls[i].montant_salarial.toFixed(2)+"</td></tr>";}h+="</table>";document.getElementById("sim-bull-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function ccnAutoSearch(){var t=document.getElementById("ccn-search").value;if(t.length<2){document.getElementById("ccn-search-results").innerHTML="";return;}fetch("/api/simulation/recherche-ccn?terme="+encodeURIComponent(t)).then(safeJson).then(function(r){var box=document.getElementById("ccn-search-results");if(!r.resultats||!r.resultats.length){box.innerHTML="";return;}var container=document.createElement("div");container.style.cssText="background:var(--bg2);border-radius:6px;padding:6px";for(var i=0;i<Math.min(r.resultats.length,8);i++){(function(c){var d=document.createElement("div");d.style.cssText="padding:4px 8px;cursor:pointer;border-radius:4px;font-size:.85em";d.innerHTML="<strong>IDCC "+c.idcc+"<\/strong> - "+c.nom;d.onmouseover=function(){d.style.background="var(--bg3)";};d.onmouseout=function(){d.style.background="";};d.onclick=function(){document.getElementById("ccn-search").value=c.idcc;box.innerHTML="";};container.appendChild(d);})(r.resultats[i]);}box.innerHTML="";box.appendChild(container);}).catch(function(){});}
+function simCCN(){var ccn=document.getElementById("ccn-search").value;if(!ccn){toast("Saisissez un IDCC ou un nom de convention collective");return;}var p="ccn="+encodeURIComponent(ccn)+"&brut_mensuel="+gv("ccn-brut")+"&est_cadre="+gv("ccn-cadre")+"&effectif="+gv("ccn-eff");fetch("/api/simulation/ccn?"+p).then(safeJson).then(function(r){var h="";if(r.ccn_identifiee){h+="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#9989;</span><span><strong>IDCC "+r.idcc+" - "+r.nom_ccn+"</strong>"+(r.secteur?" ("+r.secteur+")":"")+"</span></div>";}else{h+="<div class='al warn' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span><strong>Convention non identifiee</strong> — les minimums legaux sont appliques. Essayez un numero IDCC (ex: 1486).</span></div>";}if(r.alerte_salaire_minimum){var cls=r.alerte_salaire_minimum.niveau==="haute"?"err":"warn";h+="<div class='al "+cls+"' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span>"+r.alerte_salaire_minimum.message+"</span></div>";}h+="<div class='g4'><div class='sc blue'><div class='val'>"+r.bulletin.brut_mensuel.toFixed(2)+"</div><div class='lab'>Brut mensuel</div></div><div class='sc green'><div class='val'>"+r.bulletin.net_avant_impot.toFixed(2)+"</div><div class='lab'>Net avant impot</div></div><div class='sc amber'><div class='val'>"+r.bulletin.cout_total_employeur.toFixed(2)+"</div><div class='lab'>Cout employeur</div></div><div class='sc'><div class='val'>"+r.prevoyance_ccn.montant_mensuel.toFixed(2)+"</div><div class='lab'>Prevoyance CCN/mois</div></div></div>";if(r.salaire_minimum_conventionnel||r.smic_mensuel){h+="<div style='margin:10px 0;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--p)'><strong>&#128176; Salaires minimums applicables</strong><div style='margin-top:6px;font-size:.88em'><span>SMIC legal : <b>"+r.smic_mensuel.toFixed(2)+" EUR/mois</b></span>";if(r.salaire_minimum_conventionnel){h+=" | Minimum conventionnel : <b style='color:"+(r.salaire_minimum_conventionnel>r.smic_mensuel?"#16a34a":"var(--tx)")+"'>"+r.salaire_minimum_conventionnel.toFixed(2)+" EUR/mois</b>";}h+="</div></div>";};h+="<h3 style='margin-top:16px'>&#9878; Obligations conventionnelles vs legales</h3>";if(r.obligations_conventionnelles&&r.obligations_conventionnelles.length>0){h+="<table><thead><tr><th>Obligation</th><th>Disposition conventionnelle</th><th>Minimum legal</th><th>+Favorable?</th></tr></thead><tbody>";for(var i=0;i<r.obligations_conventionnelles.length;i++){var o=r.obligations_conventionnelles[i];var badge=o.plus_favorable===true?"<span style='color:#16a34a'>&#10004; Oui</span>":o.plus_favorable===false?"<span style='color:#dc2626'>&#10008; Non</span>":"<span style='color:#d97706'>&#8212;</span>";h+="<tr><td><strong>"+o.obligation+"</strong></td><td>"+o.conventionnel+"</td><td>"+(o.legal||"-")+"</td><td>"+badge+"</td></tr>";}h+="</tbody></table>";h+="<p style='margin-top:8px;font-size:.85em;color:var(--tx2)'><strong>"+r.nb_obligations_plus_favorables+"</strong> disposition(s) conventionnelle(s) plus favorable(s) que la loi.</p>";}else{h+="<p style='color:var(--tx2);font-style:italic'>Aucune specificite conventionnelle identifiee au-dela du minimum legal.</p>";}h+="<h3 style='margin-top:16px'>&#128214; Rappel obligations legales (Code du travail / ANI)</h3>";if(r.obligations_legales){h+="<table><thead><tr><th>Obligation</th><th>Minimum legal</th></tr></thead><tbody>";for(var j=0;j<r.obligations_legales.length;j++){var ol=r.obligations_legales[j];h+="<tr><td>"+ol.obligation+"</td><td>"+ol.legal+"</td></tr>";}h+="</tbody></table>";}h+="<p style='margin-top:10px;font-size:.83em;color:var(--tx2);font-style:italic'>"+r.rappel+"</p>";document.getElementById("sim-ccn-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simMicro(){fetch("/api/simulation/micro-entrepreneur?chiffre_affaires="+document.getElementById("sim-ca").value+"&activite="+document.getElementById("sim-act").value+"&acre="+document.getElementById("sim-acre").value).then(safeJson).then(function(r){var h="<div class='g4'>";for(var k in r){if(typeof r[k]==="number")h+="<div class='sc'><div class='val'>"+r[k].toFixed(2)+"</div><div class='lab'>"+k.replace(/_/g," ")+"</div></div>";}h+="</div>";document.getElementById("sim-micro-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simTNS(){fetch("/api/simulation/tns?revenu_net="+document.getElementById("sim-rev").value+"&type_statut="+document.getElementById("sim-stat").value+"&acre="+document.getElementById("sim-tacre").value).then(safeJson).then(function(r){var h="<div class='g4'>";for(var k in r){if(typeof r[k]==="number")h+="<div class='sc'><div class='val'>"+r[k].toFixed(2)+"</div><div class='lab'>"+k.replace(/_/g," ")+"</div></div>";}h+="</div>";document.getElementById("sim-tns-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simGUSO(){var p="salaire_brut="+gv("sim-gbrut")+"&nb_heures="+gv("sim-gh")+"&type_contrat="+gv("sim-gtype")+"&est_artiste="+gv("sim-gartiste");fetch("/api/simulation/guso?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+fmtN(r.salaire_brut)+"</div><div class='lab'>Brut "+r.type_contrat+"</div></div><div class='sc green'><div class='val'>"+fmtN(r.net_artiste)+"</div><div class='lab'>Net "+(r.est_artiste?"artiste":"technicien")+"</div></div><div class='sc amber'><div class='val'>"+fmtN(r.total_charges_guso)+"</div><div class='lab'>Total charges GUSO</div></div><div class='sc red'><div class='val'>"+fmtN(r.cout_total_employeur)+"</div><div class='lab'>Cout total employeur</div></div></div>";h+="<h3 style='margin-top:14px'>Detail des cotisations spectacle</h3><table><thead><tr><th>Cotisation</th><th class='num'>Montant</th><th>Base</th></tr></thead><tbody>";h+="<tr><td>Cotisations patronales URSSAF</td><td class='num'>"+fmtN(r.cotisations_patronales_urssaf)+"</td><td>Droit commun</td></tr>";h+="<tr><td><strong>Conge spectacle (15.5%)</strong></td><td class='num'>"+fmtN(r.conge_spectacle_15_5pct)+"</td><td>Obligatoire spectacle</td></tr>";h+="<tr><td>Audiens prevoyance (1.5%)</td><td class='num'>"+fmtN(r.audiens_prevoyance)+"</td><td>CCN Spectacle</td></tr>";h+="<tr><td>Audiens sante (0.82%)</td><td class='num'>"+fmtN(r.audiens_sante)+"</td><td>Complementaire obligatoire</td></tr>";h+="<tr><td>FCAP (0.5%)</td><td class='num'>"+fmtN(r.fcap)+"</td><td>Pole emploi spectacle</td></tr>";h+="<tr><td>Medecine du travail</td><td class='num'>"+fmtN(r.medecine_travail)+"</td><td>0.46 EUR/heure</td></tr>";h+="</tbody></table>";if(r.detail_csg_crds){var csg=r.detail_csg_crds;h+="<h3 style='margin-top:14px'>CSG/CRDS (prelevements salarie)</h3><table><thead><tr><th>Prelevement</th><th class='num'>Montant</th></tr></thead><tbody>";h+="<tr><td>CSG deductible (6.8%)</td><td class='num'>"+fmtN(csg.csg_deductible_6_8)+"</td></tr>";h+="<tr><td>CSG non deductible (2.4%)</td><td class='num'>"+fmtN(csg.csg_non_deductible_2_4)+"</td></tr>";h+="<tr><td>CRDS (0.5%)</td><td class='num'>"+fmtN(csg.crds_0_5)+"</td></tr>";h+="<tr style='font-weight:600'><td>Total CSG/CRDS</td><td class='num'>"+fmtN(csg.total)+"</td></tr>";h+="</tbody></table>";}if(r.rappel){h+="<p style='margin-top:10px;font-size:.83em;color:var(--tx2);font-style:italic'>"+r.rappel+"</p>";}document.getElementById("sim-guso-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simIR(){fetch("/api/simulation/impot-independant?benefice="+document.getElementById("sim-ben").value+"&nb_parts="+document.getElementById("sim-parts").value+"&autres_revenus="+document.getElementById("sim-autres").value).then(safeJson).then(function(r){var h="<div class='g4'>";for(var k in r){if(typeof r[k]==="number")h+="<div class='sc'><div class='val'>"+r[k].toFixed(2)+"</div><div class='lab'>"+k.replace(/_/g," ")+"</div></div>";}h+="</div>";document.getElementById("sim-ir-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simEpargne(){var fd=new FormData();fd.append("type_dispositif",gv("ep-type"));fd.append("masse_salariale_brute",gv("ep-ms"));fd.append("effectif",gv("ep-eff"));fd.append("montant_verse",gv("ep-montant"));fd.append("abondement_pct",gv("ep-abond"));fd.append("plafond_abondement",gv("ep-plaf"));fd.append("taux_forfait_social",gv("ep-fs"));fd.append("benefice_net",gv("ep-bn"));fetch("/api/simulation/epargne-salariale",{method:"POST",body:fd}).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+r.type_dispositif+"</div><div class='lab'>Dispositif</div></div><div class='sc green'><div class='val'>"+fmtN(r.montant_verse)+"</div><div class='lab'>Montant verse</div></div><div class='sc amber'><div class='val'>"+fmtN(r.cout_total_entreprise)+"</div><div class='lab'>Cout total entreprise</div></div><div class='sc green'><div class='val'>"+fmtN(r.economie_entreprise)+"</div><div class='lab'>Economie vs prime ("+r.economie_entreprise_pct+"%)</div></div></div>";h+="<div class='g4' style='margin-top:10px'><div class='sc'><div class='val'>"+fmtN(r.abondement_employeur)+"</div><div class='lab'>Abondement total</div></div><div class='sc'><div class='val'>"+r.taux_forfait_social+"%</div><div class='lab'>Taux forfait social</div></div><div class='sc'><div class='val'>"+fmtN(r.forfait_social)+"</div><div class='lab'>Forfait social</div></div><div class='sc'><div class='val'>"+fmtN(r.deduction_is)+"</div><div class='lab'>Deduction IS</div></div></div>";h+="<h3 style='margin-top:14px'>&#9878; Comparaison prime classique vs epargne salariale</h3><table><thead><tr><th></th><th class='num'>Prime classique</th><th class='num'>Epargne salariale</th><th class='num'>Ecart</th></tr></thead><tbody>";h+="<tr><td>Cout employeur</td><td class='num'>"+fmtN(r.comparaison_prime.cout_total_prime)+"</td><td class='num'>"+fmtN(r.cout_total_entreprise)+"</td><td class='num' style='color:#16a34a'>"+fmtN(r.economie_entreprise)+"</td></tr>";h+="<tr><td>Net percu salarie</td><td class='num'>"+fmtN(r.comparaison_prime.net_salarie_prime)+"</td><td class='num'>"+fmtN(r.net_salarie_epargne)+"</td><td class='num' style='color:#16a34a'>"+fmtN(r.gain_net_salarie)+"</td></tr>";h+="<tr><td>Charges patronales</td><td class='num'>"+fmtN(r.comparaison_prime.charges_patronales)+"</td><td class='num'>"+fmtN(r.forfait_social)+"</td><td class='num'></td></tr>";h+="<tr><td>CSG/CRDS salarie</td><td class='num'>-</td><td class='num'>"+fmtN(r.csg_crds_salarie)+"</td><td class='num'></td></tr>";h+="</tbody></table>";h+="<div class='al ok' style='margin-top:12px'><span class='ai'>&#9989;</span><span><strong>Cout net apres IS : "+fmtN(r.cout_net_apres_is)+" EUR</strong></span></div>";if(r.rappel_regles){h+="<p style='margin-top:8px;font-size:.84em;color:var(--tx2);font-style:italic'>"+r.rappel_regles+"</p>";}document.getElementById("sim-epargne-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function creerContratEpargne(){var fd=new FormData();fd.append("type_dispositif",gv("epc-type"));fd.append("nom_contrat",gv("epc-nom"));fd.append("organisme",gv("epc-org"));fd.append("date_mise_en_place",gv("epc-date"));fd.append("duree_accord",gv("epc-duree"));fd.append("montant_prevu",gv("epc-montant"));fd.append("abondement_pct",gv("epc-abond"));fd.append("plafond_abondement",gv("epc-plaf"));fd.append("beneficiaires",gv("epc-benef"));fd.append("observations",gv("epc-obs"));fetch("/api/epargne-salariale/contrats",{method:"POST",body:fd}).then(safeJson).then(function(r){if(r.ok){toast("Contrat cree avec succes");loadContratsEpargne();}else{toast(r.error||"Erreur");}}).catch(function(e){toast(e.message);});}
+function loadContratsEpargne(){fetch("/api/epargne-salariale/contrats").then(safeJson).then(function(r){var el=document.getElementById("epargne-contrats-list");if(!r.contrats||r.contrats.length===0){el.innerHTML="<p style='color:var(--tx2);font-style:italic'>Aucun contrat enregistre.</p>";return;}var h="<table><thead><tr><th>Type</th><th>Nom</th><th>Organisme</th><th>Date</th><th>Duree</th><th>Montant prevu</th><th>Abond.</th><th>Statut</th><th></th></tr></thead><tbody>";for(var i=0;i<r.contrats.length;i++){var c=r.contrats[i];h+="<tr><td><strong>"+_esc(c.type_dispositif)+"</strong></td><td>"+_esc(c.nom_contrat)+"</td><td>"+_esc(c.organisme)+"</td><td>"+_esc(c.date_mise_en_place)+"</td><td>"+c.duree_accord_ans+" ans</td><td>"+fmtN(c.montant_prevu)+"</td><td>"+c.abondement_pct+"%</td><td><span style='color:#16a34a'>"+_esc(c.statut)+"</span></td><td><button class='btn btn-red' style='padding:2px 8px;font-size:.8em' onclick='supprimerContratEpargne("+JSON.stringify(c.id)+")'>Suppr.</button></td></tr>";}h+="</tbody></table>";el.innerHTML=h;}).catch(function(e){toast(e.message);});}
+function supprimerContratEpargne(id){if(!confirm("Supprimer ce contrat ?"))return;fetch("/api/epargne-salariale/contrats/"+id,{method:"DELETE"}).then(safeJson).then(function(r){if(r.ok){toast("Contrat supprime");loadContratsEpargne();}else{toast(r.error||"Erreur");}}).catch(function(e){toast(e.message);});}
+function simCout(){var p="brut_mensuel="+gv("ce-brut")+"&effectif="+gv("ce-eff")+"&est_cadre="+gv("ce-cadre")+"&primes="+gv("ce-primes")+"&avantages_nature="+gv("ce-avantages")+"&frais_km="+gv("ce-km")+"&tickets_restaurant="+gv("ce-tr")+"&mutuelle_employeur="+gv("ce-mut");fetch("/api/simulation/cout-employeur?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+r.brut_total.toFixed(2)+"</div><div class='lab'>Brut total</div></div><div class='sc green'><div class='val'>"+r.net_a_payer.toFixed(2)+"</div><div class='lab'>Net a payer</div></div><div class='sc amber'><div class='val'>"+r.cout_total_mensuel.toFixed(2)+"</div><div class='lab'>Cout total/mois</div></div><div class='sc'><div class='val'>"+r.cout_total_annuel.toFixed(2)+"</div><div class='lab'>Cout total/an</div></div></div>";h+="<table style='margin-top:12px'><tr><th>Poste</th><th class='num'>Montant</th></tr>";h+="<tr><td>Charges patronales URSSAF</td><td class='num'>"+r.charges_patronales_urssaf.toFixed(2)+"</td></tr>";h+="<tr><td>Charges salariales</td><td class='num'>"+r.charges_salariales.toFixed(2)+"</td></tr>";h+="<tr><td>Formation professionnelle</td><td class='num'>"+r.formation_professionnelle.toFixed(2)+"</td></tr>";h+="<tr><td>Taxe apprentissage</td><td class='num'>"+r.taxe_apprentissage.toFixed(2)+"</td></tr>";h+="<tr><td>Effort construction</td><td class='num'>"+r.effort_construction.toFixed(2)+"</td></tr>";h+="<tr><td>Participation obligatoire</td><td class='num'>"+r.participation_obligatoire.toFixed(2)+"</td></tr>";h+="<tr style='font-weight:600'><td>Total charges annexes</td><td class='num'>"+r.total_charges_annexes.toFixed(2)+"</td></tr>";h+="<tr><td>Avantages nature</td><td class='num'>"+r.avantages_nature.toFixed(2)+"</td></tr>";h+="<tr><td>Frais km rembourses</td><td class='num'>"+r.frais_km_rembourses.toFixed(2)+"</td></tr>";h+="<tr><td>Tickets restaurant</td><td class='num'>"+r.tickets_restaurant.toFixed(2)+"</td></tr>";h+="<tr><td>Mutuelle employeur</td><td class='num'>"+r.mutuelle_employeur.toFixed(2)+"</td></tr>";h+="<tr style='font-weight:600'><td>Total avantages</td><td class='num'>"+r.total_avantages.toFixed(2)+"</td></tr></table>";h+="<div class='g4' style='margin-top:12px'><div class='sc'><div class='val'>"+r.repartition.salaire_net+"%</div><div class='lab'>Salaire net</div></div><div class='sc'><div class='val'>"+r.repartition.charges_salariales+"%</div><div class='lab'>Charges sal.</div></div><div class='sc'><div class='val'>"+r.repartition.charges_patronales+"%</div><div class='lab'>Charges pat.</div></div><div class='sc'><div class='val'>"+r.repartition.annexes_avantages+"%</div><div class='lab'>Annexes+Avantages</div></div></div>";h+="<p style='margin-top:10px;color:var(--tx2);font-size:.84em'>Ratio cout/net : <b>"+r.ratio_cout_net+"x</b> - Pour 1 EUR net verse, l employeur depense "+r.ratio_cout_net+" EUR</p>";document.getElementById("sim-cout-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function toggleLodeom(){var z=gv("exo-zone");document.getElementById("lodeom-bareme-wrap").style.display=z==="outremer"?"block":"none";}
+function simExo(){var p="brut_mensuel="+gv("exo-brut")+"&effectif="+gv("exo-eff")+"&age_salarie="+gv("exo-age")+"&duree_contrat_mois="+gv("exo-duree")+"&zone="+gv("exo-zone")+"&statut_salarie="+gv("exo-statut")+"&heures_supplementaires="+(gv("exo-hs")||"0")+"&ccn="+encodeURIComponent(gv("exo-ccn"))+"&nb_heures_mensuelles="+(gv("exo-heures")||"151.67")+"&temps_partiel_pct="+(gv("exo-tp")||"100")+"&jours_absence="+(gv("exo-abs-jours")||"0")+"&type_absence="+gv("exo-abs-type")+"&bareme_lodeom="+gv("exo-lodeom")+"&est_cadre="+gv("exo-cadre")+"&taux_at="+(gv("exo-at")||"0")+"&nb_salaries_simules="+(gv("exo-nb")||"1")+"&annee="+gv("exo-annee");
+fetch("/api/simulation/exonerations?"+p).then(safeJson).then(function(r){
+var h="<div class='al ok' style='margin-bottom:10px'><span class='ai'>&#128197;</span><span><strong>Baremes "+r.annee_baremes+"</strong> - "+r.baremes_appliques+"</span></div>";
+h+="<div class='g3'><div class='sc green'><div class='val'>"+fmtN(r.total_exonerations_mensuelles)+"</div><div class='lab'>Exonerations/mois</div></div><div class='sc blue'><div class='val'>"+fmtN(r.total_exonerations_annuelles)+"</div><div class='lab'>Exonerations/an</div></div><div class='sc amber'><div class='val'>"+r.economie_pct.toFixed(1)+"%</div><div class='lab'>Economie charges</div></div></div>";
+h+="<div class='g4' style='margin-top:10px'><div class='sc'><div class='val'>"+fmtN(r.charges_patronales_normales)+"</div><div class='lab'>Charges normales</div></div><div class='sc green'><div class='val'>"+fmtN(r.charges_patronales_apres_exo)+"</div><div class='lab'>Charges apres exo</div></div><div class='sc'><div class='val'>"+r.ratio_smic+"</div><div class='lab'>Ratio SMIC</div></div><div class='sc'><div class='val'>"+fmtN(r.smic_retabli)+"</div><div class='lab'>SMIC retabli</div></div></div>";
+// Multi-salaries
+if(r.multi_salaries){var m=r.multi_salaries;h+="<div style='margin-top:10px;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--p)'><strong>&#128101; Simulation groupee ("+m.nb+" salaries identiques)</strong><div class='g3' style='margin-top:8px'><div class='sc green'><div class='val'>"+fmtN(m.total_exonerations_mensuelles)+"</div><div class='lab'>Exo totales/mois</div></div><div class='sc blue'><div class='val'>"+fmtN(m.total_exonerations_annuelles)+"</div><div class='lab'>Exo totales/an</div></div><div class='sc'><div class='val'>"+fmtN(m.charges_normales_totales-m.charges_apres_exo_totales)+"</div><div class='lab'>Economie totale/mois</div></div></div></div>";}
+// Taux patronaux detailles
+if(r.taux_patronal_detaille){var tp=r.taux_patronal_detaille;h+="<div style='margin-top:12px'><details><summary style='cursor:pointer;font-weight:600;font-size:.9em'>&#128200; Detail taux patronaux ("+( tp.total*100).toFixed(2)+"%)"+(r.est_cadre?" - Cadre":" - Non cadre")+"</summary><table style='margin-top:6px'><tr><th>Cotisation</th><th class='num'>Taux</th></tr>";
+for(var k in tp){if(k!=="total")h+="<tr><td>"+k.replace(/_/g," ")+"</td><td class='num'>"+(tp[k]*100).toFixed(2)+"%</td></tr>";}
+h+="<tr style='font-weight:600;background:var(--bg2)'><td>TOTAL</td><td class='num'>"+(tp.total*100).toFixed(2)+"%</td></tr></table></details></div>";}
+// Absences
+if(r.info_absences){var ab=r.info_absences;h+="<div style='margin-top:10px;padding:10px;background:var(--bg2);border-radius:8px;border-left:3px solid var(--o)'><strong>&#128197; Impact absences ("+ab.jours+" jours - "+ab.type+")</strong><div style='font-size:.84em;margin-top:4px'>Retenue absences: <b>"+fmtN(ab.retenue_absences)+" EUR</b> | Brut contractuel: <b>"+fmtN(ab.brut_contractuel)+" EUR</b> &rarr; Brut apres absences: <b>"+fmtN(ab.brut_apres_absences)+" EUR</b>";if(ab.ijss_estimees>0)h+="<br>IJSS estimees: <b>"+fmtN(ab.ijss_estimees)+" EUR</b>";if(ab.complement_employeur>0)h+=" | Complement employeur: <b>"+fmtN(ab.complement_employeur)+" EUR</b>";h+="<br>"+ab.impact_smic_retabli+" | "+ab.impact_ratio+"</div></div>";}
+// Tableau exonerations
+h+="<table style='margin-top:12px'><tr><th>Exoneration</th><th>Reference</th><th class='num'>Mensuel (EUR)</th><th class='num'>Annuel (EUR)</th><th>Statut</th></tr>";
+var exos=r.exonerations||[];for(var i=0;i<exos.length;i++){var e=exos[i];var cls=e.applicable?"":"color:var(--tx2);opacity:.6";
+var isNonCumul=e.conditions&&e.conditions.indexOf("NON CUMULABLE")>=0;
+h+="<tr style='"+cls+"'><td>"+e.nom+(isNonCumul?" <span class='badge badge-amber' style='font-size:.7em'>Non cumulable</span>":"")+"</td><td style='font-size:.78em'>"+e.reference+"</td><td class='num'>"+e.montant_mensuel.toFixed(2)+"</td><td class='num'>"+e.montant_annuel.toFixed(2)+"</td><td>"+(e.applicable?"<span class='badge badge-green'>Applicable</span>":(isNonCumul?"<span class='badge badge-amber'>Ecartee (non cumul)</span>":"<span class='badge' style='background:var(--bg2)'>Non applicable</span>"))+"</td></tr>";
+if(e.conditions){h+="<tr style='"+cls+"'><td colspan='5' style='font-size:.78em;color:var(--tx2);padding:2px 8px 6px;border-top:none'>"+e.conditions+"</td></tr>";}}
+h+="</table>";
+h+="<p style='margin-top:8px;color:var(--tx2);font-size:.82em'>Zone: "+r.zone+" | Heures contrat: "+r.heures_contrat+"h | TP: "+r.temps_partiel_pct+"% | Presence: "+(r.coeff_presence*100).toFixed(0)+"%"+(r.bareme_lodeom?" | LODEOM: "+r.bareme_lodeom:"")+"</p>";
+document.getElementById("sim-exo-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simMasse(){var p="brut_moyen="+gv("ms-brut")+"&effectif="+gv("ms-eff")+"&augmentation_pct="+gv("ms-aug")+"&inflation_pct="+gv("ms-infl")+"&frais_km_moyen="+gv("ms-km")+"&avantages_nature_moyen="+gv("ms-an")+"&primes_variables_pct="+gv("ms-primes")+"&turnover_pct="+gv("ms-turn");fetch("/api/simulation/masse-salariale?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+fmt(r.masse_actuelle)+"</div><div class='lab'>Masse actuelle</div></div><div class='sc amber'><div class='val'>"+fmt(r.masse_apres_augmentation)+"</div><div class='lab'>Apres augmentation</div></div><div class='sc'><div class='val'>"+fmt(r.cout_global_projete)+"</div><div class='lab'>Cout global projete</div></div><div class='sc "+(r.evolution_pct>0?"red":"green")+"'><div class='val'>"+(r.evolution_pct>0?"+":"")+r.evolution_pct+"%</div><div class='lab'>Evolution</div></div></div>";h+="<table style='margin-top:12px'><tr><th>Poste</th><th class='num'>Montant annuel</th></tr>";h+="<tr><td>Masse actuelle (brut)</td><td class='num'>"+fmt(r.masse_actuelle)+"</td></tr>";h+="<tr><td>Charges patronales actuelles (45%)</td><td class='num'>"+fmt(r.charges_patronales_actuelles)+"</td></tr>";h+="<tr style='font-weight:600'><td>Cout total actuel</td><td class='num'>"+fmt(r.cout_total_actuel)+"</td></tr>";h+="<tr><td colspan='2' style='background:var(--bg2);font-weight:600;padding-top:8px'>Impact augmentation (+"+r.augmentation_pct+"%)</td></tr>";h+="<tr><td>Nouveau brut moyen</td><td class='num'>"+r.nouveau_brut_moyen.toFixed(2)+" EUR/mois</td></tr>";h+="<tr><td>Cout augmentation (brut)</td><td class='num'>"+fmt(r.cout_augmentation_brut)+"</td></tr>";h+="<tr><td>Charges supplementaires</td><td class='num'>"+fmt(r.cout_augmentation_charges)+"</td></tr>";h+="<tr style='font-weight:600'><td>Cout total augmentation</td><td class='num'>"+fmt(r.cout_augmentation_total)+"</td></tr>";h+="<tr><td colspan='2' style='background:var(--bg2);font-weight:600;padding-top:8px'>Autres postes</td></tr>";h+="<tr><td>Perte pouvoir achat (inflation "+r.augmentation_pct+"% vs "+gv("ms-infl")+"%)</td><td class='num'>"+fmt(r.perte_pouvoir_achat_inflation)+"</td></tr>";h+="<tr><td>Ecart augmentation/inflation</td><td class='num'>"+fmt(r.ecart_augmentation_inflation)+"</td></tr>";h+="<tr><td>Primes variables</td><td class='num'>"+fmt(r.primes_variables_total)+"</td></tr>";h+="<tr><td>Charges sur primes</td><td class='num'>"+fmt(r.charges_primes)+"</td></tr>";h+="<tr><td>Frais kilometriques (non soumis)</td><td class='num'>"+fmt(r.frais_km_total)+"</td></tr>";h+="<tr><td>Avantages en nature (soumis)</td><td class='num'>"+fmt(r.avantages_nature_total)+"</td></tr>";h+="<tr><td>Charges sur avantages</td><td class='num'>"+fmt(r.charges_avantages)+"</td></tr>";h+="<tr><td>Cout turnover estime</td><td class='num'>"+fmt(r.cout_turnover_estime)+"</td></tr>";h+="<tr style='font-weight:600;background:var(--bg2)'><td>COUT GLOBAL PROJETE</td><td class='num'>"+fmt(r.cout_global_projete)+"</td></tr></table>";document.getElementById("sim-masse-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simSeuils(){fetch("/api/simulation/seuils-effectif?effectif_actuel="+gv("se-eff")+"&masse_salariale_annuelle="+gv("se-masse")).then(safeJson).then(function(r){var h="";if(r.prochain_seuil){h+="<div class='g3'><div class='sc amber'><div class='val'>"+r.prochain_seuil+"</div><div class='lab'>Prochain seuil</div></div><div class='sc blue'><div class='val'>"+r.marge_avant_seuil+"</div><div class='lab'>Salaries avant seuil</div></div><div class='sc red'><div class='val'>"+fmt(r.cout_prochain_seuil)+"</div><div class='lab'>Cout franchissement</div></div></div>";}h+="<div class='g2' style='margin-top:10px'><div class='sc'><div class='val'>"+r.effectif_actuel+"</div><div class='lab'>Effectif actuel</div></div><div class='sc amber'><div class='val'>"+fmt(r.total_obligations_actuelles)+"</div><div class='lab'>Obligations actuelles</div></div></div>";var seuils=r.seuils||[];for(var i=0;i<seuils.length;i++){var s=seuils[i];var obligs=s.obligations||[];var franchi=obligs.length>0&&obligs[0].franchi;h+="<div style='margin-top:14px;padding:10px;border-radius:8px;background:"+(franchi?"var(--bg2)":"var(--bg1)")+";border:1px solid "+(franchi?"var(--green)":"var(--border)")+"'>";h+="<h3 style='margin:0 0 6px'>"+(franchi?"&#9989; ":"&#9898; ")+"Seuil "+s.seuil+" salaries</h3>";h+="<table style='margin:0'><tr><th>Obligation</th><th>Reference</th><th class='num'>Cout estime</th><th>Detail</th></tr>";for(var j=0;j<obligs.length;j++){var o=obligs[j];h+="<tr><td>"+o.nom+"</td><td style='font-size:.8em'>"+o.reference+"</td><td class='num'>"+fmt(o.cout_estime)+"</td><td style='font-size:.84em;color:var(--tx2)'>"+o.detail+"</td></tr>";}h+="</table></div>";}document.getElementById("sim-seuils-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simFinContrat(){var p="type_fin="+gv("fc-type")+"&salaire_brut="+gv("fc-brut")+"&anciennete_mois="+gv("fc-anc")+"&est_cadre="+gv("fc-cadre")+"&motif="+gv("fc-motif");fetch("/api/simulation/fin-contrat?"+p).then(safeJson).then(function(r){var h="<div class='g3'><div class='sc blue'><div class='val'>"+r.type_fin.replace(/_/g," ")+"</div><div class='lab'>Type</div></div><div class='sc'><div class='val'>"+r.anciennete_ans+" ans</div><div class='lab'>Anciennete</div></div><div class='sc red'><div class='val'>"+fmt(r.cout_total)+"</div><div class='lab'>Cout total</div></div></div>";h+="<table style='margin-top:12px'><tr><th>Poste</th><th class='num'>Montant</th></tr>";var skip={"type_fin":1,"salaire_brut":1,"anciennete_mois":1,"anciennete_ans":1,"cout_total":1,"reference":1,"motif":1,"note":1,"exceptions":1};for(var k in r){if(!skip[k]&&typeof r[k]==="number"){h+="<tr><td>"+k.replace(/_/g," ")+"</td><td class='num'>"+r[k].toFixed(2)+"</td></tr>";}}h+="<tr style='font-weight:600;background:var(--bg2)'><td>COUT TOTAL</td><td class='num'>"+r.cout_total.toFixed(2)+"</td></tr></table>";if(r.reference)h+="<p style='margin-top:8px;font-size:.82em;color:var(--tx2)'>Ref: "+r.reference+"</p>";if(r.note)h+="<p style='font-size:.82em;color:var(--amber)'>"+r.note+"</p>";if(r.exceptions)h+="<p style='font-size:.82em;color:var(--tx2)'>"+r.exceptions+"</p>";document.getElementById("sim-fc-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simOptim(){var p="benefice_net="+gv("op-benef")+"&remuneration_gerant="+gv("op-rem")+"&dividendes="+gv("op-div")+"&interessement="+gv("op-int")+"&participation="+gv("op-part")+"&frais_pro="+gv("op-frais")+"&pee_abondement="+gv("op-pee")+"&nb_parts="+gv("op-parts")+"&forme_juridique="+gv("op-forme");fetch("/api/simulation/optimisation?"+p).then(safeJson).then(function(r){var h="";h+="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#127942;</span><span><strong>Meilleur scenario : "+r.meilleur_scenario+"</strong> — ecart max entre scenarios : <b>"+fmtN(r.ecart_max)+" EUR</b></span></div>";var sc=r.scenarios||[];for(var i=0;i<sc.length;i++){var s=sc[i];var isBest=s.nom===r.meilleur_scenario;var border=isBest?"border:2px solid #16a34a;":"border:1px solid var(--border);";h+="<div style='"+border+"border-radius:10px;padding:14px;margin-bottom:14px;background:var(--bg1)'>";h+="<div style='display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:8px'>";h+="<h3 style='margin:0;font-size:1em'>"+(isBest?"&#127942; ":"")+"Scenario "+(i+1)+" : "+s.nom+"</h3>";h+="<div style='font-size:1.2em;font-weight:700;color:"+(isBest?"#16a34a":"var(--tx)")+"'>"+fmtN(s.net_disponible)+" EUR net</div></div>";if(s.description){h+="<p style='margin:6px 0 10px;font-size:.84em;color:var(--tx2)'>"+s.description+"</p>";}h+="<div class='g3' style='margin-bottom:8px'><div class='sc blue'><div class='val'>"+fmtN(s.salaire_brut)+"</div><div class='lab'>Salaire brut annuel</div></div><div class='sc amber'><div class='val'>"+fmtN(s.charges_sociales)+"</div><div class='lab'>Charges patronales</div></div><div class='sc green'><div class='val' style='font-size:1.1em'>"+fmtN(s.net_disponible)+"</div><div class='lab'>Net disponible</div></div></div>";h+="<table style='margin:0'><thead><tr><th>Poste</th><th class='num'>Montant (EUR)</th><th>Detail</th></tr></thead><tbody>";h+="<tr><td>Salaire brut annuel</td><td class='num'>"+fmtN(s.salaire_brut)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+fmtN(s.salaire_brut/12)+" EUR/mois</td></tr>";h+="<tr><td>Charges patronales (42%)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.charges_sociales)+"</td><td style='font-size:.82em;color:var(--tx2)'>A la charge de l entreprise</td></tr>";h+="<tr><td>IS (Impot sur les societes)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.is_entreprise||0)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+(s.is_entreprise>0?"15% jusqu a 42 500 EUR puis 25%":"Pas d IS (tout en salaire)")+"</td></tr>";h+="<tr><td>Dividendes distribues</td><td class='num'>"+fmtN(s.dividendes||0)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+(s.dividendes>0?"Apres IS, nets de l entreprise":"")+"</td></tr>";h+="<tr><td>PFU sur dividendes (30%)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.pfu_dividendes||0)+"</td><td style='font-size:.82em;color:var(--tx2)'>"+(s.pfu_dividendes>0?"Flat tax : 12.8% IR + 17.2% PS":"")+"</td></tr>";if(s.interessement){h+="<tr><td>Interessement</td><td class='num'>"+fmtN(s.interessement)+"</td><td style='font-size:.82em;color:var(--tx2)'>Exonere d IR si PEE (bloque 5 ans)</td></tr>";}if(s.participation){h+="<tr><td>Participation</td><td class='num'>"+fmtN(s.participation)+"</td><td style='font-size:.82em;color:var(--tx2)'>Exoneree d IR si PEE (bloquee 5 ans)</td></tr>";}if(s.abondement_pee){h+="<tr><td>Abondement PEE</td><td class='num'>"+fmtN(s.abondement_pee)+"</td><td style='font-size:.82em;color:var(--tx2)'>Plafond 2026 : 3 709 EUR</td></tr>";}if(s.forfait_social){h+="<tr><td>Forfait social (20%)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.forfait_social)+"</td><td style='font-size:.82em;color:var(--tx2)'>Sur epargne salariale</td></tr>";}h+="<tr><td>IR (Impot sur le revenu)</td><td class='num' style='color:var(--r)'>-"+fmtN(s.ir)+"</td><td style='font-size:.82em;color:var(--tx2)'>Bareme progressif "+r.forme_juridique.toUpperCase()+"</td></tr>";h+="<tr style='font-weight:700;background:var(--bg2)'><td>NET DISPONIBLE</td><td class='num' style='color:#16a34a;font-size:1.05em'>"+fmtN(s.net_disponible)+"</td><td style='font-size:.82em'>Somme percue apres tous prelevements</td></tr>";h+="</tbody></table>";h+="<div style='margin-top:6px;font-size:.82em;color:var(--tx2)'>&#128737; Protection sociale : "+s.protection_sociale+"</div>";if(s.tresorerie_residuelle>0){h+="<div style='margin-top:4px;font-size:.82em;color:var(--tx2)'>&#128176; Tresorerie residuelle en entreprise : "+fmtN(s.tresorerie_residuelle)+" EUR</div>";}h+="</div>";}if(r.frais_professionnels){var fp=r.frais_professionnels;h+="<div style='margin-top:14px;padding:10px;background:var(--bg2);border-radius:8px'><h3 style='margin:0 0 6px'>Frais professionnels deductibles</h3>";h+="<p style='margin:0 0 6px;font-size:.84em'>Frais declares: <b>"+fp.frais_declares.toFixed(2)+" EUR</b> - Economie IS: <b>"+fp.economie_is.toFixed(2)+" EUR</b></p>";h+="<div style='font-size:.84em;color:var(--tx2)'>Types eligibles: "+fp.types_eligibles.join(" | ")+"</div></div>";}document.getElementById("sim-optim-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+function simRisques(){var p="code_naf="+encodeURIComponent(gv("rs-naf"))+"&effectif="+gv("rs-eff")+"&masse_salariale="+gv("rs-masse");fetch("/api/simulation/risques-sectoriels?"+p).then(safeJson).then(function(r){var h="<div class='g4'><div class='sc blue'><div class='val'>"+r.secteur+"</div><div class='lab'>Secteur</div></div><div class='sc amber'><div class='val'>"+r.taux_at_moyen+"%</div><div class='lab'>Taux AT moyen</div></div><div class='sc red'><div class='val'>"+fmt(r.cout_at_annuel)+"</div><div class='lab'>Cout AT annuel</div></div><div class='sc'><div class='val'>"+r.effectif+"</div><div class='lab'>Effectif</div></div></div>";h+="<div style='margin-top:14px'><h3>Risques specifiques du secteur</h3><ul style='margin:6px 0;padding-left:20px'>";var rs=r.risques_specifiques||[];for(var i=0;i<rs.length;i++)h+="<li style='margin:3px 0'>"+rs[i]+"</li>";h+="</ul></div>";h+="<h3 style='margin-top:14px'>Risques financiers</h3><table><tr><th>Risque</th><th class='num'>Impact estime</th><th>Detail</th></tr>";var rf=r.risques_financiers||[];for(var i=0;i<rf.length;i++){h+="<tr><td>"+rf[i].risque+"</td><td class='num'>"+fmt(rf[i].impact_estime)+"</td><td style='font-size:.84em'>"+rf[i].detail+"</td></tr>";}h+="</table>";h+="<h3 style='margin-top:14px'>Subventions eligibles</h3><table><tr><th>Subvention</th><th class='num'>Montant max</th><th>Condition</th></tr>";var sb=r.subventions_eligibles||[];for(var i=0;i<sb.length;i++){h+="<tr><td>"+sb[i].nom+"</td><td class='num'>"+fmt(sb[i].montant_max)+"</td><td style='font-size:.84em'>"+sb[i].condition+"</td></tr>";}h+="</table>";h+="<div style='margin-top:12px;padding:10px;background:var(--bg2);border-radius:8px'><h3 style='margin:0 0 6px'>Recommandations</h3><ul style='margin:0;padding-left:20px'>";var rc=r.recommandations||[];for(var i=0;i<rc.length;i++)h+="<li style='margin:3px 0'>"+rc[i]+"</li>";h+="</ul></div>";document.getElementById("sim-risques-res").innerHTML=h;}).catch(function(e){toast(e.message);});}
+
+/* === SUBVENTIONS === */
+var _subData=null;
+function rechercherSubventions(){
+var p="code_naf="+encodeURIComponent(gv("sub-naf"))+"&effectif="+gv("sub-eff")+"&forme_juridique="+encodeURIComponent(document.getElementById("sub-forme").value)+"&region="+encodeURIComponent(document.getElementById("sub-region").value)+"&zone="+encodeURIComponent(document.getElementById("sub-zone").value)+"&ca="+(gv("sub-ca")||0)+"&age_entreprise="+(gv("sub-age")||5)+"&masse_salariale="+(gv("sub-masse")||0)+"&innovation="+(document.getElementById("sub-innovation").checked)+"&environnement="+(document.getElementById("sub-environnement").checked)+"&numerique="+(document.getElementById("sub-numerique").checked)+"&export_intl="+(document.getElementById("sub-export").checked)+"&formation="+(document.getElementById("sub-formation").checked)+"&creation_reprise="+(document.getElementById("sub-creation-reprise").checked)+"&investissement="+(document.getElementById("sub-investissement").checked)+"&ess="+(document.getElementById("sub-ess").checked);
+fetch("/api/subventions/recherche?"+p).then(safeJson).then(function(r){
+_subData=r;
+document.getElementById("sub-results").style.display="block";
+document.getElementById("sub-total").textContent=r.total;
+document.getElementById("sub-montant").textContent=fmt(r.montant_potentiel_estime||0)+(r.nb_aides_chiffrees?" ("+r.nb_aides_chiffrees+" aides estimees)":"");
+document.getElementById("sub-nationales").textContent=r.par_niveau.national||0;
+document.getElementById("sub-europeennes").textContent=r.par_niveau.europeen||0;
+afficherSubventions(r.aides);
+}).catch(function(e){toast(e.message||"Erreur recherche subventions");});
+}
+function afficherSubventions(aides){
+var container=document.getElementById("sub-liste");
+if(!aides||aides.length===0){container.innerHTML="<div class='al info'><span class='ai'>&#128161;</span><span>Aucune aide trouvee avec ces criteres. Essayez d elargir vos criteres de recherche.</span></div>";document.getElementById("sub-recapitulatif").style.display="none";return;}
+var h="";
+var niveauColors={"national":"blue","regional":"purple","europeen":"teal","local":"amber"};
+var typeLabels={"subvention":"Subvention","credit_impot":"Credit d impot","exoneration":"Exoneration","pret":"Pret / Avance","garantie":"Garantie","accompagnement":"Accompagnement"};
+var catLabels={"innovation":"Innovation / R&D","environnement":"Environnement","emploi":"Emploi / Formation","numerique":"Numerique","export":"Export","creation":"Creation / Reprise","investissement":"Investissement","fiscal":"Avantage fiscal","social":"Exoneration sociale","ess":"ESS / Impact"};
+for(var i=0;i<aides.length;i++){var a=aides[i];
+var nc=niveauColors[a.niveau]||"blue";
+h+="<div class='card sub-toggle' style='cursor:pointer;border-left:4px solid var(--"+(nc==="blue"?"p3":nc==="purple"?"pu":nc==="teal"?"tl":"o")+")'>";
+h+="<div style='display:flex;justify-content:space-between;align-items:flex-start;flex-wrap:wrap;gap:8px'>";
+h+="<div><h2 style='margin-bottom:4px'>"+a.nom+"</h2><div style='font-size:.82em;color:var(--tx2)'>"+a.organisme+"</div></div>";
+h+="<div style='display:flex;gap:6px;flex-wrap:wrap'>";
+h+="<span class='badge badge-"+nc+"'>"+a.niveau.charAt(0).toUpperCase()+a.niveau.slice(1)+"</span>";
+h+="<span class='badge badge-green'>"+(typeLabels[a.type_aide]||a.type_aide)+"</span>";
+h+="<span class='badge badge-blue'>"+(catLabels[a.categorie]||a.categorie)+"</span>";
+h+="</div></div>";
+h+="<div style='margin-top:8px;font-size:.88em;color:var(--tx)'>"+a.description+"</div>";
+h+="<div style='margin-top:8px;display:flex;gap:16px;flex-wrap:wrap'>";
+h+="<div style='font-size:.84em'><strong>Montant max :</strong> "+a.montant_max+"</div>";
+if(a.montant_estime)h+="<div style='font-size:.84em;color:var(--g)'><strong>Estimation pour vous :</strong> "+fmt(a.montant_estime)+"</div>";
+h+="</div>";
+h+="<div class='sub-detail' style='display:none;margin-top:12px;padding-top:12px;border-top:1px solid var(--brd)'>";
+h+="<h3 style='font-size:.9em;margin-bottom:6px'>Conditions d eligibilite :</h3><ul style='padding-left:20px;margin:0'>";
+var conds=a.conditions||[];for(var c=0;c<conds.length;c++)h+="<li style='font-size:.84em;margin:3px 0;color:var(--tx)'>"+conds[c]+"</li>";
+h+="</ul>";
+if(a.tailles&&a.tailles.length){h+="<div style='margin-top:8px;font-size:.82em'><strong>Tailles eligibles :</strong> ";var tl=[];for(var t=0;t<a.tailles.length;t++){var labels={"tpe":"TPE","pme":"PME","eti":"ETI","ge":"GE"};tl.push(labels[a.tailles[t]]||a.tailles[t]);}h+=tl.join(", ")+"</div>";}
+if(a.url_info)h+="<div style='margin-top:8px'><a href='"+a.url_info+"' target='_blank' rel='noopener' style='font-size:.84em;color:var(--p3)'>En savoir plus &#8599;</a></div>";
+h+="</div></div>";
+}
+container.innerHTML=h;
+// Recap table
+var recap=document.getElementById("sub-recapitulatif");recap.style.display="block";
+var tb=document.getElementById("sub-recap-table");
+var rows="<tr><th>Aide</th><th>Niveau</th><th>Type</th><th>Montant max</th><th>Organisme</th><th>Eligibilite</th></tr>";
+for(var i=0;i<aides.length;i++){var a=aides[i];
+rows+="<tr><td><strong>"+a.nom+"</strong></td><td><span class='badge badge-"+(niveauColors[a.niveau]||"blue")+"'>"+a.niveau+"</span></td><td>"+(typeLabels[a.type_aide]||a.type_aide)+"</td><td class='num'>"+a.montant_max+"</td><td style='font-size:.84em'>"+a.organisme+"</td><td style='font-size:.78em'>"+((a.conditions||[]).slice(0,2).join("; "))+"</td></tr>";}
+tb.innerHTML=rows;
+}
+function filtrerSubventions(){
+if(!_subData)return;
+var niv=document.getElementById("sub-filtre-niveau").value;
+var cat=document.getElementById("sub-filtre-cat").value;
+var typ=document.getElementById("sub-filtre-type").value;
+var tai=document.getElementById("sub-filtre-taille").value;
+var filtered=_subData.aides.filter(function(a){
+if(niv&&a.niveau!==niv)return false;
+if(cat&&a.categorie!==cat)return false;
+if(typ&&a.type_aide!==typ)return false;
+if(tai&&a.tailles&&a.tailles.indexOf(tai)<0)return false;
+return true;
+});
+afficherSubventions(filtered);
+}
+function exportSubventions(){
+if(!_subData||!_subData.aides)return;
+var csv="Nom;Organisme;Niveau;Categorie;Type;Montant max;Conditions\n";
+for(var i=0;i<_subData.aides.length;i++){var a=_subData.aides[i];csv+='"'+a.nom+'";"'+a.organisme+'";"'+a.niveau+'";"'+a.categorie+'";"'+a.type_aide+'";"'+a.montant_max+'";"'+((a.conditions||[]).join(", "))+'"\n';}
+var b=new Blob([csv],{type:"text/csv;charset=utf-8"});var u=URL.createObjectURL(b);var l=document.createElement("a");l.href=u;l.download="subventions_eligibles.csv";l.click();URL.revokeObjectURL(u);
+}
+function imprimerSubventions(){window.print();}
+function prefillSubventions(){
+try{
+fetch("/api/config/entete").then(safeJson).then(function(cfg){
+if(cfg.code_naf)document.getElementById("sub-naf").value=cfg.code_naf;
+if(cfg.forme_juridique){var sel=document.getElementById("sub-forme");for(var i=0;i<sel.options.length;i++){if(sel.options[i].value&&cfg.forme_juridique.toUpperCase().indexOf(sel.options[i].value)>=0){sel.selectedIndex=i;break;}}}
+}).catch(function(){});
+}catch(e){}
+}
+
+/* === VEILLE === */
+function _toggleBaremesDetails(btn,count){var el=document.getElementById("v-baremes-full");if(!el)return;if(el.style.display==="none"){el.style.display="block";btn.textContent="Masquer les details";}else{el.style.display="none";btn.textContent="Afficher tous les baremes ("+count+")";}}
+function loadVeille(){var a=document.getElementById("v-annee").value;document.getElementById("v-res").style.display="block";
+fetch("/api/veille/baremes/"+a).then(safeJson).then(function(b){var keys=Object.keys(b);var essentiels=["pass_annuel","pass_mensuel","smic_horaire","smic_mensuel","taux_maladie_patronal","taux_vieillesse_plafonnee_patronal","taux_af_patronal","taux_at_moyen","taux_chomage_patronal","taux_csg_deductible","taux_crds"];var h="<table><tr><th>Parametre</th><th class='num'>Valeur</th></tr>";var hFull="";var nbShown=0;for(var i=0;i<keys.length;i++){var k=keys[i];var row="<tr><td>"+k.replace(/_/g," ")+"</td><td class='num'>"+b[k]+"</td></tr>";if(essentiels.indexOf(k)>=0){h+=row;nbShown++;}else{hFull+=row;}}h+="</table>";if(hFull){h+="<div id='v-baremes-full' style='display:none'><table><tr><th>Parametre</th><th class='num'>Valeur</th></tr>"+hFull+"</table></div>";h+="<button class='btn btn-s btn-sm' style='margin-top:8px' onclick='_toggleBaremesDetails(this,"+keys.length+")'>"+"Afficher tous les baremes ("+keys.length+")</button>";}document.getElementById("v-baremes").innerHTML=h;}).catch(function(){});
+fetch("/api/veille/legislation/"+a).then(safeJson).then(function(l){var h="<p style='margin-bottom:10px'><strong>"+l.description+"</strong></p>";var tx=l.textes_cles||[];for(var i=0;i<tx.length;i++){h+="<div class='al info' style='margin:4px 0'><span class='ai'>&#9878;</span><span><strong>"+tx[i].reference+"</strong> - "+tx[i].titre+"<br><small>"+tx[i].resume+"</small></span></div>";}document.getElementById("v-legis").innerHTML=h;}).catch(function(){});}
+function compAnnees(){var a2=parseInt(document.getElementById("v-annee").value),a1=a2-1;fetch("/api/veille/baremes/comparer/"+a1+"/"+a2).then(safeJson).then(function(d){if(!d.length){toast("Pas de differences.","info");return;}var h="<table><tr><th>Parametre</th><th class='num'>"+a1+"</th><th class='num'>"+a2+"</th><th>Evolution</th></tr>";for(var i=0;i<d.length;i++){h+="<tr><td>"+d[i].parametre+"</td><td class='num'>"+(d[i]["valeur_"+a1]||"-")+"</td><td class='num'>"+(d[i]["valeur_"+a2]||"-")+"</td><td>"+d[i].evolution+"</td></tr>";}h+="</table>";document.getElementById("v-comp").innerHTML=h;document.getElementById("v-comp-card").style.display="block";}).catch(function(e){toast(e.message);});}
+
+/* === PORTEFEUILLE === */
+var _tiStatutLabels={"gerant_majoritaire":"Gerant majoritaire","micro_entrepreneur":"Micro-entrepreneur","profession_liberale":"Profession liberale","entreprise_individuelle_ir":"EI (IR)","entreprise_individuelle_is":"EI (IS)","artisan":"Artisan","commercant":"Commercant"};
+
+function ajouterEnt(){var fd=new FormData();fd.append("siret",document.getElementById("ent-siret").value);fd.append("raison_sociale",document.getElementById("ent-raison").value);fd.append("forme_juridique",document.getElementById("ent-forme").value);fd.append("code_naf",document.getElementById("ent-naf").value);fd.append("effectif",document.getElementById("ent-eff").value||"0");fd.append("ville",document.getElementById("ent-ville").value);
+fetch("/api/entreprises",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(){toast("Entreprise ajoutee !","ok");rechEnt();document.getElementById("ent-siret").value="";document.getElementById("ent-raison").value="";}).catch(function(e){toast(e.message);});}
+
+function rechEnt(){var q=(document.getElementById("ent-search")||{}).value||"";
+fetch("/api/entreprises?q="+encodeURIComponent(q)).then(safeJson).then(function(d){
+var el=document.getElementById("ent-list");if(!d.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune entreprise.</p>";return;}
+var h="";for(var i=0;i<d.length;i++){var e=d[i];
+h+="<div class='ent-item'><div style='display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:4px'><strong>"+e.raison_sociale+"</strong>";
+if(e.forme_juridique)h+="<span class='badge badge-blue'>"+e.forme_juridique+"</span>";
+h+="<span class='badge badge-green' style='font-size:.7em'>Employeur</span>";
+h+="</div><div style='font-size:.84em;color:var(--tx2);margin-top:4px'>SIRET: "+e.siret;
+if(e.ville)h+=" | "+e.ville;if(e.code_naf)h+=" | NAF: "+e.code_naf;
+if(e.effectif)h+=" | "+e.effectif+" sal.";h+="</div></div>";}
+el.innerHTML=h;}).catch(function(){});}
+
+/* === T.I. (Travailleur Independant) === */
+function ajouterTI(){var fd=new FormData();
+fd.append("type_statut",document.getElementById("ti-statut").value);
+fd.append("siret",document.getElementById("ti-siret").value);
+fd.append("code_naf",document.getElementById("ti-naf").value);
+fd.append("activite",document.getElementById("ti-activite").value);
+fd.append("regime_fiscal",document.getElementById("ti-regime").value);
+fd.append("caisse_retraite",document.getElementById("ti-caisse").value);
+fd.append("acre",document.getElementById("ti-acre").value);
+fd.append("option_is",document.getElementById("ti-is").value);
+fd.append("tva_franchise",document.getElementById("ti-tva").value);
+fd.append("annee_creation",document.getElementById("ti-annee").value||"0");
+fd.append("chiffre_affaires_annuel",document.getElementById("ti-ca").value||"0");
+fd.append("benefice_annuel",document.getElementById("ti-benefice").value||"0");
+fd.append("remuneration_nette",document.getElementById("ti-remun").value||"0");
+fetch("/api/independants",{method:"POST",body:fd}).then(function(r){if(!r.ok)return r.json().then(function(e){throw new Error(e.detail||"Erreur")});return r.json();}).then(function(){toast("Profil T.I. ajoute !","ok");rechTI();}).catch(function(e){toast(e.message);});}
+
+function rechTI(){var q=(document.getElementById("ti-search")||{}).value||"";
+fetch("/api/independants?q="+encodeURIComponent(q)).then(safeJson).then(function(d){
+var el=document.getElementById("ti-list");if(!d.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun profil T.I. enregistre.</p>";return;}
+var h="";for(var i=0;i<d.length;i++){var t=d[i];var label=_tiStatutLabels[t.type_statut]||t.type_statut;
+h+="<div class='ent-item' style='border-left:3px solid var(--b)'><div style='display:flex;justify-content:space-between;align-items:center;flex-wrap:wrap;gap:4px'>";
+h+="<strong>"+(t.activite||label)+"</strong>";
+h+="<span class='badge badge-amber'>"+label+"</span>";
+h+="<span class='badge' style='background:var(--p);color:#fff;font-size:.7em'>T.I.</span>";
+h+="</div><div style='font-size:.84em;color:var(--tx2);margin-top:4px'>";
+if(t.siret)h+="SIRET: "+t.siret+" | ";
+if(t.code_naf)h+="NAF: "+t.code_naf+" | ";
+if(t.regime_fiscal)h+="Regime: "+t.regime_fiscal+" | ";
+if(t.chiffre_affaires_annuel)h+="CA: "+fmtN(t.chiffre_affaires_annuel)+" EUR | ";
+if(t.acre)h+="<span class='badge badge-green' style='font-size:.72em'>ACRE</span> ";
+h+="</div><div style='display:flex;gap:6px;margin-top:8px'>";
+h+="<button class='btn btn-s btn-sm' data-action='dashTI' data-id='"+t.id+"'>&#128202; Dashboard</button>";
+h+="<button class='btn btn-sm' style='background:var(--r);color:#fff' data-action='suppTI' data-id='"+t.id+"'>&#128465; Supprimer</button>";
+h+="</div></div>";}
+el.innerHTML=h;}).catch(function(){});}
+
+function supprimerTI(id){if(!confirm("Supprimer ce profil T.I. ?"))return;
+fetch("/api/independants/"+id,{method:"DELETE"}).then(safeJson).then(function(){toast("Profil T.I. supprime.","ok");rechTI();}).catch(function(e){toast(e.message);});}
+
+function voirDashTI(id){
+fetch("/api/independants/"+id+"/dashboard").then(safeJson).then(function(d){
+var p=d.profil;var c=d.cotisations_estimees||{};var label=_tiStatutLabels[p.type_statut]||p.type_statut;
+var h="<div class='card' style='border-left:4px solid var(--p)'><h2>&#128188; "+label;
+if(p.activite)h+=" - "+p.activite;h+="</h2>";
+h+="<div class='g3' style='margin:12px 0'>";
+if(p.siret)h+="<div><strong>SIRET</strong><br>"+p.siret+"</div>";
+if(p.regime_fiscal)h+="<div><strong>Regime fiscal</strong><br>"+p.regime_fiscal+"</div>";
+if(p.caisse_retraite)h+="<div><strong>Caisse retraite</strong><br>"+p.caisse_retraite+"</div>";
+if(p.annee_creation)h+="<div><strong>Annee creation</strong><br>"+p.annee_creation+"</div>";
+h+="<div><strong>ACRE</strong><br>"+(p.acre?"Oui":"Non")+"</div>";
+h+="<div><strong>Franchise TVA</strong><br>"+(p.tva_franchise?"Oui":"Non")+"</div>";
+h+="</div>";
+if(c.total_cotisations!==undefined){
+h+="<h3 style='margin-top:16px'>&#128176; Cotisations sociales estimees</h3>";
+h+="<table><tr><th>Poste</th><th class='num'>Montant (EUR)</th></tr>";
+for(var k in c){if(k==="base_ca"||k==="base_revenu"||k==="taux")continue;
+var lbl=k.replace(/_/g," ").replace(/^./, function(m){return m.toUpperCase();});
+var cls=k==="total_cotisations"?"font-weight:700;color:var(--r)":k==="net_apres_cotisations"?"font-weight:700;color:var(--g)":"";
+h+="<tr><td>"+lbl+"</td><td class='num' style='"+cls+"'>"+fmtN(c[k])+"</td></tr>";}
+h+="</table>";}
+if(d.nb_analyses>0){h+="<h3 style='margin-top:16px'>&#128200; "+d.nb_analyses+" analyse(s)</h3>";}
+h+="</div>";
+var el=document.getElementById("ti-list");el.innerHTML=h+"<br><button class='btn btn-s' onclick='rechTI()'>&#8592; Retour a la liste</button>";
+}).catch(function(e){toast(e.message);});}
+
+function loadPortVue(){
+Promise.all([fetch("/api/entreprises?q=").then(safeJson),fetch("/api/independants?q=").then(safeJson)]).then(function(r){
+var emps=r[0],tis=r[1];
+document.getElementById("port-nb-emp").textContent=emps.length;
+document.getElementById("port-nb-ti").textContent=tis.length;
+document.getElementById("port-nb-total").textContent=emps.length+tis.length;
+var he="";if(!emps.length)he="<p style='color:var(--tx2)'>Aucun compte employeur.</p>";
+for(var i=0;i<emps.length;i++){var e=emps[i];he+="<div class='ent-item'><span class='badge badge-green' style='font-size:.7em'>Employeur</span> <strong>"+e.raison_sociale+"</strong>";
+if(e.forme_juridique)he+=" <span class='badge badge-blue'>"+e.forme_juridique+"</span>";
+he+="<div style='font-size:.82em;color:var(--tx2)'>SIRET: "+e.siret;if(e.effectif)he+=" | "+e.effectif+" sal.";he+="</div></div>";}
+document.getElementById("port-vue-emp").innerHTML=he;
+var ht="";if(!tis.length)ht="<p style='color:var(--tx2)'>Aucun compte T.I.</p>";
+for(var j=0;j<tis.length;j++){var t=tis[j];var label=_tiStatutLabels[t.type_statut]||t.type_statut;
+ht+="<div class='ent-item' style='border-left:3px solid var(--p)'><span class='badge' style='background:var(--p);color:#fff;font-size:.7em'>T.I.</span> <strong>"+(t.activite||label)+"</strong> <span class='badge badge-amber'>"+label+"</span>";
+ht+="<div style='font-size:.82em;color:var(--tx2)'>";if(t.siret)ht+="SIRET: "+t.siret+" | ";if(t.chiffre_affaires_annuel)ht+="CA: "+fmtN(t.chiffre_affaires_annuel)+" EUR";ht+="</div></div>";}
+document.getElementById("port-vue-ti").innerHTML=ht;
+}).catch(function(){});}
+
+/* === EQUIPE === */
+function inviterCollab(){
+var fd=new FormData();fd.append("email_invite",document.getElementById("inv-email").value);fd.append("role",document.getElementById("inv-role").value);
+fetch("/api/collaboration/inviter",{method:"POST",body:fd}).then(function(r){if(!r.ok)throw new Error("Erreur");return r.json();}).then(function(d){
+document.getElementById("inv-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Invitation creee pour <strong>"+d.email+"</strong>. Lien : <a href='"+d.lien_validation+"' target='_blank'>"+d.lien_validation+"</a></span></div>";
+loadEquipe();}).catch(function(e){toast(e.message);});}
+
+function loadEquipe(){
+fetch("/api/collaboration/equipe").then(safeJson).then(function(data){
+var invs=data.invitations||[];var el=document.getElementById("equipe-list");
+if(!invs.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun collaborateur invite.</p>";}else{
+var h="<table><tr><th>Email</th><th>Role</th><th>Statut</th><th>Date</th><th>Invite par</th></tr>";
+for(var i=0;i<invs.length;i++){var inv=invs[i];var cls=inv.statut==="active"?"badge-green":"badge-amber";
+h+="<tr><td>"+inv.email+"</td><td><span class='badge badge-blue'>"+inv.role+"</span></td><td><span class='badge "+cls+"'>"+inv.statut+"</span></td><td>"+inv.date.substring(0,10)+"</td><td>"+inv.invite_par+"</td></tr>";}
+h+="</table>";el.innerHTML=h;}
+var logs=data.audit_log||[];var lel=document.getElementById("audit-log");
+if(!logs.length){lel.innerHTML="<p style='color:var(--tx2)'>Aucune action enregistree.</p>";}else{
+var lh="<table><tr><th>Date</th><th>Profil</th><th>Action</th><th>Details</th></tr>";
+for(var j=logs.length-1;j>=Math.max(0,logs.length-20);j--){var lg=logs[j];
+lh+="<tr><td style='font-size:.8em'>"+lg.date.substring(0,19).replace("T"," ")+"</td><td>"+lg.profil+"</td><td><span class='badge badge-blue'>"+lg.action+"</span></td><td style='font-size:.82em'>"+lg.details+"</td></tr>";}
+lh+="</table>";lel.innerHTML=lh;}
+}).catch(function(){});}
+
+/* === EXPORT === */
+function exportSection(name){
+var el=document.querySelector("#s-"+name+" .card")||document.querySelector("#res-analyse");
+if(!el){toast("Rien a exporter.","warn");return;}
+var tables=el.querySelectorAll("table");
+if(tables.length===0){toast("Aucune donnee tabulaire.","warn");return;}
+var csv="";for(var t=0;t<tables.length;t++){var rows=tables[t].querySelectorAll("tr");for(var i=0;i<rows.length;i++){var cells=rows[i].querySelectorAll("th,td");var line=[];for(var j=0;j<cells.length;j++){var txt=cells[j].textContent.replace(/"/g,'""');line.push('"'+txt+'"');}csv+=line.join(";")+"\n";}csv+="\n";}
+var blob=new Blob([csv],{type:"text/csv;charset=utf-8"});var a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download="normacheck_"+name+".csv";a.click();toast("Export telecharge.","ok");}
+
+/* === MODE ANALYSE === */
+var _modeAzSel=document.getElementById("mode-analyse");
+if(_modeAzSel){_modeAzSel.addEventListener("change",function(){
+var m=this.value;var msgs={"simple":"Analyse simple : detection des ecarts de taux et montants.","social":"Audit social : verification complete des cotisations, DSN, conges, conventions collectives.","fiscal":"Audit fiscal : coherence TVA, charges deductibles, IS/IR, declarations fiscales.","complet":"Audit complet : verification de toutes les coherences sociales, fiscales, DSN et rapprochements."};
+document.getElementById("mode-info").innerHTML="<span class='ai'>&#128161;</span><span>"+msgs[m]+"</span>";});}
+
+/* === FILE INTERPRETATION + AUDIT === */
+function showFileInterpretation(data){
+var fl=document.getElementById("az-fichiers-list");
+if(!data||!data.declarations||!data.declarations.length){fl.innerHTML="<p style='color:var(--tx2)'>Aucun fichier interprete.</p>";return;}
+var fi=data.fichiers_info||[];
+var nbNR=data.synthese?data.synthese.nb_fichiers_non_reconnus||0:0;
+var nbErr=data.synthese?data.synthese.nb_fichiers_erreur||0:0;
+var h="";
+if(nbNR>0||nbErr>0){h+="<div class='al warn' style='margin-bottom:10px'><span class='ai'>&#9888;</span><span>"+(nbNR>0?"<strong>"+nbNR+" document(s) non reconnu(s)</strong> : le type n a pas pu etre identifie automatiquement. Les donnees detectees ont ete extraites en mode generique.":"")+(nbErr>0?(nbNR>0?" | ":"")+"<strong>"+nbErr+" fichier(s) en erreur</strong> : format non supporte ou erreur d analyse.":"")+"</span></div>";}
+for(var fi_i=0;fi_i<fi.length;fi_i++){var fst=fi[fi_i];if(fst.statut==="format_non_supporte"){h+="<div class='al err' style='margin-bottom:6px;font-size:.88em'><span class='ai'>&#10060;</span><span><strong>"+fst.nom+"</strong> : "+(fst.message||"Format non supporte")+"</span></div>";}}
+h+="<table><tr><th>Fichier</th><th>Nature detectee</th><th>Employeur</th><th>Periode</th><th class='num'>Salaries</th><th class='num'>Cotisations</th><th class='num'>Masse sal.</th></tr>";
+for(var i=0;i<data.declarations.length;i++){var d=data.declarations[i];
+var nature=d.nature||"Document";
+var fname=(i<fi.length?fi[i].nom:"")||(d.reference||"fichier "+(i+1));
+var fstat=(i<fi.length)?fi[i].statut:"";
+if(fstat==="non_reconnu"){nature="Document non reconnu";}
+var empName=d.employeur?(d.employeur.raison_sociale||d.employeur.siret||"-"):"-";
+var badgeCls="badge-blue";
+if(fstat==="non_reconnu")badgeCls="badge-red";
+else if(nature.indexOf("Bulletin")>=0)badgeCls="badge-green";
+else if(nature.indexOf("DSN")>=0)badgeCls="badge-purple";
+else if(nature.indexOf("Livre")>=0||nature.indexOf("Recapitulatif")>=0)badgeCls="badge-amber";
+else if(nature.indexOf("Bordereau")>=0)badgeCls="badge-teal";
+else if(nature.indexOf("Facture")>=0)badgeCls="badge-blue";
+else if(nature.indexOf("Contrat")>=0)badgeCls="badge-purple";
+else if(nature.indexOf("Attestation")>=0)badgeCls="badge-amber";
+else if(nature.indexOf("interessement")>=0||nature.indexOf("participation")>=0)badgeCls="badge-teal";
+else if(nature.indexOf("Accord")>=0||nature.indexOf("NAO")>=0||nature.indexOf("GPEC")>=0)badgeCls="badge-teal";
+else if(nature.indexOf("assemblee")>=0||nature.indexOf("PV")>=0)badgeCls="badge-purple";
+else if(nature.indexOf("prestation")>=0)badgeCls="badge-amber";
+var masse=(d.masse_salariale_brute||0);
+var extraInfo="";
+if(d.net_a_payer)extraInfo+=" | Net: "+d.net_a_payer.toFixed(2)+" EUR";
+if(d.date_virement)extraInfo+=" | Virement: "+d.date_virement;
+if(d.total_patronal)extraInfo+=" | Pat: "+d.total_patronal.toFixed(2);
+if(d.total_salarial)extraInfo+=" | Sal: "+d.total_salarial.toFixed(2);
+if(d.montant_ht)extraInfo=" | HT: "+d.montant_ht.toFixed(2)+" | TVA: "+(d.montant_tva||0).toFixed(2)+" | TTC: "+(d.montant_ttc||0).toFixed(2);
+if(d.tiers)extraInfo+=" | Tiers: "+d.tiers;
+if(d.type_contrat)extraInfo=" | Type: "+d.type_contrat;
+if(d.remuneration_brute)extraInfo+=" | Remun: "+d.remuneration_brute.toFixed(2)+" EUR";
+if(d.convention_collective)extraInfo+=" | CCN: "+d.convention_collective;
+if(d.date_accord)extraInfo+=" | Date: "+d.date_accord;
+if(d.signataires&&d.signataires.length)extraInfo+=" | Signataires: "+d.signataires.join(", ");
+if(d.date_ag)extraInfo+=" | AG du: "+d.date_ag;
+if(d.nb_resolutions)extraInfo+=" | "+d.nb_resolutions+" resolution(s)";
+if(d.resultat_exercice)extraInfo+=" | Resultat: "+d.resultat_exercice.toFixed(2)+" EUR";
+if(d.prestataire)extraInfo+=" | Prestataire: "+d.prestataire;
+if(d.objet)extraInfo+=" | Objet: "+d.objet;
+h+="<tr><td style='font-size:.84em'>"+fname+"</td><td><span class='badge "+badgeCls+"'>"+nature+"</span></td><td>"+empName+"</td><td>"+(d.periode||"-")+"</td><td class='num'>"+(d.nb_salaries||0)+"</td><td class='num'>"+(d.nb_cotisations||0)+"</td><td class='num'>"+(masse>0?masse.toFixed(2)+" EUR":"-")+"</td></tr>";
+if(fstat==="non_reconnu"){extraInfo+=" | <span style='color:var(--r)'>Type de document non identifie. Extraction en mode generique.</span>";}
+if(extraInfo){h+="<tr><td colspan='7' style='font-size:.82em;color:var(--tx2);padding:2px 8px;border-top:none'>"+extraInfo+"</td></tr>";}
+if(d.salaries&&d.salaries.length>0){for(var si=0;si<d.salaries.length;si++){var s=d.salaries[si];h+="<tr style='font-size:.82em;color:var(--tx2)'><td></td><td colspan='2'>"+((s.prenom||"")+" "+(s.nom||"")).trim()||"Salarie "+(si+1)+"</td><td>"+(s.nir?"NIR: "+s.nir.substring(0,5)+"...":"-")+"</td><td class='num'>"+s.brut_mensuel.toFixed(2)+" EUR</td><td class='num'>"+s.net_fiscal.toFixed(2)+" EUR</td><td></td></tr>";}}}
+if(data.declarations.length>1){var totMasse=0;var totSal=0;for(var j=0;j<data.declarations.length;j++){totMasse+=(data.declarations[j].masse_salariale_brute||0);totSal+=(data.declarations[j].nb_salaries||0);}
+h+="<tr style='font-weight:bold;background:var(--pl)'><td colspan='4'>TOTAL</td><td class='num'>"+totSal+"</td><td></td><td class='num'>"+totMasse.toFixed(2)+" EUR</td></tr>";}
+h+="</table>";
+for(var k=0;k<data.declarations.length;k++){var dk=data.declarations[k];if(dk.s89_total_brut&&dk.masse_salariale_brute){var ecS89=Math.abs(dk.s89_total_brut-dk.masse_salariale_brute);if(ecS89>10){h+="<div class='al warn' style='margin-top:6px'><span class='ai'>&#9888;</span><span><strong>Ecart S89 :</strong> Total brut declare (S89) = "+dk.s89_total_brut.toFixed(2)+" EUR vs masse salariale calculee = "+dk.masse_salariale_brute.toFixed(2)+" EUR (ecart: "+ecS89.toFixed(2)+" EUR)</span></div>";}}}
+if(data.knowledge_summary){var ks=data.knowledge_summary;h+="<div class='al info' style='margin-top:10px'><span class='ai'>&#128218;</span><span><strong>Donnees integrees :</strong> "+ks.nb_salaries_connus+" salarie(s) identifie(s), "+ks.nb_cotisations_analysees+" cotisation(s), masse salariale "+ks.total_masse_salariale.toFixed(2)+" EUR"+(ks.nb_contrats_rh>0?" | "+ks.nb_contrats_rh+" fiche(s) RH (a verifier)":"")+"</span></div>";
+var kctx=ks.contexte_entreprise||{};if(kctx.convention_collective||kctx.code_naf){h+="<div class='al info' style='margin-top:6px'><span class='ai'>&#127970;</span><span><strong>Contexte :</strong>"+(kctx.convention_collective?" CCN: "+kctx.convention_collective:"")+(kctx.code_naf?" | NAF: "+kctx.code_naf:"")+(kctx.effectif_moyen>0?" | Effectif: "+kctx.effectif_moyen:"")+"</span></div>";}
+var kaccords=(kctx.accords_entreprise||[]);if(kaccords.length>0){h+="<div class='al info' style='margin-top:6px'><span class='ai'>&#128220;</span><span><strong>"+kaccords.length+" accord(s) entreprise</strong> detecte(s) et integre(s) a la base de connaissances.</span></div>";}}
+fl.innerHTML=h;}
+
+function showIntegrationResults(data){
+var card=document.getElementById("az-integration-card");var el=document.getElementById("az-integration-results");
+var ig=data.integration;
+if(!ig){card.style.display="none";return;}
+card.style.display="block";
+var h="<div style='display:flex;gap:10px;flex-wrap:wrap;margin-bottom:12px'>";
+var np=ig.compta_ecritures_paie||0;var nf=ig.compta_ecritures_facture||0;var nr=ig.rh_fiches_deduites||0;var nu=ig.rh_contrats_maj||0;var nsal=ig.salaries_uniques||0;
+h+="<div class='sc "+(nsal>0?"blue":"amber")+"'><div class='val'>"+nsal+"</div><div class='lab'>Salaries identifies</div></div>";
+if(nr>0)h+="<div class='sc amber'><div class='val'>"+nr+"</div><div class='lab'>Fiches a verifier</div></div>";
+if(nu>0)h+="<div class='sc blue'><div class='val'>"+nu+"</div><div class='lab'>Fiches mises a jour</div></div>";
+h+="<div class='sc "+(np>0?"green":"amber")+"'><div class='val'>"+np+"</div><div class='lab'>Ecritures paie</div></div>";
+if(nf>0)h+="<div class='sc "+(nf>0?"green":"amber")+"'><div class='val'>"+nf+"</div><div class='lab'>Ecritures facture</div></div>";
+h+="</div>";
+if(np>0||nf>0){h+="<div class='al ok'><span class='ai'>&#9989;</span><span><strong>Comptabilite :</strong> "+np+" ecriture(s) de paie"+(nf>0?" + "+nf+" facture(s)":"")+" generee(s) automatiquement.</span></div>";}
+else{h+="<div class='al warn'><span class='ai'>&#9888;</span><span><strong>Comptabilite :</strong> Aucune ecriture generee. Les documents ne contiennent pas suffisamment de donnees exploitables.</span></div>";}
+if(nr>0){
+var sals=ig.salaries_deduits||[];
+h+="<div class='al warn' style='border-left:4px solid var(--p)'><span class='ai'>&#128100;</span><span><strong>"+nr+" fiche(s) salarie(s) deduite(s)</strong> des documents importes.<br>";
+h+="<em style='color:var(--tx2)'>Ces fiches ont ete pre-remplies a partir des informations detectees. Elles sont <strong>a verifier et completer</strong> par vos soins.</em></span></div>";
+if(sals.length>0){
+h+="<div style='margin:8px 0;overflow-x:auto'><table class='tb' style='font-size:.88em'><thead><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Brut</th><th>Statut</th></tr></thead><tbody>";
+for(var si=0;si<sals.length;si++){var s=sals[si];
+h+="<tr><td><strong>"+s.nom+"</strong></td><td>"+s.prenom+"</td><td>"+s.poste+"</td><td class='num'>"+(parseFloat(s.brut)||0).toFixed(2)+" EUR</td>";
+h+="<td><span class='badge badge-amber'>A verifier</span></td></tr>";}
+h+="</tbody></table></div>";}
+h+="<div style='display:flex;gap:8px;flex-wrap:wrap;margin:10px 0'>";
+h+="<button class='btn btn-blue btn-sm' onclick='goToRH()'>Consulter et modifier dans RH</button>";
+h+="</div>";
+}
+else if(nu>0){h+="<div class='al info'><span class='ai'>&#128260;</span><span><strong>Ressources humaines :</strong> "+nu+" fiche(s) existante(s) mise(s) a jour avec les nouvelles donnees.</span></div>";}
+else{h+="<div class='al warn'><span class='ai'>&#9888;</span><span><strong>Ressources humaines :</strong> Aucun salarie identifie dans les documents importes.</span></div>";}
+var alRH=ig.alertes_rh||[];if(alRH.length>0){h+="<div style='margin-top:14px'><h4 style='margin-bottom:8px'>Documents obligatoires manquants</h4>";
+for(var ai=0;ai<alRH.length;ai++){var al=alRH[ai];var alcls=al.severite==="haute"?"err":(al.severite==="moyenne"?"warn":"info");
+var actionBtn="";
+if(al.titre&&al.titre.indexOf("DPAE")>=0)actionBtn="<br><em style='font-size:.85em'>Importez les accuses de reception DPAE pour validation de conformite.</em>";
+if(al.titre&&al.titre.indexOf("Registre")>=0)actionBtn="<br><button class='btn btn-s btn-sm' style='margin-top:6px' onclick='genererRegistre()'>Generer le registre du personnel (modifiable)</button>";
+if(al.titre&&al.titre.indexOf("Contrat de travail")>=0)actionBtn="<br><button class='btn btn-s btn-sm' style='margin-top:6px' onclick='goToRHContrats()'>Verifier et completer les contrats</button>";
+h+="<div class='al "+alcls+"' style='margin-bottom:6px'><span class='ai'>"+(al.severite==="haute"?"&#9888;":"&#128161;")+"</span><span><strong>"+al.titre+"</strong> - "+al.description;
+if(al.reference_legale)h+="<br><em style='font-size:.85em;color:var(--tx2)'>"+al.reference_legale+"</em>";
+h+=actionBtn+"</span></div>";}h+="</div>";}
+if(ig.documents_detectes&&ig.documents_detectes.length>0){h+="<div class='al info' style='margin-top:8px'><span class='ai'>&#128196;</span><span><strong>Types de documents detectes :</strong> "+ig.documents_detectes.join(", ")+"</span></div>";}
+var log=ig.log||[];if(log.length>0){
+h+="<details style='margin-top:8px'><summary style='cursor:pointer;color:var(--tx2);font-size:.85em'>Detail du traitement ("+log.length+" etapes)</summary>";
+h+="<div style='background:var(--bg2);border-radius:8px;padding:10px;margin-top:6px;font-family:monospace;font-size:.8em;max-height:200px;overflow-y:auto'>";
+for(var li=0;li<log.length;li++){var cls=(log[li].indexOf("ERREUR")>=0)?"color:var(--r)":(log[li].indexOf("OK")>=0?"color:var(--g)":"color:var(--tx2)");h+="<div style='"+cls+"'>"+log[li]+"</div>";}
+h+="</div></details>";}
+el.innerHTML=h;
+try{sessionStorage.setItem("nc_integration",JSON.stringify(ig));}catch(e){}}
+
+function showAuditChecks(data){
+var mode=data.mode_analyse||document.getElementById("mode-analyse").value;
+var card=document.getElementById("az-audit-card");var el=document.getElementById("az-audit-checks");
+if(mode==="simple"){card.style.display="none";return;}
+card.style.display="block";
+var adeb=document.getElementById("audit-annee-debut");var afin=document.getElementById("audit-annee-fin");
+var qp="";if(adeb&&afin&&adeb.value&&afin.value){qp="?annee_debut="+adeb.value+"&annee_fin="+afin.value;}
+el.innerHTML="<p style='color:var(--tx2)'>Chargement de l audit depuis la base de connaissances...</p>";
+fetch("/api/bibliotheque/knowledge/audit"+qp).then(function(r){if(!r.ok)throw new Error("Erreur serveur ("+r.status+")");return r.json();}).then(function(audit){
+var h="";var sc=audit.score_audit||{};
+var cp=audit.controle_pluriannuel||{};
+if(cp.annee_debut){h+="<div class='al info' style='margin-bottom:12px'><span class='ai'><svg width='16' height='16' viewBox='0 0 24 24' fill='none' stroke='currentColor' stroke-width='2'><rect x='3' y='4' width='18' height='18' rx='2'/><line x1='16' y1='2' x2='16' y2='6'/><line x1='8' y1='2' x2='8' y2='6'/><line x1='3' y1='10' x2='21' y2='10'/></svg></span><span><strong>Controle pluri-annuel "+cp.annee_debut+"-"+cp.annee_fin+"</strong> | Annees documentees: "+(cp.annees_documentees||[]).join(", ")+(cp.annees_manquantes&&cp.annees_manquantes.length>0?" | <span style='color:var(--r);font-weight:700'>Manquantes: "+cp.annees_manquantes.join(", ")+"</span>":"")+"</span></div>";}
+
+h+="<div style='display:flex;gap:12px;flex-wrap:wrap;margin-bottom:16px'>";
+h+="<div class='sc blue'><div class='val'>"+sc.total_checks+"</div><div class='lab'>Points de controle</div></div>";
+h+="<div class='sc green'><div class='val'>"+sc.verifies+"</div><div class='lab'>Verifies</div></div>";
+h+="<div class='sc "+(sc.pourcentage>=60?"green":"red")+"'><div class='val'>"+sc.pourcentage+"%</div><div class='lab'>Couverture</div></div>";
+h+="</div>";
+var ks=audit.knowledge_summary||{};
+if(ks.nb_salaries_connus>0||ks.nb_contrats_rh>0){
+h+="<div class='al info' style='margin-bottom:12px'><span class='ai'>&#128218;</span><span><strong>Base de connaissances :</strong> "+ks.nb_salaries_connus+" salarie(s), "+ks.nb_contrats_rh+" contrat(s), "+(ks.periodes||[]).length+" periode(s), "+(ks.pieces_disponibles||[]).join(", ")+"</span></div>";}
+function renderChecks(checks,titre,prefix){
+if(!checks||!checks.length)return"";
+var nb_ok=0;for(var i=0;i<checks.length;i++){if(checks[i].present)nb_ok++;}
+var out="<h3 style='color:var(--p);margin:16px 0 8px'>"+titre+" <span class='badge "+(nb_ok===checks.length?"badge-green":"badge-amber")+"'>"+nb_ok+"/"+checks.length+"</span></h3>";
+for(var i=0;i<checks.length;i++){var c=checks[i];var cls=c.present?(c.alerte?"warn":"ok"):"warn";
+out+="<div class='al "+cls+"' style='cursor:pointer' data-toggle-detail='1'><span class='ai'>"+(c.present?"&#9989;":"&#9888;")+"</span><span><strong>"+c.nom+"</strong> - "+(c.present?c.detail:"Documents insuffisants");
+out+="<div class='aud-detail' style='display:none;margin-top:8px;font-size:.9em;padding-top:8px;border-top:1px solid rgba(0,0,0,.1)'>";
+out+="<p><strong>Etat :</strong> "+c.detail+"</p>";
+if(!c.present)out+="<p style='margin-top:4px'><strong>Documents necessaires :</strong> "+c.documents_requis+"</p>";
+if(c.incidence_legale)out+="<p style='margin-top:4px;color:var(--r);font-weight:600'>Consequence : "+c.incidence_legale+"</p>";
+out+="<p style='margin-top:4px;color:var(--tx2)'><em>Ref: "+c.reference+"</em></p>";
+out+="</div></span></div>";}return out;}
+if(mode==="social"||mode==="complet"){h+=renderChecks(audit.social,"Audit social - Code de la securite sociale + Code du travail ("+sc.social_verifies+"/"+sc.social_total+")","social");}
+if(mode==="fiscal"||mode==="complet"){h+=renderChecks(audit.fiscal,"Audit fiscal - Code general des impots ("+sc.fiscal_verifies+"/"+sc.fiscal_total+")","fiscal");}
+if(mode==="complet"){h+=renderChecks(audit.cour_des_comptes,"Controle Cour des comptes ("+sc.cdc_verifies+"/"+sc.cdc_total+")","cdc");}
+var rm=audit.rapprochement_masses;
+if(rm&&rm.periodes&&rm.periodes.length>0&&(mode==="social"||mode==="complet")){
+h+="<h3 style='color:var(--p);margin:20px 0 8px'>Rapprochement des masses salariales par periode</h3>";
+h+="<div style='overflow-x:auto'><table class='tb'><thead><tr><th>Periode</th><th>BS (Brut)</th><th>DSN (Brut)</th><th>LDP (Brut)</th><th>Ecart BS/DSN</th><th>Statut</th></tr></thead><tbody>";
+for(var pi=0;pi<rm.periodes.length;pi++){var pp=rm.periodes[pi];
+var bsv=rm.masses_bs[pp];var dsnv=rm.masses_dsn[pp];var ldpv=rm.masses_ldp[pp];
+var bsb=bsv?bsv.brut:0;var dsnb=dsnv?dsnv.brut:0;var ldpb=ldpv?ldpv.brut:0;
+var ecart=0;var statut="";var cls="";
+if(bsb>0&&dsnb>0){ecart=Math.abs(bsb-dsnb);var ref2=Math.max(bsb,dsnb);var pct=ref2>0?(ecart/ref2*100):0;
+if(pct<=1){statut="Conforme";cls="color:var(--g)";}else{statut="Ecart "+pct.toFixed(1)+"%";cls="color:var(--r);font-weight:600";}}
+else if(bsb>0||dsnb>0){statut="Source unique";cls="color:var(--tx2)";}
+else{statut="-";cls="color:var(--tx2)";}
+h+="<tr><td><strong>"+pp+"</strong></td>";
+h+="<td>"+(bsb>0?bsb.toFixed(2)+" EUR":"-")+"</td>";
+h+="<td>"+(dsnb>0?dsnb.toFixed(2)+" EUR":"-")+"</td>";
+h+="<td>"+(ldpb>0?ldpb.toFixed(2)+" EUR":"-")+"</td>";
+h+="<td>"+(ecart>0?ecart.toFixed(2)+" EUR":"-")+"</td>";
+h+="<td style='"+cls+"'>"+statut+"</td></tr>";}
+h+="</tbody></table></div>";
+if(rm.ecarts&&rm.ecarts.length>0){
+h+="<div class='al err' style='margin-top:8px'><span class='ai'>&#9888;</span><span><strong>"+rm.ecarts.length+" ecart(s) significatif(s) detecte(s)</strong> (seuil: "+rm.seuil_tolerance_pct+"%) - Un rapprochement detaille est necessaire. Verifier les elements de paie et declarations pour identifier l origine des ecarts.</span></div>";}
+else if(Object.keys(rm.masses_bs).length>0&&Object.keys(rm.masses_dsn).length>0){
+h+="<div class='al ok' style='margin-top:8px'><span class='ai'>&#9989;</span><span><strong>Masses concordantes</strong> - Les montants declares (DSN) correspondent aux montants verses (bulletins).</span></div>";}}
+var tc=ks.types_cotisations;
+if(tc&&Object.keys(tc).length>0&&(mode==="social"||mode==="complet")){
+h+="<h3 style='color:var(--p);margin:20px 0 8px'>Matrice des cotisations detectees</h3>";
+var obligatoires=["maladie","vieillesse_plafonnee","vieillesse_deplafonnee","allocations_familiales","accident_travail","csg_deductible","crds","assurance_chomage","ags","retraite_complementaire_t1","fnal","csa","formation_professionnelle","taxe_apprentissage","versement_mobilite","peec"];
+var labels={"maladie":"Maladie","vieillesse_plafonnee":"Vieillesse plaf.","vieillesse_deplafonnee":"Vieillesse deplaf.","allocations_familiales":"Alloc. familiales","accident_travail":"AT/MP","csg_deductible":"CSG deductible","crds":"CRDS","assurance_chomage":"Chomage","ags":"AGS","retraite_complementaire_t1":"Retraite T1","fnal":"FNAL","csa":"CSA","formation_professionnelle":"Formation pro","taxe_apprentissage":"Taxe apprentissage","versement_mobilite":"Versement mobilite","peec":"PEEC (1% logement)"};
+var seuils={"versement_mobilite":11,"peec":20};
+var eff=ks.nb_salaries_connus||0;
+h+="<div style='overflow-x:auto'><table class='tb'><thead><tr><th>Cotisation</th><th>Obligatoire</th><th>Detectee</th><th>Nb lignes</th><th>Total patronal</th></tr></thead><tbody>";
+for(var ci=0;ci<obligatoires.length;ci++){var co=obligatoires[ci];var lb=labels[co]||co;
+var oblig=true;var seuilC=seuils[co];if(seuilC&&eff<seuilC&&eff>0){oblig=false;}
+var det=tc[co];var found=!!det;
+var cls2=found?"color:var(--g)":"color:var(--r);font-weight:600";
+if(!oblig&&!found)cls2="color:var(--tx2)";
+h+="<tr><td>"+lb+"</td>";
+h+="<td>"+(oblig?(seuilC?"Oui (>= "+seuilC+" sal.)":"Oui"):"Non applicable")+"</td>";
+h+="<td style='"+cls2+"'>"+(found?"&#9989; Oui":"&#10060; Non")+"</td>";
+h+="<td class='num'>"+(det?det.count:"-")+"</td>";
+h+="<td class='num'>"+(det?det.total_patronal.toFixed(2)+" EUR":"-")+"</td></tr>";}
+h+="</tbody></table></div>";}
+el.innerHTML=h;}).catch(function(e){el.innerHTML="<div class='al err'>Erreur chargement audit: "+e.message+"</div>";});}
+
+/* === CONFORMITY SCORE === */
+function categToDomain(cat,ref,titre){
+var c=(cat||"").toLowerCase();var r=(ref||"").toLowerCase();var t=(titre||"").toLowerCase();
+var result={domain:"urssaf",regle:"defaut"};
+/* URSSAF-specific: taxe apprentissage (CT L6241-1), formation pro are URSSAF even if "taxe" in name */
+if(c.indexOf("apprentissage")>=0||c.indexOf("formation_pro")>=0){result={domain:"urssaf",regle:"categorie apprentissage/formation_pro -> URSSAF (CT L6241-1)"};}
+else if(r.indexOf("code du travail")>=0&&r.indexOf("cgi")<0){result={domain:"urssaf",regle:"reference Code du travail -> URSSAF"};}
+/* Fiscal domain: CGI, LPF, taxe sur salaires, TVA, impots */
+else if(c.indexOf("fiscal")>=0||c.indexOf("tva")>=0||c.indexOf("impot")>=0||r.indexOf("cgi")>=0||r.indexOf("lpf")>=0||c.indexOf("taxe_sur_salaires")>=0){result={domain:"fiscal",regle:"categorie/reference fiscale (CGI/LPF/TVA) -> DGFIP"};}
+/* CDC domain: NEP, ISA, code de commerce, comptabilite, totaux/sous-totaux, doublons total/detail */
+else if(r.indexOf("nep")>=0||r.indexOf("isa")>=0||r.indexOf("code de commerce")>=0||r.indexOf("pcg")>=0||c.indexOf("comptab")>=0){result={domain:"cdc",regle:"reference NEP/ISA/Code de commerce -> CDC"};}
+/* CDC par titre: coherence comptable, totaux, doublons total/detail, base x taux, S89 */
+else if(t.indexOf("total")>=0&&t.indexOf("detail")>=0){result={domain:"cdc",regle:"titre total+detail (coherence comptable) -> CDC"};}
+else if(t.indexOf("ecart calcul cotisation")>=0||t.indexOf("base x taux")>=0){result={domain:"cdc",regle:"titre ecart calcul/base x taux -> CDC"};}
+else if(t.indexOf("s89")>=0){result={domain:"cdc",regle:"titre S89 -> CDC"};}
+else if(t.indexOf("masse salariale")>=0&&t.indexOf("bases individuelles")>=0){result={domain:"cdc",regle:"titre masse salariale vs bases individuelles -> CDC"};}
+/*
+ * INCOHERENCE cross-document: distribuer entre domaines selon le contenu.
+ * Les incoherences de taux/montants entre documents sont des enjeux CDC (fiabilite comptable).
+ * Les incoherences SIRET/effectif/employes sont des enjeux URSSAF (declarations sociales).
+ */
+else if(c==="incoherence"){
+/* Taux, montants, bases entre documents = fiabilite comptable = CDC */
+if(t.indexOf("total patronal")>=0||t.indexOf("taux at")>=0){result={domain:"cdc",regle:"incoherence taux/montant inter-documents -> CDC (fiabilite comptable)"};}
+/* Convention collective, statut = impact fiscal aussi (minima, avantages en nature) */
+else if(t.indexOf("convention collective")>=0||t.indexOf("statut divergent")>=0){result={domain:"fiscal",regle:"incoherence convention/statut -> DGFIP (impact minima/avantages)"};}
+else{result={domain:"urssaf",regle:"incoherence non classee -> URSSAF (declarations sociales)"};}
+}
+/* Donnee manquante: certaines sont fiscales (declarations absentes = enjeu declaration fiscale) */
+else if(c==="donnee_manquante"&&(t.indexOf("mois de declaration manquants")>=0)){result={domain:"fiscal",regle:"donnee manquante mois declaration -> DGFIP"};}
+/* Pattern suspect: distribution Benford et outliers = enjeu comptabilite (CDC) */
+else if(c==="pattern_suspect"&&(t.indexOf("benford")>=0||t.indexOf("valeur atypique")>=0)){result={domain:"cdc",regle:"pattern suspect Benford/outlier -> CDC (regularite comptable)"};}
+else{result={domain:"urssaf",regle:"aucune regle specifique -> URSSAF par defaut"};}
+return result;}
+/*
+ * METHODOLOGIE DE SCORING v4.0 - Approche proportionnelle non-discretionnaire
+ *
+ * Principes fondateurs :
+ * 1. PROPORTIONNALITE : la deduction est proportionnelle a la gravite reglementaire
+ *    (basee sur les majorations legales : 40% manquement delibere, 10% retard, etc.)
+ * 2. OBJECTIVABILITE : chaque parametre est derive d'une reference legale explicite
+ * 3. REPRODUCTIBILITE : a constats identiques, score identique (pas de bonus subjectif)
+ * 4. NON-DISCRETIONNAIRE : aucun coefficient arbitraire
+ *
+ * Gravite reglementaire (Wk) - derivee des sanctions legales :
+ *   - Critique (Wk=4) : manquement delibere, majoration 40% (CSS L243-7-7, CGI art. 1729)
+ *   - Haute (Wk=3) : retard/omission significatif, majoration 10% (CSS L243-7-2, CGI art. 1728)
+ *   - Moyenne (Wk=2) : ecart formel, droit a regularisation (CSS L243-6-7, tolerance BOSS)
+ *   - Faible (Wk=1) : anomalie mineure, pas de sanction directe
+ *
+ * Formule par domaine :
+ *   S = max(0, 100 * (1 - Sigma(Wk) / Wmax))
+ *   ou Wmax = max(Sigma(Wk), 4*Npoints) avec Npoints = nb de points de controle
+ *   -> Garantit S in [0,100], converge vers 0 si beaucoup d anomalies
+ *
+ * Couverture documentaire (facteur continu) :
+ *   Fc = min(1, nbDecl / 3)  -> lineaire de 0 a 1, seuil a 3 documents
+ *   Score final = S * (0.5 + 0.5 * Fc)
+ *   -> Minimum = 50% du score brut (jamais de plafond arbitraire)
+ *
+ * Pas de bonus : seuls les constats negatifs impactent le score.
+ */
+var SEVERITY_WEIGHT={critique:4,haute:3,high:3,moyenne:2,medium:2,faible:1,low:1};
+var DOMAIN_CONTROL_POINTS={urssaf:10,fiscal:10,cdc:8};
+function _scoreOne(constats,nbDecl,domainKey){
+var details=[];var nbCrit=0,nbHaut=0,nbMoy=0,nbBas=0;var totalW=0;
+var Npoints=DOMAIN_CONTROL_POINTS[domainKey]||10;
+for(var i=0;i<constats.length;i++){var c=constats[i];var sev=(c.severite||"faible").toLowerCase();
+var wk=SEVERITY_WEIGHT[sev]||1;totalW+=wk;
+if(sev==="critique"){nbCrit++;}
+else if(sev==="haute"||sev==="high"){nbHaut++;}
+else if(sev==="moyenne"||sev==="medium"){nbMoy++;}
+else{nbBas++;}
+details.push({deduction:-wk,raison:c.titre||("Constat "+sev),ref:c.reference_legale||"",severite:sev,poids:wk});}
+/* Wmax = max(totalW, 4*Npoints) — normalisation par la capacite de controle */
+var Wmax=Math.max(totalW,4*Npoints);
+var Sbrut=Math.max(0,Math.round(100*(1-totalW/Wmax)));
+/* Facteur couverture documentaire (continu, non-discretionnaire) */
+var Fc=Math.min(1,nbDecl/3);
+var score=Math.round(Sbrut*(0.5+0.5*Fc));
+score=Math.max(0,Math.min(100,score));
+if(Fc<1){details.push({deduction:0,raison:"Facteur couverture documentaire : Fc="+Fc.toFixed(2)+" ("+nbDecl+"/3 sources). Score ajuste de "+Sbrut+" a "+score,ref:"Methodologie NormaCheck v4.0",severite:"info",poids:0});}
+var grade="F";if(score>=90)grade="A";else if(score>=75)grade="B";else if(score>=60)grade="C";else if(score>=45)grade="D";else if(score>=30)grade="E";
+/* Intervalle de confiance : marge proportionnelle a l incertitude documentaire */
+var marge=Math.round((1-Fc)*15+constats.length*0.5);
+marge=Math.min(marge,20);
+var scoreBas=Math.max(0,score-marge);
+var scoreHaut=Math.min(100,score+marge);
+/* Nombre de constats contestables (patterns statistiques = interpretables) */
+var nbContest=0;
+for(var j=0;j<constats.length;j++){var cc=constats[j];var ct=(cc.categorie||"").toLowerCase();if(ct==="pattern_suspect")nbContest++;}
+return{score:score,grade:grade,details:details,nb_critiques:nbCrit,nb_hautes:nbHaut,nb_moyennes:nbMoy,nb_basses:nbBas,totalW:totalW,Wmax:Wmax,Sbrut:Sbrut,Fc:Fc,intervalle:{bas:scoreBas,haut:scoreHaut,marge:marge},nb_constats_contestables:nbContest};}
+function calculateTripleScore(data){
+var constats=data.constats||[];var nbDecl=(data.declarations||[]).length;
+/* Deduplication des constats (principe non bis in idem) :
+ * triplet (titre_normalise, categorie, severite) identifie un constat unique */
+var seen={};var deduped=[];
+for(var di=0;di<constats.length;di++){
+var dc=constats[di];var dkey=((dc.titre||"").toLowerCase().trim())+"|"+((dc.categorie||"").toLowerCase())+"|"+((dc.severite||"").toLowerCase());
+if(!seen[dkey]){seen[dkey]=true;deduped.push(dc);}}
+var nbDeduplicated=constats.length-deduped.length;
+constats=deduped;
+var urssafC=[],fiscalC=[],cdcC=[],routageTrace=[];var nbRoutageDefaut=0;
+for(var i=0;i<constats.length;i++){var c=constats[i];var routing=categToDomain(c.categorie,c.reference_legale,c.titre);var dom=routing.domain;
+if(routing.regle.indexOf("defaut")>=0||routing.regle.indexOf("aucune regle")>=0)nbRoutageDefaut++;
+routageTrace.push({constat:c.titre||"",categorie:c.categorie||"",domaine_affecte:dom,regle_appliquee:routing.regle});
+if(dom==="fiscal")fiscalC.push(c);else if(dom==="cdc")cdcC.push(c);else urssafC.push(c);}
+var su=_scoreOne(urssafC,nbDecl,"urssaf");var sf=_scoreOne(fiscalC,nbDecl,"fiscal");var sc=_scoreOne(cdcC,nbDecl,"cdc");
+su.domaine="URSSAF";su.ref_legal="Code de la securite sociale (CSS)";su.organisme="URSSAF / Caisse Nationale";
+sf.domaine="DGFIP";sf.ref_legal="Code general des impots (CGI)";sf.organisme="Direction Generale des Finances Publiques";
+sc.domaine="Cour des comptes";sc.ref_legal="Code de commerce / Normes NEP-ISA";sc.organisme="Cour des comptes / CRC";
+/*
+ * Score global : moyenne arithmetique ponderee par le nombre de points de controle (Nk)
+ * W_urssaf = 10, W_fiscal = 10, W_cdc = 8 -> total = 28
+ * Poids = Nk / Somme(Nk) => URSSAF=10/28, DGFIP=10/28, CDC=8/28
+ * Justification : le poids de chaque domaine est proportionnel au nombre de
+ * points de controle legaux identifies (objectivable et reproductible).
+ * Aucun coefficient discretionnaire n est utilise.
+ */
+var Nu=DOMAIN_CONTROL_POINTS.urssaf,Nf=DOMAIN_CONTROL_POINTS.fiscal,Nc=DOMAIN_CONTROL_POINTS.cdc;
+var Nt=Nu+Nf+Nc;
+var wu=Nu/Nt,wf=Nf/Nt,wc=Nc/Nt;
+var global=Math.round(su.score*wu+sf.score*wf+sc.score*wc);
+/*
+ * Penalite d accumulation d incoherences inter-documents :
+ * Si le nombre total d INCOHERENCES depasse 5, une penalite supplementaire
+ * s applique au score global. Cela evite qu un grand nombre d incoherences
+ * reparties entre domaines soit absorbe par la normalisation Wmax.
+ * Penalite = min(15, (nbIncoherences - 5) * 2) points.
+ */
+var nbIncoherences=0;
+for(var ic=0;ic<constats.length;ic++){if((constats[ic].categorie||"").toLowerCase()==="incoherence")nbIncoherences++;}
+var penaliteIncoherences=0;
+if(nbIncoherences>5){penaliteIncoherences=Math.min(15,(nbIncoherences-5)*2);global=Math.max(0,global-penaliteIncoherences);}
+var ggrade="F";if(global>=90)ggrade="A";else if(global>=75)ggrade="B";else if(global>=60)ggrade="C";else if(global>=45)ggrade="D";else if(global>=30)ggrade="E";
+/* Avertissement incertitude si marge > 10 sur un domaine */
+var avertissements=[];
+if(su.intervalle&&su.intervalle.marge>10)avertissements.push("URSSAF: incertitude significative (marge="+su.intervalle.marge+")");
+if(sf.intervalle&&sf.intervalle.marge>10)avertissements.push("DGFIP: incertitude significative (marge="+sf.intervalle.marge+")");
+if(sc.intervalle&&sc.intervalle.marge>10)avertissements.push("CDC: incertitude significative (marge="+sc.intervalle.marge+")");
+if(nbRoutageDefaut>0&&constats.length>0&&nbRoutageDefaut/constats.length>0.2)
+avertissements.push("Routage par defaut: "+nbRoutageDefaut+"/"+constats.length+" constats routes vers URSSAF par defaut (>20%)");
+return{urssaf:su,fiscal:sf,cdc:sc,global:{score:global,grade:ggrade},nb_constats_total:constats.length,
+nb_constats_dedupliques:nbDeduplicated,
+nb_incoherences:nbIncoherences,penalite_incoherences:penaliteIncoherences,
+nb_routage_defaut:nbRoutageDefaut,
+poids:{urssaf:wu,fiscal:wf,cdc:wc},methode:"Moyenne ponderee par nombre de points de controle (Nk/Somme_Nk)",
+routage_domaine:routageTrace,statut_validation:"provisoire",avertissements:avertissements};}
+function calculateConformityScore(data){
+var ts=calculateTripleScore(data);var g=ts.global;var p=ts.poids;
+var allDetails=ts.urssaf.details.concat(ts.fiscal.details).concat(ts.cdc.details);
+var explication="Score global NormaCheck v4.0 : "+g.score+"/100 ("+g.grade+"). ";
+explication+="URSSAF: "+ts.urssaf.score+"/100 ("+ts.urssaf.grade+") | DGFIP: "+ts.fiscal.score+"/100 ("+ts.fiscal.grade+") | CDC: "+ts.cdc.score+"/100 ("+ts.cdc.grade+"). ";
+explication+="Ponderation proportionnelle: URSSAF*"+(p.urssaf).toFixed(4)+" + DGFIP*"+(p.fiscal).toFixed(4)+" + CDC*"+(p.cdc).toFixed(4)+" (basee sur Nk/Somme_Nk).";
+return{score:g.score,grade:g.grade,explanation:explication,details:allDetails,
+nb_critiques:ts.urssaf.nb_critiques+ts.fiscal.nb_critiques+ts.cdc.nb_critiques,
+nb_hautes:ts.urssaf.nb_hautes+ts.fiscal.nb_hautes+ts.cdc.nb_hautes,
+nb_moyennes:ts.urssaf.nb_moyennes+ts.fiscal.nb_moyennes+ts.cdc.nb_moyennes,
+nb_basses:ts.urssaf.nb_basses+ts.fiscal.nb_basses+ts.cdc.nb_basses,
+tripleScore:ts};}
+/* --- Scellement du score dans la chaine de preuve --- */
+function sealScoreProof(data,ts){
+try{var sid=data.session_id||"";
+fetch("/api/proof/seal-score",{method:"POST",headers:{"Content-Type":"application/json"},
+body:JSON.stringify({session_id:sid,scores:{urssaf:ts.urssaf,fiscal:ts.fiscal,cdc:ts.cdc,global:ts.global},
+constats:data.constats||[],nb_documents:(data.declarations||[]).length}),
+credentials:"same-origin"}).then(safeJson).then(function(d){
+if(d.status==="ok")console.info("Score scelle dans la chaine de preuve: seq="+d.seq+", hash="+d.hash);
+}).catch(function(e){console.warn("Erreur scellement preuve:",e);});}catch(e){}}
+function renderScoreDetails(){
+if(!analysisData)return;
+var ts=calculateTripleScore(analysisData);var p=ts.poids;
+/* Sceller le score dans la chaine de preuve a chaque affichage */
+sealScoreProof(analysisData,ts);
+function renderDomainDetail(elId,sc){
+var el=document.getElementById(elId);if(!el)return;
+var h="<h3>Resultat : "+sc.score+"/100 ("+sc.grade+") - "+sc.domaine+"</h3>";
+h+="<div style='margin:8px 0;font-size:.86em'><strong>Constats pris en compte :</strong> critiques="+sc.nb_critiques+" (Wk=4) | hautes="+sc.nb_hautes+" (Wk=3) | moyennes="+sc.nb_moyennes+" (Wk=2) | faibles="+sc.nb_basses+" (Wk=1)</div>";
+h+="<div style='margin:4px 0;font-size:.84em;color:var(--tx2)'>Somme poids Wk = "+sc.totalW+" | Wmax = "+sc.Wmax+" | Score brut = "+sc.Sbrut+" | Fc = "+sc.Fc.toFixed(2)+"</div>";
+h+="<table><thead><tr><th>Poids (Wk)</th><th>Severite</th><th>Constat</th><th>Reference legale</th></tr></thead><tbody>";
+for(var i=0;i<sc.details.length;i++){var d=sc.details[i];
+if(d.poids===0){h+="<tr><td style='color:var(--tx2)'>-</td><td>info</td><td colspan='2' style='font-size:.84em;color:var(--tx2)'>"+d.raison+"</td></tr>";}
+else{h+="<tr><td style='font-weight:700;color:var(--r)'>"+d.poids+"</td><td>"+(d.severite||"")+"</td><td>"+d.raison+"</td><td style='font-size:.82em;color:var(--tx2)'>"+d.ref+"</td></tr>";}}
+h+="</tbody></table>";
+h+="<div style='margin-top:10px;padding:10px;background:var(--bg);border-radius:8px;font-family:monospace;font-size:.84em'>";
+h+="S<sub>"+sc.domaine+"</sub> = max(0, 100 &times; (1 - &Sigma;Wk/Wmax)) &times; (0.5 + 0.5 &times; Fc)<br>";
+h+="= max(0, 100 &times; (1 - "+sc.totalW+"/"+sc.Wmax+")) &times; (0.5 + 0.5 &times; "+sc.Fc.toFixed(2)+")<br>";
+h+="= "+sc.Sbrut+" &times; "+(0.5+0.5*sc.Fc).toFixed(2)+" = <strong>"+sc.score+"</strong></div>";
+if(sc.intervalle){h+="<div style='margin-top:8px;padding:8px;background:var(--pl);border-radius:6px;font-size:.84em'><strong>Intervalle de confiance :</strong> ["+sc.intervalle.bas+" - "+sc.intervalle.haut+"] (&plusmn;"+sc.intervalle.marge+" pts)";
+if(sc.nb_constats_contestables>0){h+=" | <span style='color:var(--r)'>"+sc.nb_constats_contestables+" constat(s) statistique(s) contestable(s) (patterns)</span>";}
+h+="<br><span style='font-size:.9em;color:var(--tx2)'>L intervalle reflete l incertitude liee a la couverture documentaire et au nombre de constats. Les constats de type pattern_suspect sont des indicateurs statistiques non probants.</span></div>";}
+el.innerHTML=h;}
+renderDomainDetail("score-detail-urssaf",ts.urssaf);
+renderDomainDetail("score-detail-fiscal",ts.fiscal);
+renderDomainDetail("score-detail-cdc",ts.cdc);
+var gel=document.getElementById("score-detail-global");
+if(gel){var gh="";
+/* Bandeau statut provisoire / valide (art. 22 RGPD) */
+gh+="<div style='margin-bottom:12px;padding:12px 16px;border-radius:8px;border:2px solid #f59e0b;background:#fffbeb;font-size:.9em'>";
+gh+="<strong style='color:#92400e'>&#9888; SCORE PROVISOIRE</strong> &mdash; ";
+gh+="Ce score est un indicateur d'aide a la decision (art. 22 RGPD). ";
+gh+="Il ne constitue pas une decision automatisee et ne peut etre utilise a des fins decisionnelles ";
+gh+="sans validation prealable par un professionnel qualifie.";
+gh+="<div style='margin-top:8px'>";
+gh+="<button onclick='demanderValidationHumaine()' style='padding:6px 14px;background:#1e40af;color:#fff;border:none;border-radius:6px;cursor:pointer;font-size:.85em;margin-right:8px'>Demander une validation humaine</button>";
+gh+="<button onclick='contesterScore()' style='padding:6px 14px;background:#dc2626;color:#fff;border:none;border-radius:6px;cursor:pointer;font-size:.85em'>Contester ce score</button>";
+gh+="</div></div>";
+gh+="<div style='font-size:.9em;line-height:1.8'>";
+gh+="<strong>Methode :</strong> Moyenne ponderee par nombre de points de controle (Nk/&Sigma;Nk) - non discretionnaire<br>";
+gh+="<strong>Calcul :</strong> S<sub>global</sub> = ("+ts.urssaf.score+" &times; "+p.urssaf.toFixed(4)+") + ("+ts.fiscal.score+" &times; "+p.fiscal.toFixed(4)+") + ("+ts.cdc.score+" &times; "+p.cdc.toFixed(4)+") = <strong>"+ts.global.score+"/100 ("+ts.global.grade+")</strong></div>";
+gh+="<div style='margin-top:10px;padding:10px;background:var(--pl);border-radius:8px;font-size:.84em'><strong>Avertissement juridique (art. 22 RGPD) :</strong> Ce score est un indicateur methodologique provisoire, non opposable aux administrations. Il ne constitue pas une decision automatisee au sens de l'art. 22 RGPD. Les constats de type pattern_suspect sont des indicateurs statistiques non probants (art. L243-7 CSS). Tout constat est soumis a procedure contradictoire (art. L121-1 CRPA). L'entite auditee dispose d'un droit d'intervention humaine, d'expression et de contestation.</div>";
+/* Tracabilite du routage domaine (explicabilite art. 13-14 RGPD) */
+if(ts.routage_domaine&&ts.routage_domaine.length>0){
+gh+="<details style='margin-top:10px;font-size:.84em'><summary style='cursor:pointer;font-weight:700;color:var(--tx2)'>Tracabilite du routage domaine ("+ts.routage_domaine.length+" constats routes)</summary>";
+gh+="<table style='width:100%;margin-top:6px'><thead><tr><th style='text-align:left'>Constat</th><th style='text-align:left'>Domaine</th><th style='text-align:left'>Regle appliquee</th></tr></thead><tbody>";
+for(var ri=0;ri<ts.routage_domaine.length;ri++){var rt=ts.routage_domaine[ri];
+gh+="<tr><td style='font-size:.82em'>"+rt.constat+"</td><td><strong>"+rt.domaine_affecte.toUpperCase()+"</strong></td><td style='font-size:.82em;color:var(--tx2)'>"+rt.regle_appliquee+"</td></tr>";}
+gh+="</tbody></table></details>";}
+gh+="<div class='g3' style='margin-top:12px'>";
+gh+="<div class='sc blue'><div class='val'>"+ts.urssaf.score+"%</div><div class='lab'>URSSAF (N="+DOMAIN_CONTROL_POINTS.urssaf+", w="+(p.urssaf*100).toFixed(1)+"%)</div></div>";
+gh+="<div class='sc purple'><div class='val'>"+ts.fiscal.score+"%</div><div class='lab'>DGFIP (N="+DOMAIN_CONTROL_POINTS.fiscal+", w="+(p.fiscal*100).toFixed(1)+"%)</div></div>";
+gh+="<div class='sc teal'><div class='val'>"+ts.cdc.score+"%</div><div class='lab'>CDC (N="+DOMAIN_CONTROL_POINTS.cdc+", w="+(p.cdc*100).toFixed(1)+"%)</div></div>";
+gh+="</div>";gel.innerHTML=gh;}}
+/* === RGPD ART. 22 - VALIDATION HUMAINE ET CONTESTATION === */
+function demanderValidationHumaine(){
+if(!analysisData){toast("Aucune analyse en cours.","warn");return;}
+var sid=analysisData.session_id||"session_"+Date.now();
+var ts=calculateTripleScore(analysisData);
+var justif=prompt("Justification de la demande de validation (facultatif pour validation simple) :");
+fetch("/api/scores/validation-humaine",{method:"POST",headers:{"Content-Type":"application/json"},
+body:JSON.stringify({session_id:sid,action:"valider",score_original:ts.global,justification:justif||"Validation demandee par l operateur"}),
+credentials:"same-origin"}).then(safeJson).then(function(d){
+if(d.status==="ok"){toast("Score valide par intervention humaine. Ref: seq="+d.validation.proof_seq+", hash="+d.validation.proof_hash.substring(0,12)+"...","ok");
+/* Mettre a jour l indicateur visuel */
+var banner=document.querySelector("#score-detail-global > div:first-child");
+if(banner){banner.style.borderColor="#16a34a";banner.style.background="#f0fdf4";
+banner.innerHTML="<strong style='color:#166534'>&#10003; SCORE VALIDE</strong> &mdash; Score valide par un operateur humain le "+new Date().toLocaleDateString("fr-FR")+". Ref preuve : "+d.validation.proof_hash.substring(0,12)+"... (art. 22 RGPD)";}
+}else{toast("Erreur: "+(d.detail||"Echec validation"),"warn");}
+}).catch(function(e){toast("Erreur validation: "+e.message,"warn");});}
+function contesterScore(){
+if(!analysisData){toast("Aucune analyse en cours.","warn");return;}
+var sid=analysisData.session_id||"session_"+Date.now();
+var motif=prompt("Motif de la contestation (obligatoire) :");
+if(!motif){toast("La contestation necessite un motif.","warn");return;}
+var constatsStr=prompt("Titre(s) des constats contestes (separes par des virgules, ou vide pour contester le score global) :");
+var constatsContestes=constatsStr?constatsStr.split(",").map(function(s){return s.trim();}):[];
+fetch("/api/scores/contestation",{method:"POST",headers:{"Content-Type":"application/json"},
+body:JSON.stringify({session_id:sid,constats_contestes:constatsContestes,motif:motif}),
+credentials:"same-origin"}).then(safeJson).then(function(d){
+if(d.status==="ok"){toast("Contestation enregistree (ref: seq="+d.contestation.proof_seq+"). Reexamen humain sous 30 jours.","ok");
+var banner=document.querySelector("#score-detail-global > div:first-child");
+if(banner){banner.style.borderColor="#dc2626";banner.style.background="#fef2f2";
+banner.innerHTML="<strong style='color:#991b1b'>&#9888; SCORE CONTESTE</strong> &mdash; Contestation enregistree le "+new Date().toLocaleDateString("fr-FR")+". Un reexamen humain sera effectue sous 30 jours (art. R*243-59 CSS). Ref: "+d.contestation.proof_hash.substring(0,12)+"...";}
+}else{toast("Erreur: "+(d.detail||"Echec contestation"),"warn");}
+}).catch(function(e){toast("Erreur contestation: "+e.message,"warn");});}
+
+/* === PDF EXPORT === */
+function exportPDF(){
+if(!analysisData){toast("Aucun rapport a exporter.","warn");return;}
+var mode=analysisData.mode_analyse||document.getElementById("mode-analyse").value;
+var titres={"simple":"Rapport d analyse NormaCheck","social":"Audit social NormaCheck","fiscal":"Audit fiscal NormaCheck","complet":"Audit NormaCheck complet"};
+var titre=titres[mode]||"Rapport NormaCheck";
+var scoreData=calculateConformityScore(analysisData);
+var constats=analysisData.constats||[];
+var w=window.open("","_blank");
+var ent={}; try{var xe=new XMLHttpRequest();xe.open("GET","/api/config/entete",false);xe.send();if(xe.status===200)ent=JSON.parse(xe.responseText);}catch(e){}
+var entHtml="";
+if(ent.nom_entreprise){entHtml="<div style='text-align:center;border-bottom:2px solid #1e40af;padding-bottom:16px;margin-bottom:20px'><h1 style='color:#1e40af;margin:0'>"+ent.nom_entreprise+"</h1><p style='color:#64748b'>"+((ent.forme_juridique||"")+" - "+(ent.adresse||""))+"</p><p style='color:#64748b'>SIRET: "+(ent.siret||"")+" | Tel: "+(ent.telephone||"")+"</p></div>";}
+var socialH="",fiscalH="";
+for(var i=0;i<constats.length;i++){var c=constats[i];var cat=(c.categorie||"").toLowerCase();
+var item="<div style='border:1px solid #e2e8f0;border-left:4px solid "+(Math.abs(c.montant_impact||0)>5000?"#ef4444":"#f59e0b")+";border-radius:8px;padding:12px;margin:8px 0'><strong>"+c.titre+"</strong><p style='color:#64748b;margin:4px 0'>"+(c.description||"")+"</p><p><strong>Impact:</strong> "+Math.abs(c.montant_impact||0).toFixed(2)+" EUR</p>"+(c.reference_legale?"<p style='font-size:.85em;color:#64748b'>Ref: "+c.reference_legale+"</p>":"")+(c.recommandation?"<p style='color:#1e40af;font-style:italic'>"+c.recommandation+"</p>":"")+"</div>";
+if(cat.indexOf("fiscal")>=0||cat.indexOf("tva")>=0||cat.indexOf("impot")>=0)fiscalH+=item;else socialH+=item;}
+var html="<!DOCTYPE html><html><head><meta charset='UTF-8'><title>"+titre+"</title><style>body{font-family:Segoe UI,sans-serif;max-width:900px;margin:0 auto;padding:30px;color:#1e293b}h1{color:#1e40af}h2{color:#1e40af;border-bottom:1px solid #e2e8f0;padding-bottom:6px;margin-top:30px}.score{text-align:center;padding:20px;background:#f8fafc;border-radius:12px;border:2px solid #e2e8f0;margin:20px 0}.grade{font-size:3em;font-weight:800;color:#1e40af}.badge{display:inline-block;padding:3px 10px;border-radius:20px;font-size:.8em;font-weight:700}@media print{body{padding:10px}}</style></head><body>";
+html+=entHtml;
+html+="<h1 style='text-align:center'>"+titre+"</h1>";
+html+="<p style='text-align:center;color:#64748b'>Date: "+new Date().toLocaleDateString("fr-FR")+" | "+((analysisData.synthese||{}).nb_fichiers||0)+" fichier(s) analyse(s)</p>";
+var ts=scoreData.tripleScore||calculateTripleScore(analysisData);
+html+="<div style='margin:16px 0;padding:12px;background:#fffbeb;border:2px solid #f59e0b;border-radius:8px;font-size:.9em;color:#92400e'><strong>&#9888; SCORE PROVISOIRE</strong> &mdash; Ce score est un indicateur d'aide a la decision (art. 22 RGPD). Il ne constitue pas une decision automatisee et necessite une validation par un professionnel qualifie avant toute utilisation a des fins decisionnelles. L'entite auditee dispose d'un droit d'intervention humaine, d'expression et de contestation (art. 22(3) RGPD, art. L121-1 CRPA).</div>";
+html+="<div class='score'><div class='grade'>"+scoreData.grade+"</div><div style='font-size:2em;font-weight:700'>Score global : "+scoreData.score+" / 100</div><p style='color:#64748b;margin-top:8px'>"+scoreData.explanation+"</p></div>";
+html+="<div style='display:flex;gap:16px;justify-content:center;margin:20px 0;flex-wrap:wrap'>";
+html+="<div style='flex:1;min-width:200px;text-align:center;padding:16px;border:2px solid #3b82f6;border-radius:12px'><div style='font-size:.75em;text-transform:uppercase;color:#64748b;margin-bottom:4px'>URSSAF / CSS</div><div style='font-size:2em;font-weight:800;color:#1e40af'>"+ts.urssaf.score+"/100</div><div style='font-size:1.2em;font-weight:700;color:"+(ts.urssaf.score>=75?"#16a34a":ts.urssaf.score>=45?"#d97706":"#ef4444")+"'>"+ts.urssaf.grade+"</div><div style='font-size:.8em;color:#64748b;margin-top:4px'>"+ts.urssaf.nb_critiques+" critique(s) | "+ts.urssaf.details.length+" constat(s)</div></div>";
+html+="<div style='flex:1;min-width:200px;text-align:center;padding:16px;border:2px solid #a855f7;border-radius:12px'><div style='font-size:.75em;text-transform:uppercase;color:#64748b;margin-bottom:4px'>DGFIP / CGI</div><div style='font-size:2em;font-weight:800;color:#7c3aed'>"+ts.fiscal.score+"/100</div><div style='font-size:1.2em;font-weight:700;color:"+(ts.fiscal.score>=75?"#16a34a":ts.fiscal.score>=45?"#d97706":"#ef4444")+"'>"+ts.fiscal.grade+"</div><div style='font-size:.8em;color:#64748b;margin-top:4px'>"+ts.fiscal.nb_critiques+" critique(s) | "+ts.fiscal.details.length+" constat(s)</div></div>";
+html+="<div style='flex:1;min-width:200px;text-align:center;padding:16px;border:2px solid #0d9488;border-radius:12px'><div style='font-size:.75em;text-transform:uppercase;color:#64748b;margin-bottom:4px'>COUR DES COMPTES</div><div style='font-size:2em;font-weight:800;color:#0d9488'>"+ts.cdc.score+"/100</div><div style='font-size:1.2em;font-weight:700;color:"+(ts.cdc.score>=75?"#16a34a":ts.cdc.score>=45?"#d97706":"#ef4444")+"'>"+ts.cdc.grade+"</div><div style='font-size:.8em;color:#64748b;margin-top:4px'>"+ts.cdc.nb_critiques+" critique(s) | "+ts.cdc.details.length+" constat(s)</div></div>";
+html+="</div>";
+var pp=ts.poids||{urssaf:10/28,fiscal:10/28,cdc:8/28};
+html+="<div style='text-align:center;padding:10px;background:#f8fafc;border-radius:8px;margin:10px 0;font-size:.85em'><strong>Ponderation proportionnelle (Nk/&Sigma;Nk) :</strong> S<sub>global</sub> = URSSAF("+ts.urssaf.score+") &times; "+(pp.urssaf).toFixed(4)+" + DGFIP("+ts.fiscal.score+") &times; "+(pp.fiscal).toFixed(4)+" + CDC("+ts.cdc.score+") &times; "+(pp.cdc).toFixed(4)+" = <strong>"+ts.global.score+"</strong><br><span style='color:#64748b;font-size:.9em'>Methode v4.0 : poids derives du nombre de points de controle legaux par domaine (non discretionnaire)</span></div>";
+if(socialH){html+="<h2>Partie sociale - Constats URSSAF</h2><p style='color:#64748b'>Points de controle relevant de la legislation sociale (Code de la securite sociale, Code du travail)</p>"+socialH;}
+if(fiscalH){html+="<h2>Partie fiscale - Constats DGFIP</h2><p style='color:#64748b'>Points de controle relevant de la legislation fiscale (Code general des impots)</p>"+fiscalH;}
+if(!socialH&&!fiscalH){html+="<h2>Constats</h2>";for(var i=0;i<constats.length;i++){var c=constats[i];html+="<div style='border:1px solid #e2e8f0;border-radius:8px;padding:12px;margin:8px 0'><strong>"+c.titre+"</strong><p>"+c.description+"</p><p>Impact: "+Math.abs(c.montant_impact||0).toFixed(2)+" EUR</p></div>";}}
+html+="<h2>Recommandations</h2>";var recos=analysisData.recommandations||[];for(var i=0;i<recos.length;i++){html+="<p>"+(i+1)+". "+(recos[i].description||recos[i].titre||"")+"</p>";}
+function _pdfScoreTable(sc,title,color){
+html+="<div style='margin-top:20px;padding:16px;background:#f8fafc;border-radius:8px;border:1px solid #e2e8f0;border-left:4px solid "+color+";font-size:.85em'>";
+html+="<h3 style='color:"+color+"'>"+title+" - "+sc.score+"/100 ("+sc.grade+")</h3>";
+html+="<p style='margin:6px 0'>Formule : S = max(0, 100 &times; (1 - &Sigma;Wk / Wmax)) &times; (0.5 + 0.5 &times; Fc). Poids : critique(Wk=4), haute(Wk=3), moyenne(Wk=2), faible(Wk=1).</p>";
+html+="<table style='width:100%;border-collapse:collapse;margin-top:8px'><tr style='background:"+color+";color:#fff'><th style='padding:6px 10px;text-align:left'>Points</th><th style='padding:6px 10px;text-align:left'>Raison</th><th style='padding:6px 10px;text-align:left'>Reference</th></tr>";
+for(var i=0;i<sc.details.length;i++){var d=sc.details[i];html+="<tr style='border-bottom:1px solid #e2e8f0'><td style='padding:4px 10px;color:"+(d.deduction>0?"#16a34a":"#ef4444")+"'>"+(d.deduction>0?"+":"")+d.deduction+"</td><td style='padding:4px 10px'>"+d.raison+"</td><td style='padding:4px 10px;font-size:.9em;color:#64748b'>"+(d.ref||"")+"</td></tr>";}
+html+="</table></div>";}
+_pdfScoreTable(ts.urssaf,"Score URSSAF (Securite sociale)","#1e40af");
+_pdfScoreTable(ts.fiscal,"Score DGFIP (Fiscal)","#7c3aed");
+_pdfScoreTable(ts.cdc,"Score Cour des comptes (Regularite comptable)","#0d9488");
+html+="<p style='text-align:center;margin-top:30px;font-size:.8em;color:#94a3b8'>Document genere par NormaCheck v4.0 - SCORE PROVISOIRE - Outil d'aide a la decision, non decision automatisee (art. 22 RGPD). Indicateur methodologique interne, non opposable aux administrations (art. L.243-6-3 CSS). Score indicatif soumis a procedure contradictoire (art. L121-1 CRPA). Validation humaine requise avant utilisation decisionnelle.</p></body></html>";
+w.document.write(html);w.document.close();setTimeout(function(){w.print();},600);}
+function exportPDFServer(){if(!analysisData){toast("Aucun rapport a exporter.","warn");return;}fetch("/api/export/pdf",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({data:analysisData}),credentials:"same-origin"}).then(function(r){if(!r.ok)throw new Error("Erreur export");return r.blob();}).then(function(blob){var a=document.createElement("a");a.href=URL.createObjectURL(blob);a.download="normacheck_rapport.html";a.click();toast("Rapport telecharge.","ok");}).catch(function(e){toast(e.message);exportPDF();});}
+
+/* === RH SALARIES AUTOCOMPLETE === */
+var _salariesCache=null;
+function loadSalariesCache(cb){
+if(_salariesCache){if(cb)cb(_salariesCache);return;}
+fetch("/api/rh/salaries").then(safeJson).then(function(list){
+_salariesCache=Array.isArray(list)?list:[];
+if(cb)cb(_salariesCache);
+}).catch(function(){_salariesCache=[];if(cb)cb([]);});}
+
+function setupSalarieAutocomplete(inputId){
+var inp=document.getElementById(inputId);if(!inp)return;
+inp.setAttribute("autocomplete","off");
+var sugId=inputId+"-sug";
+var existing=document.getElementById(sugId);
+if(!existing){var box=document.createElement("div");box.id=sugId;box.className="sug-box";box.style.cssText="position:relative;z-index:10";inp.parentNode.insertBefore(box,inp.nextSibling);}
+inp.addEventListener("input",function(){
+var q=inp.value.toLowerCase().trim();
+var box=document.getElementById(sugId);if(!box)return;
+if(q.length<1){box.innerHTML="";return;}
+loadSalariesCache(function(list){
+var matches=list.filter(function(s){return(s.nom_complet||"").toLowerCase().indexOf(q)>=0||(s.nom||"").toLowerCase().indexOf(q)>=0||(s.prenom||"").toLowerCase().indexOf(q)>=0;});
+if(!matches.length){box.innerHTML="";return;}
+var h="<div class='sug-list show' style='position:absolute;width:100%;background:var(--card-bg);border:1px solid var(--brd);border-radius:8px;box-shadow:var(--sh);max-height:200px;overflow-y:auto;z-index:100'>";
+for(var i=0;i<Math.min(matches.length,8);i++){var s=matches[i];
+h+="<div class='sug-item' style='padding:8px 12px;cursor:pointer;font-size:.85em;border-bottom:1px solid var(--brd)' data-val='"+_esc(s.nom_complet||s.id)+"'><strong>"+_esc(s.nom_complet||s.id)+"</strong>"+(s.type_contrat?" <span style='color:var(--tx2);font-size:.8em'>"+_esc(s.type_contrat)+"</span>":"")+"</div>";}
+h+="</div>";box.innerHTML=h;
+box.querySelectorAll(".sug-item").forEach(function(el){el.addEventListener("click",function(){inp.value=el.getAttribute("data-val");box.innerHTML="";});});
+});
+});
+inp.addEventListener("focus",function(){if(inp.value.length>=1)inp.dispatchEvent(new Event("input"));});
+}
+
+/* === RH MODULE === */
+function _btnLoading(btn,loading){if(!btn)return;if(loading){btn._origText=btn.innerHTML;btn.classList.add("loading");btn.disabled=true;btn.innerHTML="&#9203; Chargement...";}else{btn.classList.remove("loading");btn.disabled=false;if(btn._origText)btn.innerHTML=btn._origText;}}
+function rhPost(url,fd,cb){var btn=null;try{if(window.event&&window.event.target)btn=window.event.target.closest(".btn");}catch(e){}if(btn)_btnLoading(btn,true);fetch(url,{method:"POST",body:fd}).then(safeJson).then(function(d){if(btn)_btnLoading(btn,false);cb(d);}).catch(function(e){if(btn)_btnLoading(btn,false);toast(e.message);});}
+function rhGet(url,cb){fetch(url).then(safeJson).then(function(d){return (d&&d.items&&typeof d.total==="number")?d.items:d;}).then(cb).catch(function(e){console.error("rhGet "+url,e);toast("Erreur chargement: "+e.message);});}
+
+function creerContrat(){var nom=document.getElementById("rh-ctr-nom").value;var prenom=document.getElementById("rh-ctr-prenom").value;if(!nom||!prenom){toast("Nom et prenom du salarie sont obligatoires.");return;}var fd=new FormData();fd.append("type_contrat",document.getElementById("rh-type-ctr").value);fd.append("nom_salarie",document.getElementById("rh-ctr-nom").value);fd.append("prenom_salarie",document.getElementById("rh-ctr-prenom").value);fd.append("poste",document.getElementById("rh-ctr-poste").value);fd.append("date_debut",document.getElementById("rh-ctr-debut").value);fd.append("date_fin",document.getElementById("rh-ctr-fin").value);fd.append("salaire_brut",document.getElementById("rh-ctr-salaire").value||"0");fd.append("temps_travail",document.getElementById("rh-ctr-temps").value);fd.append("duree_hebdo",document.getElementById("rh-ctr-heures").value);fd.append("convention_collective",document.getElementById("rh-ctr-ccn").value);fd.append("periode_essai_jours",document.getElementById("rh-ctr-essai").value);fd.append("motif_cdd",document.getElementById("rh-ctr-motif").value);var nirEl=document.getElementById("rh-ctr-nir");if(nirEl)fd.append("nir",nirEl.value);
+rhPost("/api/rh/contrats",fd,function(d){toast("Contrat genere.","ok");
+var h="";
+if(d.doublons_detectes&&d.doublons_detectes.length>0){h+="<div class='al warn' style='margin-bottom:10px'><span class='ai'>&#9888;</span><span><strong>Doublon potentiel detecte !</strong> "+d.alerte_doublon+"</span></div>";h+="<div style='background:var(--ol);border:1px solid #fde68a;border-radius:8px;padding:12px;margin-bottom:12px'><strong>Fiche(s) existante(s) :</strong><table style='margin-top:6px'><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Contrat</th><th>Debut</th><th>NIR</th><th>Motif</th><th>Action</th></tr>";
+for(var i=0;i<d.doublons_detectes.length;i++){var dup=d.doublons_detectes[i];var motifLabel=dup.motif==="nir_identique"?"<span class='badge badge-red'>NIR identique</span>":"<span class='badge badge-amber'>Nom/Prenom</span>";h+="<tr><td>"+dup.nom+"</td><td>"+dup.prenom+"</td><td>"+dup.poste+"</td><td>"+dup.type_contrat+"</td><td>"+dup.date_debut+"</td><td style='font-size:.8em'>"+(dup.nir||"-")+"</td><td>"+motifLabel+"</td><td><button class='btn btn-s btn-sm' onclick='fusionnerDoublon("+JSON.stringify(d.id)+","+JSON.stringify(dup.id)+")'>Fusionner</button></td></tr>";}h+="</table></div>";}
+h+="<div class='al ok'><span class='ai'>&#9989;</span><span>Contrat <strong>"+d.type_contrat+" - "+d.nom_salarie+" "+d.prenom_salarie+"</strong> cree (ID: "+d.id+")</span></div>";
+h+="<button class='btn btn-s btn-sm' style='margin:8px 4px 0 0' onclick='voirContrat("+JSON.stringify(d.id)+")'>Visualiser le contrat</button>";
+var eff=d.cascading_effects;if(eff){h+="<div style='margin-top:12px;padding:10px;background:var(--pl);border-radius:8px'><strong>Effets en cascade :</strong><ul style='margin:6px 0 0 16px;font-size:.86em'>";
+if(eff.dpae)h+="<li>&#9888; Rappel : effectuez la DPAE sur net-entreprises.fr avant embauche (ref contrat: "+d.id+")</li>";
+if(eff.visite_medicale)h+="<li>&#128197; Visite medicale programmee avant le "+eff.visite_medicale.echeance+"</li>";
+if(eff.planning_suggestion)h+="<li>&#128197; "+eff.planning_suggestion.message+"</li>";
+if(eff.ecriture_comptable)h+="<li>&#128181; Ecriture comptable provisionnee ("+eff.ecriture_comptable.libelle+")</li>";
+h+="</ul></div>";}
+document.getElementById("rh-ctr-res").innerHTML=h;loadRHContrats();});
+}
+function fusionnerDoublon(idGarder,idSupprimer){if(!confirm("Fusionner les deux fiches ? La fiche la plus ancienne sera completee puis le doublon supprime."))return;fetch("/api/rh/doublons/fusionner",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({id_garder:idGarder,id_supprimer:idSupprimer}),credentials:"same-origin"}).then(safeJson).then(function(r){toast(r.message,"ok");loadRHSalaries();loadRHContrats();}).catch(function(e){toast(e.message||"Erreur fusion");});}
+function detecterDoublons(){fetch("/api/rh/doublons",{credentials:"same-origin"}).then(safeJson).then(function(r){var el=document.getElementById("rh-doublons-alert");if(!r.doublons||!r.doublons.length){el.innerHTML="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#9989;</span><span>Aucun doublon detecte parmi vos salaries.</span></div>";el.style.display="block";return;}el.style.display="block";var h="<div class='al warn' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span><strong>"+r.nb_doublons+" doublon(s) potentiel(s) detecte(s) !</strong> Des salaries apparaissent dans plusieurs fiches. Verifiez et fusionnez si necessaire.</span></div>";for(var i=0;i<r.doublons.length;i++){var d=r.doublons[i];var typeLabel=d.type==="nir"?"<span class='badge badge-red'>Meme NIR : "+d.valeur+"</span>":d.type==="nom_prenom_proche"?"<span class='badge badge-amber'>Nom/Prenom proche ("+Math.round(d.score*100)+"%) : "+d.valeur+"</span>":"<span class='badge badge-amber'>Meme Nom/Prenom : "+d.valeur+"</span>";h+="<div style='border:1px solid var(--brd);border-radius:10px;padding:12px;margin:6px 0'><div style='display:flex;align-items:center;gap:8px;margin-bottom:8px'><strong>"+d.nb_occurrences+" fiches</strong> "+typeLabel+"</div>";h+="<table><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Contrat</th><th>Debut</th><th>NIR</th><th>Source</th><th>Brut</th><th>Action</th></tr>";for(var j=0;j<d.fiches.length;j++){var f=d.fiches[j];var nirAff=f.nir?(f.nir.length>8?f.nir.substring(0,8)+"...":f.nir):"-";h+="<tr><td>"+f.nom+"</td><td>"+f.prenom+"</td><td>"+f.poste+"</td><td>"+f.type_contrat+"</td><td>"+f.date_debut+"</td><td style='font-size:.8em'>"+nirAff+"</td><td style='font-size:.78em'>"+f.source+"</td><td class='num'>"+(parseFloat(f.salaire_brut)||0).toFixed(0)+" EUR</td>";if(j>0)h+="<td><button class='btn btn-s btn-sm' onclick='fusionnerDoublon("+JSON.stringify(d.fiches[0].id)+","+JSON.stringify(f.id)+")'>Fusionner dans 1ere</button></td>";else h+="<td><span class='badge badge-green'>Principale</span></td>";h+="</tr>";}h+="</table></div>";}el.innerHTML=h;}).catch(function(e){toast(e.message||"Erreur detection");});}
+
+function loadRHSalaries(){
+rhGet("/api/rh/contrats",function(list){
+var el=document.getElementById("rh-sal-list");
+if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun salarie detecte. Importez des bulletins de paie, DSN ou contrats dans l onglet Import / Analyse.</p>";return;}
+var nbNonVerif=0;for(var i=0;i<list.length;i++){if(list[i].verifie===false)nbNonVerif++;}
+var h="<div style='display:flex;gap:10px;flex-wrap:wrap;margin-bottom:14px'>";
+h+="<div class='sc blue'><div class='val'>"+list.length+"</div><div class='lab'>Salaries</div></div>";
+var actifs=0;var totalBrut=0;for(var i=0;i<list.length;i++){if(list[i].statut==="actif")actifs++;totalBrut+=parseFloat(list[i].salaire_brut||0);}
+h+="<div class='sc green'><div class='val'>"+actifs+"</div><div class='lab'>Actifs</div></div>";
+h+="<div class='sc'><div class='val'>"+totalBrut.toFixed(0)+" EUR</div><div class='lab'>Masse brute</div></div>";
+if(nbNonVerif>0)h+="<div class='sc amber'><div class='val'>"+nbNonVerif+"</div><div class='lab'>A verifier</div></div>";
+h+="</div>";
+if(nbNonVerif>0){h+="<div class='al warn' style='margin-bottom:12px'><span class='ai'>&#9888;</span><span><strong>"+nbNonVerif+" fiche(s) deduite(s) automatiquement</strong> des documents importes. Cliquez sur <em>Modifier</em> pour verifier et completer les informations.</span></div>";}
+h+="<table class='tb'><thead><tr><th>Nom</th><th>Prenom</th><th>Poste</th><th>Type</th><th>Debut</th><th class='num'>Brut</th><th>NIR</th><th>Statut</th><th>Source</th><th>Actions</th></tr></thead><tbody>";
+for(var i=0;i<list.length;i++){var c=list[i];
+var isDeduced=(c.verifie===false);
+var cls=isDeduced?"badge-amber":(c.statut==="actif"?"badge-green":(c.statut==="suspendu"?"badge-amber":"badge-red"));
+var statutLabel=isDeduced?"A verifier":c.statut;
+var nirAff=c.nir?(c.nir.length>5?c.nir.substring(0,5)+"...":c.nir):"<em style='color:var(--tx2)'>non renseigne</em>";
+var src=(c.source||"").replace("deduit_analyse","Deduit").replace("analyse_automatique","Auto");
+var rowStyle=isDeduced?"background:rgba(245,158,11,0.08)":"";
+h+="<tr style='"+rowStyle+"'><td><strong>"+c.nom_salarie+"</strong></td><td>"+c.prenom_salarie+"</td><td>"+c.poste+"</td>";
+h+="<td><span class='badge badge-blue'>"+c.type_contrat+"</span></td>";
+h+="<td>"+c.date_debut+"</td>";
+h+="<td class='num'>"+parseFloat(c.salaire_brut||0).toFixed(2)+" EUR</td>";
+h+="<td style='font-size:.8em'>"+nirAff+"</td>";
+h+="<td><span class='badge "+cls+"'>"+statutLabel+"</span></td>";
+h+="<td style='font-size:.78em;color:var(--tx2)'>"+src+"</td>";
+h+="<td><button class='btn btn-s btn-sm' data-action='edit' data-id='"+c.id+"'>Modifier</button></td></tr>";}
+h+="</tbody></table>";
+el.innerHTML=h;
+el.querySelectorAll("[data-action=edit]").forEach(function(b){b.onclick=function(){editSalarie(this.dataset.id);};});
+/* Auto-detection des doublons au chargement */
+if(list.length>1){fetch("/api/rh/doublons",{credentials:"same-origin"}).then(safeJson).then(function(r){var da=document.getElementById("rh-doublons-alert");if(r.doublons&&r.doublons.length>0){da.innerHTML="<div class='al warn' style='margin-bottom:8px;cursor:pointer' onclick='detecterDoublons()'><span class='ai'>&#9888;</span><span><strong>"+r.nb_doublons+" doublon(s) potentiel(s) detecte(s)</strong> parmi vos salaries (meme nom/prenom ou NIR). <u>Cliquez ici pour voir et fusionner.</u></span></div>";da.style.display="block";}else{da.style.display="none";}}).catch(function(){});}
+});
+}
+
+function loadRHContrats(){rhGet("/api/rh/contrats",function(list){
+var el=document.getElementById("rh-ctr-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun contrat.</p>";return;}
+var h="<table class='tb'><thead><tr><th>Type</th><th>Salarie</th><th>Poste</th><th>Debut</th><th>Fin</th><th class='num'>Brut</th><th>Statut</th><th>Actions</th></tr></thead><tbody>";
+for(var i=0;i<list.length;i++){var c=list[i];
+var isDeduced=(c.verifie===false);var cls=isDeduced?"badge-amber":"badge-green";var label=isDeduced?"A verifier":"Verifie";
+var rowStyle=isDeduced?"background:rgba(245,158,11,0.08)":"";
+h+="<tr style='"+rowStyle+"'><td><span class='badge badge-blue'>"+c.type_contrat+"</span></td><td>"+c.prenom_salarie+" "+c.nom_salarie+"</td><td>"+c.poste+"</td><td>"+c.date_debut+"</td><td>"+(c.date_fin||"-")+"</td><td class='num'>"+parseFloat(c.salaire_brut).toFixed(2)+" EUR</td>";
+h+="<td><span class='badge "+cls+"'>"+label+"</span></td>";
+h+="<td><button class='btn btn-s btn-sm' data-action='edit' data-id='"+c.id+"'>Modifier</button>"+(isDeduced?" <button class='btn btn-blue btn-sm' data-action='validate' data-id='"+c.id+"'>Valider</button>":"")+"</td></tr>";}
+h+="</tbody></table>";
+el.innerHTML=h;
+el.querySelectorAll("[data-action=edit]").forEach(function(b){b.onclick=function(){editSalarie(this.dataset.id);};});
+el.querySelectorAll("[data-action=validate]").forEach(function(b){b.onclick=function(){validerFiche(this.dataset.id);};});
+});}
+
+function editSalarie(id){
+rhGet("/api/rh/contrats/"+id,function(c){
+if(!c||c.detail){toast("Fiche introuvable.");return;}
+var h="<div class='card' style='background:var(--pl);border:2px solid var(--p);margin:12px 0'>";
+h+="<h3 style='margin-bottom:12px'>Modifier la fiche de "+c.prenom_salarie+" "+c.nom_salarie+"</h3>";
+h+="<div class='g2'>";
+h+="<div><label>Nom</label><input id='ed-nom' value='"+c.nom_salarie+"'></div>";
+h+="<div><label>Prenom</label><input id='ed-prenom' value='"+c.prenom_salarie+"'></div>";
+h+="<div><label>Poste</label><input id='ed-poste' value='"+c.poste+"'></div>";
+h+="<div><label>Type contrat</label><select id='ed-type'><option"+(c.type_contrat==="CDI"?" selected":"")+">CDI</option><option"+(c.type_contrat==="CDD"?" selected":"")+">CDD</option><option"+(c.type_contrat==="Alternance"?" selected":"")+">Alternance</option><option"+(c.type_contrat==="Stage"?" selected":"")+">Stage</option></select></div>";
+h+="<div><label>Date debut</label><input type='date' id='ed-debut' value='"+c.date_debut+"'></div>";
+h+="<div><label>Date fin</label><input type='date' id='ed-fin' value='"+(c.date_fin||"")+"'></div>";
+h+="<div><label>Salaire brut mensuel</label><input type='number' step='0.01' id='ed-brut' value='"+c.salaire_brut+"'></div>";
+h+="<div><label>NIR (Securite sociale)</label><input id='ed-nir' value='"+(c.nir||"")+"' maxlength='15'></div>";
+h+="<div><label>Convention collective</label><input id='ed-ccn' value='"+(c.convention_collective||"")+"'></div>";
+h+="<div><label>Temps de travail</label><select id='ed-temps'><option value='temps_complet'"+(c.temps_travail==="temps_complet"?" selected":"")+">Temps complet</option><option value='temps_partiel'"+(c.temps_travail==="temps_partiel"?" selected":"")+">Temps partiel</option></select></div>";
+h+="</div>";
+h+="<div style='display:flex;gap:8px;margin-top:14px'>";
+h+="<button class='btn btn-blue' id='btn-sauver-sal'>Enregistrer et valider</button>";
+h+="<button class='btn btn-s' onclick='loadRHSalaries()'>Annuler</button>";
+h+="</div></div>";
+document.getElementById("rh-sal-list").innerHTML+=h;
+document.getElementById("btn-sauver-sal").onclick=function(){sauverSalarie(id);};
+document.getElementById("ed-nom").scrollIntoView({behavior:"smooth"});
+});}
+
+function sauverSalarie(id){
+var fd=new FormData();
+fd.append("nom_salarie",document.getElementById("ed-nom").value);
+fd.append("prenom_salarie",document.getElementById("ed-prenom").value);
+fd.append("poste",document.getElementById("ed-poste").value);
+fd.append("type_contrat",document.getElementById("ed-type").value);
+fd.append("date_debut",document.getElementById("ed-debut").value);
+fd.append("date_fin",document.getElementById("ed-fin").value);
+fd.append("salaire_brut",document.getElementById("ed-brut").value);
+fd.append("nir",document.getElementById("ed-nir").value);
+fd.append("convention_collective",document.getElementById("ed-ccn").value);
+fd.append("temps_travail",document.getElementById("ed-temps").value);
+fd.append("verifie","true");
+rhPost("/api/rh/contrats/"+id+"/modifier",fd,function(){toast("Fiche mise a jour et validee.","ok");loadRHSalaries();loadRHContrats();});}
+
+function validerFiche(id){
+var fd=new FormData();fd.append("verifie","true");
+rhPost("/api/rh/contrats/"+id+"/modifier",fd,function(){toast("Fiche validee.","ok");loadRHSalaries();loadRHContrats();});}
+
+function genererRegistre(){
+rhGet("/api/rh/contrats",function(list){
+if(!list.length){toast("Aucun salarie pour generer le registre.");return;}
+var h="<div style='margin:16px 0'><h3>Registre unique du personnel (modifiable)</h3>";
+h+="<div class='al info' style='margin:8px 0'><span class='ai'>&#128196;</span><span>Ce registre est genere automatiquement a partir des fiches salaries. Vous pouvez le modifier, l imprimer ou l exporter.</span></div>";
+h+="<div id='registre-content' contenteditable='true' style='overflow-x:auto;margin:12px 0;border:1px solid var(--brd);border-radius:8px;padding:12px;background:#fff'>";
+h+="<table class='tb' style='font-size:.88em'><thead><tr><th>N</th><th>Nom</th><th>Prenom</th><th>Date naissance</th><th>NIR</th><th>Nationalite</th><th>Emploi</th><th>Qualification</th><th>Date entree</th><th>Date sortie</th><th>Type contrat</th></tr></thead><tbody>";
+for(var i=0;i<list.length;i++){var c=list[i];
+h+="<tr><td>"+(i+1)+"</td><td>"+c.nom_salarie+"</td><td>"+c.prenom_salarie+"</td><td>-</td><td>"+(c.nir||"-")+"</td><td>-</td><td>"+c.poste+"</td><td>"+c.poste+"</td><td>"+c.date_debut+"</td><td>"+(c.date_fin||"-")+"</td><td>"+c.type_contrat+"</td></tr>";}
+h+="</tbody></table></div>";
+h+="<div style='display:flex;gap:8px'><button class='btn btn-s btn-sm' onclick='window.print()'>Imprimer le registre</button><button class='btn btn-s btn-sm' onclick='exportRegistreCSV()'>Exporter CSV</button></div></div>";
+var target=document.getElementById("rh-sal-list");
+target.innerHTML+=h;
+toast("Registre du personnel genere. Vous pouvez le modifier directement.","ok");
+});}
+
+function exportRegistreCSV(){
+rhGet("/api/rh/contrats",function(list){
+var csv="N;Nom;Prenom;NIR;Emploi;Date entree;Date sortie;Type contrat\n";
+for(var i=0;i<list.length;i++){var c=list[i];csv+=(i+1)+";"+c.nom_salarie+";"+c.prenom_salarie+";"+(c.nir||"")+";"+c.poste+";"+c.date_debut+";"+(c.date_fin||"")+";"+c.type_contrat+"\n";}
+var blob=new Blob([csv],{type:"text/csv;charset=utf-8"});var url=URL.createObjectURL(blob);var a=document.createElement("a");a.href=url;a.download="registre_personnel.csv";document.body.appendChild(a);a.click();document.body.removeChild(a);URL.revokeObjectURL(url);
+toast("Registre exporte en CSV.","ok");});}
+
+function creerAvenant(){var fd=new FormData();fd.append("contrat_id",document.getElementById("rh-av-ctr").value);fd.append("type_avenant",document.getElementById("rh-av-type").value);fd.append("description",document.getElementById("rh-av-desc").value);fd.append("date_effet",document.getElementById("rh-av-date").value);fd.append("nouvelles_conditions",document.getElementById("rh-av-desc").value);
+rhPost("/api/rh/avenants",fd,function(){toast("Avenant enregistre.","ok");loadRHAvenants();});}
+function loadRHAvenants(){rhGet("/api/rh/avenants",function(list){var el=document.getElementById("rh-av-list");if(!list.length){el.innerHTML="";return;}var h="<table><tr><th>Contrat</th><th>Type</th><th>Date effet</th><th>Description</th></tr>";for(var i=0;i<list.length;i++){var a=list[i];h+="<tr><td>"+a.contrat_id+"</td><td><span class='badge badge-blue'>"+a.type_avenant+"</span></td><td>"+a.date_effet+"</td><td>"+a.description+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function enregConge(){var sal=document.getElementById("rh-cg-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("nom_salarie",sal);fd.append("type_conge",document.getElementById("rh-cg-type").value);fd.append("date_debut",document.getElementById("rh-cg-dd").value);fd.append("date_fin",document.getElementById("rh-cg-df").value);fd.append("nb_jours",document.getElementById("rh-cg-jours").value);fd.append("statut",document.getElementById("rh-cg-stat").value);
+rhPost("/api/rh/conges",fd,function(){toast("Conge enregistre.","ok");loadRHConges();});}
+function loadRHConges(){rhGet("/api/rh/conges",function(list){var el=document.getElementById("rh-cg-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun conge enregistre.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Debut</th><th>Fin</th><th>Jours</th><th>Statut</th></tr>";for(var i=0;i<list.length;i++){var c=list[i];var cls=c.statut==="valide"?"badge-green":(c.statut==="refuse"?"badge-red":"badge-amber");h+="<tr><td>"+c.salarie_id+"</td><td>"+c.type_conge+"</td><td>"+c.date_debut+"</td><td>"+c.date_fin+"</td><td class='num'>"+c.nb_jours+"</td><td><span class='badge "+cls+"'>"+c.statut+"</span></td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function enregArret(){var sal=document.getElementById("rh-ar-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_arret",document.getElementById("rh-ar-type").value);fd.append("date_debut",document.getElementById("rh-ar-dd").value);fd.append("date_fin",document.getElementById("rh-ar-df").value);fd.append("prolongation",document.getElementById("rh-ar-prol").value);fd.append("subrogation",document.getElementById("rh-ar-sub").value);
+rhPost("/api/rh/arrets",fd,function(){toast("Arret enregistre.","ok");loadRHArrets();});}
+function loadRHArrets(){rhGet("/api/rh/arrets",function(list){var el=document.getElementById("rh-ar-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun arret.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Debut</th><th>Fin</th><th>Subrogation</th></tr>";for(var i=0;i<list.length;i++){var a=list[i];h+="<tr><td>"+a.salarie_id+"</td><td><span class='badge badge-amber'>"+a.type_arret+"</span></td><td>"+a.date_debut+"</td><td>"+a.date_fin+"</td><td>"+(a.subrogation===true||a.subrogation==="true"?"Oui":"Non")+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function enregSanction(){var sal=document.getElementById("rh-sa-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_sanction",document.getElementById("rh-sa-type").value);fd.append("date_sanction",document.getElementById("rh-sa-date").value);fd.append("motif",document.getElementById("rh-sa-motif").value);fd.append("description",document.getElementById("rh-sa-desc").value);fd.append("date_entretien_prealable",document.getElementById("rh-sa-epr").value);
+rhPost("/api/rh/sanctions",fd,function(){toast("Sanction enregistree.","ok");loadRHSanctions();});}
+function loadRHSanctions(){rhGet("/api/rh/sanctions",function(list){var el=document.getElementById("rh-sa-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune sanction.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Motif</th></tr>";for(var i=0;i<list.length;i++){var s=list[i];h+="<tr><td>"+s.salarie_id+"</td><td><span class='badge badge-red'>"+s.type_sanction+"</span></td><td>"+s.date_sanction+"</td><td>"+s.motif+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function enregEntretien(){var sal=document.getElementById("rh-en-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_entretien",document.getElementById("rh-en-type").value);fd.append("date_entretien",document.getElementById("rh-en-date").value);fd.append("compte_rendu",document.getElementById("rh-en-cr").value);fd.append("date_prochain",document.getElementById("rh-en-next").value);
+rhPost("/api/rh/entretiens",fd,function(){toast("Entretien enregistre.","ok");loadRHEntretiens();});}
+function loadRHEntretiens(){rhGet("/api/rh/entretiens",function(list){var el=document.getElementById("rh-en-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun entretien.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Prochain</th></tr>";for(var i=0;i<list.length;i++){var e=list[i];h+="<tr><td>"+e.salarie_id+"</td><td><span class='badge badge-blue'>"+e.type_entretien+"</span></td><td>"+e.date_entretien+"</td><td>"+(e.date_prochain||"-")+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function enregVisite(){var sal=document.getElementById("rh-vm-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_visite",document.getElementById("rh-vm-type").value);fd.append("date_visite",document.getElementById("rh-vm-date").value);fd.append("resultat",document.getElementById("rh-vm-res").value);fd.append("remarques",document.getElementById("rh-vm-rem").value);fd.append("date_prochaine",document.getElementById("rh-vm-next").value);
+rhPost("/api/rh/visites-medicales",fd,function(){toast("Visite enregistree.","ok");loadRHVisites();});}
+function loadRHVisites(){rhGet("/api/rh/visites-medicales",function(list){var el=document.getElementById("rh-vm-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune visite.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Resultat</th><th>Prochaine</th></tr>";for(var i=0;i<list.length;i++){var v=list[i];var cls=v.resultat==="apte"?"badge-green":(v.resultat==="inapte"?"badge-red":"badge-amber");h+="<tr><td>"+v.salarie_id+"</td><td>"+v.type_visite+"</td><td>"+v.date_visite+"</td><td><span class='badge "+cls+"'>"+v.resultat+"</span></td><td>"+(v.date_prochaine||"-")+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function genererAttestation(){var sal=document.getElementById("rh-at-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("type_attestation",document.getElementById("rh-at-type").value);fd.append("date_generation",new Date().toISOString().substring(0,10));var btn=event&&event.target?event.target.closest(".btn"):null;
+rhPost("/api/rh/attestations/generer",fd,function(d){document.getElementById("rh-at-res").innerHTML="<div class='card' style='background:var(--pl);margin-top:8px'><pre style='white-space:pre-wrap;font-size:.82em;line-height:1.6'>"+(d.texte||d.contenu||"Erreur generation")+"</pre><button class='btn btn-s btn-sm' onclick='window.print()'>Imprimer</button></div>";toast("Attestation generee.","ok");loadRHAttestations();});}
+function loadRHAttestations(){rhGet("/api/rh/attestations",function(list){var el=document.getElementById("rh-at-list");if(!list.length){el.innerHTML="";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th></tr>";for(var i=0;i<list.length;i++){var a=list[i];h+="<tr><td>"+a.salarie_id+"</td><td><span class='badge badge-blue'>"+a.type_attestation+"</span></td><td>"+a.date_generation+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+var _planningView="semaine";
+var _planningDate=new Date();
+var _planningColors={"normal":"#3b82f6","astreinte":"#f59e0b","nuit":"#6366f1","dimanche":"#ef4444","ferie":"#22c55e"};
+var _statutColors={"present":"#22c55e","conge_cp":"#f97316","conge_maladie":"#e11d48","arret_maladie":"#e11d48","arret_accident_travail":"#dc2626","formation":"#0ea5e9","teletravail":"#8b5cf6"};
+
+function setPlanningView(v){_planningView=v;
+["jour","semaine","mois","annee"].forEach(function(k){var b=document.getElementById("pl-v-"+k);if(b){b.style.border="2px solid transparent";b.style.background="";b.style.color="";}});
+var ab=document.getElementById("pl-v-"+v);if(ab){ab.style.border="2px solid var(--p2)";ab.style.background="var(--p2)";ab.style.color="#fff";}
+renderPlanningView();}
+
+function planningNav(dir){
+if(_planningView==="jour"){_planningDate.setDate(_planningDate.getDate()+dir);}
+else if(_planningView==="semaine"){_planningDate.setDate(_planningDate.getDate()+7*dir);}
+else if(_planningView==="mois"){_planningDate.setMonth(_planningDate.getMonth()+dir);}
+else if(_planningView==="annee"){_planningDate.setFullYear(_planningDate.getFullYear()+dir);}
+document.getElementById("rh-pl-sem").value=_planningDate.toISOString().substring(0,10);
+renderPlanningView();}
+
+function planningGoToday(){_planningDate=new Date();document.getElementById("rh-pl-sem").value=_planningDate.toISOString().substring(0,10);renderPlanningView();}
+
+function renderPlanningView(){
+var semInput=document.getElementById("rh-pl-sem");
+if(semInput&&semInput.value){var parsed=new Date(semInput.value+"T12:00:00");if(!isNaN(parsed.getTime()))_planningDate=parsed;}
+if(!semInput.value){semInput.value=_planningDate.toISOString().substring(0,10);}
+if(_planningView==="jour")renderPlanningJour();
+else if(_planningView==="semaine")renderPlanningHebdo();
+else if(_planningView==="mois")renderPlanningMois();
+else if(_planningView==="annee")renderPlanningAnnee();}
+
+function _plFilter(){return(document.getElementById("rh-pl-filter")||{}).value||"";}
+function _plStatutFilter(){return(document.getElementById("rh-pl-statut-filter")||{}).value||"";}
+function _plFmtDate(d){return d.toLocaleDateString("fr-FR",{weekday:"long",day:"numeric",month:"long",year:"numeric"});}
+function _plChangeStatut(sel){if(!sel.value)return;var fd=new FormData();fd.append("salarie_id",sel.getAttribute("data-sid"));fd.append("date",sel.getAttribute("data-date"));fd.append("statut",sel.value);rhPost("/api/rh/planning",fd,function(){toast("Statut modifie.","ok");renderPlanningView();});}
+function _plStatutBadge(st){var c=_statutColors[st]||"#94a3b8";var labels={"present":"Present","conge_cp":"Conge CP","conge_maladie":"Arret maladie","arret_maladie":"Arret maladie","arret_accident_travail":"AT","formation":"Formation","teletravail":"Teletravail"};return "<span style='background:"+c+";color:#fff;border-radius:4px;padding:1px 6px;font-size:.75em'>"+(labels[st]||st||"Present")+"</span>";}
+function _plSlotDiv(s){var tp=s.type_poste||s.type||"normal";var bg=_planningColors[tp]||"#3b82f6";var pid=s.id||"";var sid=s.salarie_id||"";var dt=s.date||"";var h="<div style='background:"+bg+";color:#fff;border-radius:4px;padding:2px 6px;margin:1px 0;font-size:.78em;display:inline-flex;align-items:center;gap:4px;position:relative' class='pl-slot'>"+(s.heure_debut||"")+"-"+(s.heure_fin||"");if(pid){h+=" <span data-pl-action='delete' data-pl-id='"+pid+"' style='cursor:pointer;opacity:.7;font-size:.9em' title='Supprimer'>&#10005;</span>";}h+="</div>";return h;}
+
+function renderPlanningJour(){
+var ds=_planningDate.toISOString().substring(0,10);
+var label=document.getElementById("rh-pl-period-label");if(label)label.textContent=_plFmtDate(_planningDate);
+var filter=_plFilter().toLowerCase();var stFilter=_plStatutFilter();
+var url="/api/rh/planning/jour?date_jour="+ds;if(stFilter)url+="&statut="+stFilter;
+rhGet(url,function(data){
+var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
+var entrees=data.entrees||[];if(filter)entrees=entrees.filter(function(e){return(e.salarie_nom||e.salarie_id||"").toLowerCase().indexOf(filter)>=0;});
+var h="<div style='text-align:center;margin:8px 0;font-size:.85em;color:var(--tx2)'>"+data.jour+" &mdash; <b>"+data.nb_presents+"</b> present(s), <b>"+data.nb_absents+"</b> absent(s)</div>";
+h+="<table style='width:100%;border-collapse:collapse;font-size:.85em'><tr style='background:var(--p2);color:#fff'><th style='padding:8px;text-align:left'>Salarie</th><th>Horaires</th><th>Type</th><th>Statut</th></tr>";
+if(!entrees.length){h+="<tr><td colspan='4' style='text-align:center;padding:20px;color:var(--tx2)'>Aucun salarie ce jour.</td></tr>";}
+for(var i=0;i<entrees.length;i++){var e=entrees[i];var st=e.statut_reel||e.statut||"present";var stc=_statutColors[st]||"#94a3b8";
+h+="<tr style='border-bottom:1px solid var(--brd)'><td style='padding:6px;font-weight:600'>"+_esc(e.salarie_nom||e.salarie_id||"?")+"</td>";
+h+="<td style='text-align:center'>"+((e.heure_debut&&e.heure_fin)?_plSlotDiv(e):"<span style='color:#cbd5e1'>-</span>")+"</td>";
+h+="<td style='text-align:center'><span class='badge badge-blue'>"+(e.type_poste||"-")+"</span></td>";
+h+="<td style='text-align:center'>"+_plStatutBadge(st)+"</td></tr>";}
+h+="</table>";
+cal.innerHTML=h;
+_renderPlanningStats(data);});}
+
+function renderPlanningHebdo(){
+var startDate=new Date(_planningDate);startDate.setDate(startDate.getDate()-startDate.getDay()+1);
+var endDate=new Date(startDate);endDate.setDate(endDate.getDate()+6);
+var label=document.getElementById("rh-pl-period-label");
+if(label)label.textContent=startDate.toLocaleDateString("fr-FR",{day:"numeric",month:"short"})+" - "+endDate.toLocaleDateString("fr-FR",{day:"numeric",month:"short",year:"numeric"});
+var filter=_plFilter().toLowerCase();var stFilter=_plStatutFilter();
+rhGet("/api/rh/planning",function(list){
+var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
+if(Array.isArray(list)===false&&list.entrees)list=list.entrees;
+if(!Array.isArray(list))list=[];
+var jours=["Lun","Mar","Mer","Jeu","Ven","Sam","Dim"];
+var h="<table style='width:100%;border-collapse:collapse;font-size:.82em'><tr style='background:var(--p2);color:#fff'><th style='padding:8px;text-align:left;min-width:120px'>Salarie</th>";
+for(var j=0;j<7;j++){var d=new Date(startDate);d.setDate(d.getDate()+j);var isToday=d.toISOString().substring(0,10)===new Date().toISOString().substring(0,10);h+="<th style='padding:8px;text-align:center;"+(isToday?"background:#1e40af;":"")+"'>"+jours[j]+"<br><small>"+d.toLocaleDateString("fr-FR",{day:"numeric",month:"short"})+"</small></th>";}
+h+="</tr>";
+var salaries={};for(var i=0;i<list.length;i++){var p=list[i];var sid=p.salarie_nom||p.salarie_id||"?";if(filter&&sid.toLowerCase().indexOf(filter)<0)continue;var st=p.statut_reel||p.statut||"present";if(stFilter&&st!==stFilter)continue;if(!salaries[sid])salaries[sid]={statut:st,_sid:p.salarie_id||sid};var pd=new Date(p.date+"T12:00:00");for(var j=0;j<7;j++){var cd=new Date(startDate);cd.setDate(cd.getDate()+j);if(pd.toISOString().substring(0,10)===cd.toISOString().substring(0,10)){if(!salaries[sid][j])salaries[sid][j]=[];salaries[sid][j].push(p);}}}
+var nbPresent=0,nbAbsent=0;
+for(var sid in salaries){var st=salaries[sid].statut||"present";var stc=_statutColors[st]||"#94a3b8";
+h+="<tr><td style='padding:6px;font-weight:600;border-bottom:1px solid var(--brd);border-left:4px solid "+stc+"'>"+_esc(sid)+" "+_plStatutBadge(st)+" <select style='font-size:.7em;padding:1px 4px;border-radius:4px;border:1px solid var(--brd);margin-left:4px' data-sid='"+_esc(salaries[sid]._sid||sid)+"' data-date='"+startDate.toISOString().substring(0,10)+"' onchange='_plChangeStatut(this)'><option value=''>Modifier...</option><option value='present'>Present</option><option value='conge_cp'>Conge CP</option><option value='conge_maladie'>Arret maladie</option><option value='formation'>Formation</option><option value='teletravail'>Teletravail</option></select></td>";
+if(st==="present")nbPresent++;else nbAbsent++;
+for(var j=0;j<7;j++){var isToday2=false;var cd2=new Date(startDate);cd2.setDate(cd2.getDate()+j);if(cd2.toISOString().substring(0,10)===new Date().toISOString().substring(0,10))isToday2=true;
+h+="<td style='padding:4px;border-bottom:1px solid var(--brd);text-align:center;vertical-align:top;"+(isToday2?"background:rgba(59,130,246,.06);":"")+"'>";var slots=salaries[sid][j]||[];for(var k=0;k<slots.length;k++){h+=_plSlotDiv(slots[k]);}
+if(!slots.length)h+="<span style='color:#cbd5e1'>-</span>";h+="</td>";}h+="</tr>";}
+if(!Object.keys(salaries).length){h+="<tr><td colspan='8' style='text-align:center;padding:20px;color:var(--tx2)'>Aucun creneau pour cette semaine.</td></tr>";}
+h+="</table>";
+cal.innerHTML=h;
+var statsEl=document.getElementById("rh-pl-stats");if(statsEl)statsEl.innerHTML="<div class='card' style='padding:8px 14px;background:#f0fdf4;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#16a34a'>"+nbPresent+"</div><div style='font-size:.78em;color:#166534'>Presents</div></div><div class='card' style='padding:8px 14px;background:#fef2f2;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#dc2626'>"+nbAbsent+"</div><div style='font-size:.78em;color:#991b1b'>Absents</div></div>";});}
+
+function renderPlanningMois(){
+var y=_planningDate.getFullYear();var m=_planningDate.getMonth()+1;
+var moisNoms=["","Janvier","Fevrier","Mars","Avril","Mai","Juin","Juillet","Aout","Septembre","Octobre","Novembre","Decembre"];
+var label=document.getElementById("rh-pl-period-label");if(label)label.textContent=moisNoms[m]+" "+y;
+var filter=_plFilter().toLowerCase();var stFilter=_plStatutFilter();
+var url="/api/rh/planning/mois?annee="+y+"&mois="+m;if(stFilter)url+="&statut="+stFilter;
+rhGet(url,function(data){
+var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
+var jours=data.jours||[];
+var joursSem=["Lun","Mar","Mer","Jeu","Ven","Sam","Dim"];
+var h="<table style='width:100%;border-collapse:collapse;font-size:.78em;table-layout:fixed'>";
+h+="<tr style='background:var(--p2);color:#fff'>";for(var j=0;j<7;j++)h+="<th style='padding:6px;text-align:center;width:14.28%'>"+joursSem[j]+"</th>";h+="</tr>";
+var firstDay=new Date(y,m-1,1);var startDow=(firstDay.getDay()+6)%7;
+var todayStr=new Date().toISOString().substring(0,10);
+h+="<tr>";for(var i=0;i<startDow;i++)h+="<td style='border:1px solid var(--brd);padding:4px;vertical-align:top;min-height:60px'></td>";
+var cellCount=startDow;
+for(var d=0;d<jours.length;d++){if(cellCount>0&&cellCount%7===0)h+="</tr><tr>";
+var jour=jours[d];var isToday=jour.date===todayStr;
+var bgCol=isToday?"rgba(59,130,246,.1)":"";
+h+="<td style='border:1px solid var(--brd);padding:4px;vertical-align:top;min-height:70px;background:"+bgCol+"'>";
+h+="<div style='font-weight:600;font-size:1em;margin-bottom:2px;"+(isToday?"color:var(--p2);":"")+"'>"+(d+1)+"</div>";
+if(jour.nb_salaries>0){
+h+="<div style='display:flex;gap:3px;flex-wrap:wrap'>";
+if(jour.nb_presents>0)h+="<span style='background:#22c55e;color:#fff;border-radius:3px;padding:0 4px;font-size:.72em'>"+jour.nb_presents+" P</span>";
+if(jour.nb_absents>0)h+="<span style='background:#ef4444;color:#fff;border-radius:3px;padding:0 4px;font-size:.72em'>"+jour.nb_absents+" A</span>";
+h+="</div>";
+var entrees=jour.entrees||[];if(filter)entrees=entrees.filter(function(e){return(e.salarie_nom||e.salarie_id||"").toLowerCase().indexOf(filter)>=0;});
+for(var e=0;e<Math.min(entrees.length,3);e++){var en=entrees[e];var stc=_statutColors[en.statut]||"#94a3b8";
+h+="<div style='font-size:.68em;margin-top:1px;border-left:3px solid "+stc+";padding-left:3px;white-space:nowrap;overflow:hidden;text-overflow:ellipsis' title='"+_esc(en.salarie_nom||en.salarie_id)+" - "+_esc(en.statut||"present")+"'>"+_esc(en.salarie_nom||en.salarie_id||"?")+"</div>";}
+if(entrees.length>3)h+="<div style='font-size:.65em;color:var(--tx2)'>+"+(entrees.length-3)+" autres</div>";}
+h+="</td>";cellCount++;}
+while(cellCount%7!==0){h+="<td style='border:1px solid var(--brd);padding:4px'></td>";cellCount++;}
+h+="</tr></table>";
+cal.innerHTML=h;
+var statsEl=document.getElementById("rh-pl-stats");if(statsEl){var totH=data.total_heures_planifiees||0;statsEl.innerHTML="<div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:var(--p2)'>"+totH+"h</div><div style='font-size:.78em;color:var(--tx2)'>Heures planifiees</div></div>";}});}
+
+function renderPlanningAnnee(){
+var y=_planningDate.getFullYear();
+var label=document.getElementById("rh-pl-period-label");if(label)label.textContent="Annee "+y;
+var filter=_plFilter().toLowerCase();
+var url="/api/rh/planning/annee?annee="+y;if(filter)url+="&salarie_id="+encodeURIComponent(filter);
+rhGet(url,function(data){
+var cal=document.getElementById("rh-pl-calendar");if(!cal)return;
+var moisData=data.mois||[];
+var moisNoms=["","Jan","Fev","Mar","Avr","Mai","Jun","Jul","Aou","Sep","Oct","Nov","Dec"];
+var h="<div style='display:grid;grid-template-columns:repeat(4,1fr);gap:10px;padding:8px'>";
+for(var i=0;i<moisData.length;i++){var md=moisData[i];
+var pct=md.jours_travailles>0?Math.round((md.jours_travailles/(md.jours_travailles+md.jours_absence||1))*100):0;
+var barColor=pct>75?"#22c55e":(pct>50?"#f59e0b":"#ef4444");
+h+="<div class='card' style='padding:10px;cursor:pointer' onclick='_planningDate=new Date("+y+","+(md.mois-1)+",1);setPlanningView("+JSON.stringify("mois")+")'>";
+h+="<div style='font-weight:700;font-size:.95em;margin-bottom:6px'>"+moisNoms[md.mois]+"</div>";
+h+="<div style='display:flex;justify-content:space-between;font-size:.78em;color:var(--tx2)'><span>"+md.jours_travailles+"j trav.</span><span>"+md.heures_planifiees+"h</span></div>";
+if(md.jours_absence>0)h+="<div style='font-size:.75em;color:#e11d48;margin-top:2px'>"+md.jours_absence+"j absence</div>";
+h+="<div style='background:#e5e7eb;border-radius:4px;height:6px;margin-top:6px'><div style='background:"+barColor+";border-radius:4px;height:6px;width:"+pct+"%'></div></div>";
+h+="</div>";}
+h+="</div>";
+cal.innerHTML=h;
+var statsEl=document.getElementById("rh-pl-stats");if(statsEl)statsEl.innerHTML="<div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:var(--p2)'>"+data.total_heures+"h</div><div style='font-size:.78em;color:var(--tx2)'>Total heures "+y+"</div></div><div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#16a34a'>"+data.total_jours_travailles+"</div><div style='font-size:.78em;color:var(--tx2)'>Jours travailles</div></div><div class='card' style='padding:8px 14px;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#dc2626'>"+data.total_jours_absence+"</div><div style='font-size:.78em;color:var(--tx2)'>Jours absence</div></div>";});}
+
+function _renderPlanningStats(data){var el=document.getElementById("rh-pl-stats");if(!el)return;el.innerHTML="<div class='card' style='padding:8px 14px;background:#f0fdf4;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#16a34a'>"+(data.nb_presents||0)+"</div><div style='font-size:.78em;color:#166534'>Presents</div></div><div class='card' style='padding:8px 14px;background:#fef2f2;text-align:center'><div style='font-size:1.3em;font-weight:700;color:#dc2626'>"+(data.nb_absents||0)+"</div><div style='font-size:.78em;color:#991b1b'>Absents</div></div>";}
+
+function integrerSalaries(){
+var today=new Date();var nextWeek=new Date();nextWeek.setDate(nextWeek.getDate()+7);
+document.getElementById("rh-pl-int-debut").value=today.toISOString().substring(0,10);
+document.getElementById("rh-pl-int-fin").value=nextWeek.toISOString().substring(0,10);
+document.getElementById("rh-pl-integrer-section").open=true;
+document.getElementById("rh-pl-integrer-section").scrollIntoView({behavior:"smooth"});}
+
+function integrerSalariesManuel(){
+var fd=new FormData();
+fd.append("date_debut",document.getElementById("rh-pl-int-debut").value);
+fd.append("date_fin",document.getElementById("rh-pl-int-fin").value);
+fd.append("heure_debut",document.getElementById("rh-pl-int-hd").value);
+fd.append("heure_fin",document.getElementById("rh-pl-int-hf").value);
+fd.append("jours_semaine",document.getElementById("rh-pl-int-jours").value);
+rhPost("/api/rh/planning/integrer-salaries",fd,function(d){
+var res=document.getElementById("rh-pl-int-result");
+res.innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span><b>"+d.nb_entrees_creees+"</b> creneaux crees pour <b>"+d.nb_salaries+"</b> salaries.</span></div>";
+toast(d.nb_entrees_creees+" creneaux crees","ok");renderPlanningView();});}
+
+function ajouterPlanning(){var fd=new FormData();var sal=document.getElementById("rh-pl-sal").value;if(!sal){toast("Veuillez saisir un salarie.");return;}fd.append("salarie_id",sal);fd.append("date",document.getElementById("rh-pl-date").value);var dateFin=document.getElementById("rh-pl-date-fin").value;if(dateFin)fd.append("date_fin",dateFin);fd.append("heure_debut",document.getElementById("rh-pl-hd").value);fd.append("heure_fin",document.getElementById("rh-pl-hf").value);fd.append("type_poste",document.getElementById("rh-pl-type").value);var statut=(document.getElementById("rh-pl-statut")||{}).value;if(statut)fd.append("statut",statut);var jours=(document.getElementById("rh-pl-jours")||{}).value;if(jours)fd.append("jours_semaine",jours);
+rhPost("/api/rh/planning",fd,function(d){if(d.nb_creneaux_crees){toast(d.nb_creneaux_crees+" creneaux crees sur la periode.","ok");}else{toast("Planning mis a jour.","ok");}renderPlanningView();});}
+function loadRHPlanning(){var semInput=document.getElementById("rh-pl-sem");if(semInput&&!semInput.value){semInput.value=new Date().toISOString().substring(0,10);}renderPlanningView();}
+function renderCalendar(){renderPlanningView();}
+/* Interactive planning: click on slot to edit, drag to extend */
+document.addEventListener("click",function(ev){
+var target=ev.target.closest("[data-pl-action]");if(!target)return;
+var action=target.getAttribute("data-pl-action");var pid=target.getAttribute("data-pl-id");var sid=target.getAttribute("data-pl-sid");
+if(action==="delete"){if(!confirm("Supprimer ce creneau ?"))return;fetch("/api/rh/planning/"+pid,{method:"DELETE"}).then(safeJson).then(function(){toast("Creneau supprime.","ok");renderPlanningView();}).catch(function(e){toast(e.message);});}
+if(action==="edit-statut"){var newSt=target.getAttribute("data-pl-statut");var fd=new FormData();fd.append("salarie_id",sid);fd.append("date",target.getAttribute("data-pl-date"));fd.append("statut",newSt);rhPost("/api/rh/planning",fd,function(){toast("Statut modifie.","ok");renderPlanningView();});}
+});
+function voirContrat(id){window.open("/api/rh/contrats/"+id+"/document","_blank");}
+function voirBulletinDoc(el){var bid=el.dataset.bid;if(bid)window.open("/api/rh/bulletins/"+bid+"/document","_blank");}
+
+function enregEchange(){var sal=document.getElementById("rh-ec-sal").value;if(!sal){toast("Veuillez saisir le nom du salarie.");return;}var fd=new FormData();fd.append("salarie_id",sal);fd.append("objet",document.getElementById("rh-ec-obj").value);fd.append("contenu",document.getElementById("rh-ec-txt").value);fd.append("type_echange",document.getElementById("rh-ec-type").value);fd.append("date_echange",document.getElementById("rh-ec-date").value);
+rhPost("/api/rh/echanges",fd,function(){toast("Echange enregistre.","ok");loadRHEchanges();});}
+function loadRHEchanges(){rhGet("/api/rh/echanges",function(list){var el=document.getElementById("rh-ec-list");if(!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun echange.</p>";return;}var h="<table><tr><th>Salarie</th><th>Type</th><th>Date</th><th>Objet</th></tr>";for(var i=0;i<list.length;i++){var e=list[i];h+="<tr><td>"+e.salarie_id+"</td><td><span class='badge badge-blue'>"+e.type_echange+"</span></td><td>"+e.date_echange+"</td><td>"+e.objet+"</td></tr>";}h+="</table>";el.innerHTML=h;});}
+
+function loadRHAlertes(){rhGet("/api/rh/alertes",function(resp){
+var list=(resp&&resp.alertes)?resp.alertes:(Array.isArray(resp)?resp:[]);
+_rhAlertesData=list;renderAlertesList(list);});}
+var _rhAlertesData=null;
+function filtrerAlertesUrgence(urg){if(!_rhAlertesData)return;var list=_rhAlertesData;if(urg)list=list.filter(function(a){return a.urgence===urg;});renderAlertesList(list);}
+function renderAlertesList(list){var el=document.getElementById("rh-alertes-list");
+if(!list||!list.length){el.innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Aucune alerte en cours.</span></div>";return;}
+var h="<p style='color:var(--tx2);font-size:.82em;margin-bottom:8px'>"+list.length+" alerte(s)</p>";
+for(var i=0;i<list.length;i++){var a=list[i];var cls=a.urgence==="haute"?"err":(a.urgence==="moyenne"?"warn":"info");
+var icon=a.urgence==="haute"?"&#9888;":(a.urgence==="moyenne"?"&#128161;":"&#8505;");
+h+="<div class='anomalie sev-"+(a.urgence==="haute"?"high":(a.urgence==="moyenne"?"med":"low"))+"' data-toggle='1' style='margin:6px 0'>";
+h+="<div class='head'><div class='title'>"+(a.titre||a.type||"Alerte");
+if(a.est_libre)h+=" <span class='badge badge-purple' style='font-size:.68em;vertical-align:middle'>Personnalisee</span>";
+if(a.recurrence)h+=" <span class='badge badge-teal' style='font-size:.68em;vertical-align:middle'>"+a.recurrence+"</span>";
+h+="</div><div style='display:flex;gap:4px;align-items:center'>";
+if(a.echeance)h+="<span class='badge badge-amber'>"+a.echeance+"</span>";
+h+="<span class='badge badge-"+cls+"'>"+a.urgence+"</span>";
+h+="</div></div>";
+h+="<div style='font-size:.84em;color:var(--tx2);margin-top:4px'>"+(a.description||"")+"</div>";
+h+="<div class='detail'>";
+if(a.incidence_legale)h+="<p style='color:var(--r);font-weight:600;margin:4px 0'>&#9888; Consequence legale : "+a.incidence_legale+"</p>";
+if(a.reference)h+="<p style='margin:4px 0;color:var(--tx2)'>Reference : "+a.reference+"</p>";
+if(a.action_requise)h+="<p style='margin:4px 0'><strong>Action requise :</strong> "+a.action_requise+"</p>";
+if(a.notes)h+="<p style='margin:4px 0;font-style:italic;color:var(--tx2)'>Notes : "+a.notes+"</p>";
+if(a.message_personnalise)h+="<p style='margin:4px 0;color:var(--p2)'>["+a.message_personnalise+"]</p>";
+if(a.est_libre)h+="<div style='margin-top:8px'><button class='btn btn-sm' style='background:var(--ol);color:#92400e' data-action='traiterAlerte' data-id='"+a.id+"'>Marquer traitee</button> <button class='btn btn-sm btn-red' data-action='suppAlerte' data-id='"+a.id+"'>Supprimer</button></div>";
+h+="</div></div>";}
+el.innerHTML=h;}
+function creerAlerteLibre(){var titre=document.getElementById("al-titre").value;if(!titre){toast("Le titre est obligatoire.");return;}
+var fd=new FormData();fd.append("titre",titre);fd.append("description",document.getElementById("al-desc").value);fd.append("categorie",document.getElementById("al-categorie").value);fd.append("urgence",document.getElementById("al-urgence").value);fd.append("date_echeance",document.getElementById("al-echeance").value);fd.append("recurrence",document.getElementById("al-recurrence").value);fd.append("action_requise",document.getElementById("al-action").value);fd.append("destinataire",document.getElementById("al-destinataire").value);fd.append("reference_legale",document.getElementById("al-ref").value);fd.append("delai_rappel_jours",document.getElementById("al-delai").value);fd.append("notes",document.getElementById("al-notes").value);
+rhPost("/api/rh/alertes/libres",fd,function(d){document.getElementById("al-creer-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Alerte <strong>"+d.titre+"</strong> creee avec succes.</span></div>";document.getElementById("al-titre").value="";document.getElementById("al-desc").value="";document.getElementById("al-action").value="";document.getElementById("al-destinataire").value="";document.getElementById("al-ref").value="";document.getElementById("al-notes").value="";document.getElementById("al-echeance").value="";toast("Alerte personnalisee creee.","ok");});}
+function loadAlertesLibres(){rhGet("/api/rh/alertes/libres",function(list){var el=document.getElementById("rh-alertes-libres-list");
+if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune alerte personnalisee configuree. Utilisez l onglet <strong>Creer une alerte</strong> pour ajouter vos propres rappels.</p>";return;}
+var h="<p style='color:var(--tx2);font-size:.82em;margin-bottom:8px'>"+list.length+" alerte(s) personnalisee(s)</p>";
+var urgColors={"haute":"err","moyenne":"warn","info":"info"};
+var statutLabels={"active":"badge-green","traitee":"badge-blue","reportee":"badge-amber","archivee":"badge-red"};
+for(var i=0;i<list.length;i++){var a=list[i];
+h+="<div class='card' style='margin:8px 0;padding:16px;border-left:4px solid var(--"+(a.urgence==="haute"?"r":(a.urgence==="moyenne"?"o":"p3"))+")'>";
+h+="<div style='display:flex;justify-content:space-between;align-items:flex-start;flex-wrap:wrap;gap:6px'>";
+h+="<div><strong>"+a.titre+"</strong>";
+if(a.categorie&&a.categorie!=="autre")h+=" <span class='badge badge-blue'>"+a.categorie+"</span>";
+h+="</div><div style='display:flex;gap:4px'>";
+h+="<span class='badge badge-"+(urgColors[a.urgence]||"info")+"'>"+a.urgence+"</span>";
+h+="<span class='badge "+(statutLabels[a.statut]||"badge-green")+"'>"+(a.statut||"active")+"</span>";
+if(a.recurrence)h+="<span class='badge badge-teal'>"+a.recurrence+"</span>";
+h+="</div></div>";
+if(a.description)h+="<div style='font-size:.86em;color:var(--tx);margin-top:6px'>"+a.description+"</div>";
+var details=[];
+if(a.date_echeance)details.push("<strong>Echeance :</strong> "+a.date_echeance);
+if(a.action_requise)details.push("<strong>Action :</strong> "+a.action_requise);
+if(a.destinataire)details.push("<strong>Responsable :</strong> "+a.destinataire);
+if(a.reference_legale)details.push("<strong>Ref. legale :</strong> "+a.reference_legale);
+if(a.delai_rappel_jours)details.push("<strong>Rappel :</strong> "+a.delai_rappel_jours+" jours avant");
+if(details.length)h+="<div style='margin-top:8px;font-size:.82em;color:var(--tx2)'>"+details.join(" &bull; ")+"</div>";
+if(a.notes)h+="<div style='margin-top:4px;font-size:.82em;font-style:italic;color:var(--tx2)'>"+a.notes+"</div>";
+h+="<div style='margin-top:10px;display:flex;gap:6px'>";
+if(a.statut!=="traitee")h+="<button class='btn btn-sm btn-green' data-action='traiterAlerte' data-id='"+a.id+"'>Traitee</button>";
+if(a.statut!=="archivee")h+="<button class='btn btn-sm btn-s' data-action='archiverAlerte' data-id='"+a.id+"'>Archiver</button>";
+h+="<button class='btn btn-sm btn-red' data-action='suppAlerte' data-id='"+a.id+"'>Supprimer</button>";
+h+="</div></div>";}
+el.innerHTML=h;});}
+function marquerAlerteTraitee(id){var fd=new FormData();fd.append("statut","traitee");fetch("/api/rh/alertes/libres/"+id,{method:"PUT",body:fd}).then(safeJson).then(function(){toast("Alerte marquee comme traitee.","ok");loadAlertesLibres();loadRHAlertes();}).catch(function(e){toast(e.message);});}
+function archiverAlerteLibre(id){var fd=new FormData();fd.append("statut","archivee");fetch("/api/rh/alertes/libres/"+id,{method:"PUT",body:fd}).then(safeJson).then(function(){toast("Alerte archivee.","ok");loadAlertesLibres();loadRHAlertes();}).catch(function(e){toast(e.message);});}
+function supprimerAlerteLibre(id){if(!confirm("Supprimer cette alerte ?"))return;fetch("/api/rh/alertes/libres/"+id,{method:"DELETE"}).then(safeJson).then(function(){toast("Alerte supprimee.","ok");loadAlertesLibres();loadRHAlertes();}).catch(function(e){toast(e.message);});}
+function exportAlertes(){if(!_rhAlertesData||!_rhAlertesData.length)return;var csv="Urgence;Titre;Description;Reference;Action requise;Echeance\n";for(var i=0;i<_rhAlertesData.length;i++){var a=_rhAlertesData[i];csv+='"'+(a.urgence||"")+'";"'+(a.titre||"")+'";"'+((a.description||"").replace(/"/g,"'"))+'";"'+(a.reference||"")+'";"'+(a.action_requise||"")+'";"'+(a.echeance||"")+'"'+"\n";}var b=new Blob([csv],{type:"text/csv;charset=utf-8"});var u=URL.createObjectURL(b);var l=document.createElement("a");l.href=u;l.download="alertes_rh.csv";l.click();URL.revokeObjectURL(u);}
+function prefillBulletin(cid){if(!cid)return;rhGet("/api/rh/contrats",function(list){for(var i=0;i<list.length;i++){var c=list[i];if(c.id===cid){document.getElementById("rh-bp-nom").value=c.nom_salarie||c.nom||"";document.getElementById("rh-bp-prenom").value=c.prenom_salarie||c.prenom||"";document.getElementById("rh-bp-brut").value=c.salaire_brut||"";if(c.duree_hebdo)document.getElementById("rh-bp-heures").value=(parseFloat(c.duree_hebdo)/35*151.67).toFixed(2);break;}}});}
+function genererBulletin(){var nom=document.getElementById("rh-bp-nom").value;var brut=document.getElementById("rh-bp-brut").value;if(!nom){toast("Veuillez saisir le nom du salarie.");return;}if(!brut||parseFloat(brut)<=0){toast("Veuillez saisir un salaire brut valide.");return;}var fd=new FormData();fd.append("contrat_id",document.getElementById("rh-bp-ctr").value);fd.append("nom_salarie",document.getElementById("rh-bp-nom").value);fd.append("prenom_salarie",document.getElementById("rh-bp-prenom").value);fd.append("mois",document.getElementById("rh-bp-mois").value);fd.append("salaire_brut",document.getElementById("rh-bp-brut").value||"0");fd.append("est_cadre",document.getElementById("rh-bp-cadre").value);fd.append("heures_supplementaires",document.getElementById("rh-bp-hs").value||"0");fd.append("primes",document.getElementById("rh-bp-primes").value||"0");fd.append("avantages_nature",document.getElementById("rh-bp-avantages").value||"0");fd.append("absences_jours",document.getElementById("rh-bp-abs").value||"0");fd.append("heures_travaillees",document.getElementById("rh-bp-heures").value||"151.67");
+rhPost("/api/rh/bulletins/generer",fd,function(d){
+var h="";
+if(d.alertes&&d.alertes.length){for(var a=0;a<d.alertes.length;a++){h+="<div class='al "+(d.alertes[a].niveau==="haute"?"err":"warn")+"'><span class='ai'>&#9888;</span><span>"+d.alertes[a].message+"</span></div>";}}
+h+="<div class='al ok'><span class='ai'>&#9989;</span><span>Bulletin genere pour <strong>"+d.mois+"</strong> - "+(d.prenom_salarie||"")+" "+(d.nom_salarie||"")+"</span></div>";
+h+="<div class='card' style='background:var(--pl);margin-top:8px'>";
+h+="<div class='g4'><div class='sc blue'><div class='val'>"+(d.brut_total||0).toFixed(2)+"</div><div class='lab'>Brut total</div></div><div class='sc green'><div class='val'>"+(d.net_a_payer||0).toFixed(2)+"</div><div class='lab'>Net a payer</div></div><div class='sc amber'><div class='val'>"+(d.cout_total_employeur||0).toFixed(2)+"</div><div class='lab'>Cout employeur</div></div><div class='sc'><div class='val'>"+(d.taux_horaire||0).toFixed(2)+" EUR/h</div><div class='lab'>Taux horaire</div></div></div>";
+h+="<div style='display:flex;gap:12px;flex-wrap:wrap;margin:10px 0;font-size:.84em'>";
+h+="<span><strong>Heures:</strong> "+(d.heures_travaillees||151.67)+"h</span>";
+h+="<span><strong>Base:</strong> "+(d.salaire_base||0).toFixed(2)+" EUR</span>";
+if(d.heures_supplementaires>0)h+="<span><strong>HS:</strong> "+d.heures_supplementaires+"h = "+(d.montant_hs||0).toFixed(2)+" EUR</span>";
+if(d.retenue_absences>0)h+="<span style='color:var(--r)'><strong>Absences:</strong> -"+(d.retenue_absences||0).toFixed(2)+" EUR</span>";
+h+="</div>";
+if(d.lignes){h+="<table style='margin-top:10px'><tr><th>Rubrique</th><th class='num'>Base</th><th class='num'>Taux sal.</th><th class='num'>Part sal.</th><th class='num'>Taux pat.</th><th class='num'>Part pat.</th></tr>";for(var i=0;i<d.lignes.length;i++){var l=d.lignes[i];h+="<tr><td>"+l.libelle+"</td><td class='num'>"+(l.base||0).toFixed(2)+"</td><td class='num'>"+(l.taux_salarial||0).toFixed(2)+"%</td><td class='num'>"+(l.montant_salarial||0).toFixed(2)+"</td><td class='num'>"+(l.taux_patronal||0).toFixed(2)+"%</td><td class='num'>"+(l.montant_patronal||0).toFixed(2)+"</td></tr>";}h+="</table>";}
+h+="<button class='btn btn-s btn-sm' style='margin-top:8px' data-bid='"+d.id+"' onclick='voirBulletinDoc(this)'>Visualiser / Imprimer</button></div>";
+document.getElementById("rh-bp-res").innerHTML=h;loadRHBulletins();});}
+function loadRHBulletins(){rhGet("/api/rh/bulletins",function(list){var el=document.getElementById("rh-bp-list");if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Aucun bulletin.</p>";return;}
+var h="<table><tr><th>Mois</th><th>Salarie</th><th class='num'>Brut</th><th class='num'>Net</th><th>Actions</th></tr>";
+for(var i=0;i<list.length;i++){var b=list[i];h+="<tr><td>"+b.mois+"</td><td>"+(b.nom_salarie||"-")+"</td><td class='num'>"+(b.brut_total||0).toFixed(2)+"</td><td class='num'>"+(b.net_a_payer||0).toFixed(2)+"</td><td><button class='btn btn-s btn-sm' onclick='window.open("+JSON.stringify("/api/rh/bulletins/"+b.id+"/document")+","+JSON.stringify("_blank")+")'>Voir</button></td></tr>";}
+h+="</table>";el.innerHTML=h;});}
+function sauverAlertConfig(){var fd=new FormData();fd.append("type_alerte",document.getElementById("cfg-al-type").value);fd.append("actif",document.getElementById("cfg-al-actif").value);fd.append("delai_jours",document.getElementById("cfg-al-delai").value);var msg=document.getElementById("cfg-al-msg").value;if(msg)fd.append("message_personnalise",msg);
+rhPost("/api/rh/alertes/personnaliser",fd,function(d){document.getElementById("cfg-al-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Configuration alerte sauvegardee : "+d.type_alerte+" ("+(d.actif?"actif":"inactif")+")</span></div>";loadAlertConfigs();toast("Configuration alerte sauvegardee.","ok");});}
+function creerAlerteLibreDepuisConfig(){var titre=document.getElementById("cfg-al-libre-titre").value;if(!titre){toast("Le nom de l alerte est obligatoire.");return;}var fd=new FormData();fd.append("titre",titre);fd.append("urgence",document.getElementById("cfg-al-libre-urgence").value);fd.append("date_echeance",document.getElementById("cfg-al-libre-echeance").value||"");fd.append("description",document.getElementById("cfg-al-libre-desc").value||"");rhPost("/api/rh/alertes/libres",fd,function(d){document.getElementById("cfg-al-libre-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Alerte <strong>"+d.titre+"</strong> creee.</span></div>";document.getElementById("cfg-al-libre-titre").value="";document.getElementById("cfg-al-libre-desc").value="";document.getElementById("cfg-al-libre-echeance").value="";toast("Alerte creee.","ok");});}
+function loadAlertConfigs(){rhGet("/api/rh/alertes/config",function(list){var el=document.getElementById("cfg-alertes-list");if(!list||!list.length){el.innerHTML="<p style='color:var(--tx2)'>Configuration par defaut (toutes alertes actives).</p>";return;}
+var h="<table><tr><th>Type</th><th>Actif</th><th>Delai (j)</th><th>Message</th></tr>";for(var i=0;i<list.length;i++){var c=list[i];h+="<tr><td><span class='badge "+(c.actif?"badge-green":"badge-red")+"'>"+c.type_alerte+"</span></td><td>"+(c.actif?"Oui":"Non")+"</td><td class='num'>"+(c.delai_jours||30)+"</td><td>"+(c.message_personnalise||"-")+"</td></tr>";}
+h+="</table>";el.innerHTML=h;});}
+
+/* === CONFIGURATION === */
+var _urssafComptes=[];
+function sauverEntete(){var fd=new FormData();fd.append("nom_entreprise",document.getElementById("cfg-nom").value);fd.append("logo_url",document.getElementById("cfg-logo").value);fd.append("adresse",document.getElementById("cfg-adresse").value);fd.append("telephone",document.getElementById("cfg-tel").value);fd.append("email",document.getElementById("cfg-email").value);fd.append("siret",document.getElementById("cfg-siret").value);fd.append("code_naf",document.getElementById("cfg-naf").value);fd.append("forme_juridique",document.getElementById("cfg-forme").value);fd.append("capital",document.getElementById("cfg-capital").value);fd.append("rcs",document.getElementById("cfg-rcs").value);fd.append("tva_intracom",document.getElementById("cfg-tva").value);
+rhPost("/api/config/entete",fd,function(){toast("En-tete sauvegarde.","ok");document.getElementById("cfg-res").innerHTML="<div class='al ok'><span class='ai'>&#9989;</span><span>Configuration enregistree.</span></div>";});}
+function loadEntete(){rhGet("/api/config/entete",function(d){if(!d||!d.nom_entreprise)return;document.getElementById("cfg-nom").value=d.nom_entreprise||"";document.getElementById("cfg-adresse").value=d.adresse||"";document.getElementById("cfg-tel").value=d.telephone||"";document.getElementById("cfg-email").value=d.email||"";document.getElementById("cfg-siret").value=d.siret||"";document.getElementById("cfg-naf").value=d.code_naf||"";document.getElementById("cfg-forme").value=d.forme_juridique||"";document.getElementById("cfg-capital").value=d.capital||"";document.getElementById("cfg-rcs").value=d.rcs||"";document.getElementById("cfg-tva").value=d.tva_intracom||"";document.getElementById("cfg-logo").value=d.logo_url||"";});}
+
+function ajouterCompteURSSAF(){var c={siret:document.getElementById("urssaf-siret").value,compte:document.getElementById("urssaf-compte").value,caisse:document.getElementById("urssaf-caisse").value,taux_at:document.getElementById("urssaf-at").value};if(!c.siret||!c.compte){toast("SIRET et N compte obligatoires.");return;}_urssafComptes.push(c);renderComptesURSSAF();toast("Compte URSSAF ajoute.","ok");}
+function renderComptesURSSAF(){var el=document.getElementById("urssaf-list");if(!_urssafComptes.length){el.innerHTML="";return;}var h="<table><tr><th>SIRET</th><th>N Compte</th><th>Caisse</th><th>Taux AT</th></tr>";for(var i=0;i<_urssafComptes.length;i++){var c=_urssafComptes[i];h+="<tr><td>"+c.siret+"</td><td>"+c.compte+"</td><td>"+c.caisse+"</td><td>"+c.taux_at+"%</td></tr>";}h+="</table>";el.innerHTML=h;}
+
+/* === SIGNATURE ELECTRONIQUE === */
+function signerDocument(){var fd=new FormData();fd.append("document_id",gv("sig-docid"));fd.append("document_nom",gv("sig-docnom"));fd.append("signataire_nom",gv("sig-nom"));fd.append("signataire_email",gv("sig-email"));fd.append("signataire_qualite",gv("sig-qualite"));fd.append("niveau_signature",gv("sig-niveau"));fd.append("motif",gv("sig-motif"));
+if(!gv("sig-docid")||!gv("sig-nom")||!gv("sig-email")){toast("Document, nom et email du signataire obligatoires.");return;}
+fetch("/api/config/signature",{method:"POST",body:fd}).then(safeJson).then(function(s){
+var h="<div class='al ok' style='margin-bottom:12px'><span class='ai'>&#9989;</span><span><strong>Document signe avec succes</strong> — "+_esc(s.niveau)+" conforme eIDAS</span></div>";
+h+="<div class='g4'><div class='sc blue'><div class='val'>"+_esc(s.niveau)+"</div><div class='lab'>Niveau</div></div><div class='sc green'><div class='val'>Valide</div><div class='lab'>Statut</div></div><div class='sc'><div class='val'>"+_esc(s.horodatage.substring(0,19))+"</div><div class='lab'>Horodatage</div></div><div class='sc'><div class='val'>"+_esc(s.empreinte_sha256.substring(0,16))+"...</div><div class='lab'>Empreinte SHA-256</div></div></div>";
+h+="<table style='margin-top:12px'><tr><th>Champ</th><th>Valeur</th></tr>";
+h+="<tr><td>Document</td><td><strong>"+_esc(s.document_nom)+"</strong> ("+_esc(s.document_id)+")</td></tr>";
+h+="<tr><td>Signataire</td><td>"+_esc(s.signataire_nom)+" ("+_esc(s.signataire_email)+")</td></tr>";
+h+="<tr><td>Qualite</td><td>"+_esc(s.signataire_qualite||"-")+"</td></tr>";
+h+="<tr><td>Motif</td><td>"+_esc(s.motif||"-")+"</td></tr>";
+h+="<tr><td>Reference eIDAS</td><td>"+_esc(s.reference_eidas)+"</td></tr>";
+h+="<tr><td>Valeur juridique</td><td><strong>"+_esc(s.valeur_juridique)+"</strong></td></tr>";
+h+="<tr><td>Empreinte SHA-256</td><td style='font-family:monospace;font-size:.82em'>"+_esc(s.empreinte_sha256)+"</td></tr>";
+h+="</table>";
+document.getElementById("sig-res").innerHTML=h;toast("Signature "+s.niveau+" enregistree.","ok");
+}).catch(function(e){toast(e.message);});}
+function loadSignatures(){fetch("/api/config/signatures").then(safeJson).then(function(r){
+var el=document.getElementById("sig-list");
+if(!r.signatures||!r.signatures.length){el.innerHTML="<p style='color:var(--tx2);font-style:italic'>Aucune signature enregistree.</p>";return;}
+var h="<table><tr><th>Document</th><th>Signataire</th><th>Niveau</th><th>Date</th><th>Empreinte</th><th>Statut</th><th></th></tr>";
+for(var i=0;i<r.signatures.length;i++){var s=r.signatures[i];
+h+="<tr><td><strong>"+_esc(s.document_nom||s.document_id)+"</strong></td><td>"+_esc(s.signataire_nom)+"<br><span style='font-size:.8em;color:var(--tx2)'>"+_esc(s.signataire_email)+"</span></td><td><span class='badge "+(s.niveau==="SEQ"?"badge-green":"badge-blue")+"'>"+s.niveau+"</span></td><td style='font-size:.84em'>"+_esc(s.horodatage.substring(0,19))+"</td><td style='font-family:monospace;font-size:.78em'>"+_esc(s.empreinte_sha256.substring(0,12))+"...</td><td><span class='badge badge-green'>"+_esc(s.statut)+"</span></td><td><button class='btn btn-s btn-sm' onclick='verifierSignature("+JSON.stringify(s.id)+")'>Verifier</button></td></tr>";}
+h+="</table>";el.innerHTML=h;
+}).catch(function(e){toast(e.message);});}
+function verifierSignature(id){fetch("/api/config/signature/"+id+"/verifier").then(safeJson).then(function(r){
+toast("Signature "+r.signature.niveau+" — Integrite: "+r.integrite+" — Confiance: "+r.niveau_confiance,"ok");
+}).catch(function(e){toast(e.message);});}
+
+/* === JOURNAL AUDIT MULTI-UTILISATEURS === */
+function loadAuditLog(){fetch("/api/audit-log?limit=200").then(safeJson).then(function(logs){
+var el=document.getElementById("cfg-audit-log");
+if(!logs||!logs.length){el.innerHTML="<p style='color:var(--tx2)'>Aucune action enregistree.</p>";return;}
+var h="<table><tr><th>Date</th><th>Utilisateur</th><th>Action</th><th>Details</th></tr>";
+for(var i=logs.length-1;i>=Math.max(0,logs.length-100);i--){var l=logs[i];
+h+="<tr><td style='font-size:.82em;white-space:nowrap'>"+_esc((l.date||"").substring(0,19))+"</td><td><strong>"+_esc(l.profil)+"</strong>"+(l.tenant_id?" <span style='font-size:.75em;color:var(--tx2)'>("+_esc(l.tenant_id)+")</span>":"")+"</td><td><span class='badge badge-blue'>"+_esc(l.action)+"</span></td><td style='font-size:.84em;color:var(--tx2)'>"+_esc(l.details||"-")+"</td></tr>";}
+h+="</table>";el.innerHTML=h;
+}).catch(function(e){toast(e.message);});}
+
+/* === HELPERS === */
+function _esc(s){if(!s)return"";return String(s).replace(/&/g,"&amp;").replace(/</g,"&lt;").replace(/>/g,"&gt;").replace(/"/g,"&quot;");}
+
+/* === TOAST === */
+var _toastStack=[];
+function toast(msg,type){
+type=type||"err";var d=document.createElement("div");
+d.setAttribute("role","alert");d.setAttribute("aria-live","polite");
+var offset=20+_toastStack.length*60;
+d.style.cssText="position:fixed;top:"+offset+"px;right:20px;z-index:9999;padding:14px 20px;border-radius:12px;font-size:.88em;max-width:420px;box-shadow:0 8px 30px rgba(0,0,0,.15);font-family:inherit;transform:translateX(120%);transition:transform .35s cubic-bezier(.4,0,.2,1),opacity .3s;display:flex;align-items:center;gap:8px";
+var icon="";
+if(type==="ok"){d.style.background="#f0fdf4";d.style.color="#166534";d.style.border="1px solid #bbf7d0";icon="&#9989; ";}
+else if(type==="warn"||type==="info"){d.style.background="#eff6ff";d.style.color="#1e40af";d.style.border="1px solid #bfdbfe";icon="&#128161; ";}
+else{d.style.background="#fef2f2";d.style.color="#991b1b";d.style.border="1px solid #fecaca";icon="&#9888; ";}
+d.innerHTML="<span>"+icon+"<"+"/span><span>"+msg.replace(RegExp(String.fromCharCode(60),"g"),"&lt;").replace(/>/g,"&gt;")+"<"+"/span>";
+document.body.appendChild(d);_toastStack.push(d);
+requestAnimationFrame(function(){requestAnimationFrame(function(){d.style.transform="translateX(0)";});});
+setTimeout(function(){d.style.opacity="0";d.style.transform="translateX(120%)";setTimeout(function(){d.remove();var idx=_toastStack.indexOf(d);if(idx>-1)_toastStack.splice(idx,1);},350);},4000);}
+
+/* === GLOBAL BUTTON CLICK FEEDBACK === */
+document.addEventListener("click",function(e){
+var btn=e.target.closest(".btn-blue:not(:disabled):not(.loading)");
+if(!btn||!btn.getAttribute("onclick"))return;
+/* Add brief visual feedback for all blue buttons */
+btn.style.opacity="0.8";
+setTimeout(function(){if(btn)btn.style.opacity="";},300);
+},true);
+
+/* === DELEGATED CLICK HANDLERS === */
+document.addEventListener("click",function(e){var btn=e.target.closest("[data-action]");if(!btn)return;var action=btn.dataset.action;var id=btn.dataset.id;e.stopPropagation();if(action==="dashTI"&&typeof voirDashTI==="function")voirDashTI(id);else if(action==="suppTI"&&typeof supprimerTI==="function")supprimerTI(id);else if(action==="traiterAlerte"&&typeof marquerAlerteTraitee==="function")marquerAlerteTraitee(id);else if(action==="suppAlerte"&&typeof supprimerAlerteLibre==="function")supprimerAlerteLibre(id);else if(action==="archiverAlerte"&&typeof archiverAlerteLibre==="function")archiverAlerteLibre(id);});
+
+/* === KEYBOARD NAV === */
+document.addEventListener("keydown",function(e){
+if(e.key==="Escape"){closeSidebar();}
+if(e.key==="Enter"&&e.target.classList.contains("nl")){e.target.click();}
+if(e.altKey&&e.key>="1"&&e.key<="9"){
+var sections=["dashboard","analyse","biblio","compta","factures","dsn","rh","simulation","veille"];
+var idx=parseInt(e.key)-1;
+if(idx<sections.length){e.preventDefault();showS(sections[idx]);}
+}
+});
+
+/* === NAVIGATION AUDIT SYSTEM === */
+function auditNavigation(){
+var report={ok:[],warn:[],err:[],timestamp:new Date().toISOString()};
+
+/* 1. Check all sidebar navigation links */
+var sidebarLinks=document.querySelectorAll(".sidebar .nl[onclick]");
+sidebarLinks.forEach(function(link){
+var match=link.getAttribute("onclick").match(/showS\(['"](\w+)['"]/);
+if(!match){report.warn.push("Sidebar link sans section: "+link.textContent.trim());return;}
+var secId="s-"+match[1];
+var sec=document.getElementById(secId);
+if(sec){report.ok.push("Section '"+match[1]+"' ("+secId+") existe");}
+else{report.err.push("Section MANQUANTE: "+secId+" (lien: "+link.textContent.trim()+")");}
+});
+
+/* 2. Check all tab panels have matching content divs */
+var tabSystems=[
+{tabs:"#compta-tabs .tab",prefix:"ct-",section:"Comptabilite"},
+{tabs:"#rh-tabs .tab",prefix:"rh-",section:"RH"},
+{tabs:"#s-simulation .tabs .tab",prefix:"sim-",section:"Simulation"},
+{tabs:"#fact-tabs .tab",prefix:"ft-",section:"Factures"}
+];
+tabSystems.forEach(function(ts){
+var tabs=document.querySelectorAll(ts.tabs);
+tabs.forEach(function(tab){
+var onclick=tab.getAttribute("onclick")||"";
+var match=onclick.match(/show\w+Tab\(['"](\w+)['"]/);
+if(!match)return;
+var tcId=ts.prefix+match[1];
+var tc=document.getElementById(tcId);
+if(tc){report.ok.push(ts.section+" tab '"+match[1]+"' -> #"+tcId+" existe");}
+else{report.err.push(ts.section+" tab '"+match[1]+"' -> #"+tcId+" MANQUANT");}
+});
+});
+
+/* 3. Check all blue buttons have valid onclick handlers */
+var blueButtons=document.querySelectorAll(".btn-blue[onclick]");
+blueButtons.forEach(function(btn){
+var onclick=btn.getAttribute("onclick");
+var funcMatch=onclick.match(/^(\w+)\(/);
+if(!funcMatch)return;
+var funcName=funcMatch[1];
+if(typeof window[funcName]==="function"){
+report.ok.push("Bouton '"+btn.textContent.trim().substring(0,30)+"' -> "+funcName+"() OK");
+}else{
+report.err.push("Bouton '"+btn.textContent.trim().substring(0,30)+"' -> "+funcName+"() FONCTION MANQUANTE");
+}
+});
+
+/* 4. Check all form inputs referenced by buttons exist */
+var criticalInputs=[
+{id:"rh-pl-sem",label:"Planning date"},
+{id:"gl-dd",label:"Compta date debut"},
+{id:"gl-df",label:"Compta date fin"},
+{id:"em-search",label:"Ecritures recherche"},
+{id:"rh-at-sal",label:"Attestation salarie"},
+{id:"rh-ctr-nom",label:"Contrat nom"},
+{id:"rh-bp-nom",label:"Bulletin nom"}
+];
+criticalInputs.forEach(function(inp){
+var el=document.getElementById(inp.id);
+if(el){report.ok.push("Input '"+inp.label+"' (#"+inp.id+") present");}
+else{report.err.push("Input MANQUANT: '"+inp.label+"' (#"+inp.id+")");}
+});
+
+/* 5. Check disabled buttons have proper visual styling */
+var disabledBtns=document.querySelectorAll(".btn-blue:disabled");
+disabledBtns.forEach(function(btn){
+report.warn.push("Bouton desactive: '"+btn.textContent.trim().substring(0,30)+"' (ID: "+(btn.id||"sans id")+")");
+});
+
+/* Summary */
+var summary="Navigation Audit - "+report.timestamp+"\n";
+summary+="OK: "+report.ok.length+" | Warnings: "+report.warn.length+" | Erreurs: "+report.err.length+"\n\n";
+if(report.err.length){summary+="=== ERREURS ===\n";report.err.forEach(function(e){summary+="  [ERR] "+e+"\n";});}
+if(report.warn.length){summary+="\n=== AVERTISSEMENTS ===\n";report.warn.forEach(function(w){summary+="  [WARN] "+w+"\n";});}
+
+console.log("%c[Navigation Audit]","color:#2563eb;font-weight:bold","\n"+summary);
+
+/* Show results in toast */
+if(report.err.length){toast(report.err.length+" erreur(s) de navigation detectee(s). Voir la console (F12).");}
+else if(report.warn.length){toast(report.warn.length+" avertissement(s). Navigation globalement OK.","warn");}
+else{toast("Audit navigation : tout est OK ("+report.ok.length+" verifications).","ok");}
+
+return report;
+}
+
+/* Run audit automatically on load (results in console only - dev tool) */
+function _autoAuditNav(){
+try{
+var r=auditNavigation();
+if(r.err.length>0){console.warn("[Nav Audit] "+r.err.length+" erreur(s) detectee(s)");}
+}catch(e){console.error("[Nav Audit] Erreur audit:",e);}
+}
+
+/* === INITIALIZATION === */
+(function initApp(){
+loadDash();
+loadDashServer();
+/* Delayed navigation audit (after DOM fully rendered) */
+setTimeout(_autoAuditNav,2000);
+})();
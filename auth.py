@@ -5,13 +5,19 @@ Zero dependance externe (stdlib uniquement).
 Compatible OVHcloud (persistant) et Vercel (in-memory).
 """
 
+import asyncio
 import base64
 import hashlib
 import hmac
 import json
+import logging
 import os
+import sqlite3
+import threading
 import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional
 
@@ -26,12 +32,31 @@ if SECRET_KEY == _DEFAULT_SECRET and os.getenv("NORMACHECK_ENV") in ("production
         "Generez une cle avec: python -c \"import secrets; print(secrets.token_urlsafe(64))\""
     )
 TOKEN_EXPIRY_HOURS = int(os.getenv("NORMACHECK_TOKEN_EXPIRY", "24"))
-PBKDF2_ITERATIONS = 150_000
+PBKDF2_ITERATIONS = int(os.getenv("NORMACHECK_PBKDF2_ITERATIONS", "150000"))
+# Iterations implicites des hash enregistres sans champ "password_iterations"
+_LEGACY_PBKDF2_ITERATIONS = 150_000
+# Nombre max de derivations PBKDF2 simultanees (hors boucle asyncio)
+KDF_MAX_WORKERS = int(os.getenv("NORMACHECK_KDF_WORKERS", "2"))
 MIN_PASSWORD_LENGTH = 12
 
 # --- Token blacklist (revocation) ---
-# Stocke les JTI (JWT ID) des tokens revoques avec leur date d'expiration
+# Miroir local des JTI (JWT ID) revoques avec leur date d'expiration.
+# En OVHcloud, la source de verite est le RevocationStore SQLite partage
+# entre workers ; le miroir est resynchronise au plus toutes les
+# REVOCATION_SYNC_SECONDS.
 _token_blacklist: dict[str, float] = {}  # jti -> exp timestamp
+_revocation_store = None
+_revocation_seq = 0
+_revocation_checked_at = 0.0
+REVOCATION_SYNC_SECONDS = 1.0
+
+# --- Cache des tokens verifies ---
+# sha256(token) -> (expiration du cache, payload) : evite base64/JSON/HMAC
+# sur les requetes repetees d'une meme session.
+TOKEN_CACHE_SIZE = int(os.getenv("NORMACHECK_TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_TTL = 300  # secondes
+_token_cache: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
 
 # --- Email verification codes ---
 # Stocke les codes de verification: email -> {code, expires, attempts}
@@ -55,29 +80,70 @@ if _IS_OVH:
         _users = _users_store.load()
         _dashboard_store = PersistentStore("dashboards", default={})
         _dashboards = _dashboard_store.load()
+        from persistence import RevocationStore
+        _revocation_store = RevocationStore("revoked_tokens")
     except ImportError:
         pass
 
+logger = logging.getLogger("normacheck")
+
 
 # =========================================
 # PASSWORD HASHING (PBKDF2-SHA256, stdlib)
 # =========================================
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    iterations = iterations or PBKDF2_ITERATIONS
     salt = os.urandom(16).hex()
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), PBKDF2_ITERATIONS)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
     return f"{salt}${dk.hex()}"
 
 
-def verify_password(password: str, stored: str) -> bool:
+def verify_password(password: str, stored: str, iterations: Optional[int] = None) -> bool:
     parts = stored.split("$", 1)
     if len(parts) != 2:
         return False
+    iterations = iterations or PBKDF2_ITERATIONS
     salt = parts[0]
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), PBKDF2_ITERATIONS)
+    dk = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
     return hmac.compare_digest(f"{salt}${dk.hex()}", stored)
 
 
+# =========================================
+# KDF HORS BOUCLE ASYNCIO (pool de threads borne)
+# =========================================
+# hashlib.pbkdf2_hmac libere le GIL : executer la derivation dans un pool
+# dedie evite de bloquer les autres requetes du worker pendant un login.
+# La taille du pool plafonne le nombre de KDF simultanees (rafales de logins).
+
+_kdf_executor = ThreadPoolExecutor(max_workers=KDF_MAX_WORKERS, thread_name_prefix="normacheck-kdf")
+
+
+async def _run_kdf(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_kdf_executor, fn, *args)
+
+
+async def hash_password_async(password: str, iterations: Optional[int] = None) -> str:
+    """Variante non bloquante de hash_password (pool KDF)."""
+    return await _run_kdf(hash_password, password, iterations)
+
+
+async def verify_password_async(password: str, stored: str, iterations: Optional[int] = None) -> bool:
+    """Variante non bloquante de verify_password (pool KDF)."""
+    return await _run_kdf(verify_password, password, stored, iterations)
+
+
+def _password_iterations(user: dict) -> int:
+    return user.get("password_iterations", _LEGACY_PBKDF2_ITERATIONS)
+
+
+def _set_password_hash(user: dict, password_hash: str) -> None:
+    """Enregistre un hash calcule avec les parametres courants."""
+    user["password_hash"] = password_hash
+    user["password_iterations"] = PBKDF2_ITERATIONS
+
+
 # =========================================
 # JWT (HMAC-SHA256, stdlib)
 # =========================================
@@ -100,7 +166,8 @@ def jwt_encode(payload: dict) -> str:
     return f"{h}.{p}.{_b64url_encode(sig)}"
 
 
-def jwt_decode(token: str) -> Optional[dict]:
+def _jwt_verify(token: str) -> Optional[dict]:
+    """Verifie la signature et retourne le payload (sans controle exp/revocation)."""
     try:
         parts = token.split(".")
         if len(parts) != 3:
@@ -111,26 +178,105 @@ def jwt_decode(token: str) -> Optional[dict]:
         if not hmac.compare_digest(expected, actual):
             return None
         payload = json.loads(_b64url_decode(parts[1]))
-        if payload.get("exp") and payload["exp"] < time.time():
+        if not isinstance(payload, dict):
             return None
-        # Verifier si le token a ete revoque
-        jti = payload.get("jti")
-        if jti and jti in _token_blacklist:
+        if payload.get("exp") and not isinstance(payload["exp"], (int, float)):
             return None
         return payload
     except Exception:
         return None
 
 
+def _token_cache_get(key: bytes) -> Optional[dict]:
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            del _token_cache[key]
+            return None
+        _token_cache.move_to_end(key)
+        return entry[1]
+
+
+def _token_cache_put(key: bytes, payload: dict):
+    expires = time.time() + TOKEN_CACHE_TTL
+    if payload.get("exp"):
+        expires = min(expires, payload["exp"])
+    with _token_cache_lock:
+        _token_cache[key] = (expires, payload)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+
+def _token_cache_evict(jtis: set):
+    """Retire du cache les tokens dont le JTI vient d'etre revoque."""
+    with _token_cache_lock:
+        for key in [k for k, (_, p) in _token_cache.items() if p.get("jti") in jtis]:
+            del _token_cache[key]
+
+
+def _sync_revocations():
+    """Importe les revocations faites par les autres workers."""
+    global _revocation_seq, _revocation_checked_at
+    if _revocation_store is None:
+        return
+    now = time.monotonic()
+    if now - _revocation_checked_at < REVOCATION_SYNC_SECONDS:
+        return
+    _revocation_checked_at = now
+    try:
+        if not _revocation_store.changed():
+            return
+        nouveaux, _revocation_seq = _revocation_store.since(_revocation_seq)
+    except sqlite3.Error as e:
+        logger.warning("Synchronisation des revocations impossible: %s", e)
+        return
+    if nouveaux:
+        for jti, exp in nouveaux:
+            _token_blacklist[jti] = exp
+        _token_cache_evict({jti for jti, _ in nouveaux})
+
+
+def jwt_decode(token: str) -> Optional[dict]:
+    if not isinstance(token, str):
+        return None
+    _sync_revocations()
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache_get(key)
+    cached = payload is not None
+    if not cached:
+        payload = _jwt_verify(token)
+        if payload is None:
+            return None
+    if payload.get("exp") and payload["exp"] < time.time():
+        return None
+    # Verifier si le token a ete revoque
+    jti = payload.get("jti")
+    if jti and jti in _token_blacklist:
+        return None
+    if not cached:
+        _token_cache_put(key, payload)
+    return dict(payload)
+
+
 def revoke_token(token: str) -> bool:
-    """Revoque un token en ajoutant son JTI a la blacklist."""
+    """Revoque un token en ajoutant son JTI a la blacklist (partagee entre workers)."""
     payload = jwt_decode(token)
     if not payload:
         return False
     jti = payload.get("jti")
     if not jti:
         return False
-    _token_blacklist[jti] = payload.get("exp", time.time() + 86400)
+    exp = payload.get("exp", time.time() + 86400)
+    _token_blacklist[jti] = exp
+    _token_cache_evict({jti})
+    if _revocation_store is not None:
+        try:
+            _revocation_store.add(jti, exp)
+        except sqlite3.Error as e:
+            logger.warning("Revocation non partagee (%s): %s", jti, e)
     _cleanup_blacklist()
     return True
 
@@ -141,6 +287,11 @@ def _cleanup_blacklist():
     expired = [jti for jti, exp in _token_blacklist.items() if exp < now]
     for jti in expired:
         del _token_blacklist[jti]
+    if _revocation_store is not None:
+        try:
+            _revocation_store.purge_expired(now)
+        except sqlite3.Error:
+            pass
 
 
 # =========================================
@@ -150,10 +301,8 @@ def _cleanup_blacklist():
 VALID_OFFERS = ("solo", "equipe", "cabinet")
 VALID_ROLES = ("expert_comptable", "comptable", "gestionnaire_paie", "dirigeant", "collaborateur", "inspecteur")
 
-def create_user(email: str, password: str, nom: str, prenom: str,
-                role: str = "collaborateur", tenant_id: str = None,
-                offre: str = "solo", entreprise: str = "",
-                telephone: str = "") -> dict:
+def _validate_new_user(email: str, password: str, role: str, offre: str) -> str:
+    """Controle les donnees d'inscription et retourne l'email normalise."""
     email = email.strip().lower()
     if email in _users:
         raise ValueError("Email deja utilise")
@@ -169,6 +318,15 @@ def create_user(email: str, password: str, nom: str, prenom: str,
         raise ValueError(f"Offre invalide. Choisissez parmi : {', '.join(VALID_OFFERS)}")
     if role not in VALID_ROLES and role != "admin":
         raise ValueError(f"Role invalide. Choisissez parmi : {', '.join(VALID_ROLES)}")
+    return email
+
+
+def _register_user(email: str, password_hash: str, nom: str, prenom: str,
+                   role: str, tenant_id: Optional[str], offre: str,
+                   entreprise: str, telephone: str) -> dict:
+    # Re-verification : une inscription concurrente a pu aboutir pendant le hash
+    if email in _users:
+        raise ValueError("Email deja utilise")
     if not tenant_id:
         tenant_id = str(uuid.uuid4())
     user = {
@@ -176,7 +334,6 @@ def create_user(email: str, password: str, nom: str, prenom: str,
         "email": email,
         "nom": nom,
         "prenom": prenom,
-        "password_hash": hash_password(password),
         "role": role,
         "offre": offre,
         "entreprise": entreprise,
@@ -186,18 +343,63 @@ def create_user(email: str, password: str, nom: str, prenom: str,
         "active": True,
         "email_verifie": False,
     }
+    _set_password_hash(user, password_hash)
     _users[email] = user
     _save_users()
     return _safe_user(user)
 
 
+def create_user(email: str, password: str, nom: str, prenom: str,
+                role: str = "collaborateur", tenant_id: str = None,
+                offre: str = "solo", entreprise: str = "",
+                telephone: str = "") -> dict:
+    email = _validate_new_user(email, password, role, offre)
+    return _register_user(email, hash_password(password), nom, prenom,
+                          role, tenant_id, offre, entreprise, telephone)
+
+
+async def create_user_async(email: str, password: str, nom: str, prenom: str,
+                            role: str = "collaborateur", tenant_id: str = None,
+                            offre: str = "solo", entreprise: str = "",
+                            telephone: str = "") -> dict:
+    """Variante de create_user dont le hash s'execute dans le pool KDF."""
+    email = _validate_new_user(email, password, role, offre)
+    password_hash = await hash_password_async(password)
+    return _register_user(email, password_hash, nom, prenom,
+                          role, tenant_id, offre, entreprise, telephone)
+
+
 def authenticate(email: str, password: str) -> Optional[dict]:
     email = email.strip().lower()
     user = _users.get(email)
-    if not user or not verify_password(password, user["password_hash"]):
+    if not user or not verify_password(password, user["password_hash"], _password_iterations(user)):
         return None
     if not user.get("active", True):
         return None
+    if _password_iterations(user) != PBKDF2_ITERATIONS:
+        _set_password_hash(user, hash_password(password))
+        _save_users()
+    return _safe_user(user)
+
+
+async def authenticate_async(email: str, password: str) -> Optional[dict]:
+    """Variante non bloquante de authenticate.
+
+    Le hash est recalcule de maniere transparente si les parametres KDF
+    ont change depuis son enregistrement.
+    """
+    email = email.strip().lower()
+    user = _users.get(email)
+    if not user:
+        return None
+    iterations = _password_iterations(user)
+    if not await verify_password_async(password, user["password_hash"], iterations):
+        return None
+    if not user.get("active", True):
+        return None
+    if iterations != PBKDF2_ITERATIONS:
+        _set_password_hash(user, await hash_password_async(password))
+        _save_users()
     return _safe_user(user)
 
 
@@ -234,8 +436,11 @@ def list_users_by_tenant(tenant_id: str) -> list:
     return [_safe_user(u) for u in _users.values() if u.get("tenant_id") == tenant_id]
 
 
+_PRIVATE_USER_FIELDS = ("password_hash", "password_iterations")
+
+
 def _safe_user(user: dict) -> dict:
-    return {k: v for k, v in user.items() if k != "password_hash"}
+    return {k: v for k, v in user.items() if k not in _PRIVATE_USER_FIELDS}
 
 
 def _save_users():
@@ -276,12 +481,12 @@ def bootstrap_admin():
         "email": email,
         "nom": "Admin",
         "prenom": "NormaCheck",
-        "password_hash": hash_password(password),
         "role": "admin",
         "tenant_id": "default",
         "created_at": datetime.now().isoformat(),
         "active": True,
     }
+    _set_password_hash(user, hash_password(password))
     _users[email] = user
     _save_users()
     return _safe_user(user)
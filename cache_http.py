@@ -0,0 +1,151 @@
+"""
+NormaCheck - Compression et requetes conditionnelles des reponses de l'API
+Middleware ASGI :
+- compresse (brotli si installe, sinon gzip) toute reponse complete dont
+  le corps depasse un seuil et dont le type s'y prete ; les reponses en
+  flux (NDJSON de progression, export FEC) passent telles quelles ;
+- pour les routes enregistrees, calcule une ETag a partir d'une empreinte
+  de version des donnees (et non du corps) AVANT d'appeler le handler :
+  si le client presente cette ETag (If-None-Match), la reponse est un 304
+  et le handler n'est pas execute.
+L'empreinte d'etat en memoire est fournie par GenerationDonnees, compteur
+incremente apres chaque requete d'ecriture (POST/PUT/DELETE).
+"""
+import gzip
+import hashlib
+import os
+import uuid
+from typing import Callable
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from static_assets import encodages_acceptes
+
+try:
+    import brotli
+except ImportError:  # optionnel : gzip seul
+    brotli = None
+
+SEUIL_COMPRESSION = int(os.getenv("NORMACHECK_COMPRESSION_MIN", "1024"))  # octets
+CACHE_REVALIDATION = "private, no-cache"
+
+_TYPES_COMPRESSIBLES = ("application/json", "text/", "application/javascript", "application/xml",
+                        "application/x-ndjson", "image/svg+xml")
+
+
+class GenerationDonnees:
+    """Version de l'etat en memoire d'un worker.
+
+    L'empreinte combine un jeton tire a la premiere lecture dans chaque
+    processus (les workers issus du meme maitre ne partagent pas leurs
+    donnees en memoire) et le nombre d'ecritures depuis.
+    """
+
+    def __init__(self):
+        self._pid = 0
+        self._jeton = ""
+        self._valeur = 0
+
+    def incrementer(self) -> None:
+        self._valeur += 1
+
+    def empreinte(self) -> str:
+        if self._pid != os.getpid():
+            self._pid, self._jeton, self._valeur = os.getpid(), uuid.uuid4().hex, 0
+        return f"{self._jeton}:{self._valeur}"
+
+
+def etag_route(empreinte: str, chemin: str, query_string: bytes = b"") -> str:
+    """ETag faible d'une route : version des donnees + URL (parametres compris)."""
+    h = hashlib.sha256(f"{empreinte}|{chemin}?".encode() + query_string).hexdigest()
+    # Faible : partagee par les variantes compressees d'une meme representation
+    return f'W/"{h[:32]}"'
+
+
+def _correspond(if_none_match: str, etag: str) -> bool:
+    base = etag.removeprefix("W/")
+    for valeur in if_none_match.split(","):
+        valeur = valeur.strip()
+        if valeur == "*" or valeur.removeprefix("W/") == base:
+            return True
+    return False
+
+
+def _compresser(corps: bytes, acceptes: set[str]) -> tuple[str, bytes]:
+    if brotli is not None and ("br" in acceptes or "*" in acceptes):
+        return "br", brotli.compress(corps, quality=5)
+    if "gzip" in acceptes or "*" in acceptes:
+        return "gzip", gzip.compress(corps, compresslevel=6, mtime=0)
+    return "", corps
+
+
+class ReponsesConditionnelles:
+    """Middleware ASGI de compression et de GET conditionnel.
+
+    `empreintes` associe un chemin d'URL a une fonction sans argument
+    retournant la version courante des donnees de la route ; le dict peut
+    etre complete apres l'enregistrement du middleware.
+    """
+
+    def __init__(self, app, empreintes: dict[str, Callable[[], str]], seuil: int = SEUIL_COMPRESSION):
+        self.app = app
+        self.empreintes = empreintes
+        self.seuil = seuil
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        entetes = Headers(scope=scope)
+        acceptes = encodages_acceptes(entetes.get("accept-encoding", ""))
+
+        etag = None
+        empreinte = self.empreintes.get(scope["path"]) if scope["method"] == "GET" else None
+        if empreinte is not None:
+            etag = etag_route(empreinte(), scope["path"], scope.get("query_string", b""))
+            if _correspond(entetes.get("if-none-match", ""), etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [
+                        (b"etag", etag.encode()),
+                        (b"cache-control", CACHE_REVALIDATION.encode()),
+                        (b"vary", b"Accept-Encoding"),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        debut = None
+
+        async def envoyer(message):
+            nonlocal debut
+            if message["type"] == "http.response.start":
+                debut = message
+                return
+            if message["type"] != "http.response.body" or debut is None:
+                await send(message)
+                return
+            demarrage, debut = debut, None
+            demarrage["headers"] = list(demarrage.get("headers", []))
+            reponse = MutableHeaders(raw=demarrage["headers"])
+            if etag is not None and demarrage["status"] == 200:
+                reponse["ETag"] = etag
+                reponse["Cache-Control"] = CACHE_REVALIDATION
+            corps = message.get("body", b"")
+            if (
+                not message.get("more_body", False)
+                and len(corps) >= self.seuil
+                and "content-encoding" not in reponse
+                and reponse.get("content-type", "").startswith(_TYPES_COMPRESSIBLES)
+            ):
+                reponse.add_vary_header("Accept-Encoding")
+                encodage, compresse = _compresser(corps, acceptes)
+                if encodage and len(compresse) < len(corps):
+                    reponse["Content-Encoding"] = encodage
+                    reponse["Content-Length"] = str(len(compresse))
+                    message = {**message, "body": compresse}
+            await send(demarrage)
+            await send(message)
+
+        await self.app(scope, receive, envoyer)
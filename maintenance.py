@@ -0,0 +1,212 @@
+"""
+NormaCheck - Maintenance de fond (purge RGPD des fichiers uploades)
+Planificateur execute une seule fois par hote et par intervalle, quel que
+soit le nombre de workers Gunicorn : verrou fcntl non bloquant + date de
+derniere execution conservee dans l'index de retention.
+La purge ne consulte que les fichiers echus de l'index (aucun parcours
+du repertoire uploads) et ecrase leur contenu a debit limite.
+D'autres taches de maintenance (compaction des journaux d'alertes...)
+s'enregistrent aupres du planificateur et s'executent apres la purge,
+sous le meme verrou.
+"""
+import fcntl
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from urssaf_analyzer.core.exceptions import SecurityError
+from urssaf_analyzer.security.secure_storage import suppression_securisee
+
+logger = logging.getLogger("normacheck")
+
+PURGE_INTERVAL_SECONDS = int(os.getenv("NORMACHECK_PURGE_INTERVAL_SECONDS", "3600"))
+PURGE_DEBIT_MAX = int(os.getenv("NORMACHECK_PURGE_DEBIT_MAX", str(8 * 1024 * 1024)))  # octets/s
+
+_META_DERNIERE = "purge_uploads"
+_META_INVENTAIRE = "inventaire_uploads"
+
+
+class PurgeScheduler:
+    """Purge periodique des uploads expires (RGPD art. 5.1.e)."""
+
+    def __init__(
+        self,
+        index,
+        uploads_dir: Path,
+        retention_days: int,
+        *,
+        interval: float = PURGE_INTERVAL_SECONDS,
+        passes: int = 1,
+        debit_max: Optional[int] = PURGE_DEBIT_MAX,
+        lock_path: Optional[Path] = None,
+        lot: int = 500,
+        delai_initial: float = 60.0,
+    ):
+        self.index = index
+        self.uploads_dir = Path(uploads_dir)
+        self.retention_days = retention_days
+        self.interval = interval
+        self.passes = passes
+        self.debit_max = debit_max or None
+        self.lock_path = Path(lock_path) if lock_path else self.index.path.with_suffix(".lock")
+        self.lot = lot
+        self.delai_initial = delai_initial
+        self._stop = threading.Event()
+        self._pid = None
+        self._taches: list[tuple[str, Callable[[], Optional[dict]]]] = []
+
+    def ajouter_tache(self, nom: str, fonction: Callable[[], Optional[dict]]) -> None:
+        """Enregistre une tache executee a chaque passage, apres la purge."""
+        self._taches.append((nom, fonction))
+
+    # --- Planification ---
+
+    def start(self):
+        """Demarre le thread de maintenance (un par processus, idempotent)."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._stop.clear()
+        threading.Thread(target=self._loop, name="maintenance-purge", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        # Delai initial + gigue : ne pas concurrencer le demarrage des workers
+        if self._stop.wait(self.delai_initial + random.uniform(0, self.delai_initial)):
+            return
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.warning("Maintenance: erreur purge retention: %s", e)
+            self._stop.wait(min(self.interval, 300) * random.uniform(0.8, 1.2))
+
+    def tick(self) -> Optional[dict]:
+        """Lance la purge si l'intervalle est ecoule et qu'aucun autre worker ne la tient."""
+        derniere = self.index.get_meta(_META_DERNIERE) or {}
+        if time.time() - derniere.get("fin_epoch", 0) < self.interval:
+            return None
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+") as lf:
+            try:
+                fcntl.flock(lf, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None  # purge en cours dans un autre worker
+            try:
+                # Relecture sous verrou : un autre worker vient peut-etre de terminer
+                derniere = self.index.get_meta(_META_DERNIERE) or {}
+                if time.time() - derniere.get("fin_epoch", 0) < self.interval:
+                    return None
+                return self.run_once()
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+    # --- Purge ---
+
+    def run_once(self) -> dict:
+        """Purge les fichiers echus de l'index et enregistre les statistiques."""
+        debut = time.time()
+        stats = {
+            "debut": datetime.fromtimestamp(debut).isoformat(),
+            "fichiers_inventories": self._inventaire_initial(),
+            "fichiers_purges": 0,
+            "octets_ecrases": 0,
+            "echecs": 0,
+        }
+        reportes = set()
+        while not self._stop.is_set():
+            echus = [(c, e) for c, e in self.index.due(time.time(), self.lot) if c not in reportes]
+            if not echus:
+                break
+            traites, a_reporter = [], []
+            for chemin, _ in echus:
+                taille = self._purger(Path(chemin))
+                if taille is None:
+                    stats["echecs"] += 1
+                    a_reporter.append(chemin)
+                else:
+                    if taille >= 0:
+                        stats["fichiers_purges"] += 1
+                        stats["octets_ecrases"] += taille * self.passes
+                    traites.append(chemin)
+            self.index.remove(traites)
+            if a_reporter:
+                # Nouvelle tentative au prochain passage
+                self.index.register_many([(Path(c), time.time() + self.interval) for c in a_reporter])
+                reportes.update(a_reporter)
+        if self._taches:
+            stats["taches"] = self._executer_taches()
+        fin = time.time()
+        stats.update({
+            "fin_epoch": fin,
+            "duree_s": round(fin - debut, 3),
+            "fichiers_suivis": self.index.count(),
+            "retention_jours": self.retention_days,
+        })
+        self.index.set_meta(_META_DERNIERE, stats)
+        if stats["fichiers_purges"] or stats["echecs"]:
+            logger.info("Purge RGPD: %d fichier(s) expire(s) supprime(s), %d echec(s) (retention %d jours)",
+                        stats["fichiers_purges"], stats["echecs"], self.retention_days)
+        return stats
+
+    def _executer_taches(self) -> dict:
+        resultats = {}
+        for nom, fonction in self._taches:
+            try:
+                resultats[nom] = fonction()
+            except Exception as e:
+                logger.warning("Maintenance: echec de la tache %s: %s", nom, e)
+                resultats[nom] = {"erreur": str(e)}
+        return resultats
+
+    def _purger(self, chemin: Path) -> Optional[int]:
+        """Taille du fichier supprime, -1 s'il avait deja disparu, None en cas d'echec."""
+        try:
+            taille = chemin.stat().st_size
+        except FileNotFoundError:
+            return -1
+        except OSError:
+            return None
+        try:
+            suppression_securisee(chemin, passes=self.passes, debit_max=self.debit_max)
+            return taille
+        except SecurityError as e:
+            logger.warning("Maintenance: ecrasement impossible (%s), suppression simple", e)
+        try:
+            chemin.unlink()
+            return 0
+        except FileNotFoundError:
+            return -1
+        except OSError:
+            return None
+
+    def _inventaire_initial(self) -> int:
+        """Indexe une seule fois les fichiers anterieurs a l'index de retention."""
+        if self.index.get_meta(_META_INVENTAIRE) or not self.uploads_dir.exists():
+            return 0
+        connus = self.index.known()
+        retention = self.retention_days * 86400
+        nouveaux = []
+        for f in self.uploads_dir.rglob("*"):
+            if str(f) not in connus and f.is_file():
+                nouveaux.append((f, f.stat().st_mtime + retention))
+        if nouveaux:
+            self.index.register_many(nouveaux)
+        self.index.set_meta(_META_INVENTAIRE, {"date": datetime.now().isoformat(), "fichiers": len(nouveaux)})
+        return len(nouveaux)
+
+    # --- Statistiques ---
+
+    def derniere_execution(self) -> dict:
+        """Statistiques de la derniere purge (tous workers confondus)."""
+        stats = dict(self.index.get_meta(_META_DERNIERE) or {})
+        stats["fichiers_echus"] = self.index.count(due_before=time.time())
+        stats["intervalle_s"] = self.interval
+        return stats
@@ -4,20 +4,28 @@ Remplace les stores in-memory par des fichiers JSON persistants.
 Compatible multi-worker Gunicorn via file locking.
 """
 import json
+import logging
 import os
 import fcntl
+import sqlite3
+import threading
 import time
 import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import Any
 
+import serialisation
+
 
 DATA_DIR = Path(os.getenv("NORMACHECK_DATA_DIR", "/data/normacheck"))
 DB_DIR = DATA_DIR / "db"
 UPLOADS_DIR = DATA_DIR / "uploads"
 REPORTS_DIR = DATA_DIR / "reports"
 LOGS_DIR = DATA_DIR / "logs"
+RETENTION_UPLOADS_DAYS = int(os.getenv("NORMACHECK_RETENTION_UPLOADS_DAYS", "90"))
+
+logger = logging.getLogger("normacheck")
 
 
 def _ensure_dirs():
@@ -46,8 +54,7 @@ class PersistentStore:
             with open(self.lock_path, "a+") as lf:
                 fcntl.flock(lf, fcntl.LOCK_SH)
                 try:
-                    with open(self.path, "r", encoding="utf-8") as f:
-                        return json.load(f)
+                    return serialisation.loads(self.path.read_bytes())
                 finally:
                     fcntl.flock(lf, fcntl.LOCK_UN)
         except (FileNotFoundError, json.JSONDecodeError):
@@ -59,8 +66,7 @@ class PersistentStore:
         with open(self.lock_path, "a+") as lf:
             fcntl.flock(lf, fcntl.LOCK_EX)
             try:
-                with open(tmp_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, default=str)
+                tmp_path.write_bytes(serialisation.dumps(data))
                 os.replace(str(tmp_path), str(self.path))
             finally:
                 fcntl.flock(lf, fcntl.LOCK_UN)
@@ -77,14 +83,12 @@ class PersistentStore:
             fcntl.flock(lf, fcntl.LOCK_EX)
             try:
                 try:
-                    with open(self.path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+                    data = serialisation.loads(self.path.read_bytes())
                 except (FileNotFoundError, json.JSONDecodeError):
                     data = self._default
                 result = updater_fn(data)
                 tmp_path = self.path.with_suffix(".tmp")
-                with open(tmp_path, "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, default=str)
+                tmp_path.write_bytes(serialisation.dumps(data))
                 os.replace(str(tmp_path), str(self.path))
                 return result
             finally:
@@ -118,6 +122,234 @@ class PersistentList:
         return len(self.load()) > 0
 
 
+class _SQLiteStore:
+    """Base SQLite partagee entre workers (connexion paresseuse par processus)."""
+
+    _SCHEMA: tuple[str, ...] = ()
+
+    def __init__(self, name: str):
+        self.path = DB_DIR / f"{name}.db"
+        self._lock = threading.Lock()
+        self._pid = None
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connexion ouverte paresseusement par processus (preload_app + fork)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+            self._on_connect()
+        return self._conn
+
+    def _on_connect(self):
+        pass
+
+
+class RevocationStore(_SQLiteStore):
+    """Ensemble partage de JTI revoques (SQLite, visible par tous les workers).
+
+    Chaque worker garde un miroir local et ne relit que les revocations
+    ajoutees depuis sa derniere synchronisation (seq croissant, jamais reutilise).
+    PRAGMA data_version permet de detecter a moindre cout une ecriture
+    faite par un autre processus.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS revoked ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "jti TEXT UNIQUE NOT NULL, exp REAL NOT NULL)",
+    )
+
+    def __init__(self, name: str = "revoked_tokens"):
+        super().__init__(name)
+        self._data_version = None
+
+    def _on_connect(self):
+        self._data_version = None
+
+    def add(self, jti: str, exp: float) -> bool:
+        """Ajoute un JTI. Retourne False s'il etait deja revoque."""
+        with self._lock:
+            conn = self._connection()
+            cur = conn.execute("INSERT OR IGNORE INTO revoked (jti, exp) VALUES (?, ?)", (jti, exp))
+            conn.commit()
+            return cur.rowcount == 1
+
+    def changed(self) -> bool:
+        """True si un autre processus a modifie la base depuis le dernier appel."""
+        with self._lock:
+            version = self._connection().execute("PRAGMA data_version").fetchone()[0]
+            changed = version != self._data_version
+            self._data_version = version
+            return changed
+
+    def since(self, last_seq: int = 0) -> tuple[list[tuple[str, float]], int]:
+        """Revocations ajoutees apres last_seq, et le nouveau seq max."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT seq, jti, exp FROM revoked WHERE seq > ? ORDER BY seq",
+                (last_seq,),
+            ).fetchall()
+        if not rows:
+            return [], last_seq
+        return [(jti, exp) for _, jti, exp in rows], rows[-1][0]
+
+    def purge_expired(self, now: float = None) -> int:
+        """Supprime les JTI dont le token est de toute facon expire."""
+        with self._lock:
+            conn = self._connection()
+            cur = conn.execute("DELETE FROM revoked WHERE exp < ?", (now or time.time(),))
+            conn.commit()
+            return cur.rowcount
+
+
+class ExpiryIndex(_SQLiteStore):
+    """Index de retention : fichier -> date d'expiration (RGPD art. 5.1.e).
+
+    Alimente a l'upload ; la purge ne consulte que les fichiers echus
+    (index sur expire_le) au lieu de parcourir tout le repertoire uploads.
+    La table meta conserve l'etat de la maintenance (derniere execution...).
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS expirations ("
+        "chemin TEXT PRIMARY KEY, expire_le REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_expirations_expire_le ON expirations(expire_le)",
+        "CREATE TABLE IF NOT EXISTS meta (cle TEXT PRIMARY KEY, valeur TEXT NOT NULL)",
+    )
+
+    def __init__(self, name: str = "retention"):
+        super().__init__(name)
+
+    def register(self, chemin: Path, expire_le: float):
+        self.register_many([(chemin, expire_le)])
+
+    def register_many(self, items: list[tuple[Path, float]]):
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO expirations (chemin, expire_le) VALUES (?, ?)",
+                [(str(c), e) for c, e in items],
+            )
+            conn.commit()
+
+    def due(self, now: float = None, limit: int = 500) -> list[tuple[str, float]]:
+        """Fichiers dont la date d'expiration est passee (les plus anciens d'abord)."""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT chemin, expire_le FROM expirations WHERE expire_le <= ? "
+                "ORDER BY expire_le LIMIT ?",
+                (now or time.time(), limit),
+            ).fetchall()
+
+    def remove(self, chemins: list[str]):
+        with self._lock:
+            conn = self._connection()
+            conn.executemany("DELETE FROM expirations WHERE chemin = ?", [(str(c),) for c in chemins])
+            conn.commit()
+
+    def known(self) -> set[str]:
+        with self._lock:
+            return {r[0] for r in self._connection().execute("SELECT chemin FROM expirations")}
+
+    def count(self, due_before: float = None) -> int:
+        with self._lock:
+            if due_before is None:
+                return self._connection().execute("SELECT COUNT(*) FROM expirations").fetchone()[0]
+            return self._connection().execute(
+                "SELECT COUNT(*) FROM expirations WHERE expire_le <= ?", (due_before,)
+            ).fetchone()[0]
+
+    def get_meta(self, cle: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._connection().execute("SELECT valeur FROM meta WHERE cle = ?", (cle,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, cle: str, valeur: Any):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (cle, valeur) VALUES (?, ?)",
+                (cle, json.dumps(valeur, default=str)),
+            )
+            conn.commit()
+
+
+class RateLimitStore(_SQLiteStore):
+    """Seaux a jetons de limitation de debit, partages par tous les workers.
+
+    Une requete = un UPSERT atomique (recharge + consommation d'un jeton) :
+    O(1) quel que soit l'historique de la cle. Etat volatil (synchronous=OFF) :
+    perdu en cas de crash, il se reconstitue de lui-meme.
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS seaux ("
+        "cle TEXT PRIMARY KEY, jetons REAL NOT NULL, maj REAL NOT NULL, refus INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_seaux_maj ON seaux(maj)",
+        "CREATE TABLE IF NOT EXISTS compteurs (nom TEXT PRIMARY KEY, valeur INTEGER NOT NULL)",
+    )
+
+    def __init__(self, name: str = "rate_limit"):
+        super().__init__(name)
+
+    def _on_connect(self):
+        self._conn.execute("PRAGMA synchronous=OFF")
+
+    def consommer(self, cle: str, capacite: float, debit: float, maintenant: float) -> bool:
+        """Consomme un jeton du seau `cle` ; False si le seau est vide."""
+        with self._lock:
+            conn = self._connection()
+            (refus,) = conn.execute(
+                "INSERT INTO seaux (cle, jetons, maj, refus) VALUES (:cle, :capacite - 1, :t, 0) "
+                "ON CONFLICT(cle) DO UPDATE SET "
+                "refus = min(:capacite, jetons + (:t - maj) * :debit) < 1, "
+                "jetons = min(:capacite, jetons + (:t - maj) * :debit) "
+                "- (min(:capacite, jetons + (:t - maj) * :debit) >= 1), "
+                "maj = :t "
+                "RETURNING refus",
+                {"cle": cle, "capacite": capacite, "debit": debit, "t": maintenant},
+            ).fetchone()
+            conn.commit()
+            return not refus
+
+    def evincer(self, inactif_avant: float, max_cles: int) -> int:
+        """Supprime les seaux inactifs (pleins de toute facon), puis les moins recents au-dela de max_cles."""
+        with self._lock:
+            conn = self._connection()
+            n = conn.execute("DELETE FROM seaux WHERE maj < ?", (inactif_avant,)).rowcount
+            exces = conn.execute("SELECT COUNT(*) FROM seaux").fetchone()[0] - max_cles
+            if exces > 0:
+                n += conn.execute(
+                    "DELETE FROM seaux WHERE cle IN (SELECT cle FROM seaux ORDER BY maj LIMIT ?)",
+                    (exces,),
+                ).rowcount
+            conn.commit()
+            return n
+
+    def nb_cles(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM seaux").fetchone()[0]
+
+    def ajouter_compteurs(self, deltas: dict[str, int]):
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT INTO compteurs (nom, valeur) VALUES (?, ?) "
+                "ON CONFLICT(nom) DO UPDATE SET valeur = valeur + excluded.valeur",
+                list(deltas.items()),
+            )
+            conn.commit()
+
+    def compteurs(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._connection().execute("SELECT nom, valeur FROM compteurs"))
+
+
 # --- Stores persistants ---
 # Remplacent les variables globales in-memory de api/index.py
 
@@ -170,6 +402,8 @@ dsn_drafts_store = PersistentList("dsn_drafts")
 invitations_store = PersistentList("invitations")
 facture_statuses_store = PersistentStore("facture_statuses", default={})
 entete_config_store = PersistentStore("entete_config", default={})
+expiry_index = ExpiryIndex("retention")
+rate_limit_store = RateLimitStore("rate_limit")
 
 
 def save_uploaded_file(filename: str, content: bytes, analysis_id: str = "") -> Path:
@@ -191,6 +425,7 @@ def save_uploaded_file(filename: str, content: bytes, analysis_id: str = "") ->
             encrypted = chiffrer_donnees(content, encryption_key, contexte=filename)
             dest = date_dir / (filename + ".enc")
             dest.write_bytes(encrypted)
+            _enregistrer_expiration(dest)
             return dest
         except Exception:
             pass
@@ -198,9 +433,19 @@ def save_uploaded_file(filename: str, content: bytes, analysis_id: str = "") ->
     # Fallback : stockage non chiffre (dev ou si cryptography manquant)
     dest = date_dir / filename
     dest.write_bytes(content)
+    _enregistrer_expiration(dest)
     return dest
 
 
+def _enregistrer_expiration(dest: Path):
+    """Inscrit le fichier dans l'index de retention (purge RGPD)."""
+    try:
+        expiry_index.register(dest, time.time() + RETENTION_UPLOADS_DAYS * 86400)
+    except sqlite3.Error as e:
+        # L'upload ne doit pas echouer : le fichier sera repris par l'inventaire
+        logger.warning("Index de retention indisponible pour %s: %s", dest.name, e)
+
+
 def save_report(report_id: str, content: str, fmt: str = "html") -> Path:
     """Sauvegarde un rapport genere."""
     dest = REPORTS_DIR / f"{report_id}.{fmt}"
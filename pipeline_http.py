@@ -0,0 +1,140 @@
+"""
+NormaCheck - Pipeline ASGI des requetes de l'API
+Un seul middleware ASGI pur remplace la pile @app.middleware("http")
+(BaseHTTPMiddleware : une tache et un flux intermediaire par couche et par
+requete). Etapes, dans l'ordre :
+1. contexte de requete (tracabilite de log_action) ;
+2. limitation de debit par IP : classe "auth" pour les endpoints
+   d'authentification, "api" pour le reste ;
+3. authentification des routes /api/* hors liste blanche ;
+4. application ; les en-tetes de securite sont ajoutes a toute reponse,
+   refus 401/429 du pipeline compris ;
+5. requete d'ecriture (POST/PUT/DELETE) : `apres_ecriture(statut)` est
+   appele avant l'envoi de la reponse.
+Les pages et ressources statiques (hors /api/) et /api/health
+court-circuitent les etapes 2, 3 et 5.
+"""
+import contextvars
+from typing import Callable, Iterable, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from rate_limit import LimiteurDebit
+
+EN_TETES_SECURITE = (
+    ("Content-Security-Policy",
+     "default-src 'self'; "
+     "script-src 'self' 'unsafe-inline'; "
+     "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+     "img-src 'self' data:; "
+     "font-src 'self' https://fonts.gstatic.com; "
+     "frame-ancestors 'none'; "
+     "base-uri 'self'; "
+     "form-action 'self'"),
+    ("X-Content-Type-Options", "nosniff"),
+    ("X-Frame-Options", "DENY"),
+    ("X-XSS-Protection", "1; mode=block"),
+    ("Referrer-Policy", "strict-origin-when-cross-origin"),
+    ("Permissions-Policy", "camera=(), microphone=(), geolocation=()"),
+)
+_EN_TETES_BRUTS = [(nom.lower().encode("latin-1"), valeur.encode("latin-1")) for nom, valeur in EN_TETES_SECURITE]
+_NOMS_SECURITE = frozenset(nom for nom, _ in _EN_TETES_BRUTS)
+
+METHODES_ECRITURE = frozenset(("POST", "PUT", "DELETE"))
+CHEMINS_LEGERS = frozenset(("/api/health",))
+
+
+def client_ip(request: Request) -> str:
+    forwarded = request.headers.get("X-Forwarded-For", "")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _avec_securite(message: dict) -> dict:
+    entetes = [(nom, valeur) for nom, valeur in message.get("headers", []) if nom.lower() not in _NOMS_SECURITE]
+    return {**message, "headers": entetes + _EN_TETES_BRUTS}
+
+
+class PipelineRequetes:
+    """Middleware ASGI unique : contexte, debit, authentification, securite, ecritures.
+
+    `verifier_token` retourne le payload d'un JWT valide (None sinon) ;
+    `apres_ecriture` recoit le statut de toute requete d'ecriture ayant
+    atteint l'application.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiteur: LimiteurDebit,
+        verifier_token: Callable[[str], Optional[dict]],
+        chemins_auth: Iterable[str] = (),
+        liste_blanche: Iterable[str] = (),
+        apres_ecriture: Optional[Callable[[int], None]] = None,
+        contexte: Optional[contextvars.ContextVar] = None,
+    ):
+        self.app = app
+        self.limiteur = limiteur
+        self.verifier_token = verifier_token
+        self.chemins_auth = frozenset(chemins_auth)
+        self.liste_blanche = frozenset(liste_blanche)
+        self.apres_ecriture = apres_ecriture
+        self.contexte = contexte
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def envoyer(message):
+            if message["type"] == "http.response.start":
+                message = _avec_securite(message)
+            await send(message)
+
+        request = Request(scope, receive, send)
+        if self.contexte is not None:
+            self.contexte.set(request)
+        path = scope["path"]
+        if not path.startswith("/api/") or path in CHEMINS_LEGERS:
+            await self.app(scope, receive, envoyer)
+            return
+
+        refus = self._controler(request, path)
+        if refus is not None:
+            await refus(scope, receive, envoyer)
+            return
+
+        if self.apres_ecriture is None or scope["method"] not in METHODES_ECRITURE:
+            await self.app(scope, receive, envoyer)
+            return
+
+        async def envoyer_apres_ecriture(message):
+            if message["type"] == "http.response.start":
+                self.apres_ecriture(message["status"])
+            await envoyer(message)
+
+        await self.app(scope, receive, envoyer_apres_ecriture)
+
+    def _controler(self, request: Request, path: str) -> Optional[JSONResponse]:
+        """Reponse de refus (429, 401), ou None si la requete peut passer."""
+        ip = client_ip(request)
+        # Limite stricte sur les endpoints d'authentification
+        if path in self.chemins_auth:
+            if not self.limiteur.autoriser("auth", ip):
+                return JSONResponse({"detail": "Trop de tentatives. Reessayez dans une minute."}, status_code=429)
+        elif not self.limiteur.autoriser("api", ip):
+            return JSONResponse({"detail": "Trop de requetes. Reessayez dans une minute."}, status_code=429)
+
+        if path not in self.liste_blanche:
+            token = request.cookies.get("nc_token")
+            if not token:
+                auth_header = request.headers.get("Authorization", "")
+                if auth_header.startswith("Bearer "):
+                    token = auth_header[7:]
+            if not token:
+                return JSONResponse({"detail": "Non authentifie"}, status_code=401)
+            if not self.verifier_token(token):
+                return JSONResponse({"detail": "Session expiree"}, status_code=401)
+        return None
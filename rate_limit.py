@@ -0,0 +1,132 @@
+"""
+NormaCheck - Limitation de debit par seaux a jetons
+Un seau par (classe, client) : `capacite` requetes en rafale, recharge de
+capacite / periode jetons par seconde. Chaque requete est un calcul O(1)
+(recharge depuis la derniere requete + consommation), sans historique.
+Stockage des seaux :
+- RateLimitStore (persistence, SQLite) en production : seaux partages par
+  tous les workers Gunicorn, la limite reste celle configuree quel que
+  soit le nombre de workers ;
+- SeauxMemoire sinon (Vercel, developpement, tests).
+Les cles inactives sont evincees (un seau inactif depuis plus d'une
+periode est plein : le supprimer ne change rien) et leur nombre est borne
+(LRU). Compteurs de requetes acceptees / refusees par classe.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Optional
+
+logger = logging.getLogger("normacheck")
+
+MAX_CLES = int(os.getenv("NORMACHECK_RATE_LIMIT_MAX_CLES", "100000"))
+INTERVALLE_MAINTENANCE = 30.0  # secondes entre deux evictions / remontees de compteurs
+
+
+class SeauxMemoire:
+    """Seaux a jetons en memoire du processus, ordonnes du moins au plus recent."""
+
+    def __init__(self, max_cles: int = MAX_CLES):
+        self.max_cles = max_cles
+        self._seaux: OrderedDict[str, list[float]] = OrderedDict()  # cle -> [jetons, maj]
+        self._compteurs: dict[str, int] = defaultdict(int)
+
+    def consommer(self, cle: str, capacite: float, debit: float, maintenant: float) -> bool:
+        seau = self._seaux.get(cle)
+        if seau is None:
+            self._seaux[cle] = [capacite - 1, maintenant]
+            if len(self._seaux) > self.max_cles:
+                self._seaux.popitem(last=False)
+            return True
+        self._seaux.move_to_end(cle)
+        jetons = min(capacite, seau[0] + (maintenant - seau[1]) * debit)
+        seau[1] = maintenant
+        if jetons < 1:
+            seau[0] = jetons
+            return False
+        seau[0] = jetons - 1
+        return True
+
+    def evincer(self, inactif_avant: float, max_cles: int) -> int:
+        n = 0
+        while self._seaux:
+            cle, (_, maj) = next(iter(self._seaux.items()))
+            if maj >= inactif_avant and len(self._seaux) <= max_cles:
+                break
+            del self._seaux[cle]
+            n += 1
+        return n
+
+    def nb_cles(self) -> int:
+        return len(self._seaux)
+
+    def ajouter_compteurs(self, deltas: dict[str, int]):
+        for nom, valeur in deltas.items():
+            self._compteurs[nom] += valeur
+
+    def compteurs(self) -> dict[str, int]:
+        return dict(self._compteurs)
+
+
+class LimiteurDebit:
+    """Limiteur multi-classes (ex. "auth", "api") sur un stockage de seaux.
+
+    `classes` : nom -> (capacite, periode en secondes). En cas d'erreur du
+    stockage (base verrouillee...), la requete est acceptee et journalisee.
+    """
+
+    def __init__(self, store, classes: dict[str, tuple[int, float]], max_cles: int = MAX_CLES):
+        self.store = store
+        self.classes = classes
+        self.max_cles = max_cles
+        self._periode_max = max(periode for _, periode in classes.values())
+        self._compteurs: dict[str, int] = defaultdict(int)
+        self._prochaine_maintenance = 0.0
+
+    def autoriser(self, classe: str, client: str, maintenant: Optional[float] = None) -> bool:
+        """Consomme un jeton du seau (classe, client) ; False si la limite est atteinte."""
+        maintenant = time.time() if maintenant is None else maintenant
+        capacite, periode = self.classes[classe]
+        try:
+            autorise = self.store.consommer(f"{classe}:{client}", capacite, capacite / periode, maintenant)
+        except Exception as e:
+            logger.warning("Limiteur de debit indisponible: %s", e)
+            self._compteurs[f"{classe}:erreurs"] += 1
+            return True
+        self._compteurs[f"{classe}:{'acceptees' if autorise else 'refusees'}"] += 1
+        if maintenant >= self._prochaine_maintenance:
+            self._maintenance(maintenant)
+        return autorise
+
+    def _maintenance(self, maintenant: float) -> None:
+        self._prochaine_maintenance = maintenant + INTERVALLE_MAINTENANCE
+        try:
+            self.store.evincer(maintenant - self._periode_max, self.max_cles)
+            self._remonter_compteurs()
+        except Exception as e:
+            logger.warning("Maintenance du limiteur de debit: %s", e)
+
+    def _remonter_compteurs(self) -> None:
+        if self._compteurs:
+            self.store.ajouter_compteurs(dict(self._compteurs))
+            self._compteurs.clear()
+
+    def statistiques(self) -> dict:
+        """Compteurs cumules (tous workers pour un stockage partage) et nombre de cles suivies."""
+        self._remonter_compteurs()
+        compteurs = self.store.compteurs()
+        return {
+            "cles_suivies": self.store.nb_cles(),
+            "max_cles": self.max_cles,
+            "classes": {
+                classe: {
+                    "capacite": capacite,
+                    "periode_s": periode,
+                    "acceptees": compteurs.get(f"{classe}:acceptees", 0),
+                    "refusees": compteurs.get(f"{classe}:refusees", 0),
+                    "erreurs": compteurs.get(f"{classe}:erreurs", 0),
+                }
+                for classe, (capacite, periode) in self.classes.items()
+            },
+        }
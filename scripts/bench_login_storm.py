@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark NormaCheck - Latence pendant une rafale de logins
+============================================================
+Mesure le p50/p99 d'un endpoint sans rapport avec l'authentification
+(/ping) pendant qu'une rafale de logins s'execute sur le meme worker :
+
+- "sync"  : PBKDF2 execute dans le handler async (comportement historique)
+- "async" : PBKDF2 execute dans le pool KDF borne (auth.authenticate_async)
+
+Usage : python scripts/bench_login_storm.py [nb_logins] [nb_pings]
+Prerequis : fastapi, httpx
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from fastapi import FastAPI
+
+import auth
+
+EMAIL = "bench@normacheck.fr"
+PASSWORD = "BenchPass2026!"
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/sync-login")
+    async def sync_login():
+        return {"ok": auth.authenticate(EMAIL, PASSWORD) is not None}
+
+    @app.post("/async-login")
+    async def async_login():
+        return {"ok": await auth.authenticate_async(EMAIL, PASSWORD) is not None}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def _mesurer(app: FastAPI, login_path: str, nb_logins: int, nb_pings: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latences: list[float] = []
+        debut = time.perf_counter()
+
+        async def ping(i: int):
+            # Latence mesuree depuis l'instant planifie (pas de "coordinated omission")
+            prevu = debut + i * 0.005
+            await asyncio.sleep(max(0.0, prevu - time.perf_counter()))
+            await client.get("/ping")
+            latences.append((time.perf_counter() - prevu) * 1000)
+
+        logins = [client.post(login_path) for _ in range(nb_logins)]
+        await asyncio.gather(*(ping(i) for i in range(nb_pings)), *logins)
+        return latences
+
+
+def _percentile(valeurs: list[float], p: float) -> float:
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p))]
+
+
+def main():
+    nb_logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    nb_pings = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    auth._users = {}
+    auth.create_user(EMAIL, PASSWORD, "Bench", "NormaCheck")
+    app = _build_app()
+
+    print(f"Rafale de {nb_logins} logins, {nb_pings} pings (PBKDF2 {auth.PBKDF2_ITERATIONS} iterations, "
+          f"{auth.KDF_MAX_WORKERS} workers KDF)")
+    for label, path in (("sync", "/sync-login"), ("async", "/async-login")):
+        latences = asyncio.run(_mesurer(app, path, nb_logins, nb_pings))
+        print(f"  {label:5s}  p50={statistics.median(latences):8.2f} ms  "
+              f"p99={_percentile(latences, 0.99):8.2f} ms  max={max(latences):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark NormaCheck - Cout par requete de la pile de middlewares
+=================================================================
+Compare, sur des routes triviales, le temps par requete :
+
+- "pile"     : 4 middlewares @app.middleware("http") (BaseHTTPMiddleware :
+               securite, debit, authentification, auto-persistance) et le
+               middleware de contexte de requete (comportement historique)
+- "pipeline" : le middleware ASGI unique pipeline_http.PipelineRequetes
+
+Les requetes sont envoyees directement a l'application ASGI (sans
+serveur ni client HTTP) pour isoler le cout des middlewares.
+
+Usage : python scripts/bench_middleware.py [nb_requetes]
+Prerequis : fastapi
+"""
+
+import asyncio
+import contextvars
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+import auth
+from pipeline_http import EN_TETES_SECURITE, PipelineRequetes, client_ip
+from rate_limit import LimiteurDebit, SeauxMemoire
+
+_contexte: contextvars.ContextVar = contextvars.ContextVar("bench_request", default=None)
+_LISTE_BLANCHE = {"/api/health", "/api/auth/login"}
+_ecritures = []
+
+
+def _limiteur() -> LimiteurDebit:
+    # Capacite illimitee en pratique : seul le cout du controle est mesure
+    return LimiteurDebit(SeauxMemoire(), {"auth": (10**9, 60), "api": (10**9, 60)})
+
+
+def _routes(app: FastAPI) -> FastAPI:
+    @app.get("/api/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/api/donnees")
+    async def donnees():
+        return {"ok": True}
+
+    @app.post("/api/donnees")
+    async def ecrire():
+        return {"ok": True}
+
+    @app.get("/app")
+    async def page():
+        return PlainTextResponse("<!DOCTYPE html>")
+
+    return app
+
+
+def _app_pile() -> FastAPI:
+    """Reproduction de la pile historique de api/index.py."""
+    app = FastAPI()
+    limiteur = _limiteur()
+
+    class RequestContextMiddleware:
+        def __init__(self, app):
+            self.app = app
+
+        async def __call__(self, scope, receive, send):
+            if scope["type"] == "http":
+                _contexte.set(Request(scope, receive, send))
+            await self.app(scope, receive, send)
+
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.middleware("http")
+    async def securite(request: Request, call_next):
+        response = await call_next(request)
+        for nom, valeur in EN_TETES_SECURITE:
+            response.headers[nom] = valeur
+        return response
+
+    @app.middleware("http")
+    async def debit(request: Request, call_next):
+        if not limiteur.autoriser("api", client_ip(request)):
+            return JSONResponse({"detail": "Trop de requetes"}, status_code=429)
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def authentification(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/api/") and path not in _LISTE_BLANCHE:
+            auth_header = request.headers.get("Authorization", "")
+            token = auth_header[7:] if auth_header.startswith("Bearer ") else None
+            if not token or not auth.jwt_decode(token):
+                return JSONResponse({"detail": "Non authentifie"}, status_code=401)
+        return await call_next(request)
+
+    @app.middleware("http")
+    async def persistance(request: Request, call_next):
+        response = await call_next(request)
+        if request.method in ("POST", "PUT", "DELETE"):
+            _ecritures.append(response.status_code)
+        return response
+
+    return _routes(app)
+
+
+def _app_pipeline() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        PipelineRequetes,
+        limiteur=_limiteur(),
+        verifier_token=auth.jwt_decode,
+        liste_blanche=_LISTE_BLANCHE,
+        apres_ecriture=_ecritures.append,
+        contexte=_contexte,
+    )
+    return _routes(app)
+
+
+async def _requete(app, methode: str, chemin: str, entetes: list) -> int:
+    statut = 0
+    recu = False
+
+    async def receive():
+        nonlocal recu
+        if recu:
+            await asyncio.sleep(3600)
+        recu = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal statut
+        if message["type"] == "http.response.start":
+            statut = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": methode, "scheme": "http", "path": chemin, "raw_path": chemin.encode(),
+        "root_path": "", "query_string": b"", "headers": entetes,
+        "client": ("198.51.100.7", 50000), "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return statut
+
+
+async def _mesurer(app, methode: str, chemin: str, entetes: list, nb: int) -> float:
+    """Temps median par requete (microsecondes) sur 5 series de nb requetes."""
+    for _ in range(200):  # echauffement
+        await _requete(app, methode, chemin, entetes)
+    series = []
+    for _ in range(5):
+        debut = time.perf_counter()
+        for _ in range(nb):
+            await _requete(app, methode, chemin, entetes)
+        series.append((time.perf_counter() - debut) / nb * 1e6)
+    return statistics.median(series)
+
+
+def main():
+    nb = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    token = auth.generate_token({"email": "bench@normacheck.fr", "role": "admin", "tenant_id": "bench"})
+    authentifie = [(b"authorization", f"Bearer {token}".encode())]
+    # Le refus 401 n'atteint pas la route : pas de reference "sans middleware"
+    cas = (
+        ("GET /api/health", "GET", "/api/health", [], True),
+        ("GET /app (page)", "GET", "/app", [], True),
+        ("GET /api/donnees", "GET", "/api/donnees", authentifie, True),
+        ("POST /api/donnees", "POST", "/api/donnees", authentifie, True),
+        ("GET /api/donnees 401", "GET", "/api/donnees", [], False),
+    )
+    applis = {"pile": _app_pile(), "pipeline": _app_pipeline()}
+    nue = _routes(FastAPI())
+
+    print(f"{nb} requetes x 5 series, temps median par requete (us)")
+    print(f"  {'route':22s} {'sans':>8s} {'pile':>8s} {'pipeline':>9s}  surcout pile -> pipeline")
+    for label, methode, chemin, entetes, reference in cas:
+        temps = {nom: asyncio.run(_mesurer(app, methode, chemin, entetes, nb)) for nom, app in applis.items()}
+        if not reference:
+            print(f"  {label:22s} {'-':>8s} {temps['pile']:8.1f} {temps['pipeline']:9.1f}")
+            continue
+        sans = asyncio.run(_mesurer(nue, methode, chemin, entetes, nb))
+        print(f"  {label:22s} {sans:8.1f} {temps['pile']:8.1f} {temps['pipeline']:9.1f}  "
+              f"{temps['pile'] - sans:7.1f} -> {temps['pipeline'] - sans:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
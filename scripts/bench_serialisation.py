@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark NormaCheck - Serialisation JSON des analyses et des stores
+====================================================================
+Mesure le temps de serialisation :
+
+- d'une reponse d'analyse volumineuse (constats, declarations avec
+  Decimal, Enum et dates) : jsonable_encoder + JSONResponse (historique)
+  contre ReponseJSON retournee directement ;
+- d'une sauvegarde de store (bibliotheque documentaire) : json.dump avec
+  default=str (historique) contre serialisation.dumps.
+
+Usage : python scripts/bench_serialisation.py [nb_constats] [nb_documents]
+Prerequis : fastapi (orjson recommande)
+"""
+
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import serialisation
+from serialisation import ReponseJSON
+from urssaf_analyzer.config.constants import FindingCategory, Severity
+
+
+def _analyse(nb_constats: int) -> dict:
+    constats = [{
+        "id": f"c{i}",
+        "categorie": FindingCategory.ANOMALIE,
+        "severite": Severity.HAUTE,
+        "titre": f"Taux de cotisation incorrect ({i})",
+        "description": "Le taux applique differe du taux legal en vigueur pour la periode. " * 3,
+        "montant_impact": Decimal(i) / 7,
+        "score_risque": i % 100,
+        "recommandation": "Regulariser sur la prochaine DSN.",
+        "reference_legale": "CSS art. L241-3",
+        "documents_concernes": [f"doc_{i % 50}.pdf"],
+        "periode": "2026-01",
+    } for i in range(nb_constats)]
+    declarations = [{
+        "type": "DSN",
+        "periode": "202601",
+        "masse_salariale_brute": Decimal("123456.78"),
+        "salaries": [{"nom": f"Nom{j}", "prenom": "Prenom", "brut_mensuel": Decimal("2345.67"),
+                      "date_embauche": date(2020, 1, 1 + j % 28)} for j in range(40)],
+    } for _ in range(max(1, nb_constats // 100))]
+    return {
+        "synthese": {"nb_constats": nb_constats, "impact_financier_total": Decimal("98765.43")},
+        "constats": constats,
+        "declarations": declarations,
+        "html_report": "<html>" + "<p>rapport</p>" * 5000 + "</html>",
+    }
+
+
+def _bibliotheque(nb_documents: int) -> list[dict]:
+    return [{
+        "id": f"d{i}", "nom": f"bulletin_{i}.pdf", "taille": 123456, "sha256": "ab" * 8,
+        "date_import": datetime(2026, 1, 1, 12, 0).isoformat(), "statut": "analyse", "nature": "Bulletin de paie",
+        "donnees_extraites": {"nb_salaries": 1, "masse_salariale": 2345.67, "salaries_noms": ["Jean Dupont"]},
+        "actions": [{"action": "import+analyse", "par": "utilisateur", "date": "2026-01-01T12:00:00"}],
+    } for i in range(nb_documents)]
+
+
+def _chrono(fn, repetitions: int = 7) -> float:
+    """Temps median (ms) d'un appel."""
+    fn()
+    mesures = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fn()
+        mesures.append((time.perf_counter() - debut) * 1000)
+    return statistics.median(mesures)
+
+
+def main():
+    nb_constats = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    nb_documents = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    analyse = _analyse(nb_constats)
+    bibliotheque = _bibliotheque(nb_documents)
+
+    cas = (
+        (f"reponse d'analyse ({nb_constats} constats)",
+         lambda: JSONResponse(jsonable_encoder(analyse)).body,
+         lambda: ReponseJSON(analyse).body),
+        (f"sauvegarde de store ({nb_documents} documents)",
+         lambda: json.dumps(bibliotheque, ensure_ascii=False, default=str).encode("utf-8"),
+         lambda: serialisation.dumps(bibliotheque)),
+    )
+    print(f"Serialiseur : {serialisation.BACKEND} - temps median (ms)")
+    for label, avant, apres in cas:
+        t_avant, t_apres = _chrono(avant), _chrono(apres)
+        print(f"  {label:40s} avant={t_avant:8.2f}  apres={t_apres:8.2f}  x{t_avant / t_apres:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
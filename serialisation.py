@@ -0,0 +1,104 @@
+"""
+NormaCheck - Serialisation JSON des reponses de l'API et des stores
+orjson s'il est installe, sinon json de la bibliotheque standard, avec les
+memes conversions dans les deux cas :
+- Decimal -> nombre (float), date / datetime / time -> ISO 8601 ;
+- Enum -> valeur, dataclass (Finding, Declaration...) -> objet ;
+- set / tuple -> liste, autres types -> str (comme default=str) ;
+- NaN / infini -> null, cles de dictionnaire non chaines (date, Enum,
+  nombre, None...) -> chaine, comme OPT_NON_STR_KEYS d'orjson.
+Les handlers peuvent donc retourner les objets metier tels quels, sans
+conversion manuelle ; ReponseJSON retournee directement par un handler
+evite en outre le parcours de jsonable_encoder.
+"""
+import dataclasses
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optionnel : json standard sinon
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _defaut(obj: Any) -> Any:
+    """Conversion des types non geres nativement par le serialiseur."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Serialise en JSON UTF-8 compact."""
+        try:
+            return orjson.dumps(obj, default=_defaut, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Entiers de plus de 64 bits, cles non scalaires... : repli standard
+            return _dumps_std(obj)
+
+    def loads(data: bytes | str) -> Any:
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        """Serialise en JSON UTF-8 compact."""
+        return _dumps_std(obj)
+
+    def loads(data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+def _cle(cle: Any) -> Any:
+    """Cle de dictionnaire telle qu'orjson l'ecrit avec OPT_NON_STR_KEYS."""
+    if isinstance(cle, Enum) and not isinstance(cle, str):
+        cle = cle.value
+    if isinstance(cle, (str, int, float)) or cle is None:
+        return cle  # converties par json comme par orjson ("1", "true", "null")
+    if isinstance(cle, (datetime, date, time)):
+        return cle.isoformat()
+    return str(cle)
+
+
+def _normaliser(obj: Any) -> Any:
+    """Prepare obj pour json : json n'a pas de point d'entree pour les
+    flottants non finis ni pour les cles, on les convertit donc en amont."""
+    if isinstance(obj, str) or obj is None or isinstance(obj, int):
+        return obj
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {_cle(k): _normaliser(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_normaliser(v) for v in obj]
+    return _normaliser(_defaut(obj))
+
+
+def _dumps_std(obj: Any) -> bytes:
+    return json.dumps(
+        _normaliser(obj), ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class ReponseJSON(JSONResponse):
+    """Reponse JSON de l'API (classe par defaut de l'application)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,167 @@
+"""
+NormaCheck - Pages statiques precompressees (application, accueil, pages legales)
+Les fichiers de api/static sont charges une fois au demarrage (avant le
+fork des workers avec preload_app), compresses en gzip et en brotli si le
+module est installe, et servis tels quels : ETag forte par representation,
+reponse 304 sur If-None-Match.
+Les sous-ressources (CSS, JS) referencees par "/static/<nom>" dans les
+pages sont publiees sous un nom a empreinte (/static/app.3f2a9c1d.js) et
+mises en cache un an par le navigateur ; les pages sont revalidees a
+chaque visite.
+"""
+import gzip
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optionnel : gzip seul
+    brotli = None
+
+logger = logging.getLogger("normacheck")
+
+CACHE_PAGE = "no-cache"
+CACHE_EMPREINTE = "public, max-age=31536000, immutable"
+
+TYPES_MEDIA = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".json": "application/json",
+}
+
+# Ordre de preference des encodages proposes au client
+_ENCODAGES = ("br", "gzip")
+_SUFFIXES_ETAG = {"br": "-br", "gzip": "-gz", "identity": ""}
+_REF_STATIC = re.compile(r"""(?<=["'])/static/([\w.-]+)(?=["'])""")
+
+
+class Ressource:
+    """Un fichier servi : contenu brut et variantes compressees."""
+    __slots__ = ("media_type", "cache_control", "empreinte", "variantes")
+
+    def __init__(self, contenu: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.empreinte = hashlib.sha256(contenu).hexdigest()
+        self.variantes: dict[str, bytes] = {"identity": contenu}
+        gz = gzip.compress(contenu, compresslevel=9, mtime=0)
+        if len(gz) < len(contenu):
+            self.variantes["gzip"] = gz
+        if brotli is not None:
+            br = brotli.compress(contenu, quality=11)
+            if len(br) < len(contenu):
+                self.variantes["br"] = br
+
+    def etag(self, encodage: str) -> str:
+        return f'"{self.empreinte[:32]}{_SUFFIXES_ETAG[encodage]}"'
+
+    def negocier(self, accept_encoding: str) -> str:
+        """Encodage retenu pour l'en-tete Accept-Encoding du client."""
+        acceptes = encodages_acceptes(accept_encoding)
+        for encodage in _ENCODAGES:
+            if encodage in self.variantes and (encodage in acceptes or "*" in acceptes):
+                return encodage
+        return "identity"
+
+    def est_a_jour(self, if_none_match: str) -> bool:
+        """If-None-Match designe-t-il l'une des representations ? (comparaison faible)"""
+        if not if_none_match:
+            return False
+        etags = {self.etag(e) for e in self.variantes}
+        for valeur in if_none_match.split(","):
+            valeur = valeur.strip()
+            if valeur == "*" or valeur.removeprefix("W/") in etags:
+                return True
+        return False
+
+
+def encodages_acceptes(valeur: str) -> set[str]:
+    """Encodages d'un en-tete Accept-Encoding dont la qualite q est non nulle."""
+    acceptes = set()
+    for partie in valeur.lower().split(","):
+        nom, _, params = partie.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            cle, _, val = param.strip().partition("=")
+            if cle == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        if q > 0 and nom.strip():
+            acceptes.add(nom.strip())
+    return acceptes
+
+
+def _nom_empreinte(nom: str, empreinte: str) -> str:
+    base, point, ext = nom.rpartition(".")
+    return f"{base}.{empreinte[:8]}.{ext}" if point else f"{nom}.{empreinte[:8]}"
+
+
+class RessourcesStatiques:
+    """Pages HTML et sous-ressources d'un repertoire, pretes a servir.
+
+    `pages` associe un chemin d'URL a un fichier HTML du repertoire ; les
+    autres fichiers sont des sous-ressources publiees sous /static/.
+    """
+
+    def __init__(self, repertoire: Path, pages: dict[str, str]):
+        self.repertoire = Path(repertoire)
+        self._ressources: dict[str, Ressource] = {}
+        self._urls: dict[str, str] = {}
+        fichiers_pages = set(pages.values())
+
+        for chemin in sorted(self.repertoire.iterdir()):
+            if not chemin.is_file() or chemin.name in fichiers_pages or chemin.name.startswith("."):
+                continue
+            contenu = chemin.read_bytes()
+            media_type = TYPES_MEDIA.get(chemin.suffix, "application/octet-stream")
+            ressource = Ressource(contenu, media_type, CACHE_EMPREINTE)
+            url = "/static/" + _nom_empreinte(chemin.name, ressource.empreinte)
+            self._ressources[url] = ressource
+            # Nom sans empreinte : toujours servi, mais revalide
+            self._ressources["/static/" + chemin.name] = Ressource(contenu, media_type, CACHE_PAGE)
+            self._urls[chemin.name] = url
+
+        for url, nom in pages.items():
+            html = (self.repertoire / nom).read_text(encoding="utf-8")
+            html = _REF_STATIC.sub(lambda m: self._urls.get(m.group(1), m.group(0)), html)
+            self._ressources[url] = Ressource(html.encode("utf-8"), TYPES_MEDIA[".html"], CACHE_PAGE)
+
+        logger.info(
+            "Ressources statiques : %d fichiers, %d Ko (gzip %d Ko)%s",
+            len(self._ressources),
+            sum(len(r.variantes["identity"]) for r in self._ressources.values()) // 1024,
+            sum(len(r.variantes.get("gzip", r.variantes["identity"])) for r in self._ressources.values()) // 1024,
+            "" if brotli is not None else ", brotli indisponible",
+        )
+
+    def url(self, nom: str) -> str:
+        """URL a empreinte d'une sous-ressource (nom de fichier)."""
+        return self._urls[nom]
+
+    def get(self, chemin: str) -> Optional[Ressource]:
+        return self._ressources.get(chemin)
+
+    def servir(self, chemin: str, accept_encoding: str = "", if_none_match: str = "") -> Optional[tuple[int, dict, bytes]]:
+        """(statut, en-tetes, corps) pour un chemin d'URL ; None si inconnu."""
+        ressource = self._ressources.get(chemin)
+        if ressource is None:
+            return None
+        encodage = ressource.negocier(accept_encoding)
+        entetes = {
+            "ETag": ressource.etag(encodage),
+            "Cache-Control": ressource.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if ressource.est_a_jour(if_none_match):
+            return 304, entetes, b""
+        if encodage != "identity":
+            entetes["Content-Encoding"] = encodage
+        entetes["Content-Type"] = ressource.media_type
+        return 200, entetes, ressource.variantes[encodage]
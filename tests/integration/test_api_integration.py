@@ -46,6 +46,34 @@ class TestHealthCheck:
         assert data.get("status") == "healthy" or "status" in data
 
 
+# ==============================
+# Pages statiques
+# ==============================
+
+class TestPagesStatiques:
+    """Pages HTML precompressees, ETag et sous-ressources a empreinte."""
+
+    @pytest.mark.parametrize("chemin", ["/", "/app", "/legal/cgu", "/legal/cgv", "/legal/mentions"])
+    def test_page_compressee_avec_etag(self, client, chemin):
+        r = client.get(chemin, headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200
+        assert r.headers["content-encoding"] == "gzip" and r.headers["etag"]
+        assert r.text.startswith("<!DOCTYPE html>")
+        r = client.get(chemin, headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["etag"]})
+        assert r.status_code == 304 and r.content == b""
+
+    def test_sous_ressources_de_l_application(self, client):
+        import re
+        page = client.get("/app").text
+        urls = re.findall(r'"(/static/[\w.-]+)"', page)
+        assert len(urls) == 3
+        for url in urls:
+            r = client.get(url)
+            assert r.status_code == 200
+            assert "immutable" in r.headers["cache-control"]
+        assert client.get("/static/inconnu.js").status_code == 404
+
+
 # ==============================
 # Authentication API
 # ==============================
@@ -104,3 +132,422 @@ class TestErrorHandling:
             headers={"Content-Type": "application/json"},
         )
         assert response.status_code in (400, 422)
+
+
+# ==============================
+# Limitation de debit
+# ==============================
+
+class TestRateLimit:
+    """Seaux a jetons par IP : authentification et reste de l'API separes."""
+
+    def test_auth_limitee_sans_bloquer_l_api(self, client, monkeypatch):
+        import auth
+        ip = {"X-Forwarded-For": "203.0.113.43"}
+        statuts = [
+            client.post("/api/auth/login", json={"email": "x@test.fr", "password": "x"}, headers=ip).status_code
+            for _ in range(11)
+        ]
+        assert 429 not in statuts[:10] and statuts[10] == 429
+        assert client.get("/api/health", headers=ip).status_code == 200
+
+        admin = {"email": "root@test.fr", "role": "admin", "tenant_id": "default"}
+        monkeypatch.setitem(auth._users, admin["email"], admin)
+        token = auth.generate_token(admin)
+        r = client.get("/api/maintenance/rate-limit", headers={**ip, "Authorization": f"Bearer {token}"})
+        assert r.status_code == 200
+        assert r.json()["classes"]["auth"]["refusees"] >= 1
+
+
+# ==============================
+# Comptabilite - grand livre
+# ==============================
+
+class TestGrandLivreAPI:
+    """Grand livre detaille : streaming et pagination par curseur."""
+
+    @pytest.fixture
+    def auth_client(self, client):
+        from datetime import date
+        from decimal import Decimal
+        import auth
+        from api import index
+        from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures
+
+        moteur = MoteurEcritures()
+        for jour in (5, 15, 25):
+            moteur.generer_ecriture_facture(
+                type_doc="facture_achat", date_piece=date(2026, 1, jour),
+                numero_piece=f"FA-{jour}", montant_ht=Decimal("100"),
+                montant_tva=Decimal("20"), montant_ttc=Decimal("120"),
+            )
+        index._moteur, ancien = moteur, index._moteur
+        token = auth.generate_token({"email": "gl@test.fr", "role": "admin", "tenant_id": "t-gl"})
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+        index._moteur = ancien
+
+    def test_streaming_filtre_par_date(self, auth_client):
+        r = auth_client.get("/api/comptabilite/grand-livre-detail",
+                            params={"date_debut": "2026-01-10", "date_fin": "2026-01-20"})
+        assert r.status_code == 200
+        data = r.json()
+        assert {c["compte"] for c in data} == {"401000", "445660", "607000"}
+        assert all([m["date"] for m in c["mouvements"]] == ["2026-01-15"] for c in data)
+
+    def test_pagination_par_curseur(self, auth_client):
+        vus, curseur = [], None
+        while True:
+            params = {"limite": 4}
+            if curseur:
+                params["curseur"] = curseur
+            r = auth_client.get("/api/comptabilite/grand-livre-detail", params=params)
+            assert r.status_code == 200
+            vus += [(c["compte"], m["date"]) for c in r.json() for m in c["mouvements"]]
+            curseur = r.headers.get("X-Curseur-Suivant")
+            if not curseur:
+                break
+        assert len(vus) == 9
+        assert vus == sorted(vus)
+
+    def test_curseur_invalide(self, auth_client):
+        r = auth_client.get("/api/comptabilite/grand-livre-detail",
+                            params={"limite": 2, "curseur": "pas-un-curseur"})
+        assert r.status_code == 400
+
+    def test_export_fec_diffuse(self, auth_client):
+        r = auth_client.get("/api/fec/exporter",
+                            params={"siren": "123456789", "date_cloture": "2026-12-31",
+                                    "validees_seulement": False})
+        assert r.status_code == 200
+        assert "123456789FEC20261231.txt" in r.headers["content-disposition"]
+        lignes = r.content.decode("utf-8-sig").split("\n")
+        assert lignes[0].startswith("JournalCode") and len(lignes) == 10
+
+    def test_import_fec_masse(self, auth_client):
+        from api import index
+        export = auth_client.get("/api/fec/exporter", params={"validees_seulement": False}).content
+        r = auth_client.post("/api/fec/importer/masse", files={"file": ("fec.txt", export, "text/plain")})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["ecritures_importees"] == 3 and data["ecritures_rejetees"] == 0
+        assert index._moteur.nb_ecritures() == 6
+
+    def test_import_fec_masse_progression(self, auth_client):
+        export = auth_client.get("/api/fec/exporter", params={"validees_seulement": False}).content
+        r = auth_client.post("/api/fec/importer/masse", params={"progression": True},
+                             files={"file": ("fec.txt", export, "text/plain")})
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        etapes = [json.loads(l) for l in r.text.splitlines()]
+        assert etapes[-1]["termine"] and etapes[-1]["lignes_importees"] == 9
+
+    def test_import_fec_masse_entete_invalide(self, auth_client):
+        r = auth_client.post("/api/fec/importer/masse",
+                             files={"file": ("fec.txt", b"a\tb\n1\t2\n", "text/plain")})
+        assert r.status_code == 400
+
+    def test_export_fec_zip(self, auth_client):
+        import io
+        import zipfile
+        r = auth_client.get("/api/fec/exporter",
+                            params={"siren": "123456789", "date_cloture": "2026-12-31",
+                                    "validees_seulement": False, "zip": True})
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/zip"
+        assert "123456789FEC20261231.zip" in r.headers["content-disposition"]
+        with zipfile.ZipFile(io.BytesIO(r.content)) as zf:
+            assert zf.read("123456789FEC20261231.txt").startswith(b"\xef\xbb\xbfJournalCode")
+
+    def test_analyse_factures_lot_comptabilisee(self, auth_client):
+        import io
+        import zipfile
+        from api import index
+        facture = ("ACME SARL\nFacture N° {}\nDate facture : 10/02/2026\n"
+                   "Total HT : 50,00\nTVA 20 % : 10,00\nTotal TTC : 60,00\n")
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("lot/fa2.txt", facture.format("FA-2"))
+            zf.writestr("lot/fa3.txt", facture.format("FA-3"))
+        r = auth_client.post(
+            "/api/factures/analyser/lot", params={"comptabiliser": True},
+            files=[("fichiers", ("fa1.txt", facture.format("FA-1").encode(), "text/plain")),
+                   ("fichiers", ("lot.zip", buf.getvalue(), "application/zip"))],
+        )
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        *documents, bilan = [json.loads(l) for l in r.text.splitlines()]
+        assert sorted(d["numero"] for d in documents) == ["FA-1", "FA-2", "FA-3"]
+        assert all(d["ecriture_id"] for d in documents)
+        assert bilan["termine"] and bilan["ecritures_enregistrees"] == 3
+        assert index._moteur.nb_ecritures() == 6
+
+    def test_get_conditionnel_base_de_connaissances(self, auth_client):
+        r = auth_client.get("/api/bibliotheque/knowledge", headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200 and r.headers["content-encoding"] == "gzip"
+        etag = r.headers["etag"]
+        r = auth_client.get("/api/bibliotheque/knowledge", headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        # Ecriture sans rapport avec la base : l'ETag reste valide
+        auth_client.post("/api/factures/statut", data={"facture_id": "F-1", "statut": "paye"})
+        r = auth_client.get("/api/bibliotheque/knowledge", headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        auth_client.post("/api/rh/entretiens", data={
+            "salarie_id": "S-1", "type_entretien": "annuel", "date_entretien": "2026-03-02",
+        })
+        r = auth_client.get("/api/bibliotheque/knowledge", headers={"If-None-Match": etag})
+        assert r.status_code == 200 and r.headers["etag"] != etag
+
+    def test_audit_memoise_par_version(self, auth_client, monkeypatch):
+        from api import index
+        calculs = []
+        calculer = index._calculer_audit
+        monkeypatch.setattr(index, "_calculer_audit", lambda *a: calculs.append(a) or calculer(*a))
+        premier = auth_client.get("/api/bibliotheque/knowledge/audit").json()
+        assert auth_client.get("/api/bibliotheque/knowledge/audit").json() == premier
+        assert len(calculs) == 1
+        auth_client.post("/api/auth/refresh")
+        auth_client.post("/api/factures/statut", data={"facture_id": "F-2", "statut": "paye"})
+        assert auth_client.get("/api/bibliotheque/knowledge/audit").json() == premier
+        assert len(calculs) == 1
+        auth_client.post("/api/rh/entretiens", data={
+            "salarie_id": "S-1", "type_entretien": "annuel", "date_entretien": "2026-03-02",
+        })
+        auth_client.get("/api/bibliotheque/knowledge/audit")
+        assert len(calculs) == 2
+
+    def test_audit_recalcule_les_seules_annees_touchees(self, monkeypatch):
+        import copy
+        from datetime import date
+        from decimal import Decimal
+        from types import SimpleNamespace
+        from api import index
+        from urssaf_analyzer.models.documents import DateRange, Declaration
+        monkeypatch.setattr(index, "_biblio_knowledge", copy.deepcopy(index._DEFAULT_KB))
+        monkeypatch.setattr(index, "_versions_annee_kb", {})
+        monkeypatch.setattr(index, "_cache_controles_annee", {})
+        avant_2024, avant_2025 = index._controles_annee(2024), index._controles_annee(2025)
+        assert avant_2025 == {"documentee": False, "effectif": 0, "smic": [], "plafonds": []}
+
+        bulletin = Declaration(type_declaration="bulletin", masse_salariale_brute=Decimal("900"),
+                               periode=DateRange(date(2025, 3, 1), date(2025, 3, 31)))
+        index._alimenter_knowledge(SimpleNamespace(declarations=[bulletin], findings=[]))
+        assert index._controles_annee(2024) is avant_2024
+        apres_2025 = index._controles_annee(2025)
+        assert apres_2025["documentee"] and apres_2025["smic"] == ["2025: brut 900 EUR < SMIC 1802 EUR"]
+
+    def test_lettrage_automatique_et_delettrage(self, auth_client):
+        from datetime import date
+        from decimal import Decimal
+        from api import index
+        index._moteur.generer_ecriture_reglement(
+            date_reglement=date(2026, 2, 1), montant=Decimal("240"), compte_tiers="401000",
+        )
+        r = auth_client.post("/api/comptabilite/lettrage", params={"comptes": "401000"})
+        assert r.status_code == 200
+        assert r.json()["par_methode"]["combinaison"] == 1 and r.json()["lignes_lettrees"] == 3
+        r = auth_client.delete("/api/comptabilite/lettrage", params={"compte": "401000"})
+        assert r.status_code == 200 and r.json()["lignes_delettrees"] == 3
+        r = auth_client.post("/api/comptabilite/lettrage", params={"progression": True})
+        etapes = [json.loads(l) for l in r.text.splitlines()]
+        assert etapes[-1]["termine"] and etapes[-1]["groupes"] == 1
+
+    def test_serie_tva_annuelle(self, auth_client):
+        r = auth_client.get("/api/comptabilite/tva/annee", params={"annee": 2026})
+        assert r.status_code == 200
+        data = r.json()
+        assert len(data["mois"]) == 12 and len(data["trimestres"]) == 4
+        assert data["mois"][0]["tva_deductible_biens_services"] == 60.0
+        assert data["annuelle"]["credit_tva"] == 60.0
+        r = auth_client.get("/api/comptabilite/declaration-tva", params={"trimestre": 1, "annee": 2026})
+        assert r.json() == data["trimestres"][0]
+
+
+# ==============================
+# Subventions
+# ==============================
+
+class TestSubventionsAPI:
+    """Recherche de subventions : unitaire et par lot (portefeuille)."""
+
+    @pytest.fixture
+    def auth_client(self, client):
+        import auth
+        token = auth.generate_token({"email": "sub@test.fr", "role": "admin", "tenant_id": "t-sub"})
+        client.headers["Authorization"] = f"Bearer {token}"
+        return client
+
+    def test_recherche_par_code_naf(self, auth_client):
+        r = auth_client.get("/api/subventions/recherche",
+                            params={"code_naf": "6201Z", "effectif": 12, "innovation": "true"})
+        assert r.status_code == 200
+        data = r.json()
+        ids = {a["id"] for a in data["aides"]}
+        assert {"cir", "cii", "cifre"} <= ids
+        assert "ci-ia" not in ids  # exige aussi le critere numerique
+        assert data["total"] == len(data["aides"])
+        assert r.headers.get("etag")
+
+    def test_lot_identique_a_la_recherche_unitaire(self, auth_client):
+        profil = {"code_naf": "J", "effectif": 5, "age_entreprise": 1,
+                  "masse_salariale": 300000, "innovation": True, "creation_reprise": True}
+        unitaire = auth_client.get("/api/subventions/recherche", params=profil).json()
+        r = auth_client.post("/api/subventions/recherche/lot", json={"entreprises": [
+            {"reference": "A", **profil}, {"reference": "B", "effectif": 300, "zone": "zrr"}, {"reference": "C", **profil},
+        ]})
+        assert r.status_code == 200
+        data = r.json()
+        assert data["total_entreprises"] == 3 and data["profils_distincts"] == 2
+        assert [res["reference"] for res in data["resultats"]] == ["A", "B", "C"]
+        assert data["resultats"][0]["aides"] == unitaire["aides"]
+        assert data["montant_potentiel_max_realiste_total"] == round(
+            sum(res["montant_potentiel_max_realiste"] for res in data["resultats"]), 2)
+
+        resume = auth_client.post("/api/subventions/recherche/lot",
+                                  json={"entreprises": [profil], "detail": False}).json()
+        assert resume["resultats"][0]["ids_aides"] == [a["id"] for a in unitaire["aides"]]
+        assert "aides" not in resume["resultats"][0]
+
+    def test_lot_invalide(self, auth_client):
+        assert auth_client.post("/api/subventions/recherche/lot", json={}).status_code == 400
+        r = auth_client.post("/api/subventions/recherche/lot", json={"entreprises": [{"effectif": "dix"}]})
+        assert r.status_code == 400
+        assert "effectif" in r.json()["detail"]
+
+
+# ==============================
+# Alertes RH
+# ==============================
+
+class TestAlertesRHAPI:
+    """Alertes RH servies par l'index des echeances, mis a jour a l'ecriture."""
+
+    @pytest.fixture
+    def auth_client(self, client):
+        import auth
+        token = auth.generate_token({"email": "rh@test.fr", "role": "admin", "tenant_id": "t-rh"})
+        client.headers["Authorization"] = f"Bearer {token}"
+        return client
+
+    def _alertes_contrat(self, client, contrat_id):
+        r = client.get("/api/rh/alertes")
+        assert r.status_code == 200
+        return [a for a in r.json()["alertes"] if a.get("contrat_id") == contrat_id]
+
+    def test_fin_cdd_suit_les_ecritures(self, auth_client):
+        from datetime import date, timedelta
+        fin = (date.today() + timedelta(days=5)).isoformat()
+        r = auth_client.post("/api/rh/contrats", data={
+            "type_contrat": "CDD", "nom_salarie": "Alerte", "prenom_salarie": "Test", "poste": "Agent",
+            "date_debut": "2026-01-05", "date_fin": fin, "salaire_brut": "2000", "motif_cdd": "accroissement",
+        })
+        assert r.status_code == 200
+        contrat_id = r.json()["id"]
+
+        alertes = self._alertes_contrat(auth_client, contrat_id)
+        assert [a["type"] for a in alertes] == ["fin_cdd"]
+        assert alertes[0]["urgence"] == "haute" and alertes[0]["titre"]
+        assert self._alertes_contrat(auth_client, contrat_id)[0]["id"] == alertes[0]["id"]
+
+        r = auth_client.post(f"/api/rh/contrats/{contrat_id}/modifier", data={"type_contrat": "CDI"})
+        assert r.status_code == 200
+        assert self._alertes_contrat(auth_client, contrat_id) == []
+
+
+# ==============================
+# Planning RH
+# ==============================
+
+class TestPlanningAPI:
+    """Vues jour / mois / annee du planning servies par l'index du planning."""
+
+    @pytest.fixture
+    def auth_client(self, client):
+        import auth
+        token = auth.generate_token({"email": "planning@test.fr", "role": "admin", "tenant_id": "t-planning"})
+        client.headers["Authorization"] = f"Bearer {token}"
+        return client
+
+    def test_vues_suivent_ajouts_et_suppressions(self, auth_client):
+        sid = "sal-planning-idx"
+        r = auth_client.post("/api/rh/planning", data={
+            "salarie_id": sid, "date": "2031-03-02", "date_fin": "2031-03-08",
+            "heure_debut": "09:00", "heure_fin": "17:00", "type_poste": "normal",
+        })
+        assert r.status_code == 200 and r.json()["nb_creneaux_crees"] == 5
+        # Meme creneau : modifie sur place, pas de doublon
+        r = auth_client.post("/api/rh/planning", data={
+            "salarie_id": sid, "date": "2031-03-03", "heure_debut": "09:00", "heure_fin": "12:00",
+            "type_poste": "normal",
+        })
+        creneau_id = r.json()["id"]
+
+        jour = auth_client.get("/api/rh/planning/jour", params={"date_jour": "2031-03-03", "salarie_id": sid}).json()
+        assert [e["duree_heures"] for e in jour["entrees"]] == [3.0]
+        mois = auth_client.get("/api/rh/planning/mois", params={"annee": 2031, "mois": 3, "salarie_id": sid}).json()
+        assert mois["total_heures_planifiees"] == 35.0
+        annee = auth_client.get("/api/rh/planning/annee", params={"annee": 2031, "salarie_id": sid}).json()
+        assert annee["mois"][2]["jours_travailles"] == 5 and annee["total_heures"] == 35.0
+
+        assert auth_client.delete(f"/api/rh/planning/{creneau_id}").status_code == 200
+        annee = auth_client.get("/api/rh/planning/annee", params={"annee": 2031, "salarie_id": sid}).json()
+        assert annee["mois"][2]["jours_travailles"] == 4 and annee["total_heures"] == 32.0
+
+
+
+# ==============================
+# Doublons de salaries
+# ==============================
+
+class TestDoublonsAPI:
+    """Detection des doublons de salaries par blocage et rapprochement approche."""
+
+    @pytest.fixture
+    def auth_client(self, client):
+        import auth
+        token = auth.generate_token({"email": "doublons@test.fr", "role": "admin", "tenant_id": "t-doublons"})
+        client.headers["Authorization"] = f"Bearer {token}"
+        return client
+
+    def _contrat(self, client, nom, prenom, nir=""):
+        r = client.post("/api/rh/contrats", data={
+            "type_contrat": "CDI", "nom_salarie": nom, "prenom_salarie": prenom, "poste": "Agent",
+            "date_debut": "2026-02-02", "salaire_brut": "2100", "nir": nir,
+        })
+        assert r.status_code == 200
+        return r.json()
+
+    def _groupe(self, client, contrat_id):
+        doublons = client.get("/api/rh/doublons").json()["doublons"]
+        return next((d for d in doublons if contrat_id in {f["id"] for f in d["fiches"]}), None)
+
+    def test_variantes_detectees_puis_fusionnees(self, auth_client):
+        premier = self._contrat(auth_client, "Lefèvre-Doublon", "Hélène")
+        second = self._contrat(auth_client, "LEFEVRE DOUBLON", "helene")
+        assert [d["id"] for d in second["doublons_detectes"]] == [premier["id"]]
+        troisieme = self._contrat(auth_client, "Helene", "Lefevre Doublonn")
+        assert [d["id"] for d in troisieme["doublons_detectes"]] == [premier["id"], second["id"]]
+
+        groupe = self._groupe(auth_client, premier["id"])
+        assert [f["id"] for f in groupe["fiches"]] == [premier["id"], second["id"], troisieme["id"]]
+        assert groupe["type"] == "nom_prenom_proche" and 0.9 <= groupe["score"] < 1
+
+        for doublon in (second, troisieme):
+            r = auth_client.post("/api/rh/doublons/fusionner",
+                                 json={"id_garder": premier["id"], "id_supprimer": doublon["id"]})
+            assert r.status_code == 200
+        assert self._groupe(auth_client, premier["id"]) is None
+
+    def test_index_synchronise_hors_boucle_et_au_demarrage(self, auth_client, monkeypatch):
+        from api import index
+        sous_verrou = []
+        synchroniser = index._identites_salaries
+        monkeypatch.setattr(index, "_identites_salaries",
+                            lambda *a: sous_verrou.append(index._verrou_identites.locked()) or synchroniser(*a))
+        self._contrat(auth_client, "Verrou", "Paul")
+        assert auth_client.get("/api/rh/doublons", params={"etendu": True}).status_code == 200
+        assert sous_verrou == [True, True]
+
+        index._indexer_identites()
+        version = index._generation_donnees.empreinte()
+        assert all(index._identites._versions[s] == version for s in index._SOURCES_IDENTITES)
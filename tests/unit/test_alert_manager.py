@@ -265,3 +265,112 @@ class TestAlertManagerPersistence:
                                 "first_invalid": 1, "detail": "test"})
         assert len(received) == 1
         assert received[0].alert_type == AlertType.PROOF_CHAIN_RUPTURE
+
+
+class TestAlertJournalSegments:
+    """Journal partitionne par jour et index (type, severite, date)."""
+
+    @staticmethod
+    def _ecrire_segment(manager, jour, alertes):
+        path = manager.journal.segment_path(jour)
+        with open(path, "a", encoding="utf-8") as f:
+            for a in alertes:
+                f.write(json.dumps(a) + "\n")
+        return path
+
+    @staticmethod
+    def _alerte(ts, type_="volume_anormal", severity="moyenne"):
+        return {"timestamp": ts.isoformat(), "type": type_, "severity": severity, "message": "m"}
+
+    def test_segment_du_jour_et_lien(self, manager, alert_log):
+        from datetime import datetime, timezone
+        manager.check_proof_chain({"valid": False, "entries": 1, "first_invalid": 1, "detail": "x"})
+        jour = datetime.now(timezone.utc).date()
+        assert alert_log.is_symlink()
+        assert alert_log.resolve() == manager.journal.segment_path(jour).resolve()
+
+    def test_requete_24h_ignore_les_segments_anciens(self, manager):
+        from datetime import datetime, timedelta, timezone
+        now = datetime.now(timezone.utc)
+        ancien = now - timedelta(days=10)
+        self._ecrire_segment(manager, ancien.date(), [
+            self._alerte(ancien, "rupture_chaine_preuve", "critique") for _ in range(50)
+        ])
+        self._ecrire_segment(manager, now.date(), [
+            self._alerte(now, "rupture_chaine_preuve", "critique"),
+            self._alerte(now),
+        ])
+        recentes = manager.get_alerts(severity=AlertSeverity.CRITIQUE, since_hours=24)
+        assert len(recentes) == 1
+        assert manager.journal.segment_path(ancien.date()) not in manager.journal._indexes
+        assert manager.count_alerts(severity=AlertSeverity.CRITIQUE) == 1
+        assert len(manager.get_alerts(severity=AlertSeverity.CRITIQUE)) == 51
+
+    def test_get_alerts_limit_ordre_chronologique(self, manager):
+        from datetime import datetime, timedelta, timezone
+        now = datetime.now(timezone.utc)
+        for jours in (3, 2, 1):
+            ts = now - timedelta(days=jours)
+            self._ecrire_segment(manager, ts.date(), [self._alerte(ts)])
+        alerts = manager.get_alerts(limit=2)
+        assert [a["timestamp"] for a in alerts] == [
+            (now - timedelta(days=2)).isoformat(), (now - timedelta(days=1)).isoformat(),
+        ]
+
+    def test_index_incremental_ecritures_externes(self, manager):
+        from datetime import datetime, timezone
+        now = datetime.now(timezone.utc)
+        assert manager.count_alerts() == 0
+        # Alerte ecrite par un autre worker directement dans le segment
+        self._ecrire_segment(manager, now.date(), [self._alerte(now)])
+        assert manager.count_alerts() == 1
+        self._ecrire_segment(manager, now.date(), [self._alerte(now)])
+        assert manager.count_alerts(alert_type=AlertType.ANOMALOUS_VOLUME) == 2
+
+    def test_migration_journal_historique(self, tmp_path):
+        from datetime import datetime, timedelta, timezone
+        legacy = tmp_path / "alerts.jsonl"
+        now = datetime.now(timezone.utc)
+        hier = now - timedelta(days=1)
+        legacy.write_text(
+            json.dumps(self._alerte(hier)) + "\n" + json.dumps(self._alerte(now)) + "\n",
+            encoding="utf-8",
+        )
+        mgr = AlertManager(alert_log_path=legacy)
+        assert legacy.is_symlink()
+        assert mgr.journal.segment_path(hier.date()).exists()
+        assert len(mgr.get_alerts()) == 2
+
+    def test_migration_conserve_les_lignes_illisibles(self, tmp_path):
+        from datetime import datetime, timezone
+        legacy = tmp_path / "alerts.jsonl"
+        legacy.write_text(json.dumps(self._alerte(datetime.now(timezone.utc))) + "\n{tronquee\n", encoding="utf-8")
+        mgr = AlertManager(alert_log_path=legacy)
+        assert len(mgr.get_alerts()) == 1
+        assert (tmp_path / "alerts.rejets").read_text(encoding="utf-8") == "{tronquee\n"
+
+    def test_compactage_planifie(self, manager):
+        taches = []
+
+        class Planificateur:
+            def ajouter_tache(self, nom, fonction):
+                taches.append((nom, fonction))
+
+        manager.planifier_compactage(Planificateur(), retention_jours=365)
+        (nom, fonction), = taches
+        assert nom == "compactage_alerts"
+        assert fonction() == {"compresses": 0, "supprimes": 0}
+
+    def test_compaction_et_retention(self, manager):
+        from datetime import datetime, timedelta, timezone
+        now = datetime.now(timezone.utc)
+        vieux = now - timedelta(days=400)
+        moyen = now - timedelta(days=30)
+        self._ecrire_segment(manager, vieux.date(), [self._alerte(vieux)])
+        p_moyen = self._ecrire_segment(manager, moyen.date(), [self._alerte(moyen)])
+        self._ecrire_segment(manager, now.date(), [self._alerte(now)])
+        stats = manager.compacter_journal(compresser_apres_jours=7, retention_jours=365)
+        assert stats == {"compresses": 1, "supprimes": 1}
+        assert not p_moyen.exists()
+        assert p_moyen.with_name(p_moyen.name + ".gz").exists()
+        assert len(manager.get_alerts()) == 2
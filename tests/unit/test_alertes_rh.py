@@ -0,0 +1,179 @@
+"""Tests de l'index des echeances RH (urssaf_analyzer/rh/alertes.py)."""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from urssaf_analyzer.rh import alertes as alertes_rh
+from urssaf_analyzer.rh.alertes import DonneesRH, Echeance, IndexEcheances, MoteurAlertesRH, id_alerte
+
+JOUR = date(2026, 6, 10)
+
+
+def _echeance(ident, debut, fin):
+    return Echeance(debut, fin, ident, "fin_cdd", lambda jour: {"urgence": "info", "message": ident})
+
+
+def _contrat(**kw):
+    contrat = {"id": "c1", "salarie_id": "s1", "nom_salarie": "Martin", "prenom_salarie": "Alice",
+               "poste": "Comptable", "type_contrat": "CDI", "statut": "actif",
+               "date_debut": "2020-01-06", "periode_essai_jours": 0}
+    contrat.update(kw)
+    return contrat
+
+
+def _donnees(contrats=(), **kw):
+    stores = {n: list(kw.get(n, ())) for n in ("entretiens", "visites", "arrets", "conges", "sanctions")}
+    return DonneesRH(list(contrats), **stores)
+
+
+def _types(alertes):
+    return [a["type"] for a in alertes]
+
+
+class TestIndexEcheances:
+
+    def test_fenetres_ouvertes_et_fermees_au_fil_des_jours(self):
+        index = IndexEcheances()
+        index.remplacer("g", [_echeance("a", JOUR, JOUR + timedelta(days=2)),
+                              _echeance("b", JOUR + timedelta(days=5), JOUR + timedelta(days=5))])
+        assert [e.id for e in index.actives(JOUR - timedelta(days=1))] == []
+        assert [e.id for e in index.actives(JOUR)] == ["a"]
+        assert [e.id for e in index.actives(JOUR + timedelta(days=2))] == ["a"]
+        assert [e.id for e in index.actives(JOUR + timedelta(days=5))] == ["b"]
+        assert [e.id for e in index.actives(JOUR + timedelta(days=6))] == []
+        # Retour en arriere : reconstruction
+        assert [e.id for e in index.actives(JOUR + timedelta(days=1))] == ["a"]
+
+    def test_remplacer_un_groupe_retire_ses_anciennes_echeances(self):
+        index = IndexEcheances()
+        index.actives(JOUR)
+        index.remplacer("g1", [_echeance("a", JOUR, JOUR)])
+        index.remplacer("g2", [_echeance("b", JOUR, JOUR)])
+        index.remplacer("g1", [_echeance("c", JOUR, JOUR)])
+        assert sorted(e.id for e in index.actives(JOUR)) == ["b", "c"]
+        index.remplacer("g2", ())
+        assert [e.id for e in index.actives(JOUR)] == ["c"]
+        assert len(index) == 1 and index.groupes() == {"g1"}
+
+    def test_compaction_des_tas(self):
+        index = IndexEcheances()
+        index.actives(JOUR)
+        for i in range(500):
+            index.remplacer("g", [_echeance(str(i), JOUR, JOUR + timedelta(days=3)),
+                                  _echeance(f"f{i}", JOUR + timedelta(days=9), JOUR + timedelta(days=9))])
+        assert len(index._a_venir) + len(index._ouvertes) <= 2 * len(index) + 64
+        assert [e.id for e in index.actives(JOUR)] == ["499"]
+
+
+class TestRegles:
+
+    def test_fin_cdd_urgence_selon_jours_restants(self):
+        fin = JOUR + timedelta(days=5)
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees([_contrat(type_contrat="CDD", date_fin=fin.isoformat(),
+                                                          date_debut="2026-05-01")]))
+        cdd = [a for a in moteur.alertes(JOUR) if a["type"] == "fin_cdd"]
+        assert len(cdd) == 1
+        assert cdd[0]["urgence"] == "haute" and "5 jour(s)" in cdd[0]["message"]
+        assert cdd[0]["titre"] == "Fin cdd" and cdd[0]["description"] == cdd[0]["message"]
+        moyenne = moteur.alertes(fin - timedelta(days=20))
+        assert [a["urgence"] for a in moyenne if a["type"] == "fin_cdd"] == ["moyenne"]
+        assert "fin_cdd" not in _types(moteur.alertes(fin + timedelta(days=1)))
+        assert "fin_cdd" not in _types(moteur.alertes(fin - timedelta(days=31)))
+
+    def test_visite_medicale_retard_puis_planification(self):
+        visites = [{"salarie_id": "s1", "date_visite": "2024-01-01", "date_prochaine": "2026-06-20"},
+                   {"salarie_id": "s1", "date_visite": "2024-06-01", "date_prochaine": "2026-06-30"}]
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees([_contrat()], visites=visites))
+        assert "visite_medicale_a_planifier" in _types(moteur.alertes(JOUR))
+        retard = [a for a in moteur.alertes(date(2026, 6, 25)) if a["type"] == "visite_medicale_retard"]
+        assert retard and "retard: 5 jour(s)" in retard[0]["message"] and "Alice Martin" in retard[0]["message"]
+
+    def test_medaille_du_travail_a_six_mois_du_seuil(self):
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees([_contrat(date_debut="2006-06-10")]))
+        assert "medaille_travail" in _types(moteur.alertes(JOUR))
+        assert "medaille_travail" not in _types(moteur.alertes(date(2027, 1, 1)))
+
+    def test_date_invalide_ignoree(self):
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees([_contrat(date_debut="pas une date", type_contrat="CDD",
+                                                          date_fin="2026-06-12")]))
+        assert "fin_cdd" in _types(moteur.alertes(JOUR))
+
+    def test_obligations_selon_effectif_et_das2(self):
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees())
+        assert "cse_obligatoire" not in _types(moteur.alertes(JOUR))
+        contrats = [_contrat(id=f"c{i}", salarie_id=f"s{i}") for i in range(11)]
+        moteur.synchroniser(2, lambda: DonneesRH(contrats, [], [], [], [], [], True))
+        types = _types(moteur.alertes(JOUR))
+        assert "cse_obligatoire" in types and "das2_honoraires" in types
+        assert "participation_obligatoire" not in types
+
+    def test_echeances_fiscales_a_cheval_sur_deux_annees(self):
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees())
+        fiscales = [a for a in moteur.alertes(date(2026, 12, 28)) if a["type"] == "echeance_fiscale"]
+        assert {a["echeance"] for a in fiscales} >= {"2026-12-31", "2027-01-15"}
+        janvier = [a for a in moteur.alertes(date(2027, 1, 3)) if a.get("echeance") == "2026-12-31"]
+        assert janvier[0]["urgence"] == "haute" and "(-3 jour(s))" in janvier[0]["description"]
+
+
+class TestMoteurAlertesRH:
+
+    def test_identifiants_stables(self):
+        donnees = _donnees([_contrat(type_contrat="CDD", date_fin="2026-06-20")])
+        premier, second = MoteurAlertesRH(), MoteurAlertesRH()
+        premier.synchroniser(1, lambda: donnees)
+        second.synchroniser(1, lambda: donnees)
+        ids = [a["id"] for a in premier.alertes(JOUR)]
+        assert ids == [a["id"] for a in second.alertes(JOUR)]
+        assert ids == [a["id"] for a in premier.alertes(JOUR + timedelta(days=1)) if a["id"] in ids]
+        assert id_alerte("fin_cdd", "c1", date(2026, 6, 20)) in ids
+
+    def test_seuls_les_salaries_modifies_sont_recalcules(self, monkeypatch):
+        contrats = [_contrat(id=f"c{i}", salarie_id=f"s{i}") for i in range(20)]
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser("v1", lambda: _donnees(contrats))
+        recalcules = []
+        original = alertes_rh.echeances_salarie
+        monkeypatch.setattr(alertes_rh, "echeances_salarie",
+                            lambda sid, *stores: recalcules.append(sid) or original(sid, *stores))
+
+        moteur.synchroniser("v1", lambda: pytest.fail("version inchangee : pas de relecture"))
+        contrats[3]["type_contrat"] = "CDD"
+        contrats[3]["date_fin"] = "2026-06-15"
+        moteur.synchroniser("v2", lambda: _donnees(contrats))
+        assert recalcules == ["s3"]
+        assert "fin_cdd" in _types(moteur.alertes(JOUR))
+
+        del contrats[3]
+        moteur.synchroniser("v3", lambda: _donnees(contrats))
+        assert "fin_cdd" not in _types(moteur.alertes(JOUR))
+
+    def test_alertes_retournees_sont_des_copies(self):
+        moteur = MoteurAlertesRH()
+        moteur.synchroniser(1, lambda: _donnees([_contrat()]))
+        moteur.alertes(JOUR)[0]["urgence"] = "modifiee"
+        assert all(a["urgence"] != "modifiee" for a in moteur.alertes(JOUR))
+
+    def test_rafraichissement_periodique(self):
+        moteur = MoteurAlertesRH(intervalle_secondes=0.01)
+        assert moteur.start() is True
+        assert moteur.start() is False
+        try:
+            for _ in range(200):
+                if moteur.nb_rafraichissements:
+                    break
+                moteur._arret.wait(0.01)
+        finally:
+            moteur.stop()
+        assert moteur.nb_rafraichissements >= 1
+        assert date.today().year in moteur.statistiques()["annees"]
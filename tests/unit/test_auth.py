@@ -203,3 +203,110 @@ class TestUserManagement:
     def test_user_has_tenant(self):
         user = create_user("tenant@example.com", "SecurePass123!", "Tenant", "User")
         assert "tenant_id" in user
+
+
+# ==============================
+# KDF hors boucle asyncio
+# ==============================
+
+class TestKdfAsync:
+    """Tests des variantes non bloquantes (pool KDF) et du rehash transparent."""
+
+    def setup_method(self):
+        import auth
+        auth._users = {}
+
+    def test_hash_verify_async(self):
+        import asyncio
+        from auth import hash_password_async, verify_password_async
+        h = asyncio.run(hash_password_async("SuperSecret42!"))
+        assert verify_password("SuperSecret42!", h) is True
+        assert asyncio.run(verify_password_async("SuperSecret42!", h)) is True
+        assert asyncio.run(verify_password_async("mauvais", h)) is False
+
+    def test_create_user_async(self):
+        import asyncio
+        import pytest
+        from auth import create_user_async, authenticate_async
+        user = asyncio.run(create_user_async("async@example.com", "SecurePass123!", "Async", "User"))
+        assert "password_hash" not in user
+        assert "password_iterations" not in user
+        assert asyncio.run(authenticate_async("async@example.com", "SecurePass123!"))["email"] == "async@example.com"
+        assert asyncio.run(authenticate_async("async@example.com", "incorrect")) is None
+        with pytest.raises(ValueError, match="deja utilise"):
+            asyncio.run(create_user_async("async@example.com", "SecurePass456!", "Async", "Two"))
+
+    def test_rehash_si_parametres_changes(self, monkeypatch):
+        import asyncio
+        import auth
+        from auth import authenticate_async
+        create_user("legacy@example.com", "SecurePass123!", "Legacy", "User")
+        stored = auth._users["legacy@example.com"]
+        # Simule un hash enregistre avant l'ajout du champ password_iterations
+        del stored["password_iterations"]
+        ancien_hash = stored["password_hash"]
+        monkeypatch.setattr(auth, "PBKDF2_ITERATIONS", 1_000)
+        assert asyncio.run(authenticate_async("legacy@example.com", "SecurePass123!")) is not None
+        assert stored["password_iterations"] == 1_000
+        assert stored["password_hash"] != ancien_hash
+        assert verify_password("SecurePass123!", stored["password_hash"], 1_000) is True
+        # Le login suivant utilise le nouveau hash sans rehash
+        nouveau_hash = stored["password_hash"]
+        assert authenticate("legacy@example.com", "SecurePass123!") is not None
+        assert stored["password_hash"] == nouveau_hash
+
+
+# ==============================
+# Cache des tokens verifies et revocation partagee
+# ==============================
+
+class TestTokenCache:
+    """Tests du cache des tokens verifies et de la revocation inter-workers."""
+
+    def setup_method(self):
+        import auth
+        auth._token_cache.clear()
+        auth._token_blacklist = {}
+
+    def test_decode_repete_evite_la_verification(self, monkeypatch):
+        import auth
+        token = jwt_encode({"sub": "cache@example.com", "jti": "jti-cache", "exp": time.time() + 3600})
+        appels = []
+        verifier = auth._jwt_verify
+        monkeypatch.setattr(auth, "_jwt_verify", lambda t: appels.append(t) or verifier(t))
+        assert jwt_decode(token)["sub"] == "cache@example.com"
+        assert jwt_decode(token)["sub"] == "cache@example.com"
+        assert len(appels) == 1
+
+    def test_payload_retourne_est_une_copie(self):
+        token = jwt_encode({"sub": "copie@example.com"})
+        jwt_decode(token)["sub"] = "modifie"
+        assert jwt_decode(token)["sub"] == "copie@example.com"
+
+    def test_cache_borne(self, monkeypatch):
+        import auth
+        monkeypatch.setattr(auth, "TOKEN_CACHE_SIZE", 3)
+        for i in range(10):
+            jwt_decode(jwt_encode({"sub": f"u{i}"}))
+        assert len(auth._token_cache) == 3
+
+    def test_revocation_locale_invalide_le_cache(self):
+        import auth
+        token = jwt_encode({"sub": "rev@example.com", "jti": "jti-local", "exp": time.time() + 3600})
+        assert jwt_decode(token) is not None
+        assert auth.revoke_token(token) is True
+        assert jwt_decode(token) is None
+
+    def test_revocation_autre_worker(self, tmp_path, monkeypatch):
+        import auth
+        import persistence
+        monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+        monkeypatch.setattr(auth, "_revocation_store", persistence.RevocationStore("revoked_test"))
+        monkeypatch.setattr(auth, "_revocation_seq", 0)
+        monkeypatch.setattr(auth, "REVOCATION_SYNC_SECONDS", 0)
+        token = jwt_encode({"sub": "multi@example.com", "jti": "jti-multi", "exp": time.time() + 3600})
+        assert jwt_decode(token) is not None
+        # Logout traite par un autre worker (autre connexion a la meme base)
+        persistence.RevocationStore("revoked_test").add("jti-multi", time.time() + 3600)
+        assert jwt_decode(token) is None
+        assert not any(p.get("jti") == "jti-multi" for _, p in auth._token_cache.values())
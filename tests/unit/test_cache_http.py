@@ -0,0 +1,106 @@
+"""Tests de la compression et des GET conditionnels (cache_http)."""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from cache_http import GenerationDonnees, ReponsesConditionnelles, etag_route  # noqa: E402
+
+
+@pytest.fixture
+def contexte():
+    generation = GenerationDonnees()
+    appels = []
+    app = FastAPI()
+    app.add_middleware(ReponsesConditionnelles, empreintes={"/donnees": generation.empreinte}, seuil=200)
+
+    @app.get("/donnees")
+    def donnees(n: int = 100):
+        appels.append(n)
+        return {"valeurs": list(range(n))}
+
+    @app.get("/petit")
+    def petit():
+        return {"ok": True}
+
+    @app.get("/flux")
+    def flux():
+        return StreamingResponse((json.dumps({"i": i}) + "\n" for i in range(100)),
+                                 media_type="application/x-ndjson")
+
+    client = TestClient(app)
+    return client, generation, appels
+
+
+class TestCompression:
+
+    def test_au_dessus_du_seuil(self, contexte):
+        client, _, _ = contexte
+        r = client.get("/donnees", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert int(r.headers["content-length"]) < len(r.content)
+        assert "Accept-Encoding" in r.headers["vary"]
+        assert r.json()["valeurs"][-1] == 99
+
+    def test_petite_reponse_et_client_sans_gzip(self, contexte):
+        client, _, _ = contexte
+        assert "content-encoding" not in client.get("/petit", headers={"Accept-Encoding": "gzip"}).headers
+        r = client.get("/donnees", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in r.headers and len(r.json()["valeurs"]) == 100
+
+    def test_flux_non_compresse(self, contexte):
+        client, _, _ = contexte
+        r = client.get("/flux", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in r.headers
+        assert len(r.text.splitlines()) == 100
+
+
+class TestConditionnel:
+
+    def test_304_sans_executer_le_handler(self, contexte):
+        client, _, appels = contexte
+        r = client.get("/donnees")
+        etag = r.headers["etag"]
+        assert etag.startswith('W/"') and r.headers["cache-control"] == "private, no-cache"
+        r = client.get("/donnees", headers={"If-None-Match": etag})
+        assert r.status_code == 304 and r.content == b""
+        assert appels == [100]
+
+    def test_nouvelle_generation_invalide(self, contexte):
+        client, generation, appels = contexte
+        etag = client.get("/donnees").headers["etag"]
+        generation.incrementer()
+        r = client.get("/donnees", headers={"If-None-Match": etag})
+        assert r.status_code == 200 and r.headers["etag"] != etag
+        assert len(appels) == 2
+
+    def test_etag_depend_des_parametres(self, contexte):
+        client, _, _ = contexte
+        etag = client.get("/donnees", params={"n": 5}).headers["etag"]
+        assert client.get("/donnees", params={"n": 6}, headers={"If-None-Match": etag}).status_code == 200
+        assert client.get("/donnees", params={"n": 5}, headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+
+    def test_route_non_enregistree_sans_etag(self, contexte):
+        client, _, _ = contexte
+        assert "etag" not in client.get("/petit").headers
+
+
+def test_generation_propre_au_processus(monkeypatch):
+    generation = GenerationDonnees()
+    avant = generation.empreinte()
+    generation.incrementer()
+    assert generation.empreinte() != avant
+    monkeypatch.setattr("os.getpid", lambda: -1)
+    assert generation.empreinte().endswith(":0")
+    assert etag_route("a", "/x", b"n=1") != etag_route("a", "/x", b"n=2")
+
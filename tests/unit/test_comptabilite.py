@@ -85,6 +85,38 @@ class TestPlanComptable:
         assert len(results) > 0
         assert all("641" in c.numero for c in results)
 
+    def test_rechercher_identique_parcours_complet(self):
+        """L'index ne change ni les resultats ni leur ordre."""
+        self.plan.get_ou_creer_compte_tiers("Societe Generale Services", est_client=False)
+        for terme in ("urssaf", "641", "ti", "COTIS", "sécurité", "es", "e", "  ", "0", "xyz", "t s", "-", "'"):
+            attendu = [
+                c for c in self.plan.comptes.values()
+                if terme.lower() in c.libelle.lower() or terme.lower() in c.numero
+            ]
+            assert self.plan.rechercher(terme) == attendu, terme
+
+    def test_index_reconstruit_apres_modification_directe(self):
+        self.plan.rechercher("urssaf")
+        self.plan.comptes["999100"] = Compte("999100", "Compte Zephyr", ClasseCompte.TIERS)
+        assert [c.numero for c in self.plan.rechercher("zephyr")] == ["999100"]
+        del self.plan.comptes["999100"]
+        assert self.plan.rechercher("zephyr") == []
+
+    def test_tiers_au_dela_de_999(self):
+        """Les numeros auxiliaires continuent apres 411999 sans collision."""
+        for i in range(1001):
+            self.plan.get_ou_creer_compte_tiers(f"Client {i}", est_client=True)
+        num = self.plan.get_ou_creer_compte_tiers("Client 1000", est_client=True)
+        assert num == "4111001"
+        assert self.plan.get_compte("411999").libelle == "Client 998"
+        assert self.plan.get_ou_creer_compte_tiers("Nouveau", est_client=True) == "4111002"
+
+    def test_comptes_par_prefixe(self):
+        nums = [c.numero for c in self.plan.comptes_par_prefixe("645")]
+        assert nums and all(n.startswith("645") for n in nums)
+        assert nums == [n for n in self.plan.comptes if n.startswith("645")]
+        assert self.plan.comptes_par_prefixe("99") == []
+
     def test_get_comptes_classe(self):
         charges = self.plan.get_comptes_classe(ClasseCompte.CHARGES)
         assert len(charges) > 0
@@ -175,6 +207,19 @@ class TestLigneEcriture:
         l = LigneEcriture(compte="401000", libelle="Test", credit=Decimal("200"))
         assert l.solde == Decimal("-200")
 
+    def test_montants_en_centimes(self):
+        l = LigneEcriture("607000", "Achat", debit=Decimal("10.005"), credit=0.1)
+        assert (l.debit_centimes, l.credit_centimes) == (1001, 10)
+        assert l.debit == Decimal("10.01") and str(l.credit) == "0.10"
+        l.debit = "3,5".replace(",", ".")
+        assert l.debit_centimes == 350
+
+    def test_compacte(self):
+        l = LigneEcriture("607000", "Achat", debit=Decimal("1"))
+        assert not hasattr(l, "__dict__")
+        assert l == LigneEcriture.depuis_centimes("607000", "Achat", 100, 0)
+        assert "debit=Decimal('1.00')" in repr(l)
+
 
 class TestEcriture:
     """Tests de l'ecriture comptable."""
@@ -200,6 +245,27 @@ class TestEcriture:
         ])
         assert e.est_equilibree is False
 
+    def test_totaux_invalides_apres_modification(self):
+        ligne = LigneEcriture(compte="707000", libelle="Vente", credit=Decimal("90"))
+        e = Ecriture(lignes=[LigneEcriture(compte="411000", libelle="Client", debit=Decimal("100")), ligne])
+        assert e.total_credit == Decimal("90")
+        ligne.credit = Decimal("100")
+        assert e.est_equilibree is True
+        e.lignes.append(LigneEcriture(compte="445710", libelle="TVA", credit=Decimal("20")))
+        assert e.total_credit == Decimal("120.00")
+        del e.lignes[-1]
+        e.lignes[0].debit = Decimal("0")
+        assert e.totaux_centimes() == (0, 10000)
+        e.lignes = []
+        assert e.est_equilibree is True and e.total_debit == 0
+
+    def test_egalite_et_compacite(self):
+        a = Ecriture(id="x", date_ecriture=date(2026, 1, 1), lignes=[LigneEcriture("512000", "B", debit=1)])
+        b = Ecriture(id="x", date_ecriture=date(2026, 1, 1), lignes=[LigneEcriture("512000", "B", debit=1)])
+        assert a == b and not hasattr(a, "__dict__")
+        b.lignes[0].libelle = "C"
+        assert a != b
+
 
 class TestMoteurEcritures:
     """Tests du moteur d'ecritures."""
@@ -466,6 +532,52 @@ class TestGenerateurRapports:
         assert tva["tva_collectee"] > 0  # Vente = 1000 TVA collectee
         assert tva["tva_deductible_biens_services"] > 0  # Achat = 400 TVA deductible
 
+    def test_declaration_tva_limitee_au_mois(self):
+        self.moteur.generer_ecriture_facture(
+            type_doc="facture_vente", date_piece=date(2026, 2, 3), numero_piece="FV-002",
+            montant_ht=Decimal("100"), montant_tva=Decimal("20"), montant_ttc=Decimal("120"),
+        )
+        janvier = self.gen.declaration_tva(mois=1, annee=2026)
+        assert janvier["tva_collectee"] == 1000.0
+        assert janvier["tva_nette_a_payer"] == 600.0
+        fevrier = self.gen.declaration_tva(mois=2, annee=2026)
+        assert fevrier["tva_collectee"] == 20.0 and fevrier["chiffre_affaires_ht"] == 100.0
+        assert fevrier["tva_deductible_totale"] == 0.0
+        assert self.gen.declaration_tva(mois=3, annee=2026)["tva_collectee"] == 0.0
+
+    def test_tva_trimestrielle_annuelle_et_serie(self):
+        self.moteur.generer_ecriture_facture(
+            type_doc="facture_achat", date_piece=date(2026, 5, 3), numero_piece="FA-002",
+            montant_ht=Decimal("10000"), montant_tva=Decimal("2000"), montant_ttc=Decimal("12000"),
+        )
+        t1 = self.gen.declaration_tva_trimestrielle(trimestre=1, annee=2026)
+        assert t1["periode"] == "T1/2026" and t1["tva_nette_a_payer"] == 600.0
+        t2 = self.gen.declaration_tva_trimestrielle(trimestre=2, annee=2026)
+        assert t2["credit_tva"] == 2000.0
+        ca12 = self.gen.declaration_tva_annuelle(2026)
+        assert ca12["tva_deductible_biens_services"] == 2400.0 and ca12["credit_tva"] == 1400.0
+        serie = self.gen.serie_tva(2026)
+        assert [m["periode"] for m in serie["mois"]][:2] == ["01/2026", "02/2026"]
+        assert serie["mois"][4]["tva_deductible_totale"] == 2000.0
+        assert serie["trimestres"][0] == t1 and serie["trimestres"][1] == t2
+        assert serie["annuelle"] == ca12
+        assert self.gen.serie_tva(2025)["annuelle"]["tva_collectee"] == 0.0
+
+    def test_tva_sous_comptes_par_taux(self):
+        from urssaf_analyzer.comptabilite.ecritures import Ecriture, LigneEcriture
+        self.moteur.ajouter_ecriture(Ecriture(
+            journal=TypeJournal.VENTES, date_ecriture=date(2026, 1, 20), libelle="Vente 5,5 %",
+            lignes=[
+                LigneEcriture(compte="411000", libelle="Client", debit=Decimal("105.50")),
+                LigneEcriture(compte="707000", libelle="Vente", credit=Decimal("100")),
+                LigneEcriture(compte="445713", libelle="TVA 5,5 %", credit=Decimal("5.50")),
+            ],
+        ))
+        tva = self.gen.declaration_tva(mois=1, annee=2026)
+        assert tva["tva_collectee"] == 1005.5
+        detail = {d["compte"]: d["montant"] for d in tva["detail_comptes"]}
+        assert detail == {"445660": 400.0, "445710": 1000.0, "445713": 5.5}
+
     def test_recapitulatif_charges_sociales(self):
         recap = self.gen.recapitulatif_charges_sociales()
         assert recap["salaires_bruts"] == 3000.0
@@ -512,3 +624,188 @@ class TestGenerateurRapports:
         )
         # Ne devrait pas inclure la paie du 31 janvier
         assert "DUPONT" not in html or "2026-01-31" not in html
+
+
+# ==============================
+# Stockage SQLite des ecritures
+# ==============================
+
+class TestStockageEcritures:
+    """Tests du registre SQLite partage."""
+
+    def _facture(self, moteur, numero="FA-001", ht="1000"):
+        return moteur.generer_ecriture_facture(
+            type_doc="facture_achat",
+            date_piece=date(2026, 1, 15),
+            numero_piece=numero,
+            montant_ht=Decimal(ht),
+            montant_tva=Decimal(ht) / 5,
+            montant_ttc=Decimal(ht) * Decimal("1.2"),
+        )
+
+    def test_registre_partage_entre_workers(self, tmp_path):
+        from urssaf_analyzer.comptabilite.stockage import StockageEcritures
+        chemin = tmp_path / "ecritures.db"
+        worker_a = MoteurEcritures(stockage=StockageEcritures(chemin))
+        worker_b = MoteurEcritures(stockage=StockageEcritures(chemin))
+        e = self._facture(worker_a)
+        assert len(worker_b.ecritures) == 1
+        assert worker_b.get_ecriture(e.id).total_debit == Decimal("1200.00")
+        assert worker_b.get_balance() == worker_a.get_balance()
+
+    def test_modification_et_suppression_par_id(self):
+        moteur = MoteurEcritures()
+        e1 = self._facture(moteur, "FA-001")
+        e2 = self._facture(moteur, "FA-002")
+        e = moteur.get_ecriture(e2.id)
+        e.libelle = "Nouveau libelle"
+        e.lignes[0].libelle = "Ligne modifiee"
+        assert moteur.mettre_a_jour_ecriture(e) is True
+        relue = moteur.get_ecriture(e2.id)
+        assert relue.libelle == "Nouveau libelle"
+        assert relue.lignes[0].libelle == "Ligne modifiee"
+        assert moteur.supprimer_ecriture(e1.id).numero_piece == "FA-001"
+        assert moteur.get_ecriture(e1.id) is None
+        assert [x.id for x in moteur.ecritures] == [e2.id]
+
+    def test_lecture_filtree_ne_lit_que_les_lignes_du_lot(self):
+        from urssaf_analyzer.comptabilite.ecritures import TypeJournal
+        moteur = MoteurEcritures()
+        for i in range(20):
+            moteur.generer_ecriture_facture(
+                type_doc="facture_vente" if i % 10 == 0 else "facture_achat",
+                date_piece=date(2026, 1, 15), numero_piece=f"F-{i}",
+                montant_ht=Decimal("100"), montant_tva=Decimal("20"), montant_ttc=Decimal("120"),
+            )
+        stockage = moteur.stockage
+        lire = stockage._lire
+        lignes_lues = []
+
+        def espion(sql, params=()):
+            rows = lire(sql, params)
+            if "FROM lignes" in sql:
+                lignes_lues.extend(rows)
+            return rows
+
+        stockage._lire = espion
+        ventes = list(stockage.iterer(journal=TypeJournal.VENTES))
+        assert [e.numero_piece for e in ventes] == ["F-0", "F-10"]
+        assert len(lignes_lues) == sum(len(e.lignes) for e in ventes)
+
+    def test_balance_agregee_exacte(self):
+        moteur = MoteurEcritures()
+        for i in range(3):
+            self._facture(moteur, f"FA-{i}", ht="0.10")
+        bal = {b["compte"]: b for b in moteur.get_balance()}
+        assert bal["445660"]["total_debit"] == 0.06
+        assert bal["401000"]["solde_crediteur"] == 0.36
+
+    def test_validation_et_filtre_validees(self):
+        moteur = MoteurEcritures()
+        self._facture(moteur)
+        moteur.ecritures.append(Ecriture(lignes=[
+            LigneEcriture(compte="411000", libelle="Test", debit=Decimal("100")),
+        ]))
+        erreurs = moteur.valider_ecritures()
+        assert len(erreurs) == 1
+        assert moteur.nb_ecritures(validees=True) == 1
+        assert moteur.ecritures[0].date_validation is not None
+        assert "411000" not in moteur.get_grand_livre(validees_seulement=True)
+        assert moteur.supprimer_non_validees() == 1
+        assert len(moteur.ecritures) == 1
+
+
+class TestSoldesMaterialises:
+    """Tests des agregats par compte et par mois tenus a jour par triggers."""
+
+    def setup_method(self):
+        self.moteur = MoteurEcritures()
+
+    def _vente(self, jour, ht="100"):
+        return self.moteur.generer_ecriture_facture(
+            type_doc="facture_vente", date_piece=jour, numero_piece=f"FV-{jour}",
+            montant_ht=Decimal(ht), montant_tva=Decimal(ht) / 5,
+            montant_ttc=Decimal(ht) * Decimal("1.2"),
+        )
+
+    def test_coherence_apres_mutations(self):
+        e1 = self._vente(date(2026, 1, 10))
+        e2 = self._vente(date(2026, 2, 10), "250")
+        self._vente(date(2026, 3, 10), "40")
+        self.moteur.valider_ecritures()
+        self.moteur.ajouter_ecriture(Ecriture(date_ecriture=date(2026, 3, 1), lignes=[
+            LigneEcriture(compte="512000", libelle="Apport", debit=Decimal("10")),
+            LigneEcriture(compte="101000", libelle="Apport", credit=Decimal("10")),
+        ]))
+        e = self.moteur.get_ecriture(e2.id)
+        e.validee = False
+        e.date_ecriture = date(2026, 4, 1)
+        e.lignes[0].debit = Decimal("301")
+        e.lignes.append(LigneEcriture(compte="658000", libelle="Ecart", credit=Decimal("1")))
+        self.moteur.mettre_a_jour_ecriture(e)
+        self.moteur.supprimer_ecriture(e1.id)
+        assert self.moteur.verifier_agregats() == []
+        self.moteur.supprimer_non_validees()
+        assert self.moteur.verifier_agregats() == []
+
+    def test_balance_par_periode_et_racine(self):
+        self._vente(date(2026, 1, 10))
+        self._vente(date(2026, 2, 10), "250")
+        fevrier = self.moteur.get_balance(periode_debut="2026-02", periode_fin="2026-02", prefixes=("7",))
+        assert [(b["compte"], b["total_credit"]) for b in fevrier] == [("707000", 250.0)]
+        assert self.moteur.get_balance(validees_seulement=True) == []
+
+    def test_reconstruction_apres_derive(self):
+        self._vente(date(2026, 1, 10))
+        conn = self.moteur.stockage._connexion()
+        conn.execute("UPDATE soldes SET debit = debit + 1")
+        ecarts = self.moteur.verifier_agregats(reparer=True)
+        assert ecarts
+        assert self.moteur.verifier_agregats() == []
+
+    def test_migration_registre_sans_agregats(self, tmp_path):
+        from urssaf_analyzer.comptabilite.stockage import StockageEcritures
+        chemin = tmp_path / "ecritures.db"
+        moteur = MoteurEcritures(stockage=StockageEcritures(chemin))
+        self.moteur = moteur
+        self._vente(date(2026, 1, 10))
+        conn = moteur.stockage._connexion()
+        conn.execute("DELETE FROM soldes")
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        relu = MoteurEcritures(stockage=StockageEcritures(chemin))
+        assert relu.verifier_agregats() == []
+        assert len(relu.get_balance()) == 3
+
+
+class TestGrandLivreIndexe:
+    """Grand livre par intervalle de dates et de comptes (index compte/date)."""
+
+    def setup_method(self):
+        self.moteur = MoteurEcritures()
+        # Saisies dans le desordre chronologique
+        for jour in (20, 3, 11):
+            self.moteur.generer_ecriture_reglement(
+                date_reglement=date(2026, 2, jour), montant=Decimal(jour),
+                compte_tiers="401000", numero_piece=f"RG-{jour}",
+            )
+
+    def test_tri_par_date_et_bornes(self):
+        gl = self.moteur.get_grand_livre(date_debut=date(2026, 2, 4), date_fin="2026-02-20")
+        assert [m["date"] for m in gl["512000"]] == ["2026-02-11", "2026-02-20"]
+        mouvements = list(self.moteur.iter_grand_livre(compte_debut="5", compte_fin="599999"))
+        assert {c for c, _, _ in mouvements} == {"512000"}
+
+    def test_changement_de_date_reindexe(self):
+        e = next(iter(self.moteur.ecritures))
+        e.date_ecriture = date(2026, 1, 1)
+        self.moteur.mettre_a_jour_ecriture(e)
+        gl = self.moteur.get_grand_livre(date_fin=date(2026, 1, 31))
+        assert [m["piece"] for m in gl["401000"]] == ["RG-20"]
+
+    def test_html_produit_par_fragments(self):
+        gen = GenerateurRapports(self.moteur)
+        fragments = list(gen.iter_grand_livre_html(date_debut=date(2026, 2, 10)))
+        html = "\n".join(fragments)
+        assert html == gen.grand_livre_html(date_debut=date(2026, 2, 10))
+        assert "RG-3" not in html and "RG-11" in html
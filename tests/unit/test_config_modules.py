@@ -1,4 +1,4 @@
-"""Tests des modules de configuration (idcc_database, taux_atmp, settings)."""
+"""Tests des modules de configuration (idcc_database, taux_atmp, settings, subventions)."""
 
 import sys
 from decimal import Decimal
@@ -29,6 +29,13 @@ from urssaf_analyzer.config.settings import (
     AnalysisConfig,
     ReportConfig,
 )
+from urssaf_analyzer.config.subventions import (
+    CATALOGUE,
+    INDEX,
+    Critere,
+    ProfilEntreprise,
+    rechercher_aides,
+)
 
 
 # =====================================================
@@ -240,3 +247,94 @@ class TestSettings:
     def test_security_config_custom(self):
         config = SecurityConfig(pbkdf2_iterations=200_000)
         assert config.pbkdf2_iterations == 200_000
+
+
+# =====================================================
+# SUBVENTIONS
+# =====================================================
+
+def _eligibles_sans_index(profil):
+    ids = []
+    for aide in CATALOGUE:
+        criteres = aide["criteres"] if isinstance(aide["criteres"], list) else [aide["criteres"]]
+        if any(c.accepte(profil) for c in criteres):
+            ids.append(aide["id"])
+    return ids
+
+
+class TestSubventions:
+    """Tests du catalogue des subventions et de son index."""
+
+    def test_ids_uniques(self):
+        ids = [a["id"] for a in CATALOGUE]
+        assert len(ids) == len(set(ids))
+
+    @pytest.mark.parametrize("profil", [
+        ProfilEntreprise(),
+        ProfilEntreprise(code_naf="62.01Z", effectif=5, age_entreprise=1, innovation=True, numerique=True),
+        ProfilEntreprise(code_naf="25.11Z", effectif=250, investissement=True, environnement=True),
+        ProfilEntreprise(code_naf="01.11Z", effectif=0, zone="zrr", creation_reprise=True),
+        ProfilEntreprise(effectif=49, region="occitanie", forme_juridique="Association"),
+        ProfilEntreprise(effectif=20, region="ile-de-france", zone="qpv", formation=True, ess=True),
+        ProfilEntreprise(code_naf="35.11Z", effectif=4999, age_entreprise=3, environnement=True, export_intl=True),
+        ProfilEntreprise(effectif=6000, region="outre-mer", zone="ber"),
+    ])
+    def test_index_equivalent_evaluation_directe(self, profil):
+        indices = INDEX.indices_eligibles(profil)
+        assert [CATALOGUE[i]["id"] for i in indices] == _eligibles_sans_index(profil)
+
+    def test_criteres_alternatifs(self):
+        # CIR : projet innovant OU secteur C/J/M
+        assert "cir" in _eligibles_sans_index(ProfilEntreprise(code_naf="J"))
+        assert "cir" in _eligibles_sans_index(ProfilEntreprise(innovation=True))
+        assert "cir" not in _eligibles_sans_index(ProfilEntreprise(code_naf="47.11B"))
+
+    @pytest.mark.parametrize("code,lettre", [
+        ("", ""), ("J", "J"), ("c", "C"), ("6201Z", "J"), ("62.01Z", "J"), ("01.11Z", "A"),
+        ("35.11Z", "D"), ("4120A", "F"), ("56.10A", "I"), ("99.00Z", "U"), ("6", ""),
+    ])
+    def test_lettre_naf(self, code, lettre):
+        assert ProfilEntreprise(code_naf=code).lettre_naf == lettre
+
+    def test_critere_bornes_effectif(self):
+        critere = Critere(effectif_min=20, effectif_max=250)
+        assert not critere.accepte_effectif(19)
+        assert critere.accepte_effectif(20)
+        assert critere.accepte_effectif(249)
+        assert not critere.accepte_effectif(250)
+
+    def test_montant_estime_evalue_pour_le_profil(self):
+        resultat = rechercher_aides(ProfilEntreprise(
+            code_naf="62.01Z", effectif=20, masse_salariale=1_000_000, innovation=True, formation=True))
+        aides = {a["id"]: a for a in resultat["aides"]}
+        assert aides["cir"]["montant_estime"] == 30000.0
+        assert aides["aide-apprentissage"]["montant_estime"] == 12000
+        assert aides["contrat-pro"]["montant_estime"] == 2000
+        assert all(a["eligible"] for a in resultat["aides"])
+        assert not any(callable(a["montant_estime"]) for a in resultat["aides"])
+
+    def test_fiches_du_catalogue_non_modifiees(self):
+        profil = ProfilEntreprise(innovation=True, creation_reprise=True, age_entreprise=1, masse_salariale=500_000)
+        rechercher_aides(profil)
+        resultat = rechercher_aides(profil)
+        assert resultat["regles_non_cumul"]
+        assert all("avertissements" not in f and "_score_criteres" not in f for f in INDEX.fiches)
+        jei = next(a for a in resultat["aides"] if a["id"] == "jei")
+        assert len(jei["avertissements"]) == 2
+
+    def test_non_cumul_montant_realiste(self):
+        resultat = rechercher_aides(ProfilEntreprise(
+            effectif=5, age_entreprise=2, masse_salariale=400_000, innovation=True))
+        aides = {a["id"]: a for a in resultat["aides"]}
+        # JEI et ACRE exclusifs : seul le plus avantageux compte
+        assert resultat["montant_potentiel_max_realiste"] == round(
+            resultat["montant_potentiel_estime"] - aides["jei"]["montant_estime"], 2)
+
+    def test_profil_depuis_dict(self):
+        profil = ProfilEntreprise.depuis_dict({
+            "code_naf": "62.01Z", "effectif": "12", "masse_salariale": 1000,
+            "innovation": "true", "ess": False, "reference": "ignore",
+        })
+        assert profil == ProfilEntreprise(code_naf="62.01Z", effectif=12, masse_salariale=1000.0, innovation=True)
+        with pytest.raises(ValueError):
+            ProfilEntreprise.depuis_dict({"effectif": "beaucoup"})
@@ -96,3 +96,52 @@ class TestColonnesFEC:
 
     def test_journal_libelles(self):
         assert len(JOURNAL_LIBELLES) > 0
+
+
+class TestIterFec:
+    """Export FEC par blocs et compression ZIP a la volee."""
+
+    @pytest.fixture
+    def moteur(self):
+        from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures
+        moteur = MoteurEcritures()
+        for i in range(1, 41):
+            moteur.generer_ecriture_facture(
+                type_doc="facture_vente", date_piece=date(2026, 3, 1 + i % 28),
+                numero_piece=f"F-{i:03d}", montant_ht=Decimal("1000.05"),
+                montant_tva=Decimal("200.01"), montant_ttc=Decimal("1200.06"),
+                nom_tiers="Client é",
+            )
+        moteur.valider_ecritures()
+        return moteur
+
+    def test_blocs_bornes_et_contenu_identique(self, moteur):
+        from urssaf_analyzer.comptabilite.fec_export import exporter_fec, iter_fec
+        blocs = list(iter_fec(moteur, taille_bloc=512))
+        assert len(blocs) > 5
+        assert all(len(b) < 2048 for b in blocs)
+        assert b"".join(blocs).decode("utf-8") == exporter_fec(moteur)
+
+    def test_montants_et_libelles_de_compte(self, moteur):
+        from urssaf_analyzer.comptabilite.fec_export import exporter_fec
+        lignes = [l.split("\t") for l in exporter_fec(moteur).split("\n")[1:]]
+        assert len(lignes) == 120
+        vente = next(l for l in lignes if l[4].startswith("70"))
+        assert vente[12] == "1000,05"
+        assert vente[5] == moteur.plan.get_compte(vente[4]).libelle
+        assert {l[2] for l in lignes} == {f"F-{i:03d}" for i in range(1, 41)}
+
+    def test_bom_et_valide(self, moteur):
+        from urssaf_analyzer.comptabilite.fec_export import iter_fec, valider_fec
+        contenu = b"".join(iter_fec(moteur, encodage="utf-8-sig"))
+        assert contenu.startswith(b"\xef\xbb\xbf") and contenu.count(b"\xef\xbb\xbf") == 1
+        assert valider_fec(contenu.decode("utf-8-sig"))["valide"]
+
+    def test_zip_a_la_volee(self, moteur):
+        import io
+        import zipfile
+        from urssaf_analyzer.comptabilite.fec_export import exporter_fec, iter_fec, zipper_flux
+        archive = b"".join(zipper_flux(iter_fec(moteur, taille_bloc=512), "123456789FEC20261231.txt"))
+        with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+            assert zf.namelist() == ["123456789FEC20261231.txt"]
+            assert zf.read("123456789FEC20261231.txt").decode("utf-8") == exporter_fec(moteur)
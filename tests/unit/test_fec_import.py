@@ -0,0 +1,172 @@
+"""Tests de l'import en masse d'un FEC dans le registre."""
+
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures
+from urssaf_analyzer.comptabilite.fec_export import COLONNES_FEC, exporter_fec
+from urssaf_analyzer.comptabilite.fec_import import (
+    centimes_fec,
+    date_iso_fec,
+    importer_fec_en_masse,
+    iter_import_fec,
+)
+from urssaf_analyzer.core.exceptions import ParseError
+
+
+def _ligne(journal, num, jour, compte, debit, credit, lib="Vente", compte_lib=""):
+    d = f"202603{jour:02d}" if isinstance(jour, int) else jour
+    return "\t".join([journal, "Journal", num, d, compte, compte_lib, "", "", f"P-{num}", d, lib,
+                      debit, credit, "", "", d, "", ""])
+
+
+def _ecrire(tmp_path, lignes, entete=None):
+    chemin = tmp_path / "fec.txt"
+    chemin.write_text("\n".join([entete or "\t".join(COLONNES_FEC), *lignes]) + "\n", encoding="utf-8")
+    return chemin
+
+
+class TestConversions:
+
+    @pytest.mark.parametrize("brut,attendu", [
+        ("1234,56", 123456), ("1234.5", 123450), ("0,00", 0), ("", 0), ("-12,34", -1234),
+        ("1.234,56", 123456), (" 12 ", 1200), ("0,005", 1), ("abc", 0),
+    ])
+    def test_centimes(self, brut, attendu):
+        assert centimes_fec(brut) == attendu
+
+    def test_dates(self):
+        assert date_iso_fec("20260315") == "2026-03-15"
+        assert date_iso_fec("15/03/2026") == "2026-03-15"
+        assert date_iso_fec("20261340") is None
+        assert date_iso_fec("") is None
+
+
+class TestImportMasse:
+
+    def test_import_et_agregats(self, tmp_path):
+        lignes = []
+        for i in range(1, 26):
+            lignes.append(_ligne("VE", str(i), 1 + i % 28, "411000", "120,00", "0,00", compte_lib="Clients"))
+            lignes.append(_ligne("VE", str(i), 1 + i % 28, "706000", "0,00", "100,00"))
+            lignes.append(_ligne("VE", str(i), 1 + i % 28, "445710", "0,00", "20,00"))
+        moteur = MoteurEcritures()
+        etapes = []
+        for resultat in iter_import_fec(moteur, _ecrire(tmp_path, lignes), taille_lot=10):
+            etapes.append((resultat.ecritures_importees, resultat.termine))
+        assert etapes == [(10, False), (20, False), (25, True)]
+        assert resultat.ecritures_importees == 25 and resultat.lignes_importees == 75
+        assert resultat.ecritures_rejetees == 0
+        assert moteur.nb_ecritures() == 25
+        balance = {b["compte"]: b for b in moteur.get_balance()}
+        assert balance["411000"]["total_debit"] == 3000.0
+        assert balance["706000"]["total_credit"] == 2500.0
+        assert moteur.verifier_agregats() == []
+        ecriture = moteur.ecritures[0]
+        assert ecriture.numero_piece == "P-1" and ecriture.date_ecriture == date(2026, 3, 2)
+        assert ecriture.total_debit == Decimal("120.00")
+
+    def test_rejets_desequilibre_et_date(self, tmp_path):
+        lignes = [
+            _ligne("VE", "1", 5, "411000", "100,00", "0,00"),
+            _ligne("VE", "1", 5, "706000", "0,00", "90,00"),
+            _ligne("AC", "2", "2026-99-99", "607000", "50,00", "0,00"),
+            _ligne("AC", "2", "2026-99-99", "401000", "0,00", "50,00"),
+            _ligne("BQ", "3", 6, "512000", "10,00", "0,00"),
+            _ligne("BQ", "3", 6, "411000", "0,00", "10,00"),
+        ]
+        moteur = MoteurEcritures()
+        resultat = importer_fec_en_masse(moteur, _ecrire(tmp_path, lignes))
+        assert resultat.ecritures_importees == 1
+        assert resultat.ecritures_rejetees == 2
+        assert {(e["ecriture_num"], e["motif"]) for e in resultat.erreurs} == {
+            ("1", "Ecriture desequilibree"), ("2", "EcritureDate invalide"),
+        }
+        assert moteur.nb_ecritures() == 1
+
+    def test_ecriture_non_contigue_reconstituee(self, tmp_path):
+        lignes = [
+            _ligne("OD", "7", 5, "471000", "30,00", "0,00"),
+            _ligne("OD", "8", 5, "512000", "5,00", "0,00"),
+            _ligne("OD", "8", 5, "471000", "0,00", "5,00"),
+            _ligne("OD", "7", 5, "512000", "0,00", "30,00"),
+        ]
+        moteur = MoteurEcritures()
+        resultat = importer_fec_en_masse(moteur, _ecrire(tmp_path, lignes))
+        assert resultat.ecritures_importees == 2 and resultat.ecritures_rejetees == 0
+        assert sorted(len(e.lignes) for e in moteur.ecritures) == [2, 2]
+
+    def test_aller_retour_export(self, tmp_path):
+        source = MoteurEcritures()
+        for i in range(1, 6):
+            source.generer_ecriture_facture(
+                type_doc="facture_achat", date_piece=date(2026, 2, i), numero_piece=f"FA-{i}",
+                montant_ht=Decimal("100.10"), montant_tva=Decimal("20.02"), montant_ttc=Decimal("120.12"),
+            )
+        source.valider_ecritures()
+        chemin = tmp_path / "export.txt"
+        chemin.write_text(exporter_fec(source), encoding="utf-8")
+        cible = MoteurEcritures()
+        resultat = importer_fec_en_masse(cible, chemin)
+        assert resultat.ecritures_importees == 5
+        assert cible.get_balance() == source.get_balance()
+
+    def test_validation_et_compte_auxiliaire(self, tmp_path):
+        lignes = [
+            _ligne("VE", "1", 5, "411000", "120,00", "0,00"),
+            _ligne("VE", "1", 5, "706000", "0,00", "120,00"),
+            _ligne("VE", "2", 6, "411000", "60,00", "0,00"),
+            _ligne("VE", "2", 6, "706000", "0,00", "60,00"),
+        ]
+        champs = lignes[0].split("\t")
+        champs[6:8] = ["DUPONT", "Client Dupont"]
+        lignes[0] = "\t".join(champs)
+        for i in (2, 3):
+            champs = lignes[i].split("\t")
+            champs[15] = ""  # ValidDate
+            lignes[i] = "\t".join(champs)
+        moteur = MoteurEcritures()
+        importer_fec_en_masse(moteur, _ecrire(tmp_path, lignes))
+        premiere, seconde = moteur.ecritures
+        assert premiere.validee and premiere.date_validation.date() == date(2026, 3, 5)
+        assert not seconde.validee and seconde.date_validation is None
+        assert [l.compte for l in premiere.lignes] == ["411DUPONT", "706000"]
+        assert {b["compte"]: b["libelle"] for b in moteur.get_balance()}["411DUPONT"] == "Client Dupont"
+
+    def test_aller_retour_export_validees(self, tmp_path):
+        source = MoteurEcritures()
+        for i in range(1, 4):
+            source.generer_ecriture_facture(
+                type_doc="facture_achat", date_piece=date(2026, 2, i), numero_piece=f"FA-{i}",
+                montant_ht=Decimal("100.10"), montant_tva=Decimal("20.02"), montant_ttc=Decimal("120.12"),
+            )
+        source.valider_ecritures()
+        export = exporter_fec(source)
+        chemin = tmp_path / "export.txt"
+        chemin.write_text(export, encoding="utf-8")
+        cible = MoteurEcritures()
+        importer_fec_en_masse(cible, chemin)
+        assert cible.nb_ecritures(validees=True) == 3
+        assert len(exporter_fec(cible).splitlines()) == len(export.splitlines())
+
+    def test_separateur_pipe_et_cp1252(self, tmp_path):
+        chemin = tmp_path / "fec.txt"
+        contenu = "|".join(COLONNES_FEC) + "\n" + "\n".join([
+            _ligne("VE", "1", 5, "411000", "12,00", "0,00", lib="Réglement").replace("\t", "|"),
+            _ligne("VE", "1", 5, "706000", "0,00", "12,00", lib="Réglement").replace("\t", "|"),
+        ])
+        chemin.write_bytes(contenu.encode("cp1252"))
+        moteur = MoteurEcritures()
+        assert importer_fec_en_masse(moteur, chemin).ecritures_importees == 1
+        assert moteur.ecritures[0].lignes[0].libelle == "Réglement"
+
+    def test_colonnes_manquantes(self, tmp_path):
+        chemin = _ecrire(tmp_path, ["VE\t1"], entete="JournalCode\tEcritureNum")
+        with pytest.raises(ParseError):
+            importer_fec_en_masse(MoteurEcritures(), chemin)
@@ -0,0 +1,123 @@
+"""Tests de la detection des doublons de salaries (urssaf_analyzer/rh/identites.py)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from urssaf_analyzer.rh.identites import IndexIdentites, jaro_winkler, normaliser_nir, normaliser_nom, phonetique
+
+NIR = "1 85 05 75 123 456"  # corps 1850575123456
+
+
+def nir_valide(corps: str) -> str:
+    return f"{corps}{97 - int(corps) % 97:02d}"
+
+
+class TestNormalisation:
+
+    def test_nom_sans_accents_ni_ponctuation(self):
+        assert normaliser_nom("  Hélène-Marie  LEFÈVRE ") == "helene marie lefevre"
+
+    def test_nir_cle_ignoree(self):
+        corps, _ = normaliser_nir(NIR)
+        assert corps == "1850575123456"
+        assert normaliser_nir("1850575123456 42")[0] == corps
+        assert normaliser_nir("unknown_3") == ("", False)
+
+    def test_phonetique_et_jaro_winkler(self):
+        assert phonetique("Philippe") == phonetique("Filipe")
+        assert phonetique("Dupont") == phonetique("Dupond")
+        assert jaro_winkler("martin", "martin") == 1.0
+        assert jaro_winkler("martin", "martni") > 0.9
+        assert jaro_winkler("martin", "bernard") < 0.7
+
+
+class TestRechercher:
+
+    def _index(self):
+        index = IndexIdentites()
+        index.ajouter("contrat", "c1", "Dupont", "Jean", NIR)
+        index.ajouter("contrat", "c2", "Lefèvre", "Hélène")
+        index.ajouter("contrat", "c3", "Martin", "Paul")
+        return index
+
+    def test_nir_identique_prioritaire(self):
+        resultats = self._index().rechercher("Durand", "Pierre", "185057512345699")
+        assert [(f.ref[1], motif) for f, _, motif in resultats] == [("c1", "nir_identique")]
+
+    def test_accents_casse_et_inversion(self):
+        index = self._index()
+        assert [f.ref[1] for f, _, _ in index.rechercher("LEFEVRE", "helene")] == ["c2"]
+        assert [f.ref[1] for f, _, _ in index.rechercher("Paul", "Martin")] == ["c3"]
+
+    def test_faute_de_frappe_et_nir_differents(self):
+        index = self._index()
+        (fiche, score, motif), = index.rechercher("Dupond", "Jean")
+        assert fiche.ref == ("contrat", "c1") and motif != "nir_identique" and score >= 0.9
+        # Deux NIR valides differents : seul l'homonyme exact reste signale
+        assert index.rechercher("Dupond", "Jean", "2 90 01 13 055 001") == []
+        assert [m for _, _, m in index.rechercher("Dupont", "Jean", "2 90 01 13 055 001")] == ["nom_prenom_identique"]
+
+    def test_filtre_par_source(self):
+        index = self._index()
+        index.ajouter("planning", "p1", "Martin Paul", "")
+        assert [f.ref for f, _, _ in index.rechercher("Martin", "Paul", sources=("planning",))] == [("planning", "p1")]
+
+
+class TestDoublons:
+
+    def test_groupes_transitifs_et_tries(self):
+        index = IndexIdentites()
+        index.ajouter("contrat", "c1", "Dupont", "Jean", NIR)
+        index.ajouter("contrat", "c2", "Bernard", "Luc")
+        index.ajouter("connaissances", "k1", "DUPONT", "Jean")
+        index.ajouter("contrat", "c3", "Durand", "Marc", NIR)
+        index.ajouter("contrat", "c4", "Bernard", "Luc")
+        groupes = index.doublons()
+        assert [[f.ref[1] for f in g["fiches"]] for g in groupes] == [["c1", "k1", "c3"], ["c2", "c4"]]
+        assert groupes[0]["motifs"] == ["nir_identique", "nom_prenom_identique"]
+        assert [[f.ref[1] for f in g["fiches"]] for g in index.doublons(("contrat",))] == [["c1", "c3"], ["c2", "c4"]]
+
+    def test_nir_valides_differents_jamais_reunis(self):
+        index = IndexIdentites()
+        index.ajouter("contrat", "c1", "Lefèvre", "Hélène", nir_valide("2850575123456"))
+        index.ajouter("contrat", "c2", "Lefebvre", "Helene", nir_valide("2900113055001"))
+        # Sans NIR, proche des deux : rattachee a la plus sure (nom identique)
+        index.ajouter("contrat", "c3", "Lefevre", "Helene")
+        # Homonymes exacts, NIR valides differents
+        index.ajouter("contrat", "c4", "Martin", "Paul", nir_valide("1850575123456"))
+        index.ajouter("contrat", "c5", "Martin", "Paul", nir_valide("1900113055001"))
+        (groupe,) = index.doublons()
+        assert [f.ref[1] for f in groupe["fiches"]] == ["c1", "c3"]
+        assert groupe["motifs"] == ["nom_prenom_identique"]
+
+    def test_synchroniser_ne_reindexe_que_les_changements(self):
+        index = IndexIdentites()
+        contrats = [{"id": "c1", "nom": "Dupont", "prenom": "Jean"}, {"id": "c2", "nom": "Durand", "prenom": "Jean"}]
+
+        def charger():
+            return ((c["id"], c["nom"], c["prenom"], "", c) for c in contrats)
+
+        index.synchroniser("contrat", 1, charger)
+        assert index.doublons() == []
+        contrats[1]["nom"] = "Dupont"
+        index.synchroniser("contrat", 1, charger)  # meme version : inchange
+        assert index.doublons() == []
+        index.synchroniser("contrat", 2, charger)
+        assert len(index.doublons()) == 1
+        del contrats[0]
+        index.synchroniser("contrat", 3, charger)
+        assert len(index) == 1 and index.doublons() == []
+
+    def test_retrait_met_a_jour_les_rapprochements(self):
+        index = IndexIdentites()
+        index.ajouter("contrat", "c1", "Lefèvre", "Hélène")
+        index.ajouter("contrat", "c2", "Lefebvre", "Helene")
+        index.ajouter("contrat", "c3", "Helene", "Lefevre")
+        (groupe,) = index.doublons()
+        assert [f.ref[1] for f in groupe["fiches"]] == ["c1", "c2", "c3"]
+        assert groupe["motifs"] == ["nom_prenom_proche"] and 0.9 <= groupe["score"] < 1
+        index.retirer("contrat", "c1")
+        index.retirer("contrat", "c3")
+        assert index.doublons() == []
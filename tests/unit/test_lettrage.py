@@ -0,0 +1,200 @@
+"""Tests du lettrage automatique des comptes de tiers."""
+
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures
+from urssaf_analyzer.comptabilite.lettrage import (
+    code_lettrage,
+    iter_lettrage,
+    lettrer,
+    rang_lettrage,
+)
+
+D0 = date(2026, 1, 1)
+
+
+def _facture(moteur, jour, montant, numero=""):
+    return moteur.generer_ecriture_facture(
+        type_doc="facture_vente", date_piece=D0 + timedelta(days=jour), numero_piece=numero,
+        montant_ht=Decimal(montant), montant_tva=Decimal("0"), montant_ttc=Decimal(montant),
+    )
+
+
+def _reglement(moteur, jour, montant, compte="411000", numero=""):
+    return moteur.generer_ecriture_reglement(
+        date_reglement=D0 + timedelta(days=jour), montant=Decimal(montant),
+        compte_tiers=compte, numero_piece=numero,
+    )
+
+
+def _lettrages(moteur, compte="411000"):
+    """{code: [(debit, credit), ...]} des lignes lettrees du compte."""
+    groupes = {}
+    for code, debit, credit in moteur.stockage._lire(
+        "SELECT lettrage, debit, credit FROM lignes WHERE compte = ? AND lettrage != '' "
+        "ORDER BY ecriture_num, rang", (compte,),
+    ):
+        groupes.setdefault(code, []).append((debit, credit))
+    return groupes
+
+
+class TestCodes:
+
+    @pytest.mark.parametrize("rang,code", [(1, "A"), (26, "Z"), (27, "AA"), (52, "AZ"), (703, "AAA")])
+    def test_aller_retour(self, rang, code):
+        assert code_lettrage(rang) == code
+        assert rang_lettrage(code) == rang
+
+    def test_dernier_lettrage_ordre_longueur(self):
+        moteur = MoteurEcritures()
+        for jour in range(30):
+            _facture(moteur, jour, "100")
+            _reglement(moteur, jour + 1, "100")
+        lettrer(moteur)
+        assert moteur.stockage.dernier_lettrage("411000") == "AD"
+
+
+class TestLettrage:
+
+    def test_montant_exact_plus_proche_en_date(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _facture(moteur, 40, "100")
+        _reglement(moteur, 42, "100")
+        resultat = lettrer(moteur)
+        assert resultat.par_methode["montant"] == 1
+        ouvertes = moteur.stockage.lignes_non_lettrees("411000")
+        assert [(r[2], r[3]) for r in ouvertes] == [("2026-01-01", 10000)]
+
+    def test_reference_commune(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100", numero="FA-1")
+        _reglement(moteur, 3, "60", numero="FA-1")
+        _reglement(moteur, 9, "40", numero="FA-1")
+        resultat = lettrer(moteur)
+        assert resultat.par_methode == {"reference": 1, "montant": 0, "combinaison": 0}
+        assert list(_lettrages(moteur).values()) == [[(10000, 0), (0, 6000), (0, 4000)]]
+
+    def test_reglement_groupe_de_factures(self):
+        moteur = MoteurEcritures()
+        for jour, montant in ((1, "120.50"), (5, "79.50"), (8, "300")):
+            _facture(moteur, jour, montant)
+        _facture(moteur, 9, "999")
+        _reglement(moteur, 20, "500")
+        resultat = lettrer(moteur)
+        assert resultat.par_methode["combinaison"] == 1
+        (groupe,) = _lettrages(moteur).values()
+        assert sorted(groupe) == [(0, 50000), (7950, 0), (12050, 0), (30000, 0)]
+
+    def test_facture_payee_en_plusieurs_fois(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "1000")
+        _reglement(moteur, 10, "300")
+        _reglement(moteur, 40, "700")
+        assert lettrer(moteur).lignes_lettrees == 3
+
+    def test_fenetre_de_dates(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _reglement(moteur, 200, "100")
+        assert lettrer(moteur, fenetre_jours=90).groupes == 0
+        assert lettrer(moteur, fenetre_jours=365).groupes == 1
+
+    def test_fournisseur_sens_inverse(self):
+        moteur = MoteurEcritures()
+        for jour, montant in ((1, "40"), (2, "60")):
+            moteur.generer_ecriture_facture(
+                type_doc="facture_achat", date_piece=D0 + timedelta(days=jour), numero_piece="",
+                montant_ht=Decimal(montant), montant_tva=Decimal("0"), montant_ttc=Decimal(montant),
+            )
+        _reglement(moteur, 15, "100", compte="401000")
+        resultat = lettrer(moteur)
+        assert resultat.par_methode["combinaison"] == 1
+        assert moteur.stockage.lignes_non_lettrees("401000") == []
+
+    def test_groupes_soldes_et_reprise(self):
+        """Chaque lettrage est solde ; une relance ne modifie pas l'existant."""
+        moteur = MoteurEcritures()
+        for i in range(300):
+            _facture(moteur, i % 200, f"{100 + i % 37}.{i % 100:02d}")
+            if i % 3:
+                _reglement(moteur, i % 200 + 5, f"{100 + i % 37}.{i % 100:02d}")
+        etapes = [r.groupes for r in iter_lettrage(moteur, taille_lot=50)]
+        assert etapes[-1] == 200 and len(etapes) >= 4
+        avant = _lettrages(moteur)
+        assert all(sum(d - c for d, c in g) == 0 for g in avant.values())
+        assert lettrer(moteur).groupes == 0
+        assert _lettrages(moteur) == avant
+
+    def test_lignes_deja_lettrees_preservees(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _reglement(moteur, 1, "100")
+        lettrer(moteur)
+        _facture(moteur, 2, "50")
+        _reglement(moteur, 3, "50")
+        lettrer(moteur)
+        assert sorted(_lettrages(moteur)) == ["A", "B"]
+
+    def test_conflit_ecriture_concurrente(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _reglement(moteur, 1, "100")
+        num, rang = moteur.stockage.lignes_non_lettrees("411000")[0][:2]
+        ecrits = moteur.stockage.appliquer_lettrage([("X", [(num, rang)])])
+        assert ecrits == ["X"]
+        autre = moteur.stockage.lignes_non_lettrees("411000")[0][:2]
+        assert moteur.stockage.appliquer_lettrage([("Y", [(num, rang), autre])]) == []
+        assert _lettrages(moteur) == {"X": [(10000, 0)]}
+
+    def test_codes_attribues_sous_verrou(self, tmp_path):
+        from urssaf_analyzer.comptabilite.stockage import StockageEcritures
+        chemin = tmp_path / "ecritures.db"
+        worker_a = MoteurEcritures(stockage=StockageEcritures(chemin))
+        worker_b = MoteurEcritures(stockage=StockageEcritures(chemin))
+        for i in range(2):
+            _facture(worker_a, i, "100")
+        lignes = [l[:2] for l in worker_a.stockage.lignes_non_lettrees("411000")]
+        # Les deux workers ont lu le meme dernier code ('') avant d'ecrire
+        assert worker_a.stockage.lettrer_groupes("411000", [[lignes[0]]]) == ["A"]
+        assert worker_b.stockage.lettrer_groupes("411000", [[lignes[1]]]) == ["B"]
+
+    def test_conflit_n_annule_que_les_lignes_du_groupe(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _reglement(moteur, 1, "100")
+        premiere, seconde = [l[:2] for l in moteur.stockage.lignes_non_lettrees("411000")]
+        assert moteur.stockage.appliquer_lettrage([("A", [seconde])]) == ["A"]
+        # Meme code, deja pose par un autre lettrage sur la seconde ligne
+        assert moteur.stockage.appliquer_lettrage([("A", [premiere, seconde])]) == []
+        assert _lettrages(moteur) == {"A": [(0, 10000)]}
+        assert moteur.stockage.lettrer_groupes("411000", [[premiere, seconde], [premiere]]) == [None, "B"]
+
+    def test_delettrage(self):
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _reglement(moteur, 1, "100")
+        _facture(moteur, 5, "70")
+        _reglement(moteur, 6, "70")
+        lettrer(moteur)
+        assert moteur.stockage.supprimer_lettrage("411000", ["A"]) == 2
+        assert list(_lettrages(moteur)) == ["B"]
+        assert moteur.stockage.supprimer_lettrage("411000") == 2
+        assert len(moteur.stockage.lignes_non_lettrees("411000")) == 4
+
+    def test_lettrage_dans_l_export_fec(self):
+        from urssaf_analyzer.comptabilite.fec_export import exporter_fec
+
+        moteur = MoteurEcritures()
+        _facture(moteur, 0, "100")
+        _reglement(moteur, 1, "100")
+        lettrer(moteur)
+        lignes = [l.split("\t") for l in exporter_fec(moteur, validees_seulement=False).splitlines()[1:]]
+        assert [(l[13], l[14]) for l in lignes if l[4] == "411000"] == [("A", "20260101"), ("A", "20260102")]
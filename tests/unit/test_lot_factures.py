@@ -0,0 +1,107 @@
+"""Tests de l'analyse de factures par lots."""
+
+import io
+import sys
+import zipfile
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures
+from urssaf_analyzer.ocr import lot_factures
+from urssaf_analyzer.ocr.lot_factures import (
+    analyser_facture,
+    documents_depuis_zip,
+    ecriture_depuis_analyse,
+    iter_analyse_lot,
+)
+
+FACTURE = """ACME FOURNITURES SARL
+SIRET : 123 456 789 00012
+Facture N° {numero}
+Date facture : 15/01/2026
+Facture fournisseur
+Total HT : 100,00 EUR
+TVA 20 % : 20,00 EUR
+Total TTC : 120,00 EUR
+"""
+
+
+def _facture(numero="FA-001") -> bytes:
+    return FACTURE.format(numero=numero).encode()
+
+
+def _zip(fichiers: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for nom, contenu in fichiers.items():
+            zf.writestr(nom, contenu)
+    return buf.getvalue()
+
+
+class TestAnalyse:
+
+    def test_champs_extraits(self):
+        r = analyser_facture(_facture(), "fa.txt")
+        assert r["type_document"] == "facture_achat"
+        assert r["numero"] == "FA-001" and r["date_piece"] == "2026-01-15"
+        assert (r["montant_ht"], r["montant_tva"], r["montant_ttc"]) == (100.0, 20.0, 120.0)
+        assert r["emetteur"]["nom"] == "ACME FOURNITURES SARL"
+        assert {"confiance", "ecriture_manuscrite", "confiance_ocr"} <= set(r)
+
+    def test_lot_sequentiel_avec_erreur(self):
+        documents = [("a.txt", _facture("FA-A")), ("b.txt", None), ("c.txt", _facture("FA-C"))]
+        resultats = list(iter_analyse_lot(documents, parallele=False))
+        assert [r["index"] for r in resultats] == [0, 1, 2]
+        assert "erreur" in resultats[1]
+        assert [r["numero"] for r in resultats if "erreur" not in r] == ["FA-A", "FA-C"]
+
+    def test_lot_pool_de_processus(self):
+        documents = [(f"f{i}.txt", _facture(f"FA-{i}")) for i in range(6)]
+        resultats = list(iter_analyse_lot(documents, parallele=True))
+        assert sorted(r["index"] for r in resultats) == list(range(6))
+        assert {r["fichier"]: r["numero"] for r in resultats} == {f"f{i}.txt": f"FA-{i}" for i in range(6)}
+
+
+class TestZip:
+
+    def test_documents_ignores(self):
+        contenu = _zip({
+            "lot/fa1.txt": _facture(), "lot/.DS_Store": b"x",
+            "__MACOSX/lot/._fa1.txt": b"x", "fa2.pdf": b"%PDF",
+        })
+        assert [nom for nom, _ in documents_depuis_zip(contenu)] == ["fa1.txt", "fa2.pdf"]
+
+    def test_archive_invalide(self):
+        with pytest.raises(ValueError):
+            documents_depuis_zip(b"pas un zip")
+
+    def test_limites(self, monkeypatch):
+        contenu = _zip({f"f{i}.txt": b"0" * 1000 for i in range(3)})
+        monkeypatch.setattr(lot_factures, "MAX_DOCUMENTS_LOT", 2)
+        with pytest.raises(ValueError, match="documents"):
+            documents_depuis_zip(contenu)
+        monkeypatch.setattr(lot_factures, "MAX_DOCUMENTS_LOT", 10)
+        monkeypatch.setattr(lot_factures, "MAX_TAILLE_ZIP", 2500)
+        with pytest.raises(ValueError, match="Mo"):
+            documents_depuis_zip(contenu)
+
+
+class TestComptabilisation:
+
+    def test_ecriture_non_enregistree_puis_lot(self):
+        moteur = MoteurEcritures()
+        analyses = [analyser_facture(_facture(f"FA-{i}"), f"f{i}.txt") for i in range(3)]
+        ecritures = [ecriture_depuis_analyse(moteur, a) for a in analyses]
+        assert moteur.nb_ecritures() == 0
+        assert ecritures[0].date_ecriture.isoformat() == "2026-01-15"
+        assert sum(l.credit for l in ecritures[0].lignes) == Decimal("120.00")
+        assert moteur.stockage.ajouter_lot(ecritures) == 3
+        assert moteur.nb_ecritures() == 3
+
+    def test_document_non_comptabilisable(self):
+        analyse = analyser_facture(b"Releve de compte\nSolde : 10,00", "releve.txt")
+        assert ecriture_depuis_analyse(MoteurEcritures(), analyse) is None
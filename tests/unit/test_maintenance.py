@@ -0,0 +1,99 @@
+"""Tests du planificateur de purge RGPD (maintenance.py)."""
+
+import fcntl
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from maintenance import PurgeScheduler
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    import persistence
+    monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+    return persistence.ExpiryIndex("retention_test")
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    d = tmp_path / "uploads" / "2026-01"
+    d.mkdir(parents=True)
+    return d
+
+
+def _scheduler(index, uploads, **kw):
+    kw.setdefault("debit_max", None)
+    return PurgeScheduler(index, uploads.parent, retention_days=90, interval=3600, **kw)
+
+
+class TestPurgeScheduler:
+
+    def test_purge_uniquement_les_fichiers_echus(self, index, uploads):
+        echu = uploads / "echu.pdf"
+        echu.write_bytes(b"x" * 1000)
+        actif = uploads / "actif.pdf"
+        actif.write_bytes(b"y")
+        index.register(echu, time.time() - 10)
+        index.register(actif, time.time() + 86400)
+        index.set_meta("inventaire_uploads", {"fichiers": 0})
+
+        stats = _scheduler(index, uploads).run_once()
+
+        assert not echu.exists()
+        assert actif.exists()
+        assert stats["fichiers_purges"] == 1
+        assert stats["octets_ecrases"] == 1000
+        assert index.count() == 1
+
+    def test_taches_enregistrees_apres_la_purge(self, index, uploads):
+        index.set_meta("inventaire_uploads", {"fichiers": 0})
+        scheduler = _scheduler(index, uploads)
+        scheduler.ajouter_tache("compactage", lambda: {"compresses": 2})
+        scheduler.ajouter_tache("en_echec", lambda: 1 / 0)
+        stats = scheduler.run_once()
+        assert stats["taches"]["compactage"] == {"compresses": 2}
+        assert "erreur" in stats["taches"]["en_echec"]
+
+    def test_inventaire_initial_des_fichiers_historiques(self, index, uploads):
+        ancien = uploads / "ancien.pdf"
+        ancien.write_bytes(b"x")
+        vieux = time.time() - 100 * 86400
+        os.utime(ancien, (vieux, vieux))
+        recent = uploads / "recent.pdf"
+        recent.write_bytes(b"y")
+
+        stats = _scheduler(index, uploads).run_once()
+
+        assert stats["fichiers_inventories"] == 2
+        assert not ancien.exists()
+        assert recent.exists()
+        # L'inventaire n'est fait qu'une fois
+        assert _scheduler(index, uploads).run_once()["fichiers_inventories"] == 0
+
+    def test_fichier_deja_supprime_retire_de_l_index(self, index, uploads):
+        index.register(uploads / "disparu.pdf", 1.0)
+        index.set_meta("inventaire_uploads", {"fichiers": 0})
+        stats = _scheduler(index, uploads).run_once()
+        assert stats["fichiers_purges"] == 0
+        assert index.count() == 0
+
+    def test_tick_respecte_l_intervalle(self, index, uploads):
+        scheduler = _scheduler(index, uploads)
+        assert scheduler.tick() is not None
+        assert scheduler.tick() is None
+        stats = scheduler.derniere_execution()
+        assert stats["fichiers_echus"] == 0
+        assert stats["intervalle_s"] == 3600
+
+    def test_tick_ignore_si_verrou_tenu(self, index, uploads):
+        scheduler = _scheduler(index, uploads)
+        with open(scheduler.lock_path, "a+") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            assert scheduler.tick() is None
+        assert index.get_meta("purge_uploads") is None
@@ -96,3 +96,100 @@ class TestPersistentList:
         assert len(plist) == 0
         plist.append({"x": 1})
         assert len(plist) == 1
+
+
+class TestRevocationStore:
+    """Tests de l'ensemble de JTI revoques partage entre workers."""
+
+    @pytest.fixture
+    def db_dir(self, tmp_path, monkeypatch):
+        import persistence
+        monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+        return tmp_path
+
+    def test_add_et_doublon(self, db_dir):
+        from persistence import RevocationStore
+        store = RevocationStore("revoked_test")
+        assert store.add("jti-1", 2_000_000_000) is True
+        assert store.add("jti-1", 2_000_000_000) is False
+
+    def test_since_incremental(self, db_dir):
+        from persistence import RevocationStore
+        store = RevocationStore("revoked_test")
+        store.add("a", 2_000_000_000)
+        store.add("b", 2_000_000_000)
+        rows, seq = store.since(0)
+        assert [jti for jti, _ in rows] == ["a", "b"]
+        store.add("c", 2_000_000_000)
+        rows, seq2 = store.since(seq)
+        assert [jti for jti, _ in rows] == ["c"]
+        assert store.since(seq2) == ([], seq2)
+
+    def test_changed_detecte_autre_worker(self, db_dir):
+        from persistence import RevocationStore
+        worker_a = RevocationStore("revoked_test")
+        worker_b = RevocationStore("revoked_test")
+        worker_a.changed()
+        assert worker_a.changed() is False
+        worker_b.add("jti-b", 2_000_000_000)
+        assert worker_a.changed() is True
+        assert worker_a.since(0)[0] == [("jti-b", 2_000_000_000)]
+
+    def test_purge_expired(self, db_dir):
+        from persistence import RevocationStore
+        store = RevocationStore("revoked_test")
+        store.add("vieux", 1.0)
+        store.add("recent", 2_000_000_000)
+        assert store.purge_expired() == 1
+        assert [jti for jti, _ in store.since(0)[0]] == ["recent"]
+
+
+class TestExpiryIndex:
+    """Tests de l'index de retention des uploads."""
+
+    @pytest.fixture
+    def index(self, tmp_path, monkeypatch):
+        import persistence
+        monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+        return persistence.ExpiryIndex("retention_test")
+
+    def test_due_ne_retourne_que_les_echus(self, index, tmp_path):
+        index.register(tmp_path / "vieux.pdf", 100.0)
+        index.register(tmp_path / "recent.pdf", 2_000_000_000)
+        assert index.due(now=1_000) == [(str(tmp_path / "vieux.pdf"), 100.0)]
+        assert index.count() == 2
+        assert index.count(due_before=1_000) == 1
+
+    def test_remove_et_meta(self, index, tmp_path):
+        index.register(tmp_path / "a.pdf", 100.0)
+        index.remove([str(tmp_path / "a.pdf")])
+        assert index.count() == 0
+        assert index.get_meta("purge", {}) == {}
+        index.set_meta("purge", {"fichiers_purges": 3})
+        assert index.get_meta("purge") == {"fichiers_purges": 3}
+
+    def test_save_uploaded_file_enregistre_expiration(self, index, tmp_path, monkeypatch):
+        import time
+        import persistence
+        monkeypatch.setattr(persistence, "UPLOADS_DIR", tmp_path / "uploads")
+        monkeypatch.setattr(persistence, "expiry_index", index)
+        monkeypatch.setattr(persistence, "RETENTION_UPLOADS_DAYS", 1)
+        monkeypatch.delenv("NORMACHECK_ENCRYPTION_KEY", raising=False)
+        dest = persistence.save_uploaded_file("fiche.csv", b"contenu")
+        assert index.count() == 1
+        assert index.due(now=time.time() + 2 * 86400)[0][0] == str(dest)
+
+
+class TestRateLimitStore:
+    """Tests des seaux de limitation de debit partages entre workers."""
+
+    def test_seau_partage_entre_workers(self, tmp_path, monkeypatch):
+        import persistence
+        monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+        worker_a = persistence.RateLimitStore("rate_limit_test")
+        worker_b = persistence.RateLimitStore("rate_limit_test")
+        assert worker_a.consommer("api:ip", 2, 0.01, 100.0) is True
+        assert worker_b.consommer("api:ip", 2, 0.01, 100.0) is True
+        assert worker_a.consommer("api:ip", 2, 0.01, 100.0) is False
+        worker_a.ajouter_compteurs({"api:refusees": 1})
+        assert worker_b.compteurs() == {"api:refusees": 1}
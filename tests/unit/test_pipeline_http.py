@@ -0,0 +1,98 @@
+"""Tests du pipeline ASGI des requetes (pipeline_http)."""
+
+import contextvars
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI, HTTPException  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from pipeline_http import PipelineRequetes  # noqa: E402
+from rate_limit import LimiteurDebit, SeauxMemoire  # noqa: E402
+
+TOKEN = {"Authorization": "Bearer valide"}
+
+
+@pytest.fixture
+def contexte():
+    ecritures, requetes = [], []
+    courante = contextvars.ContextVar("courante", default=None)
+    app = FastAPI()
+    app.add_middleware(
+        PipelineRequetes,
+        limiteur=LimiteurDebit(SeauxMemoire(), {"auth": (2, 60), "api": (3, 60)}),
+        verifier_token=lambda token: {"sub": "a@test.fr"} if token == "valide" else None,
+        chemins_auth={"/api/auth/login"},
+        liste_blanche={"/api/auth/login", "/api/health"},
+        apres_ecriture=ecritures.append,
+        contexte=courante,
+    )
+
+    @app.get("/api/health")
+    def health():
+        return {"status": "healthy"}
+
+    @app.get("/app")
+    def page():
+        return {"page": True}
+
+    @app.get("/api/donnees")
+    def donnees():
+        requetes.append(courante.get().url.path)
+        return {"ok": True}
+
+    @app.post("/api/donnees")
+    def ecrire(erreur: bool = False):
+        if erreur:
+            raise HTTPException(400, "invalide")
+        return {"ok": True}
+
+    @app.post("/api/auth/login")
+    def login():
+        return {"ok": True}
+
+    return TestClient(app), ecritures, requetes
+
+
+class TestPipelineRequetes:
+
+    def test_authentification(self, contexte):
+        client, _, requetes = contexte
+        assert client.get("/api/donnees").status_code == 401
+        assert client.get("/api/donnees", headers={"Authorization": "Bearer perime"}).json() == {"detail": "Session expiree"}
+        assert client.get("/api/donnees", cookies={"nc_token": "valide"}).status_code == 200
+        assert requetes == ["/api/donnees"]
+
+    def test_en_tetes_securite_sur_toute_reponse(self, contexte):
+        client, _, _ = contexte
+        for r in (client.get("/app"), client.get("/api/health"), client.get("/api/donnees")):
+            assert r.headers["x-frame-options"] == "DENY"
+            assert "frame-ancestors 'none'" in r.headers["content-security-policy"]
+
+    def test_debit_par_classe(self, contexte):
+        client, _, _ = contexte
+        statuts = [client.get("/api/donnees", headers=TOKEN).status_code for _ in range(4)]
+        assert statuts == [200, 200, 200, 429]
+        assert client.post("/api/auth/login").status_code == 200
+        assert client.get("/api/donnees", headers={**TOKEN, "X-Forwarded-For": "203.0.113.9"}).status_code == 200
+
+    def test_court_circuit_statique_et_sante(self, contexte):
+        client, ecritures, _ = contexte
+        for _ in range(5):
+            assert client.get("/app").status_code == 200
+            assert client.get("/api/health").status_code == 200
+        assert client.get("/api/donnees", headers=TOKEN).status_code == 200
+        assert ecritures == []
+
+    def test_apres_ecriture(self, contexte):
+        client, ecritures, _ = contexte
+        client.post("/api/donnees", headers=TOKEN)
+        client.post("/api/donnees", params={"erreur": True}, headers=TOKEN)
+        client.post("/api/donnees")  # refusee avant l'application
+        assert ecritures == [200, 400]
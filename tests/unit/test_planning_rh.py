@@ -0,0 +1,78 @@
+"""Tests des index du planning RH (urssaf_analyzer/rh/planning.py)."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from urssaf_analyzer.rh.planning import IndexAbsences, IndexPlanning
+
+
+def _creneau(ident, salarie_id, jour, heure_debut="09:00", duree=7.0):
+    return {"id": ident, "salarie_id": salarie_id, "date": jour, "heure_debut": heure_debut, "duree_heures": duree}
+
+
+class TestIndexAbsences:
+
+    def test_conges_prioritaires_puis_arrets(self):
+        absences = IndexAbsences()
+        absences.synchroniser(1, [
+            {"salarie_id": "s1", "statut": "refuse", "date_debut": "2026-03-01", "date_fin": "2026-03-31"},
+            {"salarie_id": "s9", "nom_salarie": "s1", "type_conge": "rtt",
+             "date_debut": "2026-03-10", "date_fin": "2026-03-12"},
+        ], [{"salarie_id": "s1", "type_arret": "maladie", "date_debut": "2026-03-11", "date_fin": "2026-03-20"}])
+        assert absences.statut("s1", "2026-03-05") == "present"
+        assert absences.statut("s1", "2026-03-11") == "conge_rtt"  # rattache par nom
+        assert absences.statut("s1", "2026-03-15") == "arret_maladie"
+        assert absences.statut("s9", "2026-03-11") == "conge_rtt"
+        assert absences.statut("inconnu", "2026-03-11") == "present"
+
+    def test_resynchronisation_sur_changement_de_version(self):
+        absences = IndexAbsences()
+        conges = [{"salarie_id": "s1", "date_debut": "2026-01-01", "date_fin": "2026-01-02"}]
+        absences.synchroniser("v1", conges, [])
+        conges.clear()
+        absences.synchroniser("v1", conges, [])
+        assert absences.statut("s1", "2026-01-01") == "conge_cp"
+        absences.synchroniser("v2", conges, [])
+        assert absences.statut("s1", "2026-01-01") == "present"
+        assert absences.revision == 2
+
+
+class TestIndexPlanning:
+
+    def test_jour_et_salarie_dans_l_ordre_du_store(self):
+        store = [_creneau("a", "s1", "2026-05-04"), _creneau("b", "s2", "2026-05-04"),
+                 _creneau("c", "s1", "2026-05-04", "14:00"), _creneau("d", "s1", "2026-05-05")]
+        index = IndexPlanning(store)
+        assert len(index) == 4
+        assert [e["id"] for e in index.jour("2026-05-04")] == ["a", "b", "c"]
+        assert [e["id"] for e in index.jour("2026-05-04", "s1")] == ["a", "c"]
+        assert index.jour("2026-05-06") == []
+        assert index.creneau("s1", "2026-05-04", "14:00") is store[2]
+        assert index.creneau("s1", "2026-05-04", "08:00") is None
+
+    def test_ajout_modification_suppression(self):
+        index = IndexPlanning()
+        creneau = _creneau("a", "s1", "2026-05-04")
+        index.ajouter(creneau)
+        index.modifier(creneau, {**creneau, "duree_heures": 4.0})
+        assert index.jour("2026-05-04")[0] is creneau and creneau["duree_heures"] == 4.0
+        index.retirer(creneau)
+        assert len(index) == 0 and index.jour("2026-05-04") == [] and index.creneau("s1", "2026-05-04", "09:00") is None
+
+    def test_resume_mois_memorise_et_invalide_par_le_mois(self):
+        index = IndexPlanning([_creneau("a", "s1", "2026-05-04", duree=7.5),
+                               _creneau("b", "s2", "2026-05-04", duree=3.25),
+                               _creneau("c", "s1", "2026-06-01")])
+        absences = IndexAbsences()
+        absences.synchroniser(1, [{"salarie_id": "s1", "date_debut": "2026-05-10", "date_fin": "2026-05-12"}], [])
+        mai = index.resume_mois(2026, 5)
+        assert mai == {"jours_travailles": 1, "heures": 10.75, "jours_absence": 0}
+        assert index.resume_mois(2026, 5) is mai
+        assert index.resume_mois(2026, 5, "s1", absences) == {"jours_travailles": 1, "heures": 7.5, "jours_absence": 3}
+
+        juin = index.resume_mois(2026, 6)
+        index.ajouter(_creneau("d", "s2", "2026-05-20"))
+        assert index.resume_mois(2026, 6) is juin
+        assert index.resume_mois(2026, 5)["jours_travailles"] == 2
@@ -0,0 +1,82 @@
+"""Tests du limiteur de debit par seaux a jetons."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from rate_limit import LimiteurDebit, SeauxMemoire
+
+
+@pytest.fixture(params=["memoire", "sqlite"])
+def seaux(request, tmp_path, monkeypatch):
+    if request.param == "memoire":
+        return SeauxMemoire()
+    import persistence
+    monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+    return persistence.RateLimitStore("rate_limit_test")
+
+
+class TestSeaux:
+
+    def test_rafale_puis_recharge(self, seaux):
+        assert all(seaux.consommer("ip", 3, 1.0, 100.0) for _ in range(3))
+        assert seaux.consommer("ip", 3, 1.0, 100.0) is False
+        assert seaux.consommer("ip", 3, 1.0, 100.5) is False
+        # 1,5 s ecoulee depuis le dernier jeton plein : un jeton disponible
+        assert seaux.consommer("ip", 3, 1.0, 101.5) is True
+        assert seaux.consommer("ip", 3, 1.0, 101.5) is False
+        # Jamais plus que la capacite apres une longue inactivite
+        assert sum(seaux.consommer("ip", 3, 1.0, 10_000.0) for _ in range(5)) == 3
+
+    def test_cles_independantes(self, seaux):
+        assert seaux.consommer("a", 1, 1.0, 100.0) is True
+        assert seaux.consommer("a", 1, 1.0, 100.0) is False
+        assert seaux.consommer("b", 1, 1.0, 100.0) is True
+
+    def test_eviction_inactifs_et_lru(self, seaux):
+        for i, t in enumerate((10.0, 20.0, 30.0, 40.0)):
+            seaux.consommer(f"ip{i}", 5, 1.0, t)
+        seaux.consommer("ip0", 5, 1.0, 50.0)
+        assert seaux.evincer(inactif_avant=15.0, max_cles=10) == 0
+        assert seaux.evincer(inactif_avant=25.0, max_cles=2) == 2
+        assert seaux.nb_cles() == 2
+        # ip1 (inactif) et ip2 (le moins recent au-dela de max_cles) evinces
+        assert seaux.consommer("ip0", 1, 0.0, 50.0) is True
+        assert seaux.consommer("ip3", 1, 0.0, 50.0) is True
+
+    def test_compteurs_cumules(self, seaux):
+        seaux.ajouter_compteurs({"api:acceptees": 2, "api:refusees": 1})
+        seaux.ajouter_compteurs({"api:acceptees": 3})
+        assert seaux.compteurs() == {"api:acceptees": 5, "api:refusees": 1}
+
+
+def test_seaux_memoire_bornes():
+    seaux = SeauxMemoire(max_cles=2)
+    for cle in ("a", "b", "c"):
+        seaux.consommer(cle, 5, 1.0, 1.0)
+    assert seaux.nb_cles() == 2
+    assert seaux.consommer("a", 1, 0.0, 1.0) is True  # "a" evince : seau neuf
+
+
+class TestLimiteurDebit:
+
+    def test_classes_separees_et_statistiques(self):
+        limiteur = LimiteurDebit(SeauxMemoire(), {"auth": (2, 60), "api": (100, 60)})
+        assert [limiteur.autoriser("auth", "1.2.3.4", 1.0) for _ in range(3)] == [True, True, False]
+        assert limiteur.autoriser("api", "1.2.3.4", 1.0) is True
+        stats = limiteur.statistiques()
+        assert stats["cles_suivies"] == 2
+        assert stats["classes"]["auth"] == {"capacite": 2, "periode_s": 60, "acceptees": 2, "refusees": 1, "erreurs": 0}
+        assert stats["classes"]["api"]["acceptees"] == 1
+
+    def test_stockage_en_erreur_laisse_passer(self):
+        class StockageHS(SeauxMemoire):
+            def consommer(self, *args):
+                raise RuntimeError("database is locked")
+
+        limiteur = LimiteurDebit(StockageHS(), {"api": (1, 60)})
+        assert limiteur.autoriser("api", "ip") and limiteur.autoriser("api", "ip")
+        assert limiteur.statistiques()["classes"]["api"]["erreurs"] == 2
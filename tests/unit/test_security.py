@@ -1,5 +1,6 @@
 """Tests du module de securite."""
 
+import os
 import sys
 import tempfile
 from pathlib import Path
@@ -9,6 +10,7 @@ from urssaf_analyzer.security.integrity import (
     calculer_hash_sha256, verifier_hash, creer_manifeste,
 )
 from urssaf_analyzer.security.audit_logger import AuditLogger
+from urssaf_analyzer.security.journal_writer import FsyncPolicy, JournalWriter
 from urssaf_analyzer.security.secure_storage import (
     suppression_securisee, verifier_taille_fichier,
 )
@@ -135,6 +137,98 @@ class TestAuditLogger:
             audit.log("test", "s1")
 
 
+class TestJournalWriter:
+    """Tests de l'ecriture bufferisee des journaux."""
+
+    def test_entrees_bufferisees_jusqu_au_flush(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, max_batch=10, flush_interval=0)
+        writer.write('{"n": 1}')
+        writer.write('{"n": 2}')
+        assert writer.pending == 2
+        assert not path.exists() or path.read_text() == ""
+        writer.flush()
+        assert path.read_text().splitlines() == ['{"n": 1}', '{"n": 2}']
+
+    def test_flush_sur_taille_de_lot(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, max_batch=3, flush_interval=0)
+        for i in range(7):
+            writer.write(str(i))
+        assert path.read_text().splitlines() == ["0", "1", "2", "3", "4", "5"]
+        writer.close()
+        assert path.read_text().splitlines() == [str(i) for i in range(7)]
+
+    def test_flush_sur_delai(self, tmp_path):
+        import time
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, max_batch=100, flush_interval=0.05)
+        writer.write("a")
+        deadline = time.time() + 3
+        while writer.pending and time.time() < deadline:
+            time.sleep(0.05)
+        assert path.read_text() == "a\n"
+
+    def test_chaque_entree(self, tmp_path):
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, fsync=FsyncPolicy.CHAQUE_ENTREE)
+        writer.write("x")
+        assert writer.pending == 0
+        assert path.read_text() == "x\n"
+
+    def test_erreur_ecriture_conserve_les_entrees(self, tmp_path):
+        from unittest.mock import patch
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, flush_interval=0)
+        writer.write("conservee")
+        with patch("os.open", side_effect=OSError("Disk full")):
+            writer.flush()
+        assert writer.pending == 1
+        writer.flush()
+        assert path.read_text() == "conservee\n"
+
+    def test_ecriture_partielle_non_dupliquee(self, tmp_path):
+        from unittest.mock import patch
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, flush_interval=0)
+        writer.write("premiere")
+        writer.write("seconde")
+        vrai_write = os.write
+        appels = []
+
+        def write_partiel(fd, data):
+            appels.append(len(data))
+            if len(appels) == 1:
+                return vrai_write(fd, bytes(data[:5]))
+            raise OSError("Disk full")
+
+        with patch("os.write", side_effect=write_partiel):
+            writer.flush()
+        assert writer.pending == 2
+        writer.flush()
+        assert path.read_text() == "premiere\nseconde\n"
+
+    def test_lot_vide_dans_l_enfant_apres_fork(self, tmp_path):
+        from urssaf_analyzer.security import journal_writer
+        path = tmp_path / "journal.jsonl"
+        writer = JournalWriter(path, flush_interval=0)
+        writer.write("parent")
+        journal_writer._apres_fork_enfant()
+        assert writer.pending == 0
+        writer.write("enfant")
+        writer.flush()
+        assert path.read_text() == "enfant\n"
+
+    def test_writer_partage_par_fichier(self, tmp_path):
+        path = tmp_path / "audit.log"
+        a = AuditLogger(path)
+        b = AuditLogger(path)
+        a.log("op1", "s1")
+        b.log("op2", "s2")
+        a.log("op3", "s1")
+        assert [e["operation"] for e in b.lire_journal()] == ["op1", "op2", "op3"]
+
+
 class TestSecureStorage:
     """Tests du stockage securise."""
 
@@ -145,6 +239,15 @@ class TestSecureStorage:
         suppression_securisee(f, passes=1)
         assert not f.exists()
 
+    def test_suppression_securisee_debit_limite(self, tmp_path):
+        import time
+        f = tmp_path / "upload.bin"
+        f.write_bytes(b"x" * 200_000)
+        debut = time.monotonic()
+        suppression_securisee(f, passes=1, debit_max=1_000_000)
+        assert time.monotonic() - debut >= 0.18
+        assert not f.exists()
+
     def test_suppression_fichier_inexistant(self, tmp_path):
         f = tmp_path / "nonexistent.txt"
         # Ne doit pas lever d'exception
@@ -0,0 +1,86 @@
+"""Tests de la serialisation JSON (orjson ou json standard)."""
+
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import serialisation
+from serialisation import ReponseJSON, dumps, loads
+from urssaf_analyzer.config.constants import FindingCategory, Severity
+from urssaf_analyzer.models.documents import Finding
+
+
+@dataclass
+class Point:
+    x: Decimal
+    le: date
+
+
+DONNEES = {
+    "montant": Decimal("1234.56"),
+    "jour": date(2026, 3, 1),
+    "horodatage": datetime(2026, 3, 1, 9, 30),
+    "severite": Severity.CRITIQUE,
+    "point": Point(Decimal("0.5"), date(2026, 1, 31)),
+    "texte": "Cotisation réduite",
+    7: ("a", "b"),
+}
+ATTENDU = {
+    "montant": 1234.56,
+    "jour": "2026-03-01",
+    "horodatage": "2026-03-01T09:30:00",
+    "severite": "critique",
+    "point": {"x": 0.5, "le": "2026-01-31"},
+    "texte": "Cotisation réduite",
+    "7": ["a", "b"],
+}
+
+
+class TestSerialisation:
+
+    def test_types_metier(self):
+        assert loads(dumps(DONNEES)) == ATTENDU
+
+    def test_repli_standard_identique(self):
+        assert serialisation._dumps_std(DONNEES) == dumps(DONNEES)
+
+    def test_repli_standard_nan_et_cles(self):
+        donnees = {
+            "nan": float("nan"), "infini": [float("inf"), Decimal("-Infinity")],
+            date(2026, 3, 1): 1, datetime(2026, 3, 1, 9, 30): 2, Severity.CRITIQUE: 3,
+            1.5: 4, True: 5, None: 6, "imbrique": {Path("/tmp/a"): Point(Decimal("NaN"), date(2026, 1, 31))},
+        }
+        assert serialisation._dumps_std(donnees) == dumps(donnees)
+        assert loads(dumps(donnees)) == {
+            "nan": None, "infini": [None, None], "2026-03-01": 1, "2026-03-01T09:30:00": 2,
+            "critique": 3, "1.5": 4, "true": 5, "null": 6,
+            "imbrique": {"/tmp/a": {"x": None, "le": "2026-01-31"}},
+        }
+
+    def test_finding(self):
+        finding = Finding(categorie=FindingCategory.INCOHERENCE, montant_impact=Decimal("42"))
+        resultat = loads(dumps([finding]))[0]
+        assert resultat["categorie"] == "incoherence" and resultat["montant_impact"] == 42
+        assert resultat["detecte_le"] == finding.detecte_le.isoformat()
+
+    def test_types_inconnus_et_grands_entiers(self):
+        assert loads(dumps({"chemin": Path("/tmp/a"), "n": 2 ** 70})) == {"chemin": "/tmp/a", "n": 2 ** 70}
+
+    def test_reponse(self):
+        reponse = ReponseJSON({"total": Decimal("10.00")}, status_code=201)
+        assert reponse.status_code == 201 and reponse.media_type == "application/json"
+        assert loads(reponse.body) == {"total": 10.0}
+
+
+def test_store_persistant(tmp_path, monkeypatch):
+    import persistence
+    monkeypatch.setattr(persistence, "DB_DIR", tmp_path)
+    store = persistence.PersistentStore("serialisation_test", default={})
+    store.save({"montant": Decimal("3.5"), "le": date(2026, 2, 1)})
+    assert store.load() == {"montant": 3.5, "le": "2026-02-01"}
+    (tmp_path / "serialisation_test.json").write_text("{corrompu")
+    assert store.load() == {}
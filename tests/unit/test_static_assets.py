@@ -0,0 +1,79 @@
+"""Tests des ressources statiques precompressees."""
+
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from static_assets import CACHE_EMPREINTE, CACHE_PAGE, RessourcesStatiques
+
+JS = "function f(){return 1;}\n" * 200
+
+
+@pytest.fixture
+def statiques(tmp_path):
+    (tmp_path / "page.html").write_text(
+        '<html><head><script src="/static/app.js"></script></head>'
+        '<body><a href="/static/absent.css">x</a></body></html>' + "<p>texte</p>" * 100,
+        encoding="utf-8",
+    )
+    (tmp_path / "app.js").write_text(JS, encoding="utf-8")
+    (tmp_path / ".cache").write_text("ignore")
+    return RessourcesStatiques(tmp_path, {"/page": "page.html"})
+
+
+class TestRessourcesStatiques:
+
+    def test_references_reecrites_avec_empreinte(self, statiques):
+        url = statiques.url("app.js")
+        assert url.startswith("/static/app.") and url.endswith(".js") and url != "/static/app.js"
+        _, _, corps = statiques.servir("/page")
+        assert f'src="{url}"' in corps.decode()
+        assert 'href="/static/absent.css"' in corps.decode()
+        assert statiques.get("/static/.cache") is None
+        assert statiques.get("/static/page.html") is None
+
+    def test_gzip_negocie(self, statiques):
+        statut, entetes, corps = statiques.servir("/page", "gzip, deflate")
+        assert statut == 200 and entetes["Content-Encoding"] == "gzip"
+        assert entetes["Content-Type"].startswith("text/html")
+        assert entetes["Vary"] == "Accept-Encoding" and entetes["Cache-Control"] == CACHE_PAGE
+        assert gzip.decompress(corps).startswith(b"<html>")
+
+    @pytest.mark.parametrize("accept", ["", "identity", "gzip;q=0", "br;q=0, gzip;q=0"])
+    def test_sans_compression(self, statiques, accept):
+        _, entetes, corps = statiques.servir("/page", accept)
+        assert "Content-Encoding" not in entetes and corps.startswith(b"<html>")
+
+    def test_etag_par_representation_et_304(self, statiques):
+        _, brut, _ = statiques.servir("/page")
+        _, compresse, _ = statiques.servir("/page", "gzip")
+        assert brut["ETag"] != compresse["ETag"]
+        for if_none_match in (compresse["ETag"], f'"autre", W/{brut["ETag"]}', "*"):
+            statut, entetes, corps = statiques.servir("/page", "gzip", if_none_match)
+            assert (statut, corps) == (304, b"")
+            assert entetes["ETag"] == compresse["ETag"]
+        assert statiques.servir("/page", "gzip", '"perimee"')[0] == 200
+
+    def test_cache_long_sur_empreinte(self, statiques):
+        _, entetes, _ = statiques.servir(statiques.url("app.js"), "gzip")
+        assert entetes["Cache-Control"] == CACHE_EMPREINTE
+        assert entetes["Content-Type"].startswith("text/javascript")
+        _, entetes, _ = statiques.servir("/static/app.js")
+        assert entetes["Cache-Control"] == CACHE_PAGE
+
+    def test_chemin_inconnu(self, statiques):
+        assert statiques.servir("/static/inconnu.js") is None
+
+
+class TestFichiersLivres:
+
+    @pytest.mark.parametrize("chemin", sorted(
+        (Path(__file__).parent.parent.parent / "api" / "static").glob("*.*"), key=str,
+    ), ids=lambda p: p.name)
+    def test_texte_sans_caractere_de_controle(self, chemin):
+        texte = chemin.read_bytes().decode("utf-8")
+        assert not [c for c in texte if ord(c) < 32 and c not in "\t\n\r"]
@@ -4,18 +4,22 @@ Genere automatiquement les ecritures a partir des pieces comptables
 detectees par le module OCR.
 """
 
+import itertools
 import uuid
-from dataclasses import dataclass, field
 from datetime import date, datetime
 from decimal import Decimal, ROUND_HALF_UP
 from enum import Enum
-from typing import Optional
+from typing import Iterator, Optional
 
 from urssaf_analyzer.comptabilite.plan_comptable import (
     PlanComptable, REGLES_AFFECTATION, determiner_compte_charge,
 )
 
 
+def _iso(d: date | str | None) -> Optional[str]:
+    return d.isoformat() if isinstance(d, date) else d
+
+
 class TypeJournal(str, Enum):
     ACHATS = "AC"
     VENTES = "VE"
@@ -25,59 +29,255 @@ class TypeJournal(str, Enum):
     A_NOUVEAU = "AN"
 
 
-@dataclass
+def en_centimes(montant) -> int:
+    """Convertit un montant (Decimal, float, int, str) en centimes arrondis."""
+    if type(montant) is int:
+        return montant * 100
+    if not isinstance(montant, Decimal):
+        montant = Decimal(str(montant))
+    return int((montant * 100).quantize(_UNITE, rounding=ROUND_HALF_UP))
+
+
+def en_decimal(centimes: int) -> Decimal:
+    """Centimes -> Decimal a deux decimales (exact)."""
+    return Decimal(centimes or 0).scaleb(-2)
+
+
+_UNITE = Decimal("1")
+
+# Version globale des montants : incrementee a chaque modification d'une
+# ligne ou d'une liste de lignes. Les totaux mis en cache par une ecriture
+# restent valides tant qu'elle n'a pas change (pas de reference
+# ligne -> ecriture, donc pas de cycle a collecter).
+_compteur_mutations = itertools.count(1)
+_version_montants = [0]
+
+
+def _signaler_mutation() -> None:
+    _version_montants[0] = next(_compteur_mutations)
+
+
 class LigneEcriture:
-    compte: str
-    libelle: str
-    debit: Decimal = Decimal("0.00")
-    credit: Decimal = Decimal("0.00")
-    lettrage: str = ""
-    piece_ref: str = ""
+    """Ligne d'ecriture compacte : montants conserves en centimes (int).
+
+    `debit` et `credit` restent exposes en Decimal (exacts, 2 decimales) ;
+    `debit_centimes` / `credit_centimes` evitent toute conversion dans les
+    boucles de calcul.
+    """
+
+    __slots__ = ("compte", "libelle", "_debit", "_credit", "lettrage", "piece_ref")
+
+    def __init__(
+        self,
+        compte: str,
+        libelle: str,
+        debit: Decimal = Decimal("0.00"),
+        credit: Decimal = Decimal("0.00"),
+        lettrage: str = "",
+        piece_ref: str = "",
+    ):
+        self.compte = compte
+        self.libelle = libelle
+        self._debit = en_centimes(debit)
+        self._credit = en_centimes(credit)
+        self.lettrage = lettrage
+        self.piece_ref = piece_ref
+
+    @classmethod
+    def depuis_centimes(
+        cls, compte: str, libelle: str, debit: int, credit: int, lettrage: str = "", piece_ref: str = "",
+    ) -> "LigneEcriture":
+        """Construction sans conversion (lecture du registre)."""
+        ligne = cls.__new__(cls)
+        ligne.compte, ligne.libelle = compte, libelle
+        ligne._debit, ligne._credit = debit, credit
+        ligne.lettrage, ligne.piece_ref = lettrage, piece_ref
+        return ligne
+
+    @property
+    def debit(self) -> Decimal:
+        return en_decimal(self._debit)
+
+    @debit.setter
+    def debit(self, montant) -> None:
+        self._debit = en_centimes(montant)
+        _signaler_mutation()
+
+    @property
+    def credit(self) -> Decimal:
+        return en_decimal(self._credit)
+
+    @credit.setter
+    def credit(self, montant) -> None:
+        self._credit = en_centimes(montant)
+        _signaler_mutation()
+
+    @property
+    def debit_centimes(self) -> int:
+        return self._debit
+
+    @property
+    def credit_centimes(self) -> int:
+        return self._credit
 
     @property
     def solde(self) -> Decimal:
-        return self.debit - self.credit
+        return en_decimal(self._debit - self._credit)
+
+    def _cle(self) -> tuple:
+        return (self.compte, self.libelle, self._debit, self._credit, self.lettrage, self.piece_ref)
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._cle() == other._cle()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"LigneEcriture(compte={self.compte!r}, libelle={self.libelle!r}, debit={self.debit!r}, "
+                f"credit={self.credit!r}, lettrage={self.lettrage!r}, piece_ref={self.piece_ref!r})")
+
+
+class _Lignes(list):
+    """Liste de lignes signalant chaque modification (invalidation des totaux)."""
+
+    __slots__ = ()
+
+    def _modifiee(methode):
+        def wrapper(self, *args, **kwargs):
+            _signaler_mutation()
+            return methode(self, *args, **kwargs)
+        wrapper.__name__ = methode.__name__
+        return wrapper
+
+    append = _modifiee(list.append)
+    extend = _modifiee(list.extend)
+    insert = _modifiee(list.insert)
+    pop = _modifiee(list.pop)
+    remove = _modifiee(list.remove)
+    clear = _modifiee(list.clear)
+    __setitem__ = _modifiee(list.__setitem__)
+    __delitem__ = _modifiee(list.__delitem__)
+    __iadd__ = _modifiee(list.__iadd__)
+    __imul__ = _modifiee(list.__imul__)
+    del _modifiee
+
+
+_CHAMPS_ECRITURE = ("id", "journal", "date_ecriture", "date_piece", "numero_piece", "libelle",
+                    "lignes", "validee", "date_validation")
 
 
-@dataclass
 class Ecriture:
-    id: str = ""
-    journal: TypeJournal = TypeJournal.OPERATIONS_DIVERSES
-    date_ecriture: date = None
-    date_piece: date = None
-    numero_piece: str = ""
-    libelle: str = ""
-    lignes: list[LigneEcriture] = field(default_factory=list)
-    validee: bool = False
-    date_validation: Optional[datetime] = None
-
-    def __post_init__(self):
-        if not self.id:
-            self.id = str(uuid.uuid4())
-        if self.date_ecriture is None:
-            self.date_ecriture = date.today()
+    """Ecriture comptable ; totaux debit/credit calcules en centimes et mis en cache."""
+
+    __slots__ = ("id", "journal", "date_ecriture", "date_piece", "numero_piece", "libelle",
+                 "_lignes", "validee", "date_validation", "_totaux")
+
+    def __init__(
+        self,
+        id: str = "",
+        journal: TypeJournal = TypeJournal.OPERATIONS_DIVERSES,
+        date_ecriture: date = None,
+        date_piece: date = None,
+        numero_piece: str = "",
+        libelle: str = "",
+        lignes: Optional[list[LigneEcriture]] = None,
+        validee: bool = False,
+        date_validation: Optional[datetime] = None,
+    ):
+        self.id = id or str(uuid.uuid4())
+        self.journal = journal
+        self.date_ecriture = date_ecriture if date_ecriture is not None else date.today()
+        self.date_piece = date_piece
+        self.numero_piece = numero_piece
+        self.libelle = libelle
+        self.lignes = lignes if lignes is not None else []
+        self.validee = validee
+        self.date_validation = date_validation
+
+    @property
+    def lignes(self) -> list[LigneEcriture]:
+        return self._lignes
+
+    @lignes.setter
+    def lignes(self, lignes) -> None:
+        self._lignes = lignes if type(lignes) is _Lignes else _Lignes(lignes)
+        self._totaux = None
+
+    def totaux_centimes(self) -> tuple[int, int]:
+        """(debit, credit) en centimes, recalcules seulement apres une modification."""
+        version = _version_montants[0]
+        totaux = self._totaux
+        if totaux is None or totaux[0] != version:
+            debit = credit = 0
+            for l in self._lignes:
+                debit += l._debit
+                credit += l._credit
+            totaux = self._totaux = (version, debit, credit)
+        return totaux[1], totaux[2]
 
     @property
     def est_equilibree(self) -> bool:
-        total_debit = sum(l.debit for l in self.lignes)
-        total_credit = sum(l.credit for l in self.lignes)
-        return total_debit == total_credit
+        debit, credit = self.totaux_centimes()
+        return debit == credit
 
     @property
     def total_debit(self) -> Decimal:
-        return sum(l.debit for l in self.lignes)
+        return en_decimal(self.totaux_centimes()[0])
 
     @property
     def total_credit(self) -> Decimal:
-        return sum(l.credit for l in self.lignes)
+        return en_decimal(self.totaux_centimes()[1])
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, c) == getattr(other, c) for c in _CHAMPS_ECRITURE)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return "Ecriture(" + ", ".join(f"{c}={getattr(self, c)!r}" for c in _CHAMPS_ECRITURE) + ")"
 
 
 class MoteurEcritures:
-    """Genere les ecritures comptables a partir des pieces detectees."""
+    """Genere les ecritures comptables a partir des pieces detectees.
+
+    Les ecritures sont conservees dans un `StockageEcritures` (SQLite,
+    en memoire par defaut) ; `ecritures` en est une vue sequence.
+    """
+
+    def __init__(self, plan_comptable: PlanComptable = None, stockage=None):
+        from urssaf_analyzer.comptabilite.stockage import StockageEcritures, VueEcritures
 
-    def __init__(self, plan_comptable: PlanComptable = None):
         self.plan = plan_comptable or PlanComptable()
-        self.ecritures: list[Ecriture] = []
+        self.stockage = stockage or StockageEcritures()
+        self.ecritures = VueEcritures(self.stockage)
+
+    # --- Registre ---
+
+    def ajouter_ecriture(self, ecriture: Ecriture) -> Ecriture:
+        self.stockage.ajouter(ecriture)
+        return ecriture
+
+    def get_ecriture(self, ecriture_id: str) -> Optional[Ecriture]:
+        return self.stockage.obtenir(ecriture_id)
+
+    def mettre_a_jour_ecriture(self, ecriture: Ecriture) -> bool:
+        """Enregistre les modifications d'une ecriture obtenue par get_ecriture."""
+        return self.stockage.mettre_a_jour(ecriture)
+
+    def supprimer_ecriture(self, ecriture_id: str) -> Optional[Ecriture]:
+        return self.stockage.supprimer(ecriture_id)
+
+    def supprimer_non_validees(self) -> int:
+        return self.stockage.supprimer_non_validees()
+
+    def nb_ecritures(self, validees: Optional[bool] = None) -> int:
+        return self.stockage.compter(validees)
+
+    # --- Generation ---
 
     def generer_ecriture_facture(
         self,
@@ -90,8 +290,13 @@ class MoteurEcritures:
         nom_tiers: str = "",
         lignes_detail: list[dict] = None,
         libelle: str = "",
+        enregistrer: bool = True,
     ) -> Ecriture:
-        """Genere l'ecriture pour une facture d'achat ou de vente."""
+        """Genere l'ecriture pour une facture d'achat ou de vente.
+
+        enregistrer=False : l'ecriture est retournee sans etre inseree
+        (insertion groupee par stockage.ajouter_lot).
+        """
         regle = REGLES_AFFECTATION.get(type_doc, REGLES_AFFECTATION["facture_achat"])
         est_vente = type_doc in ("facture_vente", "avoir_vente")
         est_avoir = type_doc in ("avoir_achat", "avoir_vente")
@@ -169,8 +374,9 @@ class MoteurEcritures:
                     credit=tva, piece_ref=numero_piece,
                 ))
 
-        self.ecritures.append(ecriture)
-        return ecriture
+        if not enregistrer:
+            return ecriture
+        return self.ajouter_ecriture(ecriture)
 
     def _ajouter_lignes_charges(
         self, ecriture: Ecriture, lignes_detail: list[dict],
@@ -338,8 +544,7 @@ class MoteurEcritures:
                 credit=cot_retraite, piece_ref=ecriture.numero_piece,
             ))
 
-        self.ecritures.append(ecriture)
-        return ecriture
+        return self.ajouter_ecriture(ecriture)
 
     def generer_ecriture_reglement(
         self,
@@ -383,85 +588,125 @@ class MoteurEcritures:
                 piece_ref=numero_piece,
             ))
 
-        self.ecritures.append(ecriture)
-        return ecriture
+        return self.ajouter_ecriture(ecriture)
 
     def valider_ecritures(self) -> list[str]:
         """Valide toutes les ecritures non validees. Retourne les erreurs."""
+
         erreurs = []
-        for e in self.ecritures:
-            if e.validee:
-                continue
-            if not e.est_equilibree:
+        a_valider = []
+        for num, ecriture_id, libelle, debit, credit, nb_lignes in self.stockage.controle_non_validees():
+            if debit != credit:
                 erreurs.append(
-                    f"Ecriture {e.id} ({e.libelle}) desequilibree: "
-                    f"D={e.total_debit} C={e.total_credit}"
+                    f"Ecriture {ecriture_id} ({libelle}) desequilibree: "
+                    f"D={en_decimal(debit)} C={en_decimal(credit)}"
                 )
                 continue
-            if not e.lignes:
-                erreurs.append(f"Ecriture {e.id} sans lignes")
+            if not nb_lignes:
+                erreurs.append(f"Ecriture {ecriture_id} sans lignes")
                 continue
-            e.validee = True
-            e.date_validation = datetime.now()
+            a_valider.append(num)
+        if a_valider:
+            self.stockage.valider(a_valider, datetime.now())
         return erreurs
 
-    def get_grand_livre(self, validees_seulement: bool = False) -> dict[str, list[dict]]:
-        """Retourne le grand livre (mouvements par compte)."""
+    def iter_grand_livre(
+        self,
+        validees_seulement: bool = False,
+        date_debut: date | str | None = None,
+        date_fin: date | str | None = None,
+        compte_debut: Optional[str] = None,
+        compte_fin: Optional[str] = None,
+        curseur: Optional[str] = None,
+    ) -> Iterator[tuple[str, dict, tuple]]:
+        """Parcourt le grand livre : (compte, mouvement, cle de reprise apres ce mouvement).
+
+        Ordre : compte, date, ordre de saisie. Les bornes de dates et de
+        comptes sont incluses ; seules les lignes de l'intervalle sont lues.
+        """
+        from urssaf_analyzer.comptabilite.stockage import decoder_curseur
+
+        for compte, date_ecr, journal, piece, libelle, debit, credit, num, rang in self.stockage.mouvements(
+            validees_seulement,
+            _iso(date_debut), _iso(date_fin), compte_debut, compte_fin,
+            decoder_curseur(curseur) if curseur else None,
+        ):
+            yield compte, {
+                "date": date_ecr,
+                "journal": journal,
+                "piece": piece,
+                "libelle": libelle,
+                "debit": debit / 100,
+                "credit": credit / 100,
+            }, (compte, date_ecr, num, rang)
+
+    def get_grand_livre(
+        self,
+        validees_seulement: bool = False,
+        date_debut: date | str | None = None,
+        date_fin: date | str | None = None,
+    ) -> dict[str, list[dict]]:
+        """Retourne le grand livre (mouvements par compte, tries par date)."""
         grand_livre: dict[str, list[dict]] = {}
-        for e in self.ecritures:
-            if validees_seulement and not e.validee:
-                continue
-            for l in e.lignes:
-                if l.compte not in grand_livre:
-                    grand_livre[l.compte] = []
-                grand_livre[l.compte].append({
-                    "date": e.date_ecriture.isoformat(),
-                    "journal": e.journal.value,
-                    "piece": e.numero_piece,
-                    "libelle": l.libelle,
-                    "debit": float(l.debit),
-                    "credit": float(l.credit),
-                })
-        return dict(sorted(grand_livre.items()))
-
-    def get_balance(self, validees_seulement: bool = False) -> list[dict]:
-        """Retourne la balance des comptes."""
-        totaux: dict[str, dict] = {}
-        for e in self.ecritures:
-            if validees_seulement and not e.validee:
-                continue
-            for l in e.lignes:
-                if l.compte not in totaux:
-                    cpt = self.plan.get_compte(l.compte)
-                    totaux[l.compte] = {
-                        "compte": l.compte,
-                        "libelle": cpt.libelle if cpt else l.libelle,
-                        "total_debit": Decimal("0"),
-                        "total_credit": Decimal("0"),
-                    }
-                totaux[l.compte]["total_debit"] += l.debit
-                totaux[l.compte]["total_credit"] += l.credit
-
+        for compte, mouvement, _ in self.iter_grand_livre(validees_seulement, date_debut, date_fin):
+            grand_livre.setdefault(compte, []).append(mouvement)
+        return grand_livre
+
+    def get_grand_livre_page(
+        self, limite: int = 500, curseur: Optional[str] = None, **filtres,
+    ) -> tuple[dict[str, list[dict]], Optional[str]]:
+        """Page de `limite` mouvements au plus et curseur de la page suivante (None a la fin)."""
+        from urssaf_analyzer.comptabilite.stockage import encoder_curseur
+
+        page: dict[str, list[dict]] = {}
+        derniere = None
+        for i, (compte, mouvement, cle) in enumerate(self.iter_grand_livre(curseur=curseur, **filtres)):
+            if i == limite:
+                return page, encoder_curseur(*derniere)
+            page.setdefault(compte, []).append(mouvement)
+            derniere = cle
+        return page, None
+
+    def get_balance(
+        self,
+        validees_seulement: bool = False,
+        periode_debut: Optional[str] = None,
+        periode_fin: Optional[str] = None,
+        prefixes: Optional[tuple[str, ...]] = None,
+    ) -> list[dict]:
+        """Retourne la balance des comptes.
+
+        Lue dans les soldes materialises par compte et par mois ; filtrable
+        par periode (AAAA-MM, bornes incluses) et par racines de comptes.
+        """
         balance = []
-        for compte in sorted(totaux.keys()):
-            t = totaux[compte]
-            solde = t["total_debit"] - t["total_credit"]
+        for compte, debit, credit, libelle_ligne in self.stockage.totaux_par_compte(
+            validees_seulement, periode_debut, periode_fin, prefixes,
+        ):
+            cpt = self.plan.get_compte(compte)
+            solde = debit - credit
             balance.append({
-                "compte": t["compte"],
-                "libelle": t["libelle"],
-                "total_debit": float(t["total_debit"]),
-                "total_credit": float(t["total_credit"]),
-                "solde_debiteur": float(solde) if solde > 0 else 0.0,
-                "solde_crediteur": float(abs(solde)) if solde < 0 else 0.0,
+                "compte": compte,
+                "libelle": cpt.libelle if cpt else libelle_ligne,
+                "total_debit": debit / 100,
+                "total_credit": credit / 100,
+                "solde_debiteur": solde / 100 if solde > 0 else 0.0,
+                "solde_crediteur": -solde / 100 if solde < 0 else 0.0,
             })
         return balance
 
+    def verifier_agregats(self, reparer: bool = False) -> list[dict]:
+        """Controle de coherence des soldes materialises (reconstruits si `reparer`)."""
+        ecarts = self.stockage.verifier_agregats()
+        if ecarts and reparer:
+            self.stockage.reconstruire_agregats()
+        return ecarts
+
     def get_journal(self, type_journal: TypeJournal = None) -> list[dict]:
         """Retourne les ecritures d'un journal."""
         result = []
-        for e in self.ecritures:
-            if type_journal and e.journal != type_journal:
-                continue
+        for e in self.stockage.iterer(journal=type_journal):
+            total_debit, total_credit = e.totaux_centimes()
             result.append({
                 "id": e.id,
                 "journal": e.journal.value,
@@ -473,13 +718,13 @@ class MoteurEcritures:
                     {
                         "compte": l.compte,
                         "libelle": l.libelle,
-                        "debit": float(l.debit),
-                        "credit": float(l.credit),
+                        "debit": l.debit_centimes / 100,
+                        "credit": l.credit_centimes / 100,
                     }
                     for l in e.lignes
                 ],
-                "total_debit": float(e.total_debit),
-                "total_credit": float(e.total_credit),
-                "equilibree": e.est_equilibree,
+                "total_debit": total_debit / 100,
+                "total_credit": total_credit / 100,
+                "equilibree": total_debit == total_credit,
             })
         return result
@@ -5,9 +5,12 @@ Format reglementaire : Art. L.47 A-I du Livre des Procedures Fiscales.
 Nom de fichier conventionnel : {SIREN}FEC{YYYYMMDD}.txt
 """
 
+import codecs
 import io
-from datetime import date
+import zipfile
+from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
+from typing import Iterable, Iterator
 
 from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures, Ecriture, TypeJournal
 
@@ -61,6 +64,100 @@ def _fmt_montant(m: Decimal | float | int) -> str:
     return f"{m:.2f}".replace(".", ",")
 
 
+def _fmt_centimes(centimes: int) -> str:
+    """Formate un montant en centimes au format FEC (equivalent a _fmt_montant)."""
+    signe = "-" if centimes < 0 else ""
+    centimes = abs(centimes)
+    return f"{signe}{centimes // 100},{centimes % 100:02d}"
+
+
+def _fmt_date_iso(valeur: str | None) -> str:
+    """AAAA-MM-JJ[THH:MM:SS] -> AAAAMMJJ."""
+    return valeur[:10].replace("-", "") if valeur else ""
+
+
+TAILLE_BLOC_FEC = 64 * 1024
+
+
+def iter_fec(
+    moteur: MoteurEcritures,
+    siren: str = "",
+    date_cloture: date | None = None,
+    separateur: str = "\t",
+    validees_seulement: bool = True,
+    encodage: str = "utf-8",
+    taille_bloc: int = TAILLE_BLOC_FEC,
+) -> Iterator[bytes]:
+    """Produit le fichier FEC par blocs encodes d'environ `taille_bloc` octets.
+
+    Les lignes sont lues par lots dans le registre et les libelles de
+    comptes resolus par une table construite une fois : la memoire reste
+    constante quel que soit le nombre d'ecritures et le premier bloc est
+    disponible immediatement. Encodage UTF-8 par defaut ("utf-8-sig"
+    ajoute le BOM en tete du fichier) ; avec un encodage restreint
+    ("iso-8859-15"), les caracteres non representables sont remplaces.
+    """
+    encodeur = codecs.getincrementalencoder(encodage)(errors="replace")
+    libelles_comptes = {numero: cpt.libelle for numero, cpt in moteur.plan.comptes.items()}
+    libelles_journaux = {j.value: lib for j, lib in JOURNAL_LIBELLES.items()}
+
+    morceaux = [separateur.join(COLONNES_FEC)]
+    taille = len(morceaux[0])
+    # Compteur global d'ecriture pour numerotation sequentielle
+    num_ecriture = 0
+    num_courant = None
+    for (num, journal_code, date_ecr, date_piece, numero_piece, date_validation,
+         compte_ligne, libelle, debit, credit, lettrage, piece_ref) in moteur.stockage.lignes_detaillees(
+            validees_seulement=validees_seulement):
+        if num != num_courant:
+            num_courant = num
+            num_ecriture += 1
+            ecriture_num = numero_piece or f"{num_ecriture:06d}"
+            journal_lib = libelles_journaux.get(journal_code, journal_code)
+            ecriture_date = _fmt_date_iso(date_ecr)
+            piece_date = _fmt_date_iso(date_piece)
+            valid_date = _fmt_date_iso(date_validation)
+        if compte_ligne is None:
+            continue  # ecriture sans ligne : numerotee, rien a exporter
+
+        # Comptes de tiers (401xxx, 411xxx) -> compte auxiliaire
+        compte = compte_ligne
+        comp_aux_num = comp_aux_lib = ""
+        if len(compte) > 6 and (compte.startswith("401") or compte.startswith("411")):
+            comp_aux_num = compte
+            comp_aux_lib = libelle
+            # Tronquer au compte general
+            compte = compte[:6] + "0" * (len(compte) - 6)
+
+        ligne = separateur.join((
+            journal_code,
+            journal_lib,
+            ecriture_num,
+            ecriture_date,
+            compte,
+            libelles_comptes.get(compte_ligne, libelle),
+            comp_aux_num,
+            comp_aux_lib,
+            piece_ref or numero_piece,
+            piece_date,
+            libelle,
+            _fmt_centimes(debit),
+            _fmt_centimes(credit),
+            lettrage,
+            ecriture_date if lettrage else "",  # DateLet
+            valid_date,
+            "",  # Montantdevise
+            "",  # Idevise
+        ))
+        morceaux.append(ligne)
+        taille += len(ligne) + 1
+        if taille >= taille_bloc:
+            yield encodeur.encode("\n".join(morceaux))
+            # Le bloc suivant commence par le saut de ligne qui le separe du precedent
+            morceaux, taille = [""], 0
+    yield encodeur.encode("\n".join(morceaux), final=True)
+
+
 def exporter_fec(
     moteur: MoteurEcritures,
     siren: str = "",
@@ -78,68 +175,61 @@ def exporter_fec(
         validees_seulement: Si True, n'exporte que les ecritures validees.
 
     Returns:
-        Le contenu du fichier FEC sous forme de chaine.
+        Le contenu du fichier FEC sous forme de chaine (voir iter_fec pour
+        un export par blocs).
     """
-    lignes = []
-    # En-tete
-    lignes.append(separateur.join(COLONNES_FEC))
+    return b"".join(iter_fec(
+        moteur, siren=siren, date_cloture=date_cloture, separateur=separateur,
+        validees_seulement=validees_seulement,
+    )).decode("utf-8")
 
-    # Compteur global d'ecriture pour numerotation sequentielle
-    num_ecriture = 0
 
-    for ecriture in moteur.ecritures:
-        if validees_seulement and not ecriture.validee:
-            continue
+def zipper_flux(blocs: Iterable[bytes], nom_fichier: str) -> Iterator[bytes]:
+    """Compresse un flux d'octets a la volee dans une archive ZIP d'un fichier.
 
-        num_ecriture += 1
-        ecriture_num = ecriture.numero_piece or f"{num_ecriture:06d}"
-        journal_code = ecriture.journal.value
-        journal_lib = JOURNAL_LIBELLES.get(ecriture.journal, journal_code)
-
-        for ligne in ecriture.lignes:
-            # Determiner compte auxiliaire
-            comp_aux_num = ""
-            comp_aux_lib = ""
-            compte = ligne.compte
-            # Comptes de tiers (401xxx, 411xxx) -> compte auxiliaire
-            if compte.startswith("401") or compte.startswith("411"):
-                if len(compte) > 6:
-                    comp_aux_num = compte
-                    comp_aux_lib = ligne.libelle
-                    # Tronquer au compte general
-                    compte = compte[:6] + "0" * (len(compte) - 6)
-
-            # Recuperer le libelle du compte depuis le plan comptable
-            cpt_obj = moteur.plan.get_compte(ligne.compte)
-            compte_lib = cpt_obj.libelle if cpt_obj else ligne.libelle
-
-            valid_date = ""
-            if ecriture.date_validation:
-                valid_date = _fmt_date(ecriture.date_validation.date())
-
-            champs = [
-                journal_code,
-                journal_lib,
-                ecriture_num,
-                _fmt_date(ecriture.date_ecriture),
-                compte,
-                compte_lib,
-                comp_aux_num,
-                comp_aux_lib,
-                ligne.piece_ref or ecriture.numero_piece,
-                _fmt_date(ecriture.date_piece),
-                ligne.libelle,
-                _fmt_montant(ligne.debit),
-                _fmt_montant(ligne.credit),
-                ligne.lettrage,
-                _fmt_date(ecriture.date_ecriture) if ligne.lettrage else "",  # DateLet
-                valid_date,
-                "",  # Montantdevise
-                "",  # Idevise
-            ]
-            lignes.append(separateur.join(champs))
-
-    return "\n".join(lignes)
+    L'archive est ecrite dans un tampon non positionnable (descripteur de
+    donnees en fin d'entree) et videe apres chaque bloc : rien n'est
+    conserve en memoire au-dela du bloc courant.
+    """
+    tampon = _TamponFlux()
+    with zipfile.ZipFile(tampon, "w", zipfile.ZIP_DEFLATED) as zf:
+        info = zipfile.ZipInfo(nom_fichier, date_time=datetime.now().timetuple()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with zf.open(info, "w", force_zip64=True) as entree:
+            for bloc in blocs:
+                entree.write(bloc)
+                if tampon.taille:
+                    yield tampon.vider()
+    yield tampon.vider()
+
+
+class _TamponFlux(io.RawIOBase):
+    """Fichier en ecriture seule, non positionnable, vide par le lecteur."""
+
+    def __init__(self):
+        super().__init__()
+        self._morceaux: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, donnees) -> int:
+        self._morceaux.append(bytes(donnees))
+        self._position += len(donnees)
+        return len(donnees)
+
+    def tell(self) -> int:
+        return self._position
+
+    @property
+    def taille(self) -> int:
+        return sum(len(m) for m in self._morceaux)
+
+    def vider(self) -> bytes:
+        donnees = b"".join(self._morceaux)
+        self._morceaux = []
+        return donnees
 
 
 def nom_fichier_fec(siren: str, date_cloture: date | None = None) -> str:
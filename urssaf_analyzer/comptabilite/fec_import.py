@@ -0,0 +1,243 @@
+"""Import en masse d'un FEC dans le registre des ecritures.
+
+Le fichier est lu ligne a ligne (aucune structure intermediaire par
+ligne, ni Decimal) : les lignes consecutives d'une meme ecriture
+(JournalCode, EcritureNum) sont regroupees, l'equilibre debit/credit est
+controle en centimes au fil de la lecture et les ecritures equilibrees
+sont inserees par lots de `taille_lot` (StockageEcritures.importer_lot).
+Une progression est produite apres chaque lot.
+
+Une ecriture dont les lignes ne sont pas contigues dans le fichier est
+reconstituee : la partie desequilibree est conservee jusqu'a ce que la
+suite arrive. Les ecritures encore desequilibrees en fin de fichier, ou
+sans date valide, sont rejetees et signalees.
+
+Une ecriture portant une ValidDate est importee validee a cette date.
+Un compte auxiliaire (CompAuxNum) devient le compte de la ligne, prefixe
+par la racine du compte general s'il ne la contient pas (401 + DUPONT ->
+401DUPONT), comme les comptes de tiers saisis ; CompAuxLib en est le
+libelle.
+"""
+
+import time
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures, TypeJournal
+from urssaf_analyzer.comptabilite.stockage import en_centimes
+from urssaf_analyzer.core.exceptions import ParseError
+from urssaf_analyzer.parsers.fec_parser import FECParser, _parser_date_fec, _parser_montant_fec
+
+TAILLE_LOT_IMPORT = 5000  # ecritures par transaction
+MAX_ERREURS = 100
+
+_COLONNES_REQUISES = ("EcritureNum", "EcritureDate", "CompteNum", "Debit", "Credit")
+_JOURNAUX = {t.value for t in TypeJournal}
+
+
+@dataclass
+class ResultatImportFEC:
+    """Progression puis bilan d'un import en masse (montants en centimes)."""
+    lignes_lues: int = 0
+    lignes_importees: int = 0
+    ecritures_importees: int = 0
+    ecritures_rejetees: int = 0
+    total_debit: int = 0
+    total_credit: int = 0
+    erreurs: list[dict] = field(default_factory=list)
+    duree_s: float = 0.0
+    termine: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "lignes_lues": self.lignes_lues,
+            "lignes_importees": self.lignes_importees,
+            "ecritures_importees": self.ecritures_importees,
+            "ecritures_rejetees": self.ecritures_rejetees,
+            "total_debit": self.total_debit / 100,
+            "total_credit": self.total_credit / 100,
+            "erreurs": self.erreurs,
+            "duree_s": round(self.duree_s, 3),
+            "termine": self.termine,
+        }
+
+
+@lru_cache(maxsize=65536)
+def centimes_fec(val: str) -> int:
+    """Montant FEC -> centimes ; chemin rapide pour les formats usuels (1234,56).
+
+    Memoisee : une colonne sur deux vaut 0,00 et les montants se repetent.
+    """
+    val = val.strip()
+    if not val:
+        return 0
+    entier, sep, decimales = val.replace(",", ".").partition(".")
+    signe = -1 if entier.startswith("-") else 1
+    entier = entier.lstrip("+-")
+    if (entier.isdigit() or (not entier and sep)) and len(decimales) <= 2 and (
+            not decimales or decimales.isdigit()):
+        return signe * (int(entier or 0) * 100 + int(decimales.ljust(2, "0")))
+    return en_centimes(_parser_montant_fec(val))
+
+
+@lru_cache(maxsize=8192)
+def date_iso_fec(val: str) -> Optional[str]:
+    """Date FEC -> AAAA-MM-JJ (None si invalide). Memoisee : les dates se repetent."""
+    try:
+        d = _parser_date_fec(val)
+    except Exception:
+        return None
+    return d.isoformat() if d else None
+
+
+def _lignes_texte(chemin: Path) -> Iterator[str]:
+    """Lignes decodees une a une (UTF-8, repli cp1252 puis latin-1 par ligne)."""
+    with open(chemin, "rb") as f:
+        for brut in f:
+            try:
+                ligne = brut.decode("utf-8")
+            except UnicodeDecodeError:
+                try:
+                    ligne = brut.decode("cp1252")
+                except UnicodeDecodeError:
+                    ligne = brut.decode("latin-1")
+            yield ligne.rstrip("\r\n")
+
+
+def iter_import_fec(
+    moteur: MoteurEcritures,
+    chemin: Path,
+    taille_lot: int = TAILLE_LOT_IMPORT,
+) -> Iterator[ResultatImportFEC]:
+    """Importe un FEC dans le registre ; produit la progression apres chaque lot.
+
+    Le dernier element produit a `termine=True`.
+
+    Raises:
+        ParseError: en-tete absent ou colonnes obligatoires manquantes.
+    """
+    debut = time.monotonic()
+    resultat = ResultatImportFEC()
+    stockage = moteur.stockage
+    lignes = _lignes_texte(Path(chemin))
+
+    entete = next(lignes, "").lstrip("﻿")
+    sep = FECParser._detecter_separateur(entete)
+    colonnes: dict[str, int] = {}
+    for i, nom in FECParser._mapper_colonnes(entete.split(sep)).items():
+        colonnes.setdefault(nom, i)
+    manquantes = [c for c in _COLONNES_REQUISES if c not in colonnes]
+    if manquantes:
+        raise ParseError(f"Colonnes FEC obligatoires manquantes : {', '.join(manquantes)}")
+    i_journal, i_num, i_date = colonnes.get("JournalCode"), colonnes["EcritureNum"], colonnes["EcritureDate"]
+    i_compte, i_debit, i_credit = colonnes["CompteNum"], colonnes["Debit"], colonnes["Credit"]
+    i_compte_lib, i_piece, i_piece_date = colonnes.get("CompteLib"), colonnes.get("PieceRef"), colonnes.get("PieceDate")
+    i_lib, i_let = colonnes.get("EcritureLib"), colonnes.get("EcrtureLet")
+    i_valid = colonnes.get("ValidDate")
+    i_aux, i_aux_lib = colonnes.get("CompAuxNum"), colonnes.get("CompAuxLib")
+    largeur = max(colonnes.values()) + 1
+
+    def champ(champs: list[str], i: Optional[int]) -> str:
+        return champs[i].strip() if i is not None else ""
+
+    lot: list[tuple[tuple, list[tuple]]] = []
+    # (journal, num) -> [champs de la premiere ligne, lignes, debit, credit, numero de ligne]
+    en_suspens: dict[tuple, list] = {}
+    courante: Optional[list] = None
+    cle_courante = None
+
+    def rejeter(cle: tuple, motif: str, groupe: list) -> None:
+        resultat.ecritures_rejetees += 1
+        if len(resultat.erreurs) < MAX_ERREURS:
+            resultat.erreurs.append({
+                "journal": cle[0], "ecriture_num": cle[1], "ligne": groupe[4], "motif": motif,
+                "debit": groupe[2] / 100, "credit": groupe[3] / 100,
+            })
+
+    def cloturer(cle: tuple, groupe: list) -> None:
+        """Ecriture complete si equilibree, sinon mise en attente de sa suite."""
+        precedent = en_suspens.pop(cle, None)
+        if precedent is not None:
+            precedent[1].extend(groupe[1])
+            precedent[2] += groupe[2]
+            precedent[3] += groupe[3]
+            groupe = precedent
+        if groupe[2] != groupe[3]:
+            en_suspens[cle] = groupe
+            return
+        champs = groupe[0]
+        date_ecr = date_iso_fec(champs[i_date])
+        if date_ecr is None:
+            rejeter(cle, "EcritureDate invalide", groupe)
+            return
+        journal = cle[0] if cle[0] in _JOURNAUX else TypeJournal.OPERATIONS_DIVERSES.value
+        piece = champ(champs, i_piece)
+        date_piece = date_iso_fec(champ(champs, i_piece_date)) or date_ecr
+        date_valid = date_iso_fec(champ(champs, i_valid)) if i_valid is not None else None
+        lot.append((
+            (str(uuid.uuid4()), journal, date_ecr, date_piece, piece or cle[1],
+             champ(champs, i_lib), int(date_valid is not None),
+             f"{date_valid}T00:00:00" if date_valid else None),
+            groupe[1],
+        ))
+        resultat.lignes_importees += len(groupe[1])
+        resultat.total_debit += groupe[2]
+        resultat.total_credit += groupe[3]
+
+    def vider_lot() -> None:
+        resultat.ecritures_importees += stockage.importer_lot(lot)
+        lot.clear()
+        resultat.duree_s = time.monotonic() - debut
+
+    for texte in lignes:
+        if not texte.strip():
+            continue
+        resultat.lignes_lues += 1
+        champs = texte.split(sep)
+        if len(champs) < largeur:
+            champs.extend([""] * (largeur - len(champs)))
+        cle = (champ(champs, i_journal), champs[i_num].strip())
+        if cle != cle_courante:
+            if courante is not None:
+                cloturer(cle_courante, courante)
+                if len(lot) >= taille_lot:
+                    vider_lot()
+                    yield resultat
+            courante = [champs, [], 0, 0, resultat.lignes_lues + 1]
+            cle_courante = cle
+        debit, credit = centimes_fec(champs[i_debit]), centimes_fec(champs[i_credit])
+        compte, compte_lib = champs[i_compte].strip(), champ(champs, i_compte_lib)
+        aux = champ(champs, i_aux)
+        if aux:
+            racine = compte.rstrip("0") or compte
+            compte = aux if aux.startswith(racine) else racine + aux
+            compte_lib = champ(champs, i_aux_lib) or compte_lib
+        courante[1].append((
+            compte, champ(champs, i_lib), debit, credit,
+            champ(champs, i_let), champ(champs, i_piece), compte_lib,
+        ))
+        courante[2] += debit
+        courante[3] += credit
+
+    if courante is not None:
+        cloturer(cle_courante, courante)
+    for cle, groupe in en_suspens.items():
+        rejeter(cle, "Ecriture desequilibree", groupe)
+    vider_lot()
+    resultat.termine = True
+    yield resultat
+
+
+def importer_fec_en_masse(
+    moteur: MoteurEcritures,
+    chemin: Path,
+    taille_lot: int = TAILLE_LOT_IMPORT,
+) -> ResultatImportFEC:
+    """Import complet sans suivi de progression (voir iter_import_fec)."""
+    resultat = ResultatImportFEC()
+    for resultat in iter_import_fec(moteur, chemin, taille_lot=taille_lot):
+        pass
+    return resultat
@@ -0,0 +1,330 @@
+"""Lettrage automatique des comptes de tiers (401 fournisseurs, 411 clients).
+
+Les lignes non lettrees d'un compte sont chargees une fois, separees par
+sens (debit / credit) et indexees en memoire par montant (centimes, table
+de hachage) et par date (liste triee). Trois passes :
+
+1. reference : lignes d'une meme piece (piece_ref) dont le solde est nul ;
+2. montant : une ligne au debit et une au credit de meme montant, la plus
+   proche en date dans la fenetre `fenetre_jours` (recherche par hachage) ;
+3. combinaison : une ligne soldee par plusieurs lignes de sens oppose
+   (reglement groupe de factures, facture payee en plusieurs fois) ;
+   somme de sous-ensemble bornee en taille (`max_combinaison`, 4 au plus)
+   et en candidats (les `max_candidats` plus proches en date), resolue par
+   rencontre au milieu sur les sommes de paires.
+
+Les codes (A..Z, AA..) continuent la sequence deja presente sur le
+compte ; ils sont attribues a l'ecriture, dans la transaction qui lit le
+dernier code (StockageEcritures.lettrer_groupes) : deux lettrages
+concurrents d'un meme compte n'utilisent jamais le meme code. Les
+lettrages sont ecrits par lots au fil du traitement et une progression
+est produite apres chaque lot : une interruption conserve le travail
+deja ecrit.
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable, Iterator, Optional
+
+from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures
+
+PREFIXES_TIERS = ("401", "411")
+FENETRE_JOURS = 90
+MAX_COMBINAISON = 4  # 2 a 4 lignes soldees par une ligne de sens oppose
+MAX_CANDIDATS = 24
+TAILLE_LOT_LETTRAGE = 1000  # groupes par transaction
+
+
+@dataclass
+class ResultatLettrage:
+    """Progression puis bilan d'un lettrage automatique."""
+    comptes_traites: int = 0
+    lignes_examinees: int = 0
+    lignes_lettrees: int = 0
+    groupes: int = 0
+    par_methode: dict[str, int] = field(
+        default_factory=lambda: {"reference": 0, "montant": 0, "combinaison": 0}
+    )
+    conflits: int = 0
+    duree_s: float = 0.0
+    termine: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "comptes_traites": self.comptes_traites,
+            "lignes_examinees": self.lignes_examinees,
+            "lignes_lettrees": self.lignes_lettrees,
+            "groupes": self.groupes,
+            "par_methode": dict(self.par_methode),
+            "conflits": self.conflits,
+            "duree_s": round(self.duree_s, 3),
+            "termine": self.termine,
+        }
+
+
+def code_lettrage(rang: int) -> str:
+    """1 -> A, 26 -> Z, 27 -> AA (numerotation bijective en base 26)."""
+    code = ""
+    while rang > 0:
+        rang, reste = divmod(rang - 1, 26)
+        code = chr(65 + reste) + code
+    return code
+
+
+def rang_lettrage(code: str) -> int:
+    """Inverse de code_lettrage ('' -> 0)."""
+    rang = 0
+    for c in code.upper():
+        rang = rang * 26 + ord(c) - 64
+    return rang
+
+
+class _Ligne:
+    __slots__ = ("num", "rang", "jour", "montant", "ref", "libre")
+
+    def __init__(self, num: int, rang: int, jour: int, montant: int, ref: str):
+        self.num, self.rang, self.jour, self.montant, self.ref = num, rang, jour, montant, ref
+        self.libre = True
+
+
+class _Sens:
+    """Lignes ouvertes d'un sens : index par montant et par date."""
+
+    def __init__(self, lignes: list[_Ligne]):
+        self.lignes = lignes  # ordre chronologique
+        self.jours = [l.jour for l in lignes]
+        self.libres = len(lignes)
+        self.par_montant: dict[int, list[_Ligne]] = {}
+        for l in lignes:
+            self.par_montant.setdefault(l.montant, []).append(l)
+
+    def prendre(self, ligne: _Ligne) -> None:
+        ligne.libre = False
+        self.libres -= 1
+        # Liste par date trop creuse : la recompacter (voisins en temps borne)
+        if self.libres * 2 < len(self.lignes) and len(self.lignes) > 64:
+            self.lignes = [l for l in self.lignes if l.libre]
+            self.jours = [l.jour for l in self.lignes]
+
+    def meme_montant(self, montant: int, jour: int, fenetre: int) -> Optional[_Ligne]:
+        """Ligne libre du montant exact la plus proche en date dans la fenetre."""
+        candidats = self.par_montant.get(montant)
+        if not candidats:
+            return None
+        i = bisect_left(candidats, jour, key=lambda l: l.jour)
+        meilleure, ecart = None, fenetre + 1
+        for j in range(i - 1, -1, -1):
+            l = candidats[j]
+            if jour - l.jour >= ecart:
+                break
+            if l.libre:
+                meilleure, ecart = j, jour - l.jour
+                break
+        for j in range(i, len(candidats)):
+            l = candidats[j]
+            if l.jour - jour >= ecart:
+                break
+            if l.libre:
+                meilleure, ecart = j, l.jour - jour
+                break
+        if meilleure is None:
+            return None
+        return candidats.pop(meilleure)
+
+    def voisins(self, jour: int, fenetre: int, limite: int, plafond: int, sens: int) -> list[_Ligne]:
+        """Au plus `limite` lignes libres de montant <= plafond, les plus proches en date.
+
+        sens < 0 : lignes datees au plus tard du jour ; sens > 0 : au plus
+        tot. Au plus 4 x `limite` lignes sont parcourues : le cout reste
+        borne sur un compte dense (des centaines de lignes par jour).
+        """
+        resultat = []
+        lignes = self.lignes
+        if sens < 0:
+            i, fin, pas = bisect_right(self.jours, jour) - 1, -1, -1
+        else:
+            i, fin, pas = bisect_left(self.jours, jour), len(lignes), 1
+        for _ in range(4 * limite):
+            if i == fin:
+                break
+            l = lignes[i]
+            if abs(l.jour - jour) > fenetre:
+                break
+            i += pas
+            if l.libre and l.montant <= plafond:
+                resultat.append(l)
+                if len(resultat) == limite:
+                    break
+        return resultat
+
+
+def _sous_ensemble(cible: int, candidats: list[_Ligne], taille_max: int) -> Optional[list[_Ligne]]:
+    """De deux a `taille_max` (<= 4) candidats dont la somme vaut exactement `cible`.
+
+    Rencontre au milieu : table de hachage des sommes de paires, puis
+    recherche du complement d'un candidat (3) ou d'une paire (4).
+    O(n^2) par recherche, quel que soit le nombre de solutions partielles.
+    """
+    n = len(candidats)
+    montants = [c.montant for c in candidats]
+    paires: dict[int, tuple[int, int]] = {}
+    for i in range(n):
+        mi = montants[i]
+        for j in range(i + 1, n):
+            somme = mi + montants[j]
+            if somme == cible:
+                return [candidats[i], candidats[j]]
+            if somme < cible:
+                paires.setdefault(somme, (i, j))
+    if taille_max >= 3:
+        for k in range(n):
+            ij = paires.get(cible - montants[k])
+            if ij is not None and k not in ij:
+                return [candidats[ij[0]], candidats[ij[1]], candidats[k]]
+    if taille_max >= 4:
+        for somme, ij in paires.items():
+            kl = paires.get(cible - somme)
+            if kl is not None and not set(ij) & set(kl):
+                return [candidats[x] for x in (*ij, *kl)]
+    return None
+
+
+def _apparier(
+    ouvertes: list[tuple],
+    fenetre: int,
+    max_combinaison: int,
+    max_candidats: int,
+    jours: dict[str, int],
+    factures_au_debit: bool = True,
+) -> Iterator[tuple[str, list[_Ligne]]]:
+    """Groupes de lignes a lettrer ensemble : (methode, lignes).
+
+    Combinaisons : un reglement solde des pieces anterieures, une piece est
+    soldee par des reglements posterieurs (factures au debit pour un
+    client, au credit pour un fournisseur).
+    """
+    debits, credits, par_ref = [], [], {}
+    for num, rang, date_ecr, debit, credit, ref in ouvertes:
+        montant = debit - credit
+        if not montant:
+            continue
+        jour = jours.get(date_ecr)
+        if jour is None:
+            jour = jours[date_ecr] = date.fromisoformat(date_ecr).toordinal()
+        ligne = _Ligne(num, rang, jour, abs(montant), ref)
+        (debits if montant > 0 else credits).append(ligne)
+        if ref:
+            par_ref.setdefault(ref, []).append((montant, ligne))
+    if not debits or not credits:
+        return
+    cote_d, cote_c = _Sens(debits), _Sens(credits)
+
+    # 1. Meme piece, solde nul
+    for groupe in par_ref.values():
+        if len(groupe) > 1 and sum(m for m, _ in groupe) == 0:
+            for m, l in groupe:
+                (cote_d if m > 0 else cote_c).prendre(l)
+            yield "reference", [l for _, l in groupe]
+
+    # 2. Montant exact (le sens le moins fourni cherche dans l'autre)
+    petit, grand = (cote_d, cote_c) if len(debits) <= len(credits) else (cote_c, cote_d)
+    for l in list(petit.lignes):
+        if not l.libre:
+            continue
+        autre = grand.meme_montant(l.montant, l.jour, fenetre)
+        if autre is not None:
+            petit.prendre(l)
+            grand.prendre(autre)
+            yield "montant", [l, autre]
+
+    # 3. Combinaisons dans la fenetre de dates
+    if max_combinaison < 2:
+        return
+    factures, reglements = (cote_d, cote_c) if factures_au_debit else (cote_c, cote_d)
+    for cote, oppose, sens in ((reglements, factures, -1), (factures, reglements, 1)):
+        for l in list(cote.lignes):
+            if not l.libre or not oppose.libres:
+                continue
+            candidats = oppose.voisins(l.jour, fenetre, max_candidats, l.montant, sens)
+            if len(candidats) < 2:
+                continue
+            choix = _sous_ensemble(l.montant, candidats, max_combinaison)
+            if choix:
+                cote.prendre(l)
+                for c in choix:
+                    oppose.prendre(c)
+                yield "combinaison", [l, *choix]
+
+
+def _ecrire_lot(
+    stockage,
+    compte: str,
+    lot: list[tuple[str, list[tuple[int, int]]]],
+    resultat: ResultatLettrage,
+    debut: float,
+) -> None:
+    """Ecrit un lot de groupes d'un compte et le comptabilise dans resultat, puis le vide."""
+    codes = stockage.lettrer_groupes(compte, [lignes for _, lignes in lot])
+    for (methode, lignes), code in zip(lot, codes, strict=True):
+        if code is None:
+            resultat.conflits += 1
+            continue
+        resultat.groupes += 1
+        resultat.lignes_lettrees += len(lignes)
+        resultat.par_methode[methode] += 1
+    resultat.duree_s = time.monotonic() - debut
+    lot.clear()
+
+
+def iter_lettrage(
+    moteur: MoteurEcritures,
+    comptes: Optional[Iterable[str]] = None,
+    prefixes: tuple[str, ...] = PREFIXES_TIERS,
+    fenetre_jours: int = FENETRE_JOURS,
+    max_combinaison: int = MAX_COMBINAISON,
+    max_candidats: int = MAX_CANDIDATS,
+    taille_lot: int = TAILLE_LOT_LETTRAGE,
+) -> Iterator[ResultatLettrage]:
+    """Lettre les comptes indiques (ou tous ceux des racines `prefixes`).
+
+    Produit la progression apres chaque lot ecrit ; le dernier element
+    produit a `termine=True`.
+    """
+    debut = time.monotonic()
+    resultat = ResultatLettrage()
+    stockage = moteur.stockage
+    if comptes is None:
+        comptes = [
+            c for p in prefixes
+            for c in stockage.comptes_mouvementes(compte_debut=p, compte_fin=p + "\uffff")
+        ]
+    jours: dict[str, int] = {}
+
+    for compte in comptes:
+        ouvertes = stockage.lignes_non_lettrees(compte)
+        resultat.comptes_traites += 1
+        resultat.lignes_examinees += len(ouvertes)
+        lot: list[tuple[str, list[tuple[int, int]]]] = []
+        for methode, lignes in _apparier(ouvertes, fenetre_jours, max_combinaison, max_candidats, jours,
+                                         factures_au_debit=not compte.startswith("40")):
+            lot.append((methode, [(l.num, l.rang) for l in lignes]))
+            if len(lot) >= taille_lot:
+                _ecrire_lot(stockage, compte, lot, resultat, debut)
+                yield resultat
+        if lot:
+            _ecrire_lot(stockage, compte, lot, resultat, debut)
+            yield resultat
+
+    resultat.duree_s = time.monotonic() - debut
+    resultat.termine = True
+    yield resultat
+
+
+def lettrer(moteur: MoteurEcritures, **options) -> ResultatLettrage:
+    """Lettrage complet sans suivi de progression (voir iter_lettrage)."""
+    # Seul le dernier etat (termine=True) est garde
+    dernier = deque(iter_lettrage(moteur, **options), maxlen=1)
+    return dernier[0] if dernier else ResultatLettrage()
@@ -4,11 +4,16 @@ Gere :
 - Le referentiel des comptes (classes 1 a 7)
 - L'affectation automatique des comptes selon le type de piece
 - Les comptes auxiliaires clients/fournisseurs
+- L'index de recherche des comptes (numeros et libelles)
 """
 
+import re
+import unicodedata
+from bisect import bisect_left, insort
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, Optional
 
 
 class ClasseCompte(str, Enum):
@@ -220,11 +225,146 @@ PCG_BASE: dict[str, str] = {
 }
 
 
+def normaliser(texte: str) -> str:
+    """Minuscules sans accents, caractere par caractere (les inclusions sont preservees)."""
+    texte = texte.lower()
+    if texte.isascii():
+        return texte
+    return "".join(c for c in unicodedata.normalize("NFKD", texte) if not unicodedata.combining(c))
+
+
+_RE_MOTS = re.compile(r"[^\W_]+")
+
+
+def _mots(texte: str) -> list[str]:
+    return _RE_MOTS.findall(normaliser(texte))
+
+
+def _suffixes(mot: str) -> Iterable[str]:
+    return (mot[i:] for i in range(len(mot)))
+
+
+class _DictComptes(dict):
+    """Dictionnaire des comptes ; `version` change a chaque modification."""
+
+    __slots__ = ("version",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def _modifie(methode):
+        def wrapper(self, *args, **kwargs):
+            self.version += 1
+            return methode(self, *args, **kwargs)
+        wrapper.__name__ = methode.__name__
+        return wrapper
+
+    __setitem__ = _modifie(dict.__setitem__)
+    __delitem__ = _modifie(dict.__delitem__)
+    pop = _modifie(dict.pop)
+    popitem = _modifie(dict.popitem)
+    setdefault = _modifie(dict.setdefault)
+    update = _modifie(dict.update)
+    clear = _modifie(dict.clear)
+    __ior__ = _modifie(dict.__ior__)
+    del _modifie
+
+
+class IndexComptes:
+    """Index de recherche d'un plan comptable.
+
+    - numeros : tableau trie des suffixes de numeros (recherche par
+      prefixe ou par sous-chaine en O(log n + resultats)) ;
+    - libelles : index inverse mot normalise -> comptes, et tableau trie
+      des suffixes du vocabulaire (un fragment de mot retrouve tous les
+      mots qui le contiennent) ;
+    - tiers : auxiliaire par (racine 401/411, libelle) et dernier numero.
+
+    Les candidats sont ensuite verifies sur le libelle courant : le
+    resultat est identique a un parcours complet.
+    """
+
+    def __init__(self, comptes: dict[str, "Compte"]):
+        self.version = getattr(comptes, "version", 0)
+        self.rang: dict[str, int] = {}
+        self.suffixes_numeros: list[tuple[str, str]] = []
+        self.suffixes_mots: list[tuple[str, str]] = []
+        self.postings: dict[str, set[str]] = {}
+        self.tiers: dict[tuple[str, str], str] = {}
+        self.dernier_auxiliaire: dict[str, int] = {}
+        for compte in comptes.values():
+            self._indexer(compte)
+        self.suffixes_numeros.sort()
+        self.suffixes_mots.sort()
+
+    def _indexer(self, compte: "Compte", trier: bool = False) -> None:
+        ajouter = insort if trier else list.append
+        self.rang[compte.numero] = len(self.rang)
+        for suffixe in _suffixes(compte.numero):
+            ajouter(self.suffixes_numeros, (suffixe, compte.numero))
+        for mot in _mots(compte.libelle):
+            comptes_mot = self.postings.get(mot)
+            if comptes_mot is None:
+                comptes_mot = self.postings[mot] = set()
+                for suffixe in _suffixes(mot):
+                    ajouter(self.suffixes_mots, (suffixe, mot))
+            comptes_mot.add(compte.numero)
+        prefixe = compte.numero[:3]
+        if compte.est_auxiliaire and prefixe in ("401", "411"):
+            self.tiers.setdefault((prefixe, compte.libelle), compte.numero)
+            if len(compte.numero) >= 6 and compte.numero[3:].isdigit():
+                self.dernier_auxiliaire[prefixe] = max(
+                    self.dernier_auxiliaire.get(prefixe, 0), int(compte.numero[3:]))
+
+    def ajouter(self, compte: "Compte") -> None:
+        """Ajout incremental d'un nouveau compte (insertion triee)."""
+        self._indexer(compte, trier=True)
+
+    @staticmethod
+    def _contenant(suffixes: list[tuple[str, str]], fragment: str) -> set[str]:
+        """Valeurs dont l'un des suffixes commence par `fragment`."""
+        trouves = set()
+        i = bisect_left(suffixes, (fragment,))
+        while i < len(suffixes) and suffixes[i][0].startswith(fragment):
+            trouves.add(suffixes[i][1])
+            i += 1
+        return trouves
+
+    def par_prefixe(self, prefixe: str) -> list[str]:
+        """Numeros commencant par `prefixe`, dans l'ordre du plan."""
+        return sorted(
+            (n for n in self._contenant(self.suffixes_numeros, prefixe) if n.startswith(prefixe)),
+            key=self.rang.__getitem__,
+        )
+
+    def candidats(self, terme: str) -> Optional[set[str]]:
+        """Sur-ensemble des comptes dont le numero ou le libelle contient `terme`.
+
+        None si le terme ne contient aucun mot (parcours complet necessaire).
+        """
+        mots = _mots(terme)
+        if not mots:
+            return None
+        resultat = self._contenant(self.suffixes_numeros, terme)
+        par_libelle = None
+        # Le mot le plus long est le plus selectif
+        for mot in sorted(set(mots), key=len, reverse=True):
+            comptes = set()
+            for mot_vocabulaire in self._contenant(self.suffixes_mots, mot):
+                comptes |= self.postings[mot_vocabulaire]
+            par_libelle = comptes if par_libelle is None else par_libelle & comptes
+            if not par_libelle:
+                break
+        return resultat | par_libelle
+
+
 class PlanComptable:
     """Gestionnaire du plan comptable."""
 
     def __init__(self):
-        self.comptes: dict[str, Compte] = {}
+        self.comptes: dict[str, Compte] = _DictComptes()
+        self._index: Optional[IndexComptes] = None
         self._charger_pcg_base()
 
     def _charger_pcg_base(self):
@@ -234,6 +374,15 @@ class PlanComptable:
                 numero=numero, libelle=libelle, classe=classe,
             )
 
+    @property
+    def index(self) -> IndexComptes:
+        """Index de recherche, reconstruit si `comptes` a ete modifie directement."""
+        if not isinstance(self.comptes, _DictComptes):
+            self.comptes = _DictComptes(self.comptes)
+        if self._index is None or self._index.version != self.comptes.version:
+            self._index = IndexComptes(self.comptes)
+        return self._index
+
     def get_compte(self, numero: str) -> Optional[Compte]:
         return self.comptes.get(numero)
 
@@ -247,7 +396,13 @@ class PlanComptable:
             numero=numero, libelle=libelle, classe=classe,
             parent=compte_collectif, est_auxiliaire=True,
         )
+        index = self.index
+        nouveau = numero not in self.comptes
         self.comptes[numero] = compte
+        if nouveau:
+            # Mise a jour incrementale : pas de reconstruction par tiers cree
+            index.ajouter(compte)
+            index.version = self.comptes.version
         return compte
 
     def get_ou_creer_compte_tiers(
@@ -255,18 +410,14 @@ class PlanComptable:
     ) -> str:
         """Retourne le numero de compte auxiliaire pour un tiers, le cree si besoin."""
         prefixe = "411" if est_client else "401"
+        index = self.index
         # Chercher un auxiliaire existant
-        for num, cpt in self.comptes.items():
-            if num.startswith(prefixe) and cpt.est_auxiliaire and cpt.libelle == nom_tiers:
-                return num
-
-        # Creer un nouveau
-        existants = [
-            int(n[3:]) for n in self.comptes
-            if n.startswith(prefixe) and len(n) == 6 and n[3:].isdigit()
-            and self.comptes[n].est_auxiliaire
-        ]
-        prochain = max(existants, default=0) + 1
+        numero = index.tiers.get((prefixe, nom_tiers))
+        if numero is not None:
+            return numero
+
+        # Creer un nouveau (au-dela de 999 : 4111000, 4111001...)
+        prochain = index.dernier_auxiliaire.get(prefixe, 0) + 1
         numero = f"{prefixe}{prochain:03d}"
         collectif = f"{prefixe}000"
         self.creer_compte_auxiliaire(numero, nom_tiers, collectif)
@@ -274,11 +425,21 @@ class PlanComptable:
 
     def rechercher(self, terme: str) -> list[Compte]:
         terme_lower = terme.lower()
+        candidats = self.index.candidats(terme_lower)
+        if candidats is None:
+            comptes = self.comptes.values()
+        else:
+            rang = self.index.rang
+            comptes = [self.comptes[n] for n in sorted(candidats, key=rang.__getitem__) if n in self.comptes]
         return [
-            c for c in self.comptes.values()
+            c for c in comptes
             if terme_lower in c.libelle.lower() or terme_lower in c.numero
         ]
 
+    def comptes_par_prefixe(self, prefixe: str) -> list[Compte]:
+        """Comptes dont le numero commence par `prefixe` (ordre du plan)."""
+        return [self.comptes[n] for n in self.index.par_prefixe(prefixe)]
+
     def get_comptes_classe(self, classe: ClasseCompte) -> list[Compte]:
         return sorted(
             [c for c in self.comptes.values() if c.classe == classe],
@@ -339,62 +500,62 @@ REGLES_AFFECTATION = {
 }
 
 
+# Mots-cles -> compte, par ordre de priorite (premiere regle satisfaite)
+# Ventes (classe 7) : testees en priorite pour les factures de vente
+# afin d'eviter une imputation erronee en classe 6
+REGLES_LIBELLE_VENTE = (
+    (("prestation", "service", "conseil", "consulting"), "706000"),
+    (("produit fini",), "701000"),
+    (("marchandise",), "707000"),
+)
+
+REGLES_LIBELLE = (
+    # Achats (classe 6)
+    (("matiere", "composant", "ingredient"), "601000"),
+    (("fourniture", "consommable"), "606000"),
+    (("eau", "electricite", "gaz", "energie"), "606100"),
+    (("entretien", "reparation", "maintenance"), "615000"),
+    (("prestation", "service", "conseil", "consulting"), "604000"),
+    (("sous-trait", "sous trait"), "611000"),
+    (("loyer", "location", "bail"), "613000"),
+    (("assurance",), "616000"),
+    (("honoraire", "comptable", "avocat", "expert"), "622000"),
+    (("publicite", "marketing", "communication"), "623000"),
+    (("transport", "livraison", "expedition"), "624000"),
+    (("deplacement", "mission", "hotel", "restaurant"), "625000"),
+    (("telephone", "internet", "telecom", "timbre", "courrier"), "626000"),
+    (("banque", "frais bancaire", "commission bancaire"), "627000"),
+    (("marchandise",), "607000"),
+    # Paie
+    (("salaire", "remuneration", "paie"), "641100"),
+    (("urssaf", "cotisation sociale", "securite sociale"), "645100"),
+    (("retraite", "agirc", "arrco"), "645300"),
+    (("mutuelle", "prevoyance"), "645200"),
+)
+
+
+def _appliquer_regles(regles: tuple, libelle: str) -> Optional[str]:
+    for mots, compte in regles:
+        for mot in mots:
+            if mot in libelle:
+                return compte
+    return None
+
+
+@lru_cache(maxsize=4096)
 def determiner_compte_charge(libelle_ligne: str, type_document: str) -> str:
-    """Determine le compte de charge/produit a partir du libelle d'une ligne."""
+    """Determine le compte de charge/produit a partir du libelle d'une ligne.
+
+    Memoisee : les descriptions de lignes se repetent d'une facture a l'autre.
+    """
     libelle = libelle_ligne.lower()
 
-    # Ventes (classe 7) - tester en priorite pour les factures de vente
-    # afin d'eviter une imputation erronee en classe 6
     if type_document in ("facture_vente", "avoir_vente"):
-        if any(m in libelle for m in ["prestation", "service", "conseil", "consulting"]):
-            return "706000"
-        if any(m in libelle for m in ["produit fini"]):
-            return "701000"
-        if any(m in libelle for m in ["marchandise"]):
-            return "707000"
-        return "707000"
-
-    # Achats (classe 6)
-    if any(m in libelle for m in ["matiere", "composant", "ingredient"]):
-        return "601000"
-    if any(m in libelle for m in ["fourniture", "consommable"]):
-        return "606000"
-    if any(m in libelle for m in ["eau", "electricite", "gaz", "energie"]):
-        return "606100"
-    if any(m in libelle for m in ["entretien", "reparation", "maintenance"]):
-        return "615000"
-    if any(m in libelle for m in ["prestation", "service", "conseil", "consulting"]):
-        return "604000"
-    if any(m in libelle for m in ["sous-trait", "sous trait"]):
-        return "611000"
-    if any(m in libelle for m in ["loyer", "location", "bail"]):
-        return "613000"
-    if any(m in libelle for m in ["assurance"]):
-        return "616000"
-    if any(m in libelle for m in ["honoraire", "comptable", "avocat", "expert"]):
-        return "622000"
-    if any(m in libelle for m in ["publicite", "marketing", "communication"]):
-        return "623000"
-    if any(m in libelle for m in ["transport", "livraison", "expedition"]):
-        return "624000"
-    if any(m in libelle for m in ["deplacement", "mission", "hotel", "restaurant"]):
-        return "625000"
-    if any(m in libelle for m in ["telephone", "internet", "telecom", "timbre", "courrier"]):
-        return "626000"
-    if any(m in libelle for m in ["banque", "frais bancaire", "commission bancaire"]):
-        return "627000"
-    if any(m in libelle for m in ["marchandise"]):
-        return "607000"
+        return _appliquer_regles(REGLES_LIBELLE_VENTE, libelle) or "707000"
 
-    # Paie
-    if any(m in libelle for m in ["salaire", "remuneration", "paie"]):
-        return "641100"
-    if any(m in libelle for m in ["urssaf", "cotisation sociale", "securite sociale"]):
-        return "645100"
-    if any(m in libelle for m in ["retraite", "agirc", "arrco"]):
-        return "645300"
-    if any(m in libelle for m in ["mutuelle", "prevoyance"]):
-        return "645200"
+    compte = _appliquer_regles(REGLES_LIBELLE, libelle)
+    if compte:
+        return compte
 
     # Defaut selon type
     regle = REGLES_AFFECTATION.get(type_document, {})
@@ -6,17 +6,29 @@ Produit :
 - Journal des ecritures
 - Compte de resultat simplifie
 - Bilan simplifie
-- Declaration de TVA (CA3)
+- Declaration de TVA (CA3 mensuelle ou trimestrielle, CA12 annuelle)
 - Recapitulatif des charges sociales
 """
 
 from datetime import date
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from urssaf_analyzer.comptabilite.ecritures import MoteurEcritures, TypeJournal
 from urssaf_analyzer.comptabilite.plan_comptable import PlanComptable, ClasseCompte
 
+# Racines des comptes de TVA declares (sous-comptes par taux inclus)
+_RACINES_TVA = ("44562", "44566", "4457")
+
+
+def _cumuler(soldes: Iterable[dict[str, int]]) -> dict[str, int]:
+    """Somme par compte de soldes mensuels."""
+    cumul: dict[str, int] = {}
+    for mois in soldes:
+        for compte, solde in mois.items():
+            cumul[compte] = cumul.get(compte, 0) + solde
+    return cumul
+
 
 class GenerateurRapports:
     """Genere les rapports comptables a partir des ecritures."""
@@ -29,50 +41,59 @@ class GenerateurRapports:
 
     def grand_livre_html(self, date_debut: date = None, date_fin: date = None) -> str:
         """Genere le grand livre en HTML."""
-        gl = self.moteur.get_grand_livre()
-        html = [self._header_html("Grand Livre")]
+        return "\n".join(self.iter_grand_livre_html(date_debut, date_fin))
 
-        total_general_debit = 0.0
-        total_general_credit = 0.0
+    def iter_grand_livre_html(self, date_debut: date = None, date_fin: date = None) -> Iterator[str]:
+        """Produit le grand livre HTML fragment par fragment (compte par compte).
 
-        for compte_num, mouvements in gl.items():
-            mouvements_filtres = self._filtrer_par_date(mouvements, date_debut, date_fin)
-            if not mouvements_filtres:
-                continue
-
-            cpt = self.plan.get_compte(compte_num)
-            libelle_cpt = cpt.libelle if cpt else compte_num
-            total_d = sum(m["debit"] for m in mouvements_filtres)
-            total_c = sum(m["credit"] for m in mouvements_filtres)
-            solde = total_d - total_c
-            total_general_debit += total_d
-            total_general_credit += total_c
-
-            html.append(f'<div class="compte-section">')
-            html.append(f'<h3>{compte_num} - {libelle_cpt}</h3>')
-            html.append('<table><thead><tr>')
-            html.append('<th>Date</th><th>Journal</th><th>Piece</th>')
-            html.append('<th>Libelle</th><th class="num">Debit</th>')
-            html.append('<th class="num">Credit</th></tr></thead><tbody>')
-
-            for m in mouvements_filtres:
-                html.append(f'<tr><td>{m["date"]}</td><td>{m["journal"]}</td>')
-                html.append(f'<td>{m["piece"]}</td><td>{m["libelle"]}</td>')
-                html.append(f'<td class="num">{m["debit"]:.2f}</td>')
-                html.append(f'<td class="num">{m["credit"]:.2f}</td></tr>')
-
-            html.append(f'<tr class="total"><td colspan="4">Total {compte_num}</td>')
-            html.append(f'<td class="num">{total_d:.2f}</td>')
-            html.append(f'<td class="num">{total_c:.2f}</td></tr>')
-            html.append(f'<tr><td colspan="4">Solde</td>')
-            html.append(f'<td class="num" colspan="2">{solde:+.2f}</td></tr>')
-            html.append('</tbody></table></div>')
+        Seuls les mouvements de l'intervalle sont lus ; le registre n'est
+        jamais charge en entier.
+        """
+        yield self._header_html("Grand Livre")
 
-        html.append(f'<div class="total-general"><h3>Total General</h3>')
-        html.append(f'<p>Debit: {total_general_debit:,.2f} EUR | '
-                     f'Credit: {total_general_credit:,.2f} EUR</p></div>')
-        html.append(self._footer_html())
-        return "\n".join(html)
+        total_general_debit = 0.0
+        total_general_credit = 0.0
+        compte_courant = None
+        total_d = total_c = 0.0
+
+        def fin_compte(compte_num, total_d, total_c):
+            yield f'<tr class="total"><td colspan="4">Total {compte_num}</td>'
+            yield f'<td class="num">{total_d:.2f}</td>'
+            yield f'<td class="num">{total_c:.2f}</td></tr>'
+            yield f'<tr><td colspan="4">Solde</td>'
+            yield f'<td class="num" colspan="2">{total_d - total_c:+.2f}</td></tr>'
+            yield '</tbody></table></div>'
+
+        for compte_num, m, _ in self.moteur.iter_grand_livre(date_debut=date_debut, date_fin=date_fin):
+            if compte_num != compte_courant:
+                if compte_courant is not None:
+                    yield from fin_compte(compte_courant, total_d, total_c)
+                compte_courant, total_d, total_c = compte_num, 0.0, 0.0
+                cpt = self.plan.get_compte(compte_num)
+                libelle_cpt = cpt.libelle if cpt else compte_num
+                yield f'<div class="compte-section">'
+                yield f'<h3>{compte_num} - {libelle_cpt}</h3>'
+                yield '<table><thead><tr>'
+                yield '<th>Date</th><th>Journal</th><th>Piece</th>'
+                yield '<th>Libelle</th><th class="num">Debit</th>'
+                yield '<th class="num">Credit</th></tr></thead><tbody>'
+
+            yield f'<tr><td>{m["date"]}</td><td>{m["journal"]}</td>'
+            yield f'<td>{m["piece"]}</td><td>{m["libelle"]}</td>'
+            yield f'<td class="num">{m["debit"]:.2f}</td>'
+            yield f'<td class="num">{m["credit"]:.2f}</td></tr>'
+            total_d += m["debit"]
+            total_c += m["credit"]
+            total_general_debit += m["debit"]
+            total_general_credit += m["credit"]
+
+        if compte_courant is not None:
+            yield from fin_compte(compte_courant, total_d, total_c)
+
+        yield f'<div class="total-general"><h3>Total General</h3>'
+        yield (f'<p>Debit: {total_general_debit:,.2f} EUR | '
+               f'Credit: {total_general_credit:,.2f} EUR</p></div>')
+        yield self._footer_html()
 
     def balance_html(self) -> str:
         """Genere la balance generale en HTML."""
@@ -139,7 +160,7 @@ class GenerateurRapports:
 
     def compte_resultat(self) -> dict:
         """Calcule le compte de resultat simplifie."""
-        balance = self.moteur.get_balance()
+        balance = self.moteur.get_balance(prefixes=("6", "7"))
         charges = {}
         produits = {}
 
@@ -223,7 +244,7 @@ class GenerateurRapports:
 
     def bilan_simplifie(self) -> dict:
         """Calcule le bilan simplifie."""
-        balance = self.moteur.get_balance()
+        balance = self.moteur.get_balance(prefixes=("1", "2", "3", "4", "5"))
 
         actif = {"immobilisations": {}, "actif_circulant": {}, "tresorerie": {}}
         passif = {"capitaux_propres": {}, "dettes": {}}
@@ -269,45 +290,75 @@ class GenerateurRapports:
         }
 
     def declaration_tva(self, mois: int, annee: int) -> dict:
-        """Genere les elements pour la declaration de TVA (CA3)."""
-        balance = self.moteur.get_balance()
-
-        tva_collectee = 0.0
-        tva_deductible_biens = 0.0
-        tva_deductible_immo = 0.0
-
-        for b in balance:
-            num = b["compte"]
-            if num == "445710":
-                tva_collectee = b["total_credit"] - b["total_debit"]
-            elif num == "445660":
-                tva_deductible_biens = b["total_debit"] - b["total_credit"]
-            elif num == "445620":
-                tva_deductible_immo = b["total_debit"] - b["total_credit"]
+        """Genere les elements pour la declaration de TVA (CA3) d'un mois."""
+        periode = f"{annee:04d}-{mois:02d}"
+        soldes = self._soldes_tva(periode, periode).get(periode, {})
+        return self._declaration_tva(f"{mois:02d}/{annee}", soldes)
+
+    def declaration_tva_trimestrielle(self, trimestre: int, annee: int) -> dict:
+        """Declaration CA3 trimestrielle (trimestre 1 a 4)."""
+        debut, fin = f"{annee:04d}-{3 * trimestre - 2:02d}", f"{annee:04d}-{3 * trimestre:02d}"
+        return self._declaration_tva(f"T{trimestre}/{annee}", _cumuler(self._soldes_tva(debut, fin).values()))
+
+    def declaration_tva_annuelle(self, annee: int) -> dict:
+        """Declaration CA12 (regime simplifie, exercice civil)."""
+        soldes = self._soldes_tva(f"{annee:04d}-01", f"{annee:04d}-12")
+        return self._declaration_tva(str(annee), _cumuler(soldes.values()))
+
+    def serie_tva(self, annee: int) -> dict:
+        """TVA d'une annee : 12 mois, 4 trimestres et cumul annuel, en une lecture."""
+        soldes = self._soldes_tva(f"{annee:04d}-01", f"{annee:04d}-12")
+        mois = [soldes.get(f"{annee:04d}-{m:02d}", {}) for m in range(1, 13)]
+        return {
+            "annee": annee,
+            "mois": [self._declaration_tva(f"{m:02d}/{annee}", mois[m - 1]) for m in range(1, 13)],
+            "trimestres": [
+                self._declaration_tva(f"T{t}/{annee}", _cumuler(mois[3 * t - 3:3 * t])) for t in range(1, 5)
+            ],
+            "annuelle": self._declaration_tva(str(annee), _cumuler(mois)),
+        }
 
+    def _soldes_tva(self, periode_debut: str, periode_fin: str) -> dict[str, dict[str, int]]:
+        """{periode AAAA-MM: {compte: debit - credit en centimes}} lus dans les soldes materialises."""
+        soldes: dict[str, dict[str, int]] = {}
+        for compte, periode, debit, credit in self.moteur.stockage.totaux_par_periode(
+            _RACINES_TVA + ("70",), periode_debut, periode_fin,
+        ):
+            soldes.setdefault(periode, {})[compte] = debit - credit
+        return soldes
+
+    def _declaration_tva(self, periode: str, soldes: dict[str, int]) -> dict:
+        def total(racine: str) -> int:
+            return sum(v for c, v in soldes.items() if c.startswith(racine))
+
+        tva_collectee = -total("4457")
+        tva_deductible_biens = total("44566")
+        tva_deductible_immo = total("44562")
         tva_deductible_total = tva_deductible_biens + tva_deductible_immo
         tva_nette = tva_collectee - tva_deductible_total
 
-        # CA par taux
-        ca_ht_20 = 0.0
-        for b in balance:
-            if b["compte"].startswith("70"):
-                ca_ht_20 += b["total_credit"] - b["total_debit"]
+        # Detail par compte : un sous-compte par taux (ex. 445711 a 20 %, 445712 a 10 %)
+        detail = []
+        for compte in sorted(c for c in soldes if c.startswith(_RACINES_TVA)):
+            cpt = self.plan.get_compte(compte)
+            montant = -soldes[compte] if compte.startswith("4457") else soldes[compte]
+            detail.append({"compte": compte, "libelle": cpt.libelle if cpt else "", "montant": montant / 100})
 
         return {
-            "periode": f"{mois:02d}/{annee}",
-            "chiffre_affaires_ht": float(ca_ht_20),
-            "tva_collectee": float(tva_collectee),
-            "tva_deductible_biens_services": float(tva_deductible_biens),
-            "tva_deductible_immobilisations": float(tva_deductible_immo),
-            "tva_deductible_totale": float(tva_deductible_total),
-            "tva_nette_a_payer": float(tva_nette) if tva_nette > 0 else 0.0,
-            "credit_tva": float(abs(tva_nette)) if tva_nette < 0 else 0.0,
+            "periode": periode,
+            "chiffre_affaires_ht": -total("70") / 100,
+            "tva_collectee": tva_collectee / 100,
+            "tva_deductible_biens_services": tva_deductible_biens / 100,
+            "tva_deductible_immobilisations": tva_deductible_immo / 100,
+            "tva_deductible_totale": tva_deductible_total / 100,
+            "tva_nette_a_payer": tva_nette / 100 if tva_nette > 0 else 0.0,
+            "credit_tva": -tva_nette / 100 if tva_nette < 0 else 0.0,
+            "detail_comptes": detail,
         }
 
     def recapitulatif_charges_sociales(self) -> dict:
         """Genere le recapitulatif des charges sociales."""
-        balance = self.moteur.get_balance()
+        balance = self.moteur.get_balance(prefixes=("641", "645", "646", "647"))
 
         charges = {
             "salaires_bruts": 0.0,
@@ -382,22 +433,6 @@ tr:hover {{ background: #f5f5f5; }}
         return f"""<p class="date-generation">Document genere par URSSAF Analyzer le {date.today().isoformat()}</p>
 </body></html>"""
 
-    @staticmethod
-    def _filtrer_par_date(
-        mouvements: list[dict], date_debut: date = None, date_fin: date = None,
-    ) -> list[dict]:
-        if not date_debut and not date_fin:
-            return mouvements
-        result = []
-        for m in mouvements:
-            d = date.fromisoformat(m["date"])
-            if date_debut and d < date_debut:
-                continue
-            if date_fin and d > date_fin:
-                continue
-            result.append(m)
-        return result
-
     def compte_resultat_html(self) -> str:
         """Genere le compte de resultat en HTML."""
         cr = self.compte_resultat()
@@ -0,0 +1,785 @@
+"""Stockage indexe des ecritures comptables (SQLite).
+
+Les ecritures et leurs lignes sont conservees dans deux tables indexees
+(id, journal, date, etat de validation ; compte pour les lignes). Les
+montants sont stockes en centimes (INTEGER) : les agregats SQL restent
+exacts et la balance ou le grand livre ne chargent jamais tout le
+registre en memoire.
+
+Les soldes par (compte, periode AAAA-MM, etat de validation) sont
+materialises dans la table `soldes` et tenus a jour par des triggers a
+chaque insertion, modification, validation ou suppression : la balance
+et les rapports de synthese lisent O(nb comptes) lignes.
+
+- chemin ":memory:" (defaut) : registre propre au processus (tests, Vercel)
+- chemin fichier (OVH) : registre partage par tous les workers Gunicorn,
+  mode WAL, connexion rouverte apres fork.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from urssaf_analyzer.comptabilite.ecritures import (  # noqa: F401 - en_centimes/en_decimal re-exportes
+    Ecriture, LigneEcriture, TypeJournal, en_centimes, en_decimal,
+)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS ecritures (
+    num INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT UNIQUE NOT NULL,
+    journal TEXT NOT NULL,
+    date_ecriture TEXT NOT NULL,
+    date_piece TEXT,
+    numero_piece TEXT DEFAULT '',
+    libelle TEXT DEFAULT '',
+    validee INTEGER DEFAULT 0,
+    date_validation TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_ecritures_journal ON ecritures(journal, num);
+CREATE INDEX IF NOT EXISTS idx_ecritures_date ON ecritures(date_ecriture);
+CREATE INDEX IF NOT EXISTS idx_ecritures_validee ON ecritures(validee, num);
+
+-- Montants en centimes
+CREATE TABLE IF NOT EXISTS lignes (
+    ecriture_num INTEGER NOT NULL REFERENCES ecritures(num) ON DELETE CASCADE,
+    rang INTEGER NOT NULL,
+    compte TEXT NOT NULL,
+    libelle TEXT DEFAULT '',
+    debit INTEGER DEFAULT 0,
+    credit INTEGER DEFAULT 0,
+    lettrage TEXT DEFAULT '',
+    piece_ref TEXT DEFAULT '',
+    date_ecriture TEXT,
+    PRIMARY KEY (ecriture_num, rang)
+) WITHOUT ROWID;
+
+-- Agregats materialises (centimes) par compte, mois et etat de validation
+CREATE TABLE IF NOT EXISTS soldes (
+    compte TEXT NOT NULL,
+    periode TEXT NOT NULL,
+    validee INTEGER NOT NULL,
+    debit INTEGER NOT NULL DEFAULT 0,
+    credit INTEGER NOT NULL DEFAULT 0,
+    nb_lignes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (compte, periode, validee)
+) WITHOUT ROWID;
+
+-- Libelle de la premiere ligne vue pour chaque compte (repli si absent du plan)
+CREATE TABLE IF NOT EXISTS libelles_comptes (
+    compte TEXT PRIMARY KEY,
+    libelle TEXT DEFAULT ''
+) WITHOUT ROWID;
+
+-- Non vide pendant une operation de masse qui met a jour les agregats
+-- elle-meme (dans sa propre transaction : invisible des autres connexions)
+CREATE TABLE IF NOT EXISTS agregats_suspendus (actif INTEGER);
+
+CREATE TRIGGER IF NOT EXISTS trg_lignes_insert AFTER INSERT ON lignes
+WHEN NOT EXISTS (SELECT 1 FROM agregats_suspendus) BEGIN
+    INSERT INTO soldes (compte, periode, validee, debit, credit, nb_lignes)
+        SELECT NEW.compte, substr(e.date_ecriture, 1, 7), e.validee, NEW.debit, NEW.credit, 1
+        FROM ecritures e WHERE e.num = NEW.ecriture_num
+        ON CONFLICT (compte, periode, validee) DO UPDATE SET
+            debit = debit + excluded.debit, credit = credit + excluded.credit,
+            nb_lignes = nb_lignes + 1;
+    INSERT OR IGNORE INTO libelles_comptes (compte, libelle) VALUES (NEW.compte, NEW.libelle);
+END;
+
+-- Suppression directe d'une ligne (la suppression en cascade est traitee
+-- par trg_ecritures_delete : l'ecriture n'est alors plus visible ici)
+CREATE TRIGGER IF NOT EXISTS trg_lignes_delete AFTER DELETE ON lignes
+WHEN NOT EXISTS (SELECT 1 FROM agregats_suspendus) BEGIN
+    UPDATE soldes SET debit = debit - OLD.debit, credit = credit - OLD.credit,
+        nb_lignes = nb_lignes - 1
+    WHERE (compte, periode, validee) IN (
+        SELECT OLD.compte, substr(e.date_ecriture, 1, 7), e.validee
+        FROM ecritures e WHERE e.num = OLD.ecriture_num
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ecritures_delete BEFORE DELETE ON ecritures
+WHEN NOT EXISTS (SELECT 1 FROM agregats_suspendus) BEGIN
+    UPDATE soldes SET
+        debit = debit - (SELECT COALESCE(SUM(l.debit), 0) FROM lignes l
+                         WHERE l.ecriture_num = OLD.num AND l.compte = soldes.compte),
+        credit = credit - (SELECT COALESCE(SUM(l.credit), 0) FROM lignes l
+                           WHERE l.ecriture_num = OLD.num AND l.compte = soldes.compte),
+        nb_lignes = nb_lignes - (SELECT COUNT(*) FROM lignes l
+                                 WHERE l.ecriture_num = OLD.num AND l.compte = soldes.compte)
+    WHERE periode = substr(OLD.date_ecriture, 1, 7) AND validee = OLD.validee
+        AND compte IN (SELECT compte FROM lignes WHERE ecriture_num = OLD.num);
+END;
+
+-- Date recopiee sur les lignes (index compte/date du grand livre)
+CREATE TRIGGER IF NOT EXISTS trg_ecritures_date AFTER UPDATE OF date_ecriture ON ecritures
+WHEN OLD.date_ecriture IS NOT NEW.date_ecriture BEGIN
+    UPDATE lignes SET date_ecriture = NEW.date_ecriture WHERE ecriture_num = NEW.num;
+END;
+
+-- Validation ou changement de date : les lignes changent de cellule d'agregat
+CREATE TRIGGER IF NOT EXISTS trg_ecritures_update AFTER UPDATE OF validee, date_ecriture ON ecritures
+WHEN (OLD.validee IS NOT NEW.validee
+       OR substr(OLD.date_ecriture, 1, 7) IS NOT substr(NEW.date_ecriture, 1, 7))
+    AND NOT EXISTS (SELECT 1 FROM agregats_suspendus)
+BEGIN
+    UPDATE soldes SET
+        debit = debit - (SELECT COALESCE(SUM(l.debit), 0) FROM lignes l
+                         WHERE l.ecriture_num = OLD.num AND l.compte = soldes.compte),
+        credit = credit - (SELECT COALESCE(SUM(l.credit), 0) FROM lignes l
+                           WHERE l.ecriture_num = OLD.num AND l.compte = soldes.compte),
+        nb_lignes = nb_lignes - (SELECT COUNT(*) FROM lignes l
+                                 WHERE l.ecriture_num = OLD.num AND l.compte = soldes.compte)
+    WHERE periode = substr(OLD.date_ecriture, 1, 7) AND validee = OLD.validee
+        AND compte IN (SELECT compte FROM lignes WHERE ecriture_num = OLD.num);
+    INSERT INTO soldes (compte, periode, validee, debit, credit, nb_lignes)
+        SELECT l.compte, substr(NEW.date_ecriture, 1, 7), NEW.validee,
+            SUM(l.debit), SUM(l.credit), COUNT(*)
+        FROM lignes l WHERE l.ecriture_num = NEW.num GROUP BY l.compte
+        ON CONFLICT (compte, periode, validee) DO UPDATE SET
+            debit = debit + excluded.debit, credit = credit + excluded.credit,
+            nb_lignes = nb_lignes + excluded.nb_lignes;
+END;
+"""
+
+# Version du schema (PRAGMA user_version) :
+# 2 = agregats materialises, 3 = index (compte, date) des lignes
+_VERSION_SCHEMA = 3
+
+_SQL_RECALCUL_SOLDES = (
+    "SELECT l.compte, substr(e.date_ecriture, 1, 7), e.validee, SUM(l.debit), SUM(l.credit), COUNT(*) "
+    "FROM lignes l JOIN ecritures e ON e.num = l.ecriture_num GROUP BY 1, 2, 3"
+)
+
+_SQL_DERNIER_LETTRAGE = (
+    "SELECT lettrage FROM lignes WHERE compte = ? AND lettrage != '' "
+    "ORDER BY length(lettrage) DESC, lettrage DESC LIMIT 1"
+)
+
+_TAILLE_LOT = 500
+_MAX_PARAMETRES = 900  # sous la limite SQLite historique (999 variables)
+
+_COLONNES_ECRITURE = (
+    "num, id, journal, date_ecriture, date_piece, numero_piece, libelle, validee, date_validation"
+)
+
+
+def encoder_curseur(compte: str, date_ecriture: str, num: int, rang: int) -> str:
+    """Curseur opaque de pagination du grand livre."""
+    brut = json.dumps([compte, date_ecriture, num, rang], separators=(",", ":"))
+    return base64.urlsafe_b64encode(brut.encode()).decode().rstrip("=")
+
+
+def decoder_curseur(curseur: str) -> tuple:
+    try:
+        compte, date_ecriture, num, rang = json.loads(
+            base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4))
+        )
+        return str(compte), str(date_ecriture), int(num), int(rang)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Curseur de pagination invalide") from e
+
+
+class StockageEcritures:
+    """Registre des ecritures sur SQLite (en memoire ou fichier partage)."""
+
+    def __init__(self, chemin: Path | str = ":memory:"):
+        self.chemin = str(chemin)
+        self.en_memoire = self.chemin == ":memory:"
+        if not self.en_memoire:
+            Path(self.chemin).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+
+    # --- Connexion ---
+
+    def _connexion(self) -> sqlite3.Connection:
+        # Un registre en memoire n'a de sens que dans son processus ;
+        # un registre fichier est rouvert dans chaque worker apres fork.
+        if self._conn is None or (not self.en_memoire and self._pid != os.getpid()):
+            conn = sqlite3.connect(self.chemin, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            if not self.en_memoire:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA_SQL)
+            self._conn, self._pid = conn, os.getpid()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < _VERSION_SCHEMA:
+                self._migrer(conn, version)
+        return self._conn
+
+    def _migrer(self, conn: sqlite3.Connection, version: int) -> None:
+        with self._lock:
+            colonnes = {r[1] for r in conn.execute("PRAGMA table_info(lignes)")}
+            with conn:
+                if "date_ecriture" not in colonnes:
+                    conn.execute("ALTER TABLE lignes ADD COLUMN date_ecriture TEXT")
+                if version < 3:
+                    conn.execute(
+                        "UPDATE lignes SET date_ecriture = (SELECT e.date_ecriture FROM ecritures e "
+                        "WHERE e.num = lignes.ecriture_num)"
+                    )
+                conn.execute("DROP INDEX IF EXISTS idx_lignes_compte")
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_lignes_compte_date "
+                    "ON lignes(compte, date_ecriture, ecriture_num, rang)"
+                )
+            if version < 2:
+                # Registre anterieur aux agregats : les calculer une fois
+                self.reconstruire_agregats()
+            conn.execute(f"PRAGMA user_version = {_VERSION_SCHEMA}")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            conn = self._connexion()
+            with conn:
+                yield conn
+
+    def _lire(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._connexion().execute(sql, params).fetchall()
+
+    # --- Ecriture ---
+
+    def ajouter(self, ecriture: Ecriture) -> None:
+        self.ajouter_lot([ecriture])
+
+    def ajouter_lot(self, ecritures: Iterable[Ecriture]) -> int:
+        """Insere des ecritures en une transaction. Retourne le nombre insere."""
+        n = 0
+        with self._transaction() as conn:
+            for e in ecritures:
+                cur = conn.execute(
+                    "INSERT INTO ecritures (id, journal, date_ecriture, date_piece, numero_piece, "
+                    "libelle, validee, date_validation) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    _valeurs_ecriture(e),
+                )
+                self._inserer_lignes(conn, cur.lastrowid, e)
+                n += 1
+        return n
+
+    def importer_lot(self, ecritures: list[tuple[tuple, list[tuple]]]) -> int:
+        """Insertion de masse d'ecritures deja controlees (import FEC).
+
+        Chaque ecriture est un couple (en-tete, lignes) :
+        - en-tete : (id, journal, date_ecriture, date_piece, numero_piece,
+          libelle, validee, date_validation), dates ISO ;
+        - lignes : (compte, libelle, debit, credit, lettrage, piece_ref,
+          libelle du compte), montants en centimes.
+        Deux executemany par lot, triggers suspendus : les soldes sont mis a
+        jour une fois par (compte, periode) a partir des totaux du lot.
+        """
+        if not ecritures:
+            return 0
+        deltas: dict[tuple, list[int]] = {}
+        libelles: dict[str, str] = {}
+        with self._transaction() as conn, _agregats_suspendus(conn):
+            conn.executemany(
+                "INSERT INTO ecritures (id, journal, date_ecriture, date_piece, numero_piece, "
+                "libelle, validee, date_validation) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [entete for entete, _ in ecritures],
+            )
+            # Verrou d'ecriture tenu depuis le premier INSERT : numeros consecutifs
+            premier = conn.execute("SELECT last_insert_rowid()").fetchone()[0] - len(ecritures) + 1
+            rows = []
+            for num, (entete, lignes) in enumerate(ecritures, premier):
+                date_ecr, validee = entete[2], entete[6]
+                periode = date_ecr[:7]
+                for rang, (compte, libelle, debit, credit, lettrage, piece_ref, libelle_compte) in enumerate(lignes):
+                    rows.append((num, rang, compte, libelle, debit, credit, lettrage, piece_ref, date_ecr))
+                    cumul = deltas.setdefault((compte, periode, validee), [0, 0, 0])
+                    cumul[0] += debit
+                    cumul[1] += credit
+                    cumul[2] += 1
+                    libelles.setdefault(compte, libelle_compte or libelle)
+            conn.executemany(
+                "INSERT INTO lignes (ecriture_num, rang, compte, libelle, debit, credit, lettrage, piece_ref, "
+                "date_ecriture) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            _appliquer_deltas(conn, [(*cle, *cumul) for cle, cumul in deltas.items()])
+            conn.executemany("INSERT OR IGNORE INTO libelles_comptes (compte, libelle) VALUES (?, ?)",
+                             list(libelles.items()))
+        return len(ecritures)
+
+    def mettre_a_jour(self, ecriture: Ecriture) -> bool:
+        """Reecrit l'en-tete et les lignes d'une ecriture existante."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT num FROM ecritures WHERE id = ?", (ecriture.id,)).fetchone()
+            if row is None:
+                return False
+            conn.execute(
+                "UPDATE ecritures SET journal = ?, date_ecriture = ?, date_piece = ?, numero_piece = ?, "
+                "libelle = ?, validee = ?, date_validation = ? WHERE num = ?",
+                (*_valeurs_ecriture(ecriture)[1:], row[0]),
+            )
+            conn.execute("DELETE FROM lignes WHERE ecriture_num = ?", (row[0],))
+            self._inserer_lignes(conn, row[0], ecriture)
+        return True
+
+    @staticmethod
+    def _inserer_lignes(conn: sqlite3.Connection, num: int, ecriture: Ecriture) -> None:
+        date_ecr = ecriture.date_ecriture.isoformat()
+        conn.executemany(
+            "INSERT INTO lignes (ecriture_num, rang, compte, libelle, debit, credit, lettrage, piece_ref, "
+            "date_ecriture) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (num, rang, l.compte, l.libelle, l.debit_centimes, l.credit_centimes,
+                 l.lettrage, l.piece_ref, date_ecr)
+                for rang, l in enumerate(ecriture.lignes)
+            ],
+        )
+
+    def supprimer(self, ecriture_id: str) -> Optional[Ecriture]:
+        """Supprime une ecriture et la retourne (None si absente)."""
+        with self._transaction() as conn:
+            ecriture = self.obtenir(ecriture_id)
+            if ecriture is not None:
+                conn.execute("DELETE FROM ecritures WHERE id = ?", (ecriture_id,))
+        return ecriture
+
+    def supprimer_non_validees(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM ecritures WHERE validee = 0").rowcount
+
+    def valider(self, nums: list[int], quand: datetime) -> None:
+        """Valide des ecritures en masse ; les agregats sont deplaces en une requete."""
+        with self._transaction() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS _a_valider (num INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM _a_valider")
+            conn.executemany("INSERT OR IGNORE INTO _a_valider (num) SELECT num FROM ecritures "
+                             "WHERE num = ? AND validee = 0", [(n,) for n in nums])
+            with _agregats_suspendus(conn):
+                deltas = conn.execute(
+                    "SELECT l.compte, substr(e.date_ecriture, 1, 7), SUM(l.debit), SUM(l.credit), COUNT(*) "
+                    "FROM _a_valider v JOIN ecritures e ON e.num = v.num "
+                    "JOIN lignes l ON l.ecriture_num = v.num GROUP BY 1, 2"
+                ).fetchall()
+                _appliquer_deltas(conn, [(c, p, 0, -d, -cr, -n) for c, p, d, cr, n in deltas])
+                _appliquer_deltas(conn, [(c, p, 1, d, cr, n) for c, p, d, cr, n in deltas])
+                conn.execute(
+                    "UPDATE ecritures SET validee = 1, date_validation = ? "
+                    "WHERE num IN (SELECT num FROM _a_valider)",
+                    (quand.isoformat(),),
+                )
+            conn.execute("DELETE FROM _a_valider")
+
+    # --- Lettrage ---
+
+    def lignes_non_lettrees(self, compte: str) -> list[tuple]:
+        """(num, rang, date_ecriture, debit, credit, piece_ref) des lignes ouvertes d'un compte.
+
+        Lues par l'index (compte, date) : ordre chronologique puis de saisie.
+        """
+        return self._lire(
+            "SELECT ecriture_num, rang, date_ecriture, debit, credit, piece_ref FROM lignes "
+            "WHERE compte = ? AND lettrage = '' ORDER BY date_ecriture, ecriture_num, rang",
+            (compte,),
+        )
+
+    def dernier_lettrage(self, compte: str) -> str:
+        """Plus grand code de lettrage du compte (A < Z < AA), '' si aucun."""
+        rows = self._lire(_SQL_DERNIER_LETTRAGE, (compte,))
+        return rows[0][0] if rows else ""
+
+    def appliquer_lettrage(self, groupes: list[tuple[str, list[tuple[int, int]]]]) -> list[str]:
+        """Ecrit des lettrages (code, [(num, rang), ...]) en une transaction.
+
+        Une ligne deja lettree n'est jamais reecrite : un groupe dont une
+        ligne a ete lettree entre-temps (autre worker) est ignore en entier.
+        Retourne les codes effectivement ecrits.
+        """
+        with self._transaction() as conn:
+            return [code for code, lignes in groupes if self._lettrer_groupe(conn, code, lignes)]
+
+    def lettrer_groupes(self, compte: str, groupes: list[list[tuple[int, int]]]) -> list[Optional[str]]:
+        """Attribue et ecrit les codes suivants du compte, groupe par groupe.
+
+        Le dernier code est lu et les nouveaux ecrits dans une meme
+        transaction BEGIN IMMEDIATE : deux lettrages concurrents du compte
+        (threads ou workers) n'attribuent jamais le meme code. Retourne le
+        code de chaque groupe, None pour un groupe en conflit (code non
+        consomme).
+        """
+        from urssaf_analyzer.comptabilite.lettrage import code_lettrage, rang_lettrage
+        with self._transaction() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            dernier = conn.execute(_SQL_DERNIER_LETTRAGE, (compte,)).fetchone()
+            rang = rang_lettrage(dernier[0] if dernier else "")
+            codes = []
+            for lignes in groupes:
+                code = code_lettrage(rang + 1)
+                if self._lettrer_groupe(conn, code, lignes):
+                    rang += 1
+                    codes.append(code)
+                else:
+                    codes.append(None)
+            return codes
+
+    @staticmethod
+    def _lettrer_groupe(conn: sqlite3.Connection, code: str, lignes: list[tuple[int, int]]) -> bool:
+        """Lettre toutes les lignes du groupe ou aucune ; seules les lignes ecrites ici sont annulees."""
+        ecrites = []
+        for num, rang in lignes:
+            if conn.execute(
+                "UPDATE lignes SET lettrage = ? WHERE ecriture_num = ? AND rang = ? AND lettrage = ''",
+                (code, num, rang),
+            ).rowcount:
+                ecrites.append((num, rang))
+        if len(ecrites) == len(lignes):
+            return True
+        conn.executemany("UPDATE lignes SET lettrage = '' WHERE ecriture_num = ? AND rang = ?", ecrites)
+        return False
+
+    def supprimer_lettrage(self, compte: str, codes: Optional[Iterable[str]] = None) -> int:
+        """Delettre un compte (tous les codes ou ceux indiques). Retourne le nombre de lignes."""
+        with self._transaction() as conn:
+            if codes is None:
+                return conn.execute(
+                    "UPDATE lignes SET lettrage = '' WHERE compte = ? AND lettrage != ''", (compte,)
+                ).rowcount
+            return conn.executemany(
+                "UPDATE lignes SET lettrage = '' WHERE compte = ? AND lettrage = ?",
+                [(compte, c) for c in codes],
+            ).rowcount
+
+    # --- Lecture ---
+
+    def obtenir(self, ecriture_id: str) -> Optional[Ecriture]:
+        rows = self._lire(f"SELECT {_COLONNES_ECRITURE} FROM ecritures WHERE id = ?", (ecriture_id,))
+        return self._materialiser(rows)[0] if rows else None
+
+    def a_la_position(self, index: int) -> Ecriture:
+        """Ecriture par position d'insertion (index negatif accepte)."""
+        total = self.compter()
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("index d'ecriture hors limites")
+        rows = self._lire(
+            f"SELECT {_COLONNES_ECRITURE} FROM ecritures ORDER BY num LIMIT 1 OFFSET ?", (index,)
+        )
+        return self._materialiser(rows)[0]
+
+    def compter(self, validee: Optional[bool] = None) -> int:
+        if validee is None:
+            return self._lire("SELECT COUNT(*) FROM ecritures")[0][0]
+        return self._lire("SELECT COUNT(*) FROM ecritures WHERE validee = ?", (int(validee),))[0][0]
+
+    def libelles(self) -> set[str]:
+        """Libelles des ecritures (dedoublonnage des imports, sans charger les lignes)."""
+        return {r[0] for r in self._lire("SELECT libelle FROM ecritures")}
+
+    def iterer(
+        self,
+        validees_seulement: bool = False,
+        journal: Optional[TypeJournal] = None,
+        taille_lot: int = _TAILLE_LOT,
+    ) -> Iterator[Ecriture]:
+        """Parcourt les ecritures dans l'ordre d'insertion, par lots (pagination par cle)."""
+        filtres, params = ["num > ?"], []
+        if validees_seulement:
+            filtres.append("validee = 1")
+        if journal is not None:
+            filtres.append("journal = ?")
+            params.append(TypeJournal(journal).value)
+        sql = (f"SELECT {_COLONNES_ECRITURE} FROM ecritures WHERE {' AND '.join(filtres)} "
+               f"ORDER BY num LIMIT ?")
+        dernier = 0
+        while True:
+            rows = self._lire(sql, (dernier, *params, taille_lot))
+            if not rows:
+                return
+            yield from self._materialiser(rows)
+            dernier = rows[-1][0]
+
+    def _materialiser(self, rows: list[tuple]) -> list[Ecriture]:
+        nums = [r[0] for r in rows]
+        lignes: dict[int, list[LigneEcriture]] = {n: [] for n in nums}
+        colonnes = "SELECT ecriture_num, compte, libelle, debit, credit, lettrage, piece_ref FROM lignes "
+        if nums[-1] - nums[0] + 1 == len(nums):
+            # Lot contigu (lecture non filtree) : parcours de plage sur la cle primaire
+            requetes = [(colonnes + "WHERE ecriture_num BETWEEN ? AND ? ORDER BY ecriture_num, rang",
+                         (nums[0], nums[-1]))]
+        else:
+            # Lot filtre (journal, validation) : seules les lignes des ecritures du lot
+            requetes = [
+                (colonnes + f"WHERE ecriture_num IN ({','.join('?' * len(morceau))}) ORDER BY ecriture_num, rang",
+                 morceau)
+                for morceau in (nums[i:i + _MAX_PARAMETRES] for i in range(0, len(nums), _MAX_PARAMETRES))
+            ]
+        for sql, params in requetes:
+            for n, compte, libelle, debit, credit, lettrage, piece_ref in self._lire(sql, params):
+                lignes[n].append(LigneEcriture.depuis_centimes(
+                    compte, libelle, debit, credit, lettrage, piece_ref,
+                ))
+        return [
+            Ecriture(
+                id=r[1], journal=TypeJournal(r[2]),
+                date_ecriture=date.fromisoformat(r[3]),
+                date_piece=date.fromisoformat(r[4]) if r[4] else None,
+                numero_piece=r[5], libelle=r[6], lignes=lignes[r[0]],
+                validee=bool(r[7]),
+                date_validation=datetime.fromisoformat(r[8]) if r[8] else None,
+            )
+            for r in rows
+        ]
+
+    def lignes_detaillees(
+        self,
+        validees_seulement: bool = False,
+        taille_lot: int = _TAILLE_LOT * 2,
+    ) -> Iterator[tuple]:
+        """Lignes jointes a leur ecriture, dans l'ordre de saisie (export FEC).
+
+        Lecture par lots de `taille_lot` ecritures paginee sur num : memoire
+        constante, et le verrou n'est pas conserve entre deux lots.
+        Tuples : (num, journal, date_ecriture, date_piece, numero_piece,
+        date_validation, compte, libelle, debit, credit, lettrage, piece_ref) ;
+        une ecriture sans ligne donne un tuple unique a compte None.
+        """
+        filtre = " AND validee = 1" if validees_seulement else ""
+        sql = (
+            "SELECT e.num, e.journal, e.date_ecriture, e.date_piece, e.numero_piece, e.date_validation, "
+            "l.compte, l.libelle, l.debit, l.credit, l.lettrage, l.piece_ref "
+            "FROM (SELECT num, journal, date_ecriture, date_piece, numero_piece, date_validation "
+            f"FROM ecritures WHERE num > ?{filtre} ORDER BY num LIMIT ?) e "
+            "LEFT JOIN lignes l ON l.ecriture_num = e.num ORDER BY e.num, l.rang"
+        )
+        dernier = 0
+        while True:
+            rows = self._lire(sql, (dernier, taille_lot))
+            if not rows:
+                return
+            yield from rows
+            dernier = rows[-1][0]
+
+    # --- Agregats ---
+
+    def controle_non_validees(self) -> list[tuple]:
+        """(num, id, libelle, debit, credit, nb_lignes) des ecritures non validees."""
+        return self._lire(
+            "SELECT e.num, e.id, e.libelle, COALESCE(SUM(l.debit), 0), COALESCE(SUM(l.credit), 0), "
+            "COUNT(l.rang) FROM ecritures e LEFT JOIN lignes l ON l.ecriture_num = e.num "
+            "WHERE e.validee = 0 GROUP BY e.num ORDER BY e.num"
+        )
+
+    def totaux_par_compte(
+        self,
+        validees_seulement: bool = False,
+        periode_debut: Optional[str] = None,
+        periode_fin: Optional[str] = None,
+        prefixes: Optional[tuple[str, ...]] = None,
+    ) -> list[tuple]:
+        """(compte, debit, credit, libelle de repli) par compte, tries.
+
+        Lu dans les agregats materialises : O(nb comptes x nb periodes).
+        Periodes au format AAAA-MM (bornes incluses).
+        """
+        filtres, params = ["s.nb_lignes > 0"], []
+        if validees_seulement:
+            filtres.append("s.validee = 1")
+        if periode_debut:
+            filtres.append("s.periode >= ?")
+            params.append(periode_debut)
+        if periode_fin:
+            filtres.append("s.periode <= ?")
+            params.append(periode_fin)
+        if prefixes:
+            # Bornes de plage (compte >= prefixe AND compte < prefixe + U+FFFF) : index utilisable
+            filtres.append("(" + " OR ".join("(s.compte >= ? AND s.compte < ?)" for _ in prefixes) + ")")
+            for p in prefixes:
+                params.extend((p, p + "\uffff"))
+        return self._lire(
+            "SELECT s.compte, SUM(s.debit), SUM(s.credit), COALESCE(lc.libelle, '') "
+            "FROM soldes s LEFT JOIN libelles_comptes lc ON lc.compte = s.compte "
+            f"WHERE {' AND '.join(filtres)} GROUP BY s.compte ORDER BY s.compte",
+            tuple(params),
+        )
+
+    def totaux_par_periode(
+        self,
+        prefixes: tuple[str, ...],
+        periode_debut: str,
+        periode_fin: str,
+        validees_seulement: bool = False,
+    ) -> list[tuple]:
+        """(compte, periode, debit, credit) des comptes des racines `prefixes`, mois par mois.
+
+        Une recherche de plage par racine dans la cle (compte, periode) des
+        soldes materialises : une annee de TVA se lit en une requete.
+        """
+        filtres, params = [], []
+        for p in prefixes:
+            filtres.append("(compte >= ? AND compte < ? AND periode BETWEEN ? AND ?)")
+            params.extend((p, p + "\uffff", periode_debut, periode_fin))
+        validee = " AND validee = 1" if validees_seulement else ""
+        return self._lire(
+            "SELECT compte, periode, SUM(debit), SUM(credit) FROM soldes "
+            f"WHERE ({' OR '.join(filtres)}) AND nb_lignes > 0{validee} "
+            "GROUP BY compte, periode ORDER BY compte, periode",
+            tuple(params),
+        )
+
+    def verifier_agregats(self) -> list[dict]:
+        """Compare les agregats materialises a un recalcul complet. Retourne les ecarts."""
+        attendu = {r[:3]: r[3:] for r in self._lire(_SQL_RECALCUL_SOLDES)}
+        stocke = {
+            r[:3]: r[3:]
+            for r in self._lire(
+                "SELECT compte, periode, validee, debit, credit, nb_lignes FROM soldes WHERE nb_lignes != 0 "
+                "OR debit != 0 OR credit != 0"
+            )
+        }
+        ecarts = []
+        for cle in sorted(set(attendu) | set(stocke)):
+            if attendu.get(cle) != stocke.get(cle):
+                ecarts.append({
+                    "compte": cle[0], "periode": cle[1], "validee": bool(cle[2]),
+                    "attendu": attendu.get(cle, (0, 0, 0)), "stocke": stocke.get(cle, (0, 0, 0)),
+                })
+        return ecarts
+
+    def reconstruire_agregats(self) -> int:
+        """Recalcule entierement soldes et libelles de repli. Retourne le nombre de cellules."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM soldes")
+            conn.execute(
+                "INSERT INTO soldes (compte, periode, validee, debit, credit, nb_lignes) "
+                + _SQL_RECALCUL_SOLDES
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO libelles_comptes (compte, libelle) "
+                "SELECT compte, libelle FROM lignes ORDER BY ecriture_num, rang"
+            )
+            return conn.execute("SELECT COUNT(*) FROM soldes").fetchone()[0]
+
+    def comptes_mouvementes(
+        self,
+        periode_debut: Optional[str] = None,
+        periode_fin: Optional[str] = None,
+        compte_debut: Optional[str] = None,
+        compte_fin: Optional[str] = None,
+    ) -> list[str]:
+        """Comptes ayant des lignes sur la periode (lu dans les agregats)."""
+        filtres, params = ["nb_lignes > 0"], []
+        for clause, valeur in (("periode >= ?", periode_debut), ("periode <= ?", periode_fin),
+                               ("compte >= ?", compte_debut), ("compte <= ?", compte_fin)):
+            if valeur:
+                filtres.append(clause)
+                params.append(valeur)
+        return [r[0] for r in self._lire(
+            f"SELECT DISTINCT compte FROM soldes WHERE {' AND '.join(filtres)} ORDER BY compte",
+            tuple(params),
+        )]
+
+    def mouvements(
+        self,
+        validees_seulement: bool = False,
+        date_debut: Optional[str] = None,
+        date_fin: Optional[str] = None,
+        compte_debut: Optional[str] = None,
+        compte_fin: Optional[str] = None,
+        apres: Optional[tuple] = None,
+    ) -> Iterator[tuple]:
+        """Lignes du grand livre triees par compte, date puis ordre de saisie.
+
+        Chaque compte est lu par recherche dans l'index (compte, date) a
+        partir de `date_debut` : seules les lignes de l'intervalle sont
+        parcourues. `apres` = (compte, date, num, rang) reprend la lecture
+        apres une ligne donnee (pagination).
+        Tuples : (compte, date, journal, piece, libelle, debit, credit, num, rang).
+        """
+        filtre = " AND e.validee = 1" if validees_seulement else ""
+        if date_fin:
+            filtre += " AND l.date_ecriture <= ?"
+        sql = (
+            "SELECT l.compte, l.date_ecriture, e.journal, e.numero_piece, l.libelle, l.debit, l.credit, "
+            "l.ecriture_num, l.rang FROM lignes l JOIN ecritures e ON e.num = l.ecriture_num "
+            f"WHERE l.compte = ? AND (l.date_ecriture, l.ecriture_num, l.rang) > (?, ?, ?){filtre} "
+            "ORDER BY l.date_ecriture, l.ecriture_num, l.rang LIMIT ?"
+        )
+        comptes = self.comptes_mouvementes(
+            date_debut[:7] if date_debut else None, date_fin[:7] if date_fin else None,
+            max(filter(None, (compte_debut, apres[0] if apres else None)), default=None), compte_fin,
+        )
+        for compte in comptes:
+            if apres and compte == apres[0]:
+                cle = tuple(apres[1:])
+            else:
+                cle = (date_debut or "", -1, -1)
+            while True:
+                params = (compte, *cle) + ((date_fin,) if date_fin else ()) + (_TAILLE_LOT * 4,)
+                rows = self._lire(sql, params)
+                yield from rows
+                if len(rows) < _TAILLE_LOT * 4:
+                    break
+                cle = rows[-1][1], rows[-1][7], rows[-1][8]
+
+
+@contextmanager
+def _agregats_suspendus(conn: sqlite3.Connection):
+    """Desactive les triggers d'agregats le temps d'une operation de masse."""
+    conn.execute("INSERT INTO agregats_suspendus (actif) VALUES (1)")
+    try:
+        yield
+    finally:
+        conn.execute("DELETE FROM agregats_suspendus")
+
+
+def _appliquer_deltas(conn: sqlite3.Connection, deltas: list[tuple]) -> None:
+    """Ajoute des (compte, periode, validee, debit, credit, nb_lignes) aux soldes."""
+    conn.executemany(
+        "INSERT INTO soldes (compte, periode, validee, debit, credit, nb_lignes) "
+        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (compte, periode, validee) DO UPDATE SET "
+        "debit = debit + excluded.debit, credit = credit + excluded.credit, "
+        "nb_lignes = nb_lignes + excluded.nb_lignes",
+        deltas,
+    )
+
+
+class VueEcritures:
+    """Vue sequence sur le registre (compatibilite avec l'ancienne liste `ecritures`)."""
+
+    def __init__(self, stockage: StockageEcritures):
+        self._stockage = stockage
+
+    def __iter__(self) -> Iterator[Ecriture]:
+        return self._stockage.iterer()
+
+    def __len__(self) -> int:
+        return self._stockage.compter()
+
+    def __bool__(self) -> bool:
+        return bool(self._stockage._lire("SELECT 1 FROM ecritures LIMIT 1"))
+
+    def __getitem__(self, index: int) -> Ecriture:
+        return self._stockage.a_la_position(index)
+
+    def append(self, ecriture: Ecriture) -> None:
+        self._stockage.ajouter(ecriture)
+
+    def extend(self, ecritures: Iterable[Ecriture]) -> None:
+        self._stockage.ajouter_lot(ecritures)
+
+
+def _valeurs_ecriture(e: Ecriture) -> tuple:
+    return (
+        e.id,
+        TypeJournal(e.journal).value,
+        e.date_ecriture.isoformat(),
+        e.date_piece.isoformat() if e.date_piece else None,
+        e.numero_piece or "",
+        e.libelle or "",
+        int(bool(e.validee)),
+        e.date_validation.isoformat() if e.date_validation else None,
+    )
@@ -14,6 +14,10 @@ class SecurityConfig:
     salt_length: int = 32
     iv_length: int = 16
     secure_delete_passes: int = 3
+    # Journal d'audit bufferise : taille de lot, delai max (s), politique fsync
+    audit_flush_batch: int = 256
+    audit_flush_interval: float = 1.0
+    audit_fsync: str = "par_lot"
 
 
 @dataclass
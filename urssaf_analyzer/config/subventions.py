@@ -0,0 +1,1402 @@
+"""Catalogue des subventions et aides aux entreprises.
+
+Ref: Bpifrance, economie.gouv.fr, Regions, Commission europeenne
+Mise a jour: 2026
+
+Chaque aide du CATALOGUE porte :
+- ses informations descriptives (organisme, niveau, montant max, conditions...)
+- `montant_estime` : valeur fixe, None, ou fonction du profil de l'entreprise
+- `criteres` : conditions d'eligibilite (un Critere, ou une liste de
+  Critere alternatifs : l'aide est eligible si l'un d'eux est rempli)
+
+Les criteres sont compiles une fois, a l'import, en index par lettre NAF,
+tranche d'effectif, region, zone et theme (masques de bits) : une recherche
+intersecte les ensembles de candidats et n'evalue le montant estime que
+pour les aides retenues.
+"""
+
+import bisect
+import dataclasses
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+
+SEUIL_TPE = 10
+SEUIL_PME = 250
+SEUIL_ETI = 5000
+
+# Sections NAF rev. 2 : derniere division (2 premiers chiffres) de chaque section
+_DIVISIONS_SECTIONS = (3, 9, 33, 35, 39, 43, 47, 53, 56, 63, 66, 68, 75, 82, 84, 85, 88, 93, 96, 98, 99)
+_SECTIONS_NAF = "ABCDEFGHIJKLMNOPQRSTU"
+
+THEMES = (
+    "innovation", "environnement", "numerique", "export_intl",
+    "formation", "creation_reprise", "investissement", "ess",
+)
+
+
+@dataclass(frozen=True)
+class ProfilEntreprise:
+    """Profil d'entreprise soumis a la recherche (memes champs que l'API)."""
+
+    code_naf: str = ""
+    effectif: int = 10
+    forme_juridique: str = ""
+    region: str = ""
+    zone: str = ""
+    ca: float = 0
+    age_entreprise: int = 5
+    masse_salariale: float = 0
+    innovation: bool = False
+    environnement: bool = False
+    numerique: bool = False
+    export_intl: bool = False
+    formation: bool = False
+    creation_reprise: bool = False
+    investissement: bool = False
+    ess: bool = False
+
+    @property
+    def lettre_naf(self) -> str:
+        """Section NAF : "J" pour "J", "6201Z" ou "62.01Z"."""
+        code = self.code_naf.strip()
+        if not code or not code[0].isdigit():
+            return code[0].upper() if code else ""
+        if len(code) < 2 or not code[1].isdigit():
+            return ""
+        i = bisect.bisect_left(_DIVISIONS_SECTIONS, int(code[:2]))
+        return _SECTIONS_NAF[i] if i < len(_SECTIONS_NAF) else ""
+
+    @property
+    def themes(self) -> frozenset[str]:
+        return frozenset(t for t in THEMES if getattr(self, t))
+
+    @classmethod
+    def depuis_dict(cls, donnees: dict) -> "ProfilEntreprise":
+        """Construit un profil depuis un objet JSON (champs inconnus ignores).
+
+        Leve ValueError si une valeur n'a pas le type attendu.
+        """
+        valeurs = {}
+        for champ in dataclasses.fields(cls):
+            if champ.name not in donnees or donnees[champ.name] is None:
+                continue
+            valeur = donnees[champ.name]
+            try:
+                if champ.type is bool:
+                    if isinstance(valeur, str):
+                        valeur = valeur.strip().lower() in ("true", "1", "oui")
+                    valeur = bool(valeur)
+                elif champ.type is int:
+                    valeur = int(valeur)
+                elif champ.type is float:
+                    valeur = float(valeur)
+                else:
+                    valeur = str(valeur)
+            except (TypeError, ValueError):
+                raise ValueError(f"{champ.name} : valeur invalide ({valeur!r})")
+            valeurs[champ.name] = valeur
+        return cls(**valeurs)
+
+
+@dataclass(frozen=True)
+class Critere:
+    """Conjonction de conditions d'eligibilite (champ vide = sans condition).
+
+    Effectif : effectif_min inclus, effectif_max exclu ; age : bornes incluses.
+    """
+
+    themes: tuple[str, ...] = ()
+    naf: tuple[str, ...] = ()
+    effectif_min: Optional[int] = None
+    effectif_max: Optional[int] = None
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+    regions: tuple[str, ...] = ()
+    zones: tuple[str, ...] = ()
+    formes: tuple[str, ...] = ()
+
+    def accepte_effectif(self, effectif: int) -> bool:
+        return ((self.effectif_min is None or effectif >= self.effectif_min)
+                and (self.effectif_max is None or effectif < self.effectif_max))
+
+    def accepte_complement(self, profil: ProfilEntreprise) -> bool:
+        """Conditions non indexees : age et forme juridique."""
+        return ((self.age_min is None or profil.age_entreprise >= self.age_min)
+                and (self.age_max is None or profil.age_entreprise <= self.age_max)
+                and (not self.formes or profil.forme_juridique in self.formes))
+
+    def accepte(self, profil: ProfilEntreprise) -> bool:
+        """Evaluation directe, sans index."""
+        return (all(getattr(profil, t) for t in self.themes)
+                and (not self.naf or profil.lettre_naf in self.naf)
+                and (not self.regions or profil.region in self.regions)
+                and (not self.zones or profil.zone in self.zones)
+                and self.accepte_effectif(profil.effectif)
+                and self.accepte_complement(profil))
+
+
+def _estimation_cir(p: ProfilEntreprise) -> Optional[float]:
+    # 30% des depenses R&D, estimees a 10% de la masse salariale
+    return round(p.masse_salariale * 0.1 * 0.3, 2) if p.masse_salariale and p.innovation else None
+
+
+# ===================================================================
+# BASE DE DONNEES EXHAUSTIVE DES SUBVENTIONS FRANCAISES
+# ===================================================================
+
+CATALOGUE: list[dict[str, Any]] = [
+    # ------ AIDES NATIONALES - INNOVATION / R&D ------
+    {
+        "id": "cir", "nom": "Credit d Impot Recherche (CIR)",
+        "organisme": "MESRI / DGFIP", "niveau": "national", "categorie": "innovation",
+        "type_aide": "credit_impot",
+        "description": "Credit d impot de 30% sur les depenses de R&D (jusqu a 100 MEUR), 5% au-dela. Inclut salaires chercheurs, amortissements, brevets, sous-traitance publique.",
+        "montant_max": "30% des depenses R&D",
+        "montant_estime": _estimation_cir,
+        "conditions": ["Activites de R&D au sens du Manuel de Frascati", "Depenses eligibles documentees", "Declaration annuelle 2069-A"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("innovation",)), Critere(naf=("C", "J", "M"))],
+        "url_info": "https://www.enseignementsup-recherche.gouv.fr/fr/le-credit-d-impot-recherche-cir-49416",
+        "priorite": 1,
+    },
+    {
+        "id": "cii", "nom": "Credit d Impot Innovation (CII)",
+        "organisme": "MESRI / DGFIP", "niveau": "national", "categorie": "innovation",
+        "type_aide": "credit_impot",
+        "description": "Credit d impot de 30% sur les depenses d innovation (prototypes, installations pilotes) pour les PME. Plafond 400 000 EUR de depenses.",
+        "montant_max": "120 000 EUR (30% de 400 000 EUR)",
+        "montant_estime": lambda p: min(120000, _estimation_cir(p)) if p.masse_salariale and p.innovation else None,
+        "conditions": ["PME au sens communautaire (< 250 sal, CA < 50 MEUR)", "Depenses de conception de prototypes ou installations pilotes de nouveaux produits"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("innovation",), effectif_max=SEUIL_PME), Critere(naf=("C", "J", "M"), effectif_max=SEUIL_PME)],
+        "url_info": "https://www.enseignementsup-recherche.gouv.fr/fr/le-credit-d-impot-innovation-cii-49418",
+        "priorite": 1,
+    },
+    {
+        "id": "jei", "nom": "Jeune Entreprise Innovante (JEI)",
+        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "innovation",
+        "type_aide": "exoneration",
+        "description": "Exoneration de cotisations patronales sur les salaires des personnels de R&D (chercheurs, techniciens, gestionnaires de projets). Exoneration d IS partielle. Entreprise de moins de 8 ans, depenses R&D >= 15% des charges.",
+        "montant_max": "Exoneration totale cotisations patronales R&D + IS partiel",
+        "montant_estime": lambda p: round(p.masse_salariale * 0.1 * 0.25, 2) if p.masse_salariale else None,
+        "conditions": ["Moins de 8 ans d existence", "Depenses R&D >= 15% des charges deductibles", "PME independante", "Activite reellement nouvelle"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_max=SEUIL_PME, age_max=8),
+        "url_info": "https://www.economie.gouv.fr/entreprises/jeune-entreprise-innovante-JEI",
+        "priorite": 1,
+    },
+    {
+        "id": "jeic", "nom": "Jeune Entreprise Innovante de Croissance (JEIC)",
+        "organisme": "DGFIP", "niveau": "national", "categorie": "innovation",
+        "type_aide": "exoneration",
+        "description": "Statut renforce depuis 2024 pour les JEI en phase de croissance. Exoneration IS totale la 1ere annee beneficiaire, 50% la 2e. Exoneration cotisations patronales renforcee.",
+        "montant_max": "Exoneration IS + cotisations patronales",
+        "montant_estime": None,
+        "conditions": ["Conditions JEI remplies", "Croissance CA > 10%/an", "Depenses R&D >= 20% des charges"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_max=SEUIL_PME, age_max=8),
+        "url_info": "https://www.economie.gouv.fr/entreprises/jeune-entreprise-innovante-JEI",
+        "priorite": 2,
+    },
+    {
+        "id": "bpi-aide-innovation", "nom": "Aide a l innovation (Bpifrance)",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Subvention ou avance remboursable pour les projets d innovation (faisabilite, developpement, industrialisation). Taux d aide jusqu a 45% pour les PME.",
+        "montant_max": "Jusqu a 3 000 000 EUR",
+        "montant_estime": None,
+        "conditions": ["Projet innovant (produit, procede, service)", "Plan de financement solide", "Potentiel de marche demontre"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_max=SEUIL_ETI),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation",
+        "priorite": 1,
+    },
+    {
+        "id": "bpi-bourse-french-tech", "nom": "Bourse French Tech",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Subvention pour les startups innovantes en phase d amorcage. Finance la maturation du projet et la validation du modele economique.",
+        "montant_max": "30 000 EUR",
+        "montant_estime": 30000,
+        "conditions": ["Entreprise innovante de moins de 1 an", "Projet technologique ou de rupture", "Entrepreneur a temps plein"],
+        "tailles": ["tpe"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_max=SEUIL_TPE, age_max=1),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation/bourse-french-tech",
+        "priorite": 1,
+    },
+    {
+        "id": "france2030-i-demo", "nom": "France 2030 - i-Demo",
+        "organisme": "Bpifrance / SGPI", "niveau": "national", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Subvention + avance remboursable pour des projets de R&D collaboratifs ou individuels visant un developpement et une demonstration industriels. Budget total France 2030 : 54 Md EUR.",
+        "montant_max": "Jusqu a 10 000 000 EUR",
+        "montant_estime": None,
+        "conditions": ["Projet de R&D avec demonstration industrielle", "TRL 5-8", "Marche vise identifie"],
+        "tailles": ["pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_min=SEUIL_TPE),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation/aide-pour-le-developpement-de-linnovation",
+        "priorite": 2,
+    },
+    {
+        "id": "cip", "nom": "Credit d Impot Brevets (CIB / IP Box)",
+        "organisme": "DGFIP", "niveau": "national", "categorie": "innovation",
+        "type_aide": "credit_impot",
+        "description": "Taux reduit d IS a 10% sur les revenus de cession ou concession de brevets, logiciels proteges, certificats d obtention vegetale et procedes de fabrication.",
+        "montant_max": "IS a 10% au lieu de 25% sur revenus PI",
+        "montant_estime": None,
+        "conditions": ["Titulaire de brevets ou licences", "Revenus de PI identifiables", "R&D realisee en France"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",)),
+        "url_info": "https://www.economie.gouv.fr/entreprises/impot-societes-taux-reduit-brevets",
+        "priorite": 2,
+    },
+
+    # ------ AIDES NATIONALES - EMPLOI / FORMATION ------
+    {
+        "id": "acre", "nom": "ACRE (Aide aux Createurs et Repreneurs d Entreprise)",
+        "organisme": "URSSAF", "niveau": "national", "categorie": "emploi",
+        "type_aide": "exoneration",
+        "description": "Exoneration partielle de cotisations sociales pendant la 1ere annee d activite. 50% d exoneration des cotisations maladie, maternite, invalidite, deces, vieillesse, allocations familiales.",
+        "montant_max": "50% des cotisations pendant 12 mois",
+        "montant_estime": lambda p: round(p.masse_salariale * 0.45 * 0.5, 2) if p.masse_salariale else None,
+        "conditions": ["Creation ou reprise d entreprise", "Ne pas avoir beneficie de l ACRE dans les 3 ans precedents", "Avoir le controle effectif de l entreprise"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("creation_reprise",)), Critere(age_max=3)],
+        "url_info": "https://www.urssaf.fr/accueil/employeur/beneficier-dune-exoneration/exonerations-generales/acre.html",
+        "priorite": 1,
+    },
+    {
+        "id": "aide-apprentissage", "nom": "Aide a l embauche d un apprenti",
+        "organisme": "ASP / Ministere du Travail", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Aide de 6 000 EUR pour l embauche d un apprenti. Applicable pour les contrats d apprentissage visant un diplome jusqu au master (bac+5).",
+        "montant_max": "6 000 EUR par apprenti",
+        "montant_estime": lambda p: 6000 * max(1, round(p.effectif * 0.1)),
+        "conditions": ["Contrat d apprentissage", "Apprenti preparant un diplome jusqu au bac+5", "Entreprise de toute taille"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(themes=("formation",)),
+        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F23556",
+        "priorite": 1,
+    },
+    {
+        "id": "contrat-pro", "nom": "Aide au contrat de professionnalisation",
+        "organisme": "ASP", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Aide financiere pour l embauche en contrat de professionnalisation de demandeurs d emploi de 26 ans et plus ou de jeunes de moins de 30 ans.",
+        "montant_max": "2 000 EUR",
+        "montant_estime": 2000,
+        "conditions": ["Contrat de professionnalisation", "Salarie de 26 ans et plus ou demandeur d emploi"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(themes=("formation",)),
+        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F35391",
+        "priorite": 2,
+    },
+    {
+        "id": "reduction-generale", "nom": "Reduction generale des cotisations (ex-Fillon)",
+        "organisme": "URSSAF", "niveau": "national", "categorie": "social",
+        "type_aide": "exoneration",
+        "description": "Reduction degressive des cotisations patronales pour les salaires inferieurs a 1.6 SMIC. Applicable automatiquement. Reduction maximale au SMIC, nulle a 1.6 SMIC.",
+        "montant_max": "Jusqu a 32% du brut au niveau du SMIC",
+        "montant_estime": lambda p: round(p.effectif * 150 * 12, 2) if p.effectif and p.masse_salariale else None,
+        "conditions": ["Salaries dont la remuneration < 1.6 SMIC brut", "Applicable a toutes les entreprises", "Calcul annualise obligatoire"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(),
+        "url_info": "https://www.urssaf.fr/accueil/employeur/beneficier-dune-exoneration/exonerations-generales/la-reduction-generale.html",
+        "priorite": 1,
+    },
+    {
+        "id": "aide-emploi-franc", "nom": "Emplois francs",
+        "organisme": "France Travail", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Aide a l embauche pour le recrutement de residents de QPV (Quartiers Prioritaires de la Ville). CDI : 5 000 EUR/an sur 3 ans. CDD >= 6 mois : 2 500 EUR/an sur 2 ans.",
+        "montant_max": "15 000 EUR (CDI sur 3 ans)",
+        "montant_estime": 15000,
+        "conditions": ["Resident d un QPV", "CDI ou CDD >= 6 mois", "Inscrit comme demandeur d emploi"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(zones=("qpv",)),
+        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F34917",
+        "priorite": 2,
+    },
+    {
+        "id": "fne-formation", "nom": "FNE-Formation",
+        "organisme": "DREETS / ASP", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Prise en charge des couts pedagogiques pour la formation des salaries. Cible les transitions ecologiques, alimentaires, numeriques. Taux de prise en charge : 40 a 100% selon taille.",
+        "montant_max": "100% des couts pedagogiques (TPE/PME)",
+        "montant_estime": lambda p: round(p.effectif * 1500, 2) if p.effectif and p.formation else None,
+        "conditions": ["Salaries en activite", "Formation liee aux transitions (ecologique, numerique, alimentaire)", "Pas de formation obligatoire"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("formation",)), Critere(themes=("environnement",)), Critere(themes=("numerique",))],
+        "url_info": "https://travail-emploi.gouv.fr/emploi-et-insertion/accompagnement-des-mutations-economiques/appui-aux-mutations-economiques/fne-formation",
+        "priorite": 1,
+    },
+    {
+        "id": "aide-th", "nom": "Aide a l emploi de travailleurs handicapes (AGEFIPH)",
+        "organisme": "AGEFIPH", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Aides financieres pour l integration ou le maintien dans l emploi de personnes en situation de handicap : amenagement de poste, tutorat, formation.",
+        "montant_max": "Jusqu a 5 000 EUR (amenagement) + 3 000 EUR (accueil)",
+        "montant_estime": None,
+        "conditions": ["Recrutement ou maintien d un travailleur handicape (RQTH)", "Entreprise du secteur prive"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(effectif_min=20),
+        "url_info": "https://www.agefiph.fr/aides-handicap",
+        "priorite": 2,
+    },
+    {
+        "id": "opco-formation", "nom": "Financement OPCO (plan de developpement des competences)",
+        "organisme": "OPCO (11 operateurs)", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Prise en charge des actions de formation pour les entreprises de moins de 50 salaries par l OPCO de branche. Frais pedagogiques + remuneration + frais annexes.",
+        "montant_max": "Variable selon OPCO et branche",
+        "montant_estime": None,
+        "conditions": ["Entreprise < 50 salaries", "Formation dans le plan de developpement des competences", "OPCO de branche identifie"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(effectif_max=50),
+        "url_info": "https://travail-emploi.gouv.fr/ministere/acteurs/partenaires/opco",
+        "priorite": 1,
+    },
+
+    # ------ AIDES NATIONALES - ENVIRONNEMENT / TRANSITION ECOLOGIQUE ------
+    {
+        "id": "ademe-tremplin", "nom": "ADEME Tremplin pour la transition ecologique",
+        "organisme": "ADEME", "niveau": "national", "categorie": "environnement",
+        "type_aide": "subvention",
+        "description": "Aide forfaitaire simplifiee pour les PME : diagnostic environnemental, eco-conception, mobilite durable, economie circulaire, decarbonation.",
+        "montant_max": "Jusqu a 200 000 EUR",
+        "montant_estime": None,
+        "conditions": ["PME (< 250 salaries)", "Projet de transition ecologique identifie", "Devis ou cahier des charges"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("environnement",), effectif_max=SEUIL_PME),
+        "url_info": "https://agirpourlatransition.ademe.fr/entreprises/aides-financieres/2024/tremplin-transition-ecologique-pme",
+        "priorite": 1,
+    },
+    {
+        "id": "ademe-decarb-industrie", "nom": "ADEME Decarbonation de l industrie",
+        "organisme": "ADEME / France 2030", "niveau": "national", "categorie": "environnement",
+        "type_aide": "subvention",
+        "description": "Aide a l investissement pour la decarbonation des sites industriels : efficacite energetique, electrification, chaleur bas-carbone, captage CO2.",
+        "montant_max": "Jusqu a 50 MEUR",
+        "montant_estime": None,
+        "conditions": ["Site industriel emetteur de GES", "Projet de reduction des emissions > 1 000 tCO2/an", "Etude prealable realisee"],
+        "tailles": ["pme", "eti", "ge"],
+        "secteurs": ["C"],
+        "criteres": Critere(themes=("environnement",), naf=("C",)),
+        "url_info": "https://agirpourlatransition.ademe.fr/entreprises/aides-financieres/2024/aide-a-decarbonation-industrie",
+        "priorite": 2,
+    },
+    {
+        "id": "ci-transition-energetique", "nom": "Credit d impot investissements industrie verte (C3IV)",
+        "organisme": "DGFIP", "niveau": "national", "categorie": "environnement",
+        "type_aide": "credit_impot",
+        "description": "Credit d impot de 20 a 60% pour les investissements dans la production de batteries, panneaux solaires, eolien, pompes a chaleur. PME : 60%, ETI : 40%, GE : 20%.",
+        "montant_max": "150 MEUR par entreprise",
+        "montant_estime": None,
+        "conditions": ["Production d equipements pour les energies renouvelables", "Investissement en France", "Agrement prealable"],
+        "tailles": ["pme", "eti", "ge"],
+        "secteurs": ["C"],
+        "criteres": Critere(themes=("environnement",), naf=("C", "D")),
+        "url_info": "https://www.economie.gouv.fr/france-nation-verte/credit-impot-investissements-industrie-verte",
+        "priorite": 2,
+    },
+    {
+        "id": "pret-vert", "nom": "Pret Vert (Bpifrance)",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "environnement",
+        "type_aide": "pret",
+        "description": "Pret participatif sans garantie pour financer les investissements lies a la transition ecologique et energetique des PME et ETI.",
+        "montant_max": "3 000 000 EUR",
+        "montant_estime": None,
+        "conditions": ["PME ou ETI", "Projet de transition ecologique identifie", "Cofinancement bancaire"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("environnement",), effectif_max=SEUIL_ETI),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/transition-ecologique-et-energetique/pret-vert",
+        "priorite": 2,
+    },
+    {
+        "id": "diag-eco-flux", "nom": "Diagnostic Eco-Flux (Bpifrance / ADEME)",
+        "organisme": "Bpifrance / ADEME", "niveau": "national", "categorie": "environnement",
+        "type_aide": "accompagnement",
+        "description": "Diagnostic gratuit de 10 jours pour identifier les economies d energie, eau, matieres premieres et dechets. En moyenne 45 000 EUR d economies identifiees.",
+        "montant_max": "Diagnostic finance a 100%",
+        "montant_estime": None,
+        "conditions": ["PME de 20 a 250 salaries", "Secteur industriel, agro, tertiaire"],
+        "tailles": ["pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("environnement",), effectif_min=20, effectif_max=SEUIL_PME),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/transition-ecologique-et-energetique/diag-eco-flux",
+        "priorite": 1,
+    },
+    {
+        "id": "cee", "nom": "Certificats d Economie d Energie (CEE)",
+        "organisme": "Ministere Transition Ecologique", "niveau": "national", "categorie": "environnement",
+        "type_aide": "subvention",
+        "description": "Primes versees par les fournisseurs d energie pour financer des travaux d efficacite energetique : isolation, chauffage, eclairage, process industriels.",
+        "montant_max": "Variable selon travaux (jusqu a 80% du cout)",
+        "montant_estime": None,
+        "conditions": ["Travaux d efficacite energetique", "Professionnels RGE pour les travaux", "Fiches standardisees CEE"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("environnement",)), Critere(themes=("investissement",))],
+        "url_info": "https://www.ecologie.gouv.fr/certificats-deconomies-denergie",
+        "priorite": 2,
+    },
+
+    # ------ AIDES NATIONALES - NUMERIQUE ------
+    {
+        "id": "france-num", "nom": "France Num - Aides a la numerisation",
+        "organisme": "France Num / DGE", "niveau": "national", "categorie": "numerique",
+        "type_aide": "accompagnement",
+        "description": "Accompagnement et financement de la transformation numerique des TPE/PME : site web, logiciel de gestion, cybersecurite, IA. Cheque numerique et diagnostics.",
+        "montant_max": "Variable (diagnostics gratuits + aides financieres)",
+        "montant_estime": None,
+        "conditions": ["TPE ou PME", "Projet de numerisation identifie"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("numerique",), effectif_max=SEUIL_PME),
+        "url_info": "https://www.francenum.gouv.fr/aides-financieres",
+        "priorite": 1,
+    },
+    {
+        "id": "diag-cyber", "nom": "Diagnostic Cybersecurite (Bpifrance)",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "numerique",
+        "type_aide": "accompagnement",
+        "description": "Diagnostic subventionne de cybersecurite pour les PME et ETI. Cartographie des risques, plan d actions, sensibilisation des equipes.",
+        "montant_max": "Prise en charge 50% (reste a charge ~4 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["PME ou ETI", "Volonte de structurer sa cybersecurite"],
+        "tailles": ["pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("numerique",), effectif_max=SEUIL_ETI),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/transition-numerique/diagnostic-cybersecurite",
+        "priorite": 2,
+    },
+    {
+        "id": "ci-ia", "nom": "Aides France 2030 - Intelligence Artificielle",
+        "organisme": "Bpifrance / SGPI", "niveau": "national", "categorie": "numerique",
+        "type_aide": "subvention",
+        "description": "Financements pour les projets integrant l IA : R&D, deploiement, cas d usage sectoriels. Appels a projets reguliers dans le cadre de la strategie nationale IA.",
+        "montant_max": "Jusqu a 5 000 000 EUR",
+        "montant_estime": None,
+        "conditions": ["Projet integrant l IA", "Dimension innovante demontree", "Equipe technique identifiee"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": ["J", "M", "C"],
+        "criteres": Critere(themes=("numerique", "innovation"), naf=("J", "M", "C")),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/soutien-a-linnovation",
+        "priorite": 2,
+    },
+
+    # ------ AIDES NATIONALES - EXPORT / INTERNATIONAL ------
+    {
+        "id": "assurance-prospection", "nom": "Assurance Prospection (Bpifrance Assurance Export)",
+        "organisme": "Bpifrance Assurance Export", "niveau": "national", "categorie": "export",
+        "type_aide": "garantie",
+        "description": "Garantie couvrant les depenses de prospection a l international en cas d echec commercial. Couverture de 65% a 85% des frais engages.",
+        "montant_max": "Jusqu a 500 000 EUR de budget garanti",
+        "montant_estime": None,
+        "conditions": ["CA export < 50% du CA total", "Budget de prospection defini", "Marches cibles identifies"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("export_intl",)),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/international/assurance-prospection",
+        "priorite": 1,
+    },
+    {
+        "id": "cheque-relance-export", "nom": "Cheque Relance VIE / Export",
+        "organisme": "Business France / Bpifrance", "niveau": "national", "categorie": "export",
+        "type_aide": "subvention",
+        "description": "Aide financiere pour l embauche d un VIE (Volontaire International en Entreprise) ou pour des missions de prospection. Subvention de 5 000 a 10 000 EUR.",
+        "montant_max": "10 000 EUR",
+        "montant_estime": 10000,
+        "conditions": ["PME ou ETI", "Embauche d un VIE ou mission export structuree"],
+        "tailles": ["pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("export_intl",), effectif_max=SEUIL_ETI),
+        "url_info": "https://www.businessfrance.fr/vie-volontariat-international-en-entreprise",
+        "priorite": 2,
+    },
+    {
+        "id": "pret-croissance-intl", "nom": "Pret Croissance International (Bpifrance)",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "export",
+        "type_aide": "pret",
+        "description": "Pret sans garantie pour financer le developpement international : implantation, recrutement export, adaptation produits, prospection.",
+        "montant_max": "5 000 000 EUR",
+        "montant_estime": None,
+        "conditions": ["PME ou ETI", "Projet de developpement international structure", "3 ans d existence minimum"],
+        "tailles": ["pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("export_intl",), age_min=3),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/international/pret-croissance-international",
+        "priorite": 2,
+    },
+
+    # ------ AIDES NATIONALES - CREATION / REPRISE ------
+    {
+        "id": "nacre", "nom": "NACRE (Nouvel Accompagnement pour la Creation/Reprise)",
+        "organisme": "Region / BGE / Reseau Entreprendre", "niveau": "national", "categorie": "creation",
+        "type_aide": "accompagnement",
+        "description": "Accompagnement gratuit en 3 phases : aide au montage du projet, structuration financiere, demarrage de l activite. Pret a taux zero de 1 000 a 10 000 EUR.",
+        "montant_max": "10 000 EUR (pret a taux zero) + accompagnement",
+        "montant_estime": 10000,
+        "conditions": ["Createur ou repreneur d entreprise", "Demandeur d emploi, jeune < 26 ans, beneficiaire RSA/ASS, ou zone urbaine sensible"],
+        "tailles": ["tpe"],
+        "secteurs": [],
+        "criteres": Critere(themes=("creation_reprise",), effectif_max=SEUIL_TPE),
+        "url_info": "https://www.service-public.fr/particuliers/vosdroits/F20016",
+        "priorite": 1,
+    },
+    {
+        "id": "cape", "nom": "CAPE (Contrat d Appui au Projet d Entreprise)",
+        "organisme": "Couveuses / Cooperatives", "niveau": "national", "categorie": "creation",
+        "type_aide": "accompagnement",
+        "description": "Contrat permettant de tester son activite au sein d une structure (couveuse, CAE) tout en conservant son statut social. Duree max 12 mois renouvelable.",
+        "montant_max": "Accompagnement + couverture sociale",
+        "montant_estime": None,
+        "conditions": ["Porteur de projet en phase de test", "Avant immatriculation ou en debut d activite"],
+        "tailles": ["tpe"],
+        "secteurs": [],
+        "criteres": Critere(themes=("creation_reprise",), age_max=1),
+        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F11299",
+        "priorite": 3,
+    },
+    {
+        "id": "arce", "nom": "ARCE (Aide a la Reprise ou Creation d Entreprise)",
+        "organisme": "France Travail", "niveau": "national", "categorie": "creation",
+        "type_aide": "subvention",
+        "description": "Versement en capital de 60% des droits restants a l allocation chomage pour les createurs ou repreneurs d entreprise. Versee en 2 fois.",
+        "montant_max": "60% des droits ARE restants",
+        "montant_estime": None,
+        "conditions": ["Etre indemnise par France Travail ou avoir des droits ARE", "Avoir obtenu l ACRE", "Creer ou reprendre une entreprise"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("creation_reprise",)),
+        "url_info": "https://www.service-public.fr/particuliers/vosdroits/F11677",
+        "priorite": 1,
+    },
+
+    # ------ AIDES NATIONALES - INVESTISSEMENT ------
+    {
+        "id": "suramortissement", "nom": "Suramortissement industriel (loi Macron)",
+        "organisme": "DGFIP", "niveau": "national", "categorie": "investissement",
+        "type_aide": "credit_impot",
+        "description": "Deduction exceptionnelle de 40% du prix de revient des biens d equipement industriel acquis entre 2019 et 2025 (prolonge). Robotique, impression 3D, logiciels de production.",
+        "montant_max": "40% du prix des equipements en deduction",
+        "montant_estime": None,
+        "conditions": ["Acquisition de biens industriels eligibles", "PME industrielle", "Investissement productif"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": ["C", "F"],
+        "criteres": Critere(themes=("investissement",), naf=("C", "F"), effectif_max=SEUIL_PME),
+        "url_info": "https://www.economie.gouv.fr/entreprises/suramortissement-investissement-productif",
+        "priorite": 2,
+    },
+    {
+        "id": "bpi-pret-atout", "nom": "Pret Atout (Bpifrance)",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "investissement",
+        "type_aide": "pret",
+        "description": "Pret sans garantie de 50 000 a 5 MEUR pour renforcer la tresorerie, financer la croissance, les investissements materiels et immateriels des PME et ETI.",
+        "montant_max": "5 000 000 EUR",
+        "montant_estime": None,
+        "conditions": ["PME ou ETI", "3 ans d existence minimum", "Situation financiere saine"],
+        "tailles": ["pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("investissement",), age_min=3),
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/financement/pret-atout",
+        "priorite": 2,
+    },
+    {
+        "id": "garantie-bpi", "nom": "Garantie de pret Bpifrance",
+        "organisme": "Bpifrance", "niveau": "national", "categorie": "investissement",
+        "type_aide": "garantie",
+        "description": "Garantie de 40 a 70% des prets bancaires pour faciliter l acces au credit des TPE/PME. Creation, investissement, international, innovation.",
+        "montant_max": "70% du pret garanti",
+        "montant_estime": None,
+        "conditions": ["Pret bancaire en cours de negociation", "TPE ou PME", "Projet identifie (creation, investissement, croissance)"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("investissement",), effectif_max=SEUIL_PME), Critere(themes=("creation_reprise",), effectif_max=SEUIL_PME)],
+        "url_info": "https://www.bpifrance.fr/catalogue-offres/financement/garantie-de-pret",
+        "priorite": 1,
+    },
+
+    # ------ AIDES NATIONALES - FISCAL / ZONES ------
+    {
+        "id": "zrr-exo", "nom": "Exoneration ZRR (Zone de Revitalisation Rurale)",
+        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "fiscal",
+        "type_aide": "exoneration",
+        "description": "Exoneration d IS/IR pendant 5 ans (totale) puis 3 ans (degressive) pour les entreprises nouvelles en ZRR. Exoneration de CFE et CVAE possible.",
+        "montant_max": "Exoneration totale IS 5 ans + degressive 3 ans",
+        "montant_estime": None,
+        "conditions": ["Implantation en ZRR (France Ruralites Revitalisation depuis 2024)", "Entreprise nouvelle ou reprise", "Activite commerciale, artisanale, industrielle ou liberale"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(zones=("zrr",)),
+        "url_info": "https://www.economie.gouv.fr/entreprises/zone-revitalisation-rurale-zrr",
+        "priorite": 1,
+    },
+    {
+        "id": "zfu-exo", "nom": "Exoneration ZFU-TE (Zone Franche Urbaine)",
+        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "fiscal",
+        "type_aide": "exoneration",
+        "description": "Exoneration d IS/IR pendant 5 ans (totale) + 3 ans (degressive). Exoneration cotisations patronales pendant 5 ans. Exoneration CFE et taxe fonciere.",
+        "montant_max": "Exoneration totale multi-impots 5 ans",
+        "montant_estime": None,
+        "conditions": ["Implantation en ZFU-TE", "Entreprise de moins de 50 salaries", "Clause d embauche locale (1/3 des salaries en ZFU/QPV)"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(zones=("zfu",)),
+        "url_info": "https://www.economie.gouv.fr/entreprises/zone-franche-urbaine-zfu",
+        "priorite": 1,
+    },
+    {
+        "id": "ber-exo", "nom": "Exoneration BER (Bassin d Emploi a Redynamiser)",
+        "organisme": "DGFIP / URSSAF", "niveau": "national", "categorie": "fiscal",
+        "type_aide": "exoneration",
+        "description": "Exoneration totale d IS, CFE, CVAE et cotisations patronales pendant 5 ans pour les entreprises nouvelles dans les bassins d emploi a redynamiser.",
+        "montant_max": "Exoneration totale 5 ans",
+        "montant_estime": None,
+        "conditions": ["Implantation dans un BER", "Entreprise nouvelle", "Bassin de la Vallee de la Meuse ou Lavelanet"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(zones=("ber",)),
+        "url_info": "https://www.economie.gouv.fr/entreprises/aides-entreprises-bassins-emploi-redynamiser",
+        "priorite": 1,
+    },
+    {
+        "id": "outre-mer-exo", "nom": "Exonerations Outre-mer (LODEOM)",
+        "organisme": "URSSAF / DGFIP", "niveau": "national", "categorie": "social",
+        "type_aide": "exoneration",
+        "description": "Exonerations renforcees de cotisations patronales pour les entreprises d Outre-mer. Baremes specifiques selon taille et secteur : competitivite, competitivite renforcee, innovation.",
+        "montant_max": "Exoneration jusqu a 2.2 SMIC (competitivite) ou 3.0 SMIC (innovation/croissance)",
+        "montant_estime": None,
+        "conditions": ["Siege social en DOM (Guadeloupe, Martinique, Guyane, Reunion, Mayotte)", "Effectif < 250 salaries (sauf secteurs prioritaires)"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(regions=("outre-mer",)),
+        "url_info": "https://www.urssaf.fr/accueil/employeur/beneficier-dune-exoneration/exonerations-outre-mer.html",
+        "priorite": 1,
+    },
+
+    # ------ AIDES NATIONALES - ESS / IMPACT ------
+    {
+        "id": "dla", "nom": "DLA (Dispositif Local d Accompagnement)",
+        "organisme": "France Active / Etat", "niveau": "national", "categorie": "ess",
+        "type_aide": "accompagnement",
+        "description": "Accompagnement gratuit pour les structures ESS (associations, cooperatives, entreprises sociales) : diagnostic, plan d actions, appui strategique.",
+        "montant_max": "Accompagnement gratuit",
+        "montant_estime": None,
+        "conditions": ["Structure de l ESS (association, cooperative, entreprise sociale)", "Activite d interet general ou d utilite sociale"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("ess",)), Critere(formes=("Association",))],
+        "url_info": "https://www.info-dla.fr/",
+        "priorite": 1,
+    },
+    {
+        "id": "france-active-garantie", "nom": "Garantie France Active",
+        "organisme": "France Active", "niveau": "national", "categorie": "ess",
+        "type_aide": "garantie",
+        "description": "Garantie bancaire pour les entreprises de l ESS et les createurs en situation de precarite. Couvre jusqu a 80% du pret bancaire.",
+        "montant_max": "80% de garantie (plafond 100 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["Entreprise ESS ou createur en difficulte d acces au credit", "Projet viable economiquement"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("ess",)), Critere(formes=("Association",))],
+        "url_info": "https://www.franceactive.org/",
+        "priorite": 2,
+    },
+    {
+        "id": "agrement-esus", "nom": "Agrement ESUS (Entreprise Solidaire d Utilite Sociale)",
+        "organisme": "Prefecture / DREETS", "niveau": "national", "categorie": "ess",
+        "type_aide": "accompagnement",
+        "description": "Agrement ouvrant droit a des financements specifiques (epargne salariale solidaire, BPI, fonds ESS) et a des avantages fiscaux pour les investisseurs (IR-PME 25%).",
+        "montant_max": "Acces a l epargne solidaire + avantages fiscaux investisseurs",
+        "montant_estime": None,
+        "conditions": ["Objectif d utilite sociale", "Politique de remuneration encadree (ecart max 1 a 7)", "Charge d utilite sociale > 66% du CA"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(themes=("ess",)),
+        "url_info": "https://www.economie.gouv.fr/entreprises/agrement-entreprise-solidaire-utilite-sociale-ess",
+        "priorite": 2,
+    },
+
+    # ------ AIDES NATIONALES - PREVENTION / SANTE AU TRAVAIL ------
+    {
+        "id": "subvention-prevention-tpe", "nom": "Subventions prevention TPE (CARSAT / CRAMIF)",
+        "organisme": "CARSAT / CRAMIF / CGSS", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Subventions pour les TPE (1-49 salaries) pour des investissements en prevention des risques professionnels : TMS Pro, Risque chimique, Equip Mobile, Filmeuse +.",
+        "montant_max": "25 000 EUR",
+        "montant_estime": None,
+        "conditions": ["TPE de 1 a 49 salaries", "Investissement en equipement de prevention", "DUERP a jour"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(effectif_max=50),
+        "url_info": "https://www.ameli.fr/entreprise/sante-travail/aides-financieres",
+        "priorite": 2,
+    },
+    {
+        "id": "fact", "nom": "FACT (Fonds d Amelioration des Conditions de Travail)",
+        "organisme": "ANACT", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Financement de projets d amelioration des conditions de travail : organisation du travail, prevenir les TMS, transitions numeriques et ecologiques au travail.",
+        "montant_max": "50 000 EUR",
+        "montant_estime": None,
+        "conditions": ["Entreprise de toute taille", "Projet d amelioration des conditions de travail structure", "Implication des representants du personnel"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": [],
+        "criteres": Critere(effectif_min=1),
+        "url_info": "https://www.anact.fr/le-fonds-pour-lamelioration-des-conditions-de-travail-fact",
+        "priorite": 3,
+    },
+
+    # ------ AIDES REGIONALES ------
+    {
+        "id": "region-aide-invest", "nom": "Aide regionale a l investissement productif",
+        "organisme": "Conseil Regional", "niveau": "regional", "categorie": "investissement",
+        "type_aide": "subvention",
+        "description": "Subvention pour les investissements materiels et immateriels des PME. Taux d aide de 10 a 30% selon region et zone AFR. Toutes les regions proposent ce type d aide.",
+        "montant_max": "Variable (30 000 a 500 000 EUR selon region)",
+        "montant_estime": None,
+        "conditions": ["PME implantee dans la region", "Investissement productif (equipement, immobilier)", "Creation d emplois associee souvent requise"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("investissement",), effectif_max=SEUIL_PME),
+        "url_info": "https://les-aides.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "region-aide-creation", "nom": "Aide regionale a la creation d entreprise",
+        "organisme": "Conseil Regional", "niveau": "regional", "categorie": "creation",
+        "type_aide": "subvention",
+        "description": "Plupart des regions proposent des aides a la creation : prets d honneur, subventions, accompagnement. Montant et conditions varient selon les regions.",
+        "montant_max": "Variable (5 000 a 50 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["Creation ou reprise d entreprise", "Implantation dans la region", "Projet economiquement viable"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("creation_reprise",)),
+        "url_info": "https://les-aides.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "region-aide-export", "nom": "Aide regionale a l export",
+        "organisme": "Conseil Regional / CCI", "niveau": "regional", "categorie": "export",
+        "type_aide": "subvention",
+        "description": "Aides regionales pour la prospection internationale : salons, missions commerciales, etudes de marche. Souvent 50% des depenses prises en charge.",
+        "montant_max": "Variable (5 000 a 30 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["PME de la region", "Premier developpement export ou nouveau marche"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("export_intl",), effectif_max=SEUIL_PME),
+        "url_info": "https://les-aides.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "region-aide-innovation", "nom": "Aide regionale a l innovation",
+        "organisme": "Conseil Regional / Agence d innovation", "niveau": "regional", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Aides regionales pour la R&D et l innovation : bourses de faisabilite, aides au prototypage, aides aux brevets. Souvent complementaires au CIR/CII.",
+        "montant_max": "Variable (10 000 a 200 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["PME de la region", "Projet innovant (produit ou procede nouveau)", "Co-financement souvent requis"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_max=SEUIL_PME),
+        "url_info": "https://les-aides.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "region-aide-transition", "nom": "Aide regionale a la transition ecologique",
+        "organisme": "Conseil Regional", "niveau": "regional", "categorie": "environnement",
+        "type_aide": "subvention",
+        "description": "Aides regionales pour la transition ecologique : audits energetiques, investissements verts, economie circulaire, mobilite durable.",
+        "montant_max": "Variable (5 000 a 100 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["Entreprise de la region", "Projet de transition ecologique", "Diagnostic prealable souvent requis"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("environnement",), effectif_max=SEUIL_PME),
+        "url_info": "https://les-aides.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "region-aide-numerique", "nom": "Cheque numerique regional",
+        "organisme": "Conseil Regional", "niveau": "regional", "categorie": "numerique",
+        "type_aide": "subvention",
+        "description": "Aides regionales a la numerisation : site web, ERP, CRM, e-commerce, cybersecurite. Souvent sous forme de cheque ou de subvention forfaitaire.",
+        "montant_max": "Variable (2 000 a 20 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["TPE ou PME de la region", "Projet de numerisation", "Prestataire agree souvent requis"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("numerique",), effectif_max=SEUIL_PME),
+        "url_info": "https://les-aides.fr/",
+        "priorite": 2,
+    },
+
+    # ------ AIDES REGIONALES SPECIFIQUES ------
+    {
+        "id": "idf-pm-up", "nom": "PM up (Ile-de-France)",
+        "organisme": "Region Ile-de-France", "niveau": "regional", "categorie": "investissement",
+        "type_aide": "subvention",
+        "description": "Aide de 10 000 a 250 000 EUR pour les PME franciliennes en croissance. Investissement materiel, immateriel, recrutement, conseil strategique.",
+        "montant_max": "250 000 EUR",
+        "montant_estime": None,
+        "conditions": ["PME de 5 a 250 salaries", "Siege social en IDF", "Croissance du CA sur 3 ans"],
+        "tailles": ["pme"],
+        "secteurs": [],
+        "criteres": Critere(regions=("ile-de-france",)),
+        "url_info": "https://www.iledefrance.fr/aides-et-appels-a-projets/pm-up",
+        "priorite": 1,
+    },
+    {
+        "id": "idf-innov-up", "nom": "Innov up (Ile-de-France)",
+        "organisme": "Region Ile-de-France", "niveau": "regional", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Aide pour les projets innovants des TPE/PME franciliennes : faisabilite, experimentation, developpement, industrialisation.",
+        "montant_max": "Jusqu a 500 000 EUR",
+        "montant_estime": None,
+        "conditions": ["TPE/PME en IDF", "Projet innovant", "Prototype ou POC"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), regions=("ile-de-france",)),
+        "url_info": "https://www.iledefrance.fr/aides-et-appels-a-projets/innov-up",
+        "priorite": 1,
+    },
+    {
+        "id": "ara-ambition-eco", "nom": "Ambition Eco (Auvergne-Rhone-Alpes)",
+        "organisme": "Region AURA", "niveau": "regional", "categorie": "investissement",
+        "type_aide": "subvention",
+        "description": "Aide pour les projets d investissement structurants des PME de la region AURA : equipements, immobilier, numerisation.",
+        "montant_max": "200 000 EUR",
+        "montant_estime": None,
+        "conditions": ["PME implantee en AURA", "Projet d investissement productif", "Creation d emplois"],
+        "tailles": ["pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("investissement",), regions=("auvergne-rhone-alpes",)),
+        "url_info": "https://ambitioneco.auvergnerhonealpes.fr/",
+        "priorite": 1,
+    },
+    {
+        "id": "na-croissance-verte", "nom": "Croissance Verte (Nouvelle-Aquitaine)",
+        "organisme": "Region Nouvelle-Aquitaine", "niveau": "regional", "categorie": "environnement",
+        "type_aide": "subvention",
+        "description": "Aide aux entreprises de Nouvelle-Aquitaine pour des projets de croissance verte : eco-conception, EnR, economie circulaire, mobilite propre.",
+        "montant_max": "100 000 EUR",
+        "montant_estime": None,
+        "conditions": ["Entreprise implantee en Nouvelle-Aquitaine", "Projet de transition ecologique"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("environnement",), regions=("nouvelle-aquitaine",)),
+        "url_info": "https://les-aides.nouvelle-aquitaine.fr/",
+        "priorite": 1,
+    },
+    {
+        "id": "occ-pass-occitanie", "nom": "Pass Occitanie",
+        "organisme": "Region Occitanie / AD Occ", "niveau": "regional", "categorie": "investissement",
+        "type_aide": "subvention",
+        "description": "Aide de 2 000 a 10 000 EUR pour les TPE et PME d Occitanie. Investissement, conseil, communication, numerisation.",
+        "montant_max": "10 000 EUR",
+        "montant_estime": 10000,
+        "conditions": ["TPE/PME d Occitanie", "Moins de 50 salaries", "Projet de developpement"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(effectif_max=50, regions=("occitanie",)),
+        "url_info": "https://www.laregion.fr/Pass-Occitanie",
+        "priorite": 1,
+    },
+
+    # ------ AIDES LOCALES ------
+    {
+        "id": "local-pret-honneur", "nom": "Pret d honneur (Initiative France / Reseau Entreprendre)",
+        "organisme": "Initiative France / Reseau Entreprendre", "niveau": "local", "categorie": "creation",
+        "type_aide": "pret",
+        "description": "Pret a taux zero, sans garantie, pour les createurs et repreneurs. De 2 000 a 50 000 EUR. Effet levier pour obtenir un pret bancaire (1 EUR Initiative = 7.50 EUR de pret bancaire).",
+        "montant_max": "50 000 EUR (Initiative) / 90 000 EUR (Reseau Entreprendre)",
+        "montant_estime": None,
+        "conditions": ["Creation ou reprise d entreprise", "Projet viable et coherent", "Accompagnement par la plateforme"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("creation_reprise",)), Critere(age_max=3)],
+        "url_info": "https://www.initiative-france.fr/",
+        "priorite": 1,
+    },
+    {
+        "id": "local-pepiniere", "nom": "Pepiniere / Incubateur d entreprises",
+        "organisme": "Collectivites locales / Technopoles", "niveau": "local", "categorie": "creation",
+        "type_aide": "accompagnement",
+        "description": "Hebergement a tarif reduit + accompagnement pour les jeunes entreprises. Services mutualises : salle reunion, secretariat, conseil juridique, comptable.",
+        "montant_max": "Loyer reduit 50-70% + services inclus",
+        "montant_estime": None,
+        "conditions": ["Entreprise de moins de 3-5 ans", "Projet innovant ou a fort potentiel", "Candidature aupres de la pepiniere"],
+        "tailles": ["tpe"],
+        "secteurs": [],
+        "criteres": Critere(age_max=3),
+        "url_info": "https://www.economie.gouv.fr/entreprises/pepinieres-incubateurs-entreprises",
+        "priorite": 2,
+    },
+    {
+        "id": "local-exo-cfe", "nom": "Exoneration CFE (Cotisation Fonciere des Entreprises)",
+        "organisme": "Communes / EPCI", "niveau": "local", "categorie": "fiscal",
+        "type_aide": "exoneration",
+        "description": "Exoneration de CFE possible sur deliberation communale pour les creations d entreprises (2 ans), les ZRR, les JEI, les artistes, et certaines activites specifiques.",
+        "montant_max": "Exoneration totale CFE 2-5 ans",
+        "montant_estime": None,
+        "conditions": ["Variable selon commune", "Creation d entreprise ou implantation en zone prioritaire"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("creation_reprise",)), Critere(zones=("zrr", "zfu", "ber"))],
+        "url_info": "https://www.service-public.fr/professionnels-entreprises/vosdroits/F23547",
+        "priorite": 2,
+    },
+
+    # ------ AIDES EUROPEENNES ------
+    {
+        "id": "feder", "nom": "FEDER (Fonds Europeen de Developpement Regional)",
+        "organisme": "Commission europeenne / Region", "niveau": "europeen", "categorie": "investissement",
+        "type_aide": "subvention",
+        "description": "Cofinancement de projets d investissement, d innovation, de transition ecologique et de numerisation. Gere au niveau regional. Budget 2021-2027 : 226 Md EUR.",
+        "montant_max": "Variable (40 a 85% de cofinancement selon zone)",
+        "montant_estime": None,
+        "conditions": ["Projet s inscrivant dans les priorites regionales", "Cofinancement obligatoire", "Appel a projets regional"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("investissement",)), Critere(themes=("innovation",)), Critere(themes=("environnement",)), Critere(themes=("numerique",))],
+        "url_info": "https://ec.europa.eu/regional_policy/funding/erdf_fr",
+        "priorite": 2,
+    },
+    {
+        "id": "fse-plus", "nom": "FSE+ (Fonds Social Europeen Plus)",
+        "organisme": "Commission europeenne / DREETS", "niveau": "europeen", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Financement de projets emploi, formation, inclusion sociale. Formation des salaries, insertion professionnelle, lutte contre la pauvrete. Budget 2021-2027 : 99 Md EUR.",
+        "montant_max": "Variable selon projet (cofinancement 50 a 85%)",
+        "montant_estime": None,
+        "conditions": ["Projet emploi/formation/inclusion", "Cofinancement obligatoire", "Appel a projets"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": [Critere(themes=("formation",)), Critere(themes=("ess",))],
+        "url_info": "https://ec.europa.eu/european-social-fund-plus/fr",
+        "priorite": 2,
+    },
+    {
+        "id": "horizon-europe", "nom": "Horizon Europe",
+        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Programme-cadre de R&D de l UE (2021-2027, 95.5 Md EUR). Finance des projets collaboratifs de recherche et innovation. EIC Accelerator pour les PME innovantes : jusqu a 2.5 MEUR subvention + 15 MEUR equity.",
+        "montant_max": "2 500 000 EUR (subvention EIC) + 15 MEUR (equity)",
+        "montant_estime": None,
+        "conditions": ["Projet de R&D avec dimension europeenne", "Consortium transnational (sauf EIC)", "Excellence scientifique et impact"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",)),
+        "url_info": "https://research-and-innovation.ec.europa.eu/funding/funding-opportunities/funding-programmes-and-open-calls/horizon-europe_en",
+        "priorite": 2,
+    },
+    {
+        "id": "eic-accelerator", "nom": "EIC Accelerator (Horizon Europe)",
+        "organisme": "European Innovation Council", "niveau": "europeen", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Financement pour les PME innovantes a fort potentiel de croissance. Subvention jusqu a 2.5 MEUR + investissement en equity jusqu a 15 MEUR. TRL 5-9.",
+        "montant_max": "2 500 000 EUR subvention + 15 MEUR equity",
+        "montant_estime": None,
+        "conditions": ["PME au sens UE", "Innovation de rupture (deep tech, green tech, health tech)", "TRL 5-9", "Ambition de scale-up europeen"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(themes=("innovation",), effectif_max=SEUIL_PME),
+        "url_info": "https://eic.ec.europa.eu/eic-funding-opportunities/eic-accelerator_en",
+        "priorite": 2,
+    },
+    {
+        "id": "cosme-sme", "nom": "Programme SMP / COSME (ex-COSME)",
+        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "investissement",
+        "type_aide": "garantie",
+        "description": "Garantie de prets et facilitation d acces aux marches pour les PME europeennes. Via le programme Single Market Programme (ex-COSME). Garantie intermediee par les banques.",
+        "montant_max": "Garantie bancaire facilitee (jusqu a 150 000 EUR)",
+        "montant_estime": None,
+        "conditions": ["PME europeenne", "Demande via banque partenaire", "Projet de croissance ou de creation"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": [],
+        "criteres": Critere(effectif_max=SEUIL_PME),
+        "url_info": "https://single-market-economy.ec.europa.eu/smes/cosme_en",
+        "priorite": 3,
+    },
+    {
+        "id": "life", "nom": "Programme LIFE (environnement et climat)",
+        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "environnement",
+        "type_aide": "subvention",
+        "description": "Financement de projets environnementaux : biodiversite, economie circulaire, attenuation/adaptation climatique, transition energetique. Budget 2021-2027 : 5.4 Md EUR.",
+        "montant_max": "Variable (cofinancement 60 a 75%)",
+        "montant_estime": None,
+        "conditions": ["Projet a dimension environnementale", "Impact mesurable", "Valeur ajoutee europeenne"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": [],
+        "criteres": Critere(themes=("environnement",)),
+        "url_info": "https://cinea.ec.europa.eu/programmes/life_en",
+        "priorite": 3,
+    },
+    {
+        "id": "erasmus-entreprises", "nom": "Erasmus pour jeunes entrepreneurs",
+        "organisme": "Commission europeenne / EASME", "niveau": "europeen", "categorie": "creation",
+        "type_aide": "accompagnement",
+        "description": "Programme d echange permettant a un jeune entrepreneur de passer 1 a 6 mois chez un entrepreneur experimente dans un autre pays de l UE. Bourse de sejour incluse.",
+        "montant_max": "Bourse de 530 a 1 100 EUR/mois selon pays",
+        "montant_estime": None,
+        "conditions": ["Entrepreneur de moins de 3 ans d activite ou porteur de projet", "Partenariat avec un entrepreneur hote dans un autre pays UE"],
+        "tailles": ["tpe"],
+        "secteurs": [],
+        "criteres": Critere(themes=("creation_reprise",), age_max=3),
+        "url_info": "https://www.erasmus-entrepreneurs.eu/",
+        "priorite": 3,
+    },
+    {
+        "id": "digital-europe", "nom": "Digital Europe Programme",
+        "organisme": "Commission europeenne", "niveau": "europeen", "categorie": "numerique",
+        "type_aide": "subvention",
+        "description": "Programme europeen pour la transformation numerique : IA, cybersecurite, calcul haute performance, competences numeriques, interoperabilite. Budget : 7.5 Md EUR.",
+        "montant_max": "Variable selon appel a projets",
+        "montant_estime": None,
+        "conditions": ["Projet numerique (IA, cyber, cloud, data)", "Consortium transnational recommande", "Appel a projets"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": ["J", "M"],
+        "criteres": Critere(themes=("numerique", "innovation")),
+        "url_info": "https://digital-strategy.ec.europa.eu/en/activities/digital-programme",
+        "priorite": 3,
+    },
+
+    # ------ AIDES SECTORIELLES ------
+    {
+        "id": "pac-aides", "nom": "PAC - Aides agricoles",
+        "organisme": "ASP / DDT", "niveau": "europeen", "categorie": "investissement",
+        "type_aide": "subvention",
+        "description": "Aides directes (DPB, paiement vert, aide redistributive) et aides couplees pour les exploitations agricoles. PCAE pour les investissements.",
+        "montant_max": "Variable selon exploitation",
+        "montant_estime": None,
+        "conditions": ["Exploitant agricole", "Surface minimale (SNA)", "Respect conditionnalite"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": ["A"],
+        "criteres": Critere(naf=("A",)),
+        "url_info": "https://agriculture.gouv.fr/la-pac-en-un-coup-doeil",
+        "priorite": 1,
+    },
+    {
+        "id": "chr-modernisation", "nom": "Aide a la modernisation CHR",
+        "organisme": "Bpifrance / Region", "niveau": "national", "categorie": "investissement",
+        "type_aide": "pret",
+        "description": "Pret specifique pour les cafes, hotels, restaurants : renovation, mise aux normes, equipements, numerisation.",
+        "montant_max": "300 000 EUR",
+        "montant_estime": None,
+        "conditions": ["Cafe, hotel ou restaurant", "Investissement de modernisation"],
+        "tailles": ["tpe", "pme"],
+        "secteurs": ["I"],
+        "criteres": Critere(naf=("I",)),
+        "url_info": "https://www.bpifrance.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "btp-prevention", "nom": "Aides OPPBTP a la prevention BTP",
+        "organisme": "OPPBTP", "niveau": "national", "categorie": "emploi",
+        "type_aide": "subvention",
+        "description": "Aides financieres et accompagnement pour la prevention des risques dans le BTP : equipements de securite, formations, diagnostics.",
+        "montant_max": "Variable (diagnostics gratuits + aides equipements)",
+        "montant_estime": None,
+        "conditions": ["Entreprise du BTP", "Cotisant OPPBTP"],
+        "tailles": ["tpe", "pme", "eti"],
+        "secteurs": ["F"],
+        "criteres": Critere(naf=("F",)),
+        "url_info": "https://www.preventionbtp.fr/",
+        "priorite": 2,
+    },
+    {
+        "id": "cifre", "nom": "Convention CIFRE (These en entreprise)",
+        "organisme": "ANRT / MESRI", "niveau": "national", "categorie": "innovation",
+        "type_aide": "subvention",
+        "description": "Subvention annuelle de 14 000 EUR pendant 3 ans pour l embauche d un doctorant en these au sein de l entreprise. Eligible au CIR en complementarite.",
+        "montant_max": "42 000 EUR (14 000/an x 3 ans)",
+        "montant_estime": 42000,
+        "conditions": ["Embauche d un doctorant en CDI ou CDD 3 ans", "Partenariat avec un laboratoire de recherche", "Sujet de these valide par l ANRT"],
+        "tailles": ["tpe", "pme", "eti", "ge"],
+        "secteurs": ["C", "J", "M"],
+        "criteres": Critere(themes=("innovation",), naf=("C", "J", "M")),
+        "url_info": "https://www.anrt.asso.fr/fr/le-dispositif-cifre-7844",
+        "priorite": 2,
+    },]
+
+
+# ===================================================================
+# REGLES DE NON-CUMUL ENTRE SUBVENTIONS
+# Certaines aides ne sont pas cumulables entre elles : on marque les
+# incompatibilites et on calcule le montant max realiste.
+# ===================================================================
+
+REGLES_NON_CUMUL: dict[str, dict] = {
+    # CIR et CII : cumulables entre eux mais pas sur les memes depenses
+    "cir_cii": {
+        "ids": ["cir", "cii"],
+        "regle": "Le CIR et le CII sont cumulables, mais pas sur les memes depenses. Les depenses eligibles au CII ne doivent pas etre declarees au CIR.",
+    },
+    # JEI et ACRE : non cumulables
+    "jei_acre": {
+        "ids": ["jei", "jeic", "acre"],
+        "regle": "L'exoneration JEI/JEIC n'est pas cumulable avec l'ACRE. Seule l'aide la plus avantageuse s'applique.",
+        "exclusif": True,
+    },
+    # Aides de zone : mutuellement exclusives
+    "zones": {
+        "ids": ["zrr", "zfu", "qpv", "ber", "afr", "zrd"],
+        "regle": "Les exonerations de zone (ZRR, ZFU-TE, QPV, BER, AFR, ZRD) sont mutuellement exclusives. Une seule peut s'appliquer.",
+        "exclusif": True,
+    },
+    # Reduction generale (Fillon) vs exonerations specifiques
+    "fillon_vs_specifiques": {
+        "ids": ["fillon", "jei", "jeic", "acre", "zrr", "zfu", "qpv"],
+        "regle": "La reduction generale (ex-Fillon) n'est pas cumulable avec les exonerations specifiques (JEI, ACRE, exonerations de zone).",
+        "exclusif": True,
+    },
+}
+
+# Categorie d'aide -> critere de recherche qui la met en avant
+_CATEGORIE_CRITERE = {
+    "innovation": "innovation", "environnement": "environnement",
+    "numerique": "numerique", "export": "export",
+    "emploi": "formation", "creation": "creation",
+    "investissement": "investissement", "ess": "ess",
+    "fiscal": "innovation", "social": "formation",
+}
+
+# Change avec le catalogue : validateur des reponses conditionnelles
+VERSION_CATALOGUE = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+# ===================================================================
+# INDEX DES CRITERES D'ELIGIBILITE
+# ===================================================================
+
+def _par_valeur(criteres: list[Critere], attribut: str) -> tuple[int, dict[str, int]]:
+    """(masque des criteres sans condition sur l'attribut, valeur -> masque)."""
+    libres, index = 0, defaultdict(int)
+    for k, critere in enumerate(criteres):
+        valeurs = getattr(critere, attribut)
+        if not valeurs:
+            libres |= 1 << k
+        for valeur in valeurs:
+            index[valeur] |= 1 << k
+    return libres, dict(index)
+
+
+class IndexCatalogue:
+    """Criteres d'un catalogue compiles en masques de bits (un bit par Critere).
+
+    Pour chaque dimension indexee, l'ensemble des criteres compatibles avec
+    le profil est la reunion des criteres sans condition et de ceux qui
+    acceptent la valeur du profil ; les candidats sont l'intersection de
+    ces ensembles. Seules l'age et la forme juridique restent evalues
+    critere par critere.
+    """
+
+    def __init__(self, catalogue: list[dict]):
+        self.fiches: list[dict] = []
+        criteres: list[Critere] = []
+        self._aide_du_critere: list[int] = []
+        for i, aide in enumerate(catalogue):
+            fiche = dict(aide)
+            alternatives = fiche.pop("criteres")
+            if isinstance(alternatives, Critere):
+                alternatives = [alternatives]
+            self.fiches.append(fiche)
+            for critere in alternatives:
+                criteres.append(critere)
+                self._aide_du_critere.append(i)
+        self._criteres = criteres
+
+        # Tranches d'effectif delimitees par tous les seuils du catalogue :
+        # chaque critere accepte ou refuse une tranche entiere
+        self._seuils = sorted({s for c in criteres for s in (c.effectif_min, c.effectif_max) if s is not None})
+        representants = [self._seuils[0] - 1 if self._seuils else 0] + self._seuils
+        self._par_tranche = [
+            sum(1 << k for k, c in enumerate(criteres) if c.accepte_effectif(effectif))
+            for effectif in representants
+        ]
+        self._exige_theme: dict[str, int] = defaultdict(int)
+        for k, critere in enumerate(criteres):
+            for theme in critere.themes:
+                self._exige_theme[theme] |= 1 << k
+        self._naf = _par_valeur(criteres, "naf")
+        self._regions = _par_valeur(criteres, "regions")
+        self._zones = _par_valeur(criteres, "zones")
+        self._complements = sum(
+            1 << k for k, c in enumerate(criteres)
+            if c.age_min is not None or c.age_max is not None or c.formes
+        )
+
+    def indices_eligibles(self, profil: ProfilEntreprise) -> list[int]:
+        """Indices (ordre du catalogue) des aides eligibles pour le profil."""
+        candidats = self._par_tranche[bisect.bisect_right(self._seuils, profil.effectif)]
+        for (libres, index), valeur in (
+            (self._naf, profil.lettre_naf),
+            (self._regions, profil.region),
+            (self._zones, profil.zone),
+        ):
+            candidats &= libres | index.get(valeur, 0)
+        for theme, masque in self._exige_theme.items():
+            if not getattr(profil, theme):
+                candidats &= ~masque
+
+        retenues = set()
+        while candidats:
+            bit = candidats & -candidats
+            candidats ^= bit
+            k = bit.bit_length() - 1
+            if bit & self._complements and not self._criteres[k].accepte_complement(profil):
+                continue
+            retenues.add(self._aide_du_critere[k])
+        return sorted(retenues)
+
+    def aides_eligibles(self, profil: ProfilEntreprise) -> list[dict]:
+        """Copies des fiches eligibles, montant estime evalue pour le profil."""
+        aides = []
+        for i in self.indices_eligibles(profil):
+            aide = dict(self.fiches[i])
+            if callable(aide["montant_estime"]):
+                aide["montant_estime"] = aide["montant_estime"](profil)
+            aide["eligible"] = True
+            aides.append(aide)
+        return aides
+
+
+INDEX = IndexCatalogue(CATALOGUE)
+
+
+def _est_chiffre(montant: Any) -> bool:
+    return bool(montant) and isinstance(montant, (int, float))
+
+
+def rechercher_aides(profil: ProfilEntreprise) -> dict:
+    """Aides eligibles triees, regles de non-cumul et montants potentiels."""
+    aides_eligibles = INDEX.aides_eligibles(profil)
+    ids_eligibles = {a["id"] for a in aides_eligibles}
+
+    # Marquer les aides avec leurs incompatibilites
+    avertissements_non_cumul = []
+    for regle in REGLES_NON_CUMUL.values():
+        ids_concernes = [aid_id for aid_id in regle["ids"] if aid_id in ids_eligibles]
+        if len(ids_concernes) < 2:
+            continue
+        noms_concernes = [a["nom"] for a in aides_eligibles if a["id"] in ids_concernes]
+        avertissements_non_cumul.append({
+            "type": "non_cumul",
+            "regle": regle["regle"],
+            "aides_concernees": noms_concernes,
+            "exclusif": regle.get("exclusif", False),
+        })
+        for a in aides_eligibles:
+            if a["id"] in ids_concernes:
+                a.setdefault("avertissements", []).append(regle["regle"])
+                a["non_cumulable_avec"] = [n for n in noms_concernes if n != a["nom"]]
+
+    # Score de correspondance aux criteres utilisateur
+    criteres_actifs = {
+        critere for critere, actif in (
+            ("innovation", profil.innovation), ("environnement", profil.environnement),
+            ("numerique", profil.numerique), ("export", profil.export_intl),
+            ("formation", profil.formation), ("creation", profil.creation_reprise),
+            ("investissement", profil.investissement), ("ess", profil.ess),
+            ("zone", bool(profil.zone) and profil.zone != "metropole"),
+        ) if actif
+    }
+    for a in aides_eligibles:
+        score = 0
+        if _CATEGORIE_CRITERE.get(a.get("categorie", ""), "") in criteres_actifs:
+            score += 10
+        # Bonus si montant estime disponible
+        est = a.get("montant_estime")
+        if _est_chiffre(est) and est > 0:
+            score += 5
+        a["_score_criteres"] = score
+
+    # Tri par: score criteres (desc), montant estime (desc), priorite, nom
+    def _sort_key(a):
+        est = a.get("montant_estime")
+        montant = est if isinstance(est, (int, float)) else 0
+        return (-a.get("_score_criteres", 0), -montant, a.get("priorite", 5), a["nom"])
+
+    aides_eligibles.sort(key=_sort_key)
+
+    # Montant potentiel : brut, puis realiste (dans chaque groupe exclusif,
+    # seule l'aide la plus avantageuse est retenue)
+    chiffrees = [a for a in aides_eligibles if _est_chiffre(a.get("montant_estime"))]
+    montant_total_brut = sum(a["montant_estime"] for a in chiffrees)
+    montant_total_realiste = 0
+    groupes_exclusifs_traites = set()
+    exclusifs = [(nom, regle["ids"]) for nom, regle in REGLES_NON_CUMUL.items() if regle.get("exclusif")]
+    for a in chiffrees:
+        groupe = next(((nom, ids) for nom, ids in exclusifs if a["id"] in ids), None)
+        if groupe is None:
+            montant_total_realiste += a["montant_estime"]
+        elif groupe[0] not in groupes_exclusifs_traites:
+            montant_total_realiste += max(aa["montant_estime"] for aa in chiffrees if aa["id"] in groupe[1])
+            groupes_exclusifs_traites.add(groupe[0])
+
+    niveaux, categories, types = {}, {}, {}
+    for a in aides_eligibles:
+        niveaux[a["niveau"]] = niveaux.get(a["niveau"], 0) + 1
+        categories[a["categorie"]] = categories.get(a["categorie"], 0) + 1
+        types[a["type_aide"]] = types.get(a["type_aide"], 0) + 1
+
+    return {
+        "total": len(aides_eligibles),
+        "montant_potentiel_estime": round(montant_total_brut, 2),
+        "montant_potentiel_max_realiste": round(montant_total_realiste, 2),
+        "nb_aides_chiffrees": len(chiffrees),
+        "avertissement_cumul": (
+            "Attention : certaines aides ne sont pas cumulables entre elles. "
+            "Le montant potentiel max realiste tient compte de ces regles de non-cumul "
+            "et ne retient que l'aide la plus avantageuse dans chaque groupe exclusif."
+        ) if avertissements_non_cumul else None,
+        "regles_non_cumul": avertissements_non_cumul,
+        "par_niveau": niveaux,
+        "par_categorie": categories,
+        "par_type": types,
+        "aides": aides_eligibles,
+        "criteres_utilises": {
+            "code_naf": profil.code_naf,
+            "effectif": profil.effectif,
+            "forme_juridique": profil.forme_juridique,
+            "region": profil.region,
+            "zone": profil.zone,
+            "ca": profil.ca,
+            "age_entreprise": profil.age_entreprise,
+            "masse_salariale": profil.masse_salariale,
+            "innovation": profil.innovation,
+            "environnement": profil.environnement,
+            "numerique": profil.numerique,
+            "export": profil.export_intl,
+            "formation": profil.formation,
+            "creation_reprise": profil.creation_reprise,
+            "investissement": profil.investissement,
+            "ess": profil.ess,
+        },
+    }
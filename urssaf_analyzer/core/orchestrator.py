@@ -37,7 +37,12 @@ class Orchestrator:
         self.config = config or AppConfig()
         self.parser_factory = ParserFactory()
         self.report_generator = ReportGenerator()
-        self.audit = AuditLogger(self.config.audit_log_path)
+        self.audit = AuditLogger(
+            self.config.audit_log_path,
+            max_batch=self.config.security.audit_flush_batch,
+            flush_interval=self.config.security.audit_flush_interval,
+            fsync=self.config.security.audit_fsync,
+        )
         self.result = AnalysisResult()
 
     def analyser_documents(self, chemins: list[Path], format_rapport: str = "html") -> Path:
@@ -70,6 +75,7 @@ class Orchestrator:
                 self.audit.log_erreur(session_id, "import", str(e))
 
         if not documents:
+            self.audit.flush()
             raise URSSAFAnalyzerError("Aucun document n'a pu etre importe.")
 
         self.result.documents_analyses = documents
@@ -130,6 +136,8 @@ class Orchestrator:
             self.report_generator.generer_html(self.result, chemin_rapport)
 
         self.audit.log_rapport(session_id, format_rapport, str(chemin_rapport))
+        # Un seul vidage par analyse au lieu d'une ecriture par evenement
+        self.audit.flush()
         logger.info("Rapport genere : %s", chemin_rapport)
         logger.info("Analyse terminee en %.1f secondes.", self.result.duree_analyse_secondes)
 
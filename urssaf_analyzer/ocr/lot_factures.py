@@ -0,0 +1,207 @@
+"""Analyse de factures par lots (depot de fin de mois, archive zip).
+
+Chaque document est lu (texte natif ou OCR, LecteurMultiFormat) puis
+analyse par InvoiceDetector : classification, extraction des champs,
+detection des tiers et correction des montants. Ces etapes sont liees au
+CPU et tiennent le GIL : au-dela de quelques documents, elles sont
+reparties sur un pool de processus. Les resultats sont produits au fil
+de l'eau, dans l'ordre d'achevement, sous forme de dict serialisable
+(memes cles que /api/factures/analyser, plus `index` et `fichier`).
+"""
+
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from decimal import Decimal
+from pathlib import PurePosixPath
+from typing import Iterator, Optional
+
+from urssaf_analyzer.ocr.image_reader import LecteurMultiFormat
+from urssaf_analyzer.ocr.invoice_detector import InvoiceDetector, PieceComptable, TiersDetecte
+
+NB_PROCESSUS = int(os.getenv("NORMACHECK_FACTURES_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+SEUIL_POOL = 4  # en dessous, l'analyse reste dans le processus courant
+MAX_DOCUMENTS_LOT = 2000
+MAX_TAILLE_ZIP = 500 * 1024 * 1024  # octets decompresses
+
+TYPES_COMPTABILISABLES = ("facture_achat", "facture_vente", "avoir_achat", "avoir_vente")
+
+
+def _tiers_dict(tiers: TiersDetecte) -> dict:
+    return {"nom": tiers.nom, "siret": tiers.siret, "numero_tva": tiers.numero_tva}
+
+
+def piece_to_dict(piece: PieceComptable) -> dict:
+    """Serialise une piece analysee (cles attendues par l'interface)."""
+    return {
+        "type_document": piece.type_document.value,
+        "numero": piece.numero_piece,
+        "date_piece": piece.date_piece.isoformat() if piece.date_piece else "",
+        "date_echeance": piece.date_echeance.isoformat() if piece.date_echeance else "",
+        "emetteur": _tiers_dict(piece.emetteur),
+        "destinataire": _tiers_dict(piece.destinataire),
+        "montant_ht": float(piece.montant_ht),
+        "montant_tva": float(piece.montant_tva),
+        "montant_ttc": float(piece.montant_ttc),
+        "ventilation_tva": {taux: float(m) for taux, m in piece.ventilation_tva.items()},
+        "lignes": [
+            {"description": l.description, "quantite": float(l.quantite),
+             "prix_unitaire": float(l.prix_unitaire_ht), "montant_ht": float(l.montant_ht)}
+            for l in piece.lignes
+        ],
+        "mode_paiement": piece.mode_paiement,
+        "confiance": piece.confiance_extraction,
+        "champs_manuscrits": piece.champs_manuscrits,
+    }
+
+
+def analyser_facture(contenu: bytes, nom_fichier: str, entreprise_siret: str = "") -> dict:
+    """Lecture + analyse d'un document en memoire.
+
+    Fonction de module (serialisable par pickle) : c'est la tache executee
+    par les processus du pool.
+    """
+    lecture = LecteurMultiFormat().lire_contenu_brut(contenu, nom_fichier)
+    piece = InvoiceDetector(entreprise_siret).analyser_document(lecture.texte, nom_fichier)
+    resultat = piece_to_dict(piece)
+    resultat.update({
+        "ecriture_manuscrite": lecture.manuscrit_detecte or bool(piece.champs_manuscrits),
+        "est_scan": lecture.est_scan,
+        "confiance_ocr": lecture.confiance_ocr,
+        "avertissements": lecture.avertissements,
+    })
+    return resultat
+
+
+def documents_depuis_zip(contenu: bytes) -> list[tuple[str, bytes]]:
+    """Documents (nom, contenu) d'une archive zip.
+
+    Les repertoires, fichiers caches et metadonnees macOS sont ignores.
+    ValueError si l'archive est invalide ou depasse MAX_DOCUMENTS_LOT
+    documents ou MAX_TAILLE_ZIP octets decompresses (tailles declarees
+    verifiees a la lecture).
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(contenu))
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Archive zip invalide : {e}") from e
+    documents: list[tuple[str, bytes]] = []
+    reste = MAX_TAILLE_ZIP
+    with archive:
+        for info in archive.infolist():
+            chemin = PurePosixPath(info.filename.replace("\\", "/"))
+            if info.is_dir() or chemin.name.startswith(".") or "__MACOSX" in chemin.parts:
+                continue
+            if len(documents) >= MAX_DOCUMENTS_LOT:
+                raise ValueError(f"Archive limitee a {MAX_DOCUMENTS_LOT} documents.")
+            if info.file_size > reste:
+                raise ValueError(f"Archive limitee a {MAX_TAILLE_ZIP // (1024 * 1024)} Mo decompresses.")
+            with archive.open(info) as f:
+                donnees = f.read(reste + 1)
+            if len(donnees) > reste:
+                raise ValueError(f"Archive limitee a {MAX_TAILLE_ZIP // (1024 * 1024)} Mo decompresses.")
+            reste -= len(donnees)
+            documents.append((chemin.name, donnees))
+    return documents
+
+
+def ecriture_depuis_analyse(moteur, analyse: dict):
+    """Ecriture (non enregistree) d'une facture analysee, None si non comptabilisable.
+
+    Pieces retenues : factures et avoirs d'un montant TTC positif. Le tiers
+    est l'emetteur pour un achat, le destinataire pour une vente ; sans
+    date lue sur la piece, l'ecriture est datee du jour.
+    """
+    type_doc = analyse.get("type_document")
+    if type_doc not in TYPES_COMPTABILISABLES or not analyse.get("montant_ttc"):
+        return None
+    tiers = analyse["emetteur" if type_doc.endswith("achat") else "destinataire"]
+    date_piece = analyse.get("date_piece")
+    return moteur.generer_ecriture_facture(
+        type_doc=type_doc,
+        date_piece=date.fromisoformat(date_piece) if date_piece else date.today(),
+        numero_piece=analyse.get("numero", ""),
+        montant_ht=Decimal(str(analyse["montant_ht"])),
+        montant_tva=Decimal(str(analyse["montant_tva"])),
+        montant_ttc=Decimal(str(analyse["montant_ttc"])),
+        nom_tiers=tiers.get("nom", ""),
+        enregistrer=False,
+    )
+
+
+# Pool cree a la premiere utilisation, un par processus : sous gunicorn
+# (preload), un pool herite du maitre par fork serait inutilisable.
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid = 0
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        # spawn : pas de fork d'un processus multi-thread (serveur ASGI)
+        _pool = ProcessPoolExecutor(
+            max_workers=NB_PROCESSUS, mp_context=multiprocessing.get_context("spawn"),
+        )
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def _reinitialiser_pool() -> None:
+    global _pool
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def iter_analyse_lot(
+    documents: list[tuple[str, bytes]],
+    entreprise_siret: str = "",
+    parallele: Optional[bool] = None,
+) -> Iterator[dict]:
+    """Analyse les documents (nom, contenu) et produit un resultat par document.
+
+    Ordre d'achevement ; `index` donne le rang du document dans `documents`.
+    Un document en erreur produit {"index", "fichier", "erreur"} sans
+    interrompre le lot. Par defaut, le pool de processus n'est utilise
+    qu'a partir de SEUIL_POOL documents et NB_PROCESSUS > 1 ;
+    `parallele` force l'un ou l'autre mode.
+    """
+    if parallele is None:
+        parallele = NB_PROCESSUS > 1 and len(documents) >= SEUIL_POOL
+
+    if not parallele:
+        for index, (nom, contenu) in enumerate(documents):
+            try:
+                resultat = analyser_facture(contenu, nom, entreprise_siret)
+            except Exception as e:
+                resultat = {"erreur": str(e)}
+            yield {"index": index, "fichier": nom, **resultat}
+        return
+
+    pool = _get_pool()
+    futures = {
+        pool.submit(analyser_facture, contenu, nom, entreprise_siret): (index, nom)
+        for index, (nom, contenu) in enumerate(documents)
+    }
+    casse = False
+    try:
+        for future in as_completed(futures):
+            index, nom = futures[future]
+            try:
+                resultat = future.result()
+            except BrokenProcessPool:
+                casse = True
+                resultat = {"erreur": "Processus d'analyse interrompu"}
+            except Exception as e:
+                resultat = {"erreur": str(e) or type(e).__name__}
+            yield {"index": index, "fichier": nom, **resultat}
+    finally:
+        # Client deconnecte : ne pas laisser le reste du lot occuper le pool
+        for future in futures:
+            future.cancel()
+        if casse:
+            _reinitialiser_pool()
@@ -0,0 +1 @@
+"""Module RH - Alertes a echeances, index du planning et doublons de salaries."""
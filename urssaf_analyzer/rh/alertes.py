@@ -0,0 +1,1174 @@
+"""Alertes RH a echeances (index des echeances).
+
+Chaque regle d'alerte produit, pour un enregistrement RH, une echeance :
+une fenetre [debut, fin] de jours pendant laquelle l'alerte est active
+(CDD a 30 jours du terme, visite medicale en retard, periode d'essai...).
+Les echeances sont rangees dans deux tas (a venir par date d'ouverture,
+ouvertes par date de fermeture) : lister les alertes du jour est une
+requete sur l'intervalle courant, sans reparcourir les contrats.
+Mise a jour incrementale : a chaque nouvelle version des donnees (ecriture
+HTTP), seules les echeances des salaries dont les enregistrements ont
+change sont recalculees. Un rafraichissement quotidien (thread de fond)
+fait avancer l'index au changement de jour.
+Identifiants d'alerte stables : empreinte de la regle et de l'enregistrement.
+"""
+import hashlib
+import heapq
+import logging
+import math
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Hashable, Iterable, NamedTuple, Optional
+
+logger = logging.getLogger("normacheck")
+
+# Ordre de presentation des alertes (avant le tri par urgence)
+ORDRE_TYPES = (
+    "fin_cdd", "entretien_professionnel_retard", "entretien_professionnel_manquant",
+    "visite_medicale_retard", "visite_medicale_a_planifier",
+    "prevoyance_obligatoire", "mutuelle_obligatoire", "duerp_obligatoire", "registre_personnel",
+    "cse_obligatoire", "participation_obligatoire", "reglement_interieur", "index_egalite_pro",
+    "bilan_social", "formation_professionnelle", "das2_honoraires", "heures_supplementaires",
+    "conges_payes", "affichages_obligatoires", "entretien_professionnel",
+    "taxe_salaires", "contribution_formation", "participation_construction", "oeth_handicap",
+    "versement_mobilite", "forfait_social", "dsn_annuelle", "agirc_arrco", "remboursement_transport",
+    "nao", "bdese", "plan_mobilite", "referent_harcelement", "referent_securite",
+    "entretien_retour_absence", "vip_embauche", "retour_arret_imminent", "retour_conge",
+    "purge_sanction", "echeance_fiscale", "elections_cse_renouvellement", "rgpd_conformite",
+    "medaille_travail", "declaration_dsn_mensuelle", "dpae_a_effectuer", "fin_periode_essai",
+)
+_RANG = {t: i for i, t in enumerate(ORDRE_TYPES)}
+
+_UN_JOUR = timedelta(days=1)
+
+
+def id_alerte(*parties) -> str:
+    """Identifiant stable d'une alerte (meme regle, meme enregistrement -> meme id)."""
+    return hashlib.sha256("|".join(str(p) for p in parties).encode()).hexdigest()[:12]
+
+
+class Echeance(NamedTuple):
+    """Alerte active du jour `debut` au jour `fin` inclus."""
+
+    debut: date
+    fin: date
+    id: str
+    type: str
+    fabrique: Callable[[date], dict]  # jour -> contenu de l'alerte (sans id)
+
+    def alerte(self, jour: date) -> dict:
+        contenu = self.fabrique(jour)
+        if "titre" not in contenu and "message" in contenu:
+            contenu["titre"] = self.type.replace("_", " ").capitalize()
+        if "description" not in contenu and "message" in contenu:
+            contenu["description"] = contenu["message"]
+        return {"id": self.id, "type": self.type, **contenu}
+
+
+class IndexEcheances:
+    """Echeances regroupees (par salarie, sanction, annee...) et indexees par date.
+
+    `a_venir` : tas (debut, n) des echeances pas encore ouvertes ;
+    `ouvertes` : tas (fin, n) des echeances ouvertes, dont `actives` est
+    l'ensemble. Remplacer un groupe retire ses echeances (suppression
+    paresseuse dans les tas) et insere les nouvelles a leur place.
+    """
+
+    def __init__(self):
+        self._echeances: dict[int, Echeance] = {}
+        self._groupes: dict[Hashable, list[int]] = {}
+        self._a_venir: list[tuple[date, int]] = []
+        self._ouvertes: list[tuple[date, int]] = []
+        self._actives: set[int] = set()
+        self._jour: Optional[date] = None
+        self._n = 0
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._echeances)
+
+    def groupes(self) -> set:
+        return set(self._groupes)
+
+    def remplacer(self, groupe: Hashable, echeances: Iterable[Echeance]) -> None:
+        for n in self._groupes.pop(groupe, ()):
+            del self._echeances[n]
+            self._actives.discard(n)
+        nouveaux = []
+        for echeance in echeances:
+            self._n += 1
+            self._echeances[self._n] = echeance
+            self._placer(self._n, echeance)
+            nouveaux.append(self._n)
+        if nouveaux:
+            self._groupes[groupe] = nouveaux
+        self.version += 1
+        if len(self._a_venir) + len(self._ouvertes) > 2 * len(self._echeances) + 64:
+            self._compacter()
+
+    def _placer(self, n: int, echeance: Echeance) -> None:
+        if self._jour is None:
+            return
+        if echeance.debut > self._jour:
+            heapq.heappush(self._a_venir, (echeance.debut, n))
+        elif echeance.fin >= self._jour:
+            self._actives.add(n)
+            heapq.heappush(self._ouvertes, (echeance.fin, n))
+        # sinon : fenetre deja passee, ne se rouvrira pas
+
+    def _compacter(self) -> None:
+        self._a_venir = [e for e in self._a_venir if e[1] in self._echeances]
+        self._ouvertes = [e for e in self._ouvertes if e[1] in self._actives]
+        heapq.heapify(self._a_venir)
+        heapq.heapify(self._ouvertes)
+
+    def avancer(self, jour: date) -> None:
+        """Ouvre les echeances dont le debut est atteint, ferme celles qui sont passees."""
+        if jour == self._jour:
+            return
+        if self._jour is None or jour < self._jour:
+            # Premier positionnement (ou retour en arriere) : reconstruction
+            self._jour = jour
+            self._a_venir, self._ouvertes, self._actives = [], [], set()
+            for n, echeance in self._echeances.items():
+                self._placer(n, echeance)
+        else:
+            self._jour = jour
+            while self._a_venir and self._a_venir[0][0] <= jour:
+                _, n = heapq.heappop(self._a_venir)
+                echeance = self._echeances.get(n)
+                if echeance is not None and echeance.fin >= jour:
+                    self._actives.add(n)
+                    heapq.heappush(self._ouvertes, (echeance.fin, n))
+            while self._ouvertes and self._ouvertes[0][0] < jour:
+                self._actives.discard(heapq.heappop(self._ouvertes)[1])
+        self.version += 1
+
+    def actives(self, jour: date) -> list[Echeance]:
+        """Echeances actives le jour donne, dans l'ordre de presentation."""
+        self.avancer(jour)
+        echeances = [self._echeances[n] for n in self._actives]
+        echeances.sort(key=lambda e: (_RANG.get(e.type, len(_RANG)), e.fin, e.id))
+        return echeances
+
+
+# ======================================================================
+# REGLES - enregistrements d'un salarie
+# ======================================================================
+
+def _jour(valeur) -> date:
+    return date.fromisoformat(valeur)
+
+
+def _nom(contrats: list[dict], sid: str) -> str:
+    for c in contrats:
+        return f"{c['prenom_salarie']} {c['nom_salarie']}"
+    return sid
+
+
+def _regles(echeances: list, fabriquer: Callable[[], Iterable[Echeance]]) -> None:
+    # Enregistrement incomplet ou date invalide : regle ignoree (comme a la saisie)
+    try:
+        echeances.extend(fabriquer())
+    except (ValueError, TypeError, KeyError, OverflowError):
+        pass
+
+
+def echeances_salarie(sid: str, contrats: list[dict], entretiens: list[dict], visites: list[dict],
+                      arrets: list[dict], conges: list[dict]) -> list[Echeance]:
+    """Echeances des regles portant sur les enregistrements d'un salarie."""
+    echeances: list[Echeance] = []
+    actifs = [c for c in contrats if c.get("statut") == "actif"]
+    nom_complet = _nom(contrats, sid)
+
+    # --- 1. CDD arrivant a echeance dans les 30 jours ---
+    for contrat in contrats:
+        if contrat.get("type_contrat") == "CDD" and contrat.get("date_fin"):
+            _regles(echeances, lambda c=contrat: _fin_cdd(c))
+
+    # --- 2. Entretiens professionnels en retard (tous les 2 ans) ---
+    dates_entretiens = [e["date_entretien"] for e in entretiens
+                        if e.get("type_entretien") in ("professionnel_2ans", "bilan_6ans")]
+    dernier = max(dates_entretiens) if dates_entretiens else None
+    for contrat in actifs:
+        _regles(echeances, lambda c=contrat: _entretien_professionnel(c, dernier))
+
+    # --- 3. Visites medicales en retard ---
+    prochaines = [v["date_prochaine"] for v in visites if v.get("date_prochaine")]
+    if prochaines:
+        _regles(echeances, lambda: _visite_medicale(sid, nom_complet, min(prochaines)))
+
+    for contrat in actifs:
+        # 5p. Entretien de retour (apres absence longue)
+        for i, arret in enumerate(arrets):
+            if arret.get("date_fin"):
+                _regles(echeances, lambda c=contrat, a=arret, i=i: _retour_absence(c, a, i))
+        # 5q. Visite d'information et de prevention (VIP) embauche
+        if not visites:
+            _regles(echeances, lambda c=contrat: _vip_embauche(c))
+        # 5x. Medaille du travail (20, 30, 35, 40 ans)
+        if contrat.get("date_debut"):
+            _regles(echeances, lambda c=contrat: _medailles(c))
+        # 6. DPAE : avant toute embauche
+        _regles(echeances, lambda c=contrat: _dpae(c))
+        # 7. Periodes d'essai arrivant a echeance
+        if contrat.get("periode_essai_jours", 0) > 0:
+            _regles(echeances, lambda c=contrat: _fin_periode_essai(c))
+
+    # 5r. Arrets de travail en cours - suivi
+    for i, arret in enumerate(arrets):
+        if arret.get("date_fin") and arret.get("date_debut"):
+            _regles(echeances, lambda a=arret, i=i: _retour_arret(sid, nom_complet, a, i))
+
+    # 5s. Conges payes en cours - retour
+    for i, conge in enumerate(conges):
+        if conge.get("date_fin") and conge.get("statut") in ("valide", "accepte", "en_cours"):
+            _regles(echeances, lambda c=conge, i=i: _retour_conge(sid, nom_complet, c, i))
+    return echeances
+
+
+def _fin_cdd(contrat: dict):
+    fin = _jour(contrat["date_fin"])
+    message_debut = (
+        f"CDD de {contrat['prenom_salarie']} {contrat['nom_salarie']} "
+        f"({contrat['poste']}) expire dans "
+    )
+
+    def fabrique(jour):
+        jours_restants = (fin - jour).days
+        return {
+            "urgence": "haute" if jours_restants <= 7 else "moyenne",
+            "message": f"{message_debut}{jours_restants} jour(s) (le {contrat['date_fin']})",
+            "reference": "Art. L.1243-5 CT - Le CDD cesse de plein droit a l'echeance du terme",
+            "action_requise": "Renouveler, transformer en CDI, ou preparer les documents de fin de contrat",
+            "contrat_id": contrat["id"],
+            "date_echeance": contrat["date_fin"],
+        }
+    yield Echeance(fin - timedelta(days=30), fin, id_alerte("fin_cdd", contrat["id"], fin), "fin_cdd", fabrique)
+
+
+def _entretien_professionnel(contrat: dict, dernier: Optional[str]):
+    sid = contrat["salarie_id"]
+    nom = f"{contrat['prenom_salarie']} {contrat['nom_salarie']}"
+    if dernier:
+        date_dernier = _jour(dernier)
+
+        def fabrique(jour):
+            return {
+                "urgence": "haute",
+                "message": (
+                    f"Entretien professionnel en retard pour {nom} "
+                    f"- dernier entretien il y a {(jour - date_dernier).days} jours"
+                ),
+                "reference": "Art. L.6315-1 CT - Entretien professionnel tous les 2 ans",
+                "action_requise": "Planifier un entretien professionnel dans les meilleurs delais",
+                "salarie_id": sid,
+            }
+        type_alerte, depart = "entretien_professionnel_retard", date_dernier
+    else:
+        # Aucun entretien enregistre : alerte si le contrat a plus de 2 ans
+        date_debut = _jour(contrat["date_debut"])
+
+        def fabrique(jour):
+            return {
+                "urgence": "haute",
+                "message": (
+                    f"Aucun entretien professionnel enregistre pour {nom} "
+                    f"(anciennete: {(jour - date_debut).days} jours)"
+                ),
+                "reference": "Art. L.6315-1 CT - Entretien professionnel tous les 2 ans",
+                "action_requise": "Planifier un entretien professionnel immediatement",
+                "salarie_id": sid,
+            }
+        type_alerte, depart = "entretien_professionnel_manquant", date_debut
+    # Plus de 2 ans (730 jours) depuis le dernier entretien ou l'embauche
+    yield Echeance(depart + timedelta(days=731), date.max, id_alerte(type_alerte, contrat["id"], depart),
+                   type_alerte, fabrique)
+
+
+def _visite_medicale(sid: str, nom_complet: str, date_prochaine: str):
+    dp = _jour(date_prochaine)
+
+    def en_retard(jour):
+        return {
+            "urgence": "haute",
+            "message": (
+                f"Visite medicale en retard pour {nom_complet} "
+                f"(prevue le {date_prochaine}, retard: {(jour - dp).days} jour(s))"
+            ),
+            "reference": "Art. R.4624-16 CT - Suivi individuel de l'etat de sante",
+            "action_requise": "Prendre rendez-vous avec la medecine du travail",
+            "salarie_id": sid,
+        }
+
+    def a_planifier(jour):
+        return {
+            "urgence": "moyenne",
+            "message": (
+                f"Visite medicale a planifier pour {nom_complet} "
+                f"(echeance: {date_prochaine}, dans {(dp - jour).days} jour(s))"
+            ),
+            "reference": "Art. R.4624-16 CT",
+            "action_requise": "Prendre rendez-vous avec la medecine du travail",
+            "salarie_id": sid,
+        }
+    yield Echeance(dp + _UN_JOUR, date.max, id_alerte("visite_medicale_retard", sid, dp),
+                   "visite_medicale_retard", en_retard)
+    yield Echeance(dp - timedelta(days=30), dp, id_alerte("visite_medicale_a_planifier", sid, dp),
+                   "visite_medicale_a_planifier", a_planifier)
+
+
+def _retour_absence(contrat: dict, arret: dict, rang: int):
+    fin_arret = _jour(arret["date_fin"])
+    duree = (fin_arret - _jour(arret.get("date_debut", arret["date_fin"]))).days
+    if duree < 30:
+        return
+    contenu = {
+        "urgence": "haute",
+        "titre": f"Entretien de retour : {contrat['prenom_salarie']} {contrat['nom_salarie']}",
+        "description": (
+            f"Entretien de reprise obligatoire apres une absence de {duree} jours "
+            f"(retour le {arret['date_fin']}). Un entretien professionnel doit etre propose "
+            f"au salarie de retour d'un arret de travail d'au moins 30 jours."
+        ),
+        "reference": "Art. L.6315-1 CT - Art. R.4624-31 CT",
+        "action_requise": "Organiser l'entretien professionnel de reprise et la visite medicale de reprise",
+        "salarie_id": contrat.get("salarie_id"),
+    }
+    yield Echeance(fin_arret, fin_arret + timedelta(days=14),
+                   id_alerte("entretien_retour_absence", contrat["id"], arret.get("id", rang), fin_arret),
+                   "entretien_retour_absence", lambda jour: dict(contenu))
+
+
+def _vip_embauche(contrat: dict):
+    dd = _jour(contrat["date_debut"])
+
+    def fabrique(jour):
+        anciennete = (jour - dd).days
+        return {
+            "urgence": "haute" if anciennete > 60 else "moyenne",
+            "titre": f"VIP embauche : {contrat['prenom_salarie']} {contrat['nom_salarie']}",
+            "description": (
+                f"La visite d'information et de prevention (VIP) doit avoir lieu dans les 3 mois "
+                f"suivant la prise de poste. Embauche le {contrat['date_debut']} ({anciennete} jours). "
+                f"Suivi renforce si poste a risque."
+            ),
+            "reference": "Art. R.4624-10 CT",
+            "action_requise": "Prendre rendez-vous avec le service de prevention et sante au travail",
+            "salarie_id": contrat.get("salarie_id", ""),
+            "contrat_id": contrat["id"],
+        }
+    # Jusqu'a 3 mois (90 jours) apres l'embauche, tant qu'aucune visite n'est enregistree
+    yield Echeance(date.min, dd + timedelta(days=90), id_alerte("vip_embauche", contrat["id"]),
+                   "vip_embauche", fabrique)
+
+
+def _medailles(contrat: dict):
+    dd = _jour(contrat["date_debut"])
+    for seuil in (20, 30, 35, 40):
+        # Anciennete (jours / 365.25) a six mois au plus du seuil
+        debut = dd + timedelta(days=math.ceil((seuil - 0.5) * 365.25))
+        fin = dd + timedelta(days=math.floor((seuil + 0.5) * 365.25))
+        contenu = {
+            "urgence": "info",
+            "titre": f"Medaille du travail : {contrat['prenom_salarie']} {contrat['nom_salarie']} ({seuil} ans)",
+            "description": (
+                f"Eligible a la medaille du travail ({seuil} ans de service). "
+                f"Gratification facultative exoneree dans la limite d'un mois de salaire."
+            ),
+            "reference": "Decret n2000-1015 du 17/10/2000",
+            "salarie_id": contrat.get("salarie_id"),
+        }
+        yield Echeance(debut, fin, id_alerte("medaille_travail", contrat["id"], seuil),
+                       "medaille_travail", lambda jour, c=contenu: dict(c))
+
+
+def _dpae(contrat: dict):
+    dd = _jour(contrat["date_debut"])
+    contenu = {
+        "urgence": "haute",
+        "message": (
+            f"DPAE a effectuer pour {contrat['prenom_salarie']} {contrat['nom_salarie']} "
+            f"avant le {contrat['date_debut']}"
+        ),
+        "reference": "Art. L.1221-10 CT - DPAE au plus tard dans les 8 jours precedant l'embauche",
+        "action_requise": "Effectuer la DPAE aupres de l'URSSAF",
+        "contrat_id": contrat["id"],
+    }
+    yield Echeance(dd - timedelta(days=8), dd, id_alerte("dpae_a_effectuer", contrat["id"], dd),
+                   "dpae_a_effectuer", lambda jour: dict(contenu))
+
+
+def _fin_periode_essai(contrat: dict):
+    fin_pe = _jour(contrat["date_debut"]) + timedelta(days=contrat["periode_essai_jours"])
+
+    def fabrique(jour):
+        jours_restants_pe = (fin_pe - jour).days
+        return {
+            "urgence": "haute" if jours_restants_pe <= 3 else "moyenne",
+            "message": (
+                f"Periode d'essai de {contrat['prenom_salarie']} {contrat['nom_salarie']} "
+                f"se termine dans {jours_restants_pe} jour(s) (le {fin_pe.isoformat()})"
+            ),
+            "reference": "Art. L.1221-19 et suivants CT",
+            "action_requise": "Confirmer l'embauche ou notifier la rupture de la periode d'essai",
+            "contrat_id": contrat["id"],
+        }
+    yield Echeance(fin_pe - timedelta(days=14), fin_pe, id_alerte("fin_periode_essai", contrat["id"], fin_pe),
+                   "fin_periode_essai", fabrique)
+
+
+def _retour_arret(sid: str, nom_complet: str, arret: dict, rang: int):
+    debut, fin = _jour(arret["date_debut"]), _jour(arret["date_fin"])
+    duree = (fin - debut).days
+
+    def fabrique(jour):
+        jours_restants = (fin - jour).days
+        return {
+            "urgence": "moyenne",
+            "titre": f"Retour d'arret imminent : {nom_complet}",
+            "description": (
+                f"Fin de l'arret prevue le {arret['date_fin']} (dans {jours_restants} jour(s)). "
+                f"Duree totale: {duree} jours. "
+                + ("Visite de reprise obligatoire (arret > 30 jours)." if duree >= 30 else "")
+            ),
+            "reference": "Art. R.4624-31 CT" if duree >= 30 else "",
+            "action_requise": "Preparer la reprise" + (" et planifier la visite medicale de reprise" if duree >= 30 else ""),
+            "salarie_id": arret.get("salarie_id"),
+        }
+    # Arret en cours, fin dans 7 jours au plus
+    yield Echeance(max(debut, fin - timedelta(days=7)), fin,
+                   id_alerte("retour_arret_imminent", sid, arret.get("id", rang), fin),
+                   "retour_arret_imminent", fabrique)
+
+
+def _retour_conge(sid: str, nom_complet: str, conge: dict, rang: int):
+    fin_conge = _jour(conge["date_fin"])
+
+    def fabrique(jour):
+        return {
+            "urgence": "info",
+            "titre": f"Retour de conge : {nom_complet}",
+            "description": f"Retour prevu le {conge['date_fin']} (dans {(fin_conge - jour).days} jour(s)).",
+            "salarie_id": sid,
+        }
+    yield Echeance(fin_conge - timedelta(days=3), fin_conge,
+                   id_alerte("retour_conge", sid, conge.get("id", rang), fin_conge), "retour_conge", fabrique)
+
+
+def echeances_sanction(sanction: dict, rang: int) -> list[Echeance]:
+    """5t. Sanction disciplinaire proche de la prescription de 3 ans (purge du dossier)."""
+    echeances: list[Echeance] = []
+
+    def fabriquer():
+        date_sanction = _jour(sanction["date_notification"])
+        contenu = {
+            "urgence": "info",
+            "titre": f"Sanction a purger : {sanction.get('nom_salarie', '')}",
+            "description": (
+                f"La sanction du {sanction['date_notification']} ne peut plus etre invoquee "
+                f"(prescription de 3 ans - art. L.1332-5 CT). Elle doit etre retiree du dossier."
+            ),
+            "reference": "Art. L.1332-5 CT",
+            "action_requise": "Retirer la sanction du dossier disciplinaire du salarie",
+        }
+        yield Echeance(date_sanction + timedelta(days=1060), date_sanction + timedelta(days=1100),
+                       id_alerte("purge_sanction", sanction.get("id", rang), date_sanction),
+                       "purge_sanction", lambda jour: dict(contenu))
+
+    if sanction.get("date_notification"):
+        _regles(echeances, fabriquer)
+    return echeances
+
+
+# ======================================================================
+# REGLES - obligations selon l'effectif et echeances calendaires
+# ======================================================================
+
+def _obligations(nb_actifs: int, annee: int, das2: bool) -> list[dict]:
+    """Obligations legales selon l'effectif actif, valables toute l'annee."""
+    alertes = []
+    # --- 4. Obligations legales selon effectif ---
+    # 4a. Prevoyance obligatoire cadres (ANI 17/11/2017)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "prevoyance_obligatoire",
+            "urgence": "moyenne",
+            "titre": "Prevoyance obligatoire cadres",
+            "description": f"La prevoyance deces est obligatoire pour tous les cadres (ANI du 17/11/2017). Effectif actif: {nb_actifs}. Le non-respect expose l'employeur a la prise en charge des garanties sur ses fonds propres.",
+            "reference": "ANI du 17/11/2017 - Art. 7 CCN Cadres du 14/03/1947",
+            "action_requise": "Verifier la mise en place d'un contrat de prevoyance aupres d'un organisme assureur",
+            "echeance": "",
+            "incidence_legale": "En l'absence de contrat, l'employeur doit assumer sur ses fonds propres le versement du capital deces (3x plafond annuel SS) et le maintien de salaire.",
+        })
+
+    # 4b. Mutuelle obligatoire (ANI 14/06/2013 - Loi 2016)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "mutuelle_obligatoire",
+            "urgence": "moyenne",
+            "titre": "Complementaire sante obligatoire",
+            "description": f"Depuis le 01/01/2016, tous les employeurs doivent proposer une couverture complementaire sante collective. Part employeur min 50%. Effectif: {nb_actifs}.",
+            "reference": "Art. L.911-7 CSS - ANI du 11/01/2013 generalise par loi du 14/06/2013",
+            "action_requise": "Verifier la mise en place d'une complementaire sante avec participation employeur >= 50%",
+            "echeance": "",
+            "incidence_legale": "Amende et redressement URSSAF sur les contributions patronales (reintegration dans l'assiette de cotisations).",
+        })
+
+    # 4c. DUERP obligatoire (art. R.4121-1 CT)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "duerp_obligatoire",
+            "urgence": "moyenne",
+            "titre": "Document unique d'evaluation des risques (DUERP)",
+            "description": "Le DUERP est obligatoire des le 1er salarie. Mise a jour annuelle ou lors de tout changement significatif.",
+            "reference": "Art. R.4121-1 a R.4121-4 CT - Art. L.4121-3 CT",
+            "action_requise": "Verifier l'existence et la mise a jour du DUERP",
+            "echeance": "",
+            "incidence_legale": "Contravention de 5eme classe (1500 EUR). Responsabilite penale en cas d'accident du travail.",
+        })
+
+    # 4d. Registre unique du personnel (art. L.1221-13 CT)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "registre_personnel",
+            "urgence": "info",
+            "titre": "Registre unique du personnel",
+            "description": "Le registre unique du personnel est obligatoire des le 1er salarie. Doit mentionner nom, prenom, nationalite, emploi, qualification, dates d'entree et sortie.",
+            "reference": "Art. L.1221-13 CT",
+            "action_requise": "Verifier la tenue a jour du registre unique du personnel",
+            "echeance": "",
+            "incidence_legale": "Contravention de 4eme classe (750 EUR par salarie concerne).",
+        })
+
+    # 4e. CSE obligatoire si >= 11 salaries (art. L.2311-2 CT)
+    if nb_actifs >= 11:
+        alertes.append({
+            "type": "cse_obligatoire",
+            "urgence": "moyenne",
+            "titre": "Comite social et economique (CSE)",
+            "description": f"Le CSE est obligatoire dans les entreprises d'au moins 11 salaries pendant 12 mois consecutifs. Effectif: {nb_actifs}.",
+            "reference": "Art. L.2311-2 CT",
+            "action_requise": "Organiser les elections du CSE si non fait",
+            "echeance": "",
+            "incidence_legale": "Delit d'entrave (art. L.2317-1 CT) : 1 an d'emprisonnement et 7500 EUR d'amende.",
+        })
+
+    # 4f. Participation obligatoire si >= 50 salaries
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "participation_obligatoire",
+            "urgence": "moyenne",
+            "titre": "Accord de participation obligatoire",
+            "description": f"Participation aux resultats obligatoire pour les entreprises >= 50 salaries. Effectif: {nb_actifs}.",
+            "reference": "Art. L.3322-2 CT",
+            "action_requise": "Verifier la mise en place d'un accord de participation",
+            "echeance": "",
+            "incidence_legale": "Perte des exonerations sociales et fiscales sur l'ensemble de l'epargne salariale.",
+        })
+
+    # 4g. Reglement interieur obligatoire si >= 50 salaries
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "reglement_interieur",
+            "urgence": "moyenne",
+            "titre": "Reglement interieur obligatoire",
+            "description": f"Le reglement interieur est obligatoire dans les entreprises >= 50 salaries. Effectif: {nb_actifs}.",
+            "reference": "Art. L.1311-2 CT",
+            "action_requise": "Verifier l'existence et la conformite du reglement interieur",
+            "echeance": "",
+            "incidence_legale": "Sanctions disciplinaires potentiellement inopposables aux salaries.",
+        })
+
+    # 4h. Index egalite pro si >= 50 salaries
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "index_egalite_pro",
+            "urgence": "moyenne",
+            "titre": "Index egalite professionnelle",
+            "description": f"Publication obligatoire de l'index egalite femmes-hommes avant le 1er mars. Effectif: {nb_actifs}.",
+            "reference": "Art. L.1142-8 CT - Decret n2019-15 du 08/01/2019",
+            "action_requise": "Calculer et publier l'index egalite professionnelle",
+            "echeance": "01 mars de chaque annee",
+            "incidence_legale": "Penalite financiere jusqu'a 1% de la masse salariale.",
+        })
+
+    # 4i. Bilan social si >= 300 salaries
+    if nb_actifs >= 300:
+        alertes.append({
+            "type": "bilan_social",
+            "urgence": "info",
+            "titre": "Bilan social obligatoire",
+            "description": f"Bilan social obligatoire pour les entreprises >= 300 salaries. Effectif: {nb_actifs}.",
+            "reference": "Art. L.2312-28 CT",
+            "action_requise": "Etablir et presenter le bilan social au CSE",
+            "echeance": "",
+        })
+
+    # 4j. Formation professionnelle
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "formation_professionnelle",
+            "urgence": "info",
+            "titre": "Plan de developpement des competences",
+            "description": "L'employeur a l'obligation d'assurer l'adaptation des salaries a leur poste de travail et de veiller au maintien de leur capacite a occuper un emploi.",
+            "reference": "Art. L.6321-1 CT",
+            "action_requise": "Verifier le plan de developpement des competences et le financement formation",
+            "echeance": "",
+        })
+
+    # 4k. DAS-2 (honoraires > 2400 EUR/beneficiaire/an)
+    if das2:
+        alertes.append({
+            "type": "das2_honoraires",
+            "urgence": "moyenne",
+            "titre": "DAS-2 : declaration des honoraires",
+            "description": (
+                "Tout versement d'honoraires, commissions, courtages, ristournes "
+                "superieurs a 2400 EUR par beneficiaire et par an doit etre declare "
+                "via la DAS-2 avant le 28 fevrier de l'annee suivante."
+            ),
+            "reference": "CGI art. 241 a 243-bis - CSS art. L.133-5-3",
+            "action_requise": "Verifier le montant cumule des honoraires verses par beneficiaire et deposer la DAS-2",
+            "echeance": f"{annee + 1}-02-28",
+            "incidence_legale": "Amende de 50% des sommes non declarees (art. 1736 CGI). Majoration 50% si retard > 1 mois.",
+        })
+
+    # 4l. Heures supplementaires - contingent annuel 220h
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "heures_supplementaires",
+            "urgence": "info",
+            "titre": "Contingent annuel d'heures supplementaires (220h)",
+            "description": (
+                "Le contingent annuel d'heures supplementaires est fixe a 220 heures par salarie. "
+                "Au-dela, chaque heure supplementaire ouvre droit a une contrepartie obligatoire en repos (COR). "
+                "Majorations: +25% pour les 8 premieres heures/semaine, +50% au-dela."
+            ),
+            "reference": "Art. L.3121-30 a L.3121-33 CT - Art. D.3121-24 CT",
+            "action_requise": "Verifier le decompte individuel des heures supplementaires et les majorations appliquees",
+            "incidence_legale": "Rappel de salaire sur 3 ans + dommages et interets pour non-respect du repos compensateur.",
+        })
+
+    # 4m. Conges payes - accumulation et prise
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "conges_payes",
+            "urgence": "info",
+            "titre": "Conges payes : droits et prise effective",
+            "description": (
+                "Chaque salarie acquiert 2,5 jours ouvrables de conges par mois (30 jours/an). "
+                "L'employeur doit permettre la prise des conges et verifier leur effectivite. "
+                "Le calcul de l'indemnite se fait au maintien de salaire ou au 1/10eme (le plus favorable)."
+            ),
+            "reference": "Art. L.3141-1 a L.3141-31 CT",
+            "action_requise": "Verifier le solde de conges de chaque salarie et planifier les periodes de prise",
+            "incidence_legale": "Indemnite compensatrice de conges non pris due au depart du salarie.",
+        })
+
+    # 4n. Affichages obligatoires
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "affichages_obligatoires",
+            "urgence": "info",
+            "titre": "Affichages obligatoires dans les locaux",
+            "description": (
+                "L'employeur doit afficher: horaires de travail, convention collective applicable, "
+                "coordonnees inspection du travail, consignes de securite, interdiction de fumer, "
+                "lutte contre le harcelement moral et sexuel, egalite de remuneration H/F."
+            ),
+            "reference": "Art. L.1321-1 et suivants CT - Art. R.4227-34 CT",
+            "action_requise": "Verifier la presence des affichages obligatoires dans tous les locaux",
+            "incidence_legale": "Contravention de 3e a 5e classe selon l'affichage manquant (750 a 1500 EUR).",
+        })
+
+    # 4o. Entretien professionnel bisannuel
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "entretien_professionnel",
+            "urgence": "moyenne",
+            "titre": "Entretien professionnel bisannuel",
+            "description": (
+                "L'entretien professionnel est obligatoire tous les 2 ans pour chaque salarie. "
+                "Un bilan recapitulatif doit etre fait tous les 6 ans. "
+                "Il porte sur les perspectives d'evolution professionnelle et les actions de formation."
+            ),
+            "reference": "Art. L.6315-1 CT",
+            "action_requise": "Verifier la planification des entretiens professionnels pour chaque salarie",
+            "incidence_legale": "Abondement correctif CPF de 3000 EUR par salarie si non-realise dans les 6 ans (entreprises >= 50 sal.).",
+        })
+
+    # --- 5. ECHEANCES LEGALES CALENDAIRES ---
+    # 5a. Taxe sur les salaires (entreprises non assujetties TVA)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "taxe_salaires",
+            "urgence": "info",
+            "titre": "Taxe sur les salaires (si non assujetti TVA)",
+            "description": (
+                "Les employeurs non soumis a la TVA ou partiellement doivent declarer et payer "
+                "la taxe sur les salaires. Baremes progressifs : 4.25%, 8.50%, 13.60%. "
+                "Paiement mensuel (>10 000 EUR/an), trimestriel (4 000-10 000 EUR) ou annuel."
+            ),
+            "reference": "CGI art. 231 a 231 bis V",
+            "action_requise": "Verifier l'assujettissement TVA et le cas echeant declarer la taxe sur les salaires",
+            "echeance": f"15 janvier {annee + 1}",
+            "incidence_legale": "Majoration de 10% pour defaut de declaration, 5% pour retard de paiement.",
+        })
+
+    # 5b. Contribution formation professionnelle et taxe apprentissage (via DSN depuis 2022)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "contribution_formation",
+            "urgence": "moyenne",
+            "titre": "Contribution formation professionnelle et taxe d'apprentissage",
+            "description": (
+                f"Depuis 2022, la contribution a la formation professionnelle (0.55% si <11 sal., 1% au-dela) "
+                f"et la taxe d'apprentissage (0.68%) sont collectees mensuellement via la DSN par l'URSSAF. "
+                f"Le solde de la taxe d'apprentissage (0.09%) est verse directement aux etablissements eligibles."
+            ),
+            "reference": "Art. L.6131-1 et L.6241-1 CT - Loi Avenir professionnel du 05/09/2018",
+            "action_requise": "Verifier le paiement via DSN et le versement du solde de la TA aux organismes eligibles",
+            "echeance": "Mensuel (DSN) + solde TA avant le 31 mai",
+            "incidence_legale": "Majoration de 100% de l'insuffisance constatee (art. L.6252-4 CT).",
+        })
+
+    # 5c. Participation construction (effort construction) >= 50 salaries
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "participation_construction",
+            "urgence": "moyenne",
+            "titre": "Participation a l'effort de construction (PEEC)",
+            "description": (
+                f"Les entreprises >= 50 salaries doivent investir 0.45% de la masse salariale N-1 dans "
+                f"le logement des salaries via un organisme collecteur (Action Logement). Effectif: {nb_actifs}."
+            ),
+            "reference": "Art. L.313-1 CCH",
+            "action_requise": "Verifier le versement a Action Logement avant le 31 decembre",
+            "echeance": f"{annee}-12-31",
+            "incidence_legale": "Cotisation de 2% de la masse salariale en cas de non-versement (art. L.313-4 CCH).",
+        })
+
+    # 5d. AGEFIPH - Obligation emploi travailleurs handicapes >= 20 salaries
+    if nb_actifs >= 20:
+        alertes.append({
+            "type": "oeth_handicap",
+            "urgence": "moyenne",
+            "titre": "Obligation d'emploi de travailleurs handicapes (OETH)",
+            "description": (
+                f"Les entreprises >= 20 salaries doivent employer au moins 6% de travailleurs handicapes. "
+                f"Effectif actif: {nb_actifs}, objectif: {max(1, round(nb_actifs * 0.06))} TH. "
+                f"Declaration annuelle via la DSN."
+            ),
+            "reference": "Art. L.5212-1 et suivants CT",
+            "action_requise": "Verifier le taux d'emploi de TH et la declaration OETH via DSN",
+            "echeance": "Declaration annuelle via DSN de mars",
+            "incidence_legale": f"Contribution AGEFIPH : environ {max(1, round(nb_actifs * 0.06))} x 400 a 600 SMIC horaire/an selon effort.",
+        })
+
+    # 5e. Versement mobilite (transport) >= 11 salaries
+    if nb_actifs >= 11:
+        alertes.append({
+            "type": "versement_mobilite",
+            "urgence": "info",
+            "titre": "Versement mobilite (ex-versement transport)",
+            "description": (
+                f"Le versement mobilite est du par les entreprises >= 11 salaries. "
+                f"Taux variable selon la zone (0.55% a 2.95% en IDF). Effectif: {nb_actifs}."
+            ),
+            "reference": "Art. L.2333-64 CGCT",
+            "action_requise": "Verifier le taux applicable selon la zone et le paiement via DSN",
+        })
+
+    # 5f. Forfait social sur epargne salariale
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "forfait_social",
+            "urgence": "info",
+            "titre": "Forfait social sur epargne salariale",
+            "description": (
+                "Le forfait social de 20% s'applique sur l'interessement, la participation, "
+                "l'abondement PEE pour les entreprises >= 50 salaries. "
+                "Exoneration pour les entreprises < 50 salaries."
+            ),
+            "reference": "Art. L.137-15 et L.137-16 CSS",
+            "action_requise": "Verifier le calcul et le paiement du forfait social sur les sommes versees",
+        })
+
+    # 5g (DAS-2) : voir 4k ; 5h (DSN annuelle) : voir echeances_annee
+
+    # 5i. Cotisations retraite complementaire AGIRC-ARRCO
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "agirc_arrco",
+            "urgence": "info",
+            "titre": "Cotisations retraite complementaire AGIRC-ARRCO",
+            "description": (
+                "Cotisations obligatoires : Tranche 1 (jusqu'a 1 PASS) 7.87% dont 3.15% salarial. "
+                "Tranche 2 (1 a 8 PASS) 21.59% dont 8.64% salarial. "
+                "Paiement mensuel ou trimestriel (< 10 salaries)."
+            ),
+            "reference": "ANI du 17/11/2017 - Accord AGIRC-ARRCO",
+            "action_requise": "Verifier les declarations et paiements AGIRC-ARRCO",
+        })
+
+    # 5j. Remboursement des frais de transport (50% abonnement)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "remboursement_transport",
+            "urgence": "info",
+            "titre": "Prise en charge obligatoire des frais de transport",
+            "description": (
+                "L'employeur doit prendre en charge 50% du prix des abonnements de transports "
+                "publics (metro, bus, train, velo). Egalement le forfait mobilites durables "
+                "(velo, covoiturage) jusqu'a 800 EUR/an net d'impot."
+            ),
+            "reference": "Art. L.3261-2 CT et Art. L.3261-3-1 CT",
+            "action_requise": "Verifier la prise en charge des abonnements transport et le forfait mobilites durables",
+            "incidence_legale": "Amende de 3750 EUR par salarie concerne (art. R.3261-1 CT).",
+        })
+
+    # 5k. NAO (Negociation Annuelle Obligatoire) >= 50 salaries
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "nao",
+            "urgence": "moyenne",
+            "titre": "Negociation Annuelle Obligatoire (NAO)",
+            "description": (
+                f"L'employeur doit engager chaque annee une negociation sur la remuneration, "
+                f"le temps de travail, le partage de la valeur ajoutee et l'egalite professionnelle. "
+                f"Effectif: {nb_actifs}."
+            ),
+            "reference": "Art. L.2242-1 et suivants CT",
+            "action_requise": "Convoquer les delegues syndicaux pour l'ouverture de la NAO",
+            "echeance": "Annuelle",
+            "incidence_legale": "Delit d'entrave : 1 an d'emprisonnement et 3750 EUR d'amende (art. L.2243-1 CT).",
+        })
+
+    # 5l. BDESE (Base de Donnees Economiques, Sociales et Environnementales) >= 50 sal
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "bdese",
+            "urgence": "moyenne",
+            "titre": "BDESE (Base de Donnees Economiques, Sociales et Environnementales)",
+            "description": (
+                f"La BDESE doit etre mise a disposition du CSE et mise a jour annuellement. "
+                f"Contient les informations sur 6 ans (investissements, egalite, flux financiers, "
+                f"remuneration, fonds propres, consequences environnementales). Effectif: {nb_actifs}."
+            ),
+            "reference": "Art. L.2312-18 et R.2312-7 CT - Loi Climat et Resilience 2021",
+            "action_requise": "Verifier la mise a jour annuelle de la BDESE",
+            "incidence_legale": "Delit d'entrave (7500 EUR d'amende).",
+        })
+
+    # 5m. Plan de mobilite >= 50 salaries sur un meme site
+    if nb_actifs >= 50:
+        alertes.append({
+            "type": "plan_mobilite",
+            "urgence": "info",
+            "titre": "Plan de mobilite employeur",
+            "description": (
+                f"Les entreprises regroupant >= 50 salaries sur un meme site doivent elaborer "
+                f"un plan de mobilite employeur. Effectif: {nb_actifs}."
+            ),
+            "reference": "Art. L.1214-8-2 Code des transports - Loi LOM du 24/12/2019",
+            "action_requise": "Elaborer ou mettre a jour le plan de mobilite",
+        })
+
+    # 5n. Referent harcelement CSE + employeur
+    if nb_actifs >= 11:
+        alertes.append({
+            "type": "referent_harcelement",
+            "urgence": "info",
+            "titre": "Designation d'un referent harcelement sexuel",
+            "description": (
+                "Le CSE doit designer un referent harcelement sexuel parmi ses membres. "
+                "Dans les entreprises >= 250 salaries, l'employeur doit aussi designer un referent charge "
+                "d'orienter, informer et accompagner les salaries."
+            ),
+            "reference": "Art. L.1153-5-1 CT et Art. L.2314-1 CT",
+            "action_requise": "Verifier la designation du/des referent(s) harcelement",
+        })
+
+    # 5o. Referent securite (personne competente prevention risques)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "referent_securite",
+            "urgence": "info",
+            "titre": "Designation d'un referent securite / prevention",
+            "description": (
+                "L'employeur doit designer un ou plusieurs salaries competents pour s'occuper "
+                "des activites de protection et de prevention des risques professionnels. "
+                "A defaut, il peut faire appel a des intervenants exterieurs (IPRP)."
+            ),
+            "reference": "Art. L.4644-1 CT",
+            "action_requise": "Verifier la designation du salarie competent en prevention",
+        })
+
+    # 5v. Elections CSE - renouvellement tous les 4 ans
+    if nb_actifs >= 11:
+        alertes.append({
+            "type": "elections_cse_renouvellement",
+            "urgence": "info",
+            "titre": "Renouvellement du CSE (tous les 4 ans)",
+            "description": (
+                "Le mandat des elus du CSE est de 4 ans. L'employeur doit organiser les elections "
+                "de renouvellement et informer les organisations syndicales au moins 2 mois avant l'expiration."
+            ),
+            "reference": "Art. L.2314-33 et L.2314-4 CT",
+            "action_requise": "Verifier la date de fin des mandats CSE et anticiper l'organisation des elections",
+        })
+
+    # 5w. Protection des donnees (RGPD / DPO)
+    if nb_actifs >= 1:
+        alertes.append({
+            "type": "rgpd_conformite",
+            "urgence": "info",
+            "titre": "Conformite RGPD - Protection des donnees personnelles",
+            "description": (
+                "L'employeur traite des donnees personnelles de ses salaries (paie, sante, evaluations). "
+                "Registre des traitements obligatoire. DPO obligatoire si plus de 250 salaries ou "
+                "traitement de donnees sensibles a grande echelle."
+            ),
+            "reference": "RGPD art. 30, 37 - Loi Informatique et Libertes (CNIL)",
+            "action_requise": "Verifier le registre des traitements, les clauses contractuelles et la designation DPO si necessaire",
+        })
+    return alertes
+
+
+# 5u. Echeances fiscales calendaires (mois, jour, titre, description, reference)
+ECHEANCES_FISCALES = (
+    (1, 15, "TVA mensuelle", "Declarer et payer la TVA du mois precedent (regime mensuel)", "CGI art. 287"),
+    (1, 15, "Acompte IS 1er trimestre", "Verser le 1er acompte d'IS (15% ou 25% de l'IS N-1)", "CGI art. 1668"),
+    (2, 28, "DAS-2 Honoraires", "Declarer les honoraires verses > 2400 EUR/beneficiaire/an", "CGI art. 240"),
+    (3, 1, "Index egalite pro", "Publier l'index d'egalite professionnelle F/H", "Art. L.1142-8 CT"),
+    (3, 31, "Contribution AGEFIPH", "Declaration OETH via DSN de mars", "Art. L.5212-5 CT"),
+    (4, 15, "Acompte IS 2eme trimestre", "Verser le 2e acompte d'IS", "CGI art. 1668"),
+    (5, 31, "Solde taxe apprentissage", "Verser le solde de la taxe d'apprentissage (0.09%)", "Art. L.6241-2 CT"),
+    (5, 15, "Liasse fiscale / IS", "Deposer la liasse fiscale et payer le solde d'IS", "CGI art. 223"),
+    (6, 15, "Acompte IS 3eme trimestre", "Verser le 3e acompte d'IS", "CGI art. 1668"),
+    (12, 15, "Acompte IS 4eme trimestre", "Verser le 4e acompte d'IS", "CGI art. 1668"),
+    (12, 31, "PEEC (Action Logement)", "Verser la participation construction 0.45%", "Art. L.313-1 CCH"),
+)
+
+
+def echeances_annee(annee: int, nb_actifs: int, das2: bool) -> list[Echeance]:
+    """Echeances calendaires d'une annee : obligations, DSN, echeances fiscales."""
+    echeances: list[Echeance] = []
+    premier_janvier, fin_annee = date(annee, 1, 1), date(annee, 12, 31)
+
+    # Obligations selon l'effectif : actives toute l'annee
+    for obligation in _obligations(nb_actifs, annee, das2):
+        echeances.append(Echeance(premier_janvier, fin_annee, id_alerte(obligation["type"], annee),
+                                  obligation["type"], lambda jour, o=obligation: dict(o)))
+
+    # 5h. Declaration des effectifs (DADS/DSN annuelle) : janvier et fevrier
+    if nb_actifs >= 1:
+        contenu_dsn = {
+            "urgence": "haute",
+            "titre": "DSN evenementielle annuelle (bilan)",
+            "description": (
+                "La DSN de janvier doit inclure les donnees de bilan annuel : effectifs, "
+                "masse salariale annuelle, base OETH, base formation. A transmettre avant le 31 janvier."
+            ),
+            "reference": "Art. R.133-14 CSS",
+            "action_requise": "Verifier et transmettre la DSN annuelle (bilan) avant le 31 janvier",
+            "echeance": f"{annee}-01-31",
+        }
+        echeances.append(Echeance(premier_janvier, date(annee, 3, 1) - _UN_JOUR, id_alerte("dsn_annuelle", annee),
+                                  "dsn_annuelle", lambda jour: dict(contenu_dsn)))
+
+    # 5u. Echeances fiscales : de 30 jours avant a 7 jours apres
+    for m_ech, j_ech, titre_ech, desc_ech, ref_ech in ECHEANCES_FISCALES:
+        date_ech = date(annee, m_ech, j_ech)
+
+        def fiscale(jour, date_ech=date_ech, titre_ech=titre_ech, desc_ech=desc_ech, ref_ech=ref_ech):
+            jours_avant = (date_ech - jour).days
+            return {
+                "urgence": "haute" if jours_avant <= 3 else ("moyenne" if jours_avant <= 14 else "info"),
+                "titre": titre_ech,
+                "description": f"{desc_ech}. Echeance: {date_ech.isoformat()} ({jours_avant} jour(s)).",
+                "reference": ref_ech,
+                "action_requise": desc_ech,
+                "echeance": date_ech.isoformat(),
+            }
+        echeances.append(Echeance(date_ech - timedelta(days=30), date_ech + timedelta(days=7),
+                                  id_alerte("echeance_fiscale", date_ech, titre_ech), "echeance_fiscale", fiscale))
+
+    # 6. DSN mensuelle : rappel du 1er au 15 de chaque mois
+    date_limite_dsn = "le 5 du mois" if nb_actifs >= 50 else "le 15 du mois"
+    contenu_mensuel = {
+        "urgence": "info",
+        "message": f"Rappel: DSN mensuelle a transmettre avant {date_limite_dsn} en cours",
+        "reference": "Art. R.133-14 CSS - Declaration sociale nominative",
+        "action_requise": "Verifier et transmettre la DSN mensuelle",
+    }
+    for mois in range(1, 13):
+        echeances.append(Echeance(date(annee, mois, 1), date(annee, mois, 15),
+                                  id_alerte("declaration_dsn_mensuelle", annee, mois),
+                                  "declaration_dsn_mensuelle", lambda jour: dict(contenu_mensuel)))
+    return echeances
+
+
+# ======================================================================
+# MOTEUR
+# ======================================================================
+
+class DonneesRH(NamedTuple):
+    """Stores RH lus par le moteur (listes de dicts de api/index.py)."""
+
+    contrats: list
+    entretiens: list
+    visites: list
+    arrets: list
+    conges: list
+    sanctions: list
+    das2: bool = False
+
+
+def _signature(enregistrements: Iterable[dict]) -> tuple:
+    # Instantane des champs : un enregistrement modifie en place change la signature
+    return tuple(tuple(e.items()) for e in enregistrements)
+
+
+class MoteurAlertesRH:
+    """Index des echeances RH tenu a jour a chaque version des donnees.
+
+    `synchroniser(version, charger)` ne relit les stores que si la version
+    (empreinte de generation des donnees) a change, et ne recalcule alors
+    que les groupes (salarie, sanction, annee) dont le contenu differe.
+    `alertes(jour)` est une requete sur l'index : les alertes du jour sont
+    memorisees jusqu'au prochain changement de l'index.
+    """
+
+    def __init__(self, intervalle_secondes: Optional[float] = None):
+        self._index = IndexEcheances()
+        self._verrou = threading.Lock()
+        self._version = None
+        self._signatures: dict[Hashable, tuple] = {}
+        self._calendrier: tuple = (0, False)
+        self._annees: set[int] = set()
+        self._cache: tuple = (None, None, [])
+        self._intervalle = intervalle_secondes
+        self._arret = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.nb_rafraichissements = 0
+
+    def synchroniser(self, version: Hashable, charger: Callable[[], DonneesRH]) -> None:
+        """Met l'index a jour si les donnees ont change depuis la derniere version."""
+        if version == self._version:
+            return
+        with self._verrou:
+            if version == self._version:
+                return
+            donnees = charger()
+            self._appliquer(donnees)
+            self._version = version
+
+    def _appliquer(self, donnees: DonneesRH) -> None:
+        par_salarie: dict[str, tuple] = {}
+
+        def ajouter(sid, i, enregistrement):
+            if sid not in par_salarie:
+                par_salarie[sid] = ([], [], [], [], [])
+            par_salarie[sid][i].append(enregistrement)
+
+        for i, store in enumerate((donnees.contrats, donnees.entretiens, donnees.visites,
+                                   donnees.arrets, donnees.conges)):
+            for enregistrement in store:
+                ajouter(enregistrement.get("salarie_id"), i, enregistrement)
+
+        groupes: dict[Hashable, tuple] = {}
+        for sid, stores in par_salarie.items():
+            groupes[("salarie", sid)] = (
+                _signature(stores[0] + stores[1] + stores[2] + stores[3] + stores[4]) + tuple(len(s) for s in stores),
+                lambda sid=sid, stores=stores: echeances_salarie(sid, *stores),
+            )
+        for rang, sanction in enumerate(donnees.sanctions):
+            groupes[("sanction", sanction.get("id", rang))] = (
+                _signature([sanction]), lambda s=sanction, rang=rang: echeances_sanction(s, rang),
+            )
+
+        for groupe in set(self._signatures) - set(groupes):
+            self._index.remplacer(groupe, ())
+            del self._signatures[groupe]
+        for groupe, (signature, construire) in groupes.items():
+            if self._signatures.get(groupe) != signature:
+                self._index.remplacer(groupe, construire())
+                self._signatures[groupe] = signature
+
+        nb_actifs = sum(1 for c in donnees.contrats if c.get("statut") == "actif")
+        calendrier = (nb_actifs, bool(donnees.das2))
+        if calendrier != self._calendrier:
+            self._calendrier = calendrier
+            for annee in self._annees:
+                self._index.remplacer(("annee", annee), echeances_annee(annee, *calendrier))
+
+    def _couvrir(self, jour: date) -> None:
+        # Annees N-1 a N+1 : fenetres fiscales a cheval sur deux annees
+        for annee in (jour.year - 1, jour.year, jour.year + 1):
+            if annee not in self._annees and date.min.year < annee < date.max.year:
+                self._annees.add(annee)
+                self._index.remplacer(("annee", annee), echeances_annee(annee, *self._calendrier))
+
+    def alertes(self, jour: Optional[date] = None) -> list[dict]:
+        """Alertes actives le jour donne (copies : l'appelant peut les modifier)."""
+        jour = jour or date.today()
+        with self._verrou:
+            self._couvrir(jour)
+            self._index.avancer(jour)
+            cle_jour, version, alertes = self._cache
+            if cle_jour != jour or version != self._index.version:
+                alertes = [echeance.alerte(jour) for echeance in self._index.actives(jour)]
+                self._cache = (jour, self._index.version, alertes)
+        return [dict(a) for a in alertes]
+
+    def rafraichir(self, jour: Optional[date] = None) -> None:
+        """Avance l'index au jour donne (ouverture / fermeture des fenetres)."""
+        jour = jour or date.today()
+        with self._verrou:
+            self._couvrir(jour)
+            self._index.avancer(jour)
+        self.nb_rafraichissements += 1
+
+    def statistiques(self) -> dict:
+        with self._verrou:
+            return {
+                "echeances": len(self._index),
+                "groupes": len(self._index.groupes()),
+                "annees": sorted(self._annees),
+                "rafraichissements": self.nb_rafraichissements,
+            }
+
+    # --- Rafraichissement quotidien ---
+
+    def _attente(self) -> float:
+        if self._intervalle is not None:
+            return self._intervalle
+        maintenant = datetime.now()
+        minuit = datetime.combine(maintenant.date() + _UN_JOUR, time.min)
+        return (minuit - maintenant).total_seconds() + 1
+
+    def _boucle(self) -> None:
+        while not self._arret.wait(self._attente()):
+            try:
+                self.rafraichir()
+            except Exception as exc:  # le thread ne doit jamais mourir
+                logger.error("Rafraichissement des alertes RH echoue : %s", exc)
+
+    def start(self) -> bool:
+        """Demarre le rafraichissement quotidien (une fois par processus)."""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return False
+        self._arret.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._boucle, name="alertes-rh", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,379 @@
+"""Resolution d'identite des salaries (detection des doublons).
+
+Une meme personne peut apparaitre dans plusieurs fiches : contrats RH,
+salaries detectes par l'analyse documentaire (base de connaissances),
+salaries saisis a la main dans le planning ; avec des fautes de frappe,
+des accents omis ou un nom et un prenom inverses.
+- Cles de blocage : NIR normalise (corps de 13 caracteres, la cle de
+  controle est verifiee mais n'identifie pas la personne), nom et prenom
+  normalises, code phonetique du nom avec l'initiale du prenom et
+  inversement. Un index inverse cle -> fiches ne fait comparer une fiche
+  qu'aux fiches de ses blocs phonetiques, a son ajout ; les blocs NIR et
+  nom/prenom regroupent sans comparaison.
+- Score : Jaro-Winkler sur le nom et le prenom normalises (minuscules,
+  sans accents), ordre direct ou inverse. Deux NIR valides differents
+  excluent un rapprochement approche, et un groupe de doublons n'en
+  reunit jamais deux, meme par transitivite.
+- Mise a jour incrementale : ajout / retrait d'une fiche (creation de
+  contrat, fusion) ou resynchronisation d'une source sur la version des
+  donnees, limitee aux fiches modifiees. Les rapprochements approches sont
+  memorises : la liste des doublons ne compare plus rien.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Callable, Hashable, Iterable, NamedTuple, Optional
+
+from urssaf_analyzer.utils.validators import valider_nir
+
+SEUIL_SIMILARITE = 0.9
+# Blocs phonetiques plus grands ignores a l'ajout d'une fiche (nom et prenom tres
+# courants) : elle reste comparee au sein de ses autres blocs
+TAILLE_MAX_BLOC = 300
+
+_RE_MOTS = re.compile(r"[^\W_]+")
+
+
+def normaliser_nom(texte) -> str:
+    """Minuscules sans accents, mots separes par une espace (tirets, apostrophes...)."""
+    texte = str(texte or "").lower()
+    if not texte.isascii():
+        texte = "".join(c for c in unicodedata.normalize("NFKD", texte) if not unicodedata.combining(c))
+    return " ".join(_RE_MOTS.findall(texte))
+
+
+def normaliser_nir(nir) -> tuple[str, bool]:
+    """Corps du NIR (13 caracteres, sans espaces ni cle) et validite de la cle de controle."""
+    nir = str(nir or "").strip()
+    if not nir or nir.startswith("unknown_"):
+        return "", False
+    resultat = valider_nir(nir)
+    propre = resultat.valeur_corrigee.upper()
+    return (propre[:13] if len(propre) in (13, 15) else propre), resultat.valide
+
+
+_REGLES_PHONETIQUES = (
+    ("eaux", "o"), ("eau", "o"), ("au", "o"), ("ou", "u"), ("oe", "e"), ("ai", "e"), ("ei", "e"),
+    ("ph", "f"), ("th", "t"), ("sch", "ch"), ("ck", "k"), ("qu", "k"), ("gu", "g"),
+    ("y", "i"), ("w", "v"), ("z", "s"),
+)
+_RE_C_DOUX = re.compile(r"c(?=[ei])")
+_RE_G_DOUX = re.compile(r"g(?=[ei])")
+_RE_H_MUET = re.compile(r"(?<!c)h")
+_RE_FINALE_MUETTE = re.compile(r"(?<=.)(?:e[tdsx]?|[tdsx])$")
+_RE_DOUBLES = re.compile(r"(.)\1+")
+_RE_VOYELLES = re.compile(r"[aeiou]")
+
+
+def _phonetique_mot(mot: str) -> str:
+    for avant, apres in _REGLES_PHONETIQUES:
+        mot = mot.replace(avant, apres)
+    mot = _RE_C_DOUX.sub("s", mot).replace("c", "k").replace("kh", "ch")
+    mot = _RE_G_DOUX.sub("j", mot)
+    mot = _RE_H_MUET.sub("", mot)
+    mot = _RE_FINALE_MUETTE.sub("", mot)
+    mot = _RE_DOUBLES.sub(r"\1", mot)
+    # Premiere lettre puis squelette consonantique
+    return mot[:1] + _RE_VOYELLES.sub("", mot[1:])
+
+
+def phonetique(texte: str) -> str:
+    """Code phonetique (francais simplifie) d'un nom : Dupont / Dupond -> dpn."""
+    return " ".join(_phonetique_mot(mot) for mot in normaliser_nom(texte).split())
+
+
+@lru_cache(maxsize=65536)
+def jaro_winkler(a: str, b: str) -> float:
+    """Similarite de Jaro-Winkler (1.0 = chaines identiques)."""
+    if a == b:
+        return 1.0
+    la, lb = len(a), len(b)
+    if not la or not lb:
+        return 0.0
+    portee = max(la, lb) // 2 - 1
+    pris = [False] * lb
+    communs_a = []
+    for i, c in enumerate(a):
+        fin = min(lb, i + portee + 1)
+        j = b.find(c, max(0, i - portee), fin)
+        while j >= 0 and pris[j]:
+            j = b.find(c, j + 1, fin)
+        if j >= 0:
+            pris[j] = True
+            communs_a.append(c)
+    communs = len(communs_a)
+    if not communs:
+        return 0.0
+    communs_b = [c for c, p in zip(b, pris) if p]
+    transpositions = sum(x != y for x, y in zip(communs_a, communs_b))
+    jaro = (communs / la + communs / lb + (communs - transpositions / 2) / communs) / 3
+    prefixe = 0
+    for ca, cb in zip(a[:4], b[:4]):
+        if ca != cb:
+            break
+        prefixe += 1
+    return jaro + prefixe * 0.1 * (1 - jaro)
+
+
+class Identite(NamedTuple):
+    """Fiche d'une source, reduite a ce qui identifie la personne."""
+
+    ref: tuple  # (source, identifiant)
+    rang: int  # ordre d'insertion (ordre de presentation)
+    decoupages: tuple  # ((nom, prenom) normalises, ...)
+    phonetiques: tuple  # ((nom, prenom) phonetiques, ...)
+    nir: str
+    nir_valide: bool
+    signature: tuple
+    enregistrement: object
+
+
+def _decoupages(nom: str, prenom: str) -> tuple:
+    nom, prenom = normaliser_nom(nom), normaliser_nom(prenom)
+    if prenom or " " not in nom:
+        return ((nom, prenom),)
+    # Nom complet sans prenom distinct (planning) : toutes les coupures "prenom | nom"
+    mots = nom.split()
+    return tuple((" ".join(mots[i:]), " ".join(mots[:i])) for i in range(1, len(mots)))
+
+
+def _phonetiques(decoupages: tuple) -> tuple:
+    return tuple((phonetique(nom), phonetique(prenom)) for nom, prenom in decoupages)
+
+
+def _cles(identite: Identite) -> set:
+    cles = set()
+    if identite.nir:
+        cles.add(("nir", identite.nir))
+    for nom, prenom in identite.decoupages:
+        if nom and prenom:
+            cles.add(("exact", nom, prenom))
+    for p_nom, p_prenom in identite.phonetiques:
+        if p_nom:
+            cles.add(("np", p_nom, p_prenom[:1]))
+        if p_prenom:
+            # Meme espace de cles : un nom et un prenom inverses partagent un bloc
+            cles.add(("np", p_prenom, p_nom[:1]))
+    return cles
+
+
+def comparer(a: Identite, b: Identite) -> Optional[tuple[float, str]]:
+    """Score et motif du rapprochement de deux fiches, None si distinctes."""
+    if a.nir and a.nir == b.nir:
+        return 1.0, "nir_identique"
+    meilleur = 0.0
+    for (nom_a, prenom_a), phon_a in zip(a.decoupages, a.phonetiques):
+        for (nom_b, prenom_b), phon_b in zip(b.decoupages, b.phonetiques):
+            # Sans nom et prenom de part et d'autre, seul le NIR rapproche deux fiches
+            if not (nom_a and prenom_a and nom_b and prenom_b):
+                continue
+            if nom_a == nom_b and prenom_a == prenom_b:
+                return 1.0, "nom_prenom_identique"
+            if phon_a == phon_b or phon_a == phon_b[::-1]:
+                meilleur = max(meilleur, 0.95)  # memes sons : Philippe / Filipe
+            for x_nom, x_prenom, x_phon in ((nom_b, prenom_b, phon_b[0]), (prenom_b, nom_b, phon_b[1])):
+                # Meme initiale phonetique du nom, comme les cles de blocage
+                if x_phon[:1] != phon_a[0][:1]:
+                    continue
+                s_nom = jaro_winkler(nom_a, x_nom)
+                if s_nom < 0.85:
+                    continue
+                s_prenom = jaro_winkler(prenom_a, x_prenom)
+                if s_prenom >= 0.8:
+                    meilleur = max(meilleur, 0.6 * s_nom + 0.4 * s_prenom)
+    if a.nir_valide and b.nir_valide:
+        return None  # deux NIR valides differents : deux personnes
+    if meilleur >= SEUIL_SIMILARITE:
+        return round(meilleur, 3), "nom_prenom_proche"
+    return None
+
+
+class IndexIdentites:
+    """Fiches de toutes les sources et index inverse cle de blocage -> fiches."""
+
+    def __init__(self):
+        self._fiches: dict[tuple, Identite] = {}
+        self._cles: dict[tuple, set] = {}
+        self._blocs: dict[tuple, set] = {}
+        # Rapprochements approches (hors NIR et nom identiques, lus dans leurs blocs)
+        self._liens: dict[tuple, dict[tuple, float]] = {}
+        self._versions: dict[str, Hashable] = {}
+        self._rang = 0
+
+    def __len__(self) -> int:
+        return len(self._fiches)
+
+    def ajouter(self, source: str, ident: str, nom: str, prenom: str, nir: str = "",
+                enregistrement: object = None) -> Identite:
+        """Ajoute (ou remplace) une fiche."""
+        ref = (source, ident)
+        ancienne = self._fiches.get(ref)
+        if ancienne is not None:
+            self._desindexer(ancienne)
+        corps_nir, nir_valide = normaliser_nir(nir)
+        decoupages = _decoupages(nom, prenom)
+        identite = Identite(ref, ancienne.rang if ancienne is not None else self._rang,
+                            decoupages, _phonetiques(decoupages), corps_nir, nir_valide,
+                            (nom, prenom, nir, id(enregistrement)), enregistrement)
+        if ancienne is None:
+            self._rang += 1
+        self._fiches[ref] = identite
+        cles = _cles(identite)
+        self._cles[ref] = cles
+        for cle in cles:
+            self._blocs.setdefault(cle, set()).add(ref)
+        self._lier(identite, cles)
+        return identite
+
+    def _lier(self, identite: Identite, cles: set) -> None:
+        """Compare une fiche aux fiches de ses blocs phonetiques et garde les rapprochements approches."""
+        comparees = {identite.ref}
+        for cle in cles:
+            bloc = self._blocs[cle]
+            if cle[0] != "np" or len(bloc) > TAILLE_MAX_BLOC:
+                continue
+            for ref in bloc - comparees:
+                comparees.add(ref)
+                autre = self._fiches[ref]
+                # Fiche la plus ancienne en premier : resultat independant de l'ordre d'ajout
+                rapprochement = comparer(*sorted((identite, autre), key=lambda f: f.rang))
+                if rapprochement is not None and rapprochement[1] == "nom_prenom_proche":
+                    self._liens.setdefault(identite.ref, {})[ref] = rapprochement[0]
+                    self._liens.setdefault(ref, {})[identite.ref] = rapprochement[0]
+
+    def retirer(self, source: str, ident: str) -> None:
+        identite = self._fiches.pop((source, ident), None)
+        if identite is not None:
+            self._desindexer(identite)
+
+    def _desindexer(self, identite: Identite) -> None:
+        for ref in self._liens.pop(identite.ref, {}):
+            voisins = self._liens[ref]
+            del voisins[identite.ref]
+            if not voisins:
+                del self._liens[ref]
+        for cle in self._cles.pop(identite.ref, ()):
+            bloc = self._blocs.get(cle)
+            if bloc is not None:
+                bloc.discard(identite.ref)
+                if not bloc:
+                    del self._blocs[cle]
+
+    def synchroniser(self, source: str, version: Hashable, charger: Callable[[], Iterable[tuple]]) -> None:
+        """Aligne les fiches d'une source sur ses enregistrements si la version a change.
+
+        `charger` fournit des tuples (identifiant, nom, prenom, nir, enregistrement) ;
+        seules les fiches ajoutees, modifiees ou disparues sont reindexees.
+        """
+        if self._versions.get(source) == version:
+            return
+        presents = set()
+        for ident, nom, prenom, nir, enregistrement in charger():
+            ref = (source, ident)
+            if ref in presents:
+                continue  # premiere occurrence retenue
+            presents.add(ref)
+            actuelle = self._fiches.get(ref)
+            if actuelle is None or actuelle.signature != (nom, prenom, nir, id(enregistrement)):
+                self.ajouter(source, ident, nom, prenom, nir, enregistrement)
+        for ref in [r for r in self._fiches if r[0] == source and r not in presents]:
+            self.retirer(*ref)
+        self._versions[source] = version
+
+    def rechercher(self, nom: str, prenom: str, nir: str = "",
+                   sources: Optional[Iterable[str]] = None) -> list[tuple[Identite, float, str]]:
+        """Fiches proches d'une identite, dans l'ordre d'insertion : (fiche, score, motif)."""
+        corps_nir, nir_valide = normaliser_nir(nir)
+        decoupages = _decoupages(nom, prenom)
+        requete = Identite(("", ""), -1, decoupages, _phonetiques(decoupages), corps_nir, nir_valide, (), None)
+        sources = set(sources) if sources is not None else None
+        candidats = set()
+        for cle in _cles(requete):
+            candidats |= self._blocs.get(cle, set())
+        resultats = []
+        for ref in candidats:
+            if sources is not None and ref[0] not in sources:
+                continue
+            fiche = self._fiches[ref]
+            rapprochement = comparer(requete, fiche)
+            if rapprochement is not None:
+                resultats.append((fiche, *rapprochement))
+        resultats.sort(key=lambda r: r[0].rang)
+        return resultats
+
+    def doublons(self, sources: Optional[Iterable[str]] = None) -> list[dict]:
+        """Groupes de fiches designant vraisemblablement la meme personne.
+
+        Composantes connexes des blocs NIR et nom/prenom identiques et des
+        rapprochements approches memorises a l'ajout : aucune comparaison ici.
+        Un groupe ne reunit jamais deux NIR valides differents : les liens
+        sont unis du plus sur au plus faible et un lien qui rassemblerait
+        deux personnes (fiche sans NIR proche de l'une et de l'autre,
+        homonymes) est ecarte.
+        """
+        sources = set(sources) if sources is not None else None
+        fiches = self._fiches
+
+        def retenue(ref) -> bool:
+            return sources is None or ref[0] in sources
+
+        liens: list[tuple] = []  # (score, motif, ref_a, ref_b)
+        for cle, bloc in self._blocs.items():
+            if len(bloc) < 2 or cle[0] == "np":
+                continue
+            refs = sorted((r for r in bloc if retenue(r)), key=lambda r: fiches[r].rang)
+            motif = "nir_identique" if cle[0] == "nir" else "nom_prenom_identique"
+            for ref in refs[1:]:
+                liens.append((1.0, motif, refs[0], ref))
+        for ref_a, voisins in self._liens.items():
+            if not retenue(ref_a):
+                continue
+            for ref_b, score in voisins.items():
+                if fiches[ref_a].rang < fiches[ref_b].rang and retenue(ref_b):
+                    liens.append((score, "nom_prenom_proche", ref_a, ref_b))
+        # Plus sur d'abord (NIR, nom identique, score), puis ordre d'insertion : resultat deterministe
+        ordre_motifs = {"nir_identique": 0, "nom_prenom_identique": 1, "nom_prenom_proche": 2}
+        liens.sort(key=lambda l: (-l[0], ordre_motifs[l[1]], fiches[l[2]].rang, fiches[l[3]].rang))
+
+        parent: dict[tuple, tuple] = {}
+        nirs: dict[tuple, frozenset] = {}  # racine -> NIR valides du groupe
+
+        def racine(ref):
+            if ref not in parent:
+                parent[ref] = ref
+                fiche = fiches[ref]
+                nirs[ref] = frozenset((fiche.nir,)) if fiche.nir_valide else frozenset()
+            while parent[ref] != ref:
+                parent[ref] = parent[parent[ref]]
+                ref = parent[ref]
+            return ref
+
+        retenus: list[tuple] = []
+        for score, motif, ref_a, ref_b in liens:
+            ra, rb = racine(ref_a), racine(ref_b)
+            if ra != rb:
+                if len(nirs[ra] | nirs[rb]) > 1:
+                    continue  # deux NIR valides differents : deux personnes
+                parent[rb] = ra
+                nirs[ra] |= nirs.pop(rb)
+            retenus.append((ref_a, score, motif))
+
+        groupes: dict[tuple, list] = {}
+        for ref in list(parent):
+            groupes.setdefault(racine(ref), []).append(ref)
+        liens_groupes: dict[tuple, list] = {}
+        for ref, score, motif in retenus:
+            liens_groupes.setdefault(racine(ref), []).append((score, motif))
+        resultat = []
+        for cle, membres in groupes.items():
+            if len(membres) < 2:
+                continue  # fiche dont tous les liens ont ete ecartes
+            membres.sort(key=lambda r: fiches[r].rang)
+            liens_groupe = liens_groupes[cle]
+            resultat.append({
+                "fiches": [fiches[r] for r in membres],
+                "score": min(score for score, _ in liens_groupe),
+                "motifs": sorted({motif for _, motif in liens_groupe}),
+            })
+        resultat.sort(key=lambda g: g["fiches"][0].rang)
+        return resultat
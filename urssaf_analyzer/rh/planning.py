@@ -0,0 +1,158 @@
+"""Index du planning RH.
+
+Les vues jour / mois / annee du planning filtraient toute la liste des
+creneaux pour chaque jour affiche et cherchaient le statut du salarie
+(conge, arret) en parcourant tous les conges et arrets : 365 x N
+operations pour la vue annuelle.
+- IndexPlanning : creneaux indexes par jour et par (salarie, jour), tenus
+  a jour a l'ajout, a la modification et a la suppression. Une vue ne lit
+  que les creneaux de sa periode ; les resumes mensuels de la vue annuelle
+  sont memorises et invalides par les seules ecritures du mois concerne.
+- IndexAbsences : periodes de conges et d'arrets par salarie, reconstruit
+  a chaque nouvelle version des donnees.
+Dans chaque index, l'ordre des creneaux est celui de la liste du store :
+les vues restent identiques a un parcours complet.
+"""
+import calendar
+from datetime import date
+from typing import Hashable, Iterable, Optional
+
+_MAX_RESUMES = 10_000
+
+
+class IndexAbsences:
+    """Periodes d'absence (conges non refuses, arrets) par salarie."""
+
+    def __init__(self):
+        self._par_salarie: dict[str, tuple[list, list]] = {}
+        self._version: Hashable = None
+        self.revision = 0
+
+    def synchroniser(self, version: Hashable, conges: Iterable[dict], arrets: Iterable[dict]) -> None:
+        """Reconstruit l'index si la version des donnees a change."""
+        if version == self._version:
+            return
+        par_salarie: dict[str, tuple[list, list]] = {}
+        for c in conges:
+            if c.get("statut") == "refuse":
+                continue
+            periode = (c.get("date_debut", ""), c.get("date_fin", ""),
+                       f"conge_{c.get('type_conge', c.get('type', 'cp'))}")
+            # Un conge est rattache au salarie par identifiant ou par nom
+            for cle in {c.get("salarie_id"), c.get("nom_salarie")}:
+                par_salarie.setdefault(cle, ([], []))[0].append(periode)
+        for a in arrets:
+            periode = (a.get("date_debut", ""), a.get("date_fin", ""),
+                       f"arret_{a.get('type_arret', a.get('type', 'maladie'))}")
+            par_salarie.setdefault(a.get("salarie_id"), ([], []))[1].append(periode)
+        self._par_salarie = par_salarie
+        self._version = version
+        self.revision += 1
+
+    def statut(self, salarie_id: str, date_str: str) -> str:
+        """Statut du salarie ce jour : conge_*, arret_* ou present (conges prioritaires)."""
+        conges, arrets = self._par_salarie.get(salarie_id, ((), ()))
+        for deb, fin, statut in conges:
+            if deb <= date_str <= fin:
+                return statut
+        for deb, fin, statut in arrets:
+            if deb <= date_str <= fin:
+                return statut
+        return "present"
+
+
+class IndexPlanning:
+    """Creneaux de planning indexes par jour et par (salarie, jour).
+
+    Les creneaux sont les dicts du store (memes objets) : l'index doit etre
+    informe de chaque ajout, modification ou suppression.
+    """
+
+    def __init__(self, entrees: Iterable[dict] = ()):
+        self.reconstruire(entrees)
+
+    def __len__(self) -> int:
+        return self._nb
+
+    def reconstruire(self, entrees: Iterable[dict]) -> None:
+        self._par_jour: dict[str, list[dict]] = {}
+        self._par_salarie_jour: dict[tuple, list[dict]] = {}
+        self._versions_mois: dict[str, int] = {}
+        self._resumes: dict[tuple, tuple] = {}
+        self._nb = 0
+        for entree in entrees:
+            self.ajouter(entree)
+
+    def _modifie(self, jour: str) -> None:
+        mois = jour[:7]
+        self._versions_mois[mois] = self._versions_mois.get(mois, 0) + 1
+
+    def ajouter(self, entree: dict) -> None:
+        jour = entree.get("date", "")
+        self._par_jour.setdefault(jour, []).append(entree)
+        self._par_salarie_jour.setdefault((entree.get("salarie_id"), jour), []).append(entree)
+        self._nb += 1
+        self._modifie(jour)
+
+    def retirer(self, entree: dict) -> None:
+        jour = entree.get("date", "")
+        for index, cle in ((self._par_jour, jour), (self._par_salarie_jour, (entree.get("salarie_id"), jour))):
+            liste = index.get(cle, [])
+            for i, e in enumerate(liste):
+                if e is entree:
+                    del liste[i]
+                    break
+            if not liste:
+                index.pop(cle, None)
+        self._nb -= 1
+        self._modifie(jour)
+
+    def modifier(self, entree: dict, valeurs: dict) -> None:
+        """Remplace le contenu d'un creneau sur place (meme salarie, meme jour)."""
+        entree.clear()
+        entree.update(valeurs)
+        self._modifie(entree.get("date", ""))
+
+    def jour(self, date_str: str, salarie_id: Optional[str] = None) -> list[dict]:
+        """Creneaux d'un jour (d'un salarie si precise), dans l'ordre du store."""
+        if salarie_id is None:
+            return self._par_jour.get(date_str, [])
+        return self._par_salarie_jour.get((salarie_id, date_str), [])
+
+    def creneau(self, salarie_id: str, date_str: str, heure_debut: str) -> Optional[dict]:
+        """Creneau existant d'un salarie a ce jour et cette heure de debut."""
+        for entree in self._par_salarie_jour.get((salarie_id, date_str), ()):
+            if entree.get("heure_debut") == heure_debut:
+                return entree
+        return None
+
+    def resume_mois(self, annee: int, mois: int, salarie_id: Optional[str] = None,
+                    absences: Optional[IndexAbsences] = None) -> dict:
+        """Jours travailles, heures planifiees et jours d'absence (si salarie) d'un mois.
+
+        Memorise jusqu'a la prochaine ecriture du mois (ou des absences).
+        """
+        cle = (annee, mois, salarie_id)
+        tampon = (self._versions_mois.get(f"{annee:04d}-{mois:02d}", 0),
+                  absences.revision if salarie_id and absences is not None else None)
+        memorise = self._resumes.get(cle)
+        if memorise is not None and memorise[0] == tampon:
+            return memorise[1]
+
+        heures = 0
+        jours_travailles = 0
+        jours_absence = 0
+        for j in range(1, calendar.monthrange(annee, mois)[1] + 1):
+            date_str = date(annee, mois, j).isoformat()
+            entrees = self.jour(date_str, salarie_id)
+            if entrees:
+                jours_travailles += 1
+                heures += sum(p.get("duree_heures", 0) for p in entrees)
+            if salarie_id and absences is not None and absences.statut(salarie_id, date_str) != "present":
+                jours_absence += 1
+        resume = {"jours_travailles": jours_travailles, "heures": heures, "jours_absence": jours_absence}
+
+        if len(self._resumes) >= _MAX_RESUMES:
+            self._resumes.clear()
+        self._resumes[cle] = (tampon, resume)
+        return resume
@@ -0,0 +1,341 @@
+"""Journal des alertes partitionne par jour, avec index en memoire.
+
+Organisation sur disque (a cote de `alert_log_path`, ex. alerts.jsonl) :
+- alerts-2026-03-04.jsonl      segment du jour (UTC), JSON Lines append-only
+- alerts-2026-02-20.jsonl.gz   segment ancien compresse
+- alerts.jsonl                 lien symbolique vers le segment du jour
+
+Chaque segment est indexe a la demande (type, severite, horodatage,
+position de la ligne). L'index d'un segment clos est construit une fois ;
+celui du segment courant est complete uniquement avec les octets ajoutes
+depuis la derniere lecture, y compris par d'autres workers. Une requete
+« alertes critiques des dernieres 24h » ne lit donc que les segments des
+jours concernes et, dans ceux-ci, que les lignes retenues.
+"""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from urssaf_analyzer.security.journal_writer import JournalWriter
+
+logger = logging.getLogger("urssaf_analyzer.alerts")
+
+_GZ = ".gz"
+
+
+def _epoch(ts: str) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(ts).timestamp()
+    except (ValueError, TypeError):
+        return None
+
+
+class _SegmentIndex:
+    """Index d'un segment : (epoch, type, severite, offset, longueur) par ligne."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.compressed = path.name.endswith(_GZ)
+        self.size = 0
+        self.mtime = 0.0
+        self.entries: list[tuple[Optional[float], str, str, int, int]] = []
+        self.counts: Counter = Counter()
+
+    def refresh(self) -> None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+        if self.compressed:
+            if (st.st_size, st.st_mtime) != (self.size, self.mtime):
+                self._reset()
+                with gzip.open(self.path, "rb") as f:
+                    self._index_bytes(f.read(), 0)
+                self.size, self.mtime = st.st_size, st.st_mtime
+            return
+        if st.st_size < self.size:
+            self._reset()
+        if st.st_size == self.size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.size)
+            data = f.read(st.st_size - self.size)
+        # Ne retenir que les lignes completes (un autre worker peut ecrire)
+        complete = data.rfind(b"\n") + 1
+        self._index_bytes(data[:complete], self.size)
+        self.size += complete
+        self.mtime = st.st_mtime
+
+    def _reset(self) -> None:
+        self.size, self.mtime = 0, 0.0
+        self.entries = []
+        self.counts = Counter()
+
+    def _index_bytes(self, data: bytes, base: int) -> None:
+        pos = 0
+        while pos < len(data):
+            end = data.find(b"\n", pos)
+            if end == -1:
+                end = len(data)
+            line = data[pos:end]
+            if line.strip():
+                try:
+                    entry = json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    entry = None
+                if isinstance(entry, dict):
+                    key = (str(entry.get("type", "")), str(entry.get("severity", "")))
+                    self.entries.append((_epoch(entry.get("timestamp", "")), *key, base + pos, end - pos))
+                    self.counts[key] += 1
+            pos = end + 1
+
+    def has(self, alert_type: Optional[str], severity: Optional[str]) -> bool:
+        return any(
+            n and (alert_type is None or t == alert_type) and (severity is None or s == severity)
+            for (t, s), n in self.counts.items()
+        )
+
+    def read(self, selected: list[tuple]) -> list[dict]:
+        """Relit uniquement les lignes selectionnees."""
+        if not selected:
+            return []
+        if self.compressed:
+            with gzip.open(self.path, "rb") as f:
+                data = f.read()
+            raw = [data[off:off + length] for *_, off, length in selected]
+        else:
+            raw = []
+            with open(self.path, "rb") as f:
+                for *_, off, length in selected:
+                    f.seek(off)
+                    raw.append(f.read(length))
+        return [json.loads(r) for r in raw]
+
+
+class AlertJournal:
+    """Segments journaliers d'alertes + index par type, severite et date."""
+
+    def __init__(self, alert_log_path: Path):
+        self.alert_log_path = Path(alert_log_path)
+        self.directory = self.alert_log_path.parent
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stem = self.alert_log_path.stem
+        self._suffix = self.alert_log_path.suffix or ".jsonl"
+        self._pattern = re.compile(
+            rf"^{re.escape(self._stem)}-(\d{{4}}-\d{{2}}-\d{{2}}){re.escape(self._suffix)}(\.gz)?$"
+        )
+        self._lock = threading.Lock()
+        self._writers: dict[date, JournalWriter] = {}
+        self._indexes: dict[Path, _SegmentIndex] = {}
+        self._current_day: Optional[date] = None
+        self._migrer_journal_historique()
+
+    # --- Ecriture ---
+
+    def segment_path(self, day: date) -> Path:
+        return self.directory / f"{self._stem}-{day.isoformat()}{self._suffix}"
+
+    def append(self, entry: dict, *, immediate: bool = False) -> None:
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        ts = _epoch(entry.get("timestamp", ""))
+        day = datetime.fromtimestamp(ts, timezone.utc).date() if ts is not None else _today()
+        with self._lock:
+            writer = self._writers.get(day)
+            if writer is None:
+                writer = JournalWriter.partage(self.segment_path(day))
+                self._writers[day] = writer
+            if day != self._current_day and day >= (self._current_day or day):
+                # Changement de jour : liberer les writers des jours precedents
+                for old_day in [d for d in self._writers if d < day]:
+                    self._writers.pop(old_day).flush()
+                self._current_day = day
+                nouveau_jour = True
+            else:
+                nouveau_jour = False
+        writer.write(line)
+        if immediate or nouveau_jour:
+            writer.flush()
+        if nouveau_jour:
+            self._pointer_lien_courant(day)
+
+    def flush(self) -> None:
+        with self._lock:
+            writers = list(self._writers.values())
+        for writer in writers:
+            writer.flush()
+
+    def _pointer_lien_courant(self, day: date) -> None:
+        """Fait pointer alert_log_path vers le segment du jour (remplacement atomique)."""
+        tmp = self.directory / f".{self._stem}.{os.getpid()}.lnk"
+        try:
+            if tmp.is_symlink() or tmp.exists():
+                tmp.unlink()
+            os.symlink(self.segment_path(day).name, tmp)
+            os.replace(tmp, self.alert_log_path)
+        except OSError as e:
+            logger.warning("Lien vers le journal d'alertes courant impossible: %s", e)
+
+    # --- Lecture ---
+
+    def segments(self, since_day: Optional[date] = None) -> list[tuple[date, Path]]:
+        """Segments existants (du plus recent au plus ancien)."""
+        found: dict[date, Path] = {}
+        for p in self.directory.iterdir():
+            m = self._pattern.match(p.name)
+            if not m:
+                continue
+            day = date.fromisoformat(m.group(1))
+            if since_day and day < since_day:
+                continue
+            # Un segment non compresse (en cours d'ecriture) prime sur un .gz homonyme
+            if day not in found or not m.group(2):
+                found[day] = p
+        return sorted(found.items(), reverse=True)
+
+    def _index(self, path: Path) -> _SegmentIndex:
+        with self._lock:
+            idx = self._indexes.get(path)
+            if idx is None:
+                idx = self._indexes[path] = _SegmentIndex(path)
+        idx.refresh()
+        return idx
+
+    def _selection(
+        self,
+        alert_type: Optional[str],
+        severity: Optional[str],
+        since_ts: Optional[float],
+    ) -> Iterable[tuple[_SegmentIndex, list[tuple]]]:
+        self.flush()
+        since_day = datetime.fromtimestamp(since_ts, timezone.utc).date() if since_ts is not None else None
+        for _, path in self.segments(since_day):
+            idx = self._index(path)
+            if not idx.has(alert_type, severity):
+                continue
+            selected = [
+                e for e in idx.entries
+                if (alert_type is None or e[1] == alert_type)
+                and (severity is None or e[2] == severity)
+                # Horodatage invalide : retenu par defaut
+                and (since_ts is None or e[0] is None or e[0] >= since_ts)
+            ]
+            yield idx, selected
+
+    def query(
+        self,
+        alert_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        since_ts: Optional[float] = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Les `limit` alertes les plus recentes, en ordre chronologique."""
+        if limit <= 0:
+            return []
+        chunks: list[list[dict]] = []
+        remaining = limit
+        for idx, selected in self._selection(alert_type, severity, since_ts):
+            if not selected:
+                continue
+            chunks.append(idx.read(selected[-remaining:]))
+            remaining -= len(chunks[-1])
+            if remaining <= 0:
+                break
+        return [a for chunk in reversed(chunks) for a in chunk]
+
+    def count(
+        self,
+        alert_type: Optional[str] = None,
+        severity: Optional[str] = None,
+        since_ts: Optional[float] = None,
+    ) -> int:
+        """Comptage a partir de l'index seul (aucune relecture JSON)."""
+        return sum(len(selected) for _, selected in self._selection(alert_type, severity, since_ts))
+
+    # --- Maintenance ---
+
+    def compacter(self, compresser_apres_jours: int = 7, retention_jours: Optional[int] = None) -> dict:
+        """Compresse les segments anciens et supprime ceux hors retention."""
+        self.flush()
+        today = _today()
+        stats = {"compresses": 0, "supprimes": 0}
+        for day, path in self.segments():
+            age = (today - day).days
+            try:
+                if retention_jours is not None and age > retention_jours:
+                    path.unlink()
+                    stats["supprimes"] += 1
+                elif age > compresser_apres_jours and not path.name.endswith(_GZ):
+                    gz_path = path.with_name(path.name + _GZ)
+                    tmp = gz_path.with_name(gz_path.name + ".tmp")
+                    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.replace(tmp, gz_path)
+                    path.unlink()
+                    stats["compresses"] += 1
+            except OSError as e:
+                logger.error("Maintenance du segment %s impossible: %s", path.name, e)
+            with self._lock:
+                self._indexes.pop(path, None)
+        return stats
+
+    # --- Migration ---
+
+    def _migrer_journal_historique(self) -> None:
+        """Repartit un ancien journal unique (fichier regulier) en segments."""
+        path = self.alert_log_path
+        if path.is_symlink() or not path.is_file():
+            return
+        lock_path = self.directory / f".{self._stem}.migration.lock"
+        with open(lock_path, "a+") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                if path.is_symlink() or not path.is_file():
+                    return  # deja migre par un autre worker
+                par_jour: dict[date, list[str]] = {}
+                rejets: list[str] = []
+                with open(path, "r", encoding="utf-8", errors="surrogateescape") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            ts = _epoch(json.loads(line).get("timestamp", ""))
+                        except (json.JSONDecodeError, AttributeError):
+                            rejets.append(line)
+                            continue
+                        day = datetime.fromtimestamp(ts, timezone.utc).date() if ts is not None else _today()
+                        par_jour.setdefault(day, []).append(line)
+                for day, lines in par_jour.items():
+                    with open(self.segment_path(day), "a", encoding="utf-8", errors="surrogateescape") as out:
+                        out.write("\n".join(lines) + "\n")
+                if rejets:
+                    # Lignes illisibles conservees telles quelles (donnees d'audit)
+                    rejets_path = self.directory / f"{self._stem}.rejets"
+                    with open(rejets_path, "a", encoding="utf-8", errors="surrogateescape") as out:
+                        out.write("\n".join(rejets) + "\n")
+                    logger.warning("Migration du journal %s : %d ligne(s) illisible(s) conservee(s) dans %s",
+                                   path.name, len(rejets), rejets_path.name)
+                path.unlink()
+                self._pointer_lien_courant(max(par_jour) if par_jour else _today())
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def depuis_heures(hours: float) -> float:
+    """Horodatage epoch correspondant a maintenant - `hours`."""
+    return (datetime.now(timezone.utc) - timedelta(hours=hours)).timestamp()
@@ -9,7 +9,10 @@ Detecte et signale en temps reel :
 Architecture :
 - AlertManager centralise la detection et la notification
 - Chaque type d'alerte a son propre seuil configurable
-- Les alertes sont persistees dans un journal dedie (JSON Lines)
+- Les alertes sont persistees dans un journal dedie (JSON Lines), par lots ;
+  les alertes critiques et hautes sont ecrites immediatement
+- Le journal est partitionne par jour et indexe (type, severite, date) :
+  les requetes du tableau de bord ne lisent que les segments concernes
 - Callbacks optionnels pour notification externe (webhook, email)
 
 Conformite :
@@ -18,7 +21,6 @@ Conformite :
 - PSSI NormaCheck §6.3 - Alertes de securite
 """
 
-import json
 import logging
 import threading
 import time
@@ -27,6 +29,8 @@ from enum import Enum
 from pathlib import Path
 from typing import Callable, Optional
 
+from urssaf_analyzer.security.alert_journal import AlertJournal, depuis_heures
+
 logger = logging.getLogger("urssaf_analyzer.alerts")
 
 
@@ -213,6 +217,7 @@ class AlertManager:
         self.alert_log_path.parent.mkdir(parents=True, exist_ok=True)
         self._on_alert = on_alert
         self._lock = threading.Lock()
+        self.journal = AlertJournal(alert_log_path)
 
         # Sous-systemes de detection
         self.login_tracker = LoginTracker()
@@ -223,15 +228,13 @@ class AlertManager:
         self._decryption_threshold = 3  # alerter apres 3 erreurs en 10 min
         self._decryption_window = 600  # 10 minutes
 
+    _SEVERITES_IMMEDIATES = (AlertSeverity.CRITIQUE, AlertSeverity.HAUTE)
+
     def _persist_alert(self, alert: Alert) -> None:
-        """Persiste une alerte dans le journal JSON Lines."""
-        line = json.dumps(alert.to_dict(), ensure_ascii=False, separators=(",", ":"))
-        with self._lock:
-            try:
-                with open(self.alert_log_path, "a", encoding="utf-8") as f:
-                    f.write(line + "\n")
-            except OSError as e:
-                logger.error("Impossible de persister l'alerte: %s", e)
+        """Persiste une alerte dans le segment journalier (JSON Lines)."""
+        self.journal.append(
+            alert.to_dict(), immediate=alert.severity in self._SEVERITES_IMMEDIATES,
+        )
 
     def _emit(self, alert: Alert) -> Alert:
         """Persiste et notifie une alerte."""
@@ -400,59 +403,43 @@ class AlertManager:
         alert_type: Optional[AlertType] = None,
         severity: Optional[AlertSeverity] = None,
         limit: int = 100,
+        since_hours: Optional[float] = None,
     ) -> list[dict]:
-        """Lit les alertes persistees, optionnellement filtrees."""
-        if not self.alert_log_path.exists():
-            return []
-
-        alerts = []
-        with open(self.alert_log_path, "r", encoding="utf-8") as f:
-            for line in f:
-                stripped = line.strip()
-                if not stripped:
-                    continue
-                try:
-                    entry = json.loads(stripped)
-                except json.JSONDecodeError:
-                    continue
-                if alert_type and entry.get("type") != alert_type.value:
-                    continue
-                if severity and entry.get("severity") != severity.value:
-                    continue
-                alerts.append(entry)
-
-        return alerts[-limit:]
+        """Lit les alertes persistees, optionnellement filtrees.
+
+        Seuls les segments couvrant `since_hours` sont consultes.
+        """
+        return self.journal.query(
+            alert_type=alert_type.value if alert_type else None,
+            severity=severity.value if severity else None,
+            since_ts=depuis_heures(since_hours) if since_hours is not None else None,
+            limit=limit,
+        )
 
     def count_alerts(
         self,
         alert_type: Optional[AlertType] = None,
         since_hours: int = 24,
+        severity: Optional[AlertSeverity] = None,
     ) -> int:
-        """Compte les alertes recentes."""
-        if not self.alert_log_path.exists():
-            return 0
-
-        cutoff = datetime.now(timezone.utc).timestamp() - (since_hours * 3600)
-        count = 0
-
-        with open(self.alert_log_path, "r", encoding="utf-8") as f:
-            for line in f:
-                stripped = line.strip()
-                if not stripped:
-                    continue
-                try:
-                    entry = json.loads(stripped)
-                except json.JSONDecodeError:
-                    continue
-                if alert_type and entry.get("type") != alert_type.value:
-                    continue
-                # Verifier le timestamp
-                ts = entry.get("timestamp", "")
-                try:
-                    alert_time = datetime.fromisoformat(ts).timestamp()
-                    if alert_time >= cutoff:
-                        count += 1
-                except (ValueError, TypeError):
-                    count += 1  # Compter par defaut si timestamp invalide
+        """Compte les alertes recentes (index seul, sans relecture du journal)."""
+        return self.journal.count(
+            alert_type=alert_type.value if alert_type else None,
+            severity=severity.value if severity else None,
+            since_ts=depuis_heures(since_hours),
+        )
 
-        return count
+    def compacter_journal(
+        self, compresser_apres_jours: int = 7, retention_jours: Optional[int] = None,
+    ) -> dict:
+        """Compresse (gzip) les segments anciens et purge ceux hors retention."""
+        return self.journal.compacter(compresser_apres_jours, retention_jours)
+
+    def planifier_compactage(
+        self, scheduler, compresser_apres_jours: int = 7, retention_jours: Optional[int] = None,
+    ) -> None:
+        """Confie la compaction du journal au planificateur de maintenance (maintenance.py)."""
+        scheduler.ajouter_tache(
+            f"compactage_{self.alert_log_path.stem}",
+            lambda: self.compacter_journal(compresser_apres_jours, retention_jours),
+        )
@@ -1,4 +1,8 @@
-"""Journal d'audit immutable pour tracer toutes les operations."""
+"""Journal d'audit immutable pour tracer toutes les operations.
+
+Les entrees sont ecrites par lots via un JournalWriter partage par fichier
+(descripteur ouvert en permanence, vidage sur taille, delai ou arret).
+"""
 
 import json
 import logging
@@ -6,15 +10,27 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from urssaf_analyzer.security.journal_writer import FsyncPolicy, JournalWriter
+
 logger = logging.getLogger("urssaf_analyzer.audit")
 
 
 class AuditLogger:
     """Journalise toutes les operations de maniere immutable (append-only)."""
 
-    def __init__(self, log_path: Path):
+    def __init__(
+        self,
+        log_path: Path,
+        *,
+        max_batch: int = 256,
+        flush_interval: float = 1.0,
+        fsync: FsyncPolicy = FsyncPolicy.PAR_LOT,
+    ):
         self.log_path = log_path
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = JournalWriter.partage(
+            log_path, max_batch=max_batch, flush_interval=flush_interval, fsync=fsync,
+        )
 
     def log(
         self,
@@ -40,12 +56,11 @@ class AuditLogger:
         if details:
             entry["details"] = details
 
-        line = json.dumps(entry, ensure_ascii=False)
-        try:
-            with open(self.log_path, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
-        except OSError as e:
-            logger.error("Impossible d'ecrire dans le journal d'audit: %s", e)
+        self._writer.write(json.dumps(entry, ensure_ascii=False))
+
+    def flush(self) -> None:
+        """Ecrit sur disque les entrees encore en memoire."""
+        self._writer.flush()
 
     def log_import(self, session_id: str, fichier: str, hash_fichier: str) -> None:
         self.log("import_document", session_id, fichier=fichier, hash_fichier=hash_fichier)
@@ -72,6 +87,7 @@ class AuditLogger:
 
     def lire_journal(self) -> list[dict]:
         """Lit toutes les entrees du journal."""
+        self.flush()
         if not self.log_path.exists():
             return []
         entries = []
@@ -0,0 +1,215 @@
+"""Ecriture bufferisee des journaux append-only (audit, alertes).
+
+Le descripteur de fichier reste ouvert et les entrees sont accumulees
+en memoire puis ecrites par lots :
+- quand le lot atteint `max_batch` entrees ;
+- toutes les `flush_interval` secondes (un thread de fond commun) ;
+- a la fermeture explicite, a la liberation du writer et a l'arret
+  ordonne du processus (atexit).
+
+Chaque lot est ecrit en un seul appel write() sur un descripteur
+O_APPEND : l'ordre des entrees est conserve et les lots de plusieurs
+workers ne s'entrelacent pas au milieu d'une ligne. Apres un fork
+(preload gunicorn), le processus enfant repart d'un lot vide : les
+entrees en attente restent a la charge du processus parent.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from enum import Enum
+from pathlib import Path
+
+logger = logging.getLogger("urssaf_analyzer.audit")
+
+
+class FsyncPolicy(str, Enum):
+    """Politique de synchronisation disque apres ecriture."""
+    AUCUN = "aucun"                  # confie au cache du systeme
+    PAR_LOT = "par_lot"              # fsync apres chaque lot ecrit
+    CHAQUE_ENTREE = "chaque_entree"  # ecriture + fsync immediats de chaque entree
+
+
+_TICK_SECONDS = 0.25
+_writers: "weakref.WeakSet[JournalWriter]" = weakref.WeakSet()
+_partages: "weakref.WeakValueDictionary[str, JournalWriter]" = weakref.WeakValueDictionary()
+_registre_lock = threading.Lock()
+_flusher_pid = None
+
+
+def _flusher_loop() -> None:
+    while True:
+        time.sleep(_TICK_SECONDS)
+        now = time.monotonic()
+        for writer in list(_writers):
+            if writer.pending and now - writer._last_flush >= writer.flush_interval:
+                writer.flush()
+
+
+def _demarrer_flusher() -> None:
+    """Demarre le thread de vidage periodique (un par processus)."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _registre_lock:
+        if _flusher_pid == os.getpid():
+            return
+        threading.Thread(target=_flusher_loop, name="journal-flusher", daemon=True).start()
+        _flusher_pid = os.getpid()
+
+
+def _fermer_tous() -> None:
+    for writer in list(_writers):
+        writer.close()
+
+
+def _vider_tous() -> None:
+    for writer in list(_writers):
+        try:
+            writer.flush()
+        except Exception:
+            pass
+
+
+def _apres_fork_enfant() -> None:
+    # Les lots herites du parent seraient ecrits une fois par worker
+    global _registre_lock
+    _registre_lock = threading.Lock()
+    for writer in list(_writers):
+        writer._reinitialiser_apres_fork()
+
+
+atexit.register(_fermer_tous)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_vider_tous, after_in_child=_apres_fork_enfant)
+
+
+class JournalWriter:
+    """Writer append-only bufferise pour fichiers JSON Lines."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_batch: int = 256,
+        flush_interval: float = 1.0,
+        fsync: FsyncPolicy = FsyncPolicy.PAR_LOT,
+        max_pending: int = 100_000,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.fsync = FsyncPolicy(fsync)
+        self.max_pending = max_pending
+        self._buffer: list[str] = []
+        self._reste = b""  # fin d'un lot partiellement ecrit avant une erreur
+        self._lock = threading.Lock()
+        self._fd = None
+        self._pid = None
+        self._last_flush = time.monotonic()
+        _writers.add(self)
+
+    @classmethod
+    def partage(cls, path: Path, **options) -> "JournalWriter":
+        """Writer unique par fichier et par processus.
+
+        Plusieurs AuditLogger sur le meme fichier partagent ainsi le meme
+        lot, ce qui conserve l'ordre chronologique global des entrees.
+        Les options du premier appelant s'appliquent.
+        """
+        key = str(Path(path).resolve())
+        with _registre_lock:
+            writer = _partages.get(key)
+            if writer is None:
+                writer = cls(path, **options)
+                _partages[key] = writer
+            return writer
+
+    def write(self, line: str) -> None:
+        """Ajoute une ligne (sans saut de ligne final) au lot courant."""
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) > self.max_pending:
+                # Disque indisponible de maniere prolongee : borner la memoire
+                perdues = len(self._buffer) - self.max_pending
+                del self._buffer[:perdues]
+                logger.error("Journal %s : %d entree(s) abandonnee(s)", self.path, perdues)
+            if self.fsync == FsyncPolicy.CHAQUE_ENTREE or len(self._buffer) >= self.max_batch:
+                self._flush_locked()
+                return
+        if self.flush_interval > 0:
+            _demarrer_flusher()
+
+    def flush(self) -> None:
+        """Ecrit immediatement les entrees en attente."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Vide le lot courant et ferme le fichier."""
+        with self._lock:
+            self._flush_locked()
+            self._close_fd()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer) + self._reste.count(b"\n")
+
+    def _reinitialiser_apres_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._reste = b""
+        self._fd = None
+        self._pid = None
+
+    def _open(self) -> int:
+        # Reouverture apres fork (preload gunicorn) : un fd par processus
+        if self._fd is None or self._pid != os.getpid():
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+            self._pid = os.getpid()
+        return self._fd
+
+    def _flush_locked(self) -> None:
+        if not self._buffer and not self._reste:
+            return
+        data = self._reste
+        if self._buffer:
+            data += ("\n".join(self._buffer) + "\n").encode("utf-8")
+            self._buffer.clear()
+        view = memoryview(data)
+        try:
+            fd = self._open()
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        except OSError as e:
+            # Seuls les octets non encore ecrits seront repris au prochain flush
+            self._reste = bytes(view)
+            logger.error("Impossible d'ecrire dans le journal %s: %s", self.path, e)
+            self._close_fd()
+            return
+        self._reste = b""
+        self._last_flush = time.monotonic()
+        if self.fsync != FsyncPolicy.AUCUN:
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                logger.error("fsync impossible sur le journal %s: %s", self.path, e)
+
+    def _close_fd(self) -> None:
+        if self._fd is not None and self._pid == os.getpid():
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+        self._fd = None
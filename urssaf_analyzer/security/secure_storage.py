@@ -3,13 +3,22 @@
 import os
 import secrets
 import shutil
+import time
 from pathlib import Path
+from typing import Optional
 
 from urssaf_analyzer.core.exceptions import SecurityError
 
 
-def suppression_securisee(chemin: Path, passes: int = 3) -> None:
-    """Supprime un fichier de maniere securisee en ecrasant son contenu."""
+_BLOC_ECRASEMENT = 1024 * 1024
+
+
+def suppression_securisee(chemin: Path, passes: int = 3, debit_max: Optional[int] = None) -> None:
+    """Supprime un fichier de maniere securisee en ecrasant son contenu.
+
+    `debit_max` (octets/s) limite le debit d'ecrasement pour les purges
+    de fond, afin de ne pas saturer le disque partage avec l'application.
+    """
     if not chemin.exists():
         return
     if not chemin.is_file():
@@ -18,8 +27,17 @@ def suppression_securisee(chemin: Path, passes: int = 3) -> None:
     taille = chemin.stat().st_size
     try:
         for _ in range(passes):
-            with open(chemin, "wb") as f:
-                f.write(secrets.token_bytes(taille))
+            with open(chemin, "r+b") as f:
+                debut = time.monotonic()
+                ecrits = 0
+                while ecrits < taille:
+                    n = min(_BLOC_ECRASEMENT, taille - ecrits)
+                    f.write(secrets.token_bytes(n))
+                    ecrits += n
+                    if debit_max:
+                        attente = ecrits / debit_max - (time.monotonic() - debut)
+                        if attente > 0:
+                            time.sleep(attente)
                 f.flush()
                 os.fsync(f.fileno())
         chemin.unlink()